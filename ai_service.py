@@ -59,36 +59,56 @@ AI_MODEL_ANALITICO = os.getenv('OPENAI_MODEL_ANALITICO', 'gpt-4o')
 AI_MODEL_CONHECIMENTO_GERAL = os.getenv('OPENAI_MODEL_CONHECIMENTO_GERAL', 'gpt-5.1')
 
 
+def _llm_somente_cache() -> bool:
+    """Modo somente-cache (testes): o LLM nunca é chamado."""
+    try:
+        from services.llm_cache import somente_cache
+        return somente_cache()
+    except Exception:
+        return False
+
+
 class AIService:
     """Serviço de IA para DUIMP - Protótipo isolado."""
     
     def __init__(self):
         self.enabled = AI_ENABLED and bool(AI_API_KEY)
         self.provider = AI_PROVIDER if self.enabled else None
-        self.cache = {}  # Cache simples em memória
+        # ✅ NOVO (16/10/2026): cache persistente (SQLite) compartilhado entre workers/reinícios
+        self.cache = self._abrir_cache()
+
+    @staticmethod
+    def _abrir_cache():
+        try:
+            from services.llm_cache import obter_llm_cache
+            return obter_llm_cache()
+        except Exception as e:
+            logger.warning(f"[AI_SERVICE] Cache LLM indisponível (seguindo sem cache): {e}")
+            return None
         
-    def _cache_key(self, tipo: str, dados: Dict) -> str:
-        """Gera chave de cache."""
-        key_data = {k: v for k, v in dados.items() if k not in ['contexto', 'pergunta']}
-        if 'contexto' in dados and dados['contexto'] is not None:
-            try:
-                contexto_norm = json.dumps(dados['contexto'], sort_keys=True, ensure_ascii=False)
-            except TypeError:
-                contexto_norm = str(dados['contexto'])
-            key_data['contexto_hash'] = hash(contexto_norm)
-        return f"{tipo}:{json.dumps(key_data, sort_keys=True)}"
+    def _cache_key(self, tipo: str, dados: Optional[Dict] = None, **prompt) -> str:
+        """
+        Gera chave de cache estável (`<tipo>:<sha256>`).
+
+        `prompt` aceita prompt/system_prompt/model/temperature/tools (ver `services.llm_cache.chave_llm`).
+        """
+        from services.llm_cache import chave_llm
+        key_data = {k: v for k, v in (dados or {}).items() if k != 'pergunta'}
+        return f"{tipo}:{chave_llm(tipo, dados=key_data, **prompt)}"
     
     def _get_cached(self, cache_key: str) -> Optional[Dict]:
-        """Busca no cache."""
-        if cache_key in self.cache:
-            cached_time, response = self.cache[cache_key]
-            if time.time() - cached_time < 3600:  # Cache válido por 1 hora
-                return response
-        return None
+        """Busca no cache (TTL conforme o tipo da chamada)."""
+        if self.cache is None:
+            return None
+        tipo, _, chave = cache_key.partition(':')
+        return self.cache.obter(chave, tipo)
     
     def _set_cache(self, cache_key: str, response: Dict):
         """Salva no cache."""
-        self.cache[cache_key] = (time.time(), response)
+        if self.cache is None:
+            return
+        tipo, _, chave = cache_key.partition(':')
+        self.cache.salvar(chave, response, tipo)
     
     def _call_llm_api(self, prompt: str, system_prompt: str, tools: Optional[List[Dict]] = None, tool_choice: Optional[str] = None, model: Optional[str] = None, temperature: Optional[float] = None) -> Optional[Any]:
         """
@@ -106,13 +126,13 @@ class AIService:
             Se tools=None: retorna string com resposta
             Se tools fornecidos: retorna dict com resposta e tool_calls (se houver)
         """
-        if not self.enabled:
+        if not self.enabled or _llm_somente_cache():
             return None
         
         try:
             if self.provider == 'openai':
                 try:
-                    from openai import OpenAI
+                    from services.openai_client_registry import obter_cliente_openai, chamada_openai
                     
                     messages = [
                         {"role": "system", "content": system_prompt},
@@ -140,7 +160,8 @@ class AIService:
                         # GPT-3.5-turbo é rápido, 30 segundos é suficiente
                         timeout_ajustado = max(AI_TIMEOUT, 30.0)  # Mínimo 30 segundos para GPT-3.5
                     
-                    client = OpenAI(api_key=AI_API_KEY, timeout=timeout_ajustado)
+                    # ✅ NOVO (16/10/2026): cliente compartilhado (pool keep-alive) + retry/limite/métricas centralizados
+                    client = obter_cliente_openai(api_key=AI_API_KEY, timeout=timeout_ajustado)
                     
                     # ✅ NOVO: Temperatura configurável (padrão 0.5 - sugerido para balance entre natural e consistente)
                     temperature_selecionada = temperature if temperature is not None else 0.5
@@ -192,27 +213,29 @@ class AIService:
                     logger.debug(f"[AI_SERVICE] 🔄 Chamando OpenAI com modelo {model_selecionado}, timeout={timeout_ajustado}s")
                     
                     # ✅ CORREÇÃO CRÍTICA: Tentar com max_completion_tokens primeiro, se falhar, tentar max_tokens
-                    try:
-                        response = client.chat.completions.create(**kwargs)
-                    except Exception as e:
-                        error_str = str(e)
-                        # Se o erro for sobre max_completion_tokens não suportado, tentar com max_tokens
-                        if 'max_completion_tokens' in error_str.lower() or 'unsupported parameter' in error_str.lower():
-                            logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_completion_tokens, tentando max_tokens: {e}")
-                            # Remover max_completion_tokens e tentar com max_tokens
-                            kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_completion_tokens'}
-                            kwargs_fallback["max_tokens"] = max_tokens_value
-                            response = client.chat.completions.create(**kwargs_fallback)
-                        # Se o erro for sobre max_tokens não suportado, tentar com max_completion_tokens
-                        elif 'max_tokens' in error_str.lower() and 'max_completion_tokens' in error_str.lower():
-                            logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_tokens, tentando max_completion_tokens: {e}")
-                            # Remover max_tokens e tentar com max_completion_tokens
-                            kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_tokens'}
-                            kwargs_fallback["max_completion_tokens"] = max_tokens_value
-                            response = client.chat.completions.create(**kwargs_fallback)
-                        else:
-                            # Re-raise se for outro tipo de erro
-                            raise
+                    with chamada_openai(model_selecionado, 'chat') as chamada:
+                        try:
+                            response = chamada.executar(client.chat.completions.create, **kwargs)
+                        except Exception as e:
+                            error_str = str(e)
+                            # Se o erro for sobre max_completion_tokens não suportado, tentar com max_tokens
+                            if 'max_completion_tokens' in error_str.lower() or 'unsupported parameter' in error_str.lower():
+                                logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_completion_tokens, tentando max_tokens: {e}")
+                                # Remover max_completion_tokens e tentar com max_tokens
+                                kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_completion_tokens'}
+                                kwargs_fallback["max_tokens"] = max_tokens_value
+                                response = chamada.executar(client.chat.completions.create, **kwargs_fallback)
+                            # Se o erro for sobre max_tokens não suportado, tentar com max_completion_tokens
+                            elif 'max_tokens' in error_str.lower() and 'max_completion_tokens' in error_str.lower():
+                                logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_tokens, tentando max_completion_tokens: {e}")
+                                # Remover max_tokens e tentar com max_completion_tokens
+                                kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_tokens'}
+                                kwargs_fallback["max_completion_tokens"] = max_tokens_value
+                                response = chamada.executar(client.chat.completions.create, **kwargs_fallback)
+                            else:
+                                # Re-raise se for outro tipo de erro
+                                raise
+                        chamada.registrar_uso(getattr(response, 'usage', None))
                     
                     message = response.choices[0].message
                     
@@ -329,14 +352,14 @@ class AIService:
             - done: bool (se terminou)
             - tool_calls: list (se houver tool calls)
         """
-        if not self.enabled:
+        if not self.enabled or _llm_somente_cache():
             yield {'chunk': '', 'done': True, 'tool_calls': None}
             return
         
         try:
             if self.provider == 'openai':
                 try:
-                    from openai import OpenAI
+                    from services.openai_client_registry import obter_cliente_openai, chamada_openai
                     
                     messages = [
                         {"role": "system", "content": system_prompt},
@@ -352,13 +375,15 @@ class AIService:
                     elif 'gpt-3.5' in model_selecionado.lower():
                         timeout_ajustado = max(AI_TIMEOUT, 30.0)
                     
-                    client = OpenAI(api_key=AI_API_KEY, timeout=timeout_ajustado)
+                    # ✅ NOVO (16/10/2026): cliente compartilhado (pool keep-alive) + retry/limite/métricas centralizados
+                    client = obter_cliente_openai(api_key=AI_API_KEY, timeout=timeout_ajustado)
                     
                     kwargs = {
                         "model": model_selecionado,
                         "messages": messages,
                         "temperature": temperature_selecionada,
-                        "stream": True  # ✅ CRÍTICO: Ativar streaming
+                        "stream": True,  # ✅ CRÍTICO: Ativar streaming
+                        "stream_options": {"include_usage": True},  # tokens no último chunk (métricas)
                     }
                     
                     max_tokens_value = 4000
@@ -380,56 +405,75 @@ class AIService:
                     tool_calls_accumulated = []
                     full_content = ""
                     
+                    # Semáforo do modelo fica ocupado enquanto o stream é consumido. O `finally` libera a
+                    # vaga (e fecha a resposta HTTP) também quando o consumidor abandona o generator no meio.
+                    chamada = chamada_openai(model_selecionado, 'chat_stream').adquirir()
+                    stream = None
                     try:
-                        stream = client.chat.completions.create(**kwargs)
-                    except Exception as e:
-                        error_str = str(e)
-                        if 'max_completion_tokens' in error_str.lower() or 'unsupported parameter' in error_str.lower():
-                            logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_completion_tokens, tentando max_tokens: {e}")
-                            kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_completion_tokens'}
-                            kwargs_fallback["max_tokens"] = max_tokens_value
-                            stream = client.chat.completions.create(**kwargs_fallback)
-                        elif 'max_tokens' in error_str.lower() and 'max_completion_tokens' in error_str.lower():
-                            logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_tokens, tentando max_completion_tokens: {e}")
-                            kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_tokens'}
-                            kwargs_fallback["max_completion_tokens"] = max_tokens_value
-                            stream = client.chat.completions.create(**kwargs_fallback)
-                        else:
-                            raise
-                    
-                    for chunk in stream:
-                        if chunk.choices and len(chunk.choices) > 0:
-                            delta = chunk.choices[0].delta
+                        try:
+                            stream = chamada.executar(client.chat.completions.create, **kwargs)
+                        except Exception as e:
+                            error_str = str(e)
+                            if 'max_completion_tokens' in error_str.lower() or 'unsupported parameter' in error_str.lower():
+                                logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_completion_tokens, tentando max_tokens: {e}")
+                                kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_completion_tokens'}
+                                kwargs_fallback["max_tokens"] = max_tokens_value
+                                stream = chamada.executar(client.chat.completions.create, **kwargs_fallback)
+                            elif 'max_tokens' in error_str.lower() and 'max_completion_tokens' in error_str.lower():
+                                logger.warning(f"[AI_SERVICE] ⚠️ Erro com max_tokens, tentando max_completion_tokens: {e}")
+                                kwargs_fallback = {k: v for k, v in kwargs.items() if k != 'max_tokens'}
+                                kwargs_fallback["max_completion_tokens"] = max_tokens_value
+                                stream = chamada.executar(client.chat.completions.create, **kwargs_fallback)
+                            else:
+                                raise
+                    
+                        for chunk in stream:
+                            # Último chunk (include_usage) traz só o consumo de tokens, sem choices
+                            chamada.registrar_uso(getattr(chunk, 'usage', None))
+                            if chunk.choices and len(chunk.choices) > 0:
+                                delta = chunk.choices[0].delta
+                                if getattr(delta, 'content', None) or getattr(delta, 'tool_calls', None):
+                                    chamada.primeiro_token()
                             
-                            # Texto do chunk
-                            if hasattr(delta, 'content') and delta.content:
-                                chunk_text = delta.content
-                                full_content += chunk_text
-                                # ✅ Log para debug: verificar se chunks estão sendo recebidos da API
-                                logger.debug(f"📦 [AI_STREAM] Chunk recebido da API ({len(chunk_text)} chars): '{chunk_text[:50]}...'")
-                                yield {
-                                    'chunk': chunk_text,
-                                    'done': False,
-                                    'tool_calls': None
-                                }
+                                # Texto do chunk
+                                if hasattr(delta, 'content') and delta.content:
+                                    chunk_text = delta.content
+                                    full_content += chunk_text
+                                    # ✅ Log para debug: verificar se chunks estão sendo recebidos da API
+                                    logger.debug(f"📦 [AI_STREAM] Chunk recebido da API ({len(chunk_text)} chars): '{chunk_text[:50]}...'")
+                                    yield {
+                                        'chunk': chunk_text,
+                                        'done': False,
+                                        'tool_calls': None
+                                    }
                             
-                            # Tool calls (acumular até terminar)
-                            if hasattr(delta, 'tool_calls') and delta.tool_calls:
-                                for tool_call_delta in delta.tool_calls:
-                                    idx = tool_call_delta.index
-                                    while len(tool_calls_accumulated) <= idx:
-                                        tool_calls_accumulated.append({
-                                            'id': '',
-                                            'function': {'name': '', 'arguments': ''}
-                                        })
+                                # Tool calls (acumular até terminar)
+                                if hasattr(delta, 'tool_calls') and delta.tool_calls:
+                                    for tool_call_delta in delta.tool_calls:
+                                        idx = tool_call_delta.index
+                                        while len(tool_calls_accumulated) <= idx:
+                                            tool_calls_accumulated.append({
+                                                'id': '',
+                                                'function': {'name': '', 'arguments': ''}
+                                            })
                                     
-                                    if tool_call_delta.id:
-                                        tool_calls_accumulated[idx]['id'] = tool_call_delta.id
-                                    if hasattr(tool_call_delta, 'function'):
-                                        if tool_call_delta.function.name:
-                                            tool_calls_accumulated[idx]['function']['name'] = tool_call_delta.function.name
-                                        if tool_call_delta.function.arguments:
-                                            tool_calls_accumulated[idx]['function']['arguments'] += tool_call_delta.function.arguments
+                                        if tool_call_delta.id:
+                                            tool_calls_accumulated[idx]['id'] = tool_call_delta.id
+                                        if hasattr(tool_call_delta, 'function'):
+                                            if tool_call_delta.function.name:
+                                                tool_calls_accumulated[idx]['function']['name'] = tool_call_delta.function.name
+                                            if tool_call_delta.function.arguments:
+                                                tool_calls_accumulated[idx]['function']['arguments'] += tool_call_delta.function.arguments
+                    except Exception as e:
+                        chamada.liberar(e)
+                        raise
+                    finally:
+                        if stream is not None and hasattr(stream, 'close'):
+                            try:
+                                stream.close()
+                            except Exception:
+                                pass
+                        chamada.liberar()
                     
                     # ✅ Se terminou e tem tool calls, retornar
                     if tool_calls_accumulated and any(tc.get('function', {}).get('name') for tc in tool_calls_accumulated):
@@ -480,7 +524,7 @@ class AIService:
         Interpreta erro da API do Portal Único em linguagem natural.
         """
         contexto = contexto or {}
-        cache_key = self._cache_key('erro', {'codigo': codigo_erro, 'campo': campo, 'contexto': contexto})
+        cache_key = self._cache_key('erro', {'codigo': codigo_erro, 'mensagem': mensagem, 'campo': campo, 'contexto': contexto})
         cached = self._get_cached(cache_key)
         if cached:
             return cached
@@ -591,7 +635,7 @@ Responda APENAS em JSON válido."""
         }
         if contexto:
             resultado['contexto'] = contexto
-        self._set_cache(cache_key, resultado)
+        # Fallback não vai para o cache persistente: uma falha transitória do LLM não deve durar o TTL inteiro
         return resultado
     
     def sugerir_ncm_por_descricao(self, descricao: str, contexto: Optional[Dict] = None, model: Optional[str] = None) -> Dict[str, Any]:
@@ -616,11 +660,6 @@ Responda APENAS em JSON válido."""
                 'sugestoes_alternativas': []
             }
         
-        cache_key = self._cache_key('sugerir_ncm', {'descricao': descricao.lower()})
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
-        
         contexto_str = ''
         if contexto:
             contexto_str = f"\nContexto adicional: {json.dumps(contexto, ensure_ascii=False)}"
@@ -743,6 +782,11 @@ Responda APENAS com o JSON, sem texto adicional."""
         
         # ✅ NOVO: Usar modelo especificado (ex: GPT-5) ou padrão
         modelo_para_usar = model or AI_MODEL_DEFAULT
+        # ✅ NOVO (16/10/2026): chave sobre o prompt final (inclui NCMs do RAG e feedbacks) + modelo
+        cache_key = self._cache_key('sugerir_ncm', prompt=user_prompt, system_prompt=system_prompt, model=modelo_para_usar)
+        cached = self._get_cached(cache_key)
+        if cached:
+            return cached
         resposta_llm = self._call_llm_api(user_prompt, system_prompt, model=modelo_para_usar)
         
         if resposta_llm:
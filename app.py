@@ -331,6 +331,16 @@ def _start_background_services(source: str) -> None:
 if __name__ != "__main__" and _should_autostart_background_services():
     _start_background_services(source="autostart")
 
+# ✅ NOVO (16/10/2026): pré-carregar índice/modelo NESH HF no import (com `gunicorn --preload`
+# os workers herdam o modelo e as páginas do índice mmap em vez de cada um carregar o seu)
+if os.getenv("NESH_HF_PRELOAD", "false").strip().lower() == "true":
+    try:
+        from services.nesh_hf_service import get_nesh_hf_service
+        if get_nesh_hf_service().preload():
+            logger.info("✅ NESH HF pré-carregado (índice mmap + modelo de embeddings)")
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao pré-carregar NESH HF: {e}")
+
 
 # =============================================================================
 # ROTAS
@@ -982,7 +992,8 @@ def chat_voice():
                 'mensagem': 'Chave da API de IA não configurada (DUIMP_AI_API_KEY).'
             }), 500
 
-        client = OpenAI(api_key=api_key, timeout=60.0)
+        from services.openai_client_registry import obter_cliente_openai
+        client = obter_cliente_openai(api_key=api_key, timeout=60.0, perfil="whisper", sdk_max_retries=2)
 
         # Modelo de transcrição (configurável via .env)
         stt_model = os.getenv('OPENAI_STT_MODEL', 'gpt-4o-mini-transcribe')
@@ -1254,8 +1265,8 @@ def briefing_dia():
                 
                 if ai_service.enabled:
                     try:
-                        from openai import OpenAI
-                        client = OpenAI(api_key=os.getenv('DUIMP_AI_API_KEY'))
+                        from services.openai_client_registry import obter_cliente_openai
+                        client = obter_cliente_openai(api_key=os.getenv('DUIMP_AI_API_KEY'), timeout=600.0, perfil="tts", sdk_max_retries=2)
                         
                         # Gerar áudio
                         response = client.audio.speech.create(
@@ -3822,7 +3833,8 @@ def gerar_relatorio_averbacoes():
     {
         "mes": "2025-06" ou "06",  # Formato YYYY-MM ou MM
         "ano": 2025,  # Opcional se fornecido no mes
-        "categoria": "BND"  # Opcional (BND, ALH, VDM, etc.)
+        "categoria": "BND",  # Opcional (BND, ALH, VDM, etc.)
+        "assincrono": true  # Opcional: responde 202 com job_id (progresso em /api/relatorio/averbacoes/status/<job_id>)
     }
     """
     try:
@@ -3838,6 +3850,16 @@ def gerar_relatorio_averbacoes():
                 'mensagem': 'Parâmetro "mes" é obrigatório (formato: "2025-06" ou "06")'
             }), 400
         
+        # ✅ NOVO (16/10/2026): relatório de fim de mês em background (evita timeout do request)
+        if data.get('assincrono'):
+            from services.relatorio_averbacoes_service import iniciar_relatorio_averbacoes_em_background
+            job_id = iniciar_relatorio_averbacoes_em_background(mes=mes, ano=ano, categoria=categoria)
+            return jsonify({
+                'sucesso': True,
+                'job_id': job_id,
+                'status_url': f'/api/relatorio/averbacoes/status/{job_id}'
+            }), 202
+        
         from services.relatorio_averbacoes_service import RelatorioAverbacoesService
         
         service = RelatorioAverbacoesService()
@@ -3864,6 +3886,21 @@ def gerar_relatorio_averbacoes():
         }), 500
 
 
+@app.route('/api/relatorio/averbacoes/status/<job_id>', methods=['GET'])
+def status_relatorio_averbacoes(job_id):
+    """Progresso/resultado de um relatório de averbações iniciado com "assincrono": true."""
+    from services.relatorio_averbacoes_service import obter_status_relatorio_averbacoes
+    
+    job = obter_status_relatorio_averbacoes(job_id)
+    if not job:
+        return jsonify({'sucesso': False, 'erro': 'JOB_NAO_ENCONTRADO'}), 404
+    
+    resultado = job.get('resultado') or {}
+    if resultado.get('sucesso') and resultado.get('caminho_arquivo'):
+        resultado['arquivo'] = f'/api/download/{Path(resultado["caminho_arquivo"]).name}'
+    return jsonify({'sucesso': True, **job}), 200
+
+
 @app.route('/api/download/<path:filename>', methods=['GET'])
 def download_file(filename):
     """Endpoint para download de arquivos (PDFs, TTS, etc)."""
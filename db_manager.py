@@ -175,6 +175,26 @@ def _criar_tabela_sales_watch_state(cursor: sqlite3.Cursor) -> None:
     from services.sales_watch_schema import criar_tabela_sales_watch_state
     criar_tabela_sales_watch_state(cursor)
 
+def _criar_tabela_vendas_make_catalogo(cursor: sqlite3.Cursor) -> None:
+    """Wrapper: schema extraído para `services/vendas_make_schema.py`."""
+    from services.vendas_make_schema import criar_tabela_vendas_make_catalogo
+    criar_tabela_vendas_make_catalogo(cursor)
+
+def _criar_tabela_dashboard_snapshot(cursor: sqlite3.Cursor) -> None:
+    """Wrapper: schema extraído para `services/dashboard_snapshot_schema.py`."""
+    from services.dashboard_snapshot_schema import criar_tabela_dashboard_snapshot
+    criar_tabela_dashboard_snapshot(cursor)
+
+def _criar_tabelas_ptax(cursor: sqlite3.Cursor) -> None:
+    """Wrapper: schema extraído para `services/ptax_schema.py`."""
+    from services.ptax_schema import criar_tabelas_ptax
+    criar_tabelas_ptax(cursor)
+
+def _criar_tabela_relatorio_fob(cursor: sqlite3.Cursor) -> None:
+    """Wrapper: schema extraído para `services/relatorio_fob_schema.py`."""
+    from services.relatorio_fob_schema import criar_tabela_relatorio_fob
+    criar_tabela_relatorio_fob(cursor)
+
 def init_db():
     """Inicializa o banco de dados (SQLite ou Postgres)."""
     conn = get_db_connection()
@@ -226,6 +246,18 @@ def init_db():
 
     # ✅ NOVO (28/01/2026): estado do watch de vendas (evita notificações repetidas)
     _criar_tabela_sales_watch_state(cursor)
+
+    # ✅ NOVO (16/10/2026): catálogo de schema do legado Make/Spalla (introspecção com TTL)
+    _criar_tabela_vendas_make_catalogo(cursor)
+
+    # ✅ NOVO (16/10/2026): dashboard do dia materializado por (categoria, modal)
+    _criar_tabela_dashboard_snapshot(cursor)
+
+    # ✅ NOVO (16/10/2026): store local de PTAX (boletins + dias carregados + calendário)
+    _criar_tabelas_ptax(cursor)
+
+    # ✅ NOVO (16/10/2026): anos fechados materializados pelo relatório FOB (VALOR_MERCADORIA)
+    _criar_tabela_relatorio_fob(cursor)
     
     # ✅ SCHEMA EXTRAÍDO (19/01/2026): notificações de processos + índices
     _criar_tabela_notificacoes_processos(cursor)
@@ -275,6 +307,9 @@ def init_db():
     # Índices para processos_kanban (schema extraído)
     from services.processos_kanban_indexes_schema import criar_indices_processos_kanban
     criar_indices_processos_kanban(cursor)
+    # ✅ NOVO (16/10/2026): backfill das colunas projetadas (linhas antigas / versão nova da regra)
+    from services.processos_kanban_projecao import reprojetar_pendentes
+    reprojetar_pendentes(cursor)
     
     # ✅ Vinculação de documentos + legislação
     _criar_tabela_processo_documentos(cursor)
@@ -2387,53 +2422,202 @@ def buscar_ncms_relacionados_hierarquia(ncm_encontrado: str) -> List[Dict[str, A
         logging.error(f"Erro ao buscar NCMs relacionados na hierarquia: {e}")
         return []
 
-def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados: bool = True) -> List[Dict[str, Any]]:
+_SUFIXOS_PLURAL_PT = (
+    # (sufixo do plural, sufixo do singular) - comparados sem acento (o índice usa remove_diacritics)
+    ('oes', 'ao'),
+    ('aes', 'ao'),
+    ('aos', 'ao'),
+    ('ais', 'al'),
+    ('eis', 'el'),
+    ('ois', 'ol'),
+    ('uis', 'ul'),
+    ('ns', 'm'),
+    ('res', 'r'),
+    ('zes', 'z'),
+    ('ses', 's'),
+)
+
+
+def _remover_acentos(texto: str) -> str:
+    import unicodedata
+    return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+
+def _variantes_singular_plural(palavra: str) -> List[str]:
+    """Formas singular/plural de uma palavra em português (sem acento), ex.: limão → limao, limoes."""
+    palavra = _remover_acentos(palavra.lower())
+    variantes = {palavra}
+    for plural, singular in _SUFIXOS_PLURAL_PT:
+        if palavra.endswith(plural) and len(palavra) > len(plural) + 1:
+            variantes.add(palavra[:-len(plural)] + singular)
+        if singular != 's' and palavra.endswith(singular) and len(palavra) > len(singular) + 1:
+            variantes.add(palavra[:-len(singular)] + plural)
+    if palavra.endswith('s') and len(palavra) > 3:
+        variantes.add(palavra[:-1])
+    else:
+        variantes.add(palavra + 's')
+    return sorted(v for v in variantes if len(v) >= 2)
+
+
+def _montar_consulta_fts_ncm(termo: str) -> Optional[str]:
     """
-    Busca NCMs por descrição (busca parcial case-insensitive).
-    
-    ✅ NOVO: Agora inclui NCMs relacionados na hierarquia quando encontra um NCM.
-    ✅ CORREÇÃO: Busca por palavras completas para evitar falsos positivos
-    (ex: "alhos" não encontra mais "soalhos").
-    
-    Args:
-        termo: Termo de busca (ex: "alho")
-        limite: Número máximo de resultados principais (padrão: 50)
-        incluir_relacionados: Se True, inclui NCMs relacionados na hierarquia (padrão: True)
+    Monta a expressão MATCH do FTS5: cada palavra vira um grupo OR de singular/plural
+    e os grupos são combinados com AND (ex.: "carne bovina" → (carne OR carnes) AND (bovina OR bovinas)).
+    """
+    import re
+    palavras = re.findall(r'\w+', termo.lower())
+    grupos = []
+    for palavra in palavras:
+        variantes = ' OR '.join(f'"{v}"' for v in _variantes_singular_plural(palavra))
+        if variantes:
+            grupos.append(f'({variantes})')
+    return ' AND '.join(grupos) if grupos else None
+
+
+def _buscar_ncms_fts(cursor: sqlite3.Cursor, termo_clean: str, limite: int) -> Optional[Tuple[List[Any], List[Any]]]:
+    """
+    Busca NCMs pelo índice FTS5 `classif_cache_fts` (ranking bm25).
     
     Returns:
-        Lista de dicionários com ncm, descricao, unidade_medida_estatistica e grupo_hierarquico
+        (linhas diretas, grupos de 4/6 dígitos que contêm o termo) ou None se o índice não existe
+        (SQLite sem FTS5) - o chamador usa `_buscar_ncms_like`.
     """
-    if not termo or len(termo.strip()) < 2:
-        return []
-    
+    consulta = _montar_consulta_fts_ncm(termo_clean)
+    if not consulta:
+        return [], []
     try:
-        termo_clean = termo.strip().lower()
-        
-        # ✅ CORREÇÃO CRÍTICA: Buscar APENAS palavras completas, não substrings
-        # Exemplo: "alho" deve encontrar "alhos-porros" mas NÃO "cascalho"
-        # Usar delimitadores: espaços, vírgulas, hífens, parênteses, dois-pontos, etc.
-        
-        conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # ✅ CORREÇÃO: Buscar plural/singular
-        termo_plural = f'{termo_clean}s'
-        termo_singular = termo_clean.rstrip('s')
-        
-        # ✅ NOVO: Busca melhorada que inclui hierarquia (grupos pais)
-        # Busca em duas etapas:
-        # 1. Busca direta na descrição do NCM (APENAS palavras completas)
-        # 2. Busca nos grupos pais (4 e 6 dígitos) e inclui todos os NCMs de 8 dígitos desses grupos
+        cursor.execute('''
+            SELECT c.ncm, c.descricao, c.unidade_medida_estatistica
+            FROM classif_cache_fts f
+            JOIN classif_cache c ON c.rowid = f.rowid
+            WHERE classif_cache_fts MATCH ?
+            ORDER BY bm25(classif_cache_fts), c.descricao ASC
+            LIMIT ?
+        ''', (consulta, limite))
+        rows_diretos = cursor.fetchall()
         
-        # ETAPA 1: Buscar NCMs que têm o termo como PALAVRA COMPLETA na descrição
-        # Delimitadores: espaço, vírgula, hífen, parêntese, dois-pontos, ponto-e-vírgula
-        # ✅ IMPORTANTE: NÃO usar '%{termo}%' que encontra substrings como "cascalho"
         cursor.execute('''
-            SELECT ncm, descricao, unidade_medida_estatistica
-            FROM classif_cache
-            WHERE (
-                -- Começa com termo (singular ou plural) seguido de delimitador ou fim
+            SELECT DISTINCT c.ncm
+            FROM classif_cache_fts f
+            JOIN classif_cache c ON c.rowid = f.rowid
+            WHERE classif_cache_fts MATCH ?
+            AND LENGTH(c.ncm) IN (4, 6)
+        ''', (consulta,))
+        grupos_rows = cursor.fetchall()
+    except sqlite3.OperationalError as e:
+        msg = str(e).lower()
+        if 'classif_cache_fts' in msg or 'fts5' in msg:
+            return None
+        raise
+    return rows_diretos, grupos_rows
+
+
+def _buscar_ncms_like(cursor: sqlite3.Cursor, termo_clean: str, limite: int) -> Tuple[List[Any], List[Any]]:
+    """
+    Busca NCMs por palavra completa com LIKE (fallback quando o SQLite não tem FTS5).
+    
+    Returns:
+        (linhas diretas, grupos de 4/6 dígitos que contêm o termo)
+    """
+    # ✅ CORREÇÃO: Buscar plural/singular
+    termo_plural = f'{termo_clean}s'
+    termo_singular = termo_clean.rstrip('s')
+    
+    # ✅ NOVO: Busca melhorada que inclui hierarquia (grupos pais)
+    # Busca em duas etapas:
+    # 1. Busca direta na descrição do NCM (APENAS palavras completas)
+    # 2. Busca nos grupos pais (4 e 6 dígitos) e inclui todos os NCMs de 8 dígitos desses grupos
+    
+    # ETAPA 1: Buscar NCMs que têm o termo como PALAVRA COMPLETA na descrição
+    # Delimitadores: espaço, vírgula, hífen, parêntese, dois-pontos, ponto-e-vírgula
+    # ✅ IMPORTANTE: NÃO usar '%{termo}%' que encontra substrings como "cascalho"
+    cursor.execute('''
+        SELECT ncm, descricao, unidade_medida_estatistica
+        FROM classif_cache
+        WHERE (
+            -- Começa com termo (singular ou plural) seguido de delimitador ou fim
+            LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || '(' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ':' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ';' COLLATE NOCASE OR
+            LOWER(descricao) = ? COLLATE NOCASE OR
+            -- Termo no meio (delimitado antes e depois)
+            LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || '(' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ':' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ';' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE OR
+            -- Termo no meio (delimitado antes por vírgula, hífen, etc.)
+            LOWER(descricao) LIKE '%, ' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE OR
+            -- Plural (mesmas condições)
+            LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || '(' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ':' COLLATE NOCASE OR
+            LOWER(descricao) LIKE ? || ';' COLLATE NOCASE OR
+            LOWER(descricao) = ? COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || '(' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ':' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? || ';' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE OR
+            LOWER(descricao) LIKE '%, ' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
+            LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE
+        )
+        ORDER BY 
+            CASE 
+                WHEN LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE THEN 1
+                WHEN LOWER(descricao) LIKE ? || ',' COLLATE NOCASE THEN 1
+                WHEN LOWER(descricao) LIKE ? || '-' COLLATE NOCASE THEN 1
+                WHEN LOWER(descricao) = ? COLLATE NOCASE THEN 1
+                WHEN LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE THEN 2
+                WHEN LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE THEN 2
+                WHEN LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE THEN 2
+                WHEN LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE THEN 2
+                ELSE 3
+            END,
+            descricao ASC
+        LIMIT ?
+    ''', (
+        # Singular - começa com termo
+        termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
+        # Singular - no meio
+        termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
+        # Singular - delimitado antes
+        termo_clean, termo_clean, termo_clean,
+        # Plural - começa com termo
+        termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
+        # Plural - no meio
+        termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
+        # Plural - delimitado antes
+        termo_plural, termo_plural, termo_plural,
+        # ORDER BY
+        termo_clean, termo_clean, termo_clean, termo_clean,
+        termo_clean, termo_clean, termo_clean, termo_clean,
+        limite
+    ))
+    
+    rows_diretos = cursor.fetchall()
+    
+    # ETAPA 2: Buscar grupos (4 e 6 dígitos) que têm o termo como PALAVRA COMPLETA na descrição
+    # Usar a mesma lógica de palavras completas para evitar falsos positivos
+    cursor.execute('''
+        SELECT DISTINCT ncm
+        FROM classif_cache
+        WHERE (
+            (LENGTH(ncm) = 4 OR LENGTH(ncm) = 6)
+            AND (
+                -- Mesma lógica de palavras completas da ETAPA 1
                 LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
                 LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
@@ -2441,7 +2625,6 @@ def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados
                 LOWER(descricao) LIKE ? || ':' COLLATE NOCASE OR
                 LOWER(descricao) LIKE ? || ';' COLLATE NOCASE OR
                 LOWER(descricao) = ? COLLATE NOCASE OR
-                -- Termo no meio (delimitado antes e depois)
                 LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE OR
@@ -2449,11 +2632,10 @@ def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados
                 LOWER(descricao) LIKE '% ' || ? || ':' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '% ' || ? || ';' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE OR
-                -- Termo no meio (delimitado antes por vírgula, hífen, etc.)
                 LOWER(descricao) LIKE '%, ' || ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE OR
-                -- Plural (mesmas condições)
+                -- Plural
                 LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
                 LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
@@ -2472,100 +2654,61 @@ def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados
                 LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
                 LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE
             )
-            ORDER BY 
-                CASE 
-                    WHEN LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE THEN 1
-                    WHEN LOWER(descricao) LIKE ? || ',' COLLATE NOCASE THEN 1
-                    WHEN LOWER(descricao) LIKE ? || '-' COLLATE NOCASE THEN 1
-                    WHEN LOWER(descricao) = ? COLLATE NOCASE THEN 1
-                    WHEN LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE THEN 2
-                    WHEN LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE THEN 2
-                    WHEN LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE THEN 2
-                    WHEN LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE THEN 2
-                    ELSE 3
-                END,
-                descricao ASC
-            LIMIT ?
-        ''', (
-            # Singular - começa com termo
-            termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
-            # Singular - no meio
-            termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
-            # Singular - delimitado antes
-            termo_clean, termo_clean, termo_clean,
-            # Plural - começa com termo
-            termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
-            # Plural - no meio
-            termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
-            # Plural - delimitado antes
-            termo_plural, termo_plural, termo_plural,
-            # ORDER BY
-            termo_clean, termo_clean, termo_clean, termo_clean,
-            termo_clean, termo_clean, termo_clean, termo_clean,
-            limite
-        ))
+        )
+    ''', (
+        # Singular
+        termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
+        termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
+        termo_clean, termo_clean, termo_clean,
+        # Plural
+        termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
+        termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
+        termo_plural, termo_plural, termo_plural
+    ))
+    
+    grupos_rows = cursor.fetchall()
+    return rows_diretos, grupos_rows
+
+
+def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados: bool = True) -> List[Dict[str, Any]]:
+    """
+    Busca NCMs por descrição (busca parcial case-insensitive).
+    
+    ✅ NOVO: Agora inclui NCMs relacionados na hierarquia quando encontra um NCM.
+    ✅ CORREÇÃO: Busca por palavras completas para evitar falsos positivos
+    (ex: "alhos" não encontra mais "soalhos").
+    
+    Args:
+        termo: Termo de busca (ex: "alho")
+        limite: Número máximo de resultados principais (padrão: 50)
+        incluir_relacionados: Se True, inclui NCMs relacionados na hierarquia (padrão: True)
+    
+    Returns:
+        Lista de dicionários com ncm, descricao, unidade_medida_estatistica e grupo_hierarquico
+    """
+    if not termo or len(termo.strip()) < 2:
+        return []
+    
+    try:
+        termo_clean = termo.strip().lower()
         
-        rows_diretos = cursor.fetchall()
+        # ✅ CORREÇÃO CRÍTICA: Buscar APENAS palavras completas, não substrings
+        # Exemplo: "alho" deve encontrar "alhos-porros" mas NÃO "cascalho"
+        # Usar delimitadores: espaços, vírgulas, hífens, parênteses, dois-pontos, etc.
         
-        # ETAPA 2: Buscar grupos (4 e 6 dígitos) que têm o termo como PALAVRA COMPLETA na descrição
-        # Usar a mesma lógica de palavras completas para evitar falsos positivos
-        grupos_com_termo = set()
-        cursor.execute('''
-            SELECT DISTINCT ncm
-            FROM classif_cache
-            WHERE (
-                (LENGTH(ncm) = 4 OR LENGTH(ncm) = 6)
-                AND (
-                    -- Mesma lógica de palavras completas da ETAPA 1
-                    LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || '(' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ':' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ';' COLLATE NOCASE OR
-                    LOWER(descricao) = ? COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || '(' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ':' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ';' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%, ' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE OR
-                    -- Plural
-                    LOWER(descricao) LIKE ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ',' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || '-' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || '(' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ':' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE ? || ';' COLLATE NOCASE OR
-                    LOWER(descricao) = ? COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ',' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || '-' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || '(' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ':' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? || ';' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '% ' || ? COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%, ' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%-' || ? || ' %' COLLATE NOCASE OR
-                    LOWER(descricao) LIKE '%(' || ? || ' %' COLLATE NOCASE
-                )
-            )
-        ''', (
-            # Singular
-            termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
-            termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean, termo_clean,
-            termo_clean, termo_clean, termo_clean,
-            # Plural
-            termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
-            termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural, termo_plural,
-            termo_plural, termo_plural, termo_plural
-        ))
+        conn = get_db_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
         
-        grupos_rows = cursor.fetchall()
+        # ✅ NOVO (16/10/2026): Índice FTS5 (bm25); LIKE só quando o SQLite não tem FTS5
+        busca_fts = _buscar_ncms_fts(cursor, termo_clean, limite)
+        validar_palavra_completa = busca_fts is None
+        if busca_fts is not None:
+            rows_diretos, grupos_rows = busca_fts
+        else:
+            rows_diretos, grupos_rows = _buscar_ncms_like(cursor, termo_clean, limite)
+        
+        grupos_com_termo = set()
         for grupo_row in grupos_rows:
             grupo_ncm = grupo_row[0]
             grupos_com_termo.add(grupo_ncm)
@@ -2666,7 +2809,8 @@ def buscar_ncms_por_descricao(termo: str, limite: int = 50, incluir_relacionados
                               descricao_norm == termo_plural_escaped
             
             # ✅ Só incluir se for palavra completa (validado por regex)
-            if not (palavra_completa or palavra_completa_plural or comeca_com_termo):
+            # (no caminho FTS5 o tokenizer já garante palavra completa, inclusive plurais irregulares)
+            if validar_palavra_completa and not (palavra_completa or palavra_completa_plural or comeca_com_termo):
                 continue
             
             # Adicionar NCM encontrado
@@ -2897,10 +3041,15 @@ def save_classif_ncm(ncm: str, unidade: str, descricao: Optional[str] = None) ->
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        # UPSERT (não REPLACE): mantém o rowid e dispara o trigger de UPDATE do índice FTS5
         cursor.execute('''
-            INSERT OR REPLACE INTO classif_cache 
+            INSERT INTO classif_cache 
             (ncm, unidade_medida_estatistica, descricao, data_atualizacao)
             VALUES (?, ?, ?, ?)
+            ON CONFLICT(ncm) DO UPDATE SET
+                unidade_medida_estatistica = excluded.unidade_medida_estatistica,
+                descricao = excluded.descricao,
+                data_atualizacao = excluded.data_atualizacao
         ''', (ncm, unidade, descricao or '', datetime.now()))
         
         conn.commit()
@@ -3622,6 +3771,62 @@ def listar_processos_por_categoria(categoria: str, limit: int = 200) -> List[str
         return []
 
 
+def carregar_projecao_kanban(processos_refs: List[str]) -> Dict[str, sqlite3.Row]:
+    """
+    Linhas projetadas do Kanban para as refs, numa consulta só (refs fora do Kanban ficam de fora).
+
+    ✅ NOVO (16/10/2026): colunas projetadas de `processos_kanban` (ver `processos_kanban_projecao`)
+    + colunas dos caches de CE/DI, usadas pela listagem por categoria/situação.
+    """
+    if not processos_refs:
+        return {}
+    marcadores = ", ".join("?" for _ in processos_refs)
+    conn = get_db_connection()
+    try:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT
+                pk.processo_referencia,
+                pk.numero_ce,
+                pk.situacao_ce,
+                pk.numero_di,
+                COALESCE(pk.di_situacao, pk.situacao_di) AS di_situacao,
+                COALESCE(pk.di_canal, (
+                    SELECT dc.canal_selecao_parametrizada FROM dis_cache dc
+                    WHERE dc.numero_di = pk.numero_di ORDER BY dc.atualizado_em DESC LIMIT 1
+                )) AS di_canal,
+                COALESCE(pk.di_data_desembaraco, (
+                    SELECT dc.data_hora_desembaraco FROM dis_cache dc
+                    WHERE dc.numero_di = pk.numero_di ORDER BY dc.atualizado_em DESC LIMIT 1
+                )) AS di_data_desembaraco,
+                COALESCE(pk.di_data_registro, (
+                    SELECT dc.data_hora_registro FROM dis_cache dc
+                    WHERE dc.numero_di = pk.numero_di ORDER BY dc.atualizado_em DESC LIMIT 1
+                )) AS di_data_registro,
+                COALESCE(pk.di_situacao_entrega_carga, pk.situacao_entrega) AS di_situacao_entrega,
+                pk.numero_duimp,
+                pk.duimp_situacao,
+                pk.duimp_versao,
+                pk.duimp_canal,
+                pk.duimp_data_registro,
+                COALESCE(pk.pendencia_frete, 0) AS pendencia_frete,
+                pk.pendencia_afrmm,
+                pk.pendencia_lpco,
+                COALESCE(ce.carga_bloqueada, 0) AS carga_bloqueada,
+                COALESCE(ce.bloqueio_impede_despacho, 0) AS bloqueio_impede_despacho,
+                (COALESCE(pk.pendencia_frete, 0) = 1 OR pk.pendencia_afrmm = 1 OR pk.pendencia_lpco = 1) AS tem_pendencia,
+                (pk.bloqueio = 1 OR COALESCE(ce.carga_bloqueada, 0) = 1
+                    OR COALESCE(ce.bloqueio_impede_despacho, 0) = 1) AS tem_bloqueio
+            FROM processos_kanban pk
+            LEFT JOIN ces_cache ce ON ce.numero_ce = pk.numero_ce
+            WHERE pk.processo_referencia IN ({marcadores})
+        """, list(processos_refs))
+        return {row["processo_referencia"]: row for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
 def listar_processos_por_categoria_e_situacao(categoria: str, situacao_filtro: Optional[str] = None, filtro_pendencias: Optional[bool] = None, filtro_bloqueio: Optional[bool] = None, limit: int = 200) -> List[Dict[str, Any]]:
     """Wrapper fino: implementação extraída para `services/processos_situacao_categoria_repository.py`."""
     from services.processos_situacao_categoria_repository import listar_processos_por_categoria_e_situacao as _impl
@@ -3635,6 +3840,7 @@ def listar_processos_por_categoria_e_situacao(categoria: str, situacao_filtro: O
         listar_processos_por_categoria=listar_processos_por_categoria,
         obter_dados_documentos_processo=obter_dados_documentos_processo,
         buscar_di_cache=buscar_di_cache,
+        carregar_projecao_kanban=carregar_projecao_kanban,
     )
 
 
@@ -6582,9 +6788,7 @@ def contar_consultas_pendentes() -> Dict[str, int]:
 # NESH - Nomenclatura Estatística SH (Notas Explicativas)
 # ============================================================================
 
-# Cache global para NESH (carregado sob demanda)
-_NESH_CACHE: Optional[List[Dict[str, Any]]] = None
-_NESH_LOADED = False
+# Disponibilidade do SQLite NESH (o índice em memória fica em services.nesh_index)
 _NESH_SQLITE_READY: Optional[bool] = None
 
 
@@ -6638,40 +6842,58 @@ def _nesh_row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
         "_nesh_source": "SQLITE",
     }
 
-def _carregar_nesh_cache() -> List[Dict[str, Any]]:
+def _obter_nesh_index():
     """
-    Carrega o arquivo NESH em cache (lazy loading).
-    
-    Returns:
-        Lista de registros NESH
+    Índice NESH do processo (construído uma vez, sob demanda).
+
+    - `nesh_chunks` populado: índices montados a partir do SQLite (registros lidos pelo rowid;
+      o `nesh_chunks.json` não é carregado)
+    - senão: fallback para o JSON, com dicts por código e índice invertido de tokens
+    """
+    from services.nesh_index import NeshIndex, obter_nesh_index
+
+    def _construir() -> NeshIndex:
+        global _NESH_SQLITE_READY
+        # ✅ NOVO (16/10/2026): (re)construção após reimportar `nesh_chunks` - reavaliar a origem
+        _NESH_SQLITE_READY = None
+        if _nesh_sqlite_ready():
+            return NeshIndex.de_sqlite(get_db_connection)
+        try:
+            # ✅ Configurável via ENV (permite mover arquivo para fora do workspace)
+            from services.path_config import get_nesh_chunks_path
+            nesh_path = get_nesh_chunks_path()
+            if not nesh_path.exists():
+                logging.warning('⚠️ Arquivo nesh_chunks.json não encontrado')
+                return NeshIndex.de_registros([])
+            logging.info('📚 Carregando arquivo NESH...')
+            return NeshIndex.de_json(nesh_path)
+        except Exception as e:
+            logging.error(f'❌ Erro ao carregar NESH: {e}')
+            return NeshIndex.de_registros([])
+
+    return obter_nesh_index(_construir, versao=_versao_nesh_chunks)
+
+
+def _versao_nesh_chunks() -> Optional[tuple]:
+    """
+    Versão de `nesh_chunks` para o índice em memória: (MAX(rowid), MAX(atualizado_em)).
+
+    O import (`scripts/importar_nesh_sqlite.py`) roda em outro processo e faz upsert: linhas novas
+    mudam o rowid máximo e linhas atualizadas mudam `atualizado_em` (ambos resolvidos por índice).
     """
-    global _NESH_CACHE, _NESH_LOADED
-    
-    if _NESH_LOADED and _NESH_CACHE is not None:
-        return _NESH_CACHE
-    
     try:
-        # ✅ Configurável via ENV (permite mover arquivo para fora do workspace)
-        from services.path_config import get_nesh_chunks_path
-        nesh_path = get_nesh_chunks_path()
-        if not nesh_path.exists():
-            logging.warning('⚠️ Arquivo nesh_chunks.json não encontrado')
-            _NESH_CACHE = []
-            _NESH_LOADED = True
-            return _NESH_CACHE
-        
-        logging.info('📚 Carregando arquivo NESH...')
-        with open(nesh_path, 'r', encoding='utf-8') as f:
-            _NESH_CACHE = json.load(f)
-        
-        _NESH_LOADED = True
-        logging.info(f'✅ NESH carregado: {len(_NESH_CACHE)} registros')
-        return _NESH_CACHE
-    except Exception as e:
-        logging.error(f'❌ Erro ao carregar NESH: {e}')
-        _NESH_CACHE = []
-        _NESH_LOADED = True
-        return _NESH_CACHE
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(rowid) FROM nesh_chunks")
+            max_rowid = cursor.fetchone()[0]
+            cursor.execute("SELECT MAX(atualizado_em) FROM nesh_chunks")
+            max_atualizado = cursor.fetchone()[0]
+            return (max_rowid, max_atualizado)
+        finally:
+            conn.close()
+    except Exception:
+        return None
 
 def buscar_nota_explicativa_nesh_por_ncm(ncm: str) -> Optional[Dict[str, Any]]:
     """
@@ -6748,44 +6970,12 @@ def buscar_nota_explicativa_nesh_por_ncm(ncm: str) -> Optional[Dict[str, Any]]:
         # Fallback: JSON
         if log_source:
             logging.info(f"📚 NESH fonte=JSON modo=ncm ncm={ncm_clean}")
-        nesh_data = _carregar_nesh_cache()
-        
-        # Buscar por código de posição (4 dígitos) ou subposição (6 dígitos)
-        ncm_4 = ncm_clean[:4]
-        ncm_6 = ncm_clean[:6] if len(ncm_clean) >= 6 else None
-        
-        # Prioridade 1: Buscar subposição exata (6 dígitos)
-        if ncm_6:
-            for registro in nesh_data:
-                subpos = registro.get('subposition_code', '')
-                if subpos:
-                    subpos_clean = str(subpos).strip().replace('.', '').replace('-', '').replace(' ', '')
-                    if subpos_clean == ncm_6:
-                        out = dict(registro) if isinstance(registro, dict) else {}
-                        out["_nesh_source"] = "JSON"
-                        return out
-        
-        # Prioridade 2: Buscar posição (4 dígitos)
-        for registro in nesh_data:
-            pos = registro.get('position_code', '')
-            if pos:
-                pos_clean = str(pos).strip().replace('.', '').replace('-', '').replace(' ', '')
-                if pos_clean == ncm_4:
-                    # Preferir registros sem subposição (nota geral da posição)
-                    if not registro.get('subposition_code'):
-                        out = dict(registro) if isinstance(registro, dict) else {}
-                        out["_nesh_source"] = "JSON"
-                        return out
-        
-        # Prioridade 3: Buscar qualquer registro com a posição (incluindo subposições)
-        for registro in nesh_data:
-            pos = registro.get('position_code', '')
-            if pos:
-                pos_clean = str(pos).strip().replace('.', '').replace('-', '').replace(' ', '')
-                if pos_clean == ncm_4:
-                    out = dict(registro) if isinstance(registro, dict) else {}
-                    out["_nesh_source"] = "JSON"
-                    return out
+        # ✅ NOVO (16/10/2026): lookup O(1) nos dicts por subposição/posição (sem varrer a lista)
+        registro = _obter_nesh_index().buscar_por_ncm(ncm_clean)
+        if registro is not None:
+            out = dict(registro)
+            out["_nesh_source"] = "JSON"
+            return out
         
         return None
     except Exception as e:
@@ -6863,31 +7053,42 @@ def buscar_notas_explicativas_nesh_por_descricao(termo: str, limite: int = 5) ->
         if _nesh_sqlite_ready():
             if log_source:
                 logging.info(f"📚 NESH fonte=SQLITE modo=descricao termo='{termo_log}'")
-            conn = get_db_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            # ✅ NOVO (16/10/2026): candidatos pelo índice invertido (token contém a palavra,
+            # mesmo critério do LIKE '%palavra%'), lidos pelo rowid; LIKE só para palavras compostas
+            indice = _obter_nesh_index()
+            ids = indice.candidatos(palavras_chave, substring=True) if indice.fonte == "SQLITE" else None
+            if ids is not None:
+                candidatos = []
+                for registro in indice.registros(ids[:200]):
+                    registro = dict(registro)
+                    registro["_nesh_source"] = "SQLITE"
+                    candidatos.append(registro)
+            else:
+                conn = get_db_connection()
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
 
-            # montar WHERE por tokens (OR)
-            like_terms = []
-            params = []
-            for p in palavras_chave:
-                pat = f"%{p}%"
-                like_terms.append("(lower(text) LIKE ? OR lower(position_title) LIKE ? OR lower(subposition_title) LIKE ?)")
-                params.extend([pat, pat, pat])
+                # montar WHERE por tokens (OR)
+                like_terms = []
+                params = []
+                for p in palavras_chave:
+                    pat = f"%{p}%"
+                    like_terms.append("(lower(text) LIKE ? OR lower(position_title) LIKE ? OR lower(subposition_title) LIKE ?)")
+                    params.extend([pat, pat, pat])
 
-            where = " OR ".join(like_terms) if like_terms else "1=0"
-            cursor.execute(
-                f"""
-                SELECT * FROM nesh_chunks
-                WHERE {where}
-                LIMIT 200
-                """,
-                params,
-            )
-            rows = cursor.fetchall()
-            conn.close()
+                where = " OR ".join(like_terms) if like_terms else "1=0"
+                cursor.execute(
+                    f"""
+                    SELECT * FROM nesh_chunks
+                    WHERE {where}
+                    LIMIT 200
+                    """,
+                    params,
+                )
+                rows = cursor.fetchall()
+                conn.close()
 
-            candidatos = [_nesh_row_to_dict(r) for r in rows]
+                candidatos = [_nesh_row_to_dict(r) for r in rows]
             resultados = []
 
             # scoring simples (mantém funcionalidade: retorna notas relevantes)
@@ -6920,7 +7121,11 @@ def buscar_notas_explicativas_nesh_por_descricao(termo: str, limite: int = 5) ->
         # Fallback: JSON
         if log_source:
             logging.info(f"📚 NESH fonte=JSON modo=descricao termo='{termo_log}'")
-        nesh_data = _carregar_nesh_cache()
+        # ✅ NOVO (16/10/2026): pontuar só os registros do índice invertido que contêm alguma
+        # palavra-chave (palavra inteira, como os regex abaixo); varredura completa só se não der
+        indice = _obter_nesh_index()
+        ids = indice.candidatos(palavras_chave, incluir_capitulo=True)
+        nesh_data = indice.registros(indice.ids if ids is None else ids)
         resultados = []
         
         # Buscar registros que contenham as palavras-chave no texto
@@ -7602,6 +7807,9 @@ def obter_pendencias_ativas(categoria: Optional[str] = None, modal: Optional[str
     """
     Busca pendências ativas (ICMS, AFRMM, LPCO, bloqueios).
     
+    ✅ OTIMIZADO (16/10/2026): tipo/descrição da pendência são projetados do JSON na gravação
+    (`services/processos_kanban_projecao.py`); aqui é só SQL indexado sobre `pendencia_tipo`.
+    
     Args:
         categoria: Filtro opcional por categoria
         modal: Filtro opcional por modal
@@ -7614,60 +7822,18 @@ def obter_pendencias_ativas(categoria: Optional[str] = None, modal: Optional[str
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Buscar processos com pendências na tabela processos_kanban
-        # ✅ CORREÇÃO CRÍTICA: Envolver todas as condições OR em parênteses para aplicar filtro de categoria corretamente
-        query_base = '''
-            SELECT 
-                processo_referencia,
-                modal,
-                pendencia_icms,
-                pendencia_frete,
-                tem_pendencias,
-                dados_completos_json,
-                situacao_di,
-                situacao_entrega,
-                numero_di,
-                numero_duimp,
-                atualizado_em
+        query = '''
+            SELECT processo_referencia, modal, pendencia_tipo, pendencia_descricao, atualizado_em
             FROM processos_kanban
-            WHERE (
-                pendencia_frete = 1
-                OR (
-                    pendencia_icms IS NOT NULL 
-                    AND pendencia_icms != '' 
-                    AND UPPER(pendencia_icms) NOT LIKE '%OK%' 
-                    AND UPPER(pendencia_icms) NOT LIKE '%PAGO%'
-                    -- ✅ AJUSTE: Excluir valores que não são realmente pendências (valores informativos/históricos)
-                    AND UPPER(pendencia_icms) NOT LIKE '%RESOLVID%'
-                    AND UPPER(pendencia_icms) NOT LIKE '%LIQUIDAD%'
-                    AND UPPER(pendencia_icms) NOT LIKE '%QUITAD%'
-                    AND UPPER(pendencia_icms) NOT LIKE '%FINALIZAD%'
-                    AND (
-                        -- Só buscar ICMS se tem DI/DUIMP desembaraçada
-                        (numero_di IS NOT NULL AND numero_di != '' AND numero_di != '/       -' AND situacao_di LIKE '%DESEMBARAC%')
-                        OR (numero_duimp IS NOT NULL AND numero_duimp != '')
-                        OR (situacao_entrega LIKE '%DESEMBARAC%' OR situacao_entrega LIKE '%ENTREGUE%' OR situacao_entrega LIKE '%ENTREGA AUTORIZADA%')
-                    )
-                )
-                OR dados_completos_json IS NOT NULL  -- ✅ Buscar também processos com JSON (para verificar AFRMM, LPCO, bloqueios)
-            )
+            WHERE pendencia_tipo IS NOT NULL
         '''
-        
         params = []
-        
-        # ✅ CORREÇÃO CRÍTICA: Filtro por categoria aplicado DEPOIS de todas as condições OR
-        # Agora que todas as condições OR estão em parênteses, o filtro de categoria será aplicado a TODAS elas
         if categoria:
-            query_base += ' AND processo_referencia LIKE ?'
+            query += ' AND processo_referencia LIKE ?'
             params.append(f'{categoria.upper()}.%')
-        
-        query = query_base
-        
-        # Filtro por modal
         if modal:
             query += ' AND modal = ?'
             params.append(modal)
-        
         query += ' ORDER BY atualizado_em ASC'
         
         cursor.execute(query, params)
@@ -7676,203 +7842,16 @@ def obter_pendencias_ativas(categoria: Optional[str] = None, modal: Optional[str
         
         pendencias = []
         for row in resultados:
-            # Extrair categoria
-            categoria_proc = row['processo_referencia'].split('.')[0] if '.' in row['processo_referencia'] else None
-            
-            # Tentar extrair pendências do JSON se disponível
-            pendencia_icms = row['pendencia_icms']
-            pendencia_afrmm = False
-            lpco_exigencia = None
-            bloqueios_ce = None
-            
-            # ✅ Buscar situação da tabela primeiro (prioridade)
-            situacao_di = row['situacao_di'] if 'situacao_di' in row.keys() and row['situacao_di'] else ''
-            situacao_entrega = row['situacao_entrega'] if 'situacao_entrega' in row.keys() and row['situacao_entrega'] else ''
-            situacao_duimp = None  # DUIMP não tem campo direto na tabela, buscar do JSON
-            
-            if row['dados_completos_json']:
-                try:
-                    import json
-                    dados_json = json.loads(row['dados_completos_json'])
-                    
-                    # Buscar pendências no JSON do CE
-                    if dados_json.get('ce'):
-                        ce_data = dados_json.get('ce', {})
-                        if isinstance(ce_data, list) and len(ce_data) > 0:
-                            ce_data = ce_data[0]
-                        pendencia_afrmm_raw = ce_data.get('pendencia_afrmm', False)
-                        # ✅ Converter para boolean: True, 1, ou string "true" = True
-                        if pendencia_afrmm_raw is True or pendencia_afrmm_raw == 1 or (isinstance(pendencia_afrmm_raw, str) and pendencia_afrmm_raw.lower() == 'true'):
-                            pendencia_afrmm = True
-                        else:
-                            pendencia_afrmm = False
-                        bloqueios_ce = ce_data.get('bloqueios') or ce_data.get('bloqueios_baixados')
-                    
-                    # Buscar LPCO (pode estar em 'lpco' ou 'lpcoDetails')
-                    lpco_data = None
-                    if dados_json.get('lpco'):
-                        lpco_data = dados_json.get('lpco', {})
-                        if isinstance(lpco_data, list) and len(lpco_data) > 0:
-                            lpco_data = lpco_data[0]
-                    elif dados_json.get('lpcoDetails'):
-                        lpco_data = dados_json.get('lpcoDetails', {})
-                        if isinstance(lpco_data, list) and len(lpco_data) > 0:
-                            lpco_data = lpco_data[0]
-                    
-                    if lpco_data:
-                        # Buscar situação e exigência do LPCO
-                        situacao_lpco = lpco_data.get('situacao') or lpco_data.get('situacao_lpco') or lpco_data.get('status')
-                        numero_lpco = lpco_data.get('LPCO') or lpco_data.get('numero_lpco') or lpco_data.get('numero')
-                        lpco_exigencia = lpco_data.get('exigencia')
-                        
-                        # ✅ NOVO: Se LPCO não está deferido, considerar como pendência bloqueante
-                        if situacao_lpco:
-                            situacao_lpco_lower = str(situacao_lpco).lower()
-                            lpco_deferido = 'deferido' in situacao_lpco_lower
-                            
-                            # Se não está deferido, é pendência bloqueante (mesmo sem exigência)
-                            if not lpco_deferido:
-                                lpco_exigencia = lpco_exigencia or f"LPCO {numero_lpco or 'N/A'} não deferido - Situação: {situacao_lpco}"
-                        elif lpco_exigencia:
-                            # Se tem exigência, manter
-                            pass
-                        else:
-                            # Se não tem situação nem exigência, não considerar como pendência
-                            lpco_exigencia = None
-                    
-                    # ✅ NOVO: Buscar situação da DI/DUIMP para validar ICMS
-                    # Se não encontrou na tabela, buscar do JSON
-                    if not situacao_di and dados_json.get('di'):
-                        di_data = dados_json.get('di', {})
-                        if isinstance(di_data, list) and len(di_data) > 0:
-                            di_data = di_data[0]
-                        situacao_di = di_data.get('situacao', '') or di_data.get('situacao_di', '')
-                    
-                    # Buscar situação da DUIMP do JSON (não tem na tabela)
-                    if dados_json.get('duimp'):
-                        duimp_data = dados_json.get('duimp', {})
-                        if isinstance(duimp_data, list) and len(duimp_data) > 0:
-                            duimp_data = duimp_data[0]
-                        situacao_duimp = duimp_data.get('situacao', '') or duimp_data.get('status', '') or duimp_data.get('situacao_duimp', '')
-                    
-                    # Buscar situação de entrega do JSON se não encontrou na tabela
-                    if not situacao_entrega:
-                        situacao_entrega = dados_json.get('situacao_entrega', '') or dados_json.get('situacaoEntrega', '')
-                except:
-                    pass
-            
-            # ✅ REGRA LEGAL: ICMS só pode ser cobrado APÓS desembaraço
-            # Ato gerador do ICMS é o desembaraço da carga
-            # Só considerar ICMS pendente se:
-            # 1. DI/DUIMP está desembaraçada OU
-            # 2. Situação é "ENTREGA AUTORIZADA SEM PROSSEGUIMENTO DO DESPACHO"
-            icms_pode_ser_cobrado = False
-            # ✅ AJUSTE: Validar se pendencia_icms realmente indica pendência antes de processar
-            pendencia_icms_valida = False
-            if pendencia_icms:
-                pendencia_icms_str_check = str(pendencia_icms).upper().strip()
-                # Excluir valores que claramente não são pendências
-                valores_nao_pendencia_check = ['OK', 'PAGO', 'RESOLVID', 'LIQUIDAD', 'QUITAD', 'FINALIZAD', 'N/A', 'NULL', 'NONE', '']
-                pendencia_icms_valida = pendencia_icms_str_check and not any(valor in pendencia_icms_str_check for valor in valores_nao_pendencia_check)
-            
-            if pendencia_icms_valida:
-                # Combinar situações da tabela e do JSON (já inicializadas acima)
-                situacao_di_final = situacao_di or ''
-                situacao_duimp_final = situacao_duimp or ''
-                situacao_entrega_final = situacao_entrega or ''
-                
-                situacao_di_lower = situacao_di_final.lower()
-                situacao_duimp_lower = situacao_duimp_final.lower()
-                situacao_entrega_lower = situacao_entrega_final.lower()
-                
-                # Verificar se tem número de DI/DUIMP (indica que foi registrada)
-                numero_di = row['numero_di'] if 'numero_di' in row.keys() and row['numero_di'] else ''
-                numero_duimp = row['numero_duimp'] if 'numero_duimp' in row.keys() and row['numero_duimp'] else ''
-                tem_di_ou_duimp = bool(numero_di and numero_di not in ['', '/       -']) or bool(numero_duimp)
-                
-                # ✅ REGRA CRÍTICA: Lógica diferenciada para DI vs DUIMP
-                # Para DI: ICMS pode ser cobrado se está desembaraçada
-                # Para DUIMP: ICMS só pode ser cobrado se situação é uma destas:
-                #   - DESEMBARACADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS
-                #   - ENTREGA_ANTECIPADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS
-                
-                if tem_di_ou_duimp:
-                    # Verificar se é DI ou DUIMP
-                    tem_di = bool(numero_di and numero_di not in ['', '/       -'])
-                    tem_duimp = bool(numero_duimp)
-                    
-                    if tem_di:
-                        # Para DI: verificar se está desembaraçada
-                        # Padrões que indicam desembaraço (ato gerador do ICMS):
-                        # - "desembaraçado", "desembaracado", "desembaraçada", "desembaracada"
-                        # - "entregue", "entregue ao destinatário"
-                        # - "entrega autorizada sem prosseguimento do despacho"
-                        # - "entrega autorizada"
-                        if (
-                            'desembara' in situacao_di_lower or
-                            'desembara' in situacao_entrega_lower or
-                            'entregue' in situacao_entrega_lower or
-                            'entrega autorizada sem prosseguimento do despacho' in situacao_entrega_lower or
-                            'entrega autorizada' in situacao_entrega_lower
-                        ):
-                            icms_pode_ser_cobrado = True
-                    
-                    elif tem_duimp:
-                        # ✅ Para DUIMP: SÓ considerar pendência se situação é uma das específicas
-                        # Situações que indicam pendência de ICMS para DUIMP:
-                        situacao_duimp_upper = situacao_duimp_final.upper()
-                        if (
-                            'DESEMBARACADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS' in situacao_duimp_upper or
-                            'ENTREGA_ANTECIPADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS' in situacao_duimp_upper
-                        ):
-                            icms_pode_ser_cobrado = True
-                        # ✅ Se situação é outra (ex: DESEMBARACADA_CARGA_ENTREGUE), NÃO considerar pendência
-            
-            # Determinar tipo de pendência
-            tipo_pendencia = None
-            descricao_pendencia = None
-            
-            if bloqueios_ce:
-                tipo_pendencia = 'Bloqueio CE'
-                descricao_pendencia = str(bloqueios_ce)
-            elif lpco_exigencia:
-                tipo_pendencia = 'LPCO'
-                descricao_pendencia = str(lpco_exigencia)
-            elif pendencia_icms_valida and icms_pode_ser_cobrado:
-                # ✅ Só considerar ICMS pendente se pode ser cobrado (desembaraçado) E valor é válido
-                # ✅ Validação já foi feita acima (pendencia_icms_valida)
-                tipo_pendencia = 'ICMS'
-                descricao_pendencia = str(pendencia_icms)
-            elif pendencia_afrmm:
-                tipo_pendencia = 'AFRMM'
-                descricao_pendencia = 'Pendente de pagamento'
-            elif row['pendencia_frete']:
-                tipo_pendencia = 'Frete'
-                descricao_pendencia = 'Pendente de pagamento'
-            
-            if tipo_pendencia:
-                # Calcular tempo desde última atualização
-                data_atualizacao = row['atualizado_em']
-                tempo_pendente = None
-                if data_atualizacao:
-                    try:
-                        from datetime import datetime
-                        data_atual = datetime.now()
-                        data_pend = datetime.fromisoformat(data_atualizacao) if isinstance(data_atualizacao, str) else data_atualizacao
-                        dias = (data_atual - data_pend).days
-                        tempo_pendente = f"{dias} dia(s)" if dias > 0 else "hoje"
-                    except:
-                        pass
-                
-                pendencias.append({
-                    'processo_referencia': row['processo_referencia'],
-                    'categoria': categoria_proc,
-                    'modal': row['modal'] or 'N/A',
-                    'tipo_pendencia': tipo_pendencia,
-                    'descricao_pendencia': descricao_pendencia,
-                    'tempo_pendente': tempo_pendente,
-                    'acao_sugerida': _sugerir_acao_pendencia(tipo_pendencia)
-                })
+            processo_ref = row['processo_referencia']
+            pendencias.append({
+                'processo_referencia': processo_ref,
+                'categoria': processo_ref.split('.')[0] if '.' in processo_ref else None,
+                'modal': row['modal'] or 'N/A',
+                'tipo_pendencia': row['pendencia_tipo'],
+                'descricao_pendencia': row['pendencia_descricao'],
+                'tempo_pendente': _tempo_desde(row['atualizado_em']),
+                'acao_sugerida': _sugerir_acao_pendencia(row['pendencia_tipo'])
+            })
         
         return pendencias
     except Exception as e:
@@ -7880,6 +7859,32 @@ def obter_pendencias_ativas(categoria: Optional[str] = None, modal: Optional[str
         return []
 
 
+def _tempo_desde(data: Any, formatos: Optional[List[str]] = None) -> Optional[str]:
+    """'N dia(s)' / 'hoje' desde `data` (ISO ou um dos `formatos`); None se não der para interpretar."""
+    if not data:
+        return None
+    try:
+        from datetime import datetime
+        if not isinstance(data, str):
+            data_ref = data
+        elif formatos:
+            data_ref = None
+            for fmt in formatos:
+                try:
+                    data_ref = datetime.strptime(data, fmt)
+                    break
+                except ValueError:
+                    continue
+            if data_ref is None:
+                return None
+        else:
+            data_ref = datetime.fromisoformat(data)
+        dias = (datetime.now() - data_ref).days
+        return f"{dias} dia(s)" if dias > 0 else "hoje"
+    except Exception:
+        return None
+
+
 def _sugerir_acao_pendencia(tipo_pendencia: str) -> str:
     """Sugere ação baseada no tipo de pendência."""
     acoes = {
@@ -7896,6 +7901,8 @@ def obter_duimps_em_analise(categoria: Optional[str] = None) -> List[Dict[str, A
     """
     Busca DUIMPs em análise (status: EM_ANALISE, AGUARDANDO_RESPOSTA, PENDENTE).
     ✅ NOVO: Também busca processos com DUIMP registrada mas não desembaraçada do JSON do Kanban.
+    ✅ OTIMIZADO (16/10/2026): situação/canal/datas da DUIMP e a regra de exclusão são projetadas
+    na gravação (`duimp_em_analise`); o Kanban é lido por SQL indexado, sem parse de JSON.
     
     Args:
         categoria: Filtro opcional por categoria (ex: 'ALH', 'VDM', 'MV5')
@@ -7904,9 +7911,6 @@ def obter_duimps_em_analise(categoria: Optional[str] = None) -> List[Dict[str, A
         Lista de DUIMPs em análise
     """
     try:
-        import json
-        from datetime import datetime
-        
         duimps = []
         
         # 1. Buscar da tabela duimps (método antigo)
@@ -7936,38 +7940,29 @@ def obter_duimps_em_analise(categoria: Optional[str] = None) -> List[Dict[str, A
         resultados = cursor.fetchall()
         
         for row in resultados:
-            # Calcular tempo em análise
-            tempo_analise = None
-            if row['criado_em']:
-                try:
-                    data_atual = datetime.now()
-                    data_criacao = datetime.fromisoformat(row['criado_em']) if isinstance(row['criado_em'], str) else row['criado_em']
-                    dias = (data_atual - data_criacao).days
-                    tempo_analise = f"{dias} dia(s)" if dias > 0 else "hoje"
-                except:
-                    pass
-            
             duimps.append({
                 'numero_duimp': row['numero_duimp'],
                 'versao': row['versao'],
                 'status': row['status'],
                 'processo_referencia': row['processo_referencia'],
                 'data_criacao': row['criado_em'],
-                'tempo_analise': tempo_analise
+                'tempo_analise': _tempo_desde(row['criado_em'])
             })
         
-        # 2. ✅ NOVO: Buscar processos com DUIMP registrada mas não desembaraçada do JSON do Kanban
+        # 2. Processos do Kanban com DUIMP registrada e ainda em análise (coluna projetada)
         query_kanban = '''
             SELECT 
                 processo_referencia,
                 numero_duimp,
-                dados_completos_json
+                situacao_entrega,
+                duimp_situacao,
+                duimp_versao,
+                duimp_canal,
+                duimp_data_registro,
+                duimp_data_desembaraco,
+                duimp_situacao_entrega_carga
             FROM processos_kanban
-            WHERE 
-                numero_duimp IS NOT NULL 
-                AND numero_duimp != ''
-                AND (numero_di IS NULL OR numero_di = '' OR numero_di = '/       -')
-                AND (situacao_ce IS NULL OR situacao_ce != 'ENTREGUE')
+            WHERE duimp_em_analise = 1
         '''
         params_kanban = []
         if categoria:
@@ -7978,173 +7973,30 @@ def obter_duimps_em_analise(categoria: Optional[str] = None) -> List[Dict[str, A
         resultados_kanban = cursor.fetchall()
         conn.close()
         
-        # Processar cada processo do Kanban
         processos_duimp_ja_adicionados = {d['numero_duimp'] for d in duimps if d.get('numero_duimp')}
         
         for row in resultados_kanban:
             numero_duimp = row['numero_duimp']
-            processo_ref = row['processo_referencia']
-            
             # Pular se já foi adicionado da tabela duimps
             if numero_duimp in processos_duimp_ja_adicionados:
                 continue
             
-            # Buscar situação da DUIMP do JSON do Kanban
-            situacao_duimp = None
-            versao_duimp = None
-            data_registro = None
-            situacao_entrega_carga_duimp = None  # ✅ NOVO: situacaoEntregaCarga para DUIMP
-            canal_duimp = None  # ✅ NOVO: Canal da DUIMP
-            data_desembaraco_duimp = None  # ✅ NOVO: Data de desembaraço da DUIMP
-            
-            try:
-                if row['dados_completos_json']:
-                    dados_json = json.loads(row['dados_completos_json'])
-                    
-                    # ✅ NOVO: Buscar situacaoEntregaCarga no nível raiz do JSON (da API externa)
-                    situacao_entrega_carga_duimp = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
-                    
-                    # ✅ NOVO: Buscar canal no nível raiz do JSON (pode ser para DUIMP também)
-                    canal_duimp = dados_json.get('canal') or dados_json.get('canal_duimp')
-                    
-                    duimps_json = dados_json.get('duimp', [])
-                    
-                    if isinstance(duimps_json, list) and len(duimps_json) > 0:
-                        for duimp_item in duimps_json:
-                            if isinstance(duimp_item, dict) and duimp_item.get('numero') == numero_duimp:
-                                situacao_duimp = (
-                                    duimp_item.get('situacao_duimp') or
-                                    duimp_item.get('situacao_duimp_agr') or
-                                    duimp_item.get('ultima_situacao') or
-                                    ''
-                                )
-                                versao_duimp = duimp_item.get('versao', '1')
-                                data_registro = duimp_item.get('data_registro_mais_recente') or duimp_item.get('data_ultimo_evento')
-                                # ✅ NOVO: Buscar canal dentro do objeto duimp
-                                if not canal_duimp:
-                                    canal_duimp = (
-                                        duimp_item.get('canal') or
-                                        duimp_item.get('canal_duimp') or
-                                        duimp_item.get('canal_consolidado')
-                                    )
-                                # ✅ NOVO: Buscar data de desembaraço da DUIMP
-                                data_desembaraco_duimp = (
-                                    duimp_item.get('data_desembaraco') or
-                                    duimp_item.get('data_hora_desembaraco') or
-                                    duimp_item.get('dataDesembaraco')
-                                )
-                                break
-                    elif isinstance(duimps_json, dict) and duimps_json.get('numero') == numero_duimp:
-                        situacao_duimp = (
-                            duimps_json.get('situacao_duimp') or
-                            duimps_json.get('situacao_duimp_agr') or
-                            duimps_json.get('ultima_situacao') or
-                            ''
-                        )
-                        versao_duimp = duimps_json.get('versao', '1')
-                        data_registro = duimps_json.get('data_registro_mais_recente') or duimps_json.get('data_ultimo_evento')
-                        # ✅ NOVO: Buscar canal dentro do objeto duimp
-                        if not canal_duimp:
-                            canal_duimp = (
-                                duimps_json.get('canal') or
-                                duimps_json.get('canal_duimp') or
-                                duimps_json.get('canal_consolidado')
-                            )
-                        # ✅ NOVO: Buscar data de desembaraço da DUIMP
-                        data_desembaraco_duimp = (
-                            duimps_json.get('data_desembaraco') or
-                            duimps_json.get('data_hora_desembaraco') or
-                            duimps_json.get('dataDesembaraco')
-                        )
-            except Exception as e:
-                logging.debug(f'Erro ao buscar situação DUIMP do JSON para {processo_ref}: {e}')
-            
-            # ✅ NOVO: Verificar também situacao_entrega do processo (campo da tabela)
-            situacao_entrega = None
-            try:
-                conn_entrega = get_db_connection()
-                cursor_entrega = conn_entrega.cursor()
-                cursor_entrega.row_factory = sqlite3.Row
-                cursor_entrega.execute('SELECT situacao_entrega FROM processos_kanban WHERE processo_referencia = ?', (processo_ref,))
-                row_entrega = cursor_entrega.fetchone()
-                conn_entrega.close()
-                
-                if row_entrega and row_entrega['situacao_entrega']:
-                    situacao_entrega = str(row_entrega['situacao_entrega']).upper()
-            except:
-                pass
-            
-            # ✅ CORREÇÃO: Lógica de exclusão para DUIMP (mesma lógica da DI)
-            # Excluir apenas se:
-            # 1. Está desembaraçada E tem entrega autorizada ou condicionada (ICMS)
-            # 2. Ou tem "ENTREGA AUTORIZADA SEM PROSSEGUIMENTO"
-            # 3. Ou tem "ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS"
-            
-            if situacao_duimp:
-                situacao_duimp_upper = str(situacao_duimp).upper()
-                situacao_entrega_upper = str(situacao_entrega).upper() if situacao_entrega else ''
-                situacao_entrega_carga_upper = str(situacao_entrega_carga_duimp).upper() if situacao_entrega_carga_duimp else ''
-                
-                # Verificar se está desembaraçada
-                esta_desembaracada = (
-                    'DESEMBARACADA' in situacao_duimp_upper or 
-                    'DESEMBARACADO' in situacao_duimp_upper
-                )
-                
-                # Verificar se tem entrega autorizada ou condicionada (ICMS) - pode estar em qualquer campo
-                tem_entrega_autorizada = (
-                    'ENTREGA AUTORIZADA' in situacao_entrega_upper or
-                    'ENTREGA AUTORIZADA' in situacao_entrega_carga_upper
-                )
-                tem_entrega_condicionada_icms = (
-                    'ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS' in situacao_entrega_upper or
-                    'ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS' in situacao_entrega_carga_upper
-                )
-                
-                tem_entrega_autorizada_sem_prosseguimento = (
-                    'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in situacao_duimp_upper or
-                    'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in situacao_entrega_upper or
-                    'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in situacao_entrega_carga_upper
-                )
-                
-                # Excluir se:
-                # - Está desembaraçada E (tem entrega autorizada OU tem entrega condicionada ICMS)
-                # - OU tem entrega autorizada sem prosseguimento
-                if (esta_desembaracada and (tem_entrega_autorizada or tem_entrega_condicionada_icms)) or tem_entrega_autorizada_sem_prosseguimento:
-                    continue
-                
-                # Se passou todas as verificações, adicionar à lista
-                # Calcular tempo em análise
-                tempo_analise = None
-                if data_registro:
-                    try:
-                        data_atual = datetime.now()
-                        if isinstance(data_registro, str):
-                            # Tentar vários formatos
-                            for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y']:
-                                try:
-                                    data_reg = datetime.strptime(data_registro, fmt)
-                                    dias = (data_atual - data_reg).days
-                                    tempo_analise = f"{dias} dia(s)" if dias > 0 else "hoje"
-                                    break
-                                except:
-                                    continue
-                    except:
-                        pass
-                
-                duimps.append({
-                    'numero_duimp': numero_duimp,
-                    'versao': versao_duimp or '1',
-                    'status': situacao_duimp,  # Usar situação do JSON
-                    'canal_duimp': canal_duimp,  # ✅ NOVO: Canal da DUIMP
-                    'situacao_entrega_carga': situacao_entrega_carga_duimp,  # ✅ NOVO: Incluir situação da entrega
-                    'situacao_entrega_tabela': situacao_entrega,  # ✅ NOVO: Incluir situação da entrega (tabela)
-                    'data_desembaraco': data_desembaraco_duimp,  # ✅ NOVO: Data de desembaraço
-                    'processo_referencia': processo_ref,
-                    'data_criacao': data_registro,
-                    'tempo_analise': tempo_analise
-                })
-                processos_duimp_ja_adicionados.add(numero_duimp)
+            data_registro = row['duimp_data_registro']
+            duimps.append({
+                'numero_duimp': numero_duimp,
+                'versao': row['duimp_versao'] or '1',
+                'status': row['duimp_situacao'],  # Usar situação do JSON
+                'canal_duimp': row['duimp_canal'],
+                'situacao_entrega_carga': row['duimp_situacao_entrega_carga'],
+                'situacao_entrega_tabela': str(row['situacao_entrega']).upper() if row['situacao_entrega'] else None,
+                'data_desembaraco': row['duimp_data_desembaraco'],
+                'processo_referencia': row['processo_referencia'],
+                'data_criacao': data_registro,
+                'tempo_analise': _tempo_desde(
+                    data_registro, ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y']
+                ) if isinstance(data_registro, str) else None
+            })
+            processos_duimp_ja_adicionados.add(numero_duimp)
         
         return duimps
     except Exception as e:
@@ -8157,6 +8009,8 @@ def obter_dis_em_analise(categoria: Optional[str] = None) -> List[Dict[str, Any]
     Busca DIs em análise (registradas mas não desembaraçadas).
     ✅ Busca processos com DI registrada do JSON do Kanban.
     Exclui DIs desembaraçadas ou com "ENTREGA AUTORIZADA SEM PROSSEGUIMENTO DO DESPACHO".
+    ✅ OTIMIZADO (16/10/2026): situação/canal/datas da DI e a regra de exclusão são projetadas
+    na gravação (`di_em_analise`); aqui é só SQL indexado, sem parse de JSON.
     
     Args:
         categoria: Filtro opcional por categoria (ex: 'ALH', 'VDM', 'MV5')
@@ -8165,12 +8019,6 @@ def obter_dis_em_analise(categoria: Optional[str] = None) -> List[Dict[str, Any]
         Lista de DIs em análise
     """
     try:
-        import json
-        from datetime import datetime
-        
-        dis = []
-        
-        # Buscar processos com DI registrada do Kanban
         conn = get_db_connection()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
@@ -8179,15 +8027,14 @@ def obter_dis_em_analise(categoria: Optional[str] = None) -> List[Dict[str, Any]
             SELECT 
                 processo_referencia,
                 numero_di,
-                situacao_di,
                 situacao_entrega,
-                dados_completos_json
+                di_situacao,
+                di_canal,
+                di_data_registro,
+                di_data_desembaraco,
+                di_situacao_entrega_carga
             FROM processos_kanban
-            WHERE 
-                numero_di IS NOT NULL 
-                AND numero_di != ''
-                AND numero_di != '/       -'
-                AND (situacao_ce IS NULL OR situacao_ce != 'ENTREGUE')
+            WHERE di_em_analise = 1
         '''
         params = []
         if categoria:
@@ -8198,238 +8045,24 @@ def obter_dis_em_analise(categoria: Optional[str] = None) -> List[Dict[str, Any]
         resultados = cursor.fetchall()
         conn.close()
         
-        # Processar cada processo
+        dis = []
         for row in resultados:
-            numero_di = row['numero_di']
-            processo_ref = row['processo_referencia']
-            
-            # Buscar situação da DI (prioridade: JSON > campo da tabela)
-            # ✅ CORREÇÃO: Buscar do campo da tabela, mas se estiver vazio, buscar do JSON
-            situacao_di = row['situacao_di'] if row['situacao_di'] and row['situacao_di'].strip() else None
-            situacao_entrega_carga = None  # ✅ NOVO: situacaoEntregaCarga do JSON
-            situacao_entrega_tabela_temp = row['situacao_entrega'] if 'situacao_entrega' in row.keys() and row['situacao_entrega'] else None  # ✅ NOVO: Buscar do campo da tabela também
-            canal_di = None  # ✅ NOVO: Canal da DI
-            data_registro = None
-            data_desembaraco = None
-            
-            try:
-                if row['dados_completos_json']:
-                    dados_json = json.loads(row['dados_completos_json'])
-                    
-                    # ✅ NOVO: Buscar situacaoEntregaCarga no nível raiz do JSON (da API externa)
-                    situacao_entrega_carga = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
-                    
-                    # ✅ NOVO: Buscar canal no nível raiz do JSON (para processos rodoviários como ARG)
-                    canal_di = dados_json.get('canal') or dados_json.get('canal_di')
-                    
-                    # ✅ NOVO: Buscar situacaoDI no nível raiz (pode estar aqui para processos rodoviários)
-                    if not situacao_di:
-                        situacao_di = dados_json.get('situacaoDI') or dados_json.get('situacao_di')
-
-                    # ✅ NOVO (16/01/2026): Buscar data de registro da DI no nível raiz (quando disponível)
-                    if not data_registro:
-                        data_registro = (
-                            dados_json.get('dataHoraRegistro')
-                            or dados_json.get('dataHoraRegistroDi')
-                            or dados_json.get('dataRegistro')
-                            or dados_json.get('data_registro')
-                        )
-                    
-                    # ✅ NOVO: Buscar dataDesembaraco no nível raiz (para processos rodoviários)
-                    if not data_desembaraco:
-                        data_desembaraco = dados_json.get('dataDesembaraco') or dados_json.get('data_desembaraco') or dados_json.get('dataDesembaraco')
-                    
-                    # ✅ CORREÇÃO: Para processos rodoviários (ARG), sempre buscar dados no nível raiz
-                    # mesmo que numeroDi não corresponda exatamente (pode ter formato diferente)
-                    numero_di_json = dados_json.get('numeroDi') or dados_json.get('numero_di')
-                    
-                    # Se numeroDi corresponde, usar dados do nível raiz
-                    if numero_di_json and str(numero_di_json) == str(numero_di):
-                        # Se corresponde, usar dados do nível raiz (processos rodoviários)
-                        if not situacao_di:
-                            situacao_di = dados_json.get('situacaoDI') or dados_json.get('situacao_di')
-                        if not canal_di:
-                            canal_di = dados_json.get('canal') or dados_json.get('canal_di')
-                        if not data_desembaraco:
-                            data_desembaraco = dados_json.get('dataDesembaraco') or dados_json.get('data_desembaraco')
-                        if not situacao_entrega_carga:
-                            situacao_entrega_carga = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
-                    # ✅ NOVO: Se tem dados no nível raiz mas numeroDi não corresponde, usar mesmo assim
-                    # (para processos rodoviários onde o formato pode ser diferente)
-                    elif dados_json.get('situacaoDI') or dados_json.get('canal') or dados_json.get('situacaoEntregaCarga'):
-                        # Tem dados no nível raiz, usar mesmo que numeroDi não corresponda
-                        if not situacao_di:
-                            situacao_di = dados_json.get('situacaoDI') or dados_json.get('situacao_di')
-                        if not canal_di:
-                            canal_di = dados_json.get('canal') or dados_json.get('canal_di')
-                        if not data_desembaraco:
-                            data_desembaraco = dados_json.get('dataDesembaraco') or dados_json.get('data_desembaraco')
-                        if not situacao_entrega_carga:
-                            situacao_entrega_carga = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
-                    
-                    # A DI pode estar em dados_json['di'] (lista ou dict)
-                    dis_json = dados_json.get('di', [])
-                    
-                    if isinstance(dis_json, list) and len(dis_json) > 0:
-                        for di_item in dis_json:
-                            if isinstance(di_item, dict):
-                                numero_di_json = di_item.get('numero_di') or di_item.get('numero', '')
-                                if numero_di_json == numero_di or not situacao_di:
-                                    situacao_di = (
-                                        di_item.get('situacao_di') or
-                                        di_item.get('situacao') or
-                                        situacao_di or
-                                        ''
-                                    )
-                                    # ✅ NOVO: Buscar também situacao_entrega_carga dentro do objeto di
-                                    if not situacao_entrega_carga:
-                                        situacao_entrega_carga = di_item.get('situacao_entrega_carga') or di_item.get('situacaoEntregaCarga')
-                                    # ✅ NOVO: Buscar canal dentro do objeto di
-                                    if not canal_di:
-                                        canal_di = (
-                                            di_item.get('canal') or
-                                            di_item.get('canal_selecao_parametrizada') or
-                                            di_item.get('canal_di')
-                                        )
-                                    # ✅ NOVO: Buscar data de desembaraço dentro do objeto di
-                                    if not data_desembaraco:
-                                        data_desembaraco = (
-                                            di_item.get('data_hora_desembaraco') or
-                                            di_item.get('data_desembaraco') or
-                                            di_item.get('dataDesembaraco')
-                                        )
-                                    # ✅ NOVO (16/01/2026): Cobrir variações de chave para data/hora de registro
-                                    data_registro = (
-                                        di_item.get('data_hora_registro')
-                                        or di_item.get('data_registro')
-                                        or di_item.get('dataHoraRegistro')
-                                        or di_item.get('dataRegistro')
-                                        or data_registro
-                                    )
-                                    break
-                    elif isinstance(dis_json, dict):
-                        numero_di_json = dis_json.get('numero_di') or dis_json.get('numero', '')
-                        if numero_di_json == numero_di or not situacao_di:
-                            situacao_di = (
-                                dis_json.get('situacao_di') or
-                                dis_json.get('situacao') or
-                                situacao_di or
-                                ''
-                            )
-                            # ✅ NOVO: Buscar também situacao_entrega_carga dentro do objeto di
-                            if not situacao_entrega_carga:
-                                situacao_entrega_carga = dis_json.get('situacao_entrega_carga') or dis_json.get('situacaoEntregaCarga')
-                            # ✅ NOVO: Buscar canal dentro do objeto di
-                            if not canal_di:
-                                canal_di = (
-                                    dis_json.get('canal') or
-                                    dis_json.get('canal_selecao_parametrizada') or
-                                    dis_json.get('canal_di')
-                                )
-                            # ✅ NOVO: Buscar data de desembaraço dentro do objeto di
-                            if not data_desembaraco:
-                                data_desembaraco = (
-                                    dis_json.get('data_hora_desembaraco') or
-                                    dis_json.get('data_desembaraco') or
-                                    dis_json.get('dataDesembaraco')
-                                )
-                            # ✅ NOVO (16/01/2026): Cobrir variações de chave para data/hora de registro
-                            data_registro = (
-                                dis_json.get('data_hora_registro')
-                                or dis_json.get('data_registro')
-                                or dis_json.get('dataHoraRegistro')
-                                or dis_json.get('dataRegistro')
-                                or data_registro
-                            )
-            except Exception as e:
-                logging.debug(f'Erro ao buscar situação DI do JSON para {processo_ref}: {e}')
-            
-            # ✅ NOVO: Usar situacao_entrega já buscada do campo da tabela (ou buscar se não tiver)
-            situacao_entrega_tabela = None
-            if situacao_entrega_tabela_temp:
-                situacao_entrega_tabela = str(situacao_entrega_tabela_temp).upper()
-            else:
-                # Se não tinha no row, buscar separadamente
-                try:
-                    conn_check = get_db_connection()
-                    cursor_check = conn_check.cursor()
-                    cursor_check.row_factory = sqlite3.Row
-                    cursor_check.execute('SELECT situacao_entrega FROM processos_kanban WHERE processo_referencia = ?', (processo_ref,))
-                    row_entrega = cursor_check.fetchone()
-                    conn_check.close()
-                    
-                    if row_entrega and row_entrega['situacao_entrega']:
-                        situacao_entrega_tabela = str(row_entrega['situacao_entrega']).upper()
-                except:
-                    pass
-            
-            # ✅ CORREÇÃO: Lógica de exclusão atualizada conforme regras de negócio
-            # Excluir apenas se:
-            # 1. Está desembaraçada E tem entrega autorizada ou condicionada (ICMS)
-            # 2. Ou tem "ENTREGA AUTORIZADA SEM PROSSEGUIMENTO"
-            # 3. Ou tem "ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS"
-            
-            situacao_di_upper = str(situacao_di).upper() if situacao_di else ''
-            situacao_entrega_carga_upper = str(situacao_entrega_carga).upper() if situacao_entrega_carga else ''
-            
-            # Verificar se está desembaraçada (apenas pela situação, não pela data)
-            esta_desembaracada = (
-                'DESEMBARACADA' in situacao_di_upper or 
-                'DESEMBARACADO' in situacao_di_upper
-            )
-            
-            # Verificar se tem entrega autorizada ou condicionada (ICMS)
-            tem_entrega_autorizada = (
-                'ENTREGA AUTORIZADA' in situacao_entrega_carga_upper or
-                'ENTREGA AUTORIZADA' in situacao_entrega_tabela if situacao_entrega_tabela else False
-            )
-            
-            tem_entrega_condicionada_icms = (
-                'ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS' in situacao_entrega_carga_upper or
-                'ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS' in (situacao_entrega_tabela if situacao_entrega_tabela else '')
-            )
-            
-            tem_entrega_autorizada_sem_prosseguimento = (
-                'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in situacao_di_upper or
-                'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in situacao_entrega_carga_upper or
-                'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in (situacao_entrega_tabela if situacao_entrega_tabela else '')
-            )
-            
-            # Excluir se:
-            # - Está desembaraçada E (tem entrega autorizada OU tem entrega condicionada ICMS)
-            # - OU tem entrega autorizada sem prosseguimento
-            if (esta_desembaracada and (tem_entrega_autorizada or tem_entrega_condicionada_icms)) or tem_entrega_autorizada_sem_prosseguimento:
-                continue
-            
-            # ✅ Todas as outras situações devem aparecer em análise (INTERROMPIDA, ENTREGA NAO AUTORIZADA, etc.)
-            
-            # Calcular tempo em análise
+            data_registro = row['di_data_registro']
             tempo_analise = None
-            if data_registro:
-                try:
-                    data_atual = datetime.now()
-                    if isinstance(data_registro, str):
-                        # Tentar vários formatos
-                        for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S']:
-                            try:
-                                data_reg = datetime.strptime(data_registro.split('.')[0].replace('Z', ''), fmt)
-                                dias = (data_atual - data_reg).days
-                                tempo_analise = f"{dias} dia(s)" if dias > 0 else "hoje"
-                                break
-                            except:
-                                continue
-                except:
-                    pass
-            
+            if isinstance(data_registro, str):
+                tempo_analise = _tempo_desde(
+                    data_registro.split('.')[0].replace('Z', ''),
+                    ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S'],
+                )
             dis.append({
-                'numero_di': numero_di,
-                'situacao_di': situacao_di,
-                'canal_di': canal_di,  # ✅ NOVO: Canal da DI
-                'situacao_entrega_carga': situacao_entrega_carga,  # ✅ NOVO: Incluir situação da entrega
-                'situacao_entrega_tabela': situacao_entrega_tabela,  # ✅ NOVO: Incluir situação da entrega (tabela)
+                'numero_di': row['numero_di'],
+                'situacao_di': row['di_situacao'],
+                'canal_di': row['di_canal'],
+                'situacao_entrega_carga': row['di_situacao_entrega_carga'],
+                'situacao_entrega_tabela': str(row['situacao_entrega']).upper() if row['situacao_entrega'] else None,
                 'data_registro': data_registro,
-                'data_desembaraco': data_desembaraco,  # ✅ NOVO: Data de desembaraço
-                'processo_referencia': processo_ref,
+                'data_desembaraco': row['di_data_desembaraco'],
+                'processo_referencia': row['processo_referencia'],
                 'tempo_analise': tempo_analise
             })
         
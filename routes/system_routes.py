@@ -88,3 +88,23 @@ def trigger_sync_kanban():
             erro_msg = "Servidor retornou resposta inválida. Verifique se o servidor Kanban está funcionando corretamente."
         return jsonify({"sucesso": False, "erro": erro_msg}), 500
 
+
+
+@system_bp.route("/api/system/db-pool", methods=["GET"])
+def get_db_pool_stats():
+    """
+    Retorna estatísticas do pool de conexões do banco local (SQLite/Postgres).
+    """
+    from services.database_service import get_pool_stats
+
+    return jsonify({"sucesso": True, "pool": get_pool_stats()})
+
+
+@system_bp.route("/api/system/llm-cache", methods=["GET"])
+def get_llm_cache_stats():
+    """
+    Retorna contadores de hit/miss e ocupação do cache persistente de respostas do LLM.
+    """
+    from services.llm_cache import obter_llm_cache
+
+    return jsonify({"sucesso": True, "cache": obter_llm_cache().stats()})
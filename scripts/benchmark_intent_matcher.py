@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark do roteamento pré-LLM (`services/intent_matcher.py`).
+
+Compara, sobre um corpus de mensagens reais:
+- "legado": os padrões inline anteriores (`_PADROES_LEGADO`), um `re.search(padrao_str, mensagem.lower())`
+  por padrão, como os serviços faziam (pior caso: nenhum casa antes do fim da lista);
+- "matcher": `IntentMatcher.analisar` (normalização + varredura única + regras filtradas por gatilho),
+  sem a memoização por mensagem (pior caso: mensagem nunca vista).
+
+Corpus:
+- `--db chat_ia.db`: últimas N mensagens de `conversas_chat.mensagem_usuario`;
+- `--arquivo msgs.txt`: uma mensagem por linha;
+- sem argumentos: amostra embutida (mensagens dos testes golden).
+
+Uso:
+  python3 scripts/benchmark_intent_matcher.py --db /app/data/chat_ia.db --limite 2000 --repeticoes 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+AMOSTRA = [
+    "o que temos pra hoje?",
+    "como está o ALH.0001/26?",
+    "status do processo vdm.0003/25",
+    "manda esse relatório para fulano@empresa.com.br",
+    "vc consegue mandar um email simpatico para helenomaffra@gmail.com avisando que nao vou na reuniao. assine gustavo",
+    "extrato do banco do brasil de ontem",
+    "extrato do CE 132505284587462",
+    "qual a ncm de parafuso de aço inox?",
+    "criar duimp do processo MV5.0013/26",
+    "situação da DUIMP 26BR0000194844-1",
+    "tem CCT MIA-4675 vinculado ao processo?",
+    "maike menu",
+    "quero fazer a conciliação bancária",
+    "limpar contexto",
+    "quais processos de GYM estão chegando essa semana?",
+    "pendências do BND",
+    "me mostra as alíquotas do tecwin para 8471.30.12",
+    "sincronizar banco santander",
+    "quanto foi o frete do DMD.0035/25?",
+    "obrigado!",
+]
+
+
+# Padrões inline de `IntentDetectionService` e `MessageIntentService` antes do matcher
+# (copiados literalmente; cada um era um `re.search` sobre `mensagem.lower()`).
+_PADROES_LEGADO = [
+    r'envia.*relat[oó]rio.*email',
+    r'mande.*relat[oó]rio.*email',
+    r'envie.*relat[oó]rio.*email',
+    r'manda.*relat[oó]rio.*email',
+    r'envia.*esse.*relat[oó]rio',
+    r'mande.*esse.*relat[oó]rio',
+    r'envie.*esse.*relat[oó]rio',
+    r'manda.*esse.*relat[oó]rio',
+    r'envia.*relat[oó]rio.*para',
+    r'mande.*relat[oó]rio.*para',
+    r'envie.*relat[oó]rio.*para',
+    r'manda.*relat[oó]rio.*para',
+    r'extrato.*banco',
+    r'extrato.*bb',
+    r'extrato.*santander',
+    r'extrato.*banc[aá]rio',
+    r'movimenta[çc][oõ]es.*banco',
+    r'transa[çc][oõ]es.*banco',
+    r'saldo.*banco',
+    r'extrato.*conta',
+    r'extrato.*ag[êe]ncia',
+    r'extrato.*ce',
+    r'extrato.*cct',
+    r'extrato.*di',
+    r'extrato.*duimp',
+    r'extrato.*processo',
+    r'envia.*email.*sobre',
+    r'mande.*email.*sobre',
+    r'envie.*email.*sobre',
+    r'envia.*email.*com',
+    r'mande.*email.*com',
+    r'envie.*email.*com',
+    r'envia.*email.*explicando',
+    r'mande.*email.*explicando',
+    r'envie.*email.*explicando',
+    r'criar.*duimp',
+    r'registrar.*duimp',
+    r'gerar.*duimp',
+    r'fazer.*duimp',
+    r'montar.*duimp',
+    r'criar.*duimp.*processo',
+    r'registrar.*duimp.*processo',
+    r'ncm.*para',
+    r'ncm.*de',
+    r'qual.*ncm',
+    r'classifica[çc][aã]o.*fiscal',
+    r'al[íi]quotas',
+    r'tecwin',
+    r'status.*processo',
+    r'situa[çc][aã]o.*processo',
+    r'como.*est[áa].*processo',
+    r'processo.*[A-Z]{2,4}',
+    r'^limpar\s+contexto',
+    r'^resetar\s+contexto',
+    r'^limpar\s+hist[óo]rico',
+    r'^resetar\s+hist[óo]rico',
+    r'^come[çc]ar\s+do\s+zero',
+    r'^come[çc]ar\s+novo',
+    r'^nova\s+conversa',
+    r'^esquecer\s+tudo',
+    r'^limpar\s+tudo',
+    r'^reset',
+    r'^clear',
+    r'^maike\s+menu\s*$',
+    r'^maike\s+menu\b',
+    r'\bmaike\s+menu\b',
+    r'(?:^|\s)maike\s+(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:o\s+)?menu\b',
+    r'(?:^|\s)menu\s*$',
+    r'(?:^|\s)maike\s+op[çc][õo]es\b',
+    r'(?:^|\s)maike\s+(?:mostrar|mostre)\s+op[çc][õo]es\b',
+    r'(?:m?aike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:concilia[çc][ãa]o|conciliar)',
+    r'(?:m?aike|maike\s+)?(?:quero|preciso|vou|vamos)\s+conciliar\s+banco',
+    r'(?:m?aike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:concilia[çc][ãa]o|concilia[çc][ãa]o\s+banc[áa]ria)',
+    r'(?:m?aike|maike\s+)?(?:quero|preciso)\s+classificar\s+lan[çc]amentos',
+    r'(?:m?aike|maike\s+)?concilia[çc][ãa]o',
+    r'(?:m?aike|maike\s+)?classificar\s+banco',
+    r'(?:maike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:sincroniza[çc][ãa]o|sincronizar)',
+    r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:sincroniza[çc][ãa]o|sincroniza[çc][ãa]o\s+banc[áa]ria)',
+    r'(?:maike|maike\s+)?(?:quero|preciso)\s+sincronizar\s+(?:extrato|extratos|banco)',
+    r'(?:maike|maike\s+)?sincronizar\s+banco',
+    r'(?:maike|maike\s+)?sincroniza[çc][ãa]o',
+    r'(?:maike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:importa[çc][ãa]o|importar)\s+(?:de\s+)?legisla[çc][ãa]o',
+    r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:importa[çc][ãa]o|importar)\s+legisla[çc][ãa]o',
+    r'(?:maike|maike\s+)?importar\s+legisla[çc][ãa]o',
+    r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:as\s+)?(?:configura[çc][õo]es|config)',
+    r'(?:maike|maike\s+)?configura[çc][õo]es',
+    r'(?:maike|maike\s+)?config',
+]
+
+
+def _carregar_corpus(args: argparse.Namespace) -> List[str]:
+    if args.arquivo:
+        return [l.strip() for l in Path(args.arquivo).read_text(encoding="utf-8").splitlines() if l.strip()]
+    if args.db:
+        conn = sqlite3.connect(args.db)
+        try:
+            rows = conn.execute(
+                "SELECT mensagem_usuario FROM conversas_chat WHERE mensagem_usuario IS NOT NULL "
+                "ORDER BY id DESC LIMIT ?",
+                (args.limite,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [r[0] for r in rows if r[0]]
+    return list(AMOSTRA)
+
+
+def _medir(fn: Callable[[str], object], corpus: List[str], repeticoes: int) -> List[float]:
+    """Tempo por mensagem (µs), uma amostra por (repetição, mensagem)."""
+    amostras = []
+    for _ in range(repeticoes):
+        for msg in corpus:
+            inicio = time.perf_counter()
+            fn(msg)
+            amostras.append((time.perf_counter() - inicio) * 1e6)
+    return amostras
+
+
+def _resumo(nome: str, amostras: List[float]) -> str:
+    amostras = sorted(amostras)
+    p95 = amostras[min(len(amostras) - 1, int(len(amostras) * 0.95))]
+    return f"{nome:<10} p50={statistics.median(amostras):8.1f}µs  p95={p95:8.1f}µs  média={statistics.fmean(amostras):8.1f}µs"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite com conversas_chat (corpus real)")
+    parser.add_argument("--arquivo", help="arquivo texto, uma mensagem por linha")
+    parser.add_argument("--limite", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    # Importar os serviços registra as regras no matcher compartilhado
+    import services.intent_detection_service  # noqa: F401
+    import services.message_intent_service  # noqa: F401
+    from services.intent_matcher import IntentMatcher, normalizar_mensagem, obter_intent_matcher
+
+    corpus = _carregar_corpus(args)
+    if not corpus:
+        print("Corpus vazio.")
+        return 1
+
+    regras = obter_intent_matcher().regras
+
+    def legado(msg: str) -> None:
+        texto = msg.lower().strip()
+        for padrao in _PADROES_LEGADO:
+            re.search(padrao, texto)
+
+    matcher = IntentMatcher(regras, obter_intent_matcher().gatilhos)
+
+    def motor(msg: str) -> None:
+        normalizar_mensagem.cache_clear()  # pior caso: mensagem nova
+        matcher.analisar(msg)
+
+    # Aquecimento (compila caches do `re` para o legado também)
+    for msg in corpus[:50]:
+        legado(msg)
+        motor(msg)
+
+    print(
+        f"Corpus: {len(corpus)} mensagens × {args.repeticoes} repetições; "
+        f"{len(_PADROES_LEGADO)} padrões legados vs {len(regras)} regras"
+    )
+    print(_resumo("legado", _medir(legado, corpus, args.repeticoes)))
+    print(_resumo("matcher", _medir(motor, corpus, args.repeticoes)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,6 +6,7 @@ Build do índice HF/FAISS para NESH a partir do SQLite (`nesh_chunks`).
 Saída:
 - <index_dir>/index.faiss
 - <index_dir>/meta.jsonl  (um registro por linha, alinhado ao índice)
+- <index_dir>/meta.offsets  (offset de cada linha do meta.jsonl; leitura sob demanda em runtime)
 
 Uso (no container):
   docker compose exec web python3 scripts/build_nesh_hf_index.py
@@ -21,9 +22,12 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
+import sys
 from pathlib import Path
 from typing import Any, Dict, List
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 
 def _row_to_doc(row: sqlite3.Row) -> Dict[str, Any]:
     return {
@@ -151,6 +155,11 @@ def main() -> int:
     faiss.write_index(index, str(out_index))
     print(f"✅ índice FAISS salvo em: {out_index}")
     print(f"✅ meta salvo em: {out_meta}")
+
+    from services.nesh_hf_service import gerar_offsets_meta
+
+    gerar_offsets_meta(out_meta, index_dir / "meta.offsets")
+    print(f"✅ offsets salvos em: {index_dir / 'meta.offsets'}")
     print(f"✅ total indexado: {written} (esperado: {total})")
     return 0
 
@@ -22,6 +22,7 @@ import json
 import logging
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -32,6 +33,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from db_manager import get_db_connection, init_db  # noqa: E402
+from services.nesh_index import invalidar_nesh_index  # noqa: E402
 from services.path_config import get_nesh_chunks_path  # noqa: E402
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -97,6 +99,8 @@ def main() -> int:
 
     inserted = 0
     total = len(data)
+    # Mesma marca para o import inteiro: muda a versão de `nesh_chunks` vista pelos processos em execução
+    importado_em = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
 
     for idx, row in enumerate(data, 1):
         if not isinstance(row, dict):
@@ -116,8 +120,8 @@ def main() -> int:
               section, chapter, chapter_code, chapter_title,
               position_code, position_code_clean, position_title,
               subposition_code, subposition_code_clean, subposition_title,
-              text
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+              text, atualizado_em
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(record_key) DO UPDATE SET
               section=excluded.section,
               chapter=excluded.chapter,
@@ -129,7 +133,8 @@ def main() -> int:
               subposition_code=excluded.subposition_code,
               subposition_code_clean=excluded.subposition_code_clean,
               subposition_title=excluded.subposition_title,
-              text=excluded.text
+              text=excluded.text,
+              atualizado_em=excluded.atualizado_em
             """,
             (
                 rk,
@@ -144,6 +149,7 @@ def main() -> int:
                 sub_clean,
                 row.get("subposition_title"),
                 row.get("text"),
+                importado_em,
             ),
         )
 
@@ -156,6 +162,9 @@ def main() -> int:
     conn.commit()
     conn.close()
 
+    # Índice deste processo; os demais (app/workers) detectam a nova versão de `nesh_chunks` sozinhos
+    invalidar_nesh_index()
+
     logger.info(f"✅ Import concluído: {inserted}/{total} registros upserted em nesh_chunks")
     return 0
 
@@ -1108,6 +1108,7 @@ class LegislacaoAgent(BaseAgent):
         # Limite padrão de 50 permite ver diretos + alguns contextuais
         limit = arguments.get('limit', 50)
         incluir_revogados = arguments.get('incluir_revogados', False)
+        proximidade = arguments.get('proximidade')
         
         if not termos or not isinstance(termos, list) or len(termos) == 0:
             return {
@@ -1121,7 +1122,8 @@ class LegislacaoAgent(BaseAgent):
             todos_trechos = self.legislacao_service.buscar_em_todas_legislacoes(
                 termos=termos,
                 limit=limit,
-                incluir_revogados=incluir_revogados
+                incluir_revogados=incluir_revogados,
+                proximidade=proximidade
             )
             
             if not todos_trechos:
@@ -8364,31 +8364,24 @@ class ProcessoAgent(BaseAgent):
         Retorna dashboard consolidado do dia atual.
         """
         try:
-            from db_manager import (
-                obter_processos_chegando_hoje,
-                obter_processos_prontos_registro,
-                obter_pendencias_ativas,
-                obter_duimps_em_analise,
-                obter_dis_em_analise,  # ✅ NOVO: DIs em análise
-                obter_processos_eta_alterado,
-                obter_alertas_recentes,
-                listar_processos_em_dta  # ✅ NOVO: Processos em DTA
-            )
+            from services.dashboard_snapshot_service import obter_dashboard_snapshot
             
             # Extrair filtros
             categoria = arguments.get('categoria')
             modal = arguments.get('modal')
             apenas_pendencias = arguments.get('apenas_pendencias', False)
             
-            # Buscar dados
-            processos_chegando = obter_processos_chegando_hoje(categoria, modal)
-            processos_prontos = obter_processos_prontos_registro(categoria, modal) if not apenas_pendencias else []
-            processos_em_dta = listar_processos_em_dta(categoria) if not apenas_pendencias else []  # ✅ NOVO: Processos em DTA
-            pendencias = obter_pendencias_ativas(categoria, modal)
-            duimps_analise = obter_duimps_em_analise(categoria) if not apenas_pendencias else []  # ✅ CORREÇÃO: Passar categoria
-            dis_analise = obter_dis_em_analise(categoria) if not apenas_pendencias else []  # ✅ CORREÇÃO: Passar categoria
-            eta_alterado = obter_processos_eta_alterado(categoria) if not apenas_pendencias else []
-            alertas = obter_alertas_recentes(limite=10, categoria=categoria) if not apenas_pendencias else []  # ✅ CORREÇÃO: Passar categoria
+            # ✅ NOVO (16/10/2026): dashboard materializado por (categoria, modal), atualizado pelo sync do Kanban
+            snapshot = obter_dashboard_snapshot(categoria, modal)
+            secoes = snapshot['secoes']
+            processos_chegando = secoes.get('processos_chegando') or []
+            pendencias = secoes.get('pendencias') or []
+            processos_prontos = secoes.get('processos_prontos') or [] if not apenas_pendencias else []
+            processos_em_dta = secoes.get('processos_em_dta') or [] if not apenas_pendencias else []  # ✅ NOVO: Processos em DTA
+            duimps_analise = secoes.get('duimps_analise') or [] if not apenas_pendencias else []
+            dis_analise = secoes.get('dis_analise') or [] if not apenas_pendencias else []
+            eta_alterado = secoes.get('eta_alterado') or [] if not apenas_pendencias else []
+            alertas = secoes.get('alertas') or [] if not apenas_pendencias else []
             
             # ✅ PASSO 6 - FASE 4: Criar JSON estruturado primeiro (fonte da verdade)
             from datetime import datetime
@@ -8398,6 +8391,8 @@ class ProcessoAgent(BaseAgent):
                 'categoria': categoria,
                 'modal': modal,
                 'apenas_pendencias': apenas_pendencias,
+                'atualizado_em': snapshot.get('gerado_em'),
+                'idade_segundos': snapshot.get('idade_segundos'),
                 'secoes': {
                     'processos_chegando': processos_chegando,
                     'processos_prontos': processos_prontos,
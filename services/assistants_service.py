@@ -57,7 +57,8 @@ class AssistantsService:
             return
         
         try:
-            self.client = OpenAI(api_key=AI_API_KEY)
+            from services.openai_client_registry import obter_cliente_openai
+            self.client = obter_cliente_openai(api_key=AI_API_KEY, timeout=600.0, perfil="assistants", sdk_max_retries=2)
             # ✅ Usar ASSISTANT_ID_LEGISLACAO (com fallback para OPENAI_ASSISTANT_ID para compatibilidade)
             self.assistant_id = os.getenv('ASSISTANT_ID_LEGISLACAO') or os.getenv('OPENAI_ASSISTANT_ID', None)
             self.vector_store_id = os.getenv('VECTOR_STORE_ID_LEGISLACAO', None)
@@ -1368,6 +1368,12 @@ class BancoConcilacaoService:
                     f"   - distribuicao_impostos len={len(distribuicao_impostos) if isinstance(distribuicao_impostos, dict) else 0} (deve ser > 0)"
                 )
             
+            # ✅ NOVO (16/10/2026): despesas/impostos dos processos mudaram -> snapshot em cache fica velho
+            from services.processo_snapshot_service import invalidar_snapshots
+            invalidar_snapshots(
+                [c.get('processo_referencia') for c in classificacoes if isinstance(c, dict)] + [processo_referencia]
+            )
+            
             if sucesso_total:
                 logger.info(f"✅ Lançamento {id_movimentacao} classificado com {len(classificacoes)} classificação(ões)")
                 return {
@@ -1564,6 +1570,10 @@ class BancoConcilacaoService:
             
             resultado = self.sql_adapter.execute_query(query_delete, database=self.sql_adapter.database)
             
+            if processo_ref:
+                from services.processo_snapshot_service import invalidar_snapshots
+                invalidar_snapshots([processo_ref])
+            
             if resultado.get('success'):
                 logger.info(f"✅ Classificação {id_lancamento_tipo_despesa} removida (lançamento {id_movimentacao}, processo {processo_ref})")
                 return {
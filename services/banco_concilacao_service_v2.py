@@ -697,6 +697,10 @@ class BancoConcilacaoServiceV2:
                     erros.append(f"Impostos: {str(e_imp)}")
                     logger.error(f"❌ Erro ao gravar impostos/importação no V2: {e_imp}", exc_info=True)
             
+            # ✅ NOVO (16/10/2026): despesas/impostos dos processos mudaram -> snapshot em cache fica velho
+            from services.processo_snapshot_service import invalidar_snapshots
+            invalidar_snapshots(processos_lista)
+            
             if sucesso_total:
                 logger.info(f"✅ Lançamento {id_movimentacao} classificado com sucesso")
                 return {
@@ -12,12 +12,46 @@ Baseado em: docs/INTEGRACAO_EXTRATOS_BANCARIOS.md
 import hashlib
 import json
 import logging
+import os
 import re
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Importação em lote: hashes resolvidos com 1 consulta por bloco e INSERT em uma única transação
+BANCO_IMPORTACAO_EM_LOTE = os.getenv('BANCO_IMPORTACAO_EM_LOTE', 'true').lower() == 'true'
+# Hashes por consulta `IN (...)` (cada hash tem 64 chars; mantém a query bem abaixo dos limites do SQL Server)
+BANCO_IMPORTACAO_HASHES_POR_CONSULTA = int(os.getenv('BANCO_IMPORTACAO_HASHES_POR_CONSULTA', '500'))
+
+_HASH_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Datas (DB) em que o critério Santander valor + descrição procura lançamentos gravados com data errada
+_DATAS_CORRECAO_SANTANDER = ('2026-01-07', '2026-01-08')
+
+_COLUNAS_INSERT_MOVIMENTACAO = (
+    'banco_origem', 'agencia_origem', 'conta_origem',
+    'data_movimentacao', 'data_lancamento',
+    'tipo_movimentacao', 'sinal_movimentacao',
+    'valor_movimentacao', 'moeda',
+    'cpf_cnpj_contrapartida', 'nome_contrapartida', 'tipo_pessoa_contrapartida',
+    'banco_contrapartida', 'agencia_contrapartida',
+    'conta_contrapartida', 'dv_conta_contrapartida',
+    'descricao_movimentacao', 'historico_codigo',
+    'informacoes_complementares',
+    'processo_referencia',
+    'fonte_dados', 'hash_dados', 'json_dados_originais',
+)
+
+_SQL_INSERT_MOVIMENTACAO = (
+    f"INSERT INTO dbo.MOVIMENTACAO_BANCARIA ({', '.join(_COLUNAS_INSERT_MOVIMENTACAO)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUNAS_INSERT_MOVIMENTACAO)})"
+)
+
+_SQL_UPDATE_DATA_MOVIMENTACAO = (
+    "UPDATE dbo.MOVIMENTACAO_BANCARIA SET data_movimentacao = ?, data_lancamento = ? WHERE id_movimentacao = ?"
+)
+
 
 class BancoSincronizacaoService:
     """
@@ -581,6 +615,187 @@ class BancoSincronizacaoService:
     # IMPORTAÇÃO DE LANÇAMENTOS
     # =========================================================================
     
+    def _extrair_data_lancamento(self, lancamento: Dict[str, Any], banco: str) -> Optional[datetime]:
+        """Extrai a data do lançamento (meia-noite), usada na verificação de duplicata."""
+        data_lanc = None
+        if banco == 'SANTANDER':
+            transaction_date_raw = lancamento.get('transactionDate', '')
+            data_lanc = self._converter_data_santander(transaction_date_raw)
+            if data_lanc:
+                data_lanc = data_lanc.replace(hour=0, minute=0, second=0, microsecond=0)
+        else:  # BB
+            data_lancamento_bb = lancamento.get('dataLancamento', '')
+            if data_lancamento_bb:
+                try:
+                    data_lanc = self._converter_data_bb(data_lancamento_bb)
+                    if data_lanc:
+                        data_lanc = data_lanc.replace(hour=0, minute=0, second=0, microsecond=0)
+                except:
+                    pass
+        return data_lanc
+    
+    def _consultar_nome_contrapartida(self, cpf_cnpj: str, nomes_cache: Optional[Dict[str, Optional[str]]] = None) -> Optional[str]:
+        """Busca o nome da contrapartida pelo CPF/CNPJ (com cache opcional por lote)."""
+        if nomes_cache is not None and cpf_cnpj in nomes_cache:
+            return nomes_cache[cpf_cnpj]
+        nome = None
+        if self.cpf_cnpj_service:
+            try:
+                res_cnpj = self.cpf_cnpj_service.consultar(cpf_cnpj)
+                if res_cnpj and res_cnpj.get('nome'):
+                    nome = res_cnpj.get('nome')
+                    logger.info(f"✅ Nome do cliente identificado via CNPJ: {nome}")
+            except Exception as e_cnpj:
+                logger.warning(f"⚠️ Erro ao consultar nome via CNPJ: {e_cnpj}")
+        if nomes_cache is not None:
+            nomes_cache[cpf_cnpj] = nome
+        return nome
+    
+    def _extrair_campos_lancamento(
+        self,
+        lancamento: Dict[str, Any],
+        agencia: Optional[str],
+        conta: Optional[str],
+        banco: str,
+        data_lanc: Optional[datetime],
+        nomes_cache: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extrai os campos de MOVIMENTACAO_BANCARIA do lançamento (formato específico por banco).
+        
+        Usado tanto pela importação unitária quanto pela importação em lote.
+        `nomes_cache` evita consultar o mesmo CPF/CNPJ várias vezes no mesmo lote.
+        """
+        transaction_date_raw = None
+        if banco == 'SANTANDER':
+            # Formato Santander
+            transaction_date_raw = lancamento.get('transactionDate', '')
+            
+            # ✅ LOG DETALHADO: Capturar formato exato da API (igual ao extrato)
+            # Log apenas para datas que contêm "08" para diagnosticar o problema
+            if '08' in str(transaction_date_raw) or '2026-01-08' in str(transaction_date_raw):
+                logger.info(f"🔍 [DEBUG DATA] transactionDate raw da API: '{transaction_date_raw}' (tipo: {type(transaction_date_raw)}, repr: {repr(transaction_date_raw)})")
+            
+            # ✅ Data já foi convertida acima, apenas validar
+            if data_lanc is None:
+                logger.error(f"❌ Não foi possível converter data do Santander: {transaction_date_raw}")
+            else:
+                # ✅ DEBUG: Log da data convertida para verificar se está correta
+                # Log apenas para datas do dia 08/01/2026 para não poluir logs
+                if data_lanc.year == 2026 and data_lanc.month == 1 and data_lanc.day == 8:
+                    logger.info(f"✅ [DIA 08 OK] Data convertida corretamente: {data_lanc.strftime('%Y-%m-%d')} (original da API: '{transaction_date_raw}')")
+                elif data_lanc.year == 2026 and data_lanc.month == 1 and data_lanc.day == 7:
+                    # ⚠️ ALERTA: Verificar se a data original tinha 08
+                    if '08' in str(transaction_date_raw) or '2026-01-08' in str(transaction_date_raw):
+                        logger.error(f"❌ [ERRO DATA] Data original tinha 08 mas foi convertida para 07! Original: '{transaction_date_raw}', Convertida: {data_lanc.strftime('%Y-%m-%d')}")
+                    else:
+                        logger.debug(f"📅 Data convertida para 07/01/2026 (original: '{transaction_date_raw}')")
+            valor = float(lancamento.get('amount', 0.0) or 0.0)
+            credit_debit = str(lancamento.get('creditDebitType', '')).strip()
+            sinal = 'C' if credit_debit == 'CREDITO' else 'D'
+            
+            # ✅ Combinar transactionName com historicComplement (igual ao formato do chat)
+            transaction_name = str(lancamento.get('transactionName', '')).strip()
+            historic_complement = str(lancamento.get('historicComplement', '')).strip()
+            
+            # Se houver complemento, combinar: "PIX ENVIADO - RIO BRASIL TERMINAL"
+            if historic_complement:
+                descricao = f"{transaction_name} - {historic_complement}".strip()
+            else:
+                descricao = transaction_name
+            
+            tipo = str(lancamento.get('transactionType', '')).strip()
+            historico_codigo = str(lancamento.get('transactionId', '')).strip()
+            info_complementar = historic_complement  # Manter também em info_complementar para referência
+            
+            # Contrapartida (Santander pode ter campos diferentes)
+            cpf_cnpj_contra = None
+            nome_contra = None
+            if 'counterpartDocument' in lancamento:
+                cpf_cnpj_contra = str(lancamento.get('counterpartDocument', '')).strip()
+            elif 'document' in lancamento:
+                cpf_cnpj_contra = str(lancamento.get('document', '')).strip()
+            
+            if 'counterpartName' in lancamento:
+                nome_contra = str(lancamento.get('counterpartName', '')).strip()
+            elif 'name' in lancamento:
+                nome_contra = str(lancamento.get('name', '')).strip()
+
+            if not cpf_cnpj_contra or cpf_cnpj_contra == '0':
+                cpf_cnpj_contra = None
+            
+            # ✅ NOVO (24/01/2026): Tentar buscar nome pelo CNPJ se não veio da API
+            if cpf_cnpj_contra and not nome_contra:
+                nome_contra = self._consultar_nome_contrapartida(cpf_cnpj_contra, nomes_cache)
+
+            tipo_pessoa_contra = None
+            banco_contra = None
+            if 'counterpartBank' in lancamento:
+                banco_contra = str(lancamento.get('counterpartBank', {}).get('code', '')).strip()
+            agencia_contra = None
+            conta_contra = None
+            dv_conta_contra = None
+            
+            # Para Santander, agência e conta podem vir do statement_id ou ser None
+            if not agencia:
+                agencia = str(lancamento.get('branchCode', '')).strip() or None
+            if not conta:
+                conta = str(lancamento.get('number', '')).strip() or None
+            
+            fonte_dados = 'SANTANDER_API'
+        else:
+            # Formato Banco do Brasil
+            data_lanc = self._converter_data_bb(lancamento.get('dataLancamento', 0))
+            valor = float(lancamento.get('valorLancamento', 0.0))
+            sinal = str(lancamento.get('indicadorSinalLancamento', 'C')).strip()
+            if sinal not in ('C', 'D'):
+                sinal = 'C'  # Default para crédito
+            
+            descricao = str(lancamento.get('textoDescricaoHistorico', '')).strip()
+            tipo = str(lancamento.get('tipoLancamento', '')).strip()
+            historico_codigo = str(lancamento.get('codigoHistoricoBanco', '')).strip()
+            info_complementar = str(lancamento.get('textoInformacaoComplementar', '')).strip()
+            
+            # Contrapartida
+            cpf_cnpj_contra = str(lancamento.get('numeroCpfCnpjContrapartida', '')).strip()
+            if cpf_cnpj_contra == '0':
+                cpf_cnpj_contra = None
+            
+            nome_contra = None
+            # ✅ NOVO (24/01/2026): Tentar buscar nome pelo CNPJ (BB não traz nome no extrato)
+            if cpf_cnpj_contra:
+                nome_contra = self._consultar_nome_contrapartida(cpf_cnpj_contra, nomes_cache)
+
+            tipo_pessoa_contra = str(lancamento.get('indicadorTipoPessoaContrapartida', '')).strip()
+            banco_contra = str(lancamento.get('codigoBancoContrapartida', '')).strip()
+            agencia_contra = str(lancamento.get('codigoAgenciaContrapartida', '')).strip()
+            conta_contra = str(lancamento.get('numeroContaContrapartida', '')).strip()
+            dv_conta_contra = str(lancamento.get('textoDvContaContrapartida', '')).strip()
+            
+            fonte_dados = 'BB_API'
+        
+        return {
+            'data_lanc': data_lanc,
+            'agencia': agencia,
+            'conta': conta,
+            'valor': valor,
+            'sinal': sinal,
+            'descricao': descricao,
+            'tipo': tipo,
+            'historico_codigo': historico_codigo,
+            'info_complementar': info_complementar,
+            'cpf_cnpj_contra': cpf_cnpj_contra,
+            'nome_contra': nome_contra,
+            'tipo_pessoa_contra': tipo_pessoa_contra,
+            'banco_contra': banco_contra,
+            'agencia_contra': agencia_contra,
+            'conta_contra': conta_contra,
+            'dv_conta_contra': dv_conta_contra,
+            'fonte_dados': fonte_dados,
+            'transaction_date_raw': transaction_date_raw,
+        }
+    
+
     def importar_lancamento(
         self,
         lancamento: Dict[str, Any],
@@ -617,21 +832,7 @@ class BancoSincronizacaoService:
             hash_lanc = self.gerar_hash_lancamento(lancamento, agencia, conta, banco)
             
             # 2. Extrair e converter data ANTES de verificar duplicata (para poder atualizar data se necessário)
-            data_lanc = None
-            if banco == 'SANTANDER':
-                transaction_date_raw = lancamento.get('transactionDate', '')
-                data_lanc = self._converter_data_santander(transaction_date_raw)
-                if data_lanc:
-                    data_lanc = data_lanc.replace(hour=0, minute=0, second=0, microsecond=0)
-            else:  # BB
-                data_lancamento_bb = lancamento.get('dataLancamento', '')
-                if data_lancamento_bb:
-                    try:
-                        data_lanc = self._converter_data_bb(data_lancamento_bb)
-                        if data_lanc:
-                            data_lanc = data_lanc.replace(hour=0, minute=0, second=0, microsecond=0)
-                    except:
-                        pass
+            data_lanc = self._extrair_data_lancamento(lancamento, banco)
             
             # 3. Verificar se já existe (duplicata) e se a data precisa ser atualizada
             duplicata_info = {'existe': False, 'data_diferente': False}
@@ -672,124 +873,25 @@ class BancoSincronizacaoService:
                 }
             
             # 4. Extrair dados do lançamento (formato específico por banco)
-            if banco == 'SANTANDER':
-                # Formato Santander
-                transaction_date_raw = lancamento.get('transactionDate', '')
-                
-                # ✅ LOG DETALHADO: Capturar formato exato da API (igual ao extrato)
-                # Log apenas para datas que contêm "08" para diagnosticar o problema
-                if '08' in str(transaction_date_raw) or '2026-01-08' in str(transaction_date_raw):
-                    logger.info(f"🔍 [DEBUG DATA] transactionDate raw da API: '{transaction_date_raw}' (tipo: {type(transaction_date_raw)}, repr: {repr(transaction_date_raw)})")
-                
-                # ✅ Data já foi convertida acima, apenas validar
-                if data_lanc is None:
-                    logger.error(f"❌ Não foi possível converter data do Santander: {transaction_date_raw}")
-                else:
-                    # ✅ DEBUG: Log da data convertida para verificar se está correta
-                    # Log apenas para datas do dia 08/01/2026 para não poluir logs
-                    if data_lanc.year == 2026 and data_lanc.month == 1 and data_lanc.day == 8:
-                        logger.info(f"✅ [DIA 08 OK] Data convertida corretamente: {data_lanc.strftime('%Y-%m-%d')} (original da API: '{transaction_date_raw}')")
-                    elif data_lanc.year == 2026 and data_lanc.month == 1 and data_lanc.day == 7:
-                        # ⚠️ ALERTA: Verificar se a data original tinha 08
-                        if '08' in str(transaction_date_raw) or '2026-01-08' in str(transaction_date_raw):
-                            logger.error(f"❌ [ERRO DATA] Data original tinha 08 mas foi convertida para 07! Original: '{transaction_date_raw}', Convertida: {data_lanc.strftime('%Y-%m-%d')}")
-                        else:
-                            logger.debug(f"📅 Data convertida para 07/01/2026 (original: '{transaction_date_raw}')")
-                valor = float(lancamento.get('amount', 0.0) or 0.0)
-                credit_debit = str(lancamento.get('creditDebitType', '')).strip()
-                sinal = 'C' if credit_debit == 'CREDITO' else 'D'
-                
-                # ✅ Combinar transactionName com historicComplement (igual ao formato do chat)
-                transaction_name = str(lancamento.get('transactionName', '')).strip()
-                historic_complement = str(lancamento.get('historicComplement', '')).strip()
-                
-                # Se houver complemento, combinar: "PIX ENVIADO - RIO BRASIL TERMINAL"
-                if historic_complement:
-                    descricao = f"{transaction_name} - {historic_complement}".strip()
-                else:
-                    descricao = transaction_name
-                
-                tipo = str(lancamento.get('transactionType', '')).strip()
-                historico_codigo = str(lancamento.get('transactionId', '')).strip()
-                info_complementar = historic_complement  # Manter também em info_complementar para referência
-                
-                # Contrapartida (Santander pode ter campos diferentes)
-                cpf_cnpj_contra = None
-                nome_contra = None
-                if 'counterpartDocument' in lancamento:
-                    cpf_cnpj_contra = str(lancamento.get('counterpartDocument', '')).strip()
-                elif 'document' in lancamento:
-                    cpf_cnpj_contra = str(lancamento.get('document', '')).strip()
-                
-                if 'counterpartName' in lancamento:
-                    nome_contra = str(lancamento.get('counterpartName', '')).strip()
-                elif 'name' in lancamento:
-                    nome_contra = str(lancamento.get('name', '')).strip()
-
-                if not cpf_cnpj_contra or cpf_cnpj_contra == '0':
-                    cpf_cnpj_contra = None
-                
-                # ✅ NOVO (24/01/2026): Tentar buscar nome pelo CNPJ se não veio da API
-                if cpf_cnpj_contra and not nome_contra and self.cpf_cnpj_service:
-                    try:
-                        res_cnpj = self.cpf_cnpj_service.consultar(cpf_cnpj_contra)
-                        if res_cnpj and res_cnpj.get('nome'):
-                            nome_contra = res_cnpj.get('nome')
-                            logger.info(f"✅ Nome do cliente identificado via CNPJ: {nome_contra}")
-                    except Exception as e_cnpj:
-                        logger.warning(f"⚠️ Erro ao consultar nome via CNPJ: {e_cnpj}")
-
-                tipo_pessoa_contra = None
-                banco_contra = None
-                if 'counterpartBank' in lancamento:
-                    banco_contra = str(lancamento.get('counterpartBank', {}).get('code', '')).strip()
-                agencia_contra = None
-                conta_contra = None
-                dv_conta_contra = None
-                
-                # Para Santander, agência e conta podem vir do statement_id ou ser None
-                if not agencia:
-                    agencia = str(lancamento.get('branchCode', '')).strip() or None
-                if not conta:
-                    conta = str(lancamento.get('number', '')).strip() or None
-                
-                fonte_dados = 'SANTANDER_API'
-            else:
-                # Formato Banco do Brasil
-                data_lanc = self._converter_data_bb(lancamento.get('dataLancamento', 0))
-                valor = float(lancamento.get('valorLancamento', 0.0))
-                sinal = str(lancamento.get('indicadorSinalLancamento', 'C')).strip()
-                if sinal not in ('C', 'D'):
-                    sinal = 'C'  # Default para crédito
-                
-                descricao = str(lancamento.get('textoDescricaoHistorico', '')).strip()
-                tipo = str(lancamento.get('tipoLancamento', '')).strip()
-                historico_codigo = str(lancamento.get('codigoHistoricoBanco', '')).strip()
-                info_complementar = str(lancamento.get('textoInformacaoComplementar', '')).strip()
-                
-                # Contrapartida
-                cpf_cnpj_contra = str(lancamento.get('numeroCpfCnpjContrapartida', '')).strip()
-                if cpf_cnpj_contra == '0':
-                    cpf_cnpj_contra = None
-                
-                nome_contra = None
-                # ✅ NOVO (24/01/2026): Tentar buscar nome pelo CNPJ (BB não traz nome no extrato)
-                if cpf_cnpj_contra and self.cpf_cnpj_service:
-                    try:
-                        res_cnpj = self.cpf_cnpj_service.consultar(cpf_cnpj_contra)
-                        if res_cnpj and res_cnpj.get('nome'):
-                            nome_contra = res_cnpj.get('nome')
-                            logger.info(f"✅ Nome do cliente identificado via CNPJ (BB): {nome_contra}")
-                    except Exception as e_cnpj:
-                        logger.warning(f"⚠️ Erro ao consultar nome via CNPJ: {e_cnpj}")
-
-                tipo_pessoa_contra = str(lancamento.get('indicadorTipoPessoaContrapartida', '')).strip()
-                banco_contra = str(lancamento.get('codigoBancoContrapartida', '')).strip()
-                agencia_contra = str(lancamento.get('codigoAgenciaContrapartida', '')).strip()
-                conta_contra = str(lancamento.get('numeroContaContrapartida', '')).strip()
-                dv_conta_contra = str(lancamento.get('textoDvContaContrapartida', '')).strip()
-                
-                fonte_dados = 'BB_API'
+            campos = self._extrair_campos_lancamento(lancamento, agencia, conta, banco, data_lanc)
+            data_lanc = campos['data_lanc']
+            agencia = campos['agencia']
+            conta = campos['conta']
+            valor = campos['valor']
+            sinal = campos['sinal']
+            descricao = campos['descricao']
+            tipo = campos['tipo']
+            historico_codigo = campos['historico_codigo']
+            info_complementar = campos['info_complementar']
+            cpf_cnpj_contra = campos['cpf_cnpj_contra']
+            nome_contra = campos['nome_contra']
+            tipo_pessoa_contra = campos['tipo_pessoa_contra']
+            banco_contra = campos['banco_contra']
+            agencia_contra = campos['agencia_contra']
+            conta_contra = campos['conta_contra']
+            dv_conta_contra = campos['dv_conta_contra']
+            fonte_dados = campos['fonte_dados']
+            transaction_date_raw = campos['transaction_date_raw']
             
             # Detectar processo automaticamente
             processo_ref = self.detectar_processo_por_descricao(descricao)
@@ -834,7 +936,7 @@ class BancoSincronizacaoService:
             
             # ✅ DEBUG: Log da data sendo salva (apenas para Santander, para debug)
             if banco == 'SANTANDER':
-                logger.debug(f"📅 Data convertida para SQL: {data_str} (original: {transaction_date_raw if 'transaction_date_raw' in locals() else 'N/A'})")
+                logger.debug(f"📅 Data convertida para SQL: {data_str} (original: {transaction_date_raw or 'N/A'})")
             
             data_sql = f"'{data_str}'"
             
@@ -935,6 +1037,330 @@ class BancoSincronizacaoService:
                 'erro': str(e)
             }
     
+    # =========================================================================
+    # IMPORTAÇÃO EM LOTE
+    # =========================================================================
+    
+    @staticmethod
+    def _valor_linha(row: Any, chave: str, indice: int) -> Any:
+        """Lê coluna de uma linha do adapter (dict no pyodbc/Node; tupla em adapters antigos)."""
+        if isinstance(row, dict):
+            return row.get(chave)
+        return row[indice] if len(row) > indice else None
+    
+    def _buscar_hashes_existentes(self, hashes: List[str]) -> Dict[str, Any]:
+        """
+        Resolve quais hashes já existem em MOVIMENTACAO_BANCARIA (uma consulta `IN (...)` por bloco).
+        
+        Returns:
+            Dict com success, data ({hash: {'id_movimentacao', 'data'}}) ou error
+        """
+        existentes: Dict[str, Dict[str, Any]] = {}
+        # Hashes são SHA-256 hex gerados aqui; validar antes de interpolar na query
+        unicos = sorted({h for h in hashes if h and _HASH_SHA256_RE.match(h)})
+        bloco = max(1, BANCO_IMPORTACAO_HASHES_POR_CONSULTA)
+        for inicio in range(0, len(unicos), bloco):
+            lista_sql = ', '.join(f"'{h}'" for h in unicos[inicio:inicio + bloco])
+            query = f"""
+                SELECT 
+                    hash_dados,
+                    id_movimentacao,
+                    CAST(data_movimentacao AS DATE) as data_movimentacao_date
+                FROM dbo.MOVIMENTACAO_BANCARIA 
+                WHERE hash_dados IN ({lista_sql})
+            """
+            resultado = self.sql_adapter.execute_query(query, database=self.sql_adapter.database)
+            if not resultado.get('success'):
+                return {'success': False, 'error': resultado.get('error', 'Erro desconhecido')}
+            for row in resultado.get('data') or []:
+                hash_db = self._valor_linha(row, 'hash_dados', 0)
+                id_mov = self._valor_linha(row, 'id_movimentacao', 1)
+                if not hash_db or not id_mov or hash_db in existentes:
+                    continue
+                existentes[hash_db] = {
+                    'id_movimentacao': id_mov,
+                    'data': str(self._valor_linha(row, 'data_movimentacao_date', 2) or '')[:10],
+                }
+        return {'success': True, 'data': existentes}
+    
+    def _buscar_candidatos_valor_descricao(self, agencia: Optional[str], conta: Optional[str]) -> Dict[str, Any]:
+        """
+        Carrega (uma vez por lote) os lançamentos Santander que o critério valor + descrição pode casar.
+        
+        Mesmo filtro de `_verificar_duplicata_por_valor_descricao`, sem valor/descrição: a comparação
+        é feita em memória por `_casar_valor_descricao`.
+        """
+        agencia_escaped = (agencia or "").replace("'", "''")
+        conta_escaped = (conta or "").replace("'", "''")
+        query = f"""
+            SELECT
+                id_movimentacao,
+                CAST(data_movimentacao AS DATE) as data_movimentacao_date,
+                valor_movimentacao,
+                sinal_movimentacao,
+                CAST(descricao_movimentacao AS VARCHAR(MAX)) as descricao_movimentacao
+            FROM dbo.MOVIMENTACAO_BANCARIA 
+            WHERE banco_origem = 'SANTANDER'
+              AND agencia_origem = '{agencia_escaped}'
+              AND conta_origem = '{conta_escaped}'
+              AND CAST(data_movimentacao AS DATE) IN ({', '.join(f"'{d}'" for d in _DATAS_CORRECAO_SANTANDER)})
+        """
+        resultado = self.sql_adapter.execute_query(query, database=self.sql_adapter.database)
+        if not resultado.get('success'):
+            return {'success': False, 'error': resultado.get('error', 'Erro desconhecido')}
+        candidatos = []
+        for row in resultado.get('data') or []:
+            try:
+                valor = float(self._valor_linha(row, 'valor_movimentacao', 2) or 0.0)
+            except (TypeError, ValueError):
+                continue
+            candidatos.append({
+                'id_movimentacao': self._valor_linha(row, 'id_movimentacao', 0),
+                'data': str(self._valor_linha(row, 'data_movimentacao_date', 1) or '')[:10],
+                'valor': valor,
+                'sinal': str(self._valor_linha(row, 'sinal_movimentacao', 3) or '').strip(),
+                'descricao': str(self._valor_linha(row, 'descricao_movimentacao', 4) or ''),
+            })
+        # Mesma precedência do `ORDER BY id_movimentacao DESC` da verificação unitária
+        candidatos.sort(key=lambda c: c['id_movimentacao'] or 0, reverse=True)
+        return {'success': True, 'data': candidatos}
+    
+    @staticmethod
+    def _candidato_pendente(lancamento: Dict[str, Any], data_lanc_str: str) -> Dict[str, Any]:
+        """Lançamento Santander do próprio lote (ainda não gravado) no formato de `_buscar_candidatos_valor_descricao`."""
+        transaction_name = str(lancamento.get('transactionName', '')).strip()
+        historic_complement = str(lancamento.get('historicComplement', '')).strip()
+        return {
+            'id_movimentacao': None,
+            'data': data_lanc_str,
+            'valor': float(lancamento.get('amount', 0.0) or 0.0),
+            'sinal': 'C' if str(lancamento.get('creditDebitType', '')).strip() == 'CREDITO' else 'D',
+            'descricao': f"{transaction_name} - {historic_complement}".strip() if historic_complement else transaction_name,
+        }
+    
+    @staticmethod
+    def _casar_valor_descricao(lancamento: Dict[str, Any], candidatos: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Equivalente em memória do critério valor + sinal + descrição (LIKE case-insensitive)."""
+        valor = float(lancamento.get('amount', 0.0) or 0.0)
+        transaction_name = str(lancamento.get('transactionName', '')).strip()
+        historic_complement = str(lancamento.get('historicComplement', '')).strip()
+        descricao_completa = f"{transaction_name} - {historic_complement}".strip() if historic_complement else transaction_name
+        sinal = 'C' if str(lancamento.get('creditDebitType', '')).strip() == 'CREDITO' else 'D'
+        nome_lower = transaction_name.lower()
+        completa_lower = descricao_completa.lower()
+        for candidato in candidatos:
+            if abs(candidato['valor'] - valor) >= 0.01 or candidato['sinal'] != sinal:
+                continue
+            descricao_lower = candidato['descricao'].lower()
+            if nome_lower in descricao_lower or descricao_lower == completa_lower:
+                return candidato
+        return None
+    
+    def _importar_lancamentos_em_lote(
+        self,
+        lancamentos: List[Dict[str, Any]],
+        agencia: Optional[str],
+        conta: Optional[str],
+        banco: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Importa lançamentos com operações em conjunto no SQL Server.
+        
+        1. Gera todos os hashes em memória
+        2. Resolve hashes existentes com uma consulta `IN (...)` por bloco
+        3. (Santander) aplica o critério valor + descrição em memória, com 1 consulta de candidatos
+        4. Corrige datas divergentes com um único `execute_many`
+        5. Insere os novos com um único `execute_many` (pyodbc: fast_executemany numa transação)
+        
+        Returns:
+            Dict com novos/duplicados/erros/processos_detectados/sql_server_indisponivel/erro_sql_server/
+            processados, ou None se o lote não pôde ser avaliado (o chamador usa o caminho unitário).
+        """
+        novos = 0
+        duplicados = 0
+        ja_inseridos = 0
+        erros = 0
+        processos_detectados: List[str] = []
+        
+        def _indisponivel(error_msg: str, pendentes: int) -> Optional[Dict[str, Any]]:
+            if not self._is_sql_server_connection_error(error_msg):
+                return None
+            self._log_sql_server_down_once(error_msg)
+            return {
+                'novos': novos,
+                'duplicados': duplicados,
+                'erros': erros + 1,
+                'processos_detectados': processos_detectados,
+                'sql_server_indisponivel': True,
+                'erro_sql_server': error_msg,
+                'processados': len(lancamentos) - pendentes,
+            }
+        
+        # 1. Hash + data de todos os lançamentos
+        preparados = []
+        for i, lanc in enumerate(lancamentos, 1):
+            try:
+                preparados.append({
+                    'indice': i,
+                    'lancamento': lanc,
+                    'hash': self.gerar_hash_lancamento(lanc, agencia, conta, banco),
+                    'data_lanc': self._extrair_data_lancamento(lanc, banco),
+                })
+            except Exception as e:
+                erros += 1
+                logger.error(f"❌ Exceção ao processar lançamento {i}/{len(lancamentos)}: {e}", exc_info=True)
+        
+        # 2. Hashes já existentes
+        resultado_hashes = self._buscar_hashes_existentes([p['hash'] for p in preparados if p['data_lanc']])
+        if not resultado_hashes.get('success'):
+            return _indisponivel(resultado_hashes.get('error', ''), len(lancamentos))
+        existentes = resultado_hashes['data']
+        
+        candidatos = None
+        hashes_no_lote = set()
+        atualizacoes_data = []
+        pendentes = []
+        for item in preparados:
+            hash_lanc = item['hash']
+            data_lanc = item['data_lanc']
+            duplicata = None
+            if data_lanc:
+                duplicata = existentes.get(hash_lanc)
+                if duplicata is None and hash_lanc in hashes_no_lote:
+                    duplicata = {'id_movimentacao': None, 'data': data_lanc.strftime('%Y-%m-%d')}
+                if duplicata is None and banco == 'SANTANDER':
+                    # 3. Valor + descrição (hash mudou, ex: historicComplement adicionado)
+                    if candidatos is None:
+                        resultado_candidatos = self._buscar_candidatos_valor_descricao(agencia, conta)
+                        if not resultado_candidatos.get('success'):
+                            return _indisponivel(resultado_candidatos.get('error', ''), len(lancamentos))
+                        candidatos = resultado_candidatos['data']
+                    duplicata = self._casar_valor_descricao(item['lancamento'], candidatos)
+            
+            if duplicata is not None:
+                duplicados += 1
+                data_lanc_str = data_lanc.strftime('%Y-%m-%d')
+                if duplicata.get('id_movimentacao') and duplicata.get('data') != data_lanc_str:
+                    logger.info(f"🔄 Atualizando data do lançamento {duplicata['id_movimentacao']} de {duplicata.get('data')} para {data_lanc_str}")
+                    data_str = self._formatar_data_sql(data_lanc)
+                    atualizacoes_data.append((data_str, data_str, duplicata['id_movimentacao']))
+                    duplicata['data'] = data_lanc_str
+                continue
+            
+            hashes_no_lote.add(hash_lanc)
+            pendentes.append(item)
+            # ✅ NOVO (16/10/2026): o pendente vira candidato valor + descrição para os itens seguintes do
+            # mesmo extrato (na importação unitária ele já estaria gravado quando o próximo fosse verificado).
+            # Na frente da lista: mesma precedência do `ORDER BY id_movimentacao DESC`.
+            data_lanc_str = data_lanc.strftime('%Y-%m-%d') if data_lanc else None
+            if candidatos is not None and data_lanc_str in _DATAS_CORRECAO_SANTANDER:
+                candidatos.insert(0, self._candidato_pendente(item['lancamento'], data_lanc_str))
+        
+        # 4. Datas divergentes
+        if atualizacoes_data:
+            resultado_update = self.sql_adapter.execute_many(
+                _SQL_UPDATE_DATA_MOVIMENTACAO,
+                atualizacoes_data,
+                database=self.sql_adapter.database
+            )
+            if resultado_update.get('success'):
+                logger.info(f"✅ Datas atualizadas para {len(atualizacoes_data)} lançamento(s)")
+            else:
+                logger.error(f"❌ Erro ao atualizar datas: {resultado_update.get('error')}")
+        
+        # 5. Montar linhas dos novos
+        nomes_cache: Dict[str, Optional[str]] = {}
+        linhas = []
+        processos_linhas = []
+        processo_por_indice: Dict[int, Optional[str]] = {}
+        for item in pendentes:
+            lanc = item['lancamento']
+            try:
+                campos = self._extrair_campos_lancamento(lanc, agencia, conta, banco, item['data_lanc'], nomes_cache)
+                data_str = self._formatar_data_sql(campos['data_lanc']) if campos['data_lanc'] else None
+                if not data_str:
+                    erros += 1
+                    logger.error(f"❌ Data inválida para lançamento: {campos['descricao'][:50]}... (item {item['indice']}/{len(lancamentos)})")
+                    continue
+                processo_ref = self.detectar_processo_por_descricao(campos['descricao'])
+                json_original = json.dumps(lanc, ensure_ascii=False)
+                if len(json_original) > 1000000:  # 1MB
+                    logger.warning(f"⚠️ JSON muito grande ({len(json_original)} chars), truncando...")
+                    json_original = json_original[:1000000]
+                linhas.append((
+                    banco, campos['agencia'], campos['conta'],
+                    data_str, data_str,
+                    campos['tipo'], campos['sinal'],
+                    campos['valor'], 'BRL',
+                    campos['cpf_cnpj_contra'], campos['nome_contra'], campos['tipo_pessoa_contra'],
+                    campos['banco_contra'], campos['agencia_contra'],
+                    campos['conta_contra'], campos['dv_conta_contra'],
+                    campos['descricao'], campos['historico_codigo'],
+                    campos['info_complementar'],
+                    processo_ref,
+                    campos['fonte_dados'], item['hash'], json_original,
+                ))
+                processos_linhas.append(processo_ref)
+                processo_por_indice[item['indice']] = processo_ref
+            except Exception as e:
+                erros += 1
+                logger.error(f"❌ Exceção ao processar lançamento {item['indice']}/{len(lancamentos)}: {e}", exc_info=True)
+        
+        # 6. Inserir todos os novos de uma vez
+        if linhas:
+            resultado_insert = self.sql_adapter.execute_many(
+                _SQL_INSERT_MOVIMENTACAO,
+                linhas,
+                database=self.sql_adapter.database
+            )
+            if not resultado_insert.get('success'):
+                error_msg = resultado_insert.get('error', 'Erro desconhecido')
+                indisponivel = _indisponivel(error_msg, len(linhas))
+                if indisponivel is not None:
+                    return indisponivel
+                # Lote rejeitado (ex: uma linha inválida): refazer item a item para isolar o erro.
+                # Seguro mesmo com inserção parcial - a importação unitária detecta duplicata pelo hash.
+                # Os pendentes não eram duplicados antes do INSERT: se agora são, foram gravados pela parte
+                # do lote que chegou a entrar - são novos deste extrato (contados em `novos`, com processo).
+                logger.warning(f"⚠️ INSERT em lote falhou ({error_msg}). Refazendo {len(pendentes)} lançamento(s) um a um...")
+                for item in pendentes:
+                    resultado = self.importar_lancamento(item['lancamento'], agencia, conta, banco)
+                    if resultado.get('acao') == 'inserido':
+                        novos += 1
+                        if resultado.get('processo_detectado'):
+                            processos_detectados.append(resultado['processo_detectado'])
+                    elif resultado.get('acao') == 'duplicado':
+                        novos += 1
+                        ja_inseridos += 1
+                        if processo_por_indice.get(item['indice']):
+                            processos_detectados.append(processo_por_indice[item['indice']])
+                    else:
+                        erros += 1
+                if ja_inseridos:
+                    logger.info(f"♻️ {ja_inseridos} lançamento(s) já gravado(s) pelo INSERT em lote interrompido")
+                return {
+                    'novos': novos,
+                    'duplicados': duplicados,
+                    'erros': erros,
+                    'processos_detectados': processos_detectados,
+                    'sql_server_indisponivel': False,
+                    'erro_sql_server': None,
+                    'processados': len(lancamentos),
+                }
+            novos = len(linhas)
+            processos_detectados.extend(p for p in processos_linhas if p)
+            logger.info(f"✅ {novos} lançamento(s) importado(s) em lote")
+        
+        return {
+            'novos': novos,
+            'duplicados': duplicados,
+            'erros': erros,
+            'processos_detectados': processos_detectados,
+            'sql_server_indisponivel': False,
+            'erro_sql_server': None,
+            'processados': len(lancamentos),
+        }
+    
     def importar_lancamentos(
         self,
         lancamentos: List[Dict[str, Any]],
@@ -982,37 +1408,54 @@ class BancoSincronizacaoService:
         
         logger.info(f"🔄 Iniciando importação de {len(lancamentos)} lançamentos...")
         
-        for i, lanc in enumerate(lancamentos, 1):
+        lote = None
+        if BANCO_IMPORTACAO_EM_LOTE and self.sql_adapter:
             try:
-                resultado = self.importar_lancamento(lanc, agencia, conta, banco)
-                processados = i
-                
-                if resultado.get('acao') == 'inserido':
-                    novos += 1
-                    if resultado.get('processo_detectado'):
-                        processos_detectados.append(resultado['processo_detectado'])
-                elif resultado.get('acao') == 'duplicado':
-                    duplicados += 1
-                elif resultado.get('acao') == 'sql_server_indisponivel':
-                    sql_server_indisponivel = True
-                    erro_sql_server = resultado.get('erro')
-                    erros += 1
-                    logger.warning(f"⚠️ Abortando importação no item {i}/{len(lancamentos)} por indisponibilidade do SQL Server.")
-                    break
-                else:
-                    erros += 1
-                    # ✅ DEBUG: Logar erro detalhado para os primeiros 3 erros
-                    if erros <= 3:
-                        erro_msg = resultado.get('erro', 'Erro desconhecido')
-                        logger.error(f"❌ Erro ao importar lançamento {i}/{len(lancamentos)}: {erro_msg}")
-                        logger.debug(f"❌ Dados do lançamento: {str(lanc)[:200]}...")
+                lote = self._importar_lancamentos_em_lote(lancamentos, agencia, conta, banco)
             except Exception as e:
-                erros += 1
-                logger.error(f"❌ Exceção ao processar lançamento {i}/{len(lancamentos)}: {e}", exc_info=True)
-            
-            # Log de progresso a cada 10 lançamentos
-            if i % 10 == 0:
-                logger.info(f"📊 Progresso: {i}/{len(lancamentos)} ({novos} novos, {duplicados} duplicados, {erros} erros)")
+                logger.error(f"❌ Erro na importação em lote, usando importação unitária: {e}", exc_info=True)
+                lote = None
+        
+        if lote is not None:
+            novos = lote['novos']
+            duplicados = lote['duplicados']
+            erros = lote['erros']
+            processos_detectados = lote['processos_detectados']
+            sql_server_indisponivel = lote['sql_server_indisponivel']
+            erro_sql_server = lote['erro_sql_server']
+            processados = lote['processados']
+        else:
+            for i, lanc in enumerate(lancamentos, 1):
+                try:
+                    resultado = self.importar_lancamento(lanc, agencia, conta, banco)
+                    processados = i
+                    
+                    if resultado.get('acao') == 'inserido':
+                        novos += 1
+                        if resultado.get('processo_detectado'):
+                            processos_detectados.append(resultado['processo_detectado'])
+                    elif resultado.get('acao') == 'duplicado':
+                        duplicados += 1
+                    elif resultado.get('acao') == 'sql_server_indisponivel':
+                        sql_server_indisponivel = True
+                        erro_sql_server = resultado.get('erro')
+                        erros += 1
+                        logger.warning(f"⚠️ Abortando importação no item {i}/{len(lancamentos)} por indisponibilidade do SQL Server.")
+                        break
+                    else:
+                        erros += 1
+                        # ✅ DEBUG: Logar erro detalhado para os primeiros 3 erros
+                        if erros <= 3:
+                            erro_msg = resultado.get('erro', 'Erro desconhecido')
+                            logger.error(f"❌ Erro ao importar lançamento {i}/{len(lancamentos)}: {erro_msg}")
+                            logger.debug(f"❌ Dados do lançamento: {str(lanc)[:200]}...")
+                except Exception as e:
+                    erros += 1
+                    logger.error(f"❌ Exceção ao processar lançamento {i}/{len(lancamentos)}: {e}", exc_info=True)
+                
+                # Log de progresso a cada 10 lançamentos
+                if i % 10 == 0:
+                    logger.info(f"📊 Progresso: {i}/{len(lancamentos)} ({novos} novos, {duplicados} duplicados, {erros} erros)")
         
         # Resumo final
         logger.info(f"✅ Importação concluída: {novos} novos, {duplicados} duplicados, {erros} erros")
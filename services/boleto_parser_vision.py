@@ -135,35 +135,39 @@ Responda APENAS com um JSON válido no formato:
             
             # Usar método direto do OpenAI client
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=os.getenv('DUIMP_AI_API_KEY'))
+                from services.openai_client_registry import obter_cliente_openai, chamada_openai
+                # timeout padrão do SDK (600s): imagens grandes podem demorar
+                client = obter_cliente_openai(api_key=os.getenv('DUIMP_AI_API_KEY'), timeout=600.0, perfil="vision")
                 
-                response = client.chat.completions.create(
-                    model="gpt-4o",  # gpt-4o tem suporte a vision
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": system_prompt
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": user_prompt
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{image_base64}"
+                with chamada_openai("gpt-4o", "vision") as chamada:
+                    response = chamada.executar(
+                        client.chat.completions.create,
+                        model="gpt-4o",  # gpt-4o tem suporte a vision
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": system_prompt
+                            },
+                            {
+                                "role": "user",
+                                "content": [
+                                    {
+                                        "type": "text",
+                                        "text": user_prompt
+                                    },
+                                    {
+                                        "type": "image_url",
+                                        "image_url": {
+                                            "url": f"data:image/png;base64,{image_base64}"
+                                        }
                                     }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=500,
-                    temperature=0.1
-                )
+                                ]
+                            }
+                        ],
+                        max_tokens=500,
+                        temperature=0.1
+                    )
+                    chamada.registrar_uso(getattr(response, 'usage', None))
                 
                 # 5. Extrair resposta
                 resposta_texto = response.choices[0].message.content.strip()
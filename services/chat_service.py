@@ -525,77 +525,26 @@ class ChatService(ChatServiceStreamingMixin):
         return self._context_extraction_handler.obter_contexto_processo(processo_referencia)
     
     def _identificar_acao(self, mensagem: str, contexto_processo: Optional[Dict] = None) -> Dict[str, Any]:
-        """Identifica a ação solicitada na mensagem."""
-        mensagem_lower = mensagem.lower()
-        
+        """Identifica a ação solicitada na mensagem.
+
+        ✅ OTIMIZADO (16/10/2026): padrões de pergunta/comando são regras do motor único de
+        intenções (ver `services/chat_service_intent_rules.py`).
+        """
+        from services.chat_service_intent_rules import ACOES_CHAT
+        from services.intent_matcher import analisar_mensagem
+
+        analise = analisar_mensagem(mensagem)
+
         # ✅ NOVO: Primeiro verificar se é uma PERGUNTA (não um comando)
         # Perguntas não devem criar DUIMP automaticamente
-        perguntas = [
-            r'^(?:tem|tem\s+algum|tem\s+alguma|tem\s+alguns|tem\s+algumas)',
-            r'^(?:qual|quais|quando|onde|como|quem|por\s+que|por\s+quê)',
-            r'^(?:esse|esta|este|esse\s+ce|esta\s+ce|este\s+ce)',
-            r'pend[êe]ncia',
-            r'bloqueio',
-            r'frete',
-            r'situa[çc][ãa]o',
-            r'status',
-            r'consignat[áa]rio',
-            r'origem',
-            r'destino',
-            r'navio',
-            r'afrmm',
-            r'tum',
-            r'peso',
-            r'cubagem'
-        ]
-        
-        eh_pergunta = False
-        for padrao_pergunta in perguntas:
-            if re.search(padrao_pergunta, mensagem_lower):
-                eh_pergunta = True
-                break
-        
-        # Padrões de comandos
-        acoes = {
-            'criar_duimp': [
-                r'cri[ae]r?\s+duimp',
-                r'registr[ae]r?\s+(?:a\s+)?duimp',  # ✅ MELHORIA: Aceita "registre a duimp" ou "registre duimp"
-                r'registr[ae]r?\s+(?:o\s+)?duimp',    # ✅ Aceita "registre o duimp"
-                r'ger[ae]r?\s+duimp',
-                r'fazer\s+duimp',
-                r'^(?:sim|pode\s+prosseguir|prosseguir|confirmar|confirma|pode\s+criar|pode\s+registrar)',  # ✅ NOVO: Confirmações após IA perguntar
-            ],
-            'consultar_status': [
-                r'status',
-                r'como\s+est[áa]',
-                r'situa[çc][ãa]o',
-                r'verificar',
-                r'consultar'
-            ],
-            'consultar_documentos': [
-                r'documentos?',
-                r'quais?\s+documentos?',
-                r'faltam\s+documentos?'
-            ],
-            'consultar_bloqueios': [
-                r'bloqueios?',
-                r'tem\s+bloqueio',
-                r'bloqueado'
-            ]
-        }
-        
-        acao_identificada = None
-        for acao, padroes in acoes.items():
-            for padrao in padroes:
-                if re.search(padrao, mensagem_lower):
-                    acao_identificada = acao
-                    break
-            if acao_identificada:
-                break
+        eh_pergunta = analise.tem('acao.pergunta')
+
+        # Padrões de comandos (a primeira ação que casar vence)
+        acao_identificada = next((acao for acao in ACOES_CHAT if analise.tem(f'acao.{acao}')), None)
         
         # ✅ MELHORIA: Se identificou "registre" sem "duimp", verificar se há processo na mensagem
         # Mas NUNCA criar DUIMP se for uma pergunta
-        if not acao_identificada and not eh_pergunta and re.search(r'registr[ae]r', mensagem_lower):
+        if not acao_identificada and not eh_pergunta and analise.tem('acao.registrar'):
             # Se há processo na mensagem, provavelmente é para criar DUIMP
             if contexto_processo and contexto_processo.get('processo_referencia'):
                 acao_identificada = 'criar_duimp'
@@ -0,0 +1,165 @@
+"""
+Regras de intenção do `ChatService._identificar_acao` e das detecções proativas
+(`chat_service_no_toolcalls_proactive_detection` / `chat_service_legacy_toolcalls_proactive_fixes`).
+
+✅ NOVO (16/10/2026): as cadeias de `re.search` desses módulos passaram para o motor único
+(`services.intent_matcher`): a mensagem é normalizada e analisada uma vez e cada módulo só
+consulta `analise.tem(...)` / `analise.tem_gatilho(...)`. Padrões sobre o texto normalizado
+(minúsculas, sem acentos, espaços colapsados): variantes só de acento (`pend[êe]ncia`,
+`estão|estao`) viram uma só e padrões que eram superconjunto de outro da mesma cadeia
+(`registrar duimp do` ⊃ `registrar duimp`) foram omitidos.
+
+Regexes que EXTRAEM valores (número da consulta, categoria, produto do NCM...) continuam nos
+módulos e só rodam depois que a regra correspondente casou.
+"""
+
+from __future__ import annotations
+
+from services.intent_matcher import Regra, registrar_regras
+
+# ---------------------------------------------------------------------- _identificar_acao
+# Ordem = prioridade (a primeira ação que casar vence)
+ACOES_CHAT = ('criar_duimp', 'consultar_status', 'consultar_documentos', 'consultar_bloqueios')
+
+_REGRAS_ACAO = (
+    # Perguntas não devem criar DUIMP automaticamente
+    Regra(
+        'acao.pergunta',
+        r'^(?:tem|qual|quais|quando|onde|como|quem|por\s+que|esse|esta|este)'
+        r'|pendencia|bloqueio|frete|situacao|status|consignatario|origem|destino|navio|afrmm|tum|peso|cubagem',
+    ),
+    Regra(
+        'acao.criar_duimp',
+        r'cri[ae]r?\s+duimp|registr[ae]r?\s+(?:[ao]\s+)?duimp|ger[ae]r?\s+duimp|fazer\s+duimp'
+        # Confirmações após a IA perguntar
+        r'|^(?:sim|pode\s+prosseguir|prosseguir|confirmar|confirma|pode\s+criar|pode\s+registrar)',
+        ('duimp', 'sim', 'prossegu', 'confirma', 'pode'),
+    ),
+    Regra(
+        'acao.consultar_status',
+        r'status|como\s+esta|situacao|verificar|consultar',
+        ('status', 'como', 'situacao', 'verificar', 'consultar'),
+    ),
+    Regra('acao.consultar_documentos', gatilhos=('documento',)),
+    Regra('acao.consultar_bloqueios', gatilhos=('bloqueio', 'bloqueado')),
+    Regra('acao.registrar', r'registr[ae]r', ('registr',)),
+)
+
+# ---------------------------------------------------------------------- detecção proativa
+_REGRAS_PROATIVAS = (
+    # Consultas bilhetadas
+    Regra(
+        'proativo.consultas_pendentes',
+        r'consultas?\s+pendentes?|consultas?\s+aguardando|consultas?\s+estao|quais\s+consultas?',
+        ('consulta',),
+    ),
+    Regra('proativo.aprovar_todas', r'aprovar\s+(?:todas?\s+)?(?:as\s+)?consultas?', ('aprovar',)),
+    Regra('proativo.rejeitar_todas', r'rejeitar\s+(?:todas?\s+)?(?:as\s+)?consultas?', ('rejeitar',)),
+    Regra('proativo.aprovar', r'aprovar\s+(?:a\s+)?consulta\s*#?\d+|aprovar\s+#?\d+', ('aprovar',)),
+    Regra('proativo.rejeitar', r'rejeitar\s+(?:a\s+)?consulta\s*#?\d+|rejeitar\s+#?\d+', ('rejeitar',)),
+    Regra(
+        'proativo.executar_todas',
+        r'(?:executar|execultar)\s+(?:todas?\s+)?(?:as\s+)?(?:consultas?\s+)?(?:aprovadas?)?'
+        r'|(?:executar|execultar)\s+(?:todas?\s+)?(?:as\s+)?aprovadas?',
+        ('executar', 'execultar'),
+    ),
+    Regra(
+        'proativo.executar',
+        r'(?:executar|execultar)\s+(?:a\s+)?consulta\s*#?\d+|(?:executar|execultar)\s+#?\d+',
+        ('executar', 'execultar'),
+    ),
+    Regra('proativo.executar_aprovadas', r'(?:executar|execultar)\s+consultas?\s+aprovadas?', ('executar', 'execultar')),
+    # Chegada / período
+    Regra('proativo.quando_chegaram', r'quando\s+(?:chegaram|chegou|chegara)', ('quando',)),
+    Regra('proativo.quando_chegam', r'quando\s+(?:chegam|chega)', ('quando',)),
+    Regra(
+        'proativo.chegada_generica',
+        r'(?:quais|como|mostre|o\s+que\s+tem)\s+(?:os|as|processos?|pra|para)?\s*(?:estao|esta)\s+'
+        r'(?:chegando|pra\s+chegar|para\s+chegar|vai\s+chegar|vao\s+chegar)'
+        r'|quais\s+[a-z]{3}\s+(?:estao|esta)\s+(?:chegando|pra\s+chegar|para\s+chegar)'
+        r'|o\s+que\s+tem\s+(?:pra|para)\s+chegar',
+        ('chega',),
+    ),
+    Regra('proativo.verbo_passado', r'\b(?:chegaram|chegou|chegara)\b', ('chegou', 'chegara')),
+    Regra('proativo.periodo_proxima_semana', r'semana\s*(?:q\s*|que\s*)?vem|proxima\s*semana', ('semana',)),
+    Regra('proativo.periodo_semana', r'esta\s*semana', ('semana',)),
+    Regra('proativo.periodo_proximo_mes', r'mes\s+que\s+vem|proximo\s+mes', ('mes',)),
+    Regra('proativo.periodo_mes', gatilhos=('este mes',)),
+    Regra('proativo.periodo_amanha', gatilhos=('amanha',)),
+    Regra('proativo.periodo_hoje', gatilhos=('hoje',)),
+    # Situação do processo (ordem = prioridade)
+    Regra('proativo.situacao_di_desembaracada', r'\b(?:desembarac|di_desembaracada)', ('desembarac',)),
+    Regra('proativo.situacao_registrado', r'\bregistr\w*\b', ('registr',)),
+    Regra('proativo.situacao_entregue', r'\bentreg\w*\b', ('entreg',)),
+    Regra('proativo.situacao_armazenado', r'\barmazen\w*\b', ('armazen',)),
+    Regra('proativo.duimp_registrada', r'tem\s+duimp\s+registrada\s+para|tem\s+duimp\s+para', ('duimp',)),
+    Regra('proativo.pendencia', gatilhos=('pendencia', 'pendente')),
+    Regra('proativo.bloqueio', r'\bbloqueio\b|\bbloquead[oa]s?\b', ('bloqueio', 'bloquead')),
+    Regra(
+        'proativo.processos_generico',
+        r'(?:quais|mostre|liste|como\s+estao).*processos?.*(?:estao|com)',
+        ('processo',),
+    ),
+    # Fluxo legado (pós tool_calls)
+    Regra(
+        'proativo.criar_duimp',
+        r'registr[ae]r?\s+(?:a\s+)?(?:o\s+)?duimp|cri[ae]r?\s+(?:a\s+)?duimp|ger[ae]r?\s+(?:a\s+)?duimp|fazer\s+(?:a\s+)?duimp',
+        ('duimp',),
+    ),
+    Regra(
+        'proativo.intencao_criar_duimp',
+        r'cri[ae]r?\s+(?:a\s+)?duimp|registr[ae]r?\s+duimp|ger[ae]r?\s+duimp',
+        ('duimp',),
+    ),
+    Regra(
+        'proativo.ncm_produto',
+        r'(?:qual|quais)\s+(?:o|os|a|as)?\s*ncm\s+(?:do|da|de|para|d[eo]?\s+produto?|de\s+)?'
+        r'|ncm\s+(?:do|da|de|para)|^ncm\s+[a-z0-9]|^qual\s+(?:a|o)\s+ncm',
+        ('ncm',),
+    ),
+    Regra('proativo.menciona_processo', gatilhos=('processo', 'categoria')),
+    Regra(
+        'proativo.pronto_registro',
+        r'prontos?\s+(?:para|pra)\s+registro|precisam\s+de\s+registro|precisam\s+registrar|precisam\s+de\s+di'
+        r'|precisam\s+de\s+duimp|chegaram\s+sem\s+despacho'
+        r'|(?:o\s+que|quais?)\s+(?:temos|tem|ha)\s+(?:pra|para|de)\s+registrar|temos\s+(?:pra|para|de)\s+registrar'
+        r'|(?:o\s+que|quais?)\s+(?:temos|tem|ha)\s+(?:pra|para)\s+registro',
+        ('registr', 'precisam', 'despacho'),
+    ),
+    Regra(
+        'proativo.processos_generico_sem_ref',
+        r'quais\s+(?:os\s+|as\s+)?processos|processos\s+(?:que|com)',
+        ('processos',),
+    ),
+)
+
+# Palavra da mensagem → situação (ordem = prioridade; 'registrado' foi removido de propósito:
+# confunde com "tem DUIMP registrada")
+SITUACOES_COMUNS = (
+    ('desembaracado', 'desembaraçado'),
+    ('desembaracada', 'desembaraçado'),
+    ('desembaraco', 'desembaraçado'),
+    ('registrada', 'registrado'),
+    ('entregue', 'entregue'),
+    ('armazenado', 'armazenado'),
+    ('armazenada', 'armazenado'),
+    ('manifestado', 'manifestado'),
+    ('manifestada', 'manifestado'),
+)
+# Palavra da mensagem → tipo de valor (perguntas sobre frete/seguro/FOB/CIF)
+VALORES_KEYWORDS = (
+    ('frete', 'frete'),
+    ('seguro', 'seguro'),
+    ('fob', 'fob'),
+    ('cif', 'cif'),
+    ('valor', 'todos'),
+    ('valores', 'todos'),
+    ('quanto', 'todos'),
+    ('moeda', 'todos'),
+)
+
+registrar_regras(
+    _REGRAS_ACAO + _REGRAS_PROATIVAS,
+    gatilhos_extras=[p for p, _ in SITUACOES_COMUNS] + [p for p, _ in VALORES_KEYWORDS]
+    + ['tem duimp', 'duimp registrada', 'quando'],
+)
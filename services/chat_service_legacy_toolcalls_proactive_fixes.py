@@ -11,6 +11,9 @@ import json
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
+from services.chat_service_intent_rules import SITUACOES_COMUNS, VALORES_KEYWORDS
+from services.intent_matcher import analisar_mensagem
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,17 +38,11 @@ def aplicar_fixes_pos_toolcalls_legacy(
 
     # ✅✅✅ PRIORIDADE MÁXIMA: Interceptar se IA chamou listar_processos_por_situacao com 'registrado' mas mensagem é comando de criar DUIMP
     mensagem_lower = mensagem.lower()
+    # ✅ OTIMIZADO (16/10/2026): padrões de detecção são regras do motor único de intenções
+    # (ver `services/chat_service_intent_rules.py`); aqui só ficam as extrações de valores.
+    analise = analisar_mensagem(mensagem)
     # ✅ CORREÇÃO: Aceitar "registrar duimp do", "criar duimp do", etc.
-    eh_comando_criar_duimp_pos = bool(
-        re.search(r'registr[ae]r?\s+(?:a\s+)?(?:duimp|o\s+duimp)', mensagem_lower)
-        or re.search(r'registr[ae]r?\s+duimp\s+do', mensagem_lower)  # ✅ "registrar duimp do"
-        or re.search(r'cri[ae]r?\s+(?:a\s+)?duimp', mensagem_lower)
-        or re.search(r'cri[ae]r?\s+duimp\s+do', mensagem_lower)  # ✅ "criar duimp do"
-        or re.search(r'ger[ae]r?\s+(?:a\s+)?duimp', mensagem_lower)
-        or re.search(r'ger[ae]r?\s+duimp\s+do', mensagem_lower)  # ✅ "gerar duimp do"
-        or re.search(r'fazer\s+(?:a\s+)?duimp', mensagem_lower)
-        or re.search(r'fazer\s+duimp\s+do', mensagem_lower)  # ✅ "fazer duimp do"
-    )
+    eh_comando_criar_duimp_pos = analise.tem('proativo.criar_duimp')
 
     if eh_comando_criar_duimp_pos:
         # Verificar se IA chamou listar_processos_por_situacao com situacao='registrado'
@@ -97,12 +94,7 @@ def aplicar_fixes_pos_toolcalls_legacy(
     # mesmo quando há tool_calls (pode ter chamado outra função incorreta)
 
     # ✅ PRIORIDADE MÁXIMA: Detectar perguntas sobre NCM de produtos (ANTES de consultas pendentes)
-    eh_pergunta_ncm_produto = bool(
-        re.search(
-            r'(?:qual|quais)\s+(?:o|os|a|as)?\s*ncm\s+(?:do|da|de|para|d[eo]?\s+produto?|de\s+)?|ncm\s+(?:do|da|de|para)|^ncm\s+[a-z0-9]|^qual\s+(?:a|o)\s+ncm',
-            mensagem_lower,
-        )
-    ) and not bool(re.search(r'processo|processos|categoria|ALH|VDM|MSS|BND|DMD|GYM|SLL', mensagem_lower))
+    eh_pergunta_ncm_produto = analise.tem('proativo.ncm_produto') and not analise.tem('proativo.menciona_processo')
 
     produto_detectado = None
     if eh_pergunta_ncm_produto:
@@ -157,12 +149,7 @@ def aplicar_fixes_pos_toolcalls_legacy(
                 log.error(f'❌ Erro ao forçar chamada de sugerir_ncm_com_ia: {e}', exc_info=True)
 
     # ✅⚠️⚠️⚠️ VALIDAÇÃO CRÍTICA: Detectar quando IA chama função errada para "pronto para registro"
-    eh_pergunta_pronto_registro = bool(
-        re.search(
-            r'pronto[s]?\s+(?:para|pra)\s+registro|precisam\s+de\s+registro|precisam\s+registrar|precisam\s+de\s+di|precisam\s+de\s+duimp|chegaram\s+sem\s+despacho|est[ao]\s+pronto[s]?\s+(?:para|pra)\s+registro|(?:o\s+que|quais?)\s+(?:temos|tem|há|ha)\s+(?:pra|para|de)\s+registrar|temos\s+(?:pra|para|de)\s+registrar|(?:o\s+que|quais?)\s+(?:temos|tem|há|ha)\s+pra\s+registro|(?:o\s+que|quais?)\s+(?:temos|tem|há|ha)\s+para\s+registro',
-            mensagem_lower,
-        )
-    )
+    eh_pergunta_pronto_registro = analise.tem('proativo.pronto_registro')
     tem_listar_liberados = any(tc['function']['name'] == 'listar_processos_liberados_registro' for tc in tool_calls) if tool_calls else False
     tem_listar_situacao_registrado = (
         any(
@@ -210,15 +197,9 @@ def aplicar_fixes_pos_toolcalls_legacy(
     # ✅ PRIORIDADE MÁXIMA: Detectar processo específico na mensagem e forçar consultar_status_processo
     processo_ref_detectado = chat_service._extrair_processo_referencia(mensagem)
     tem_consultar_status_processo = any(tc['function']['name'] == 'consultar_status_processo' for tc in tool_calls) if tool_calls else False
-    eh_pergunta_generica_sem_processo = bool(
-        re.search(r'quais\s+processos|quais\s+os\s+processos|quais\s+as\s+processos|processos\s+que|processos\s+com', mensagem_lower)
-        and not processo_ref_detectado
-    )
+    eh_pergunta_generica_sem_processo = analise.tem('proativo.processos_generico_sem_ref') and not processo_ref_detectado
     tem_criar_duimp = any(tc['function']['name'] == 'criar_duimp' for tc in tool_calls) if tool_calls else False
-    mensagem_lower_check = mensagem.lower()
-    intencao_criar_duimp = bool(
-        re.search(r'cri[ae]r?\s+duimp|cri[ae]r?\s+a\s+duimp|registr[ae]r?\s+duimp|ger[ae]r?\s+duimp', mensagem_lower_check)
-    )
+    intencao_criar_duimp = analise.tem('proativo.intencao_criar_duimp')
 
     if (
         processo_ref_detectado
@@ -248,7 +229,7 @@ def aplicar_fixes_pos_toolcalls_legacy(
             log.error(f'❌ Erro ao forçar chamada de consultar_status_processo: {e}', exc_info=True)
 
     # ✅ NOVO: Detectar perguntas sobre consultas bilhetadas pendentes (PRIORIDADE MÁXIMA)
-    eh_pergunta_consultas_pendentes = bool(re.search(r'consultas?\s+pendentes?|consultas?\s+aguardando|consultas?\s+estão|quais\s+consultas?', mensagem_lower))
+    eh_pergunta_consultas_pendentes = analise.tem('proativo.consultas_pendentes')
     tem_listar_consultas_pendentes = any(
         tc['function']['name'] == 'listar_consultas_bilhetadas_pendentes' for tc in tool_calls
     ) if tool_calls else False
@@ -271,34 +252,17 @@ def aplicar_fixes_pos_toolcalls_legacy(
             log.error(f'❌ Erro ao forçar chamada de listar_consultas_bilhetadas_pendentes: {e}', exc_info=True)
 
     # Verificar se é pergunta sobre pendências (de processos, não consultas)
-    tem_pendencia = bool(re.search(r'pend[êe]ncia|pendente', mensagem_lower)) and not eh_pergunta_consultas_pendentes
+    tem_pendencia = analise.tem('proativo.pendencia') and not eh_pergunta_consultas_pendentes
 
     # ✅ NOVO: Verificar se é pergunta sobre situação específica (desembaraçado, registrado, entregue, etc.)
     # ⚠️ CRÍTICO: NÃO detectar "registrado" se a pergunta contém "tem DUIMP registrada para [PROCESSO]"
-    eh_pergunta_duimp_registrada = bool(re.search(r'tem\s+duimp\s+registrada\s+para|tem\s+duimp\s+para', mensagem_lower))
-
-    situacoes_comuns = {
-        'desembaraçado': 'desembaraçado',
-        'desembaracado': 'desembaraçado',
-        'desembaraçada': 'desembaraçado',
-        'desembaracada': 'desembaraçado',
-        'desembaraco': 'desembaraçado',
-        # 'registrado': 'registrado',  # Removido - causa confusão com "tem DUIMP registrada"
-        'registrada': 'registrado',
-        'entregue': 'entregue',
-        'armazenado': 'armazenado',
-        'armazenada': 'armazenado',
-        'manifestado': 'manifestado',
-        'manifestada': 'manifestado',
-    }
+    eh_pergunta_duimp_registrada = analise.tem('proativo.duimp_registrada')
 
     situacao_detectada = None
     if not eh_pergunta_duimp_registrada:
-        for palavra, situacao in situacoes_comuns.items():
-            if palavra in mensagem_lower:
-                if (palavra == 'registrado' or palavra == 'registrada') and (
-                    'tem duimp' in mensagem_lower or 'duimp registrada' in mensagem_lower
-                ):
+        for palavra, situacao in SITUACOES_COMUNS:
+            if analise.tem_gatilho(palavra):
+                if palavra == 'registrada' and analise.tem_gatilho('tem duimp', 'duimp registrada'):
                     continue
                 situacao_detectada = situacao
                 break
@@ -336,22 +300,7 @@ def aplicar_fixes_pos_toolcalls_legacy(
             match_categoria = None
 
     # ✅ NOVO: Detectar perguntas sobre valores (frete, seguro, FOB, CIF)
-    valores_keywords = {
-        'frete': 'frete',
-        'seguro': 'seguro',
-        'fob': 'fob',
-        'cif': 'cif',
-        'valor': 'todos',
-        'valores': 'todos',
-        'quanto': 'todos',
-        'moeda': 'todos',
-    }
-
-    valor_detectado = None
-    for keyword, tipo in valores_keywords.items():
-        if keyword in mensagem_lower:
-            valor_detectado = tipo
-            break
+    valor_detectado = next((tipo for keyword, tipo in VALORES_KEYWORDS if analise.tem_gatilho(keyword)), None)
 
     padrao_processo = r'([A-Z]{3}\.\d{4}/\d{2})'
     match_processo_valor = re.search(padrao_processo, mensagem, re.IGNORECASE)
@@ -409,19 +358,19 @@ def aplicar_fixes_pos_toolcalls_legacy(
     categoria_detectada_funcao = chat_service._extrair_categoria_da_mensagem(mensagem)
     categoria_detectada = categoria_detectada_funcao or categoria_detectada_regex
 
-    situacao_detectada_tool_calls = None
-    if re.search(r'\b(?:desembarac|desembaraç|di_desembaracada)', mensagem_lower):
-        situacao_detectada_tool_calls = 'di_desembaracada'
-    elif re.search(r'\b(?:registrad|registr)\w*\b', mensagem_lower):
-        situacao_detectada_tool_calls = 'registrado'
-    elif re.search(r'\b(?:entregu|entreg)\w*\b', mensagem_lower):
-        situacao_detectada_tool_calls = 'entregue'
-    elif re.search(r'\b(?:armazenad|armazen)\w*\b', mensagem_lower):
-        situacao_detectada_tool_calls = 'armazenado'
+    situacao_detectada_tool_calls = next(
+        (
+            situacao
+            for situacao in ('di_desembaracada', 'registrado', 'entregue', 'armazenado')
+            if analise.tem(f'proativo.situacao_{situacao}')
+        ),
+        None,
+    )
+
+    eh_pergunta_quando_chegaram = analise.tem('proativo.quando_chegaram')
+    eh_pergunta_quando_chegam = analise.tem('proativo.quando_chegam')
 
     if categoria_detectada and situacao_detectada_tool_calls and not match_processo_especifico:
-        eh_pergunta_quando_chegaram = bool(re.search(r'quando\s+(?:chegaram|chegou|chegara)', mensagem_lower))
-        eh_pergunta_quando_chegam = bool(re.search(r'quando\s+(?:chegam|chega)', mensagem_lower))
         if not (eh_pergunta_quando_chegaram or eh_pergunta_quando_chegam):
             log.warning(
                 f'⚠️⚠️⚠️ PRIORIDADE MÁXIMA (TOOL_CALLS): Categoria {categoria_detectada} + situação "{situacao_detectada_tool_calls}" detectada '
@@ -475,8 +424,6 @@ def aplicar_fixes_pos_toolcalls_legacy(
                     log.error(f'❌ Erro ao forçar chamada da função para categoria {categoria_detectada} com pendências: {e}', exc_info=True)
 
             if categoria_detectada and situacao_detectada and not tem_listar_situacao and not tem_pendencia:
-                eh_pergunta_quando_chegaram = bool(re.search(r'quando\s+(?:chegaram|chegou|chegara)', mensagem_lower))
-                eh_pergunta_quando_chegam = bool(re.search(r'quando\s+(?:chegam|chega)', mensagem_lower))
                 if not (eh_pergunta_quando_chegaram or eh_pergunta_quando_chegam):
                     log.warning(f'⚠️⚠️⚠️ PRIORIDADE MÁXIMA: Categoria {categoria_detectada} + situação "{situacao_detectada}" detectada mas IA não chamou listar_processos_por_situacao. Forçando chamada...')
                 try:
@@ -11,6 +11,9 @@ import logging
 import re
 from typing import Any, Dict, List, Optional
 
+from services.chat_service_intent_rules import SITUACOES_COMUNS
+from services.intent_matcher import analisar_mensagem
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +41,9 @@ def aplicar_deteccao_proativa_sem_toolcalls(
 
     # Base: resposta string, sem tool calls.
     mensagem_lower = (mensagem or "").lower()
+    # ✅ OTIMIZADO (16/10/2026): padrões de detecção são regras do motor único de intenções
+    # (ver `services/chat_service_intent_rules.py`); aqui só ficam as extrações de valores.
+    analise = analisar_mensagem(mensagem)
     resposta_ia = resposta_ia_raw if resposta_ia_raw else (resposta_ia or "")
 
     # Se veio do precheck para refinar, a resposta da IA já foi usada acima no ChatService.
@@ -51,9 +57,7 @@ def aplicar_deteccao_proativa_sem_toolcalls(
     resposta_ia_periodo = None
 
     # ✅ PRIORIDADE MÁXIMA: Detectar perguntas sobre consultas bilhetadas pendentes (ANTES de tudo)
-    eh_pergunta_consultas_pendentes = bool(
-        re.search(r"consultas?\s+pendentes?|consultas?\s+aguardando|consultas?\s+estão|quais\s+consultas?", mensagem_lower)
-    )
+    eh_pergunta_consultas_pendentes = analise.tem("proativo.consultas_pendentes")
     if eh_pergunta_consultas_pendentes:
         _logger.warning(
             "⚠️⚠️⚠️ PRIORIDADE MÁXIMA: Pergunta sobre consultas pendentes detectada mas IA não chamou "
@@ -76,10 +80,10 @@ def aplicar_deteccao_proativa_sem_toolcalls(
             _logger.error(f"❌ Erro ao forçar chamada de listar_consultas_bilhetadas_pendentes: {e}", exc_info=True)
 
     # ✅ PRIORIDADE MÁXIMA: Detectar comandos de aprovar/rejeitar consultas (ANTES de tudo)
-    eh_comando_aprovar_todas = bool(re.search(r"aprovar\s+(?:todas?\s+)?(?:as\s+)?consultas?", mensagem_lower))
-    eh_comando_rejeitar_todas = bool(re.search(r"rejeitar\s+(?:todas?\s+)?(?:as\s+)?consultas?", mensagem_lower))
-    eh_comando_aprovar = bool(re.search(r"aprovar\s+(?:a\s+)?consulta\s*#?(\d+)|aprovar\s+#?(\d+)", mensagem_lower))
-    eh_comando_rejeitar = bool(re.search(r"rejeitar\s+(?:a\s+)?consulta\s*#?(\d+)|rejeitar\s+#?(\d+)", mensagem_lower))
+    eh_comando_aprovar_todas = analise.tem("proativo.aprovar_todas")
+    eh_comando_rejeitar_todas = analise.tem("proativo.rejeitar_todas")
+    eh_comando_aprovar = analise.tem("proativo.aprovar")
+    eh_comando_rejeitar = analise.tem("proativo.rejeitar")
 
     if eh_comando_aprovar_todas or eh_comando_rejeitar_todas or eh_comando_aprovar or eh_comando_rejeitar:
         try:
@@ -124,17 +128,9 @@ def aplicar_deteccao_proativa_sem_toolcalls(
             _logger.error(f"❌ Erro ao forçar chamada de aprovar/rejeitar consultas: {e}", exc_info=True)
 
     # ✅ PRIORIDADE MÁXIMA: Detectar comandos de executar consultas aprovadas (ANTES de tudo)
-    eh_comando_executar_todas = bool(
-        re.search(
-            r"(?:executar|execultar)\s+(?:todas?\s+)?(?:as\s+)?(?:consultas?\s+)?(?:aprovadas?)?|"
-            r"(?:executar|execultar)\s+(?:todas?\s+)?(?:as\s+)?aprovadas?",
-            mensagem_lower,
-        )
-    )
-    eh_comando_executar = bool(
-        re.search(r"(?:executar|execultar)\s+(?:a\s+)?consulta\s*#?(\d+)|(?:executar|execultar)\s+#?(\d+)", mensagem_lower)
-    )
-    eh_comando_executar_aprovadas = bool(re.search(r"(?:executar|execultar)\s+consultas?\s+aprovadas?", mensagem_lower))
+    eh_comando_executar_todas = analise.tem("proativo.executar_todas")
+    eh_comando_executar = analise.tem("proativo.executar")
+    eh_comando_executar_aprovadas = analise.tem("proativo.executar_aprovadas")
 
     if eh_comando_executar_todas or eh_comando_executar or eh_comando_executar_aprovadas:
         try:
@@ -185,18 +181,14 @@ def aplicar_deteccao_proativa_sem_toolcalls(
 
     categoria_situacao_processada = False
 
-    eh_pergunta_quando_chegaram = bool(re.search(r"quando\s+(?:chegaram|chegou|chegara)", mensagem_lower))
-    eh_pergunta_quando_chegam = bool(re.search(r"quando\s+(?:chegam|chega)", mensagem_lower))
+    eh_pergunta_quando_chegaram = analise.tem("proativo.quando_chegaram")
+    eh_pergunta_quando_chegam = analise.tem("proativo.quando_chegam")
 
     if not (eh_pergunta_quando_chegaram or eh_pergunta_quando_chegam):
-        if re.search(r"\b(?:desembarac|desembaraç|di_desembaracada)", mensagem_lower):
-            situacao_detectada = "di_desembaracada"
-        elif re.search(r"\b(?:registrad|registr)\w*\b", mensagem_lower):
-            situacao_detectada = "registrado"
-        elif re.search(r"\b(?:entregu|entreg)\w*\b", mensagem_lower):
-            situacao_detectada = "entregue"
-        elif re.search(r"\b(?:armazenad|armazen)\w*\b", mensagem_lower):
-            situacao_detectada = "armazenado"
+        for situacao in ("di_desembaracada", "registrado", "entregue", "armazenado"):
+            if analise.tem(f"proativo.situacao_{situacao}"):
+                situacao_detectada = situacao
+                break
 
     _logger.info(
         f'🔍 Detecção proativa: categoria={categoria_detectada}, situação={situacao_detectada}, '
@@ -254,15 +246,7 @@ def aplicar_deteccao_proativa_sem_toolcalls(
     # ---------------------------------------------------------------------
     # Pergunta genérica sobre chegada (antes de períodos temporais)
     # ---------------------------------------------------------------------
-    eh_pergunta_generica_chegada = bool(
-        re.search(
-            r"(?:quais|como|mostre|o\s+que\s+tem)\s+(?:os|as|processos?|pra|para)?\s*(?:estao|estão|esta|está)\s+"
-            r"(?:chegando|pra\s+chegar|para\s+chegar|vai\s+chegar|vão\s+chegar)",
-            mensagem_lower,
-        )
-    ) or bool(
-        re.search(r"quais\s+[a-z]{3}\s+(?:estao|estão|esta|está)\s+(?:chegando|pra\s+chegar|para\s+chegar)", mensagem_lower)
-    ) or bool(re.search(r"o\s+que\s+tem\s+(?:pra|para)\s+chegar", mensagem_lower))
+    eh_pergunta_generica_chegada = analise.tem("proativo.chegada_generica")
 
     categoria_chegada_generica = chat_service._extrair_categoria_da_mensagem(mensagem) if eh_pergunta_generica_chegada else None  # noqa: SLF001
     if not categoria_chegada_generica and eh_pergunta_generica_chegada:
@@ -392,8 +376,8 @@ def aplicar_deteccao_proativa_sem_toolcalls(
         periodo_temporal_data_fim = None
         _logger.info("✅ Pergunta genérica sobre chegada detectada. Ignorando detecção de período temporal (evitar herdar contexto).")
     else:
-        verbo_passado = bool(re.search(r"\b(?:chegaram|chegou|chegara)\b", mensagem_lower))
-        if "quando" in mensagem_lower:
+        verbo_passado = analise.tem("proativo.verbo_passado")
+        if analise.tem_gatilho("quando"):
             verbo_passado = False
 
         meses_nomes = {
@@ -448,27 +432,22 @@ def aplicar_deteccao_proativa_sem_toolcalls(
                 f"🔍 Mês por nome detectado: {mes_detectado}/{ano_detectado} "
                 f"(primeiro dia: {periodo_temporal_data_especifica}, último dia: {periodo_temporal_data_fim})"
             )
-        elif re.search(
-            r"(?:semana\s*(?:q\s*|que\s*)?vem|semana\s*(?:q\s*|que\s*)?vêm|próxima\s*semana|proxima\s*semana|"
-            r"chegam\s+semana\s*(?:q\s*|que\s*)?vem|chegam\s+semana\s*(?:q\s*|que\s*)?vêm|"
-            r"vao\s+chegar\s+semana\s*(?:q\s*|que\s*)?vem|vão\s+chegar\s+semana\s*(?:q\s*|que\s*)?vem)",
-            mensagem_lower,
-        ):
+        elif analise.tem("proativo.periodo_proxima_semana"):
             periodo_temporal_detectado = "proxima_semana"
             periodo_temporal_passado = False
-        elif re.search(r"esta\s*semana|nesta\s*semana|chegam\s+(?:esta|nesta)\s*semana|chegaram\s+(?:esta|nesta)\s*semana", mensagem_lower):
+        elif analise.tem("proativo.periodo_semana"):
             periodo_temporal_detectado = "semana"
             periodo_temporal_passado = verbo_passado
-        elif re.search(r"(?:mês\s+que\s+vem|mes\s+que\s+vem|próximo\s+mês|proximo\s+mes|vao\s+chegar\s+m[êe]s\s+que\s+vem|vão\s+chegar\s+m[êe]s\s+que\s+vem)", mensagem_lower):
+        elif analise.tem("proativo.periodo_proximo_mes"):
             periodo_temporal_detectado = "proximo_mes"
             periodo_temporal_passado = False
-        elif re.search(r"este mês|neste mês|neste mes", mensagem_lower):
+        elif analise.tem("proativo.periodo_mes"):
             periodo_temporal_detectado = "mes"
             periodo_temporal_passado = verbo_passado
-        elif re.search(r"amanhã|amanha", mensagem_lower):
+        elif analise.tem("proativo.periodo_amanha"):
             periodo_temporal_detectado = "amanha"
             periodo_temporal_passado = False
-        elif re.search(r"hoje", mensagem_lower):
+        elif analise.tem("proativo.periodo_hoje"):
             periodo_temporal_detectado = "hoje"
             periodo_temporal_passado = verbo_passado
 
@@ -535,33 +514,19 @@ def aplicar_deteccao_proativa_sem_toolcalls(
     # ---------------------------------------------------------------------
     # Detecção de categoria/situação/pendência/bloqueio (pós período temporal)
     # ---------------------------------------------------------------------
-    eh_pergunta_duimp_registrada = bool(re.search(r"tem\s+duimp\s+registrada\s+para|tem\s+duimp\s+para", mensagem_lower))
-
-    situacoes_comuns = {
-        "desembaraçado": "desembaraçado",
-        "desembaracado": "desembaraçado",
-        "desembaraçada": "desembaraçado",
-        "desembaracada": "desembaraçado",
-        "desembaraco": "desembaraçado",
-        "registrada": "registrado",
-        "entregue": "entregue",
-        "armazenado": "armazenado",
-        "armazenada": "armazenado",
-        "manifestado": "manifestado",
-        "manifestada": "manifestado",
-    }
+    eh_pergunta_duimp_registrada = analise.tem("proativo.duimp_registrada")
 
     situacao_detectada = None
     if not eh_pergunta_duimp_registrada:
-        for palavra, situacao in situacoes_comuns.items():
-            if palavra in mensagem_lower:
-                if (palavra == "registrado" or palavra == "registrada") and ("tem duimp" in mensagem_lower or "duimp registrada" in mensagem_lower):
+        for palavra, situacao in SITUACOES_COMUNS:
+            if analise.tem_gatilho(palavra):
+                if palavra == "registrada" and analise.tem_gatilho("tem duimp", "duimp registrada"):
                     continue
                 situacao_detectada = situacao
                 break
 
-    tem_pendencia = bool(re.search(r"pend[êe]ncia|pendente", mensagem_lower))
-    tem_bloqueio = bool(re.search(r"\bbloqueio\b|\bbloqueados?\b|\bbloqueadas?\b", mensagem_lower))
+    tem_pendencia = analise.tem("proativo.pendencia")
+    tem_bloqueio = analise.tem("proativo.bloqueio")
 
     categoria_detectada_direta = chat_service._extrair_categoria_da_mensagem(mensagem)  # noqa: SLF001
 
@@ -597,8 +562,7 @@ def aplicar_deteccao_proativa_sem_toolcalls(
         else:
             match_categoria = None
 
-    padrao_generico = r"(?:quais|mostre|liste|como\s+estao|como\s+estão).*(?:processos|processo).*(?:estao|estão|com)"
-    match_generico = bool(re.search(padrao_generico, mensagem_lower)) and not bool(match_categoria)
+    match_generico = analise.tem("proativo.processos_generico") and not bool(match_categoria)
 
     tem_listar_todos_situacao = (
         any(tc.get("function", {}).get("name") == "listar_todos_processos_por_situacao" for tc in (tool_calls or []))
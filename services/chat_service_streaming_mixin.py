@@ -711,34 +711,43 @@ class ChatServiceStreamingMixin:
 
         Mantém o comportamento atual: executa tools via `_executar_funcao_tool` e
         combina tudo com `_combinar_resultados_tools`.
+
+        ✅ NOVO (16/10/2026): tools de consulta do mesmo turno rodam em paralelo
+        (`services.tool_calls_executor`); a ordem dos resultados é preservada.
         """
         import json
+        from services.tool_calls_executor import executar_tool_calls, resultado_timeout, TOOL_CALL_TIMEOUT_SECONDS
 
-        resultados_tools: List[Dict[str, Any]] = []
-
+        chamadas: List[Any] = []
         for tool_call in tool_calls:
+            func_name = tool_call.get('function', {}).get('name')
+            func_args_str = tool_call.get('function', {}).get('arguments', '{}')
+            if not func_name:
+                continue
+
             try:
-                func_name = tool_call.get('function', {}).get('name')
-                func_args_str = tool_call.get('function', {}).get('arguments', '{}')
-                if not func_name:
-                    continue
+                func_args = json.loads(func_args_str) if isinstance(func_args_str, str) else (func_args_str or {})
+            except json.JSONDecodeError:
+                logger.warning(f'Erro ao parsear argumentos da função {func_name}: {func_args_str}')
+                continue
+            chamadas.append((func_name, func_args))
+
+        def _executar(func_name: str, func_args: Dict[str, Any]) -> Any:
+            return self._executar_funcao_tool(
+                func_name,
+                func_args,
+                mensagem_original=mensagem_original,
+                session_id=session_id,
+            )
 
-                try:
-                    func_args = json.loads(func_args_str) if isinstance(func_args_str, str) else (func_args_str or {})
-                except json.JSONDecodeError:
-                    logger.warning(f'Erro ao parsear argumentos da função {func_name}: {func_args_str}')
-                    continue
-
-                resultado = self._executar_funcao_tool(
-                    func_name,
-                    func_args,
-                    mensagem_original=mensagem_original,
-                    session_id=session_id,
-                )
-                if resultado:
-                    resultados_tools.append(resultado)
-            except Exception as e:
-                logger.error(f"Erro ao executar tool_call no streaming: {e}", exc_info=True)
+        resultados_tools: List[Dict[str, Any]] = []
+        for r in executar_tool_calls(chamadas, _executar):
+            if r.timeout:
+                resultados_tools.append(resultado_timeout(r.nome, TOOL_CALL_TIMEOUT_SECONDS))
+            elif r.erro is not None:
+                logger.error(f"Erro ao executar tool_call no streaming: {r.erro}", exc_info=r.erro)
+            elif r.resultado:
+                resultados_tools.append(r.resultado)
 
         resposta_final = self._combinar_resultados_tools(resultados_tools, resposta_ia_texto)
 
@@ -1,5 +1,8 @@
+import logging
 import sqlite3
 
+logger = logging.getLogger(__name__)
+
 
 def criar_tabelas_classif_cache(cursor: sqlite3.Cursor) -> None:
     """Cria as tabelas de cache do Classif (NCM) e metadados."""
@@ -24,3 +27,79 @@ def criar_tabelas_classif_cache(cursor: sqlite3.Cursor) -> None:
         """
     )
 
+    criar_indice_fts_classif_cache(cursor)
+
+
+def criar_indice_fts_classif_cache(cursor: sqlite3.Cursor) -> bool:
+    """
+    Cria o índice full-text (FTS5) de `classif_cache.descricao`.
+
+    - tabela de conteúdo externo (não duplica as descrições; lê de `classif_cache` pelo rowid)
+    - `remove_diacritics 2`: "algodão" casa com "algodao"
+    - triggers mantêm o índice em sincronia com INSERT/UPDATE/DELETE
+
+    Returns:
+        True se o índice está disponível (SQLite compilado com FTS5), False caso contrário.
+    """
+    # Versão anterior criava índices de prefixo (`prefix='2 3 4'`) que a busca nunca usa e que toda
+    # gravação pagava: recriar sem eles (o 'rebuild' abaixo reindexa a partir de `classif_cache`)
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'classif_cache_fts'")
+    existente = cursor.fetchone()
+    if existente and "prefix=" in (existente[0] or "").replace(" ", ""):
+        cursor.execute("DROP TABLE classif_cache_fts")
+
+    try:
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS classif_cache_fts USING fts5(
+                ncm UNINDEXED,
+                descricao,
+                content='classif_cache',
+                content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """
+        )
+    except sqlite3.OperationalError as e:
+        # SQLite sem FTS5: a busca por descrição continua no caminho LIKE
+        logger.warning(f"⚠️ FTS5 indisponível para classif_cache: {e}")
+        return False
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS classif_cache_fts_ai AFTER INSERT ON classif_cache BEGIN
+            INSERT INTO classif_cache_fts(rowid, ncm, descricao) VALUES (new.rowid, new.ncm, new.descricao);
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS classif_cache_fts_ad AFTER DELETE ON classif_cache BEGIN
+            INSERT INTO classif_cache_fts(classif_cache_fts, rowid, ncm, descricao)
+            VALUES ('delete', old.rowid, old.ncm, old.descricao);
+        END
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS classif_cache_fts_au AFTER UPDATE OF ncm, descricao ON classif_cache BEGIN
+            INSERT INTO classif_cache_fts(classif_cache_fts, rowid, ncm, descricao)
+            VALUES ('delete', old.rowid, old.ncm, old.descricao);
+            INSERT INTO classif_cache_fts(rowid, ncm, descricao) VALUES (new.rowid, new.ncm, new.descricao);
+        END
+        """
+    )
+
+    # Banco já populado antes do índice existir: indexar tudo uma vez
+    cursor.execute("SELECT COUNT(*) FROM classif_cache_fts_docsize")
+    indexados = cursor.fetchone()[0]
+    if not indexados:
+        cursor.execute("SELECT COUNT(*) FROM classif_cache")
+        if cursor.fetchone()[0]:
+            cursor.execute("INSERT INTO classif_cache_fts(classif_cache_fts) VALUES ('rebuild')")
+    return True
+
+
+def reconstruir_indice_fts_classif_cache(cursor: sqlite3.Cursor) -> None:
+    """Reindexa `classif_cache_fts` a partir de `classif_cache` (ex.: após carga feita sem triggers)."""
+    cursor.execute("INSERT INTO classif_cache_fts(classif_cache_fts) VALUES ('rebuild')")
@@ -0,0 +1,28 @@
+"""
+Dashboard snapshot schema (SQLite)
+
+Dashboard "o que temos pra hoje" materializado por (categoria, modal).
+Recalculado pela sincronização do Kanban; lido por chave primária.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+
+def criar_tabela_dashboard_snapshot(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_snapshot (
+            categoria TEXT NOT NULL DEFAULT '',
+            modal TEXT NOT NULL DEFAULT '',
+            data_ref TEXT NOT NULL,
+            secoes_json TEXT NOT NULL,
+            gerado_em TEXT NOT NULL,
+            gerado_em_epoch REAL NOT NULL,
+            duracao_ms INTEGER,
+            origem TEXT,
+            PRIMARY KEY (categoria, modal)
+        )
+        """
+    )
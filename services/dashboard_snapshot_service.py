@@ -0,0 +1,268 @@
+"""
+Dashboard "o que temos pra hoje" materializado.
+
+✅ NOVO (16/10/2026): as 8 seções do dashboard (chegando, prontos, DTA, pendências,
+DUIMPs/DIs em análise, ETA alterado, alertas) eram recalculadas a cada pedido, cada
+uma com sua conexão e parse de `dados_completos_json` em Python. Agora:
+
+- o resultado fica na tabela `dashboard_snapshot`, uma linha por (categoria, modal);
+- leitura por chave primária + carimbo `gerado_em` (idade exposta ao chamador);
+- a sincronização do Kanban recalcula só os snapshots afetados pelos processos alterados;
+- quando não há snapshot válido (dia virou / passou do `DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS`),
+  as seções são calculadas em paralelo e pedidos simultâneos da mesma chave esperam um único cálculo.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_SNAPSHOT_ENABLED = os.getenv("DASHBOARD_SNAPSHOT_ENABLED", "true").lower() == "true"
+DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS", "900"))
+DASHBOARD_SNAPSHOT_MAX_WORKERS = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_WORKERS", "4"))
+
+
+def _secoes() -> List[Tuple[str, Callable[[Optional[str], Optional[str]], List[Dict[str, Any]]]]]:
+    """Seções do dashboard na ordem de exibição: (nome, fn(categoria, modal))."""
+    import db_manager as db
+
+    return [
+        ("processos_chegando", lambda c, m: db.obter_processos_chegando_hoje(c, m)),
+        ("processos_prontos", lambda c, m: db.obter_processos_prontos_registro(c, m)),
+        ("processos_em_dta", lambda c, m: db.listar_processos_em_dta(c)),
+        ("pendencias", lambda c, m: db.obter_pendencias_ativas(c, m)),
+        ("duimps_analise", lambda c, m: db.obter_duimps_em_analise(c)),
+        ("dis_analise", lambda c, m: db.obter_dis_em_analise(c)),
+        ("eta_alterado", lambda c, m: db.obter_processos_eta_alterado(c)),
+        ("alertas", lambda c, m: db.obter_alertas_recentes(limite=10, categoria=c)),
+    ]
+
+
+def _chave(categoria: Optional[str], modal: Optional[str]) -> Tuple[str, str]:
+    return ((categoria or "").strip().upper(), (modal or "").strip())
+
+
+def calcular_secoes(
+    categoria: Optional[str] = None,
+    modal: Optional[str] = None,
+    *,
+    max_workers: Optional[int] = None,
+    secoes: Optional[List[Tuple[str, Callable]]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Calcula todas as seções em paralelo (cada função abre sua própria conexão)."""
+    secoes = secoes if secoes is not None else _secoes()
+    workers = max(1, min(max_workers or DASHBOARD_SNAPSHOT_MAX_WORKERS, len(secoes)))
+    if workers == 1:
+        return {nome: fn(categoria, modal) or [] for nome, fn in secoes}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard") as pool:
+        futuros = [(nome, pool.submit(fn, categoria, modal)) for nome, fn in secoes]
+        # .result() propaga a exceção da seção (mesmo comportamento do cálculo sequencial)
+        return {nome: futuro.result() or [] for nome, futuro in futuros}
+
+
+class DashboardSnapshotService:
+    """Lê/grava o dashboard materializado em `dashboard_snapshot`."""
+
+    _locks: Dict[Tuple[str, str], threading.Lock] = {}
+    _locks_guard = threading.Lock()
+    _tabela_ok = False
+
+    def __init__(self, max_idade_segundos: Optional[int] = None, secoes: Optional[List[Tuple[str, Callable]]] = None):
+        self.max_idade_segundos = (
+            DASHBOARD_SNAPSHOT_MAX_AGE_SECONDS if max_idade_segundos is None else max_idade_segundos
+        )
+        self._secoes = secoes
+        self._garantir_tabela()
+
+    @classmethod
+    def _garantir_tabela(cls) -> None:
+        if cls._tabela_ok:
+            return
+        try:
+            from db_manager import get_db_connection
+            from services.dashboard_snapshot_schema import criar_tabela_dashboard_snapshot
+
+            conn = get_db_connection()
+            try:
+                criar_tabela_dashboard_snapshot(conn.cursor())
+                conn.commit()
+            finally:
+                conn.close()
+            cls._tabela_ok = True
+        except Exception as e:
+            logger.warning(f"[DASHBOARD_SNAPSHOT] ⚠️ Falha ao garantir tabela dashboard_snapshot: {e}")
+
+    # ------------------------------------------------------------------ leitura
+    def obter(self, categoria: Optional[str] = None, modal: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Retorna o dashboard de (categoria, modal).
+
+        Returns:
+            Dict com 'secoes', 'gerado_em' (ISO), 'idade_segundos' e 'origem' ('snapshot' | 'calculado').
+        """
+        if not DASHBOARD_SNAPSHOT_ENABLED:
+            return self._montar_resultado(
+                calcular_secoes(categoria, modal, secoes=self._secoes), datetime.now(), "calculado"
+            )
+
+        chave = _chave(categoria, modal)
+        snapshot = self._ler(chave)
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock_da_chave(chave):
+            # Outro pedido pode ter recalculado enquanto esperávamos o lock
+            snapshot = self._ler(chave)
+            if snapshot is not None:
+                return snapshot
+            return self.recalcular(categoria, modal, origem="calculado")
+
+    def _ler(self, chave: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        try:
+            from db_manager import get_db_connection
+
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT data_ref, secoes_json, gerado_em, gerado_em_epoch FROM dashboard_snapshot "
+                    "WHERE categoria = ? AND modal = ?",
+                    chave,
+                )
+                row = cursor.fetchone()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.debug(f"[DASHBOARD_SNAPSHOT] Falha ao ler snapshot {chave}: {e}")
+            return None
+        if not row:
+            return None
+        data_ref, secoes_json, gerado_em, gerado_em_epoch = row[0], row[1], row[2], row[3]
+        idade = time.time() - float(gerado_em_epoch)
+        if data_ref != datetime.now().strftime("%Y-%m-%d") or idade > self.max_idade_segundos:
+            return None
+        return {
+            "secoes": json.loads(secoes_json),
+            "gerado_em": gerado_em,
+            "idade_segundos": round(max(idade, 0.0), 1),
+            "origem": "snapshot",
+        }
+
+    # ------------------------------------------------------------------ escrita
+    def recalcular(self, categoria: Optional[str] = None, modal: Optional[str] = None, *, origem: str = "sync") -> Dict[str, Any]:
+        """Recalcula as seções (em paralelo) e grava o snapshot da chave."""
+        chave = _chave(categoria, modal)
+        inicio = time.monotonic()
+        secoes = calcular_secoes(chave[0] or None, chave[1] or None, secoes=self._secoes)
+        duracao_ms = int((time.monotonic() - inicio) * 1000)
+        agora = datetime.now()
+        secoes_json = json.dumps(secoes, ensure_ascii=False, default=str)
+
+        try:
+            from db_manager import get_db_connection
+
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    INSERT INTO dashboard_snapshot
+                        (categoria, modal, data_ref, secoes_json, gerado_em, gerado_em_epoch, duracao_ms, origem)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(categoria, modal) DO UPDATE SET
+                        data_ref = excluded.data_ref,
+                        secoes_json = excluded.secoes_json,
+                        gerado_em = excluded.gerado_em,
+                        gerado_em_epoch = excluded.gerado_em_epoch,
+                        duracao_ms = excluded.duracao_ms,
+                        origem = excluded.origem
+                    """,
+                    (
+                        chave[0],
+                        chave[1],
+                        agora.strftime("%Y-%m-%d"),
+                        secoes_json,
+                        agora.isoformat(timespec="seconds"),
+                        time.time(),
+                        duracao_ms,
+                        origem,
+                    ),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"[DASHBOARD_SNAPSHOT] Falha ao gravar snapshot {chave}: {e}")
+
+        logger.info(f"[DASHBOARD_SNAPSHOT] {chave} recalculado em {duracao_ms}ms ({origem})")
+        return self._montar_resultado(json.loads(secoes_json), agora, origem)
+
+    def atualizar_apos_sync(self, refs_alteradas: Iterable[str]) -> int:
+        """
+        Recalcula os snapshots afetados pelos processos alterados na sincronização do Kanban.
+
+        Sempre recalcula o snapshot geral ('', ''); por categoria/modal, só os que já foram
+        materializados (pedidos anteriores) e cuja categoria teve processo alterado.
+        """
+        if not DASHBOARD_SNAPSHOT_ENABLED:
+            return 0
+        categorias = {str(ref).split(".")[0].strip().upper() for ref in refs_alteradas if ref}
+        if not categorias:
+            return 0
+
+        chaves = {("", "")}
+        try:
+            from db_manager import get_db_connection
+
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT categoria, modal FROM dashboard_snapshot")
+                for categoria, modal in cursor.fetchall():
+                    if not categoria or categoria in categorias:
+                        chaves.add((categoria or "", modal or ""))
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.debug(f"[DASHBOARD_SNAPSHOT] Falha ao listar snapshots: {e}")
+
+        atualizados = 0
+        for chave in sorted(chaves):
+            try:
+                with self._lock_da_chave(chave):
+                    self.recalcular(chave[0] or None, chave[1] or None, origem="sync")
+                atualizados += 1
+            except Exception as e:
+                logger.warning(f"[DASHBOARD_SNAPSHOT] Falha ao recalcular {chave} após sync: {e}")
+        return atualizados
+
+    # ------------------------------------------------------------------ helpers
+    @classmethod
+    def _lock_da_chave(cls, chave: Tuple[str, str]) -> threading.Lock:
+        with cls._locks_guard:
+            lock = cls._locks.get(chave)
+            if lock is None:
+                lock = cls._locks[chave] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def _montar_resultado(secoes: Dict[str, Any], gerado_em: datetime, origem: str) -> Dict[str, Any]:
+        return {
+            "secoes": secoes,
+            "gerado_em": gerado_em.isoformat(timespec="seconds"),
+            "idade_segundos": 0.0,
+            "origem": origem,
+        }
+
+
+def obter_dashboard_snapshot(categoria: Optional[str] = None, modal: Optional[str] = None) -> Dict[str, Any]:
+    """Atalho: dashboard do dia de (categoria, modal) via snapshot materializado."""
+    return DashboardSnapshotService().obter(categoria, modal)
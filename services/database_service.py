@@ -1,9 +1,19 @@
 """
 Serviço centralizado de banco de dados (suporta SQLite e Postgres).
+
+✅ NOVO (16/10/2026): pool de conexões.
+- SQLite: conexões reaproveitadas por thread (PRAGMAs aplicados uma única vez por conexão física).
+- Postgres: `psycopg2.pool.ThreadedConnectionPool` limitado.
+- `close()` dos wrappers devolve a conexão ao pool em vez de fechá-la.
+- Wrapper descartado sem `close()` (a maioria dos chamadores não fecha em `finally`) tem o
+  checkout recuperado quando é coletado (`weakref.finalize`), contado em `leaked`.
 """
 import os
 import logging
-from typing import Any, Optional, Union
+import sqlite3
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -20,18 +30,280 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "maike_chat")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "")
 
+# Configurações do pool
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() == "true"
+SQLITE_POOL_MAX_IDLE_PER_THREAD = int(os.getenv("SQLITE_POOL_MAX_IDLE_PER_THREAD", "4"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+POSTGRES_POOL_MIN = int(os.getenv("POSTGRES_POOL_MIN", "1"))
+POSTGRES_POOL_MAX = int(os.getenv("POSTGRES_POOL_MAX", "10"))
+POSTGRES_POOL_WAIT_TIMEOUT = float(os.getenv("POSTGRES_POOL_WAIT_TIMEOUT", "30"))
+
+
+class SQLiteConnectionPool:
+    """
+    Pool de conexões SQLite por thread.
+
+    Cada thread mantém uma pilha de conexões ociosas. Um checkout aninhado na mesma thread
+    (função que já tem conexão aberta chama outra que abre a sua) recebe outra conexão física,
+    então um `close()` interno nunca afeta a transação da conexão externa.
+    """
+
+    def __init__(self, db_path: Union[str, Path], timeout: float = SQLITE_TIMEOUT,
+                 max_idle_per_thread: int = SQLITE_POOL_MAX_IDLE_PER_THREAD):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self.max_idle_per_thread = max(0, max_idle_per_thread)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "reused": 0, "released": 0, "discarded": 0, "in_use": 0, "leaked": 0}
+
+    def _idle(self) -> List[sqlite3.Connection]:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = []
+            self._local.idle = idle
+        return idle
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += delta
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        conn.execute("PRAGMA foreign_keys = ON")
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+            conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}")
+            conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+            conn.execute("PRAGMA temp_store = MEMORY")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Não foi possível aplicar PRAGMAs de performance no SQLite: {e}")
+        self._count("created")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        idle = self._idle()
+        while idle:
+            conn = idle.pop()
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.Error:
+                self._count("discarded")
+                continue
+            self._count("reused")
+            self._count("in_use")
+            return conn
+        conn = self._connect()
+        self._count("in_use")
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._count("in_use", -1)
+        try:
+            # Mesmo comportamento de `close()`: transação não commitada é descartada
+            if conn.in_transaction:
+                conn.rollback()
+            # Restaurar estado padrão (chamadores costumam setar `row_factory = sqlite3.Row`)
+            conn.row_factory = None
+            conn.text_factory = str
+            conn.isolation_level = ""
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        idle = self._idle()
+        if len(idle) >= self.max_idle_per_thread:
+            self._discard(conn)
+            return
+        idle.append(conn)
+        self._count("released")
+
+    def reclaim_leaked(self) -> None:
+        """
+        Checkout cujo wrapper foi coletado sem `close()`.
+
+        Só ajusta as estatísticas: a conexão não volta para as ociosas (o finalizador pode rodar em
+        outra thread e um cursor cru ainda pode estar usando-a); ela fecha sozinha quando for coletada.
+        """
+        self._count("in_use", -1)
+        self._count("leaked")
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        self._count("discarded")
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_thread_connections(self) -> int:
+        """Fecha as conexões ociosas da thread atual. Retorna quantas foram fechadas."""
+        idle = self._idle()
+        total = len(idle)
+        while idle:
+            self._discard(idle.pop())
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._stats)
+        data["db_path"] = str(self.db_path)
+        data["idle_current_thread"] = len(self._idle())
+        data["max_idle_per_thread"] = self.max_idle_per_thread
+        return data
+
+
+class PostgresPoolEsgotado(TimeoutError):
+    """Nenhuma conexão do pool Postgres liberada dentro de POSTGRES_POOL_WAIT_TIMEOUT (não cai para SQLite)."""
+
+
+class PostgresConnectionPool:
+    """Pool Postgres limitado (`ThreadedConnectionPool`) com espera por vaga livre."""
+
+    def __init__(self, minconn: int = POSTGRES_POOL_MIN, maxconn: int = POSTGRES_POOL_MAX,
+                 wait_timeout: float = POSTGRES_POOL_WAIT_TIMEOUT):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self.minconn = max(0, minconn)
+        self.maxconn = max(1, maxconn, self.minconn)
+        self.wait_timeout = wait_timeout
+        self._pool = ThreadedConnectionPool(
+            self.minconn,
+            self.maxconn,
+            host=POSTGRES_HOST,
+            port=POSTGRES_PORT,
+            database=POSTGRES_DB,
+            user=POSTGRES_USER,
+            password=POSTGRES_PASSWORD,
+            connect_timeout=10,
+        )
+        # `getconn()` levanta PoolError quando esgotado; o semáforo faz o chamador esperar
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "released": 0, "discarded": 0, "in_use": 0, "wait_timeouts": 0, "leaked": 0}
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += delta
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            self._count("wait_timeouts")
+            raise PostgresPoolEsgotado(
+                f"Pool Postgres esgotado ({self.maxconn} conexões em uso há mais de {self.wait_timeout:.0f}s)"
+            )
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                self._pool.putconn(conn, close=True)
+                self._count("discarded")
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        self._count("checkouts")
+        self._count("in_use")
+        return conn
+
+    def release(self, conn) -> None:
+        discard = bool(conn.closed)
+        if not discard:
+            try:
+                # Mesmo comportamento de `close()`: transação não commitada é descartada
+                conn.rollback()
+            except Exception:
+                discard = True
+        try:
+            self._pool.putconn(conn, close=discard)
+        finally:
+            self._slots.release()
+            self._count("in_use", -1)
+            self._count("discarded" if discard else "released")
+
+    def reclaim_leaked(self, conn) -> None:
+        """Checkout cujo wrapper foi coletado sem `close()`: devolve a conexão e a vaga ao pool."""
+        self._count("leaked")
+        logger.warning("⚠️ Conexão Postgres não fechada pelo chamador - devolvida ao pool pelo coletor")
+        try:
+            self.release(conn)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao recuperar conexão Postgres vazada: {e}")
+
+    def close_all(self) -> None:
+        self._pool.closeall()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = dict(self._stats)
+        data["minconn"] = self.minconn
+        data["maxconn"] = self.maxconn
+        return data
+
+
+_sqlite_pools: Dict[str, SQLiteConnectionPool] = {}
+_postgres_pool: Optional[PostgresConnectionPool] = None
+_pools_lock = threading.Lock()
+
+
+def _get_sqlite_pool(db_path: Union[str, Path, None] = None) -> SQLiteConnectionPool:
+    key = str(Path(db_path or DB_PATH).resolve())
+    pool = _sqlite_pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _sqlite_pools.get(key)
+            if pool is None:
+                pool = SQLiteConnectionPool(db_path or DB_PATH)
+                _sqlite_pools[key] = pool
+    return pool
+
+
+def _get_postgres_pool() -> PostgresConnectionPool:
+    global _postgres_pool
+    if _postgres_pool is None:
+        with _pools_lock:
+            if _postgres_pool is None:
+                _postgres_pool = PostgresConnectionPool()
+    return _postgres_pool
+
+
+def _connect_sqlite() -> "SQLiteConnectionWrapper":
+    if not DB_POOL_ENABLED:
+        conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return SQLiteConnectionWrapper(conn)
+    pool = _get_sqlite_pool()
+    return SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+
+
+def _falha_de_conexao_postgres(erro: BaseException) -> bool:
+    if isinstance(erro, ImportError):
+        return True
+    try:
+        import psycopg2
+    except ImportError:
+        return False
+    return isinstance(erro, psycopg2.OperationalError)
+
+
 def get_db_connection() -> Any:
     """
     Retorna uma conexão com o banco de dados configurado (Postgres ou SQLite).
     A conexão retornada é envolvida em um wrapper para compatibilidade de sintaxe.
+
+    Com `DB_POOL_ENABLED=true` (padrão), a conexão vem do pool e `close()` a devolve.
     """
     # ✅ Robustez: Verificar se deve usar Postgres
     use_postgres_env = os.getenv("USE_POSTGRES", "false").lower() == "true"
     
     if use_postgres_env:
         try:
+            if DB_POOL_ENABLED:
+                pool = _get_postgres_pool()
+                return PostgresConnectionWrapper(pool.acquire(), pool=pool)
+
             import psycopg2
-            from psycopg2.extras import RealDictCursor
             
             conn = psycopg2.connect(
                 host=POSTGRES_HOST,
@@ -42,32 +314,61 @@ def get_db_connection() -> Any:
                 connect_timeout=10
             )
             return PostgresConnectionWrapper(conn)
-        except (ImportError, Exception) as e:
+        except Exception as e:
+            # ✅ Só cai para SQLite se o driver não existe ou o servidor não aceitou a conexão.
+            # Pool esgotado (ex.: conexões vazadas) ou outro erro propaga: ler/gravar no SQLite
+            # em silêncio mandaria os dados para o banco errado.
+            if not _falha_de_conexao_postgres(e):
+                raise
             logger.error(f"❌ Erro ao conectar ao Postgres: {e}. Tentando fallback para SQLite...")
             # Fallback para SQLite se o Postgres falhar ou a biblioteca não estiver instalada
-            import sqlite3
             try:
-                conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT)
-                conn.execute("PRAGMA foreign_keys = ON")
-                return SQLiteConnectionWrapper(conn)
+                return _connect_sqlite()
             except Exception as e2:
                 logger.error(f"❌ Erro fatal ao conectar ao SQLite (fallback): {e2}")
                 raise
     else:
-        import sqlite3
         try:
-            conn = sqlite3.connect(DB_PATH, timeout=SQLITE_TIMEOUT)
-            conn.execute("PRAGMA foreign_keys = ON")
-            return SQLiteConnectionWrapper(conn)
+            return _connect_sqlite()
         except Exception as e:
             logger.error(f"❌ Erro ao conectar ao SQLite: {e}")
             raise
 
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Retorna estatísticas dos pools de conexão (SQLite por arquivo e Postgres)."""
+    return {
+        "enabled": DB_POOL_ENABLED,
+        "sqlite": [pool.stats() for pool in list(_sqlite_pools.values())],
+        "postgres": _postgres_pool.stats() if _postgres_pool is not None else None,
+    }
+
+
+def close_pools() -> None:
+    """Fecha conexões ociosas (SQLite da thread atual e todo o pool Postgres)."""
+    global _postgres_pool
+    for pool in list(_sqlite_pools.values()):
+        pool.close_thread_connections()
+    with _pools_lock:
+        if _postgres_pool is not None:
+            _postgres_pool.close_all()
+            _postgres_pool = None
+
+def _finalizador_checkout(wrapper: Any, reclaim, *args) -> weakref.finalize:
+    """Recupera o checkout quando o wrapper é coletado sem `close()` (desligado no encerramento do processo)."""
+    finalizer = weakref.finalize(wrapper, reclaim, *args)
+    finalizer.atexit = False
+    return finalizer
+
+
 class SQLiteConnectionWrapper:
     """Wrapper para conexão SQLite para manter consistência com PostgresConnectionWrapper."""
-    def __init__(self, conn):
+    def __init__(self, conn, pool: Optional[SQLiteConnectionPool] = None):
         # Guardar conexão real (sqlite3.Connection)
         self.conn = conn
+        self._pool = pool
+        self._closed = False
+        self._finalizer = _finalizador_checkout(self, pool.reclaim_leaked) if pool is not None else None
 
     # ✅ Compatibilidade: várias partes do código (ex: db_manager.py) esperam poder setar
     # `conn.row_factory = sqlite3.Row`. Se não repassarmos isso para a conexão real,
@@ -80,20 +381,37 @@ class SQLiteConnectionWrapper:
     def row_factory(self, value):
         setattr(self.conn, "row_factory", value)
 
+    def _check_open(self) -> None:
+        # Conexão devolvida ao pool pode já estar com outro chamador
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
     def __getattr__(self, name: str):
         # Delegar atributos/métodos não definidos para a conexão real
+        if name in ("conn", "_pool", "_closed", "_finalizer"):
+            raise AttributeError(name)
+        self._check_open()
         return getattr(self.conn, name)
     
     def cursor(self):
+        self._check_open()
         return self.conn.cursor()
     
     def commit(self):
+        self._check_open()
         return self.conn.commit()
     
     def rollback(self):
+        self._check_open()
         return self.conn.rollback()
     
     def close(self):
+        if self._closed:
+            return None
+        self._closed = True
+        if self._pool is not None:
+            self._finalizer.detach()
+            return self._pool.release(self.conn)
         return self.conn.close()
     
     def __enter__(self):
@@ -108,11 +426,14 @@ class SQLiteConnectionWrapper:
 
 class PostgresConnectionWrapper:
     """Wrapper para conexão Postgres para traduzir sintaxe SQLite (?) para Postgres (%s)."""
-    def __init__(self, conn):
+    def __init__(self, conn, pool: Optional[PostgresConnectionPool] = None):
         self.conn = conn
+        self._pool = pool
+        self._closed = False
+        self._finalizer = _finalizador_checkout(self, pool.reclaim_leaked, conn) if pool is not None else None
     
     def cursor(self):
-        return PostgresCursorWrapper(self.conn.cursor())
+        return PostgresCursorWrapper(self.conn.cursor(), conexao=self)
     
     def commit(self):
         return self.conn.commit()
@@ -121,6 +442,12 @@ class PostgresConnectionWrapper:
         return self.conn.rollback()
     
     def close(self):
+        if self._closed:
+            return None
+        self._closed = True
+        if self._pool is not None:
+            self._finalizer.detach()
+            return self._pool.release(self.conn)
         return self.conn.close()
     
     def __enter__(self):
@@ -135,8 +462,10 @@ class PostgresConnectionWrapper:
 
 class PostgresCursorWrapper:
     """Wrapper para cursor Postgres para traduzir sintaxe SQLite (?) para Postgres (%s)."""
-    def __init__(self, cursor):
+    def __init__(self, cursor, conexao: Optional["PostgresConnectionWrapper"] = None):
         self.cursor = cursor
+        # Cursor vivo mantém o wrapper da conexão vivo (o checkout não é recuperado no meio do uso)
+        self._conexao = conexao
     
     def execute(self, query, params=None):
         # Traduzir ? para %s
@@ -159,6 +159,10 @@ class DocumentoHistoricoService:
                     # Se não há mudanças e documento já existe, não logar (já foi logado como debug em _atualizar_documento)
                 else:
                     logger.warning(f"⚠️ Falha ao gravar documento {tipo_documento} {numero_documento} no SQL Server")
+                # ✅ NOVO (16/10/2026): documento do processo mudou -> snapshot em cache fica velho
+                if processo_referencia:
+                    from services.processo_snapshot_service import invalidar_snapshots
+                    invalidar_snapshots([processo_referencia])
             
             if historicos_gravados:
                 logger.info(f"✅ {len(historicos_gravados)} mudança(ões) detectada(s) e gravada(s) para {tipo_documento} {numero_documento}")
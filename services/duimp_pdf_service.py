@@ -11,7 +11,7 @@ import logging
 import json
 import time
 import os
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -393,6 +393,45 @@ class DuimpPdfService:
                 return 500, {'erro': 'Módulo não encontrado', 'detalhes': error_msg}
             return 500, {'erro': str(e)}
     
+    def consultar_itens_duimp_portal_lote(
+        self, numero: str, versao: str, indices: List[Any], ambiente: Optional[str] = None
+    ) -> List[Tuple[Any, int, Any]]:
+        """
+        Consulta vários itens da DUIMP no Portal Único em paralelo limitado.
+
+        ✅ NOVO (16/10/2026): antes cada item era uma chamada sequencial com sessão mTLS nova;
+        agora todos usam a sessão/tokens do `PortalClient` (ver `utils.portal_proxy`).
+
+        Returns:
+            Lista [(indice, status_code, response_body normalizado)] na ordem de `indices`.
+        """
+        if not indices:
+            return []
+        try:
+            from utils.portal_proxy import call_portal_itens_duimp
+        except ImportError as e:
+            logger.warning(f'Erro ao importar call_portal_itens_duimp: {e}')
+            return [(i, 500, {'erro': 'Módulo não disponível', 'detalhes': str(e)}) for i in indices]
+
+        logger.debug(f'Consultando {len(indices)} item(ns) da DUIMP {numero}/{versao} no Portal Único (ambiente: {ambiente or "producao"})')
+        try:
+            resultados = call_portal_itens_duimp(numero, versao, indices)
+        except Exception as e:
+            logger.warning(f'Erro ao consultar itens da DUIMP {numero}/{versao}: {e}')
+            return [(i, 500, {'erro': 'Erro ao consultar Portal Único', 'detalhes': str(e)}) for i in indices]
+        return [(indice, status, self._normalize_response(body)) for indice, status, body in resultados]
+
+    @staticmethod
+    def _indices_itens(itens: List[Any]) -> List[Any]:
+        """Índices dos itens listados na capa da DUIMP (campo 'indice' ou 'numero')."""
+        indices = []
+        for item in itens:
+            if isinstance(item, dict):
+                indice = item.get('indice') or item.get('numero')
+                if indice:
+                    indices.append(indice)
+        return indices
+
     def _normalize_response(self, body: Any) -> Any:
         """
         Normaliza resposta do Portal Único.
@@ -725,15 +764,11 @@ class DuimpPdfService:
         dados_itens = []
         
         if isinstance(itens, list):
-            for item in itens:
-                if isinstance(item, dict):
-                    indice = item.get('indice') or item.get('numero')
-                    if indice:
-                        status_item, dados_item = self.consultar_itens_duimp_portal(
-                            numero, versao, indice, ambiente
-                        )
-                        if status_item == 200 and isinstance(dados_item, dict):
-                            dados_itens.append(dados_item)
+            for _, status_item, dados_item in self.consultar_itens_duimp_portal_lote(
+                numero, versao, self._indices_itens(itens), ambiente
+            ):
+                if status_item == 200 and isinstance(dados_item, dict):
+                    dados_itens.append(dados_item)
         
         # ✅ NOVO: Atualizar banco SQL Server (mAIke_assistente) via DocumentoHistoricoService
         if status_capa == 200 and isinstance(dados_capa, dict):
@@ -918,15 +953,11 @@ class DuimpPdfService:
                             itens = dados_capa.get('itens', [])
                             if isinstance(itens, list):
                                 dados_itens = []
-                                for item in itens:
-                                    if isinstance(item, dict):
-                                        indice = item.get('indice') or item.get('numero')
-                                        if indice:
-                                            status_item, dados_item = self.consultar_itens_duimp_portal(
-                                                numero, versao, indice, ambiente
-                                            )
-                                            if status_item == 200 and isinstance(dados_item, dict):
-                                                dados_itens.append(dados_item)
+                                for _, status_item, dados_item in self.consultar_itens_duimp_portal_lote(
+                                    numero, versao, self._indices_itens(itens), ambiente
+                                ):
+                                    if status_item == 200 and isinstance(dados_item, dict):
+                                        dados_itens.append(dados_item)
                     else:
                         logger.warning(f'⚠️ Segunda tentativa de consulta ao Portal Único também falhou para DUIMP {numero}/{versao}')
                         return {
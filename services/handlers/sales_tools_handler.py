@@ -505,6 +505,15 @@ class SalesToolsHandler:
                     "resposta": "❌ SQL Server adapter indisponível (pyodbc/node não encontrados).",
                 }
 
+            # ✅ NOVO (16/10/2026): refresh explícito do catálogo de schema (senão vale o TTL)
+            catalogo_atualizado = False
+            if argumentos.get("atualizar_catalogo"):
+                atualizado = svc.atualizar_catalogo_schema()
+                if not atualizado.get("sucesso"):
+                    err = atualizado.get("erro") or "erro_desconhecido"
+                    return {"sucesso": False, "erro": err, "resposta": f"❌ Erro ao atualizar catálogo de schema: {err}"}
+                catalogo_atualizado = True
+
             resultado = svc.inspecionar_schema_nf(top=int(top) if top is not None else 80)
             if not resultado.get("sucesso"):
                 err = resultado.get("erro") or "erro_desconhecido"
@@ -516,6 +525,8 @@ class SalesToolsHandler:
             tabs = dados.get("tabelas_sugeridas_itens_produtos") or []
 
             resp = "🔎 **Schema legado (Make/Spalla) — NF/Vendas**\n\n"
+            if catalogo_atualizado:
+                resp += "🔄 Catálogo de schema atualizado (colunas e JOINs de cliente/empresa redescobertos).\n\n"
             resp += "**Candidatos encontrados em `spalla.dbo.documentos`:**\n"
             resp += f"- Número NF: `{', '.join(cand.get('numero_nf') or []) or 'N/A'}`\n"
             resp += f"- Cliente: `{', '.join(cand.get('cliente') or []) or 'N/A'}`\n"
@@ -6,14 +6,19 @@ Este serviço detecta a intenção do usuário e permite:
 2. Validar tool escolhida vs intenção (gate de mismatch)
 3. Forçar tool correta quando há mismatch
 
+✅ OTIMIZADO (16/10/2026): os padrões viraram regras do motor único `services/intent_matcher.py`
+(compiladas uma vez, texto normalizado sem acentos, uma varredura por mensagem e resultado
+memoizado — a mesma mensagem é avaliada mais de uma vez por request no core).
+
 Data: 14/01/2026
 """
 
 import logging
-import re
 from typing import Dict, Optional, List, Any
 from enum import Enum
 
+from services.intent_matcher import Regra, ResultadoIntencao, analisar_mensagem, registrar_regras
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +33,39 @@ class IntentType(Enum):
     OUTROS = "outros"
 
 
+_VERBOS_ENVIO = ('manda', 'mande', 'mandar', 'envia', 'envie', 'enviar')
+
+# Regras sobre o texto normalizado (minúsculas, sem acentos). Gatilhos = literais que precisam
+# aparecer para a regra ser avaliada.
+_REGRAS_INTENCAO = (
+    # "envia/mande + relatório + email/para" ou "envia esse relatório"
+    Regra('intent.relatorio_email', r'(?:envia|mande|envie|manda).*(?:relatorio.*(?:email|para)|esse.*relatorio)', ('relatorio',)),
+    # ✅ EXCLUIR: Extrato de CE/CCT/DI/DUIMP (não é extrato bancário)
+    Regra('intent.extrato_documento', r'extrato.*(?:ce|cct|di|duimp|processo)', ('extrato',)),
+    Regra(
+        'intent.extrato_bancario',
+        r'extrato.*(?:banco|bb|santander|bancario|conta|agencia)|(?:movimentacoes|transacoes|saldo).*banco',
+        ('extrato', 'banco'),
+    ),
+    Regra('intent.email_personalizado', r'(?:envia|mande|envie).*email.*(?:sobre|com|explicando)', ('email',)),
+    Regra('intent.criar_duimp', r'(?:criar|registrar|gerar|fazer|montar).*duimp', ('duimp',)),
+    Regra(
+        'intent.consultar_ncm',
+        r'ncm.*(?:para|de)|qual.*ncm|classificacao.*fiscal|aliquotas|tecwin',
+        ('ncm', 'fiscal', 'aliquotas', 'tecwin'),
+    ),
+    Regra('intent.consultar_processo', r'(?:status|situacao|como.*esta).*processo', ('processo',)),
+)
+
+registrar_regras(
+    _REGRAS_INTENCAO,
+    gatilhos_extras=_VERBOS_ENVIO + (
+        'relatorio', 'email', 'e-mail', 'assine', 'assinar', 'assinatura', 'sobre', 'explicando',
+        'bancario', 'bb', 'santander', 'criar', 'registrar',
+    ),
+)
+
+
 class IntentDetectionService:
     """Serviço para detectar intenções do usuário."""
     
@@ -56,14 +94,14 @@ class IntentDetectionService:
             - keywords: List[str] - palavras-chave encontradas
             - contexto: Dict com informações adicionais
         """
-        mensagem_lower = mensagem.lower().strip()
+        analise = analisar_mensagem(mensagem)
         
         # ✅ INTENÇÃO 1: Enviar relatório por email
-        if self._eh_intencao_enviar_relatorio_email(mensagem_lower, ultima_resposta_texto):
+        if self._eh_intencao_enviar_relatorio_email(analise, ultima_resposta_texto):
             return {
                 'intent_type': IntentType.ENVIAR_RELATORIO_EMAIL,
                 'confidence': 0.95,
-                'keywords': self._extrair_keywords_enviar_relatorio(mensagem_lower),
+                'keywords': self._extrair_keywords_enviar_relatorio(analise),
                 'contexto': {
                     'tem_report_meta': '[REPORT_META:' in (ultima_resposta_texto or ''),
                     'ultima_resposta_tem_relatorio': self._ultima_resposta_tem_relatorio(ultima_resposta_texto),
@@ -71,47 +109,47 @@ class IntentDetectionService:
             }
         
         # ✅ INTENÇÃO 2: Consultar extrato bancário
-        if self._eh_intencao_consultar_extrato_bancario(mensagem_lower):
+        if self._eh_intencao_consultar_extrato_bancario(analise):
             return {
                 'intent_type': IntentType.CONSULTAR_EXTRATO_BANCARIO,
                 'confidence': 0.90,
-                'keywords': self._extrair_keywords_extrato(mensagem_lower),
+                'keywords': self._extrair_keywords_extrato(analise),
                 'contexto': {}
             }
         
         # ✅ INTENÇÃO 3: Enviar email personalizado
-        if self._eh_intencao_enviar_email_personalizado(mensagem_lower, ultima_resposta_texto):
+        if self._eh_intencao_enviar_email_personalizado(analise, ultima_resposta_texto):
             return {
                 'intent_type': IntentType.ENVIAR_EMAIL_PERSONALIZADO,
                 'confidence': 0.85,
-                'keywords': self._extrair_keywords_email_personalizado(mensagem_lower),
+                'keywords': self._extrair_keywords_email_personalizado(analise),
                 'contexto': {}
             }
         
         # ✅ INTENÇÃO 4: Criar DUIMP
-        if self._eh_intencao_criar_duimp(mensagem_lower):
+        if analise.tem('intent.criar_duimp'):
             return {
                 'intent_type': IntentType.CRIAR_DUIMP,
                 'confidence': 0.90,
-                'keywords': self._extrair_keywords_duimp(mensagem_lower),
+                'keywords': self._extrair_keywords_duimp(analise),
                 'contexto': {}
             }
         
         # ✅ INTENÇÃO 5: Consultar NCM
-        if self._eh_intencao_consultar_ncm(mensagem_lower):
+        if analise.tem('intent.consultar_ncm'):
             return {
                 'intent_type': IntentType.CONSULTAR_NCM,
                 'confidence': 0.85,
-                'keywords': self._extrair_keywords_ncm(mensagem_lower),
+                'keywords': self._extrair_keywords_ncm(analise),
                 'contexto': {}
             }
         
         # ✅ INTENÇÃO 6: Consultar processo
-        if self._eh_intencao_consultar_processo(mensagem_lower):
+        if analise.tem('intent.consultar_processo'):
             return {
                 'intent_type': IntentType.CONSULTAR_PROCESSO,
                 'confidence': 0.80,
-                'keywords': self._extrair_keywords_processo(mensagem_lower),
+                'keywords': ['processo'],
                 'contexto': {}
             }
         
@@ -125,80 +163,23 @@ class IntentDetectionService:
     
     def _eh_intencao_enviar_relatorio_email(
         self,
-        mensagem_lower: str,
+        analise: ResultadoIntencao,
         ultima_resposta_texto: Optional[str] = None
     ) -> bool:
         """Verifica se a intenção é enviar relatório por email."""
-        # Padrões de "envia/mande + email + relatório"
-        padroes_envio = [
-            r'envia.*relat[oó]rio.*email',
-            r'mande.*relat[oó]rio.*email',
-            r'envie.*relat[oó]rio.*email',
-            r'manda.*relat[oó]rio.*email',
-            r'envia.*esse.*relat[oó]rio',
-            r'mande.*esse.*relat[oó]rio',
-            r'envie.*esse.*relat[oó]rio',
-            r'manda.*esse.*relat[oó]rio',
-            r'envia.*relat[oó]rio.*para',
-            r'mande.*relat[oó]rio.*para',
-            r'envie.*relat[oó]rio.*para',
-            r'manda.*relat[oó]rio.*para',
-        ]
-        
-        for padrao in padroes_envio:
-            if re.search(padrao, mensagem_lower):
-                # ✅ VALIDAÇÃO: Verificar se última resposta tem relatório
-                if ultima_resposta_texto:
-                    tem_relatorio = (
-                        '[REPORT_META:' in ultima_resposta_texto or
-                        'O QUE TEMOS PRA HOJE' in ultima_resposta_texto.upper() or
-                        'FECHAMENTO DO DIA' in ultima_resposta_texto.upper() or
-                        'PROCESSOS CHEGANDO' in ultima_resposta_texto.upper() or
-                        'DIs EM ANÁLISE' in ultima_resposta_texto.upper() or
-                        'DUIMPs EM ANÁLISE' in ultima_resposta_texto.upper() or
-                        'PENDÊNCIAS ATIVAS' in ultima_resposta_texto.upper()
-                    )
-                    if tem_relatorio:
-                        return True
-        
-        return False
+        # ✅ VALIDAÇÃO: só é envio de relatório se a última resposta tem relatório
+        return analise.tem('intent.relatorio_email') and self._ultima_resposta_tem_relatorio(ultima_resposta_texto)
     
-    def _eh_intencao_consultar_extrato_bancario(self, mensagem_lower: str) -> bool:
+    def _eh_intencao_consultar_extrato_bancario(self, analise: ResultadoIntencao) -> bool:
         """Verifica se a intenção é consultar extrato bancário."""
-        padroes_extrato = [
-            r'extrato.*banco',
-            r'extrato.*bb',
-            r'extrato.*santander',
-            r'extrato.*banc[aá]rio',
-            r'movimenta[çc][oõ]es.*banco',
-            r'transa[çc][oõ]es.*banco',
-            r'saldo.*banco',
-            r'extrato.*conta',
-            r'extrato.*ag[êe]ncia',
-        ]
-        
         # ✅ EXCLUIR: Extrato de CE/CCT/DI/DUIMP (não é extrato bancário)
-        padroes_excluir = [
-            r'extrato.*ce',
-            r'extrato.*cct',
-            r'extrato.*di',
-            r'extrato.*duimp',
-            r'extrato.*processo',
-        ]
-        
-        for padrao_excluir in padroes_excluir:
-            if re.search(padrao_excluir, mensagem_lower):
-                return False
-        
-        for padrao in padroes_extrato:
-            if re.search(padrao, mensagem_lower):
-                return True
-        
-        return False
+        if analise.tem('intent.extrato_documento'):
+            return False
+        return analise.tem('intent.extrato_bancario')
     
     def _eh_intencao_enviar_email_personalizado(
         self,
-        mensagem_lower: str,
+        analise: ResultadoIntencao,
         ultima_resposta_texto: Optional[str] = None
     ) -> bool:
         """Verifica se a intenção é enviar email personalizado (não relatório)."""
@@ -206,12 +187,10 @@ class IntentDetectionService:
         # Cobrir frases naturais do usuário, ex:
         # "manda um email simpático para X@gmail.com avisando que..."
         # "envie para X@gmail.com e assine Y"
-        padrao_email = r"[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}"
-        tem_email = bool(re.search(padrao_email, mensagem_lower))
-        verbos_envio = ['manda', 'mande', 'mandar', 'envia', 'envie', 'enviar']
-        tem_verbo_envio = any(v in mensagem_lower for v in verbos_envio)
-        tem_palavra_email = ('email' in mensagem_lower) or ('e-mail' in mensagem_lower)
-        tem_assinatura = ('assine' in mensagem_lower) or ('assinar' in mensagem_lower) or ('assinatura' in mensagem_lower)
+        tem_email = analise.entidade('email') is not None
+        tem_verbo_envio = analise.tem_gatilho(*_VERBOS_ENVIO)
+        tem_palavra_email = analise.tem_gatilho('email', 'e-mail')
+        tem_assinatura = analise.tem_gatilho('assine', 'assinar', 'assinatura')
 
         # Se tem email explícito e verbo de envio, isso é praticamente determinístico
         if tem_email and tem_verbo_envio:
@@ -225,171 +204,92 @@ class IntentDetectionService:
         if tem_assinatura and tem_verbo_envio:
             return True
 
-        # Padrões de email personalizado
-        padroes_email = [
-            r'envia.*email.*sobre',
-            r'mande.*email.*sobre',
-            r'envie.*email.*sobre',
-            r'envia.*email.*com',
-            r'mande.*email.*com',
-            r'envie.*email.*com',
-            r'envia.*email.*explicando',
-            r'mande.*email.*explicando',
-            r'envie.*email.*explicando',
-        ]
-        
         # ✅ VALIDAÇÃO: NÃO é email personalizado se última resposta foi relatório
         if ultima_resposta_texto:
+            resposta_upper = ultima_resposta_texto.upper()
             tem_relatorio = (
                 '[REPORT_META:' in ultima_resposta_texto or
-                'O QUE TEMOS PRA HOJE' in ultima_resposta_texto.upper() or
-                'FECHAMENTO DO DIA' in ultima_resposta_texto.upper()
+                'O QUE TEMOS PRA HOJE' in resposta_upper or
+                'FECHAMENTO DO DIA' in resposta_upper
             )
             if tem_relatorio:
                 return False  # É relatório, não email personalizado
         
-        for padrao in padroes_email:
-            if re.search(padrao, mensagem_lower):
-                return True
-        
-        return False
-    
-    def _eh_intencao_criar_duimp(self, mensagem_lower: str) -> bool:
-        """Verifica se a intenção é criar DUIMP."""
-        padroes_duimp = [
-            r'criar.*duimp',
-            r'registrar.*duimp',
-            r'gerar.*duimp',
-            r'fazer.*duimp',
-            r'montar.*duimp',
-            r'criar.*duimp.*processo',
-            r'registrar.*duimp.*processo',
-        ]
-        
-        for padrao in padroes_duimp:
-            if re.search(padrao, mensagem_lower):
-                return True
-        
-        return False
-    
-    def _eh_intencao_consultar_ncm(self, mensagem_lower: str) -> bool:
-        """Verifica se a intenção é consultar NCM."""
-        padroes_ncm = [
-            r'ncm.*para',
-            r'ncm.*de',
-            r'qual.*ncm',
-            r'classifica[çc][aã]o.*fiscal',
-            r'al[íi]quotas',
-            r'tecwin',
-        ]
-        
-        for padrao in padroes_ncm:
-            if re.search(padrao, mensagem_lower):
-                return True
-        
-        return False
-    
-    def _eh_intencao_consultar_processo(self, mensagem_lower: str) -> bool:
-        """Verifica se a intenção é consultar processo."""
-        # Padrão de processo: CATEGORIA.NUMERO/ANO (ex: DMD.0001/26)
-        padrao_processo = r'[A-Z]{2,4}\.\d{4}/\d{2}'
-        if re.search(padrao_processo, mensagem_lower):
-            return True
-        
-        padroes_consulta = [
-            r'status.*processo',
-            r'situa[çc][aã]o.*processo',
-            r'como.*est[áa].*processo',
-            r'processo.*[A-Z]{2,4}',
-        ]
-        
-        for padrao in padroes_consulta:
-            if re.search(padrao, mensagem_lower):
-                return True
-        
-        return False
+        return analise.tem('intent.email_personalizado')
     
     def _ultima_resposta_tem_relatorio(self, ultima_resposta_texto: Optional[str]) -> bool:
         """Verifica se a última resposta contém um relatório."""
         if not ultima_resposta_texto:
             return False
         
+        resposta_upper = ultima_resposta_texto.upper()
         return (
             '[REPORT_META:' in ultima_resposta_texto or
-            'O QUE TEMOS PRA HOJE' in ultima_resposta_texto.upper() or
-            'FECHAMENTO DO DIA' in ultima_resposta_texto.upper() or
-            'PROCESSOS CHEGANDO' in ultima_resposta_texto.upper() or
-            'DIs EM ANÁLISE' in ultima_resposta_texto.upper() or
-            'DUIMPs EM ANÁLISE' in ultima_resposta_texto.upper() or
-            'PENDÊNCIAS ATIVAS' in ultima_resposta_texto.upper()
+            'O QUE TEMOS PRA HOJE' in resposta_upper or
+            'FECHAMENTO DO DIA' in resposta_upper or
+            'PROCESSOS CHEGANDO' in resposta_upper or
+            'DIs EM ANÁLISE' in resposta_upper or
+            'DUIMPs EM ANÁLISE' in resposta_upper or
+            'PENDÊNCIAS ATIVAS' in resposta_upper
         )
     
-    def _extrair_keywords_enviar_relatorio(self, mensagem_lower: str) -> List[str]:
+    def _extrair_keywords_enviar_relatorio(self, analise: ResultadoIntencao) -> List[str]:
         """Extrai palavras-chave relacionadas a enviar relatório."""
         keywords = []
-        if 'envia' in mensagem_lower or 'envie' in mensagem_lower:
+        if analise.tem_gatilho('envia', 'envie'):
             keywords.append('envia')
-        if 'mande' in mensagem_lower or 'manda' in mensagem_lower:
+        if analise.tem_gatilho('mande', 'manda'):
             keywords.append('mande')
-        if 'relatorio' in mensagem_lower or 'relatório' in mensagem_lower:
+        if analise.tem_gatilho('relatorio'):
             keywords.append('relatorio')
-        if 'email' in mensagem_lower:
+        if analise.tem_gatilho('email'):
             keywords.append('email')
         return keywords
     
-    def _extrair_keywords_extrato(self, mensagem_lower: str) -> List[str]:
+    def _extrair_keywords_extrato(self, analise: ResultadoIntencao) -> List[str]:
         """Extrai palavras-chave relacionadas a extrato bancário."""
         keywords = []
-        if 'extrato' in mensagem_lower:
+        if analise.tem_gatilho('extrato'):
             keywords.append('extrato')
-        if 'banco' in mensagem_lower or 'bancario' in mensagem_lower:
+        if analise.tem_gatilho('banco', 'bancario'):
             keywords.append('banco')
-        if 'bb' in mensagem_lower:
+        if analise.tem_gatilho('bb'):
             keywords.append('bb')
-        if 'santander' in mensagem_lower:
+        if analise.tem_gatilho('santander'):
             keywords.append('santander')
         return keywords
     
-    def _extrair_keywords_email_personalizado(self, mensagem_lower: str) -> List[str]:
+    def _extrair_keywords_email_personalizado(self, analise: ResultadoIntencao) -> List[str]:
         """Extrai palavras-chave relacionadas a email personalizado."""
         keywords = []
-        if 'email' in mensagem_lower:
+        if analise.tem_gatilho('email'):
             keywords.append('email')
-        if 'sobre' in mensagem_lower:
+        if analise.tem_gatilho('sobre'):
             keywords.append('sobre')
-        if 'explicando' in mensagem_lower:
+        if analise.tem_gatilho('explicando'):
             keywords.append('explicando')
         return keywords
     
-    def _extrair_keywords_duimp(self, mensagem_lower: str) -> List[str]:
+    def _extrair_keywords_duimp(self, analise: ResultadoIntencao) -> List[str]:
         """Extrai palavras-chave relacionadas a DUIMP."""
         keywords = []
-        if 'duimp' in mensagem_lower:
+        if analise.tem_gatilho('duimp'):
             keywords.append('duimp')
-        if 'criar' in mensagem_lower or 'registrar' in mensagem_lower:
+        if analise.tem_gatilho('criar', 'registrar'):
             keywords.append('criar')
         return keywords
     
-    def _extrair_keywords_ncm(self, mensagem_lower: str) -> List[str]:
+    def _extrair_keywords_ncm(self, analise: ResultadoIntencao) -> List[str]:
         """Extrai palavras-chave relacionadas a NCM."""
         keywords = []
-        if 'ncm' in mensagem_lower:
+        if analise.tem_gatilho('ncm'):
             keywords.append('ncm')
-        if 'aliquotas' in mensagem_lower or 'alíquotas' in mensagem_lower:
+        if analise.tem_gatilho('aliquotas'):
             keywords.append('aliquotas')
-        if 'tecwin' in mensagem_lower:
+        if analise.tem_gatilho('tecwin'):
             keywords.append('tecwin')
         return keywords
     
-    def _extrair_keywords_processo(self, mensagem_lower: str) -> List[str]:
-        """Extrai palavras-chave relacionadas a processo."""
-        keywords = []
-        if 'processo' in mensagem_lower:
-            keywords.append('processo')
-        if re.search(r'[A-Z]{2,4}\.\d{4}/\d{2}', mensagem_lower):
-            keywords.append('referencia_processo')
-        return keywords
-    
     def obter_whitelist_tools(self, intent_type: IntentType) -> Optional[List[str]]:
         """
         Retorna whitelist de tools permitidas para uma intenção específica.
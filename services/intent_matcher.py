@@ -0,0 +1,287 @@
+"""
+Motor único de casamento de intenções (pré-LLM).
+
+✅ NOVO (16/10/2026): cada mensagem passava por dezenas de `re.search` com padrões inline
+(recompilados/buscados no cache do `re` a cada chamada) e por vários `mensagem.lower()`,
+repetidos em `IntentDetectionService` e `MessageIntentService` — às vezes mais de uma vez
+por mensagem. Agora:
+
+- a mensagem é normalizada UMA vez (minúsculas, sem acentos, espaços colapsados);
+- todas as palavras-gatilho literais viram UMA alternância compilada, varrida em uma passada
+  (com fechamento de literais contidos/sobrepostos: mesma semântica de `'x' in texto`);
+- cada regra regex é compilada uma vez e só roda se algum gatilho dela apareceu;
+- entidades (processo, CE, CCT, DUIMP, email, categoria) saem de UMA varredura combinada;
+- o resultado é imutável e memoizado por mensagem (o mesmo texto é analisado por vários serviços).
+
+Uso:
+    from services.intent_matcher import analisar_mensagem
+    r = analisar_mensagem("manda o relatório pro fulano@x.com")
+    r.tem('relatorio_email'), r.entidade('email')
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Collection, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def _tabela_sem_acentos() -> Dict[int, str]:
+    """Tabela `str.translate` para letras latinas acentuadas (Latin-1 + Latin Extended-A/B)."""
+    tabela = {}
+    for codigo in range(0xC0, 0x250):
+        base = "".join(ch for ch in unicodedata.normalize("NFKD", chr(codigo)) if not unicodedata.combining(ch))
+        if base != chr(codigo) and base.isascii():
+            tabela[codigo] = base
+    return tabela
+
+
+_SEM_ACENTOS = _tabela_sem_acentos()
+
+
+@lru_cache(maxsize=1024)
+def normalizar_mensagem(texto: Optional[str]) -> str:
+    """Minúsculas, sem acentos/cedilha e espaços colapsados (ex: 'Relatório  ÇÃO' → 'relatorio cao')."""
+    if not texto:
+        return ""
+    texto = str(texto).lower()
+    if not texto.isascii():
+        texto = texto.translate(_SEM_ACENTOS)
+        if not texto.isascii():  # fora da tabela (ligaduras, outros alfabetos): caminho geral
+            texto = "".join(ch for ch in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(ch))
+    return _RE_ESPACOS.sub(" ", texto).strip()
+
+
+@dataclass(frozen=True)
+class Regra:
+    """
+    Regra de intenção sobre o texto normalizado.
+
+    Args:
+        nome: identificador da regra (ex: 'extrato_bancario').
+        padrao: regex sobre o texto normalizado; None = basta um gatilho aparecer.
+        gatilhos: literais (normalizados) dos quais ao menos um precisa estar no texto para a
+            regra ser avaliada. Vazio = regra sempre avaliada (use com parcimônia).
+    """
+
+    nome: str
+    padrao: Optional[str] = None
+    gatilhos: Tuple[str, ...] = ()
+
+
+# Entidades: uma alternância com grupos nomeados (ordem = prioridade na mesma posição).
+# `email` só entra quando há '@' no texto e `palavra` (categoria avulsa) só com categorias conhecidas.
+_ENTIDADE_EMAIL = r"(?P<email>[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,})"
+_ENTIDADES_BASE = (
+    r"(?P<processo>\b[a-z0-9]{2,4}\.\d{4}/\d{2}\b)",
+    r"(?P<duimp>\b\d{2}br\d{9,11}(?:-\d+)?\b)",
+    r"(?P<ce>\b\d{10,15}\b)",
+    r"(?P<cct>\b[a-z]{3}-?\d{4,}\b)",
+)
+_ENTIDADE_PALAVRA = r"(?P<palavra>\b[a-z]{2,4}\d?\b)"
+# Siglas que nunca são prefixo de CCT nem categoria de processo
+_PALAVRAS_RESERVADAS = frozenset({"CCT", "CE", "DI", "DUIMP", "NCM"})
+
+
+@dataclass(frozen=True)
+class ResultadoIntencao:
+    """Resultado (imutável) da análise de uma mensagem."""
+
+    texto: str
+    regras: Tuple[str, ...]
+    gatilhos: FrozenSet[str]
+    entidades: Tuple[Tuple[str, str], ...] = field(default=())
+
+    def tem(self, *nomes: str) -> bool:
+        """True se alguma das regras casou."""
+        return any(nome in self.regras for nome in nomes)
+
+    def tem_gatilho(self, *gatilhos: str) -> bool:
+        """Equivalente a `any(g in texto for g in gatilhos)` (gatilhos precisam estar registrados)."""
+        return any(g in self.gatilhos for g in gatilhos)
+
+    def entidades_de(self, tipo: str) -> Tuple[str, ...]:
+        return tuple(valor for t, valor in self.entidades if t == tipo)
+
+    def entidade(self, tipo: str) -> Optional[str]:
+        for t, valor in self.entidades:
+            if t == tipo:
+                return valor
+        return None
+
+
+class IntentMatcher:
+    """Compila um conjunto de regras + entidades uma vez e analisa mensagens em uma passada."""
+
+    def __init__(self, regras: Iterable[Regra], gatilhos_extras: Iterable[str] = ()):
+        self.regras: Tuple[Regra, ...] = tuple(regras)
+        nomes = [r.nome for r in self.regras]
+        duplicados = {n for n in nomes if nomes.count(n) > 1}
+        if duplicados:
+            raise ValueError(f"Regras com nome duplicado: {sorted(duplicados)}")
+
+        literais = {g for r in self.regras for g in r.gatilhos} | set(gatilhos_extras)
+        self._gatilhos = frozenset(literais)
+        # Uma alternância com todos os literais (mais longo primeiro). `findall` não devolve
+        # ocorrências sobrepostas; para manter a semântica de `'x' in texto`:
+        # - `_contidos[g]`: literais dentro de g (ex: 'manda' em 'mandar') entram junto com g;
+        # - `_sobrepostos[g]`: literais que podem começar dentro de g e terminar depois dele
+        #   (sufixo de g = prefixo do outro) são conferidos com `in` só quando g aparece.
+        ordenados = sorted(literais, key=len, reverse=True)
+        self._re_gatilhos = re.compile("|".join(re.escape(g) for g in ordenados)) if ordenados else None
+        self._contidos: Dict[str, FrozenSet[str]] = {
+            g: frozenset(h for h in literais if h != g and h in g) for g in literais
+        }
+        self._sobrepostos: Dict[str, Tuple[str, ...]] = {
+            g: tuple(
+                h for h in literais
+                if h not in g and any(g.endswith(h[:k]) for k in range(1, min(len(g), len(h))))
+            )
+            for g in literais
+        }
+        self._compiladas: Tuple[Tuple[Regra, Optional[re.Pattern]], ...] = tuple(
+            (r, re.compile(r.padrao) if r.padrao else None) for r in self.regras
+        )
+        # Variantes da varredura de entidades: (tem '@', tem categorias) → regex
+        self._re_entidades = {
+            (com_email, com_palavra): re.compile(
+                "|".join(
+                    ((_ENTIDADE_EMAIL,) if com_email else ())
+                    + _ENTIDADES_BASE
+                    + ((_ENTIDADE_PALAVRA,) if com_palavra else ())
+                )
+            )
+            for com_email in (False, True)
+            for com_palavra in (False, True)
+        }
+
+    @property
+    def gatilhos(self) -> FrozenSet[str]:
+        return self._gatilhos
+
+    def _varrer_gatilhos(self, texto: str) -> FrozenSet[str]:
+        if self._re_gatilhos is None or not texto:
+            return frozenset()
+        encontrados = set(self._re_gatilhos.findall(texto))
+        for g in tuple(encontrados):
+            encontrados.update(self._contidos[g])
+            for h in self._sobrepostos[g]:
+                if h not in encontrados and h in texto:
+                    encontrados.add(h)
+        return frozenset(encontrados)
+
+    def _varrer_entidades(self, texto: str, categorias: Optional[Collection[str]]) -> Tuple[Tuple[str, str], ...]:
+        entidades: List[Tuple[str, str]] = []
+        vistos = set()
+
+        def _add(tipo: str, valor: str) -> None:
+            if (tipo, valor) not in vistos:
+                vistos.add((tipo, valor))
+                entidades.append((tipo, valor))
+
+        padrao = self._re_entidades[("@" in texto, bool(categorias))]
+        for m in padrao.finditer(texto):
+            tipo, valor = m.lastgroup, m.group()
+            if tipo == "email":
+                _add("email", valor)
+            elif tipo == "processo":
+                ref = valor.upper()
+                _add("processo", ref)
+                _add("categoria", ref.split(".")[0])
+            elif tipo == "duimp":
+                _add("duimp", valor.upper())
+            elif tipo == "ce":
+                _add("ce", valor)
+            elif tipo == "cct":
+                prefixo = valor[:3].upper()
+                if prefixo in _PALAVRAS_RESERVADAS or (categorias and prefixo in categorias):
+                    continue  # ex: 'alh0176' é processo sem ponto, não CCT
+                _add("cct", valor.upper())
+            elif categorias:
+                palavra = valor.upper()
+                if palavra in categorias and palavra not in _PALAVRAS_RESERVADAS:
+                    _add("categoria", palavra)
+        return tuple(entidades)
+
+    def analisar(self, mensagem: Optional[str], categorias: Optional[Collection[str]] = None) -> ResultadoIntencao:
+        """
+        Analisa a mensagem: regras que casaram (na ordem de declaração), gatilhos e entidades.
+
+        Args:
+            mensagem: texto do usuário (normalizado aqui).
+            categorias: categorias de processo conhecidas (MAIÚSCULAS). Sem elas, 'categoria'
+                só vem de referências de processo e CCTs não são filtrados contra categorias.
+        """
+        texto = normalizar_mensagem(mensagem)
+        gatilhos = self._varrer_gatilhos(texto)
+        casadas = []
+        for regra, compilada in self._compiladas:
+            if regra.gatilhos and not any(g in gatilhos for g in regra.gatilhos):
+                continue
+            if compilada is None or compilada.search(texto):
+                casadas.append(regra.nome)
+        return ResultadoIntencao(
+            texto=texto,
+            regras=tuple(casadas),
+            gatilhos=gatilhos,
+            entidades=self._varrer_entidades(texto, categorias),
+        )
+
+
+# ---------------------------------------------------------------------- regras registradas
+_REGRAS: List[Regra] = []
+_EXTRAS: set = set()
+_matcher: Optional[IntentMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def registrar_regras(regras: Sequence[Regra], gatilhos_extras: Iterable[str] = ()) -> None:
+    """
+    Registra regras no matcher compartilhado (chamado no import dos serviços de intenção).
+
+    Nomes já registrados são ignorados (import repetido não duplica regra).
+    """
+    global _matcher
+    with _matcher_lock:
+        existentes = {r.nome for r in _REGRAS}
+        novas = [r for r in regras if r.nome not in existentes]
+        extras = set(gatilhos_extras)
+        if not novas and extras <= _EXTRAS:
+            return
+        _REGRAS.extend(novas)
+        _EXTRAS.update(extras)
+        _matcher = None
+        _analisar_cache.cache_clear()
+
+
+def obter_intent_matcher() -> IntentMatcher:
+    """Matcher compartilhado com todas as regras registradas (compilado sob demanda, uma vez)."""
+    global _matcher
+    matcher = _matcher
+    if matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = IntentMatcher(_REGRAS, _EXTRAS)
+            matcher = _matcher
+    return matcher
+
+
+@lru_cache(maxsize=256)
+def _analisar_cache(mensagem: str) -> ResultadoIntencao:
+    return obter_intent_matcher().analisar(mensagem)
+
+
+def analisar_mensagem(mensagem: Optional[str], categorias: Optional[Collection[str]] = None) -> ResultadoIntencao:
+    """
+    Analisa a mensagem com o matcher compartilhado.
+
+    Sem `categorias` o resultado é memoizado por texto (vários serviços analisam a mesma mensagem).
+    """
+    if categorias:
+        return obter_intent_matcher().analisar(mensagem, categorias)
+    return _analisar_cache(mensagem or "")
@@ -46,8 +46,10 @@ def criar_tabelas_legislacao(cursor: sqlite3.Cursor) -> None:
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_legislacao ON legislacao_trecho(legislacao_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_artigo ON legislacao_trecho(numero_artigo)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_ordem ON legislacao_trecho(legislacao_id, ordem)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_texto ON legislacao_trecho(texto)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_texto_com_artigo ON legislacao_trecho(texto_com_artigo)")
+    # Índices B-tree sobre texto não atendem `LIKE '%termo%'` e só encareciam a importação
+    # (a busca por palavra-chave usa `legislacao_trecho_fts`)
+    cursor.execute("DROP INDEX IF EXISTS idx_legislacao_trecho_texto")
+    cursor.execute("DROP INDEX IF EXISTS idx_legislacao_trecho_texto_com_artigo")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_legislacao_trecho_revogado ON legislacao_trecho(revogado)")
 
     # MIGRAÇÃO: adicionar coluna revogado se não existir (para instalações antigas)
@@ -56,3 +58,71 @@ def criar_tabelas_legislacao(cursor: sqlite3.Cursor) -> None:
     except sqlite3.OperationalError:
         pass  # Coluna já existe
 
+    criar_indice_fts_legislacao(cursor)
+
+
+def criar_indice_fts_legislacao(cursor: sqlite3.Cursor) -> bool:
+    """
+    Cria o índice full-text (FTS5) dos trechos de legislação.
+
+    `legislacao_trecho_fts` é uma tabela de conteúdo externo sobre `legislacao_trecho` (rowid = id):
+    indexa texto, texto_com_artigo e referencia; legislacao_id/ordem/numero_artigo ficam UNINDEXED
+    (disponíveis no resultado, sem entrar no índice invertido). Triggers mantêm o índice em sincronia.
+
+    Returns:
+        True se o índice está disponível (SQLite compilado com FTS5), False caso contrário.
+    """
+    try:
+        cursor.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS legislacao_trecho_fts USING fts5(
+                texto,
+                texto_com_artigo,
+                referencia,
+                legislacao_id UNINDEXED,
+                ordem UNINDEXED,
+                numero_artigo UNINDEXED,
+                content='legislacao_trecho',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3 4'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5: a busca continua no caminho LIKE
+        return False
+
+    colunas = "texto, texto_com_artigo, referencia, legislacao_id, ordem, numero_artigo"
+    novos = "new.texto, new.texto_com_artigo, new.referencia, new.legislacao_id, new.ordem, new.numero_artigo"
+    antigos = "old.texto, old.texto_com_artigo, old.referencia, old.legislacao_id, old.ordem, old.numero_artigo"
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS legislacao_trecho_fts_ai AFTER INSERT ON legislacao_trecho BEGIN
+            INSERT INTO legislacao_trecho_fts(rowid, {colunas}) VALUES (new.id, {novos});
+        END
+        """
+    )
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS legislacao_trecho_fts_ad AFTER DELETE ON legislacao_trecho BEGIN
+            INSERT INTO legislacao_trecho_fts(legislacao_trecho_fts, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+        END
+        """
+    )
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS legislacao_trecho_fts_au AFTER UPDATE ON legislacao_trecho BEGIN
+            INSERT INTO legislacao_trecho_fts(legislacao_trecho_fts, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+            INSERT INTO legislacao_trecho_fts(rowid, {colunas}) VALUES (new.id, {novos});
+        END
+        """
+    )
+
+    # Legislações importadas antes do índice existir: indexar tudo uma vez
+    cursor.execute("SELECT COUNT(*) FROM legislacao_trecho_fts_docsize")
+    if not cursor.fetchone()[0]:
+        cursor.execute("SELECT COUNT(*) FROM legislacao_trecho")
+        if cursor.fetchone()[0]:
+            cursor.execute("INSERT INTO legislacao_trecho_fts(legislacao_trecho_fts) VALUES ('rebuild')")
+    return True
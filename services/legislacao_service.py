@@ -1121,18 +1121,22 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
         self,
         termos: List[str],
         limit: int = 20,
-        incluir_revogados: bool = False
+        incluir_revogados: bool = False,
+        proximidade: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Busca trechos em TODAS as legislações do banco por palavra-chave.
         
         ✅ MELHORADO: Agora expande termos automaticamente (plural/singular, variações).
-        ✅ MELHORADO: Busca direta no banco para melhor performance.
+        ✅ NOVO (16/10/2026): Usa o índice FTS5 `legislacao_trecho_fts` (ranking bm25, trecho
+        destacado com snippet(), frases e proximidade). Sem FTS5, cai na busca LIKE.
         
         Args:
-            termos: Lista de termos para buscar
+            termos: Lista de termos para buscar (termos com várias palavras são buscados como frase)
             limit: Limite de resultados por legislação (padrão: 20)
             incluir_revogados: Se True, inclui trechos revogados
+            proximidade: Se informado (e houver 2+ termos), exige todos os termos a no máximo
+                N palavras de distância (NEAR) em vez de qualquer um deles
             
         Returns:
             Lista de dicts com trechos encontrados, cada um contendo:
@@ -1143,209 +1147,41 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
             - texto_com_artigo: str
             - numero_artigo: int
             - revogado: bool
+            - destaque: str (trecho com os termos em **negrito**; só em resultados diretos via FTS5)
+            - relevancia: float (bm25; menor = mais relevante; só em resultados diretos via FTS5)
         """
         try:
             # ✅ MELHORADO: Expandir termos (plural/singular, variações)
             termos_expandidos = self._expandir_termos_busca(termos)
             logger.info(f"[LEGISLACAO] Termos originais: {termos} → Expandidos: {termos_expandidos}")
             
-            # 1. Buscar todas as legislações do banco
             conn = get_db_connection()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
-            cursor.execute('''
-                SELECT id, tipo_ato, numero, ano, sigla_orgao, titulo_oficial
-                FROM legislacao
-                ORDER BY tipo_ato, numero, ano
-            ''')
+            cursor.execute('SELECT COUNT(*) FROM legislacao')
+            total_legislacoes = cursor.fetchone()[0]
             
-            legislacoes = cursor.fetchall()
-            
-            if not legislacoes:
+            if not total_legislacoes:
                 conn.close()
                 logger.info("[LEGISLACAO] Nenhuma legislação encontrada no banco")
                 return []
             
-            logger.info(f"[LEGISLACAO] Buscando '{', '.join(termos)}' (expandido: '{', '.join(termos_expandidos)}') em {len(legislacoes)} legislação(ões)")
+            logger.info(f"[LEGISLACAO] Buscando '{', '.join(termos)}' (expandido: '{', '.join(termos_expandidos)}') em {total_legislacoes} legislação(ões)")
             
             # ✅ MELHORADO: Busca hierárquica contextual
             # 1. Buscar trechos que contêm o termo diretamente
             # 2. Identificar títulos/capítulos/seções que contêm o termo
             # 3. Incluir TODOS os artigos abaixo desses títulos/capítulos (contexto hierárquico)
-            
-            todos_trechos = []
-            ordens_titulos_capitulos_encontrados = {}  # {legislacao_id: [ordens dos títulos/capítulos]}
-            
-            # Construir condições de busca para todos os termos expandidos
-            conditions = []
-            params = []
-            
-            for termo in termos_expandidos:
-                termo_lower = termo.lower()
-                # Buscar em texto, texto_com_artigo E referencia
-                conditions.append('(LOWER(texto) LIKE ? OR LOWER(texto_com_artigo) LIKE ? OR LOWER(referencia) LIKE ?)')
-                params.extend([f'%{termo_lower}%', f'%{termo_lower}%', f'%{termo_lower}%'])
-            
-            # Filtro de revogados
-            filtro_revogado = '' if incluir_revogados else 'AND revogado = 0'
-            
-            # ETAPA 1: Buscar trechos que contêm o termo diretamente
-            query_direta = f'''
-                SELECT 
-                    lt.referencia, 
-                    lt.tipo_trecho, 
-                    lt.texto, 
-                    lt.texto_com_artigo, 
-                    lt.ordem, 
-                    lt.numero_artigo, 
-                    lt.revogado,
-                    lt.legislacao_id,
-                    l.tipo_ato,
-                    l.numero,
-                    l.ano,
-                    l.sigla_orgao,
-                    l.titulo_oficial
-                FROM legislacao_trecho lt
-                JOIN legislacao l ON lt.legislacao_id = l.id
-                WHERE ({' OR '.join(conditions)}) {filtro_revogado}
-                ORDER BY l.tipo_ato, l.numero, l.ano, lt.ordem
-            '''
-            
-            cursor.execute(query_direta, params)
-            rows_diretos = cursor.fetchall()
-            
-            # ETAPA 2: Identificar artigos que mencionam títulos/capítulos sobre o assunto
-            # Estratégia: Artigos que mencionam "neste Título", "neste Capítulo" + o termo
-            # indicam que estão dentro de um contexto hierárquico sobre o assunto
-            
-            artigos_em_contexto_hierarquico = {}  # {legislacao_id: [ordens]}
-            
-            for termo in termos_expandidos:
-                termo_lower = termo.lower()
-                
-                # Buscar artigos que mencionam "neste Título/Capítulo" E o termo
-                # Isso indica que o artigo está dentro de um título/capítulo sobre o assunto
-                query_contexto = f'''
-                    SELECT 
-                        lt.legislacao_id,
-                        lt.ordem,
-                        lt.referencia,
-                        lt.numero_artigo
-                    FROM legislacao_trecho lt
-                    JOIN legislacao l ON lt.legislacao_id = l.id
-                    WHERE (
-                        LOWER(lt.texto) LIKE ?  -- Contém o termo
-                        AND (
-                            LOWER(lt.texto) LIKE '%neste título%' OR
-                            LOWER(lt.texto) LIKE '%neste capítulo%' OR
-                            LOWER(lt.texto) LIKE '%neste capitulo%' OR
-                            LOWER(lt.texto) LIKE '%deste título%' OR
-                            LOWER(lt.texto) LIKE '%deste capítulo%' OR
-                            LOWER(lt.texto) LIKE '%deste capitulo%' OR
-                            LOWER(lt.texto) LIKE '%do título%' OR
-                            LOWER(lt.texto) LIKE '%do capítulo%' OR
-                            LOWER(lt.texto) LIKE '%do capitulo%'
-                        )
-                    ) {filtro_revogado}
-                    ORDER BY lt.legislacao_id, lt.ordem
-                '''
-                
-                cursor.execute(query_contexto, [f'%{termo_lower}%'])
-                rows_contexto = cursor.fetchall()
-                
-                for row_ctx in rows_contexto:
-                    leg_id = row_ctx['legislacao_id']
-                    ordem = row_ctx['ordem']
-                    numero_artigo = row_ctx['numero_artigo']
-                    
-                    if leg_id not in artigos_em_contexto_hierarquico:
-                        artigos_em_contexto_hierarquico[leg_id] = []
-                    
-                    # Agrupar por artigo (não por ordem individual)
-                    if numero_artigo and numero_artigo not in [a.get('artigo') for a in artigos_em_contexto_hierarquico[leg_id] if isinstance(a, dict)]:
-                        artigos_em_contexto_hierarquico[leg_id].append({
-                            'artigo': numero_artigo,
-                            'ordem_inicio': ordem,
-                            'referencia': row_ctx['referencia']
-                        })
-                        logger.info(f"[LEGISLACAO] ✅ Artigo em contexto hierárquico: {row_ctx['referencia']} (artigo {numero_artigo}, ordem: {ordem})")
-            
-            # Converter para formato compatível com a lógica existente
-            for leg_id, artigos in artigos_em_contexto_hierarquico.items():
-                if leg_id not in ordens_titulos_capitulos_encontrados:
-                    ordens_titulos_capitulos_encontrados[leg_id] = []
-                for artigo_info in artigos:
-                    if isinstance(artigo_info, dict):
-                        # Buscar todos os trechos deste artigo (caput + parágrafos)
-                        cursor.execute('''
-                            SELECT ordem FROM legislacao_trecho
-                            WHERE legislacao_id = ? AND numero_artigo = ?
-                            ORDER BY ordem
-                        ''', (leg_id, artigo_info['artigo']))
-                        ordens_artigo = [row[0] for row in cursor.fetchall()]
-                        ordens_titulos_capitulos_encontrados[leg_id].extend(ordens_artigo)
-            
-            # ETAPA 3: Para cada título/capítulo encontrado, buscar TODOS os artigos abaixo dele
-            artigos_contextuais = []
-            
-            for leg_id, ordens_titulos in ordens_titulos_capitulos_encontrados.items():
-                for ordem_titulo in ordens_titulos:
-                    # Buscar o próximo título/capítulo (ou fim da legislação) para delimitar o escopo
-                    cursor.execute('''
-                        SELECT ordem FROM legislacao_trecho
-                        WHERE legislacao_id = ? 
-                          AND ordem > ?
-                          AND (
-                              LOWER(referencia) LIKE '%título%' OR
-                              LOWER(referencia) LIKE '%capítulo%' OR
-                              LOWER(referencia) LIKE '%capitulo%' OR
-                              LOWER(referencia) LIKE '%seção%' OR
-                              LOWER(referencia) LIKE '%secao%'
-                          )
-                        ORDER BY ordem ASC
-                        LIMIT 1
-                    ''', (leg_id, ordem_titulo))
-                    
-                    proximo_titulo = cursor.fetchone()
-                    ordem_fim = proximo_titulo[0] if proximo_titulo else 999999  # Se não tem próximo, pegar até o fim
-                    
-                    # Buscar TODOS os artigos entre este título e o próximo
-                    cursor.execute('''
-                        SELECT 
-                            lt.referencia, 
-                            lt.tipo_trecho, 
-                            lt.texto, 
-                            lt.texto_com_artigo, 
-                            lt.ordem, 
-                            lt.numero_artigo, 
-                            lt.revogado,
-                            lt.legislacao_id,
-                            l.tipo_ato,
-                            l.numero,
-                            l.ano,
-                            l.sigla_orgao,
-                            l.titulo_oficial
-                        FROM legislacao_trecho lt
-                        JOIN legislacao l ON lt.legislacao_id = l.id
-                        WHERE lt.legislacao_id = ?
-                          AND lt.ordem > ?
-                          AND lt.ordem < ?
-                          {filtro_revogado}
-                        ORDER BY lt.ordem
-                    '''.format(filtro_revogado=filtro_revogado), (leg_id, ordem_titulo, ordem_fim))
-                    
-                    rows_contextuais = cursor.fetchall()
-                    
-                    for row_ctx in rows_contextuais:
-                        # Marcar como contextual (não contém o termo diretamente, mas está no contexto)
-                        artigos_contextuais.append({
-                            'row': row_ctx,
-                            'contextual': True,
-                            'titulo_origem': ordem_titulo
-                        })
-                    
-                    logger.info(f"[LEGISLACAO] ✅ Adicionados {len(rows_contextuais)} artigos contextuais do título/capítulo (ordem {ordem_titulo})")
+            try:
+                rows_diretos, artigos_contextuais = self._buscar_trechos_fts(
+                    cursor, termos, termos_expandidos, incluir_revogados, proximidade
+                )
+            except sqlite3.OperationalError as e:
+                if 'legislacao_trecho_fts' not in str(e) and 'fts5' not in str(e).lower():
+                    raise
+                logger.warning(f"[LEGISLACAO] Índice FTS5 indisponível ({e}). Usando busca LIKE.")
+                rows_diretos, artigos_contextuais = self._buscar_trechos_like(cursor, termos_expandidos, incluir_revogados)
             
             conn.close()
             
@@ -1374,8 +1210,10 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
                     trechos_unicos[chave] = artigo_ctx
             
             # ETAPA 5: Formatar resultados
+            todos_trechos = []
             for chave, dados in trechos_unicos.items():
                 row = dados['row']
+                colunas = row.keys()
                 trecho_completo = {
                     'legislacao_info': {
                         'tipo_ato': row['tipo_ato'],
@@ -1393,17 +1231,11 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
                     'revogado': bool(row['revogado']),
                     'contextual': dados.get('contextual', False)  # ✅ NOVO: Flag indicando se é contextual
                 }
+                if not dados.get('contextual') and 'destaque' in colunas:
+                    trecho_completo['destaque'] = row['destaque']
+                    trecho_completo['relevancia'] = row['relevancia']
                 todos_trechos.append(trecho_completo)
             
-            # Ordenar por legislação e ordem, priorizando diretos sobre contextuais
-            todos_trechos.sort(key=lambda x: (
-                x['legislacao_info']['tipo_ato'],
-                x['legislacao_info']['numero'],
-                x['legislacao_info']['ano'],
-                x.get('contextual', False),  # Diretos primeiro (False < True)
-                x['ordem']
-            ))
-            
             # Aplicar limite se especificado
             # ✅ MELHORADO: Aplicar limite de forma inteligente
             # - Se há muitos contextuais, aumentar o limite para incluir alguns
@@ -1417,13 +1249,28 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
                 if contextuais_count > 0 and diretos_count > 0:
                     # Limite mínimo: incluir todos os diretos + até 30% de contextuais
                     limit_minimo = diretos_count + int(contextuais_count * 0.3)
-                    limit_total = max(limit * len(legislacoes) if legislacoes else limit * 10, limit_minimo)
+                    limit_total = max(limit * total_legislacoes, limit_minimo)
                 else:
-                    limit_total = limit * len(legislacoes) if legislacoes else limit * 10
+                    limit_total = limit * total_legislacoes
                 
+                # Corte por relevância: diretos (bm25) antes de contextuais
+                todos_trechos.sort(key=lambda x: (
+                    x.get('contextual', False),
+                    x.get('relevancia', 0.0),
+                    x['ordem']
+                ))
                 todos_trechos = todos_trechos[:limit_total]
             
-            logger.info(f"[LEGISLACAO] ✅ Encontrados {len(todos_trechos)} trechos (diretos + contextuais) em {len(legislacoes)} legislação(ões)")
+            # Ordenar por legislação e ordem, priorizando diretos sobre contextuais
+            todos_trechos.sort(key=lambda x: (
+                x['legislacao_info']['tipo_ato'],
+                x['legislacao_info']['numero'],
+                x['legislacao_info']['ano'],
+                x.get('contextual', False),  # Diretos primeiro (False < True)
+                x['ordem']
+            ))
+            
+            logger.info(f"[LEGISLACAO] ✅ Encontrados {len(todos_trechos)} trechos (diretos + contextuais) em {total_legislacoes} legislação(ões)")
             
             return todos_trechos
             
@@ -1431,6 +1278,366 @@ Sua resposta deve ser APENAS a URL ou "NAO_ENCONTREI", sem nenhum texto adiciona
             logger.error(f"[LEGISLACAO] Erro ao buscar em todas as legislações: {e}", exc_info=True)
             return []
     
+    @staticmethod
+    def _frase_fts(termo: str, prefixo: bool = True) -> Optional[str]:
+        """Converte um termo em frase FTS5 (`"sanção pecuniária"*`); None se não sobra palavra."""
+        palavras = re.findall(r'\w+', termo.lower())
+        if not palavras:
+            return None
+        frase = '"' + ' '.join(palavras) + '"'
+        return frase + '*' if prefixo else frase
+    
+    def _montar_consulta_fts(self, termos: List[str], termos_expandidos: List[str], proximidade: Optional[int]) -> Optional[str]:
+        """
+        Monta a expressão MATCH do FTS5.
+        
+        - Padrão: qualquer termo expandido, como frase com prefixo (equivalente ao antigo `LIKE '%termo%'`
+          restrito a início de palavra: "multa" casa "multas"/"multado", mas não "fumultar")
+        - Com `proximidade`: NEAR(termo1 termo2 ..., N) sobre os termos originais
+        """
+        if proximidade and len(termos) > 1:
+            frases = [f for f in (self._frase_fts(t) for t in termos) if f]
+            if len(frases) > 1:
+                return f"NEAR({' '.join(frases)}, {int(proximidade)})"
+        frases = []
+        for termo in termos_expandidos:
+            frase = self._frase_fts(termo)
+            if frase and frase not in frases:
+                frases.append(frase)
+        return ' OR '.join(frases) if frases else None
+    
+    def _buscar_trechos_fts(
+        self,
+        cursor: sqlite3.Cursor,
+        termos: List[str],
+        termos_expandidos: List[str],
+        incluir_revogados: bool,
+        proximidade: Optional[int] = None
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        Busca trechos via `legislacao_trecho_fts`.
+        
+        Returns:
+            (linhas diretas ordenadas por bm25, trechos contextuais [{'row', 'contextual', 'titulo_origem'}])
+        """
+        consulta = self._montar_consulta_fts(termos, termos_expandidos, proximidade)
+        if not consulta:
+            return [], []
+        filtro_revogado = '' if incluir_revogados else 'AND lt.revogado = 0'
+        colunas_trecho = '''
+                lt.referencia, 
+                lt.tipo_trecho, 
+                lt.texto, 
+                lt.texto_com_artigo, 
+                lt.ordem, 
+                lt.numero_artigo, 
+                lt.revogado,
+                lt.legislacao_id,
+                l.tipo_ato,
+                l.numero,
+                l.ano,
+                l.sigla_orgao,
+                l.titulo_oficial'''
+        
+        # ETAPA 1: trechos que contêm o termo (texto, texto_com_artigo ou referencia), por relevância.
+        # Pesos bm25: referencia > texto > texto_com_artigo (que repete o caput do artigo).
+        cursor.execute(f'''
+            SELECT {colunas_trecho},
+                snippet(legislacao_trecho_fts, 0, '**', '**', '…', 24) AS destaque,
+                bm25(legislacao_trecho_fts, 1.0, 0.5, 2.0) AS relevancia
+            FROM legislacao_trecho_fts
+            JOIN legislacao_trecho lt ON lt.id = legislacao_trecho_fts.rowid
+            JOIN legislacao l ON lt.legislacao_id = l.id
+            WHERE legislacao_trecho_fts MATCH ? {filtro_revogado}
+            ORDER BY relevancia
+        ''', (consulta,))
+        rows_diretos = cursor.fetchall()
+        
+        # ETAPA 2: artigos que mencionam "neste Título/Capítulo" (ou "deste"/"do") E o termo:
+        # estão dentro de um título/capítulo sobre o assunto
+        consulta_contexto = (
+            f'texto : (({consulta}) AND ("neste titulo" OR "neste capitulo" OR "deste titulo" '
+            f'OR "deste capitulo" OR "do titulo" OR "do capitulo"))'
+        )
+        cursor.execute(f'''
+            SELECT DISTINCT lt.legislacao_id, lt.numero_artigo
+            FROM legislacao_trecho_fts
+            JOIN legislacao_trecho lt ON lt.id = legislacao_trecho_fts.rowid
+            WHERE legislacao_trecho_fts MATCH ? {filtro_revogado}
+              AND lt.numero_artigo IS NOT NULL
+        ''', (consulta_contexto,))
+        artigos_contexto = cursor.fetchall()
+        if not artigos_contexto:
+            return rows_diretos, []
+        
+        # ETAPA 3: escopo de cada artigo = do início do artigo até o próximo título/capítulo/seção
+        legislacao_ids = sorted({row['legislacao_id'] for row in artigos_contexto})
+        marcadores = ','.join('?' for _ in legislacao_ids)
+        cursor.execute(f'''
+            SELECT lt.legislacao_id, lt.numero_artigo, MIN(lt.ordem) AS ordem_inicio
+            FROM legislacao_trecho lt
+            WHERE lt.legislacao_id IN ({marcadores})
+              AND lt.numero_artigo IS NOT NULL
+            GROUP BY lt.legislacao_id, lt.numero_artigo
+        ''', legislacao_ids)
+        inicio_artigo = {(row['legislacao_id'], row['numero_artigo']): row['ordem_inicio'] for row in cursor.fetchall()}
+        
+        cursor.execute(f'''
+            SELECT DISTINCT lt.legislacao_id, lt.ordem
+            FROM legislacao_trecho_fts
+            JOIN legislacao_trecho lt ON lt.id = legislacao_trecho_fts.rowid
+            WHERE legislacao_trecho_fts MATCH 'referencia : ("titulo" OR "capitulo" OR "secao")'
+              AND lt.legislacao_id IN ({marcadores})
+            ORDER BY lt.legislacao_id, lt.ordem
+        ''', legislacao_ids)
+        divisoes: Dict[int, List[int]] = {}
+        for row in cursor.fetchall():
+            divisoes.setdefault(row['legislacao_id'], []).append(row['ordem'])
+        
+        from bisect import bisect_right
+        intervalos: Dict[int, List[List[int]]] = {}
+        for row in artigos_contexto:
+            leg_id = row['legislacao_id']
+            ordem_titulo = inicio_artigo.get((leg_id, row['numero_artigo']))
+            if ordem_titulo is None:
+                continue
+            ordens_divisao = divisoes.get(leg_id, [])
+            pos = bisect_right(ordens_divisao, ordem_titulo)
+            ordem_fim = ordens_divisao[pos] if pos < len(ordens_divisao) else 999999  # Se não tem próximo, pegar até o fim
+            intervalos.setdefault(leg_id, []).append([ordem_titulo, ordem_fim])
+        
+        # Unir intervalos sobrepostos e buscar todos de uma vez (índice (legislacao_id, ordem))
+        condicoes = []
+        params: List[Any] = []
+        origem_por_intervalo = []
+        for leg_id, lista in intervalos.items():
+            lista.sort()
+            unidos = [lista[0]]
+            for inicio, fim in lista[1:]:
+                if inicio < unidos[-1][1]:
+                    unidos[-1][1] = max(unidos[-1][1], fim)
+                else:
+                    unidos.append([inicio, fim])
+            for inicio, fim in unidos:
+                condicoes.append('(lt.legislacao_id = ? AND lt.ordem > ? AND lt.ordem < ?)')
+                params.extend([leg_id, inicio, fim])
+                origem_por_intervalo.append((leg_id, inicio, fim))
+        if not condicoes:
+            return rows_diretos, []
+        
+        cursor.execute(f'''
+            SELECT {colunas_trecho}
+            FROM legislacao_trecho lt
+            JOIN legislacao l ON lt.legislacao_id = l.id
+            WHERE ({' OR '.join(condicoes)})
+              {filtro_revogado}
+            ORDER BY lt.legislacao_id, lt.ordem
+        ''', params)
+        
+        artigos_contextuais = []
+        for row_ctx in cursor.fetchall():
+            titulo_origem = next(
+                (inicio for leg_id, inicio, fim in origem_por_intervalo
+                 if leg_id == row_ctx['legislacao_id'] and inicio < row_ctx['ordem'] < fim),
+                None
+            )
+            artigos_contextuais.append({
+                'row': row_ctx,
+                'contextual': True,
+                'titulo_origem': titulo_origem
+            })
+        logger.info(f"[LEGISLACAO] ✅ Adicionados {len(artigos_contextuais)} artigos contextuais ({len(condicoes)} intervalo(s) de título/capítulo)")
+        
+        return rows_diretos, artigos_contextuais
+    
+    def _buscar_trechos_like(
+        self,
+        cursor: sqlite3.Cursor,
+        termos_expandidos: List[str],
+        incluir_revogados: bool
+    ) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """
+        Busca trechos com LIKE (fallback quando o SQLite não tem FTS5).
+        
+        Returns:
+            (linhas diretas, trechos contextuais [{'row', 'contextual', 'titulo_origem'}])
+        """
+        ordens_titulos_capitulos_encontrados = {}  # {legislacao_id: [ordens dos títulos/capítulos]}
+        
+        # Construir condições de busca para todos os termos expandidos
+        conditions = []
+        params = []
+        
+        for termo in termos_expandidos:
+            termo_lower = termo.lower()
+            # Buscar em texto, texto_com_artigo E referencia
+            conditions.append('(LOWER(texto) LIKE ? OR LOWER(texto_com_artigo) LIKE ? OR LOWER(referencia) LIKE ?)')
+            params.extend([f'%{termo_lower}%', f'%{termo_lower}%', f'%{termo_lower}%'])
+        
+        # Filtro de revogados
+        filtro_revogado = '' if incluir_revogados else 'AND revogado = 0'
+        
+        # ETAPA 1: Buscar trechos que contêm o termo diretamente
+        query_direta = f'''
+            SELECT 
+                lt.referencia, 
+                lt.tipo_trecho, 
+                lt.texto, 
+                lt.texto_com_artigo, 
+                lt.ordem, 
+                lt.numero_artigo, 
+                lt.revogado,
+                lt.legislacao_id,
+                l.tipo_ato,
+                l.numero,
+                l.ano,
+                l.sigla_orgao,
+                l.titulo_oficial
+            FROM legislacao_trecho lt
+            JOIN legislacao l ON lt.legislacao_id = l.id
+            WHERE ({' OR '.join(conditions)}) {filtro_revogado}
+            ORDER BY l.tipo_ato, l.numero, l.ano, lt.ordem
+        '''
+        
+        cursor.execute(query_direta, params)
+        rows_diretos = cursor.fetchall()
+        
+        # ETAPA 2: Identificar artigos que mencionam títulos/capítulos sobre o assunto
+        # Estratégia: Artigos que mencionam "neste Título", "neste Capítulo" + o termo
+        # indicam que estão dentro de um contexto hierárquico sobre o assunto
+        
+        artigos_em_contexto_hierarquico = {}  # {legislacao_id: [ordens]}
+        
+        for termo in termos_expandidos:
+            termo_lower = termo.lower()
+            
+            # Buscar artigos que mencionam "neste Título/Capítulo" E o termo
+            # Isso indica que o artigo está dentro de um título/capítulo sobre o assunto
+            query_contexto = f'''
+                SELECT 
+                    lt.legislacao_id,
+                    lt.ordem,
+                    lt.referencia,
+                    lt.numero_artigo
+                FROM legislacao_trecho lt
+                JOIN legislacao l ON lt.legislacao_id = l.id
+                WHERE (
+                    LOWER(lt.texto) LIKE ?  -- Contém o termo
+                    AND (
+                        LOWER(lt.texto) LIKE '%neste título%' OR
+                        LOWER(lt.texto) LIKE '%neste capítulo%' OR
+                        LOWER(lt.texto) LIKE '%neste capitulo%' OR
+                        LOWER(lt.texto) LIKE '%deste título%' OR
+                        LOWER(lt.texto) LIKE '%deste capítulo%' OR
+                        LOWER(lt.texto) LIKE '%deste capitulo%' OR
+                        LOWER(lt.texto) LIKE '%do título%' OR
+                        LOWER(lt.texto) LIKE '%do capítulo%' OR
+                        LOWER(lt.texto) LIKE '%do capitulo%'
+                    )
+                ) {filtro_revogado}
+                ORDER BY lt.legislacao_id, lt.ordem
+            '''
+            
+            cursor.execute(query_contexto, [f'%{termo_lower}%'])
+            rows_contexto = cursor.fetchall()
+            
+            for row_ctx in rows_contexto:
+                leg_id = row_ctx['legislacao_id']
+                ordem = row_ctx['ordem']
+                numero_artigo = row_ctx['numero_artigo']
+                
+                if leg_id not in artigos_em_contexto_hierarquico:
+                    artigos_em_contexto_hierarquico[leg_id] = []
+                
+                # Agrupar por artigo (não por ordem individual)
+                if numero_artigo and numero_artigo not in [a.get('artigo') for a in artigos_em_contexto_hierarquico[leg_id] if isinstance(a, dict)]:
+                    artigos_em_contexto_hierarquico[leg_id].append({
+                        'artigo': numero_artigo,
+                        'ordem_inicio': ordem,
+                        'referencia': row_ctx['referencia']
+                    })
+                    logger.info(f"[LEGISLACAO] ✅ Artigo em contexto hierárquico: {row_ctx['referencia']} (artigo {numero_artigo}, ordem: {ordem})")
+        
+        # Converter para formato compatível com a lógica existente
+        for leg_id, artigos in artigos_em_contexto_hierarquico.items():
+            if leg_id not in ordens_titulos_capitulos_encontrados:
+                ordens_titulos_capitulos_encontrados[leg_id] = []
+            for artigo_info in artigos:
+                if isinstance(artigo_info, dict):
+                    # Buscar todos os trechos deste artigo (caput + parágrafos)
+                    cursor.execute('''
+                        SELECT ordem FROM legislacao_trecho
+                        WHERE legislacao_id = ? AND numero_artigo = ?
+                        ORDER BY ordem
+                    ''', (leg_id, artigo_info['artigo']))
+                    ordens_artigo = [row[0] for row in cursor.fetchall()]
+                    ordens_titulos_capitulos_encontrados[leg_id].extend(ordens_artigo)
+        
+        # ETAPA 3: Para cada título/capítulo encontrado, buscar TODOS os artigos abaixo dele
+        artigos_contextuais = []
+        
+        for leg_id, ordens_titulos in ordens_titulos_capitulos_encontrados.items():
+            for ordem_titulo in ordens_titulos:
+                # Buscar o próximo título/capítulo (ou fim da legislação) para delimitar o escopo
+                cursor.execute('''
+                    SELECT ordem FROM legislacao_trecho
+                    WHERE legislacao_id = ? 
+                      AND ordem > ?
+                      AND (
+                          LOWER(referencia) LIKE '%título%' OR
+                          LOWER(referencia) LIKE '%capítulo%' OR
+                          LOWER(referencia) LIKE '%capitulo%' OR
+                          LOWER(referencia) LIKE '%seção%' OR
+                          LOWER(referencia) LIKE '%secao%'
+                      )
+                    ORDER BY ordem ASC
+                    LIMIT 1
+                ''', (leg_id, ordem_titulo))
+                
+                proximo_titulo = cursor.fetchone()
+                ordem_fim = proximo_titulo[0] if proximo_titulo else 999999  # Se não tem próximo, pegar até o fim
+                
+                # Buscar TODOS os artigos entre este título e o próximo
+                cursor.execute('''
+                    SELECT 
+                        lt.referencia, 
+                        lt.tipo_trecho, 
+                        lt.texto, 
+                        lt.texto_com_artigo, 
+                        lt.ordem, 
+                        lt.numero_artigo, 
+                        lt.revogado,
+                        lt.legislacao_id,
+                        l.tipo_ato,
+                        l.numero,
+                        l.ano,
+                        l.sigla_orgao,
+                        l.titulo_oficial
+                    FROM legislacao_trecho lt
+                    JOIN legislacao l ON lt.legislacao_id = l.id
+                    WHERE lt.legislacao_id = ?
+                      AND lt.ordem > ?
+                      AND lt.ordem < ?
+                      {filtro_revogado}
+                    ORDER BY lt.ordem
+                '''.format(filtro_revogado=filtro_revogado), (leg_id, ordem_titulo, ordem_fim))
+                
+                rows_contextuais = cursor.fetchall()
+                
+                for row_ctx in rows_contextuais:
+                    # Marcar como contextual (não contém o termo diretamente, mas está no contexto)
+                    artigos_contextuais.append({
+                        'row': row_ctx,
+                        'contextual': True,
+                        'titulo_origem': ordem_titulo
+                    })
+                
+                logger.info(f"[LEGISLACAO] ✅ Adicionados {len(rows_contextuais)} artigos contextuais do título/capítulo (ordem {ordem_titulo})")
+        
+        
+        return rows_diretos, artigos_contextuais
+    
+
     # ========== Métodos privados ==========
     
     def _extrair_texto_html(self, content: bytes, url: Optional[str] = None) -> str:
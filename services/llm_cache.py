@@ -0,0 +1,267 @@
+"""
+Cache persistente de respostas do LLM (SQLite local).
+
+✅ NOVO (16/10/2026): substitui o dict em memória do `AIService`:
+- chave estável (SHA-256) sobre prompt normalizado + modelo + temperatura + tools
+  (igual entre workers do gunicorn e entre reinícios, ao contrário de `hash()`);
+- TTL por tipo de chamada (`sugerir_ncm`, `erro`, ...);
+- limite de entradas com despejo LRU (por último acesso);
+- contadores de hit/miss por tipo;
+- modo somente-cache (`LLM_CACHE_MODO=somente_cache`) para testes: nenhum LLM é chamado.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mesmo diretório de dados do `chat_ia.db` (DB_PATH; /app/data no Docker), não o cwd
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB") or str(Path(os.getenv("DB_PATH", "chat_ia.db")).parent / "llm_cache.db")
+LLM_CACHE_MAX_ENTRADAS = int(os.getenv("LLM_CACHE_MAX_ENTRADAS", "20000"))
+# normal | somente_cache | desligado
+LLM_CACHE_MODO = os.getenv("LLM_CACHE_MODO", "normal").strip().lower()
+LLM_CACHE_TTL_PADRAO = int(os.getenv("LLM_CACHE_TTL_PADRAO", "3600"))
+
+# TTL (segundos) por tipo de chamada. Sobrescreva com LLM_CACHE_TTL_<TIPO> (ex: LLM_CACHE_TTL_SUGERIR_NCM).
+LLM_CACHE_TTLS: Dict[str, int] = {
+    "sugerir_ncm": 30 * 86400,  # mesma descrição → mesma sugestão (pedido recorrente entre usuários)
+    "erro": 7 * 86400,  # interpretação de erros do Portal Único muda pouco
+    "sugestao": 3600,
+    "validacao": 86400,
+}
+
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Normaliza texto para a chave: casefold + espaços colapsados."""
+    if not texto:
+        return ""
+    return _RE_ESPACOS.sub(" ", str(texto)).strip().casefold()
+
+
+def _json_estavel(valor: Any) -> str:
+    return json.dumps(valor, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def chave_llm(
+    tipo: str,
+    *,
+    prompt: Optional[str] = None,
+    system_prompt: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    tools: Any = None,
+    dados: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Gera chave estável (SHA-256) para uma chamada ao LLM.
+
+    `tools` pode ser a lista de schemas ou o JSON já serializado (ex: `get_available_tools_json`).
+    `dados` cobre chamadas cujo resultado não depende de prompt (ex: base de conhecimento de erros).
+    """
+    if tools is not None and not isinstance(tools, str):
+        tools = _json_estavel(tools)
+    partes = {
+        "tipo": tipo,
+        "prompt": normalizar_texto(prompt),
+        "system": normalizar_texto(system_prompt),
+        "model": model or "",
+        "temperature": None if temperature is None else round(float(temperature), 3),
+        "tools": hashlib.sha256(tools.encode("utf-8")).hexdigest() if tools else "",
+        "dados": dados or {},
+    }
+    return hashlib.sha256(_json_estavel(partes).encode("utf-8")).hexdigest()
+
+
+def ttl_para(tipo: str) -> int:
+    env = os.getenv(f"LLM_CACHE_TTL_{tipo.upper()}")
+    if env:
+        try:
+            return int(env)
+        except ValueError:
+            logger.warning(f"[LLM_CACHE] LLM_CACHE_TTL_{tipo.upper()} inválido: {env!r}")
+    return LLM_CACHE_TTLS.get(tipo, LLM_CACHE_TTL_PADRAO)
+
+
+def somente_cache() -> bool:
+    """True quando o LLM não deve ser chamado (misses caem no fallback de cada método)."""
+    return LLM_CACHE_MODO == "somente_cache"
+
+
+class LLMCache:
+    """Cache SQLite de respostas do LLM com TTL por tipo e despejo LRU."""
+
+    def __init__(self, db_path: Optional[str] = None, max_entradas: Optional[int] = None):
+        self.db_path = str(db_path or LLM_CACHE_DB)
+        self.max_entradas = max_entradas if max_entradas is not None else LLM_CACHE_MAX_ENTRADAS
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._gravacoes_desde_limpeza = 0
+        self._contadores: Dict[str, Dict[str, int]] = {}
+        self._init_db()
+
+    # ------------------------------------------------------------------ conexão
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                chave TEXT PRIMARY KEY,
+                tipo TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                expira_em REAL NOT NULL,
+                acessado_em REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_acessado ON llm_cache(acessado_em)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expira ON llm_cache(expira_em)")
+        conn.commit()
+
+    # ------------------------------------------------------------------ contadores
+    def _contar(self, tipo: str, evento: str, n: int = 1) -> None:
+        with self._lock:
+            c = self._contadores.setdefault(tipo, {"hits": 0, "misses": 0, "gravacoes": 0, "despejos": 0})
+            c[evento] = c.get(evento, 0) + n
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores por tipo + total de entradas persistidas."""
+        with self._lock:
+            por_tipo = {t: dict(c) for t, c in self._contadores.items()}
+        try:
+            entradas = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        except sqlite3.Error:
+            entradas = None
+        hits = sum(c["hits"] for c in por_tipo.values())
+        misses = sum(c["misses"] for c in por_tipo.values())
+        return {
+            "entradas": entradas,
+            "max_entradas": self.max_entradas,
+            "modo": LLM_CACHE_MODO,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "por_tipo": por_tipo,
+        }
+
+    # ------------------------------------------------------------------ leitura/escrita
+    def obter(self, chave: str, tipo: str = "geral") -> Optional[Any]:
+        if LLM_CACHE_MODO == "desligado":
+            return None
+        agora = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT valor, expira_em FROM llm_cache WHERE chave = ?", (chave,)
+            ).fetchone()
+            if row is None or row[1] <= agora:
+                self._contar(tipo, "misses")
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET acessado_em = ?, hits = hits + 1 WHERE chave = ?", (agora, chave)
+            )
+            conn.commit()
+            self._contar(tipo, "hits")
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"[LLM_CACHE] Falha ao ler cache: {e}")
+            self._contar(tipo, "misses")
+            return None
+
+    def salvar(self, chave: str, valor: Any, tipo: str = "geral", ttl: Optional[int] = None) -> None:
+        if LLM_CACHE_MODO == "desligado":
+            return
+        agora = time.time()
+        ttl = ttl_para(tipo) if ttl is None else ttl
+        try:
+            conn = self._conn()
+            conn.execute(
+                """
+                INSERT INTO llm_cache (chave, tipo, valor, criado_em, expira_em, acessado_em)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    valor = excluded.valor,
+                    criado_em = excluded.criado_em,
+                    expira_em = excluded.expira_em,
+                    acessado_em = excluded.acessado_em
+                """,
+                (chave, tipo, json.dumps(valor, ensure_ascii=False, default=str), agora, agora + ttl, agora),
+            )
+            conn.commit()
+            self._contar(tipo, "gravacoes")
+        except (sqlite3.Error, TypeError) as e:
+            logger.warning(f"[LLM_CACHE] Falha ao gravar cache: {e}")
+            return
+        with self._lock:
+            self._gravacoes_desde_limpeza += 1
+            limpar = self._gravacoes_desde_limpeza >= max(1, self.max_entradas // 20)
+            if limpar:
+                self._gravacoes_desde_limpeza = 0
+        if limpar:
+            self.despejar()
+
+    def despejar(self) -> int:
+        """Remove expirados e, se acima do limite, os menos acessados recentemente (LRU)."""
+        try:
+            conn = self._conn()
+            removidos = conn.execute("DELETE FROM llm_cache WHERE expira_em <= ?", (time.time(),)).rowcount
+            excesso = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entradas
+            if excesso > 0:
+                removidos += conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE chave IN (
+                        SELECT chave FROM llm_cache ORDER BY acessado_em ASC LIMIT ?
+                    )
+                    """,
+                    (excesso,),
+                ).rowcount
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[LLM_CACHE] Falha ao despejar entradas: {e}")
+            return 0
+        if removidos:
+            self._contar("geral", "despejos", removidos)
+        return removidos
+
+    def limpar(self, tipo: Optional[str] = None) -> None:
+        conn = self._conn()
+        if tipo:
+            conn.execute("DELETE FROM llm_cache WHERE tipo = ?", (tipo,))
+        else:
+            conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def obter_llm_cache() -> LLMCache:
+    """Instância compartilhada do cache (uma por processo, mesmo arquivo para todos os workers)."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache()
+    return _llm_cache
@@ -12,8 +12,67 @@ import re
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
+from services.intent_matcher import Regra, analisar_mensagem, registrar_regras
+
 logger = logging.getLogger(__name__)
 
+# ✅ NOVO (16/10/2026): comandos de interface/contexto como regras do motor único de intenções.
+# Padrões sobre o texto normalizado (minúsculas, sem acentos); o prefixo opcional "maike" dos
+# padrões antigos não muda o resultado de uma busca e foi omitido.
+_VERBOS_ABRIR = r'(?:abre?|abrir|mostrar|mostre|exibir|exiba)'
+_VERBOS_QUERER = r'(?:quero|preciso|vou|vamos)'
+_REGRAS_COMANDOS = (
+    Regra(
+        'comando.limpar_contexto',
+        r'^(?:(?:limpar|resetar)\s+(?:contexto|historico)|comecar\s+(?:do\s+zero|novo)|nova\s+conversa'
+        r'|esquecer\s+tudo|limpar\s+tudo|reset|clear)',
+    ),
+    # Melhorado: aceita "maike menu", "maike  menu" (com espaços), ou apenas "menu"
+    Regra(
+        'comando.menu',
+        r'\bmaike\s+menu\b'
+        rf'|(?:^|\s)maike\s+{_VERBOS_ABRIR}\s+(?:o\s+)?menu\b'
+        r'|(?:^|\s)menu\s*$'
+        r'|(?:^|\s)maike\s+(?:(?:mostrar|mostre)\s+)?opcoes\b',
+        ('menu', 'opcoes'),
+    ),
+    Regra(
+        'comando.conciliacao',
+        rf'{_VERBOS_QUERER}\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:conciliacao|conciliar)'
+        rf'|{_VERBOS_QUERER}\s+conciliar\s+banco'
+        r'|conciliacao'
+        r'|(?:quero|preciso)\s+classificar\s+lancamentos'
+        r'|classificar\s+banco',
+        ('concilia', 'classificar'),
+    ),
+    Regra(
+        'comando.sincronizacao',
+        rf'{_VERBOS_QUERER}\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:sincronizacao|sincronizar)'
+        r'|(?:quero|preciso)\s+sincronizar\s+(?:extrato|extratos|banco)'
+        r'|sincronizar\s+banco'
+        r'|sincronizacao',
+        ('sincroniza',),
+    ),
+    Regra(
+        'comando.legislacao',
+        rf'{_VERBOS_QUERER}\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:importacao|importar)\s+(?:de\s+)?legislacao'
+        rf'|{_VERBOS_ABRIR}\s+(?:a\s+)?(?:importacao|importar)\s+legislacao'
+        r'|importar\s+legislacao',
+        ('legislacao',),
+    ),
+    Regra('comando.config', r'config', ('config',)),
+)
+registrar_regras(_REGRAS_COMANDOS)
+
+# Ordem de prioridade dos comandos de interface (primeiro que casar)
+_COMANDOS_INTERFACE = (
+    ('comando.menu', {'tipo': 'menu', 'acao': 'abrir_menu'}),
+    ('comando.conciliacao', {'tipo': 'conciliação', 'acao': 'abrir_conciliação'}),
+    ('comando.sincronizacao', {'tipo': 'sincronização', 'acao': 'abrir_sincronização'}),
+    ('comando.legislacao', {'tipo': 'legislação', 'acao': 'abrir_legislação'}),
+    ('comando.config', {'tipo': 'config', 'acao': 'abrir_config'}),
+)
+
 
 class MessageIntentService:
     """Serviço para detecção e correção de intenções em mensagens"""
@@ -37,30 +96,15 @@ class MessageIntentService:
         Returns:
             True se é comando de limpar contexto, False caso contrário
         """
-        mensagem_lower = mensagem.lower().strip()
-        comandos_limpar_contexto = [
-            r'^limpar\s+contexto',
-            r'^resetar\s+contexto',
-            r'^limpar\s+hist[óo]rico',
-            r'^resetar\s+hist[óo]rico',
-            r'^come[çc]ar\s+do\s+zero',
-            r'^come[çc]ar\s+novo',
-            r'^nova\s+conversa',
-            r'^esquecer\s+tudo',
-            r'^limpar\s+tudo',
-            r'^reset',
-            r'^clear'
-        ]
-        
-        for padrao in comandos_limpar_contexto:
-            if re.search(padrao, mensagem_lower):
-                return True
-        return False
+        return analisar_mensagem(mensagem).tem('comando.limpar_contexto')
     
     def detectar_comando_interface(self, mensagem: str) -> Optional[Dict[str, Any]]:
         """
         Detecta comandos para abrir interfaces do sistema (menu, conciliação, etc.).
         
+        ✅ OTIMIZADO (16/10/2026): padrões compilados uma vez no `services/intent_matcher.py`
+        (a mesma mensagem é checada pelo core e pelo ChatService; a análise é memoizada).
+        
         Args:
             mensagem: Mensagem do usuário
             
@@ -69,74 +113,12 @@ class MessageIntentService:
             Exemplo: {'tipo': 'menu', 'acao': 'abrir_menu'}
                      {'tipo': 'conciliação', 'acao': 'abrir_conciliação'}
         """
-        mensagem_lower = mensagem.lower().strip()
-        
-        # Comandos para abrir menu
-        # Melhorado: aceita "maike menu", "maike  menu" (com espaços), ou apenas "menu"
-        comandos_menu = [
-            r'^maike\s+menu\s*$',  # Exatamente "maike menu"
-            r'^maike\s+menu\b',    # "maike menu" no início
-            r'\bmaike\s+menu\b',   # "maike menu" em qualquer lugar
-            r'(?:^|\s)maike\s+(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:o\s+)?menu\b',
-            r'(?:^|\s)menu\s*$',   # Apenas "menu" sozinho
-            r'(?:^|\s)maike\s+op[çc][õo]es\b',
-            r'(?:^|\s)maike\s+(?:mostrar|mostre)\s+op[çc][õo]es\b'
-        ]
-        
-        for padrao in comandos_menu:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"🎯 [INTENT] Comando de menu detectado! Padrão: {padrao}, Mensagem: {mensagem}")
-                return {'tipo': 'menu', 'acao': 'abrir_menu'}
-        
-        # Comandos para conciliação bancária
-        comandos_conciliação = [
-            r'(?:m?aike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:concilia[çc][ãa]o|conciliar)',
-            r'(?:m?aike|maike\s+)?(?:quero|preciso|vou|vamos)\s+conciliar\s+banco',  # ✅ Typos: "aike", "maike"
-            r'(?:m?aike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:concilia[çc][ãa]o|concilia[çc][ãa]o\s+banc[áa]ria)',
-            r'(?:m?aike|maike\s+)?(?:quero|preciso)\s+classificar\s+lan[çc]amentos',
-            r'(?:m?aike|maike\s+)?concilia[çc][ãa]o',
-            r'(?:m?aike|maike\s+)?classificar\s+banco'
-        ]
-        
-        for padrao in comandos_conciliação:
-            if re.search(padrao, mensagem_lower):
-                return {'tipo': 'conciliação', 'acao': 'abrir_conciliação'}
-        
-        # Comandos para sincronização bancária
-        comandos_sincronização = [
-            r'(?:maike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:sincroniza[çc][ãa]o|sincronizar)',
-            r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:sincroniza[çc][ãa]o|sincroniza[çc][ãa]o\s+banc[áa]ria)',
-            r'(?:maike|maike\s+)?(?:quero|preciso)\s+sincronizar\s+(?:extrato|extratos|banco)',
-            r'(?:maike|maike\s+)?sincronizar\s+banco',
-            r'(?:maike|maike\s+)?sincroniza[çc][ãa]o'
-        ]
-        
-        for padrao in comandos_sincronização:
-            if re.search(padrao, mensagem_lower):
-                return {'tipo': 'sincronização', 'acao': 'abrir_sincronização'}
-        
-        # Comandos para importar legislação
-        comandos_legislação = [
-            r'(?:maike|maike\s+)?(?:quero|preciso|vou|vamos)\s+(?:fazer|faz|realizar|realiza)?\s+(?:a\s+)?(?:importa[çc][ãa]o|importar)\s+(?:de\s+)?legisla[çc][ãa]o',
-            r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:a\s+)?(?:importa[çc][ãa]o|importar)\s+legisla[çc][ãa]o',
-            r'(?:maike|maike\s+)?importar\s+legisla[çc][ãa]o'
-        ]
-        
-        for padrao in comandos_legislação:
-            if re.search(padrao, mensagem_lower):
-                return {'tipo': 'legislação', 'acao': 'abrir_legislação'}
-        
-        # Comandos para configurações
-        comandos_config = [
-            r'(?:maike|maike\s+)?(?:abre?|abrir|mostrar|mostre|exibir|exiba)\s+(?:as\s+)?(?:configura[çc][õo]es|config)',
-            r'(?:maike|maike\s+)?configura[çc][õo]es',
-            r'(?:maike|maike\s+)?config'
-        ]
-        
-        for padrao in comandos_config:
-            if re.search(padrao, mensagem_lower):
-                return {'tipo': 'config', 'acao': 'abrir_config'}
-        
+        analise = analisar_mensagem(mensagem)
+        for regra, comando in _COMANDOS_INTERFACE:
+            if analise.tem(regra):
+                if comando['tipo'] == 'menu':
+                    logger.info(f"🎯 [INTENT] Comando de menu detectado! Mensagem: {mensagem}")
+                return dict(comando)
         return None
     
     def detectar_pergunta_ncm_produto(self, mensagem: str) -> Tuple[bool, Optional[str]]:
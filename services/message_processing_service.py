@@ -12,7 +12,7 @@ Status: ⏳ EM DESENVOLVIMENTO
 """
 
 import logging
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -520,10 +520,12 @@ class MessageProcessingService:
                 '_precisa_chat_service': True  # Flag temporária para indicar que precisa do chat_service
             }
         
-        system_prompt = self.prompt_builder.build_system_prompt(
+        # ✅ NOVO (16/10/2026): segmentos estáveis por prefixo (núcleo/política/regras antes da saudação)
+        segmentos_system = self.prompt_builder.montar_segmentos_system(
             saudacao_personalizada,
             regras_aprendidas=regras_aprendidas_texto
         )
+        system_prompt = "".join(s.texto for s in segmentos_system)
         
         # ✅ PASSO 3.5 - FASE 3.5.1 - SUB-ETAPA 3: Construir contexto_str (processo, categoria, CE/CCT)
         contexto_str = self._construir_contexto_str(
@@ -562,6 +564,15 @@ class MessageProcessingService:
             eh_fechamento_dia=eh_fechamento_dia
         )
         
+        segmentos_user = self.prompt_builder.montar_segmentos_user(
+            mensagem=mensagem,
+            contexto_str=contexto_str,
+            historico_str=historico_str,
+            acao_info=acao_info,
+            contexto_sessao=contexto_sessao_texto,
+        )
+        base_user_prompt = "".join(s.texto for s in segmentos_user)
+        
         # ✅ PASSO 3.5 - FASE 3.5.1 - SUB-ETAPA 6: Construir user_prompt e modo legislação estrita
         user_prompt, usar_tool_calling_final, system_prompt_final = self._construir_user_prompt(
             mensagem=mensagem,
@@ -573,7 +584,12 @@ class MessageProcessingService:
             eh_pedido_melhorar_email=eh_pedido_melhorar_email,
             email_para_melhorar_contexto=email_para_melhorar_contexto,
             system_prompt=system_prompt,
-            session_id=session_id  # ✅ NOVO: Passar session_id para adicionar JSON salvo
+            session_id=session_id,  # ✅ NOVO: Passar session_id para adicionar JSON salvo
+            base_user_prompt=base_user_prompt,
+        )
+        
+        prompt_metricas = self._metricas_prompt(
+            segmentos_system, segmentos_user, system_prompt, system_prompt_final, base_user_prompt, user_prompt
         )
         
         # Retornar prompts completos construídos
@@ -581,11 +597,44 @@ class MessageProcessingService:
             'system_prompt': system_prompt_final,
             'user_prompt': user_prompt,
             'usar_tool_calling': usar_tool_calling_final,
+            'prompt_metricas': prompt_metricas,
             'contexto_str': contexto_str,  # Manter para compatibilidade
             'historico_str': historico_str,  # Manter para compatibilidade
             'contexto_sessao_texto': contexto_sessao_texto,  # Manter para compatibilidade
         }
     
+    @staticmethod
+    def _metricas_prompt(
+        segmentos_system: List[Any],
+        segmentos_user: List[Any],
+        system_prompt: str,
+        system_prompt_final: str,
+        base_user_prompt: str,
+        user_prompt: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Tokens por segmento e tamanho do prefixo cacheável (para acompanhar cached_tokens da OpenAI)."""
+        try:
+            from services.prompt_builder import PromptMontado, SegmentoPrompt
+
+            if system_prompt_final != system_prompt:
+                # Modo legislação estrita substitui o system prompt inteiro
+                segmentos_system = [SegmentoPrompt("system_legislacao", system_prompt_final)]
+            segmentos_user = list(segmentos_user)
+            if user_prompt.startswith(base_user_prompt):
+                if len(user_prompt) > len(base_user_prompt):
+                    segmentos_user.append(SegmentoPrompt("instrucoes_turno", user_prompt[len(base_user_prompt):]))
+            else:
+                segmentos_user = [SegmentoPrompt("user", user_prompt)]
+            metricas = PromptMontado(system=list(segmentos_system), user=segmentos_user).metricas()
+            logger.info(
+                f"[PROMPT] ~{metricas['total_tokens']} tokens, prefixo cacheável ~{metricas['prefixo_cacheavel_tokens']} "
+                f"({metricas['prefixo_cacheavel_ratio']:.0%}) | {metricas['tokens_por_segmento']}"
+            )
+            return metricas
+        except Exception as e:
+            logger.debug(f"[PROMPT] Falha ao calcular métricas do prompt: {e}")
+            return None
+    
     def _construir_user_prompt(
         self,
         mensagem: str,
@@ -598,6 +647,7 @@ class MessageProcessingService:
         email_para_melhorar_contexto: Optional[Dict] = None,
         system_prompt: str = '',
         session_id: Optional[str] = None,  # ✅ NOVO: session_id para buscar JSON salvo
+        base_user_prompt: Optional[str] = None,
     ) -> tuple[str, bool, str]:
         """
         ✅ PASSO 3.5 - FASE 3.5.1 - SUB-ETAPA 6: Constrói user_prompt e detecta modo legislação estrita.
@@ -616,6 +666,7 @@ class MessageProcessingService:
             eh_pedido_melhorar_email: Se é pedido para melhorar email
             email_para_melhorar_contexto: Contexto do email para melhorar
             system_prompt: System prompt construído (pode ser substituído no modo estrito)
+            base_user_prompt: user_prompt base já montado em segmentos (evita remontar)
         
         Returns:
             Tuple com (user_prompt, usar_tool_calling, system_prompt_final)
@@ -635,13 +686,14 @@ class MessageProcessingService:
             logger.error("❌ PromptBuilder não está inicializado no MessageProcessingService")
             return ("", True, system_prompt)
         
-        base_user_prompt = self.prompt_builder.build_user_prompt(
-            mensagem=mensagem,
-            contexto_str=contexto_str,
-            historico_str=historico_str,
-            acao_info=acao_info,
-            contexto_sessao=contexto_sessao_texto,
-        )
+        if base_user_prompt is None:
+            base_user_prompt = self.prompt_builder.build_user_prompt(
+                mensagem=mensagem,
+                contexto_str=contexto_str,
+                historico_str=historico_str,
+                acao_info=acao_info,
+                contexto_sessao=contexto_sessao_texto,
+            )
         
         # ✅ NOVO: Adicionar resposta_base_precheck ao prompt se existir (para IA refinar)
         prompt_adicional = ""
@@ -985,10 +1037,11 @@ class MessageProcessingService:
 
         # Preparar tools (versão compacta para reduzir tokens)
         try:
-            from services.tool_definitions import get_available_tools
+            from services.tool_definitions import get_available_tools, estimar_tokens_tools
             tools = get_available_tools(compact=True, whitelist=whitelist_tools)
             tools_expostas_count = len(tools) if tools else 0
-            logger.info(f'🔍 Tool calling ativado - {tools_expostas_count} ferramentas disponíveis (compact)')
+            tokens_tools = estimar_tokens_tools(compact=True, whitelist=whitelist_tools)['total']
+            logger.info(f'🔍 Tool calling ativado - {tools_expostas_count} ferramentas disponíveis (compact, ~{tokens_tools} tokens)')
         except Exception as e:
             logger.error(f'❌ Erro ao obter tools: {e}', exc_info=True)
             tools = None
@@ -1087,7 +1140,8 @@ class MessageProcessingService:
         # ✅ CASOS ESPECIAIS: Aplicar correções automáticas antes de executar
         tool_calls = self._aplicar_correcoes_tool_calls(tool_calls, mensagem)
         
-        # Executar cada tool call
+        # Preparar cada tool call (gate/correções) e depois executar
+        chamadas: List[Tuple[str, Dict[str, Any]]] = []
         resultados_tools = []
         ultima_resposta_aguardando_email = None
         ultima_resposta_aguardando_duimp = None
@@ -1173,14 +1227,31 @@ class MessageProcessingService:
             if not executar_funcao_tool_fn:
                 logger.error(f'❌ executar_funcao_tool_fn não fornecida - não é possível executar {func_name}')
                 continue
-            
+
+            chamadas.append((func_name, func_args))
+
+        # ✅ NOVO (16/10/2026): executar as tools preparadas (consultas em paralelo, tools seriais
+        # sozinhas); resultados voltam na ordem das chamadas
+        from services.tool_calls_executor import executar_tool_calls, resultado_timeout, TOOL_CALL_TIMEOUT_SECONDS
+
+        def _executar(nome_funcao: str, argumentos: Dict[str, Any]) -> Any:
+            return executar_funcao_tool_fn(
+                nome_funcao=nome_funcao,
+                argumentos=argumentos,
+                mensagem_original=mensagem,
+                session_id=session_id
+            )
+
+        for execucao in executar_tool_calls(chamadas, _executar):
+            func_name = execucao.nome
+            if execucao.timeout:
+                resultados_tools.append(resultado_timeout(func_name, TOOL_CALL_TIMEOUT_SECONDS))
+                continue
+
             try:
-                resultado_raw = executar_funcao_tool_fn(
-                    nome_funcao=func_name,
-                    argumentos=func_args,
-                    mensagem_original=mensagem,
-                    session_id=session_id
-                )
+                if execucao.erro is not None:
+                    raise execucao.erro
+                resultado_raw = execucao.resultado
 
                 # ✅ CRÍTICO (14/01/2026): Normalizar resultado para garantir contrato sempre-dict (nunca None)
                 from services.tool_result import normalize_tool_result
@@ -9,7 +9,19 @@ Design:
 - Indexação offline (script em /scripts) gera:
   - index.faiss
   - meta.jsonl (um json por linha com campos principais + texto)
-- Em runtime: carrega índice + meta e retorna top-k candidatos.
+  - meta.offsets (offset de cada linha do meta.jsonl; uint64 little-endian + tamanho do arquivo no fim)
+- Em runtime: abre o índice + offsets e retorna top-k candidatos.
+
+Modo compartilhado (NESH_HF_SHARED=true, padrão):
+- index.faiss aberto com IO_FLAG_MMAP: páginas vêm do page cache do SO, compartilhadas entre workers
+- meta.jsonl lido sob demanda (só as linhas dos hits), sem lista de dicts na memória de cada worker
+- se meta.offsets não existir (índice antigo), é gerado uma vez varrendo o meta.jsonl
+- NESH_HF_PRELOAD=true carrega modelo/índice no import do app (com `gunicorn --preload`,
+  os workers herdam o modelo via copy-on-write em vez de cada um carregar o seu)
+
+Cache de embeddings de consulta:
+- LRU por texto normalizado (NESH_HF_QUERY_CACHE_SIZE, padrão 512): perguntas repetidas
+  de NCM/NESH não reencodam a descrição
 """
 
 from __future__ import annotations
@@ -17,9 +29,12 @@ from __future__ import annotations
 import json
 import logging
 import os
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +43,69 @@ def _env_bool(name: str, default: str = "false") -> bool:
     return str(os.getenv(name, default)).strip().lower() in ("1", "true", "yes", "y", "on")
 
 
+def normalizar_consulta(texto: str) -> str:
+    """Chave do cache de embeddings: minúsculas e espaços colapsados."""
+    return re.sub(r"\s+", " ", (texto or "").strip().lower())
+
+
+def gerar_offsets_meta(meta_path: Path, offsets_path: Path) -> int:
+    """
+    Gera `meta.offsets` para `meta.jsonl`: offset (uint64 LE) do início de cada linha não vazia,
+    seguido do tamanho do arquivo (sentinela). Retorna o número de registros.
+    """
+    import numpy as np
+
+    offsets: List[int] = []
+    pos = 0
+    with meta_path.open("rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(pos)
+            pos += len(line)
+    offsets.append(pos)
+    tmp_path = offsets_path.with_suffix(offsets_path.suffix + ".tmp")
+    np.asarray(offsets, dtype="<u8").tofile(str(tmp_path))
+    os.replace(tmp_path, offsets_path)
+    return len(offsets) - 1
+
+
 @dataclass
 class NeshHit:
     score: float
     row: Dict[str, Any]
 
 
+class _MetaSobDemanda:
+    """Leitura de registros do meta.jsonl pelo índice FAISS, via offsets (sem carregar o arquivo)."""
+
+    def __init__(self, meta_path: Path, offsets_path: Path) -> None:
+        import numpy as np
+
+        self._offsets = np.memmap(str(offsets_path), dtype="<u8", mode="r")
+        self._fd = os.open(str(meta_path), os.O_RDONLY)
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def get(self, idx: int) -> Optional[Dict[str, Any]]:
+        if idx < 0 or idx >= len(self):
+            return None
+        inicio = int(self._offsets[idx])
+        fim = int(self._offsets[idx + 1])
+        try:
+            # pread: sem seek compartilhado, seguro entre threads
+            obj = json.loads(os.pread(self._fd, fim - inicio, inicio).decode("utf-8"))
+        except Exception:
+            return None
+        return obj if isinstance(obj, dict) else None
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except Exception:
+            pass
+
+
 class NeshHfService:
     """
     Runtime retrieval em cima do índice FAISS.
@@ -44,12 +116,20 @@ class NeshHfService:
         self.index_dir = Path(os.getenv("NESH_HF_INDEX_DIR", "/app/data/nesh_hf_index"))
         self.embed_model = os.getenv("NESH_HF_EMBED_MODEL", "intfloat/multilingual-e5-base")
         self.top_k = int(os.getenv("NESH_HF_TOP_K", "15") or 15)
+        self.shared = _env_bool("NESH_HF_SHARED", "true")
+        self.query_cache_size = int(os.getenv("NESH_HF_QUERY_CACHE_SIZE", "512") or 0)
         self._loaded = False
+        self._load_lock = threading.Lock()
+        self._embed_lock = threading.Lock()
 
         self._index = None
-        self._meta: List[Dict[str, Any]] = []
+        self._meta: Any = []  # List[Dict] (modo legado) ou _MetaSobDemanda (modo compartilhado)
         self._embedder = None
 
+        self._query_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.stats = {"query_cache_hits": 0, "query_cache_misses": 0, "encodes": 0}
+
     def _deps_available(self) -> bool:
         try:
             import faiss  # type: ignore
@@ -62,6 +142,9 @@ class NeshHfService:
     def _index_paths(self) -> Tuple[Path, Path]:
         return (self.index_dir / "index.faiss", self.index_dir / "meta.jsonl")
 
+    def _offsets_path(self) -> Path:
+        return self.index_dir / "meta.offsets"
+
     def is_ready(self) -> bool:
         if not self.enabled:
             return False
@@ -73,19 +156,55 @@ class NeshHfService:
     def _load(self) -> None:
         if self._loaded:
             return
-        if not self.is_ready():
-            self._loaded = True
-            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if not self.is_ready():
+                self._loaded = True
+                return
 
-        idx_path, meta_path = self._index_paths()
+            idx_path, meta_path = self._index_paths()
+            self._index = self._read_index(idx_path)
+            self._meta = self._open_meta(meta_path)
 
+            self._loaded = True
+            logger.info(
+                f"✅ NESH_HF carregado: index={bool(self._index)}, meta={len(self._meta)} itens, "
+                f"shared={self.shared}, dir={self.index_dir}"
+            )
+
+    def _read_index(self, idx_path: Path) -> Any:
         try:
             import faiss  # type: ignore
-            self._index = faiss.read_index(str(idx_path))
+        except Exception as e:
+            logger.warning(f"⚠️ NESH_HF: faiss indisponível: {e}")
+            return None
+        if self.shared:
+            try:
+                flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_READ_ONLY", 0)
+                return faiss.read_index(str(idx_path), flags)
+            except Exception as e:
+                logger.warning(f"⚠️ NESH_HF: índice não suporta mmap ({e}); carregando em memória")
+        try:
+            return faiss.read_index(str(idx_path))
         except Exception as e:
             logger.warning(f"⚠️ NESH_HF: falha ao carregar FAISS index: {e}")
-            self._index = None
+            return None
 
+    def _open_meta(self, meta_path: Path) -> Any:
+        if self.shared:
+            offsets_path = self._offsets_path()
+            try:
+                if not offsets_path.exists() or offsets_path.stat().st_mtime < meta_path.stat().st_mtime:
+                    total = gerar_offsets_meta(meta_path, offsets_path)
+                    logger.info(f"✅ NESH_HF: meta.offsets gerado ({total} registros)")
+                return _MetaSobDemanda(meta_path, offsets_path)
+            except Exception as e:
+                logger.warning(f"⚠️ NESH_HF: offsets indisponíveis ({e}); carregando meta.jsonl em memória")
+        return self._load_meta_list(meta_path)
+
+    @staticmethod
+    def _load_meta_list(meta_path: Path) -> List[Dict[str, Any]]:
         try:
             meta: List[Dict[str, Any]] = []
             with meta_path.open("r", encoding="utf-8") as f:
@@ -99,72 +218,126 @@ class NeshHfService:
                             meta.append(obj)
                     except Exception:
                         continue
-            self._meta = meta
+            return meta
         except Exception as e:
             logger.warning(f"⚠️ NESH_HF: falha ao carregar meta.jsonl: {e}")
-            self._meta = []
+            return []
 
-        self._loaded = True
-        logger.info(
-            f"✅ NESH_HF carregado: index={bool(self._index)}, meta={len(self._meta)} itens, dir={self.index_dir}"
-        )
+    def _meta_row(self, idx: int) -> Optional[Dict[str, Any]]:
+        if isinstance(self._meta, _MetaSobDemanda):
+            return self._meta.get(idx)
+        if 0 <= idx < len(self._meta):
+            row = self._meta[idx]
+            return row if isinstance(row, dict) else None
+        return None
+
+    def _get_embedder(self) -> Any:
+        # ✅ Performance: cachear o modelo HF (evita reload a cada busca); lock evita 2 cargas simultâneas
+        if self._embedder is None:
+            with self._embed_lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._embedder = SentenceTransformer(self.embed_model)
+        return self._embedder
+
+    def preload(self) -> bool:
+        """Carrega índice, offsets e modelo antecipadamente (ex.: no master do gunicorn com --preload)."""
+        if not self.is_ready():
+            return False
+        self._load()
+        try:
+            self._get_embedder()
+        except Exception as e:
+            logger.warning(f"⚠️ NESH_HF: falha ao pré-carregar modelo: {e}")
+            return False
+        return bool(self._index)
+
+    # ------------------------------------------------------------------
+    # Embeddings de consulta (com cache LRU)
+    # ------------------------------------------------------------------
+    def _cache_get(self, chave: str) -> Optional[Any]:
+        with self._query_cache_lock:
+            vec = self._query_cache.get(chave)
+            if vec is not None:
+                self._query_cache.move_to_end(chave)
+                self.stats["query_cache_hits"] += 1
+            else:
+                self.stats["query_cache_misses"] += 1
+            return vec
+
+    def _cache_put(self, chave: str, vec: Any) -> None:
+        if self.query_cache_size <= 0:
+            return
+        with self._query_cache_lock:
+            self._query_cache[chave] = vec
+            self._query_cache.move_to_end(chave)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
 
-    def _embed_query(self, query: str) -> Optional["Any"]:
+    def encode_queries(self, descricoes: Sequence[str]) -> Optional["Any"]:
         """
-        Gera embedding para a query. Para e5, prefixar com 'query:' melhora.
+        Gera embeddings (float32, normalizados) para várias descrições de uma vez.
+
+        Descrições já vistas saem do cache; as demais são encodadas numa única chamada ao modelo.
+        A forma normalizada é só a chave do cache: o modelo recebe a primeira descrição original
+        (apenas `strip()`) de cada chave, como no embed unitário (modelos e5/XLM-R diferenciam caixa).
+        Retorna matriz (n, dim) alinhada a `descricoes`, ou None se alguma descrição estiver vazia
+        ou o modelo falhar.
         """
-        q = (query or "").strip()
-        if not q:
+        chaves = [normalizar_consulta(d) for d in descricoes]
+        if not chaves or not all(chaves):
             return None
         try:
             import numpy as np
-            from sentence_transformers import SentenceTransformer
-
-            # ✅ Performance: cachear o modelo HF (evita reload a cada busca)
-            if self._embedder is None:
-                self._embedder = SentenceTransformer(self.embed_model)
-            model = self._embedder
-            # e5: usar prefixos
-            if "e5" in (self.embed_model or "").lower():
-                q = f"query: {q}"
-            vec = model.encode([q], normalize_embeddings=True)
-            return np.asarray(vec, dtype="float32")
+
+            vetores: Dict[str, Any] = {}
+            originais: Dict[str, str] = {}
+            faltando: List[str] = []
+            for descricao, chave in zip(descricoes, chaves):
+                if chave in vetores or chave in originais:
+                    continue
+                vec = self._cache_get(chave)
+                if vec is not None:
+                    vetores[chave] = vec
+                else:
+                    originais[chave] = descricao.strip()
+                    faltando.append(chave)
+
+            if faltando:
+                model = self._get_embedder()
+                textos = [originais[chave] for chave in faltando]
+                # e5: usar prefixos
+                if "e5" in (self.embed_model or "").lower():
+                    textos = [f"query: {t}" for t in textos]
+                embs = np.asarray(model.encode(textos, normalize_embeddings=True), dtype="float32")
+                self.stats["encodes"] += len(faltando)
+                for chave, vec in zip(faltando, embs):
+                    vetores[chave] = vec
+                    self._cache_put(chave, vec)
+
+            return np.stack([vetores[c] for c in chaves]).astype("float32", copy=False)
         except Exception as e:
             logger.warning(f"⚠️ NESH_HF: falha ao embed query: {e}")
             return None
 
-    def buscar_por_descricao(self, descricao: str, *, limite: int = 5) -> List[Dict[str, Any]]:
+    def _embed_query(self, query: str) -> Optional["Any"]:
         """
-        Retorna lista de dicts no formato compatível com `db_manager._nesh_row_to_dict`.
+        Gera embedding para a query. Para e5, prefixar com 'query:' melhora.
         """
-        if not self.enabled:
-            return []
-
-        self._load()
-        if not self._index or not self._meta:
-            return []
-
-        qv = self._embed_query(descricao)
-        if qv is None:
-            return []
-
-        try:
-            k = max(1, min(int(self.top_k), 50))
-            D, I = self._index.search(qv, k)  # type: ignore
-        except Exception as e:
-            logger.warning(f"⚠️ NESH_HF: falha ao buscar no index: {e}")
-            return []
+        return self.encode_queries([query])
 
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+    def _hits_para_rows(self, scores: List[float], idxs: List[int], limite: int) -> List[Dict[str, Any]]:
         hits: List[NeshHit] = []
         try:
             # D: maior = mais similar quando IP/normalize (dependendo do index)
             # Aqui tratamos como score diretamente.
-            for score, idx in zip(D[0].tolist(), I[0].tolist()):
+            for score, idx in zip(scores, idxs):
                 if idx < 0:
                     continue
-                if idx >= len(self._meta):
-                    continue
-                row = self._meta[idx]
+                row = self._meta_row(idx)
                 if isinstance(row, dict):
                     hits.append(NeshHit(score=float(score), row=row))
         except Exception:
@@ -181,9 +354,48 @@ class NeshHfService:
             out.append(row)
         return out
 
+    def buscar_por_descricoes(self, descricoes: Sequence[str], *, limite: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Versão em lote de `buscar_por_descricao`: um encode e uma busca FAISS para todas as descrições.
+
+        Retorna uma lista de resultados por descrição (mesma ordem; lista vazia quando não há hits).
+        """
+        vazio: List[List[Dict[str, Any]]] = [[] for _ in descricoes]
+        if not self.enabled or not descricoes:
+            return vazio
+
+        self._load()
+        if not self._index or not len(self._meta):
+            return vazio
+
+        validas = [i for i, d in enumerate(descricoes) if normalizar_consulta(d)]
+        if not validas:
+            return vazio
+        qv = self.encode_queries([descricoes[i] for i in validas])
+        if qv is None:
+            return vazio
+
+        try:
+            k = max(1, min(int(self.top_k), 50))
+            D, I = self._index.search(qv, k)  # type: ignore
+        except Exception as e:
+            logger.warning(f"⚠️ NESH_HF: falha ao buscar no index: {e}")
+            return vazio
+
+        for pos, i in enumerate(validas):
+            vazio[i] = self._hits_para_rows(D[pos].tolist(), I[pos].tolist(), limite)
+        return vazio
+
+    def buscar_por_descricao(self, descricao: str, *, limite: int = 5) -> List[Dict[str, Any]]:
+        """
+        Retorna lista de dicts no formato compatível com `db_manager._nesh_row_to_dict`.
+        """
+        if not self.enabled:
+            return []
+        return self.buscar_por_descricoes([descricao], limite=limite)[0]
+
 
 def get_nesh_hf_service() -> NeshHfService:
     if not hasattr(get_nesh_hf_service, "_instance"):
         get_nesh_hf_service._instance = NeshHfService()
     return get_nesh_hf_service._instance
-
@@ -0,0 +1,307 @@
+"""
+Índice em memória das Notas Explicativas (NESH).
+
+Substitui as varreduras lineares sobre a lista completa do `nesh_chunks.json`:
+- dicts por subposição/posição/capítulo (código limpo) → lookup O(1) NCM → nota
+- índice invertido token → ids (array compacto de inteiros) para selecionar candidatos
+  da busca por descrição antes da pontuação
+
+Duas origens:
+- `NeshIndex.de_json(path)`: registros do JSON ficam em memória (modo fallback legado)
+- `NeshIndex.de_sqlite(conn)`: só os índices ficam em memória; os registros são lidos
+  de `nesh_chunks` pelo rowid quando necessários (o JSON nunca é carregado)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Intervalo mínimo entre conferências da versão de `nesh_chunks` (reimportação por outro processo)
+NESH_INDEX_VERIFICAR_SEGUNDOS = float(os.getenv("NESH_INDEX_VERIFICAR_SEGUNDOS", "30"))
+
+_TOKEN_RE = re.compile(r"\w+")
+_PALAVRA_SIMPLES_RE = re.compile(r"^\w+$")
+
+# Campos do índice invertido (o título do capítulo é indexado à parte, por capítulo)
+_CAMPOS_TEXTO = ("text", "position_title", "subposition_title")
+
+_COLUNAS_REGISTRO = (
+    "section",
+    "chapter",
+    "chapter_code",
+    "chapter_title",
+    "position_code",
+    "position_title",
+    "subposition_code",
+    "subposition_title",
+    "text",
+)
+
+
+def normalizar_codigo_nesh(code: Optional[Any]) -> Optional[str]:
+    if not code:
+        return None
+    return str(code).strip().replace(".", "").replace("-", "").replace(" ", "")
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Tokens `\\w+` em minúsculas (mesma fronteira de palavra usada pelos regex `\\b` da busca)."""
+    return _TOKEN_RE.findall((texto or "").lower())
+
+
+class NeshIndex:
+    """
+    Índices NCM → registro e token → registros sobre o corpus NESH.
+
+    Os ids são posições na lista de registros (JSON) ou rowids de `nesh_chunks` (SQLite).
+    """
+
+    def __init__(self, carregar_registros: Callable[[Sequence[int]], Dict[int, Dict[str, Any]]], fonte: str) -> None:
+        self.fonte = fonte
+        self._carregar_registros = carregar_registros
+        self.por_subposicao: Dict[str, int] = {}
+        self.por_posicao_geral: Dict[str, int] = {}
+        self.por_posicao: Dict[str, int] = {}
+        self.por_capitulo: Dict[str, array] = {}
+        self.indice_tokens: Dict[str, array] = {}
+        self.tokens_capitulo: Dict[str, set] = {}
+        self.ids = array("q")
+        self.total = 0
+        self._vocabulario: Optional[List[str]] = None
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    def _indexar(self, rid: int, registro: Dict[str, Any]) -> None:
+        self.total += 1
+        self.ids.append(rid)
+        pos = normalizar_codigo_nesh(registro.get("position_code"))
+        sub = normalizar_codigo_nesh(registro.get("subposition_code"))
+        cap = normalizar_codigo_nesh(registro.get("chapter_code"))
+
+        # Primeiro registro vence (mesma prioridade das varreduras com `return` no 1º match)
+        if sub:
+            self.por_subposicao.setdefault(sub, rid)
+        if pos:
+            self.por_posicao.setdefault(pos, rid)
+            if not registro.get("subposition_code"):
+                self.por_posicao_geral.setdefault(pos, rid)
+        if cap:
+            self.por_capitulo.setdefault(cap, array("q")).append(rid)
+            if cap not in self.tokens_capitulo:
+                self.tokens_capitulo[cap] = set(tokenizar(registro.get("chapter_title")))
+
+        tokens = set()
+        for campo in _CAMPOS_TEXTO:
+            tokens.update(tokenizar(registro.get(campo)))
+        for token in tokens:
+            postings = self.indice_tokens.get(token)
+            if postings is None:
+                postings = self.indice_tokens[token] = array("q")
+            postings.append(rid)
+
+    @classmethod
+    def de_registros(cls, registros: List[Dict[str, Any]], fonte: str = "JSON") -> "NeshIndex":
+        def carregar(ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+            return {i: registros[i] for i in ids if 0 <= i < len(registros)}
+
+        idx = cls(carregar, fonte)
+        for i, registro in enumerate(registros):
+            if isinstance(registro, dict):
+                idx._indexar(i, registro)
+        return idx
+
+    @classmethod
+    def de_json(cls, path: Path) -> "NeshIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            registros = json.load(f)
+        if not isinstance(registros, list):
+            registros = []
+        return cls.de_registros(registros, fonte="JSON")
+
+    @classmethod
+    def de_sqlite(cls, conectar: Callable[[], sqlite3.Connection]) -> "NeshIndex":
+        """
+        Constrói os índices varrendo `nesh_chunks` uma vez (sem reter o texto).
+
+        `conectar` abre uma conexão nova a cada leitura de registros (conexões SQLite
+        não são compartilhadas entre threads).
+        """
+        colunas = ", ".join(_COLUNAS_REGISTRO)
+
+        def carregar(ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+            ids = [int(i) for i in ids]
+            if not ids:
+                return {}
+            out: Dict[int, Dict[str, Any]] = {}
+            conn = conectar()
+            try:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                # Lotes de 500 (limite de variáveis do SQLite)
+                for inicio in range(0, len(ids), 500):
+                    lote = ids[inicio:inicio + 500]
+                    marcadores = ", ".join("?" for _ in lote)
+                    cursor.execute(
+                        f"SELECT rowid AS _rid, {colunas} FROM nesh_chunks WHERE rowid IN ({marcadores})",
+                        lote,
+                    )
+                    for row in cursor.fetchall():
+                        out[int(row["_rid"])] = {c: row[c] for c in _COLUNAS_REGISTRO}
+            finally:
+                conn.close()
+            return out
+
+        idx = cls(carregar, "SQLITE")
+        conn = conectar()
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT rowid AS _rid, {colunas} FROM nesh_chunks ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    idx._indexar(int(row["_rid"]), {c: row[c] for c in _COLUNAS_REGISTRO})
+        finally:
+            conn.close()
+        return idx
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def registros(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Registros na ordem de `ids` (ids inexistentes são ignorados)."""
+        ids = list(ids)
+        carregados = self._carregar_registros(ids)
+        return [carregados[i] for i in ids if i in carregados]
+
+    def registro(self, rid: int) -> Optional[Dict[str, Any]]:
+        encontrados = self.registros([rid])
+        return encontrados[0] if encontrados else None
+
+    def buscar_id_por_ncm(self, ncm: str) -> Optional[int]:
+        """
+        Mesma prioridade da busca por NCM: subposição exata (6) → nota geral da posição (4)
+        → qualquer registro da posição.
+        """
+        ncm_clean = normalizar_codigo_nesh(ncm) or ""
+        if len(ncm_clean) < 4:
+            return None
+        if len(ncm_clean) >= 6 and ncm_clean[:6] in self.por_subposicao:
+            return self.por_subposicao[ncm_clean[:6]]
+        ncm_4 = ncm_clean[:4]
+        if ncm_4 in self.por_posicao_geral:
+            return self.por_posicao_geral[ncm_4]
+        return self.por_posicao.get(ncm_4)
+
+    def buscar_por_ncm(self, ncm: str) -> Optional[Dict[str, Any]]:
+        rid = self.buscar_id_por_ncm(ncm)
+        return self.registro(rid) if rid is not None else None
+
+    def ids_por_capitulo(self, chapter_code: str) -> List[int]:
+        return list(self.por_capitulo.get(normalizar_codigo_nesh(chapter_code) or "", ()))
+
+    def _ids_por_substring(self, palavra: str) -> set:
+        if self._vocabulario is None:
+            self._vocabulario = list(self.indice_tokens)
+        ids: set = set()
+        for token in self._vocabulario:
+            if palavra in token:
+                ids.update(self.indice_tokens[token])
+        return ids
+
+    def candidatos(
+        self,
+        palavras: Iterable[str],
+        *,
+        substring: bool = False,
+        incluir_capitulo: bool = False,
+    ) -> Optional[List[int]]:
+        """
+        Ids (ordenados) de registros que contêm alguma das palavras em text/position_title/subposition_title.
+
+        - `substring=False`: palavra inteira (equivale a `\\bpalavra\\b` sobre o texto em minúsculas)
+        - `substring=True`: token que contém a palavra (equivale a `LIKE '%palavra%'` por token)
+        - `incluir_capitulo=True`: inclui também todos os registros de capítulos cujo título contém a palavra
+
+        Retorna None quando alguma palavra não é um token simples (ex.: "aço-inox");
+        nesse caso o chamador deve varrer todos os registros.
+        """
+        ids: set = set()
+        for palavra in palavras:
+            palavra = (palavra or "").lower()
+            if not _PALAVRA_SIMPLES_RE.match(palavra):
+                return None
+            if substring:
+                ids |= self._ids_por_substring(palavra)
+            else:
+                ids.update(self.indice_tokens.get(palavra, ()))
+            if incluir_capitulo:
+                for cap, tokens in self.tokens_capitulo.items():
+                    casou = any(palavra in t for t in tokens) if substring else palavra in tokens
+                    if casou:
+                        ids.update(self.por_capitulo[cap])
+        return sorted(ids)
+
+
+_INDEX: Optional[NeshIndex] = None
+_INDEX_LOCK = threading.Lock()
+_INDEX_VERSAO: Any = None
+_INDEX_VERIFICADO_EM = 0.0
+
+
+def obter_nesh_index(
+    construir: Callable[[], NeshIndex],
+    versao: Optional[Callable[[], Any]] = None,
+) -> NeshIndex:
+    """
+    Índice singleton do processo (construído uma vez, thread-safe).
+
+    Args:
+        construir: monta o índice
+        versao: opcional; devolve a versão atual da origem (ex.: MAX(rowid)/MAX(atualizado_em) de
+            `nesh_chunks`). Conferida no máximo a cada NESH_INDEX_VERIFICAR_SEGUNDOS: se mudou
+            (reimportação feita por outro processo), o índice é reconstruído. None = versão
+            desconhecida (mantém o índice atual).
+    """
+    global _INDEX, _INDEX_VERSAO, _INDEX_VERIFICADO_EM
+    if _INDEX is not None and versao is not None and time.monotonic() - _INDEX_VERIFICADO_EM >= NESH_INDEX_VERIFICAR_SEGUNDOS:
+        with _INDEX_LOCK:
+            if _INDEX is not None and time.monotonic() - _INDEX_VERIFICADO_EM >= NESH_INDEX_VERIFICAR_SEGUNDOS:
+                _INDEX_VERIFICADO_EM = time.monotonic()
+                atual = versao()
+                if atual is not None and atual != _INDEX_VERSAO:
+                    logger.info(f"🔄 nesh_chunks mudou ({_INDEX_VERSAO} → {atual}) - reconstruindo índice NESH")
+                    _INDEX = None
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                # Versão lida ANTES de construir: um import concorrente é pego na próxima conferência
+                _INDEX_VERSAO = versao() if versao is not None else None
+                _INDEX_VERIFICADO_EM = time.monotonic()
+                _INDEX = construir()
+                logger.info(
+                    f"✅ Índice NESH construído: fonte={_INDEX.fonte}, registros={_INDEX.total}, "
+                    f"tokens={len(_INDEX.indice_tokens)}"
+                )
+    return _INDEX
+
+
+def invalidar_nesh_index() -> None:
+    """Descarta o índice (ex.: após reimportar `nesh_chunks`)."""
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
@@ -28,11 +28,18 @@ def criar_tabela_nesh_chunks(cursor: sqlite3.Cursor) -> None:
             subposition_code_clean TEXT,
             subposition_title TEXT,
             text TEXT,
-            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TIMESTAMP
         )
         """
     )
 
+    # ✅ NOVO (16/10/2026): marca da última importação (o upsert atualiza linhas sem mudar rowid);
+    # junto com MAX(rowid) forma a versão que faz o índice NESH em memória ser reconstruído
+    cursor.execute("PRAGMA table_info(nesh_chunks)")
+    if "atualizado_em" not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE nesh_chunks ADD COLUMN atualizado_em TIMESTAMP")
+
     # Índices para buscas por NCM
     cursor.execute(
         "CREATE INDEX IF NOT EXISTS idx_nesh_position_clean ON nesh_chunks(position_code_clean)"
@@ -43,6 +50,9 @@ def criar_tabela_nesh_chunks(cursor: sqlite3.Cursor) -> None:
     cursor.execute(
         "CREATE INDEX IF NOT EXISTS idx_nesh_chapter_code ON nesh_chunks(chapter_code)"
     )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_nesh_atualizado_em ON nesh_chunks(atualizado_em)"
+    )
 
     logger.info("✅ Tabela 'nesh_chunks' e índices verificados/criados.")
 
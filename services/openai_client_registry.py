@@ -0,0 +1,357 @@
+"""
+Registro de clientes OpenAI compartilhados pelo processo.
+
+Antes cada chamada criava `OpenAI(api_key=..., timeout=...)`, descartando o pool httpx
+(handshake TLS novo a cada turno do chat). Aqui:
+- um cliente por (api_key, timeout, perfil), com pool httpx ajustado (keep-alive)
+- retry centralizado com backoff exponencial + jitter em 429/5xx/erro de conexão
+  (o retry interno do SDK fica desligado para não multiplicar tentativas)
+- limite de concorrência por modelo (semáforo)
+- métricas de latência por modelo: tempo até o 1º token (streaming), tempo total, tokens
+
+ENV:
+- OPENAI_HTTP_MAX_CONNECTIONS (20), OPENAI_HTTP_MAX_KEEPALIVE (10), OPENAI_HTTP_KEEPALIVE_EXPIRY (60s)
+- OPENAI_MAX_RETRIES (2), OPENAI_RETRY_BASE_SECONDS (0.5), OPENAI_RETRY_MAX_SECONDS (8)
+- OPENAI_MAX_CONCORRENCIA_POR_MODELO (8)
+- OPENAI_CONCORRENCIA_MODELOS (ex.: "gpt-5.1=4,gpt-4o=8") - sobrescreve por modelo
+- OPENAI_FILA_TIMEOUT_SEGUNDOS (120) - espera máxima por uma vaga no semáforo do modelo
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OPENAI_HTTP_MAX_CONNECTIONS = int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "20"))
+OPENAI_HTTP_MAX_KEEPALIVE = int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "10"))
+OPENAI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_RETRY_BASE_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "0.5"))
+OPENAI_RETRY_MAX_SECONDS = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "8"))
+OPENAI_MAX_CONCORRENCIA_POR_MODELO = max(1, int(os.getenv("OPENAI_MAX_CONCORRENCIA_POR_MODELO", "8")))
+OPENAI_FILA_TIMEOUT_SEGUNDOS = float(os.getenv("OPENAI_FILA_TIMEOUT_SEGUNDOS", "120"))
+
+
+class FilaOpenAIEsgotada(RuntimeError):
+    """Nenhuma vaga do limite de concorrência do modelo foi liberada dentro de OPENAI_FILA_TIMEOUT_SEGUNDOS."""
+
+
+def _parse_concorrencia_modelos(valor: str) -> Dict[str, int]:
+    limites: Dict[str, int] = {}
+    for item in (valor or "").split(","):
+        if "=" not in item:
+            continue
+        modelo, limite = item.split("=", 1)
+        try:
+            limites[modelo.strip()] = max(1, int(limite.strip()))
+        except ValueError:
+            continue
+    return limites
+
+
+OPENAI_CONCORRENCIA_MODELOS = _parse_concorrencia_modelos(os.getenv("OPENAI_CONCORRENCIA_MODELOS", ""))
+
+_clientes: Dict[Tuple[str, float, str, int], Any] = {}
+_clientes_lock = threading.Lock()
+
+_semaforos: Dict[str, threading.BoundedSemaphore] = {}
+_semaforos_lock = threading.Lock()
+
+_metricas: Dict[str, Dict[str, Any]] = {}
+_metricas_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------
+# Clientes
+# ----------------------------------------------------------------------------
+def obter_cliente_openai(
+    *,
+    api_key: Optional[str] = None,
+    timeout: float = 60.0,
+    perfil: str = "chat",
+    sdk_max_retries: int = 0,
+) -> Any:
+    """
+    Cliente `openai.OpenAI` compartilhado (thread-safe; o SDK suporta uso concorrente).
+
+    Args:
+        api_key: chave (padrão: DUIMP_AI_API_KEY)
+        timeout: timeout de leitura em segundos (faz parte da chave do registro)
+        perfil: separa pools por uso (ex.: 'chat', 'tts', 'vision', 'whisper')
+        sdk_max_retries: retry interno do SDK. 0 (padrão) quando a chamada passa por
+            `chamada_openai(...).executar` (retry centralizado); fluxos com muitas chamadas
+            diretas ao cliente (Assistants/Responses) mantêm o retry do SDK
+
+    Raises:
+        ImportError: se a biblioteca `openai` não estiver instalada (chamadores já tratam)
+    """
+    chave_api = api_key if api_key is not None else os.getenv("DUIMP_AI_API_KEY", "")
+    chave = (chave_api, float(timeout), perfil, int(sdk_max_retries))
+    cliente = _clientes.get(chave)
+    if cliente is not None:
+        return cliente
+
+    with _clientes_lock:
+        cliente = _clientes.get(chave)
+        if cliente is not None:
+            return cliente
+
+        from openai import OpenAI
+
+        kwargs: Dict[str, Any] = {"api_key": chave_api, "timeout": float(timeout), "max_retries": int(sdk_max_retries)}
+        try:
+            import httpx  # dependência do SDK openai
+
+            kwargs["http_client"] = httpx.Client(
+                timeout=httpx.Timeout(float(timeout), connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=OPENAI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=OPENAI_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+        except ImportError:
+            pass
+
+        cliente = OpenAI(**kwargs)
+        _clientes[chave] = cliente
+        logger.info(f"✅ [OPENAI] Cliente compartilhado criado (perfil={perfil}, timeout={timeout}s)")
+        return cliente
+
+
+def fechar_clientes_openai() -> None:
+    """Fecha e descarta todos os clientes (ex.: testes ou troca de chave)."""
+    with _clientes_lock:
+        for cliente in _clientes.values():
+            try:
+                cliente.close()
+            except Exception:
+                pass
+        _clientes.clear()
+
+
+# ----------------------------------------------------------------------------
+# Retry
+# ----------------------------------------------------------------------------
+def _status_http(erro: BaseException) -> Optional[int]:
+    status = getattr(erro, "status_code", None)
+    if status is None:
+        status = getattr(getattr(erro, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def erro_retentavel(erro: BaseException) -> bool:
+    """429, 5xx e falha de conexão. Timeout NÃO é retentado (dobraria a espera do usuário)."""
+    status = _status_http(erro)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    return type(erro).__name__ == "APIConnectionError"
+
+
+def espera_backoff(tentativa: int, erro: Optional[BaseException] = None) -> float:
+    """Segundos até a próxima tentativa: Retry-After quando houver, senão full jitter exponencial."""
+    headers = getattr(getattr(erro, "response", None), "headers", None) if erro is not None else None
+    if headers:
+        try:
+            retry_after = headers.get("retry-after")
+            if retry_after is not None:
+                return min(float(retry_after), OPENAI_RETRY_MAX_SECONDS)
+        except (TypeError, ValueError):
+            pass
+    teto = min(OPENAI_RETRY_MAX_SECONDS, OPENAI_RETRY_BASE_SECONDS * (2 ** tentativa))
+    return random.uniform(0, teto)
+
+
+# ----------------------------------------------------------------------------
+# Concorrência + métricas
+# ----------------------------------------------------------------------------
+def _semaforo_modelo(modelo: str) -> threading.BoundedSemaphore:
+    sem = _semaforos.get(modelo)
+    if sem is None:
+        with _semaforos_lock:
+            sem = _semaforos.get(modelo)
+            if sem is None:
+                sem = _semaforos[modelo] = threading.BoundedSemaphore(_limite_modelo(modelo))
+    return sem
+
+
+def _limite_modelo(modelo: str) -> int:
+    return OPENAI_CONCORRENCIA_MODELOS.get(modelo, OPENAI_MAX_CONCORRENCIA_POR_MODELO)
+
+
+def _registrar_metricas(chamada: "ChamadaOpenAI") -> None:
+    with _metricas_lock:
+        m = _metricas.get(chamada.modelo)
+        if m is None:
+            m = _metricas[chamada.modelo] = {
+                "chamadas": 0,
+                "erros": 0,
+                "retries": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_ms": deque(maxlen=500),
+                "ttft_ms": deque(maxlen=500),
+                "fila_ms": deque(maxlen=500),
+            }
+        m["chamadas"] += 1
+        m["erros"] += 1 if chamada.erro else 0
+        m["retries"] += chamada.retries
+        m["prompt_tokens"] += chamada.prompt_tokens or 0
+        m["completion_tokens"] += chamada.completion_tokens or 0
+        m["total_ms"].append(chamada.total_ms)
+        m["fila_ms"].append(chamada.fila_ms)
+        if chamada.ttft_ms is not None:
+            m["ttft_ms"].append(chamada.ttft_ms)
+
+
+def _percentil(valores: Deque[int], p: float) -> Optional[int]:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+def obter_metricas_openai() -> Dict[str, Dict[str, Any]]:
+    """Resumo por modelo: contagens, tokens e p50/p95 de tempo total, TTFT e espera na fila."""
+    with _metricas_lock:
+        resumo: Dict[str, Dict[str, Any]] = {}
+        for modelo, m in _metricas.items():
+            resumo[modelo] = {
+                "chamadas": m["chamadas"],
+                "erros": m["erros"],
+                "retries": m["retries"],
+                "prompt_tokens": m["prompt_tokens"],
+                "completion_tokens": m["completion_tokens"],
+                "total_ms_p50": _percentil(m["total_ms"], 0.5),
+                "total_ms_p95": _percentil(m["total_ms"], 0.95),
+                "ttft_ms_p50": _percentil(m["ttft_ms"], 0.5),
+                "ttft_ms_p95": _percentil(m["ttft_ms"], 0.95),
+                "fila_ms_p95": _percentil(m["fila_ms"], 0.95),
+            }
+        return resumo
+
+
+def resetar_metricas_openai() -> None:
+    with _metricas_lock:
+        _metricas.clear()
+
+
+class ChamadaOpenAI:
+    """
+    Escopo de uma chamada ao modelo: segura o semáforo do modelo, aplica retry e mede latência.
+
+    Uso:
+        with chamada_openai(modelo, "chat_stream") as chamada:
+            stream = chamada.executar(client.chat.completions.create, **kwargs)
+            for chunk in stream:
+                chamada.primeiro_token()
+                ...
+                chamada.registrar_uso(getattr(chunk, "usage", None))
+
+    Em generators (a vaga fica ocupada enquanto o consumidor lê o stream), prefira
+    `adquirir()` + `liberar()` num `finally`: libera a vaga também quando o consumidor
+    abandona o generator (`GeneratorExit`). `liberar()` é idempotente.
+
+    Raises:
+        FilaOpenAIEsgotada: se nenhuma vaga do modelo abrir em OPENAI_FILA_TIMEOUT_SEGUNDOS
+    """
+
+    def __init__(self, modelo: str, operacao: str = "chat") -> None:
+        self.modelo = modelo or "desconhecido"
+        self.operacao = operacao
+        self.retries = 0
+        self.erro: Optional[BaseException] = None
+        self.ttft_ms: Optional[int] = None
+        self.total_ms = 0
+        self.fila_ms = 0
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self._inicio = 0.0
+        self._ocupada = False
+        self._semaforo = _semaforo_modelo(self.modelo)
+
+    def adquirir(self) -> "ChamadaOpenAI":
+        espera_inicio = time.monotonic()
+        # ✅ NOVO (16/10/2026): espera limitada - uma vaga vazada ou modelo saturado não trava o worker
+        if not self._semaforo.acquire(timeout=OPENAI_FILA_TIMEOUT_SEGUNDOS):
+            self.fila_ms = int((time.monotonic() - espera_inicio) * 1000)
+            self.erro = FilaOpenAIEsgotada(
+                f"Limite de {_limite_modelo(self.modelo)} chamadas simultâneas ao modelo {self.modelo} "
+                f"atingido: nenhuma vaga liberada em {OPENAI_FILA_TIMEOUT_SEGUNDOS:g}s "
+                f"(ajuste OPENAI_CONCORRENCIA_MODELOS / OPENAI_FILA_TIMEOUT_SEGUNDOS)"
+            )
+            _registrar_metricas(self)
+            logger.error(f"❌ [OPENAI] {self.operacao}: {self.erro}")
+            raise self.erro
+        self._ocupada = True
+        self._inicio = time.monotonic()
+        self.fila_ms = int((self._inicio - espera_inicio) * 1000)
+        return self
+
+    def liberar(self, erro: Optional[BaseException] = None) -> None:
+        if not self._ocupada:
+            return
+        self._ocupada = False
+        self._semaforo.release()
+        self.total_ms = int((time.monotonic() - self._inicio) * 1000)
+        if erro is not None and self.erro is None:
+            self.erro = erro
+        _registrar_metricas(self)
+        logger.info(
+            f"⏱️ [OPENAI] {self.operacao} modelo={self.modelo} total={self.total_ms}ms "
+            f"ttft={self.ttft_ms if self.ttft_ms is not None else '-'}ms fila={self.fila_ms}ms "
+            f"tokens={self.prompt_tokens or 0}+{self.completion_tokens or 0} retries={self.retries}"
+            + (f" erro={type(self.erro).__name__}" if self.erro else "")
+        )
+
+    def __enter__(self) -> "ChamadaOpenAI":
+        return self.adquirir()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.liberar(exc)
+        return False
+
+    def executar(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Chama `fn` com retry (backoff com jitter) para erros retentáveis."""
+        tentativa = 0
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if tentativa >= OPENAI_MAX_RETRIES or not erro_retentavel(e):
+                    raise
+                espera = espera_backoff(tentativa, e)
+                logger.warning(
+                    f"⚠️ [OPENAI] {self.operacao} modelo={self.modelo} falhou ({_status_http(e) or type(e).__name__}); "
+                    f"tentativa {tentativa + 2}/{OPENAI_MAX_RETRIES + 1} em {espera:.2f}s"
+                )
+                time.sleep(espera)
+                tentativa += 1
+                self.retries += 1
+
+    def primeiro_token(self) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = int((time.monotonic() - self._inicio) * 1000)
+
+    def registrar_uso(self, usage: Any) -> None:
+        if not usage:
+            return
+        prompt = getattr(usage, "prompt_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+        if prompt is None and isinstance(usage, dict):
+            prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        if prompt is not None:
+            self.prompt_tokens = int(prompt)
+        if completion is not None:
+            self.completion_tokens = int(completion)
+
+
+def chamada_openai(modelo: str, operacao: str = "chat") -> ChamadaOpenAI:
+    return ChamadaOpenAI(modelo, operacao)
@@ -12,9 +12,83 @@ from services.processo_precheck_service import ProcessoPrecheckService
 from services.ncm_precheck_service import NcmPrecheckService
 from services.legislacao_precheck_service import LegislacaoPrecheckService
 from services.intent_policy_service import IntentPolicyService
+from services.intent_matcher import Regra, analisar_mensagem, registrar_regras
 
 logger = logging.getLogger(__name__)
 
+# ✅ NOVO (16/10/2026): comandos fixos do precheck como regras do motor único de intenções
+# (texto normalizado: minúsculas, sem acentos, espaços colapsados). Antes eram listas de padrões
+# percorridas com `re.search` a cada mensagem.
+_REGRAS_PRECHECK = (
+    Regra(
+        'precheck.continuar_pagamento',
+        r'(?:continue|continuar|confirmar|efetivar|autorizar|finalizar)\s+(?:o\s+)?pagamento'
+        r'|(?:confirmar|efetivar|autorizar)\s+boleto|pagar\s+(?:o\s+)?boleto',
+        ('pagamento', 'boleto'),
+    ),
+    Regra('precheck.historico_comprovante', r'\bhist|\bcomprov', ('hist', 'comprov')),
+    Regra('precheck.verbo_pagar', r'\b(?:pagar|pague|paga|quitar|quite|efetuar|efetue)\b', ('pag', 'quit', 'efetu')),
+    Regra(
+        'precheck.ver_emails',
+        r'^(?:ver|ler|leia)\s+emails?$'
+        r'|^(?:ver|ler|leia|mostrar|consultar)\s+meus\s+e-?mails$'
+        r'|^(?:mostrar|quais|verificar|consultar)\s+emails$'
+        r'|^(?:ver|ler|leia|mostrar|consultar|verificar)\s+(?:meus\s+)?e-?mails\s+(?:de\s+)?hoje$',
+        ('mail',),
+    ),
+    Regra('precheck.detalhe_email', gatilhos=('email',)),
+    Regra('precheck.registrados', r'foram\s+registrad[oa]s|foi\s+registrad[oa]|registramos|registraram', ('registra',)),
+    Regra('precheck.futuro', r'\b(?:amanha|futuro|depois)\b', ('amanha', 'futuro', 'depois')),
+    Regra('precheck.em_analise', r'analise|est[ao]o\s+analisando|est[ao]o\s+analisadas', ('analis',)),
+    Regra(
+        'precheck.extrato_bb',
+        r'extrato\s+(?:do\s+)?(?:banco\s+do\s+brasil|bb|b\.?b\.?)|(?:banco\s+do\s+brasil|bb|b\.?b\.?)\s+extrato',
+        ('extrato',),
+    ),
+    # Follow-up de extrato bancário (`_detectar_followup_extrato`)
+    Regra('precheck.extrato_documento', r'extrato.*(?:ce|cct|di|duimp|processo)', ('extrato',)),
+    Regra(
+        'precheck.followup_extrato',
+        r'detalh[ae]r?\s+(?:os|as)?\s*(?:\d+\s+)?lancamentos'
+        r'|envi(?:[ae]r?)?\s+(?:esse|o)?\s*extrato'
+        r'|mostre?\s+(?:os|as)?\s*(?:lancamentos|transacoes)',
+        ('lancamentos', 'extrato', 'transacoes'),
+    ),
+    # Proteções da normalização de termo de cliente (`_normalizar_termo_cliente`)
+    Regra(
+        'precheck.comando_especifico',
+        r'^ver\s+email|^detalhe\s+email|extrato\s+(?:do\s+)?(?:banco|santander|bb)|fechar\s+(?:o\s+)?dia'
+        r'|o\s+que\s+temos?\s+(?:pra|para)\s+hoje|fechamento|dashboard|tecwin|legislacao'
+        r'|relatorio\s+(?:fob|averbacoes)|gerar\s+pdf|pdf\s+do\s+extrato|calcul(?:ar|e\s+os)\s+impostos'
+        r'|(?:criar|montar)\s+duimp|(?:consultar|sugerir)\s+ncm',
+        (
+            'email', 'extrato', 'dia', 'hoje', 'fechamento', 'dashboard', 'tecwin', 'legislacao',
+            'relatorio', 'pdf', 'impostos', 'duimp', 'ncm',
+        ),
+    ),
+    Regra('precheck.pergunta_registrados', r'registramos|foram\s+registrados|foi\s+registrado', ('registra',)),
+    Regra(
+        'precheck.categoria_explicita',
+        r'\b(?:alh|vdm|mss|bnd|dmd|gym|sll|mv5|gps|ntm|mcd|dba|arg|upi)\b',
+        ('alh', 'vdm', 'mss', 'bnd', 'dmd', 'gym', 'sll', 'mv5', 'gps', 'ntm', 'mcd', 'dba', 'arg', 'upi'),
+    ),
+    Regra(
+        'precheck.pergunta_processo',
+        r'como\s+esta|quais\s+(?:os|as)?\s*processos|mostre\s+(?:os|as)?\s*processos|listar\s+processos'
+        r'|processos?\s+d[oe]|status\s+dos?\s*processos|situacao\s+dos?\s*processos'
+        r'|registramos|foram\s+registrados|foi\s+registrado',
+        ('como', 'processo', 'registra'),
+    ),
+)
+# Sinais explícitos de extrato bancário para o follow-up
+_SINAIS_EXTRATO = ('extrato', 'saldo', 'lancamento', 'banco', 'agencia', 'conta')
+_RE_DETALHE_EMAIL = re.compile(r'^(?:detalhes?|ler(?:\s+o)?|leia(?:\s+o)?|ver|mostrar)\s+email\s+(\d+)$')
+
+registrar_regras(
+    _REGRAS_PRECHECK,
+    gatilhos_extras=_SINAIS_EXTRATO + ('afrmm', 'hoje', 'relatorio', 'dashboard', 'resumo'),
+)
+
 
 class PrecheckService:
     """Prechecks determinísticos antes de chamar a IA.
@@ -50,6 +124,9 @@ class PrecheckService:
         """
         historico = historico or []
         mensagem_lower = mensagem.lower().strip()
+        # ✅ OTIMIZADO (16/10/2026): os comandos fixos abaixo são regras do motor único de intenções
+        # (`_REGRAS_PRECHECK`); a mensagem é analisada uma vez e compartilhada com os outros serviços.
+        analise = analisar_mensagem(mensagem)
 
         # ✅ NOVO (28/01/2026): Vendas (Make/Spalla) — roteamento determinístico para "por NF"
         # Evita depender da IA para escolher entre:
@@ -690,71 +767,57 @@ class PrecheckService:
             logger.debug(f"[PRECHECK] Erro no follow-up de dashboard: {_e_dash_followup}")
 
         # 0) ✅ NOVO: Detectar "continue o pagamento" e usar contexto salvo
-        padroes_continuar_pagamento = [
-            r'continue\s+(o\s+)?pagamento',
-            r'continuar\s+(o\s+)?pagamento',
-            r'confirmar\s+(o\s+)?pagamento',
-            r'confirmar\s+boleto',
-            r'efetivar\s+(o\s+)?pagamento',
-            r'efetivar\s+boleto',
-            r'autorizar\s+(o\s+)?pagamento',
-            r'autorizar\s+boleto',
-            r'pagar\s+(o\s+)?boleto',
-            r'finalizar\s+(o\s+)?pagamento'
-        ]
-        for padrao in padroes_continuar_pagamento:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"[PRECHECK] Comando 'continuar pagamento' detectado - mensagem: '{mensagem_lower}'")
-                logger.info(f"[PRECHECK] session_id disponível: {session_id is not None} (valor: {session_id})")
-                if session_id:
-                    try:
-                        from services.context_service import buscar_contexto_sessao
-                        contextos = buscar_contexto_sessao(
-                            session_id=session_id,
-                            tipo_contexto='pagamento_boleto'
-                        )
-                        if contextos:
-                            contexto = contextos[0]
-                            dados = contexto.get('dados_json', {})
-                            if isinstance(dados, str):
-                                import json
-                                dados = json.loads(dados)
+        if analise.tem('precheck.continuar_pagamento'):
+            logger.info(f"[PRECHECK] Comando 'continuar pagamento' detectado - mensagem: '{mensagem_lower}'")
+            logger.info(f"[PRECHECK] session_id disponível: {session_id is not None} (valor: {session_id})")
+            if session_id:
+                try:
+                    from services.context_service import buscar_contexto_sessao
+                    contextos = buscar_contexto_sessao(
+                        session_id=session_id,
+                        tipo_contexto='pagamento_boleto'
+                    )
+                    if contextos:
+                        contexto = contextos[0]
+                        dados = contexto.get('dados_json', {})
+                        if isinstance(dados, str):
+                            import json
+                            dados = json.loads(dados)
                             
-                            payment_id = dados.get('payment_id') or contexto.get('valor')
-                            valor = dados.get('valor')
+                        payment_id = dados.get('payment_id') or contexto.get('valor')
+                        valor = dados.get('valor')
                             
-                            if payment_id and valor:
-                                logger.info(f"[PRECHECK] ✅ Contexto de pagamento encontrado: payment_id={payment_id}, valor={valor}")
-                                return {
-                                    'tool_calls': [{
-                                        'function': {
-                                            'name': 'efetivar_bank_slip_payment_santander',
-                                            'arguments': {
-                                                'payment_id': payment_id,
-                                                'payment_value': valor
-                                                # agencia_origem e conta_origem serão obtidos do workspace
-                                            }
+                        if payment_id and valor:
+                            logger.info(f"[PRECHECK] ✅ Contexto de pagamento encontrado: payment_id={payment_id}, valor={valor}")
+                            return {
+                                'tool_calls': [{
+                                    'function': {
+                                        'name': 'efetivar_bank_slip_payment_santander',
+                                        'arguments': {
+                                            'payment_id': payment_id,
+                                            'payment_value': valor
+                                            # agencia_origem e conta_origem serão obtidos do workspace
                                         }
-                                    }]
-                                }
-                            else:
-                                logger.warning(f"[PRECHECK] ⚠️ Contexto de pagamento encontrado mas sem payment_id ou valor (payment_id={payment_id}, valor={valor})")
+                                    }
+                                }]
+                            }
                         else:
-                            logger.warning(f"[PRECHECK] ⚠️ Nenhum contexto de pagamento encontrado para session_id={session_id}, tipo='pagamento_boleto'")
-                    except Exception as e:
-                        logger.error(f"[PRECHECK] ❌ Erro ao buscar contexto de pagamento: {e}", exc_info=True)
-                else:
-                    logger.warning(f"[PRECHECK] ⚠️ session_id não disponível para buscar contexto de pagamento")
-                break
+                            logger.warning(f"[PRECHECK] ⚠️ Contexto de pagamento encontrado mas sem payment_id ou valor (payment_id={payment_id}, valor={valor})")
+                    else:
+                        logger.warning(f"[PRECHECK] ⚠️ Nenhum contexto de pagamento encontrado para session_id={session_id}, tipo='pagamento_boleto'")
+                except Exception as e:
+                    logger.error(f"[PRECHECK] ❌ Erro ao buscar contexto de pagamento: {e}", exc_info=True)
+            else:
+                logger.warning(f"[PRECHECK] ⚠️ session_id não disponível para buscar contexto de pagamento")
 
         # 0.1) ✅ CRÍTICO: Pagamento AFRMM (Mercante) por comando direto
         # Motivo: evita depender de tool calling (limite 128 tools pode esconder `executar_pagamento_afrmm`)
         # e evita cair em "despesas do processo" quando o usuário quer pagar.
         try:
             if (
-                "afrmm" in mensagem_lower
-                and not re.search(r"\bhist|\bcomprov", mensagem_lower)  # não conflitar com "histórico/comprovante"
-                and re.search(r"\b(pagar|pague|paga|quitar|quite|efetuar|efetue)\b", mensagem_lower)
+                analise.tem_gatilho("afrmm")
+                and not analise.tem("precheck.historico_comprovante")  # não conflitar com "histórico/comprovante"
+                and analise.tem("precheck.verbo_pagar")
             ):
                 m_proc = re.search(r"\b([a-z]{3}\.\d{4}/\d{2})\b", mensagem_lower, flags=re.IGNORECASE)
                 if m_proc:
@@ -770,316 +833,270 @@ class PrecheckService:
 
         # 1) ✅ NOVO: Ver emails e detalhes de email (PRIORIDADE MÁXIMA ABSOLUTA)
         # Padrões para listar emails: "ver email", "ver emails", "ler email", "ler emails"
-        padroes_ver_email = [
-            r'^ver\s+email$',
-            r'^ver\s+emails$',
-            r'^ler\s+email$',
-            r'^ler\s+emails$',
-            # ✅ NOVO: imperativo comum ("leia meus emails")
-            r'^leia\s+email$',
-            r'^leia\s+emails$',
-            # ✅ NOVO: variações comuns ("meus emails", "meus e-mails")
-            r'^ver\s+meus\s+e-?mails$',
-            r'^ler\s+meus\s+e-?mails$',
-            r'^leia\s+meus\s+e-?mails$',
-            r'^mostrar\s+meus\s+e-?mails$',
-            r'^consultar\s+meus\s+e-?mails$',
-            r'^mostrar\s+emails$',
-            r'^quais\s+emails$',
-            r'^verificar\s+emails$',
-            r'^consultar\s+emails$',
-            # ✅ NOVO: "de hoje"
-            r'^(ver|ler|leia|mostrar|consultar|verificar)\s+(meus\s+)?e-?mails\s+de\s+hoje$',
-            r'^(ver|ler|leia|mostrar|consultar|verificar)\s+(meus\s+)?e-?mails\s+hoje$',
-        ]
-        for padrao in padroes_ver_email:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"[PRECHECK] Comando 'ver email' detectado - chamando ler_emails diretamente")
-                # ✅ Ajuste: se o usuário mencionar "hoje", reduzir a janela para 1 dia.
-                # (Evita retornar emails antigos e dá mais precisão para a intenção do usuário.)
-                max_dias = 1 if re.search(r'\bhoje\b', mensagem_lower) else 7
+        if analise.tem('precheck.ver_emails'):
+            logger.info(f"[PRECHECK] Comando 'ver email' detectado - chamando ler_emails diretamente")
+            # ✅ Ajuste: se o usuário mencionar "hoje", reduzir a janela para 1 dia.
+            # (Evita retornar emails antigos e dá mais precisão para a intenção do usuário.)
+            max_dias = 1 if analise.tem_gatilho('hoje') else 7
+            return {
+                'tool_calls': [{
+                    'function': {
+                        'name': 'ler_emails',
+                        'arguments': {
+                            'limit': 10,
+                            'apenas_nao_lidos': False,
+                            'max_dias': max_dias
+                        }
+                    }
+                }]
+            }
+        
+        # Padrões para detalhes de email específico: "detalhe email 8", "ler email 3", "ver email 5"
+        match = _RE_DETALHE_EMAIL.search(analise.texto) if analise.tem('precheck.detalhe_email') else None
+        if match:
+            email_index = int(match.group(1))
+            logger.info(f"[PRECHECK] Comando 'detalhe email {email_index}' detectado - chamando obter_detalhes_email diretamente")
+            return {
+                'tool_calls': [{
+                    'function': {
+                        'name': 'obter_detalhes_email',
+                        'arguments': {
+                            'email_index': email_index
+                        }
+                    }
+                }]
+            }
+
+        # ✅ NOVO (16/01/2026): Detectar "foram registrados" → chamar listar_processos_registrados_hoje
+        # Padrões: "quais dmd foram registrados?", "quais processos foram registrados hoje?"
+        # ✅ Nunca futuro: ignorar perguntas tipo "amanhã" / "futuro"
+        if analise.tem('precheck.registrados') and not analise.tem('precheck.futuro'):
+            logger.info(f"[PRECHECK] Pergunta 'foram registrados' detectada - mensagem: '{mensagem}'")
+            # ✅ Detectar período (prioridade: range > mês > semana > ontem/hoje)
+            # Range: "de 01/01/25 a 30/05/26"
+            m_range = re.search(r'\bde\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+a\s+(\d{1,2}/\d{1,2}/\d{2,4})\b', mensagem_lower)
+            if m_range:
+                data_inicio = m_range.group(1)
+                data_fim = m_range.group(2)
+                # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
+                categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
+                if not categoria:
+                    if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                        categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+                if not categoria:
+                    match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                    if match_categoria:
+                        cat_candidata = match_categoria.group(1)
+                        categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                        if cat_candidata in categorias_validas:
+                            categoria = cat_candidata
                 return {
                     'tool_calls': [{
                         'function': {
-                            'name': 'ler_emails',
+                            'name': 'listar_processos_registrados_periodo',
                             'arguments': {
-                                'limit': 10,
-                                'apenas_nao_lidos': False,
-                                'max_dias': max_dias
+                                'categoria': categoria.upper() if categoria else None,
+                                'periodo': 'periodo_especifico',
+                                'data_inicio': data_inicio,
+                                'data_fim': data_fim,
+                                'limite': 200
                             }
                         }
                     }]
                 }
-        
-        # Padrões para detalhes de email específico: "detalhe email 8", "ler email 3", "ver email 5"
-        padroes_detalhe_email = [
-            r'^detalhe\s+email\s+(\d+)$',
-            r'^detalhes\s+email\s+(\d+)$',
-            r'^ler\s+email\s+(\d+)$',
-            r'^ler\s+o\s+email\s+(\d+)$',
-            r'^leia\s+email\s+(\d+)$',
-            r'^leia\s+o\s+email\s+(\d+)$',
-            r'^ver\s+email\s+(\d+)$',
-            r'^mostrar\s+email\s+(\d+)$'
-        ]
-        for padrao in padroes_detalhe_email:
-            match = re.search(padrao, mensagem_lower)
-            if match:
-                email_index = int(match.group(1))
-                logger.info(f"[PRECHECK] Comando 'detalhe email {email_index}' detectado - chamando obter_detalhes_email diretamente")
+
+            # Dia específico: "dia 22/01", "em 22/01", "no dia 22/01" OU direto "registramos 22/01"
+            # Regra: se não informar ano, assumir ano atual.
+            m_dia = re.search(
+                r'(?:\b(?:dia|em|no\s+dia)\b\s*)?(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?(?=\D|$)',
+                mensagem_lower,
+            )
+            if m_dia:
+                from datetime import datetime
+                dd = m_dia.group(1)
+                mm = m_dia.group(2)
+                yy_opt = m_dia.group(3)
+                ano_eff = datetime.now().year if not yy_opt else (2000 + int(yy_opt)) if len(yy_opt) == 2 else int(yy_opt)
+                data_dd_mm_aaaa = f"{int(dd):02d}/{int(mm):02d}/{int(ano_eff)}"
+
+                categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
+                if not categoria:
+                    if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                        categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+                if not categoria:
+                    match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                    if match_categoria:
+                        cat_candidata = match_categoria.group(1)
+                        categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                        if cat_candidata in categorias_validas:
+                            categoria = cat_candidata
+
+                logger.info(f"[PRECHECK] Pergunta 'registrados' com dia específico detectada: {data_dd_mm_aaaa} (categoria={categoria})")
                 return {
                     'tool_calls': [{
                         'function': {
-                            'name': 'obter_detalhes_email',
+                            'name': 'listar_processos_registrados_periodo',
                             'arguments': {
-                                'email_index': email_index
+                                'categoria': categoria.upper() if categoria else None,
+                                'periodo': 'periodo_especifico',
+                                'data_inicio': data_dd_mm_aaaa,
+                                'data_fim': data_dd_mm_aaaa,
+                                'limite': 200
                             }
                         }
                     }]
                 }
 
-        # ✅ NOVO (16/01/2026): Detectar "foram registrados" → chamar listar_processos_registrados_hoje
-        # Padrões: "quais dmd foram registrados?", "quais processos foram registrados hoje?"
-        padroes_registrados = [
-            r'foram\s+registrados',
-            r'foi\s+registrado',
-            r'registramos',
-            r'registraram',
-            r'foram\s+registradas',  # Para DIs/DUIMPs
-            r'foi\s+registrada'
-        ]
-        for padrao in padroes_registrados:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"[PRECHECK] Pergunta 'foram registrados' detectada - mensagem: '{mensagem}'")
-                # ✅ Nunca futuro: ignorar perguntas tipo "amanhã" / "futuro"
-                if re.search(r'\b(amanh[ãa]|futuro|depois)\b', mensagem_lower):
+            # Mês por nome (pt-BR): "em dezembro 25", "em outubro de 2025"
+            meses = {
+                'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+                'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+            }
+            mes_detectado = None
+            for nome_mes, num_mes in meses.items():
+                if re.search(rf'\b{re.escape(nome_mes)}\b', mensagem_lower):
+                    mes_detectado = num_mes
                     break
+            ano_detectado = None
+            m_ano4 = re.search(r'\b(20\d{2})\b', mensagem_lower)
+            if m_ano4:
+                ano_detectado = int(m_ano4.group(1))
+            else:
+                m_ano2 = re.search(r'\b(\d{2})\b', mensagem_lower)
+                if m_ano2 and mes_detectado:
+                    # se tem mês e só ano 2 dígitos, assumir 20xx
+                    try:
+                        ano_detectado = int(f"20{m_ano2.group(1)}")
+                    except Exception:
+                        ano_detectado = None
 
-                # ✅ Detectar período (prioridade: range > mês > semana > ontem/hoje)
-                # Range: "de 01/01/25 a 30/05/26"
-                m_range = re.search(r'\bde\s+(\d{1,2}/\d{1,2}/\d{2,4})\s+a\s+(\d{1,2}/\d{1,2}/\d{2,4})\b', mensagem_lower)
-                if m_range:
-                    data_inicio = m_range.group(1)
-                    data_fim = m_range.group(2)
-                    # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
-                    categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
-                    if not categoria:
-                        if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                            categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                    if not categoria:
-                        match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                        if match_categoria:
-                            cat_candidata = match_categoria.group(1)
-                            categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                            if cat_candidata in categorias_validas:
-                                categoria = cat_candidata
-                    return {
-                        'tool_calls': [{
-                            'function': {
-                                'name': 'listar_processos_registrados_periodo',
-                                'arguments': {
-                                    'categoria': categoria.upper() if categoria else None,
-                                    'periodo': 'periodo_especifico',
-                                    'data_inicio': data_inicio,
-                                    'data_fim': data_fim,
-                                    'limite': 200
-                                }
-                            }
-                        }]
-                    }
-
-                # Dia específico: "dia 22/01", "em 22/01", "no dia 22/01" OU direto "registramos 22/01"
-                # Regra: se não informar ano, assumir ano atual.
-                m_dia = re.search(
-                    r'(?:\b(?:dia|em|no\s+dia)\b\s*)?(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?(?=\D|$)',
-                    mensagem_lower,
-                )
-                if m_dia:
+            if mes_detectado:
+                # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
+                categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
+                if not categoria:
+                    if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                        categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+                if not categoria:
+                    match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                    if match_categoria:
+                        cat_candidata = match_categoria.group(1)
+                        categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                        if cat_candidata in categorias_validas:
+                            categoria = cat_candidata
+                # ✅ NOVO: Se não especificou ano e mês é no passado (antes do mês atual), assumir ano anterior
+                ano_eff = ano_detectado
+                if not ano_eff:
                     from datetime import datetime
-                    dd = m_dia.group(1)
-                    mm = m_dia.group(2)
-                    yy_opt = m_dia.group(3)
-                    ano_eff = datetime.now().year if not yy_opt else (2000 + int(yy_opt)) if len(yy_opt) == 2 else int(yy_opt)
-                    data_dd_mm_aaaa = f"{int(dd):02d}/{int(mm):02d}/{int(ano_eff)}"
-
-                    categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
-                    if not categoria:
-                        if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                            categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                    if not categoria:
-                        match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                        if match_categoria:
-                            cat_candidata = match_categoria.group(1)
-                            categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                            if cat_candidata in categorias_validas:
-                                categoria = cat_candidata
-
-                    logger.info(f"[PRECHECK] Pergunta 'registrados' com dia específico detectada: {data_dd_mm_aaaa} (categoria={categoria})")
-                    return {
-                        'tool_calls': [{
-                            'function': {
-                                'name': 'listar_processos_registrados_periodo',
-                                'arguments': {
-                                    'categoria': categoria.upper() if categoria else None,
-                                    'periodo': 'periodo_especifico',
-                                    'data_inicio': data_dd_mm_aaaa,
-                                    'data_fim': data_dd_mm_aaaa,
-                                    'limite': 200
-                                }
+                    hoje = datetime.now()
+                    if mes_detectado > hoje.month:
+                        # Mês futuro no ano atual não faz sentido para histórico, assumir ano anterior
+                        ano_eff = hoje.year - 1
+                    else:
+                        # Mês passado ou atual: usar ano atual
+                        ano_eff = hoje.year
+                return {
+                    'tool_calls': [{
+                        'function': {
+                            'name': 'listar_processos_registrados_periodo',
+                            'arguments': {
+                                'categoria': categoria.upper() if categoria else None,
+                                'periodo': 'mes',
+                                'mes': int(mes_detectado),
+                                'ano': int(ano_eff),
+                                'limite': 200
                             }
-                        }]
-                    }
-
-                # Mês por nome (pt-BR): "em dezembro 25", "em outubro de 2025"
-                meses = {
-                    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'março': 3, 'abril': 4, 'maio': 5, 'junho': 6,
-                    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+                        }
+                    }]
                 }
-                mes_detectado = None
-                for nome_mes, num_mes in meses.items():
-                    if re.search(rf'\b{re.escape(nome_mes)}\b', mensagem_lower):
-                        mes_detectado = num_mes
-                        break
-                ano_detectado = None
-                m_ano4 = re.search(r'\b(20\d{2})\b', mensagem_lower)
-                if m_ano4:
-                    ano_detectado = int(m_ano4.group(1))
-                else:
-                    m_ano2 = re.search(r'\b(\d{2})\b', mensagem_lower)
-                    if m_ano2 and mes_detectado:
-                        # se tem mês e só ano 2 dígitos, assumir 20xx
-                        try:
-                            ano_detectado = int(f"20{m_ano2.group(1)}")
-                        except Exception:
-                            ano_detectado = None
-
-                if mes_detectado:
-                    # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
-                    categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
-                    if not categoria:
-                        if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                            categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                    if not categoria:
-                        match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                        if match_categoria:
-                            cat_candidata = match_categoria.group(1)
-                            categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                            if cat_candidata in categorias_validas:
-                                categoria = cat_candidata
-                    # ✅ NOVO: Se não especificou ano e mês é no passado (antes do mês atual), assumir ano anterior
-                    ano_eff = ano_detectado
-                    if not ano_eff:
-                        from datetime import datetime
-                        hoje = datetime.now()
-                        if mes_detectado > hoje.month:
-                            # Mês futuro no ano atual não faz sentido para histórico, assumir ano anterior
-                            ano_eff = hoje.year - 1
-                        else:
-                            # Mês passado ou atual: usar ano atual
-                            ano_eff = hoje.year
-                    return {
-                        'tool_calls': [{
-                            'function': {
-                                'name': 'listar_processos_registrados_periodo',
-                                'arguments': {
-                                    'categoria': categoria.upper() if categoria else None,
-                                    'periodo': 'mes',
-                                    'mes': int(mes_detectado),
-                                    'ano': int(ano_eff),
-                                    'limite': 200
-                                }
-                            }
-                        }]
-                    }
-
-                # Ano (ex.: "em 2025")
-                if ano_detectado and re.search(r'\b(em|no|na)\s+20\d{2}\b', mensagem_lower):
-                    # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
-                    categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
-                    if not categoria:
-                        if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                            categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                    if not categoria:
-                        match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                        if match_categoria:
-                            cat_candidata = match_categoria.group(1)
-                            categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                            if cat_candidata in categorias_validas:
-                                categoria = cat_candidata
-                    return {
-                        'tool_calls': [{
-                            'function': {
-                                'name': 'listar_processos_registrados_periodo',
-                                'arguments': {
-                                    'categoria': categoria.upper() if categoria else None,
-                                    'periodo': 'ano',
-                                    'ano': int(ano_detectado),
-                                    'limite': 200
-                                }
-                            }
-                        }]
-                    }
 
-                # Semana: "essa semana", "nesta semana"
-                if re.search(r'\b(essa|nesta)\s+semana\b', mensagem_lower) or re.search(r'\bsemana\b', mensagem_lower):
-                    # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
-                    categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
-                    if not categoria:
-                        if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                            categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                    if not categoria:
-                        match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                        if match_categoria:
-                            cat_candidata = match_categoria.group(1)
-                            categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                            if cat_candidata in categorias_validas:
-                                categoria = cat_candidata
-                    return {
-                        'tool_calls': [{
-                            'function': {
-                                'name': 'listar_processos_registrados_periodo',
-                                'arguments': {
-                                    'categoria': categoria.upper() if categoria else None,
-                                    'periodo': 'semana',
-                                    'limite': 200
-                                }
+            # Ano (ex.: "em 2025")
+            if ano_detectado and re.search(r'\b(em|no|na)\s+20\d{2}\b', mensagem_lower):
+                # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
+                categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
+                if not categoria:
+                    if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                        categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+                if not categoria:
+                    match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                    if match_categoria:
+                        cat_candidata = match_categoria.group(1)
+                        categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                        if cat_candidata in categorias_validas:
+                            categoria = cat_candidata
+                return {
+                    'tool_calls': [{
+                        'function': {
+                            'name': 'listar_processos_registrados_periodo',
+                            'arguments': {
+                                'categoria': categoria.upper() if categoria else None,
+                                'periodo': 'ano',
+                                'ano': int(ano_detectado),
+                                'limite': 200
                             }
-                        }]
-                    }
-
-                # ✅ Detectar dia: hoje (0) / ontem (1) (fallback)
-                dias_atras = 0
-                if re.search(r'\bontem\b', mensagem_lower) or re.search(r'\bde\s+ontem\b', mensagem_lower):
-                    dias_atras = 1
+                        }
+                    }]
+                }
 
-                # Extrair categoria da mensagem
-                categoria = None
-                if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                    categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                # Se não encontrou categoria, tentar extrair manualmente
+            # Semana: "essa semana", "nesta semana"
+            if re.search(r'\b(essa|nesta)\s+semana\b', mensagem_lower) or re.search(r'\bsemana\b', mensagem_lower):
+                # ✅ NOVO: Aplicar normalização de termos de cliente ANTES de regex
+                categoria = self._normalizar_termo_cliente(mensagem, mensagem_lower)
+                if not categoria:
+                    if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                        categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
                 if not categoria:
                     match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
                     if match_categoria:
                         cat_candidata = match_categoria.group(1)
-                        # Validar se é categoria conhecida
                         categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
                         if cat_candidata in categorias_validas:
                             categoria = cat_candidata
-                
-                logger.info(f"[PRECHECK] Categoria extraída: {categoria}")
                 return {
                     'tool_calls': [{
                         'function': {
-                            'name': 'listar_processos_registrados_hoje',
+                            'name': 'listar_processos_registrados_periodo',
                             'arguments': {
                                 'categoria': categoria.upper() if categoria else None,
-                                'limite': 200,
-                                'dias_atras': dias_atras
+                                'periodo': 'semana',
+                                'limite': 200
                             }
                         }
                     }]
                 }
 
+            # ✅ Detectar dia: hoje (0) / ontem (1) (fallback)
+            dias_atras = 0
+            if re.search(r'\bontem\b', mensagem_lower) or re.search(r'\bde\s+ontem\b', mensagem_lower):
+                dias_atras = 1
+
+            # Extrair categoria da mensagem
+            categoria = None
+            if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+            # Se não encontrou categoria, tentar extrair manualmente
+            if not categoria:
+                match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                if match_categoria:
+                    cat_candidata = match_categoria.group(1)
+                    # Validar se é categoria conhecida
+                    categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                    if cat_candidata in categorias_validas:
+                        categoria = cat_candidata
+                
+            logger.info(f"[PRECHECK] Categoria extraída: {categoria}")
+            return {
+                'tool_calls': [{
+                    'function': {
+                        'name': 'listar_processos_registrados_hoje',
+                        'arguments': {
+                            'categoria': categoria.upper() if categoria else None,
+                            'limite': 200,
+                            'dias_atras': dias_atras
+                        }
+                    }
+                }]
+            }
+
         # ✅ NOVO (19/01/2026): Detectar "desembaraçou hoje" → listar_processos_desembaracados_hoje
         if re.search(r'desembarac|desembara[cç]', mensagem_lower) and re.search(r'\b(hoje|ontem|do\s+dia|de\s+ontem)\b', mensagem_lower):
             # ✅ Nunca futuro: não responder "amanhã"
@@ -1113,85 +1130,75 @@ class PrecheckService:
         
         # ✅ NOVO (16/01/2026): Detectar "está em análise" → chamar obter_dis_em_analise + obter_duimps_em_analise
         # Padrões: "quais dmd está em análise?", "quais processos estão em análise?"
-        padroes_em_analise = [
-            r'est[áa]\s+em\s+an[áa]lise',
-            r'est[ao]o\s+em\s+an[áa]lise',
-            r'em\s+an[áa]lise',
-            r'an[áa]lise',
-            r'est[ao]o\s+an[áa]lisando',
-            r'est[ao]o\s+an[áa]lisadas'
-        ]
-        for padrao in padroes_em_analise:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"[PRECHECK] Pergunta 'está em análise' detectada - mensagem: '{mensagem}'")
-                # Extrair categoria da mensagem
-                categoria = None
-                if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
-                    categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
-                # Se não encontrou categoria, tentar extrair manualmente
-                if not categoria:
-                    match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
-                    if match_categoria:
-                        cat_candidata = match_categoria.group(1)
-                        # Validar se é categoria conhecida
-                        categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
-                        if cat_candidata in categorias_validas:
-                            categoria = cat_candidata
+        if analise.tem('precheck.em_analise'):
+            logger.info(f"[PRECHECK] Pergunta 'está em análise' detectada - mensagem: '{mensagem}'")
+            # Extrair categoria da mensagem
+            categoria = None
+            if hasattr(self.chat_service, '_extrair_categoria_da_mensagem'):
+                categoria = self.chat_service._extrair_categoria_da_mensagem(mensagem)
+            # Se não encontrou categoria, tentar extrair manualmente
+            if not categoria:
+                match_categoria = re.search(r'\b([A-Z]{2,4})\b', mensagem.upper())
+                if match_categoria:
+                    cat_candidata = match_categoria.group(1)
+                    # Validar se é categoria conhecida
+                    categorias_validas = ['ALH', 'VDM', 'MSS', 'BND', 'DMD', 'GYM', 'SLL', 'MV5', 'CCT', 'ARG', 'GLT', 'GPS', 'NTM', 'DBA', 'MCD', 'UPI', 'ELT']
+                    if cat_candidata in categorias_validas:
+                        categoria = cat_candidata
                 
-                logger.info(f"[PRECHECK] Categoria extraída: {categoria}")
-                # Buscar DIs e DUIMPs em análise (mesma lógica do dashboard)
-                try:
-                    from db_manager import obter_dis_em_analise, obter_duimps_em_analise
+            logger.info(f"[PRECHECK] Categoria extraída: {categoria}")
+            # Buscar DIs e DUIMPs em análise (mesma lógica do dashboard)
+            try:
+                from db_manager import obter_dis_em_analise, obter_duimps_em_analise
                     
-                    dis = obter_dis_em_analise(categoria.upper() if categoria else None)
-                    duimps = obter_duimps_em_analise(categoria.upper() if categoria else None)
+                dis = obter_dis_em_analise(categoria.upper() if categoria else None)
+                duimps = obter_duimps_em_analise(categoria.upper() if categoria else None)
                     
-                    # Formatar resposta similar ao dashboard
-                    resposta = ""
-                    if dis or duimps:
-                        if dis:
-                            resposta += f"📋 **DIs EM ANÁLISE** ({len(dis)} DI(s)):\n"
-                            for di in dis[:20]:  # Limitar a 20 para não ficar muito longo
-                                processo_ref = di.get('processo_referencia', 'N/A')
-                                numero_di = di.get('numero_di', 'N/A')
-                                situacao = di.get('situacao_di', 'N/A')
-                                canal = di.get('canal_di', '')
-                                data_registro = di.get('data_registro') or di.get('data_hora_registro')
-                                canal_texto = f" - Canal: {canal}" if canal else ""
-                                registro_texto = f" - Registro: {data_registro}" if data_registro else ""
-                                resposta += f"• {numero_di} - Processo: {processo_ref} - Status: {situacao}{canal_texto}{registro_texto}\n"
-                            if len(dis) > 20:
-                                resposta += f"• ... e mais {len(dis) - 20} DI(s)\n"
-                            resposta += "\n"
+                # Formatar resposta similar ao dashboard
+                resposta = ""
+                if dis or duimps:
+                    if dis:
+                        resposta += f"📋 **DIs EM ANÁLISE** ({len(dis)} DI(s)):\n"
+                        for di in dis[:20]:  # Limitar a 20 para não ficar muito longo
+                            processo_ref = di.get('processo_referencia', 'N/A')
+                            numero_di = di.get('numero_di', 'N/A')
+                            situacao = di.get('situacao_di', 'N/A')
+                            canal = di.get('canal_di', '')
+                            data_registro = di.get('data_registro') or di.get('data_hora_registro')
+                            canal_texto = f" - Canal: {canal}" if canal else ""
+                            registro_texto = f" - Registro: {data_registro}" if data_registro else ""
+                            resposta += f"• {numero_di} - Processo: {processo_ref} - Status: {situacao}{canal_texto}{registro_texto}\n"
+                        if len(dis) > 20:
+                            resposta += f"• ... e mais {len(dis) - 20} DI(s)\n"
+                        resposta += "\n"
                         
-                        if duimps:
-                            resposta += f"📋 **DUIMPs EM ANÁLISE** ({len(duimps)} DUIMP(s)):\n"
-                            for duimp in duimps[:20]:  # Limitar a 20
-                                processo_ref = duimp.get('processo_referencia', 'N/A')
-                                numero_duimp = duimp.get('numero_duimp', 'N/A')
-                                versao = duimp.get('versao') or duimp.get('versao_duimp', '')
-                                situacao = duimp.get('status') or duimp.get('situacao_duimp', 'N/A')
-                                tempo = duimp.get('tempo_analise', '')
-                                data_registro = duimp.get('data_criacao') or duimp.get('data_registro')
-                                tempo_texto = f" (há {tempo})" if tempo else ""
-                                versao_texto = f" v{versao}" if versao else ""
-                                registro_texto = f" - Registro: {data_registro}" if data_registro else ""
-                                resposta += f"• {numero_duimp}{versao_texto} - Processo: {processo_ref} - Status: {situacao}{tempo_texto}{registro_texto}\n"
-                            if len(duimps) > 20:
-                                resposta += f"• ... e mais {len(duimps) - 20} DUIMP(s)\n"
-                    else:
-                        categoria_texto = f" {categoria}" if categoria else ""
-                        resposta = f"⚠️ Nenhum processo{categoria_texto} com DI ou DUIMP em análise encontrado."
+                    if duimps:
+                        resposta += f"📋 **DUIMPs EM ANÁLISE** ({len(duimps)} DUIMP(s)):\n"
+                        for duimp in duimps[:20]:  # Limitar a 20
+                            processo_ref = duimp.get('processo_referencia', 'N/A')
+                            numero_duimp = duimp.get('numero_duimp', 'N/A')
+                            versao = duimp.get('versao') or duimp.get('versao_duimp', '')
+                            situacao = duimp.get('status') or duimp.get('situacao_duimp', 'N/A')
+                            tempo = duimp.get('tempo_analise', '')
+                            data_registro = duimp.get('data_criacao') or duimp.get('data_registro')
+                            tempo_texto = f" (há {tempo})" if tempo else ""
+                            versao_texto = f" v{versao}" if versao else ""
+                            registro_texto = f" - Registro: {data_registro}" if data_registro else ""
+                            resposta += f"• {numero_duimp}{versao_texto} - Processo: {processo_ref} - Status: {situacao}{tempo_texto}{registro_texto}\n"
+                        if len(duimps) > 20:
+                            resposta += f"• ... e mais {len(duimps) - 20} DUIMP(s)\n"
+                else:
+                    categoria_texto = f" {categoria}" if categoria else ""
+                    resposta = f"⚠️ Nenhum processo{categoria_texto} com DI ou DUIMP em análise encontrado."
                     
-                    return {
-                        'resposta': resposta,
-                        'precheck': True,
-                        'precheck_tipo': 'em_analise'
-                    }
-                except Exception as e:
-                    logger.error(f"[PRECHECK] ❌ Erro ao buscar DIs/DUIMPs em análise: {e}", exc_info=True)
-                    # Se der erro, deixar a IA processar
-                    break
+                return {
+                    'resposta': resposta,
+                    'precheck': True,
+                    'precheck_tipo': 'em_analise'
+                }
+            except Exception as e:
+                logger.error(f"[PRECHECK] ❌ Erro ao buscar DIs/DUIMPs em análise: {e}", exc_info=True)
+                # Se der erro, deixar a IA processar
         
         # 1) Busca de artigo específico de legislação → chamar tool diretamente (PRIORIDADE)
         resposta_artigo = self.legislacao_precheck.precheck_buscar_artigo_especifico(
@@ -1306,25 +1313,16 @@ class PrecheckService:
             return resultado_followup_extrato
         
         # Padrões gerais (sem agência/conta - a tool pedirá)
-        padroes_extrato_bb = [
-            r'extrato\s+(?:do\s+)?(?:banco\s+do\s+brasil|bb|b\.?b\.?)',
-            r'(?:banco\s+do\s+brasil|bb|b\.?b\.?)\s+extrato',
-            r'consultar\s+extrato\s+(?:do\s+)?(?:banco\s+do\s+brasil|bb|b\.?b\.?)',
-            r'ver\s+extrato\s+(?:do\s+)?(?:banco\s+do\s+brasil|bb|b\.?b\.?)',
-            r'mostrar\s+extrato\s+(?:do\s+)?(?:banco\s+do\s+brasil|bb|b\.?b\.?)',
-        ]
-        
-        for padrao in padroes_extrato_bb:
-            if re.search(padrao, mensagem_lower):
-                logger.info(f"[PRECHECK] Pedido de extrato BB detectado: '{mensagem}'")
-                return {
-                    'tool_calls': [{
-                        'function': {
-                            'name': 'consultar_extrato_bb',
-                            'arguments': {}
-                        }
-                    }]
-                }
+        if analise.tem('precheck.extrato_bb'):
+            logger.info(f"[PRECHECK] Pedido de extrato BB detectado: '{mensagem}'")
+            return {
+                'tool_calls': [{
+                    'function': {
+                        'name': 'consultar_extrato_bb',
+                        'arguments': {}
+                    }
+                }]
+            }
         
         # 2) Consulta TECwin NCM → responder diretamente
         resposta_tecwin = self.ncm_precheck.precheck_tecwin_ncm(
@@ -1510,39 +1508,22 @@ class PrecheckService:
         Returns:
             Dict com tool_call para consultar_extrato ou None
         """
+        analise = analisar_mensagem(mensagem)
+
         # ✅ TRAVA ANTI-COLISÃO: Se tem "relatório/resumo/dashboard", NÃO é follow-up de extrato
-        if any(k in mensagem_lower for k in ["relatorio", "relatório", "dashboard", "resumo"]):
+        if analise.tem_gatilho("relatorio", "dashboard", "resumo"):
             return None
         
         # ✅ SINAIS EXPLÍCITOS DE EXTRATO: Só disparar se tiver sinais claros de extrato bancário
-        sinais_extrato = ["extrato", "saldo", "lançamento", "lancamento", "banco", "agencia", "agência", "conta"]
-        if not any(k in mensagem_lower for k in sinais_extrato):
+        if not analise.tem_gatilho(*_SINAIS_EXTRATO):
             return None
         
         # ✅ EXCLUIR: Extrato de CE/CCT/DI/DUIMP (não é extrato bancário)
-        padroes_excluir = [
-            r'extrato.*ce',
-            r'extrato.*cct',
-            r'extrato.*di',
-            r'extrato.*duimp',
-            r'extrato.*processo',
-        ]
-        for padrao in padroes_excluir:
-            if re.search(padrao, mensagem_lower):
-                return None
+        if analise.tem('precheck.extrato_documento'):
+            return None
         
         # Padrões de follow-up de extrato (sem "envie relatorio")
-        padroes_followup_extrato = [
-            r'detalh[ae]r?\s+(?:os|as)?\s*\d+\s+lan[çc]amentos',
-            r'detalh[ae]r?\s+(?:os|as)?\s*lan[çc]amentos',
-            r'envie?\s+(?:esse|o)?\s*extrato',
-            r'envi[ae]r?\s+(?:esse|o)?\s*extrato',
-            r'mostre?\s+(?:os|as)?\s*lan[çc]amentos',
-            r'mostre?\s+(?:os|as)?\s*transa[çc][oõ]es',
-        ]
-        
-        eh_followup_extrato = any(re.search(p, mensagem_lower) for p in padroes_followup_extrato)
-        if not eh_followup_extrato:
+        if not analise.tem('precheck.followup_extrato'):
             return None
         
         if not session_id:
@@ -1620,31 +1601,8 @@ class PrecheckService:
         """
         try:
             # ✅ PROTEÇÃO 1: Verificar se NÃO é comando específico
-            comandos_especificos = [
-                r'^ver\s+email',
-                r'^detalhe\s+email',
-                r'extrato\s+(?:do\s+)?(?:banco|santander|bb)',
-                r'fechar\s+(?:o\s+)?dia',
-                r'o\s+que\s+temos?\s+(?:pra|para)\s+hoje',
-                r'fechamento',
-                r'dashboard',
-                r'tecwin',
-                r'legislacao',
-                r'importar\s+legislacao',
-                r'relatorio\s+fob',
-                r'relatorio\s+averbacoes',
-                r'gerar\s+pdf',
-                r'pdf\s+do\s+extrato',
-                r'calcular\s+impostos',
-                r'calcule\s+os\s+impostos',
-                r'criar\s+duimp',
-                r'montar\s+duimp',
-                r'consultar\s+ncm',
-                r'sugerir\s+ncm',
-            ]
-            
-            eh_comando_especifico = any(re.search(padrao, mensagem_lower) for padrao in comandos_especificos)
-            if eh_comando_especifico:
+            analise = analisar_mensagem(mensagem)
+            if analise.tem('precheck.comando_especifico'):
                 logger.debug(f"[PRECHECK] Mensagem é comando específico - não normalizar: '{mensagem}'")
                 return None
             
@@ -1652,39 +1610,14 @@ class PrecheckService:
             # Se já tem categoria (ex: "como estão os DMD?"), não normalizar
             # ⚠️ EXCEÇÃO: Para "registramos", permitir normalizar mesmo se tiver categoria explícita
             # (ex: "o que registramos de alho" → normalizar "alho" → "ALH" mesmo se já tiver "ALH" na mensagem)
-            eh_pergunta_registrados = bool(
-                re.search(r'registramos|foram\s+registrados|foi\s+registrado', mensagem_lower)
-            )
-            if not eh_pergunta_registrados:
-                categorias_existentes = ['alh', 'vdm', 'mss', 'bnd', 'dmd', 'gym', 'sll', 'mv5', 'gps', 'ntm', 'mcd', 'dba', 'arg', 'upi']
-                tem_categoria_explicita = any(
-                    re.search(rf'\b{cat}\b', mensagem_lower) for cat in categorias_existentes
-                )
-                if tem_categoria_explicita:
+            if not analise.tem('precheck.pergunta_registrados'):
+                if analise.tem('precheck.categoria_explicita'):
                     logger.debug(f"[PRECHECK] Mensagem já tem categoria explícita - não normalizar: '{mensagem}'")
                     return None
             
             # ✅ PROTEÇÃO 3: Verificar se parece ser pergunta sobre processos/categorias
             # Padrões que indicam pergunta sobre processos
-            padroes_pergunta_processo = [
-                r'como\s+est[aã]o',
-                r'como\s+est[aã]',
-                r'quais\s+(?:os|as)?\s*processos',
-                r'mostre\s+(?:os|as)?\s*processos',
-                r'listar\s+processos',
-                r'processos?\s+do',
-                r'processos?\s+de',
-                r'status\s+dos?\s*processos',
-                r'situacao\s+dos?\s*processos',
-                r'registramos',  # ✅ NOVO: "o que registramos" também é pergunta sobre processos
-                r'foram\s+registrados',
-                r'foi\s+registrado',
-            ]
-            
-            parece_pergunta_processo = any(
-                re.search(padrao, mensagem_lower) for padrao in padroes_pergunta_processo
-            )
-            if not parece_pergunta_processo:
+            if not analise.tem('precheck.pergunta_processo'):
                 logger.debug(f"[PRECHECK] Mensagem não parece ser pergunta sobre processos - não normalizar: '{mensagem}'")
                 return None
             
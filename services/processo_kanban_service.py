@@ -3,6 +3,7 @@ Serviço para sincronizar processos do Kanban com SQLite.
 Sincronização automática a cada 5 minutos.
 """
 import requests
+import hashlib
 import json
 import logging
 import sqlite3
@@ -22,14 +23,35 @@ class ProcessoKanbanService:
     # ✅ Configurável via .env (KANBAN_API_URL). Fallback mantém compatibilidade.
     API_URL = os.getenv("KANBAN_API_URL", "http://172.16.10.211:5000/api/kanban/pedidos")
     SYNC_INTERVAL = 300  # 5 minutos
+    # ✅ NOVO (16/10/2026): só regrava processos cujo JSON mudou (KANBAN_SYNC_INCREMENTAL=false volta ao modo completo)
+    SYNC_INCREMENTAL = os.getenv("KANBAN_SYNC_INCREMENTAL", "true").lower() == "true"
+
+    # init_db() roda uma única vez por processo (não a cada ciclo de 5 minutos)
+    _db_inicializado = False
     
     def __init__(self, db_path: Optional[str] = None):
         """Inicializa o serviço"""
         from db_manager import get_db_connection, DB_PATH
         self.db_path = Path(db_path) if db_path else Path(DB_PATH)
+        self.ultimas_metricas: Dict[str, Any] = {}
+
+    def _garantir_db_inicializado(self) -> None:
+        if ProcessoKanbanService._db_inicializado:
+            return
+        from db_manager import init_db
+        init_db()
+        ProcessoKanbanService._db_inicializado = True
     
-    def sincronizar(self) -> bool:
-        """Sincroniza processos do Kanban para SQLite"""
+    def sincronizar(self, incremental: Optional[bool] = None) -> bool:
+        """
+        Sincroniza processos do Kanban para SQLite.
+
+        Args:
+            incremental: True = só processa processos alterados (hash do payload);
+                False = regrava todos. None = usa KANBAN_SYNC_INCREMENTAL (padrão: true).
+        """
+        if incremental is None:
+            incremental = self.SYNC_INCREMENTAL
         started = datetime.now()
         repo_sync = None
         try:
@@ -41,9 +63,8 @@ class ProcessoKanbanService:
             repo_sync = None
 
         try:
-            # ✅ Garantir que o banco está inicializado com todas as colunas (apenas uma vez por sincronização)
-            from db_manager import init_db
-            init_db()
+            # ✅ Garantir que o banco está inicializado com todas as colunas (apenas uma vez por processo)
+            self._garantir_db_inicializado()
             
             logger.info("🔄 Iniciando sincronização de processos do Kanban...")
             
@@ -64,15 +85,35 @@ class ProcessoKanbanService:
             
             # 2. Limpar processos antigos (que não estão mais no Kanban)
             processos_ativos_refs = [p.get('numeroPedido') for p in processos_json if p.get('numeroPedido')]
-            self._limpar_processos_antigos(processos_ativos_refs)
+            refs_removidas = self._limpar_processos_antigos(processos_ativos_refs)
             
             # 3. Salvar processos atuais
-            salvos = 0
-            for processo_json in processos_json:
-                if self._salvar_processo(processo_json):
-                    salvos += 1
-            
-            logger.info(f"✅ Sincronização concluída: {salvos}/{len(processos_json)} processos salvos")
+            metricas: Dict[str, Any] = {}
+            if incremental:
+                metricas = self._sincronizar_incremental(processos_json)
+                logger.info(
+                    f"✅ Sincronização incremental concluída: {metricas['alterados']} alterados, "
+                    f"{metricas['inalterados']} inalterados, {metricas['erros']} erros "
+                    f"({metricas['duration_ms']}ms)"
+                )
+            else:
+                salvos = 0
+                for processo_json in processos_json:
+                    if self._salvar_processo(processo_json):
+                        salvos += 1
+                metricas = {'total': len(processos_json), 'alterados': salvos, 'inalterados': 0}
+                self.ultimas_metricas = metricas
+                logger.info(f"✅ Sincronização concluída: {salvos}/{len(processos_json)} processos salvos")
+            
+            # ✅ NOVO (16/10/2026): recalcular dashboards materializados afetados pelos processos alterados
+            # (inclui os removidos do Kanban: somem do dashboard já neste sync, não após o max age)
+            refs_alteradas = metricas.pop('refs_alteradas', None) if incremental else processos_ativos_refs
+            refs_dashboard = list(refs_alteradas or []) + refs_removidas
+            if refs_dashboard:
+                self._atualizar_dashboard_snapshot(refs_dashboard)
+                # ✅ NOVO (16/10/2026): snapshots de processo em cache ficam velhos após o sync
+                from services.processo_snapshot_service import invalidar_snapshots
+                invalidar_snapshots(refs_dashboard)
             
             # ✅ NOVO: Limpar histórico antigo (> 30 dias) após sincronização
             try:
@@ -85,7 +126,13 @@ class ProcessoKanbanService:
             try:
                 if repo_sync:
                     dur_ms = int((datetime.now() - started).total_seconds() * 1000)
-                    repo_sync.registrar_sucesso("kanban", count=int(len(processos_json) or 0), duration_ms=dur_ms)
+                    repo_sync.registrar_sucesso(
+                        "kanban",
+                        count=int(len(processos_json) or 0),
+                        duration_ms=dur_ms,
+                        changed=metricas.get('alterados'),
+                        unchanged=metricas.get('inalterados'),
+                    )
             except Exception:
                 pass
 
@@ -165,8 +212,14 @@ class ProcessoKanbanService:
         
         return []
     
-    def _limpar_processos_antigos(self, processos_ativos_refs: List[str]) -> None:
-        """Remove processos do SQLite que não estão mais no Kanban"""
+    def _limpar_processos_antigos(self, processos_ativos_refs: List[str]) -> List[str]:
+        """
+        Remove processos do SQLite que não estão mais no Kanban.
+
+        Returns:
+            Referências removidas (para atualizar o que foi materializado a partir delas).
+        """
+        removidos: List[str] = []
         try:
             from db_manager import get_db_connection
             
@@ -176,6 +229,11 @@ class ProcessoKanbanService:
             # Criar lista de placeholders para IN clause
             if processos_ativos_refs:
                 placeholders = ','.join('?' * len(processos_ativos_refs))
+                cursor.execute(f'''
+                    SELECT processo_referencia FROM processos_kanban
+                    WHERE processo_referencia NOT IN ({placeholders})
+                ''', processos_ativos_refs)
+                removidos = [row[0] for row in cursor.fetchall() if row[0]]
                 cursor.execute(f'''
                     DELETE FROM processos_kanban 
                     WHERE processo_referencia NOT IN ({placeholders})
@@ -188,38 +246,305 @@ class ProcessoKanbanService:
             conn.close()
         except Exception as e:
             logger.error(f"❌ Erro ao limpar processos antigos: {e}")
+            return []
+        return removidos
     
-    def _buscar_processo_anterior(self, processo_referencia: str) -> Optional[Dict[str, Any]]:
-        """Busca versão anterior do processo no SQLite para comparação"""
+    # Colunas gravadas em processos_kanban (mesma ordem de `_montar_linha_kanban`)
+    _COLUNAS_KANBAN = (
+        'processo_referencia', 'id_processo_importacao', 'id_importacao',
+        'etapa_kanban', 'modal', 'numero_ce', 'numero_di', 'numero_duimp',
+        'numero_dta', 'documento_despacho', 'numero_documento_despacho',
+        'bl_house', 'master_bl', 'situacao_ce', 'situacao_di', 'situacao_entrega',
+        'tem_pendencias', 'pendencia_icms', 'pendencia_frete',
+        'data_criacao', 'data_embarque', 'data_desembaraco', 'data_entrega',
+        'data_destino_final', 'data_armazenamento', 'data_situacao_carga_ce', 'data_atracamento',
+        'eta_iso', 'porto_codigo', 'porto_nome', 'nome_navio', 'status_shipsgo',
+        'dados_completos_json', 'fonte', 'payload_hash',
+    )
+
+    @staticmethod
+    def _hash_payload(processo_json: Dict[str, Any]) -> str:
+        """Hash estável do JSON do Kanban (ordem de chaves normalizada) para detectar mudanças."""
+        raw = json.dumps(processo_json, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _sql_insert_kanban(self) -> str:
+        from services.processos_kanban_projecao import COLUNAS_PROJECAO
+
+        todas = self._COLUNAS_KANBAN + COLUNAS_PROJECAO
+        colunas = ', '.join(todas)
+        placeholders = ', '.join('?' * len(todas))
+        return f'INSERT OR REPLACE INTO processos_kanban ({colunas}) VALUES ({placeholders})'
+
+    def _deve_criar_notificacoes(self, dto: Any) -> bool:
+        """
+        Não criar notificações para processos entregues ou processos antigos inativos.
+        """
+        # Verificar se está entregue
+        situacao_ce = (dto.situacao_ce or '').upper()
+        situacao_entrega = (dto.situacao_entrega or '').upper()
+        if 'ENTREGUE' in situacao_ce or 'ENTREGUE' in situacao_entrega:
+            logger.debug(f"ℹ️ Processo {dto.processo_referencia} está ENTREGUE - não criar notificações")
+            return False
+        
+        # Verificar se é processo antigo inativo (sem documentos, sem ETA futuro)
+        if dto.processo_referencia:
+            try:
+                # Extrair ano do processo (formato: CATEGORIA.NUMERO/AA)
+                partes = dto.processo_referencia.split('/')
+                if len(partes) == 2:
+                    ano = partes[1]
+                    if ano and len(ano) == 2:
+                        ano_completo = 2000 + int(ano)
+                        ano_atual = datetime.now().year
+                        
+                        # Se processo é de 2024 ou anterior
+                        if ano_completo < ano_atual:
+                            tem_documentos = bool(
+                                dto.numero_ce or 
+                                (dto.numero_di and dto.numero_di not in ('', '/       -')) or 
+                                dto.numero_duimp
+                            )
+                            tem_eta_futuro = False
+                            if dto.eta_iso:
+                                try:
+                                    if isinstance(dto.eta_iso, str):
+                                        if 'T' in dto.eta_iso:
+                                            eta_date = datetime.fromisoformat(dto.eta_iso.replace('Z', '').split('+')[0].split('.')[0])
+                                        else:
+                                            eta_date = datetime.strptime(dto.eta_iso.split(' ')[0], '%Y-%m-%d')
+                                    else:
+                                        eta_date = dto.eta_iso
+                                    
+                                    if eta_date.date() >= datetime.now().date():
+                                        tem_eta_futuro = True
+                                except:
+                                    pass
+                            
+                            # Se não tem documentos nem ETA futuro, é processo antigo inativo
+                            if not tem_documentos and not tem_eta_futuro:
+                                logger.debug(f"ℹ️ Processo {dto.processo_referencia} é antigo ({ano_completo}) e inativo - não criar notificações")
+                                return False
+            except Exception as e:
+                logger.debug(f"Erro ao verificar se processo é antigo: {e}")
+        return True
+
+    def _detectar_mudancas(self, dto: Any, processo_anterior_json: Optional[Dict[str, Any]]) -> None:
+        """Cria notificações e registra mudança de etapa comparando com a versão anterior (antes de salvar)."""
+        from services.models.processo_kanban_dto import ProcessoKanbanDTO
+        from services.notificacao_service import NotificacaoService
+
+        dto_anterior = None
+        if processo_anterior_json:
+            try:
+                dto_anterior = ProcessoKanbanDTO.from_kanban_json(processo_anterior_json)
+            except Exception:
+                dto_anterior = None
+
+        deve_criar_notificacoes = self._deve_criar_notificacoes(dto)
+        
+        if deve_criar_notificacoes and dto_anterior is not None:
+            notificacao_service = NotificacaoService()
+            notificacoes_criadas = notificacao_service.detectar_mudancas_e_notificar(dto_anterior, dto)
+            if notificacoes_criadas:
+                logger.info(f"🔔 {len(notificacoes_criadas)} notificação(ões) criada(s) para {dto.processo_referencia}")
+        elif not deve_criar_notificacoes:
+            logger.debug(f"ℹ️ Processo {dto.processo_referencia} não deve receber notificações (entregue/antigo) - pulando detecção de mudanças")
+        else:
+            logger.debug(f"ℹ️ Processo {dto.processo_referencia} é novo - sem versão anterior para comparar")
+
+        # ✅ NOVO (19/01/2026): Registrar mudança de etapa (lead time por etapa)
+        # Mesmo que não crie notificações, o histórico é útil para monitoramento de processos ativos.
         try:
-            from db_manager import get_db_connection
-            
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT dados_completos_json FROM processos_kanban 
-                WHERE processo_referencia = ?
-            ''', (processo_referencia,))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            if row and row[0]:
-                return json.loads(row[0])
-            
+            if deve_criar_notificacoes:
+                etapa_anterior = (dto_anterior.etapa_kanban if dto_anterior else None)
+                etapa_nova = dto.etapa_kanban or ''
+                if etapa_nova and etapa_nova != (etapa_anterior or ''):
+                    self._registrar_mudanca_etapa(
+                        processo_referencia=dto.processo_referencia,
+                        etapa_anterior=etapa_anterior,
+                        etapa_nova=etapa_nova,
+                        modal=dto.modal,
+                    )
+        except Exception as e:
+            logger.debug(f"ℹ️ Erro ao registrar mudança de etapa para {dto.processo_referencia}: {e}")
+
+    def _carregar_linhas_anteriores(self, cursor: Any, refs: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Carrega (em lotes) os campos preservados + JSON anterior dos processos informados."""
+        anteriores: Dict[str, Dict[str, Any]] = {}
+        for inicio in range(0, len(refs), 500):
+            lote = refs[inicio:inicio + 500]
+            placeholders = ','.join('?' * len(lote))
+            cursor.execute(
+                f"""
+                SELECT processo_referencia, eta_iso, porto_codigo, porto_nome, nome_navio, status_shipsgo, dados_completos_json
+                FROM processos_kanban
+                WHERE processo_referencia IN ({placeholders})
+                """,
+                lote,
+            )
+            for row in cursor.fetchall():
+                anteriores[row[0]] = {
+                    'eta_iso': row[1],
+                    'porto_codigo': row[2],
+                    'porto_nome': row[3],
+                    'nome_navio': row[4],
+                    'status_shipsgo': row[5],
+                    'dados_completos_json': row[6],
+                }
+        return anteriores
+
+    @staticmethod
+    def _json_anterior(prev: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if not prev or not prev.get('dados_completos_json'):
             return None
+        try:
+            return json.loads(prev['dados_completos_json'])
         except Exception as e:
-            logger.warning(f"⚠️ Erro ao buscar processo anterior {processo_referencia}: {e}")
+            logger.warning(f"⚠️ JSON anterior inválido no cache do Kanban: {e}")
             return None
-    
+
+    def _montar_linha_kanban(
+        self,
+        dto: Any,
+        processo_json: Dict[str, Any],
+        prev: Optional[Dict[str, Any]],
+        payload_hash: Optional[str] = None,
+    ) -> tuple:
+        """
+        Monta a tupla de `_COLUNAS_KANBAN` + colunas projetadas, preservando campos logísticos
+        já conhecidos (`prev`).
+        """
+        from services.processos_kanban_projecao import valores_projecao
+
+        # Preparar dados completos JSON
+        dados_completos_json_novo = json.dumps(processo_json, ensure_ascii=False, default=str)
+
+        # ✅ REGRA CRÍTICA (fonte da verdade / evitar regressão):
+        # Kanban é fonte derivada e pode vir "capado" (ex.: sem shipgov2). NÃO podemos apagar
+        # campos logísticos já conhecidos (ETA/Navio/Status/Porto) nem sobrescrever um JSON rico
+        # por um JSON menor que perdeu shipgov2.
+        eta_iso_final = dto.eta_iso
+        porto_codigo_final = dto.porto_codigo
+        porto_nome_final = dto.porto_nome
+        nome_navio_final = dto.nome_navio
+        status_shipsgo_final = dto.status_shipsgo
+        dados_completos_json_final = dados_completos_json_novo
+
+        if prev:
+            # Preservar campos se o novo vier vazio
+            if eta_iso_final is None and prev["eta_iso"]:
+                eta_iso_final = prev["eta_iso"]
+            if not porto_codigo_final and prev["porto_codigo"]:
+                porto_codigo_final = prev["porto_codigo"]
+            if not porto_nome_final and prev["porto_nome"]:
+                porto_nome_final = prev["porto_nome"]
+            if not nome_navio_final and prev["nome_navio"]:
+                nome_navio_final = prev["nome_navio"]
+            if not status_shipsgo_final and prev["status_shipsgo"]:
+                status_shipsgo_final = prev["status_shipsgo"]
+
+            # Preservar JSON rico (shipgov2) se o novo perdeu essa seção
+            try:
+                prev_json_raw = prev["dados_completos_json"] or ""
+                prev_has_shipgov2 = False
+                if prev_json_raw:
+                    prev_json = json.loads(prev_json_raw)
+                    prev_has_shipgov2 = isinstance(prev_json.get("shipgov2"), dict) and bool(prev_json.get("shipgov2"))
+
+                novo_has_shipgov2 = isinstance(processo_json.get("shipgov2"), dict) and bool(processo_json.get("shipgov2"))
+
+                if prev_has_shipgov2 and not novo_has_shipgov2:
+                    dados_completos_json_final = prev_json_raw
+            except Exception:
+                # Se der erro no parse, não bloquear o salvamento
+                pass
+
+        # Formatar datas para string (SQLite)
+        def format_date(dt):
+            if dt is None:
+                return None
+            if isinstance(dt, str):
+                return dt
+            return dt.isoformat() if hasattr(dt, 'isoformat') else str(dt)
+
+        linha = (
+            dto.processo_referencia,
+            dto.id_processo_importacao,
+            dto.id_importacao,
+            dto.etapa_kanban or '',
+            dto.modal or '',
+            dto.numero_ce,
+            dto.numero_di,
+            dto.numero_duimp,
+            dto.numero_dta,  # ✅ NOVO: DTA
+            dto.documento_despacho,  # ✅ NOVO: Tipo de documento (DTA, DI, DUIMP)
+            dto.numero_documento_despacho,  # ✅ NOVO: Número do documento
+            dto.bl_house,  # BL (marítimo) ou AWB (aéreo) - depende do modal
+            dto.master_bl,
+            dto.situacao_ce,
+            dto.situacao_di,
+            dto.situacao_entrega,
+            1 if dto.tem_pendencias else 0,
+            dto.pendencia_icms,
+            1 if dto.pendencia_frete else 0,
+            format_date(dto.data_criacao),
+            format_date(dto.data_embarque),
+            format_date(dto.data_desembaraco),
+            format_date(dto.data_entrega),
+            format_date(dto.data_destino_final),
+            format_date(dto.data_armazenamento),
+            format_date(dto.data_situacao_carga_ce),
+            format_date(dto.data_atracamento),
+            format_date(eta_iso_final),
+            porto_codigo_final,
+            porto_nome_final,
+            nome_navio_final,
+            status_shipsgo_final,
+            dados_completos_json_final,
+            'kanban',
+            payload_hash,
+        )
+        # ✅ NOVO (16/10/2026): pendências/DI/DUIMP projetadas do JSON uma vez, na gravação
+        return linha + valores_projecao(dict(zip(self._COLUNAS_KANBAN, linha)))
+
+    def _efeitos_pos_salvar(self, dto: Any, processo_json: Dict[str, Any]) -> None:
+        """Efeitos colaterais após gravar o processo (ShipsGo + histórico de documentos)."""
+        from services.shipsgo_sync_service import ShipsGoSyncService
+
+        # ✅ ShipsGo (API oficial) → cache shipsgo_tracking (não bloqueante)
+        # Regra: só chama se houver requestId (id_externo_shipsgo) e respeita TTL para evitar custos.
+        try:
+            # Só sincronizar se o Kanban marcou que o tracking está ativo
+            shipsgo_sync_enabled = (os.getenv("SHIPSGO_SYNC_ENABLED", "true") or "true").strip().lower()
+            if shipsgo_sync_enabled not in ("1", "true", "yes", "on"):
+                raise RuntimeError("SHIPSGO_SYNC_ENABLED desabilitado")
+
+            consulta_shipgo = (processo_json.get("consulta_shipgo") or (processo_json.get("dados_processo_kanban") or {}).get("consulta_shipgo") or "").lower()
+            if consulta_shipgo == "ativo":
+                if not hasattr(self, "_shipsgo_sync_service") or self._shipsgo_sync_service is None:
+                    self._shipsgo_sync_service = ShipsGoSyncService(
+                        ttl_minutes=int(os.getenv("SHIPSGO_SYNC_TTL_MIN", "60") or "60")
+                    )
+                _ = self._shipsgo_sync_service.sync_from_kanban_snapshot(
+                processo_referencia=dto.processo_referencia,
+                processo_json=processo_json,
+                )
+        except Exception as e:
+            logger.debug(f"ℹ️ ShipsGo sync não executado para {dto.processo_referencia}: {e}")
+        
+        # ✅ NOVO: Gravar histórico de documentos após salvar processo
+        try:
+            self._gravar_historico_documentos(dto, processo_json)
+        except Exception as e:
+            # Não bloquear se houver erro no histórico
+            logger.warning(f"⚠️ Erro ao gravar histórico de documentos para {dto.processo_referencia}: {e}")
+
     def _salvar_processo(self, processo_json: Dict[str, Any]) -> bool:
         """Salva um processo no SQLite usando o DTO para parse correto e detecta mudanças"""
         try:
             from db_manager import get_db_connection
             from services.models.processo_kanban_dto import ProcessoKanbanDTO
-            from services.notificacao_service import NotificacaoService
-            from services.shipsgo_sync_service import ShipsGoSyncService
             
             # Usar DTO para extrair dados corretamente do JSON
             dto = ProcessoKanbanDTO.from_kanban_json(processo_json)
@@ -228,252 +553,118 @@ class ProcessoKanbanService:
                 logger.warning(f"⚠️ Processo sem número de pedido, ignorando...")
                 return False
             
-            # ✅ NOVO: Buscar versão anterior para comparação
-            processo_anterior_json = self._buscar_processo_anterior(dto.processo_referencia)
-            dto_anterior_para_etapa = None
-            if processo_anterior_json:
-                try:
-                    dto_anterior_para_etapa = ProcessoKanbanDTO.from_kanban_json(processo_anterior_json)
-                except Exception:
-                    dto_anterior_para_etapa = None
-            
-            # ✅ CORREÇÃO CRÍTICA: Verificar se processo é antigo/finalizado ANTES de criar notificações
-            # Não criar notificações para processos entregues ou processos antigos inativos
-            deve_criar_notificacoes = True
-            
-            # Verificar se está entregue
-            situacao_ce = (dto.situacao_ce or '').upper()
-            situacao_entrega = (dto.situacao_entrega or '').upper()
-            if 'ENTREGUE' in situacao_ce or 'ENTREGUE' in situacao_entrega:
-                deve_criar_notificacoes = False
-                logger.debug(f"ℹ️ Processo {dto.processo_referencia} está ENTREGUE - não criar notificações")
-            
-            # Verificar se é processo antigo inativo (sem documentos, sem ETA futuro)
-            if deve_criar_notificacoes and dto.processo_referencia:
-                try:
-                    # Extrair ano do processo (formato: CATEGORIA.NUMERO/AA)
-                    partes = dto.processo_referencia.split('/')
-                    if len(partes) == 2:
-                        ano = partes[1]
-                        if ano and len(ano) == 2:
-                            ano_completo = 2000 + int(ano)
-                            ano_atual = datetime.now().year
-                            
-                            # Se processo é de 2024 ou anterior
-                            if ano_completo < ano_atual:
-                                tem_documentos = bool(
-                                    dto.numero_ce or 
-                                    (dto.numero_di and dto.numero_di not in ('', '/       -')) or 
-                                    dto.numero_duimp
-                                )
-                                tem_eta_futuro = False
-                                if dto.eta_iso:
-                                    try:
-                                        if isinstance(dto.eta_iso, str):
-                                            if 'T' in dto.eta_iso:
-                                                eta_date = datetime.fromisoformat(dto.eta_iso.replace('Z', '').split('+')[0].split('.')[0])
-                                            else:
-                                                eta_date = datetime.strptime(dto.eta_iso.split(' ')[0], '%Y-%m-%d')
-                                        else:
-                                            eta_date = dto.eta_iso
-                                        
-                                        if eta_date.date() >= datetime.now().date():
-                                            tem_eta_futuro = True
-                                    except:
-                                        pass
-                                
-                                # Se não tem documentos nem ETA futuro, é processo antigo inativo
-                                if not tem_documentos and not tem_eta_futuro:
-                                    deve_criar_notificacoes = False
-                                    logger.debug(f"ℹ️ Processo {dto.processo_referencia} é antigo ({ano_completo}) e inativo - não criar notificações")
-                except Exception as e:
-                    logger.debug(f"Erro ao verificar se processo é antigo: {e}")
-            
-            # ✅ NOVO: Detectar mudanças e criar notificações ANTES de salvar (apenas se deve criar)
-            if deve_criar_notificacoes and processo_anterior_json:
-                # Converter processo anterior para DTO para comparação correta
-                dto_anterior = ProcessoKanbanDTO.from_kanban_json(processo_anterior_json)
-                notificacao_service = NotificacaoService()
-                notificacoes_criadas = notificacao_service.detectar_mudancas_e_notificar(dto_anterior, dto)
-                if notificacoes_criadas:
-                    logger.info(f"🔔 {len(notificacoes_criadas)} notificação(ões) criada(s) para {dto.processo_referencia}")
-            elif not deve_criar_notificacoes:
-                logger.debug(f"ℹ️ Processo {dto.processo_referencia} não deve receber notificações (entregue/antigo) - pulando detecção de mudanças")
-            else:
-                logger.debug(f"ℹ️ Processo {dto.processo_referencia} é novo - sem versão anterior para comparar")
-
-            # ✅ NOVO (19/01/2026): Registrar mudança de etapa (lead time por etapa)
-            # Mesmo que não crie notificações, o histórico é útil para monitoramento de processos ativos.
+            # ✅ NOVO: Buscar versão anterior para comparação (notificações ANTES de salvar)
+            conn = get_db_connection()
             try:
-                if deve_criar_notificacoes:
-                    etapa_anterior = (dto_anterior_para_etapa.etapa_kanban if dto_anterior_para_etapa else None)
-                    etapa_nova = dto.etapa_kanban or ''
-                    if etapa_nova and etapa_nova != (etapa_anterior or ''):
-                        self._registrar_mudanca_etapa(
-                            processo_referencia=dto.processo_referencia,
-                            etapa_anterior=etapa_anterior,
-                            etapa_nova=etapa_nova,
-                            modal=dto.modal,
-                        )
-            except Exception as e:
-                logger.debug(f"ℹ️ Erro ao registrar mudança de etapa para {dto.processo_referencia}: {e}")
-            
-            # Preparar dados completos JSON
-            dados_completos_json_novo = json.dumps(processo_json, ensure_ascii=False, default=str)
-
-            # ✅ REGRA CRÍTICA (fonte da verdade / evitar regressão):
-            # Kanban é fonte derivada e pode vir "capado" (ex.: sem shipgov2). NÃO podemos apagar
-            # campos logísticos já conhecidos (ETA/Navio/Status/Porto) nem sobrescrever um JSON rico
-            # por um JSON menor que perdeu shipgov2.
-            eta_iso_final = dto.eta_iso
-            porto_codigo_final = dto.porto_codigo
-            porto_nome_final = dto.porto_nome
-            nome_navio_final = dto.nome_navio
-            status_shipsgo_final = dto.status_shipsgo
-            dados_completos_json_final = dados_completos_json_novo
+                prev = self._carregar_linhas_anteriores(conn.cursor(), [dto.processo_referencia]).get(dto.processo_referencia)
+            finally:
+                conn.close()
+            self._detectar_mudancas(dto, self._json_anterior(prev))
 
+            conn = get_db_connection()
             try:
-                conn_prev = get_db_connection()
-                conn_prev.row_factory = sqlite3.Row
-                cur_prev = conn_prev.cursor()
-                cur_prev.execute(
-                    """
-                    SELECT eta_iso, porto_codigo, porto_nome, nome_navio, status_shipsgo, dados_completos_json
-                    FROM processos_kanban
-                    WHERE processo_referencia = ?
-                    """,
-                    (dto.processo_referencia,),
-                )
-                prev = cur_prev.fetchone()
-                conn_prev.close()
-
-                if prev:
-                    # Preservar campos se o novo vier vazio
-                    if eta_iso_final is None and prev["eta_iso"]:
-                        eta_iso_final = prev["eta_iso"]
-                    if not porto_codigo_final and prev["porto_codigo"]:
-                        porto_codigo_final = prev["porto_codigo"]
-                    if not porto_nome_final and prev["porto_nome"]:
-                        porto_nome_final = prev["porto_nome"]
-                    if not nome_navio_final and prev["nome_navio"]:
-                        nome_navio_final = prev["nome_navio"]
-                    if not status_shipsgo_final and prev["status_shipsgo"]:
-                        status_shipsgo_final = prev["status_shipsgo"]
-
-                    # Preservar JSON rico (shipgov2) se o novo perdeu essa seção
-                    try:
-                        prev_json_raw = prev["dados_completos_json"] or ""
-                        prev_has_shipgov2 = False
-                        if prev_json_raw:
-                            prev_json = json.loads(prev_json_raw)
-                            prev_has_shipgov2 = isinstance(prev_json.get("shipgov2"), dict) and bool(prev_json.get("shipgov2"))
-
-                        novo_has_shipgov2 = isinstance(processo_json.get("shipgov2"), dict) and bool(processo_json.get("shipgov2"))
-
-                        if prev_has_shipgov2 and not novo_has_shipgov2:
-                            dados_completos_json_final = prev_json_raw
-                    except Exception:
-                        # Se der erro no parse, não bloquear o salvamento
-                        pass
-            except Exception:
-                pass
+                cursor = conn.cursor()
+                linha = self._montar_linha_kanban(dto, processo_json, prev, payload_hash=self._hash_payload(processo_json))
+                cursor.execute(self._sql_insert_kanban(), linha)
+                conn.commit()
+            finally:
+                conn.close()
+
+            self._efeitos_pos_salvar(dto, processo_json)
+            return True
             
-            conn = get_db_connection()
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar processo {processo_json.get('numeroPedido', 'N/A')}: {e}", exc_info=True)
+            return False
+
+    def _sincronizar_incremental(self, processos_json: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sincronização incremental: só processa processos cujo JSON mudou desde o último ciclo.
+
+        - compara hash do payload com `processos_kanban.payload_hash` (uma query)
+        - notificações/etapa/ShipsGo/histórico de documentos só para os alterados
+        - upserts de todos os alterados em uma única transação (`executemany`)
+
+        Returns:
+            Dict com métricas do ciclo: total, alterados, inalterados, erros, duration_ms
+        """
+        from db_manager import get_db_connection
+        from services.models.processo_kanban_dto import ProcessoKanbanDTO
+
+        inicio = time.monotonic()
+        metricas = {'total': len(processos_json), 'alterados': 0, 'inalterados': 0, 'erros': 0, 'duration_ms': 0}
+
+        conn = get_db_connection()
+        try:
             cursor = conn.cursor()
-            
-            # Formatar datas para string (SQLite)
-            def format_date(dt):
-                if dt is None:
-                    return None
-                if isinstance(dt, str):
-                    return dt
-                return dt.isoformat() if hasattr(dt, 'isoformat') else str(dt)
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO processos_kanban (
-                    processo_referencia, id_processo_importacao, id_importacao,
-                    etapa_kanban, modal, numero_ce, numero_di, numero_duimp,
-                    numero_dta, documento_despacho, numero_documento_despacho,
-                    bl_house, master_bl, situacao_ce, situacao_di, situacao_entrega,
-                    tem_pendencias, pendencia_icms, pendencia_frete,
-                    data_criacao, data_embarque, data_desembaraco, data_entrega,
-                    data_destino_final, data_armazenamento, data_situacao_carga_ce, data_atracamento,
-                    eta_iso, porto_codigo, porto_nome, nome_navio, status_shipsgo,
-                    dados_completos_json, fonte
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                dto.processo_referencia,
-                dto.id_processo_importacao,
-                dto.id_importacao,
-                dto.etapa_kanban or '',
-                dto.modal or '',
-                dto.numero_ce,
-                dto.numero_di,
-                dto.numero_duimp,
-                dto.numero_dta,  # ✅ NOVO: DTA
-                dto.documento_despacho,  # ✅ NOVO: Tipo de documento (DTA, DI, DUIMP)
-                dto.numero_documento_despacho,  # ✅ NOVO: Número do documento
-                dto.bl_house,  # BL (marítimo) ou AWB (aéreo) - depende do modal
-                dto.master_bl,
-                dto.situacao_ce,
-                dto.situacao_di,
-                dto.situacao_entrega,
-                1 if dto.tem_pendencias else 0,
-                dto.pendencia_icms,
-                1 if dto.pendencia_frete else 0,
-                format_date(dto.data_criacao),
-                format_date(dto.data_embarque),
-                format_date(dto.data_desembaraco),
-                format_date(dto.data_entrega),
-                format_date(dto.data_destino_final),
-                format_date(dto.data_armazenamento),
-                format_date(dto.data_situacao_carga_ce),
-                format_date(dto.data_atracamento),
-                format_date(eta_iso_final),
-                porto_codigo_final,
-                porto_nome_final,
-                nome_navio_final,
-                status_shipsgo_final,
-                dados_completos_json_final,
-                'kanban'
-            ))
-            
-            conn.commit()
+            cursor.execute('SELECT processo_referencia, payload_hash FROM processos_kanban')
+            hashes_atuais = {row[0]: row[1] for row in cursor.fetchall()}
+
+            candidatos = []  # (processo_json, payload_hash)
+            vistos = set()
+            for processo_json in processos_json:
+                ref = processo_json.get('numeroPedido')
+                if not ref:
+                    logger.warning(f"⚠️ Processo sem número de pedido, ignorando...")
+                    metricas['erros'] += 1
+                    continue
+                payload_hash = self._hash_payload(processo_json)
+                if hashes_atuais.get(ref) == payload_hash or (ref, payload_hash) in vistos:
+                    metricas['inalterados'] += 1
+                    continue
+                vistos.add((ref, payload_hash))
+                candidatos.append((processo_json, payload_hash))
+
+            anteriores = self._carregar_linhas_anteriores(
+                cursor, [p.get('numeroPedido') for p, _ in candidatos]
+            )
+        finally:
             conn.close()
 
-            # ✅ ShipsGo (API oficial) → cache shipsgo_tracking (não bloqueante)
-            # Regra: só chama se houver requestId (id_externo_shipsgo) e respeita TTL para evitar custos.
+        # Detectar mudanças (notificações/etapa) e montar linhas - fora da transação de escrita
+        linhas = []
+        alterados = []
+        for processo_json, payload_hash in candidatos:
             try:
-                # Só sincronizar se o Kanban marcou que o tracking está ativo
-                shipsgo_sync_enabled = (os.getenv("SHIPSGO_SYNC_ENABLED", "true") or "true").strip().lower()
-                if shipsgo_sync_enabled not in ("1", "true", "yes", "on"):
-                    raise RuntimeError("SHIPSGO_SYNC_ENABLED desabilitado")
-
-                consulta_shipgo = (processo_json.get("consulta_shipgo") or (processo_json.get("dados_processo_kanban") or {}).get("consulta_shipgo") or "").lower()
-                if consulta_shipgo == "ativo":
-                    if not hasattr(self, "_shipsgo_sync_service") or self._shipsgo_sync_service is None:
-                        self._shipsgo_sync_service = ShipsGoSyncService(
-                            ttl_minutes=int(os.getenv("SHIPSGO_SYNC_TTL_MIN", "60") or "60")
-                        )
-                    _ = self._shipsgo_sync_service.sync_from_kanban_snapshot(
-                    processo_referencia=dto.processo_referencia,
-                    processo_json=processo_json,
-                    )
+                dto = ProcessoKanbanDTO.from_kanban_json(processo_json)
+                prev = anteriores.get(dto.processo_referencia)
+                self._detectar_mudancas(dto, self._json_anterior(prev))
+                linhas.append(self._montar_linha_kanban(dto, processo_json, prev, payload_hash=payload_hash))
+                alterados.append((dto, processo_json))
             except Exception as e:
-                logger.debug(f"ℹ️ ShipsGo sync não executado para {dto.processo_referencia}: {e}")
-            
-            # ✅ NOVO: Gravar histórico de documentos após salvar processo
+                metricas['erros'] += 1
+                logger.error(f"❌ Erro ao preparar processo {processo_json.get('numeroPedido', 'N/A')}: {e}", exc_info=True)
+
+        if linhas:
+            conn = get_db_connection()
             try:
-                self._gravar_historico_documentos(dto, processo_json)
-            except Exception as e:
-                # Não bloquear se houver erro no histórico
-                logger.warning(f"⚠️ Erro ao gravar histórico de documentos para {dto.processo_referencia}: {e}")
-            
-            return True
-            
+                cursor = conn.cursor()
+                cursor.executemany(self._sql_insert_kanban(), linhas)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+        for dto, processo_json in alterados:
+            self._efeitos_pos_salvar(dto, processo_json)
+
+        metricas['alterados'] = len(linhas)
+        metricas['refs_alteradas'] = [dto.processo_referencia for dto, _ in alterados]
+        metricas['duration_ms'] = int((time.monotonic() - inicio) * 1000)
+        self.ultimas_metricas = metricas
+        return metricas
+
+    @staticmethod
+    def _atualizar_dashboard_snapshot(refs_alteradas: List[str]) -> None:
+        try:
+            from services.dashboard_snapshot_service import DashboardSnapshotService
+            atualizados = DashboardSnapshotService().atualizar_apos_sync(refs_alteradas)
+            if atualizados:
+                logger.info(f"📊 {atualizados} dashboard(s) materializado(s) atualizado(s) após sync")
         except Exception as e:
-            logger.error(f"❌ Erro ao salvar processo {processo_json.get('numeroPedido', 'N/A')}: {e}", exc_info=True)
-            return False
+            logger.warning(f"⚠️ Erro ao atualizar dashboard materializado: {e}")
 
     def _registrar_mudanca_etapa(
         self,
@@ -853,19 +853,18 @@ class ProcessoRepository:
             except Exception:
                 pass
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO processos_kanban (
-                    processo_referencia, id_processo_importacao, id_importacao,
-                    etapa_kanban, modal, numero_ce, numero_di, numero_duimp,
-                    numero_dta, documento_despacho, numero_documento_despacho,
-                    bl_house, master_bl, situacao_ce, situacao_di, situacao_entrega,
-                    tem_pendencias, pendencia_icms, pendencia_frete,
-                    data_criacao, data_embarque, data_desembaraco, data_entrega,
-                    data_destino_final, data_armazenamento, data_situacao_carga_ce, data_atracamento,
-                    eta_iso, porto_codigo, porto_nome, nome_navio, status_shipsgo,
-                    dados_completos_json, fonte
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            colunas = (
+                'processo_referencia', 'id_processo_importacao', 'id_importacao',
+                'etapa_kanban', 'modal', 'numero_ce', 'numero_di', 'numero_duimp',
+                'numero_dta', 'documento_despacho', 'numero_documento_despacho',
+                'bl_house', 'master_bl', 'situacao_ce', 'situacao_di', 'situacao_entrega',
+                'tem_pendencias', 'pendencia_icms', 'pendencia_frete',
+                'data_criacao', 'data_embarque', 'data_desembaraco', 'data_entrega',
+                'data_destino_final', 'data_armazenamento', 'data_situacao_carga_ce', 'data_atracamento',
+                'eta_iso', 'porto_codigo', 'porto_nome', 'nome_navio', 'status_shipsgo',
+                'dados_completos_json', 'fonte',
+            )
+            valores = (
                 processo.processo_referencia,
                 processo.id_processo_importacao,
                 processo.id_importacao,
@@ -900,7 +899,17 @@ class ProcessoRepository:
                 status_shipsgo_final,
                 dados_completos_json_final,
                 processo.fonte
-            ))
+            )
+            # ✅ NOVO (16/10/2026): pendências/DI/DUIMP projetadas do JSON (colunas indexadas)
+            from services.processos_kanban_projecao import COLUNAS_PROJECAO, valores_projecao
+
+            valores += valores_projecao(dict(zip(colunas, valores)))
+            colunas += COLUNAS_PROJECAO
+            cursor.execute(
+                f"INSERT OR REPLACE INTO processos_kanban ({', '.join(colunas)}) "
+                f"VALUES ({', '.join('?' * len(colunas))})",
+                valores,
+            )
             
             conn.commit()
             conn.close()
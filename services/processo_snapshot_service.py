@@ -7,16 +7,147 @@ Monta um "resumo completo" de um processo de importação usando o SQL Server
 
 Quando dados essenciais estiverem faltando no banco novo, pode executar fallback
 seletivo (Make/Serpro/Duimp) e escrever de volta no banco novo (auto-heal).
+
+✅ OTIMIZADO (16/10/2026): as 5 seções (capa, documentos, valores, impostos, despesas) eram
+buscadas em série, uma ida ao SQL Server por vez. Agora:
+- as seções são consultadas em paralelo (cada consulta pega sua conexão do pool do adapter);
+- pedidos simultâneos do mesmo processo esperam uma única carga (lock por processo);
+- o snapshot fica num cache em memória de TTL curto (PROCESSO_SNAPSHOT_TTL_SEGUNDOS), invalidado
+  pela sincronização do Kanban, pela gravação de documentos e pela classificação de lançamentos
+  (`invalidar_snapshots`).
 """
 
 from __future__ import annotations
 
+import copy
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+PROCESSO_SNAPSHOT_TTL_SEGUNDOS = int(os.getenv("PROCESSO_SNAPSHOT_TTL_SEGUNDOS", "60"))
+PROCESSO_SNAPSHOT_MAX_WORKERS = int(os.getenv("PROCESSO_SNAPSHOT_MAX_WORKERS", "5"))
+PROCESSO_SNAPSHOT_CACHE_MAX = int(os.getenv("PROCESSO_SNAPSHOT_CACHE_MAX", "256"))
+
+# processo_ref -> (carregado_em monotonic, dados do snapshot)
+_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+# Versão por processo (e global): carga iniciada antes de uma invalidação não grava no cache
+_versoes: Dict[str, int] = {}
+_versao_global = 0
+_locks: Dict[str, threading.Lock] = {}
+# processo_ref -> quantos pedidos pegaram o lock (segurando ou esperando); só descarta com 0
+_locks_em_uso: Dict[str, int] = {}
+_locks_guard = threading.Lock()
+
+
+def invalidar_snapshots(processos: Optional[Iterable[str]] = None) -> None:
+    """
+    Descarta snapshots em cache.
+
+    Args:
+        processos: Referências alteradas/removidas (sync/classificação). None = descarta todos.
+    """
+    global _versao_global
+    with _cache_lock:
+        if processos is None:
+            _versao_global += 1
+            _cache.clear()
+            descartados = list(_locks)
+        else:
+            descartados = []
+            for ref in processos:
+                ref = (ref or "").upper().strip()
+                if ref:
+                    _versoes[ref] = _versoes.get(ref, 0) + 1
+                    _cache.pop(ref, None)
+                    descartados.append(ref)
+    _descartar_locks(descartados)
+
+
+def _versao(processo_ref: str) -> Tuple[int, int]:
+    with _cache_lock:
+        return _versao_global, _versoes.get(processo_ref, 0)
+
+
+@contextmanager
+def _lock_do_processo(processo_ref: str) -> Iterator[None]:
+    """Segura o lock do processo. Conta o pedido ainda sob `_locks_guard`, antes de esperar o lock."""
+    with _locks_guard:
+        lock = _locks.get(processo_ref)
+        if lock is None:
+            lock = _locks[processo_ref] = threading.Lock()
+        _locks_em_uso[processo_ref] = _locks_em_uso.get(processo_ref, 0) + 1
+    try:
+        with lock:
+            yield
+    finally:
+        with _locks_guard:
+            restantes = _locks_em_uso.get(processo_ref, 1) - 1
+            if restantes > 0:
+                _locks_em_uso[processo_ref] = restantes
+            else:
+                _locks_em_uso.pop(processo_ref, None)
+
+
+def _descartar_locks(processos: Iterable[str]) -> None:
+    """
+    Solta o lock (e a versão) de processos fora do cache, para `_locks`/`_versoes` não crescerem
+    com todo processo já consultado. Lock entregue a algum pedido (carga em andamento ou na fila) fica.
+    Chamar SEM `_cache_lock` (ordem: `_locks_guard` -> `_cache_lock`).
+    """
+    with _locks_guard:
+        for ref in processos:
+            if ref not in _locks or _locks_em_uso.get(ref):
+                continue
+            with _cache_lock:
+                if ref in _cache:
+                    continue
+                # Sem carga em andamento: ninguém depende da versão capturada
+                _versoes.pop(ref, None)
+            del _locks[ref]
+
+
+def _ler_cache(processo_ref: str, auto_heal: bool) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        item = _cache.get(processo_ref)
+        if item is None:
+            return None
+        carregado_em, dados = item
+        expirado = time.monotonic() - carregado_em > PROCESSO_SNAPSHOT_TTL_SEGUNDOS
+        if expirado:
+            _cache.pop(processo_ref, None)
+        # Snapshot sem capa carregado sem auto-heal não serve para quem pediu auto-heal
+        elif auto_heal and not dados.get("processo"):
+            return None
+        else:
+            _cache.move_to_end(processo_ref)
+            # Cópia: quem chama (ex.: auto-heal do status v2) altera o dict retornado
+            return copy.deepcopy(dados)
+    _descartar_locks([processo_ref])
+    return None
+
+
+def _gravar_cache(processo_ref: str, dados: Dict[str, Any], versao: Tuple[int, int]) -> None:
+    if PROCESSO_SNAPSHOT_TTL_SEGUNDOS <= 0:
+        return
+    with _cache_lock:
+        if versao != (_versao_global, _versoes.get(processo_ref, 0)):
+            return
+        _cache[processo_ref] = (time.monotonic(), copy.deepcopy(dados))
+        _cache.move_to_end(processo_ref)
+        removidos = []
+        while len(_cache) > max(1, PROCESSO_SNAPSHOT_CACHE_MAX):
+            removidos.append(_cache.popitem(last=False)[0])
+    _descartar_locks(removidos)
+
 
 class ProcessoSnapshotService:
     def __init__(self) -> None:
@@ -26,6 +157,7 @@ class ProcessoSnapshotService:
         self,
         processo_referencia: str,
         auto_heal: bool = True,
+        usar_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Retorna snapshot do processo.
@@ -33,28 +165,52 @@ class ProcessoSnapshotService:
         Args:
             processo_referencia: Ex: ALH.0001/25
             auto_heal: Se True, tenta preencher banco novo quando faltar.
+            usar_cache: Se False, relê o banco novo (ex.: logo após um auto-heal que gravou dados).
         """
-        from utils.sql_server_adapter import get_sql_adapter
-
         processo_ref = (processo_referencia or "").upper().strip()
         if not processo_ref:
             return {"sucesso": False, "erro": "processo_referencia vazio", "dados": None}
 
+        if usar_cache:
+            dados = _ler_cache(processo_ref, auto_heal)
+            if dados is not None:
+                return {"sucesso": True, "erro": None, "dados": dados}
+
+        with _lock_do_processo(processo_ref):
+            # Outro pedido pode ter carregado enquanto esperávamos o lock
+            if usar_cache:
+                dados = _ler_cache(processo_ref, auto_heal)
+                if dados is not None:
+                    return {"sucesso": True, "erro": None, "dados": dados}
+            versao = _versao(processo_ref)
+            resultado = self._carregar_snapshot(processo_ref, auto_heal)
+            if resultado.get("sucesso"):
+                _gravar_cache(processo_ref, resultado["dados"], versao)
+        # Processos que nunca chegaram ao cache (falha, invalidados durante a carga) também deixam lock
+        if len(_locks) > 2 * max(1, PROCESSO_SNAPSHOT_CACHE_MAX):
+            _descartar_locks(list(_locks))
+        return resultado
+
+    def _carregar_snapshot(self, processo_ref: str, auto_heal: bool) -> Dict[str, Any]:
+        from utils.sql_server_adapter import get_sql_adapter
+
         adapter = get_sql_adapter()
         if not adapter:
             return {"sucesso": False, "erro": "SQL Server adapter não disponível", "dados": None}
 
-        # 1) Garantir "capa" do processo no banco novo (auto-heal seletivo)
-        processo_row = self._buscar_processo_importacao(adapter, processo_ref)
-        if not processo_row and auto_heal:
+        # 1) Capa + consultas principais (sempre no banco novo), em paralelo
+        secoes = self._buscar_secoes(adapter, processo_ref)
+
+        # 2) Sem "capa" no banco novo: auto-heal seletivo e releitura (a migração grava as outras seções também)
+        if not secoes["processo"] and auto_heal:
             self._auto_heal_processo_importacao(adapter, processo_ref)
-            processo_row = self._buscar_processo_importacao(adapter, processo_ref)
+            secoes = self._buscar_secoes(adapter, processo_ref)
 
-        # 2) Consultas principais (sempre no banco novo)
-        documentos = self._buscar_documentos(adapter, processo_ref)
-        valores = self._buscar_valores_mercadoria(adapter, processo_ref)
-        impostos = self._buscar_impostos(adapter, processo_ref)
-        despesas = self._buscar_despesas(adapter, processo_ref)
+        processo_row = secoes["processo"]
+        documentos = secoes["documentos"]
+        valores = secoes["valores_mercadoria"]
+        impostos = secoes["impostos_importacao"]
+        despesas = secoes["despesas"]
 
         # 3) Métricas simples de completude (para guiar próximos backfills)
         completeness = self._calcular_completude(processo_row, documentos, valores, impostos, despesas)
@@ -71,6 +227,23 @@ class ProcessoSnapshotService:
 
         return {"sucesso": True, "erro": None, "dados": snapshot}
 
+    def _buscar_secoes(self, adapter, processo_ref: str) -> Dict[str, Any]:
+        """Consulta as seções independentes em paralelo (1 ida ao banco por seção, ao mesmo tempo)."""
+        buscas: List[Tuple[str, Callable[[Any, str], Any]]] = [
+            ("processo", self._buscar_processo_importacao),
+            ("documentos", self._buscar_documentos),
+            ("valores_mercadoria", self._buscar_valores_mercadoria),
+            ("impostos_importacao", self._buscar_impostos),
+            ("despesas", self._buscar_despesas),
+        ]
+        workers = max(1, min(PROCESSO_SNAPSHOT_MAX_WORKERS, len(buscas)))
+        if workers == 1:
+            return {nome: fn(adapter, processo_ref) for nome, fn in buscas}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="processo_snapshot") as pool:
+            futuros = [(nome, pool.submit(fn, adapter, processo_ref)) for nome, fn in buscas]
+            # .result() propaga a exceção da seção (mesmo comportamento da busca sequencial)
+            return {nome: futuro.result() for nome, futuro in futuros}
+
     def _buscar_processo_importacao(self, adapter, processo_ref: str) -> Optional[Dict[str, Any]]:
         sql = f"""
             SELECT TOP 1
@@ -161,7 +161,7 @@ class ProcessoStatusV2Service:
                     
                     # Verificar se faltam impostos/valores também (re-buscar após auto-heal)
                     # Re-buscar snapshot para pegar dados atualizados após auto-heal
-                    snapshot_atualizado = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False)
+                    snapshot_atualizado = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False, recarregar=True)
                     if snapshot_atualizado.get("sucesso"):
                         dados_atualizados = snapshot_atualizado.get("dados") or {}
                         impostos = dados_atualizados.get("impostos_importacao") or []
@@ -205,7 +205,7 @@ class ProcessoStatusV2Service:
                                 import time
                                 time.sleep(0.5)
                                 # Re-buscar snapshot após atualização
-                                snapshot2 = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False)
+                                snapshot2 = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False, recarregar=True)
                                 if snapshot2.get("sucesso"):
                                     dados = snapshot2.get("dados") or dados
                                     # Log para debug
@@ -225,7 +225,7 @@ class ProcessoStatusV2Service:
                 logger.debug(f"[StatusV2] auto-heal DI valores/impostos falhou: {e}")
 
             # re-snapshot após possíveis persistências (sem auto-heal, só reler banco novo)
-            snapshot2 = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False)
+            snapshot2 = self._snapshot_clean(processo_ref, tentar_auto_heal_se_sem_kanban=False, recarregar=True)
             if snapshot2.get("sucesso"):
                 dados = snapshot2.get("dados") or dados
 
@@ -247,13 +247,16 @@ class ProcessoStatusV2Service:
     # Clean path helpers
     # -------------------------
 
-    def _snapshot_clean(self, processo_ref: str, *, tentar_auto_heal_se_sem_kanban: bool = False) -> Dict[str, Any]:
+    def _snapshot_clean(
+        self, processo_ref: str, *, tentar_auto_heal_se_sem_kanban: bool = False, recarregar: bool = False
+    ) -> Dict[str, Any]:
         from services.processo_snapshot_service import ProcessoSnapshotService
 
         svc = ProcessoSnapshotService()
         # Se processo não está no Kanban (antigo), tentar auto-heal para buscar dados do banco antigo/Make
         use_auto_heal = tentar_auto_heal_se_sem_kanban
-        return svc.obter_snapshot(processo_ref, auto_heal=use_auto_heal)
+        # `recarregar`: releitura após auto-heal que pode ter gravado no banco novo (não usar o cache)
+        return svc.obter_snapshot(processo_ref, auto_heal=use_auto_heal, usar_cache=not recarregar)
 
     def _buscar_kanban_min(self, processo_ref: str) -> Optional[Dict[str, Any]]:
         """
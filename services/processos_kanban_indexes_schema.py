@@ -33,3 +33,16 @@ def criar_indices_processos_kanban(cursor: sqlite3.Cursor) -> None:
         "CREATE INDEX IF NOT EXISTS idx_processos_kanban_data_armazenamento ON processos_kanban(data_armazenamento)"
     )
 
+    # ✅ NOVO (16/10/2026): listagens do dashboard sobre colunas projetadas (ver processos_kanban_projecao)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_processos_kanban_pendencia "
+        "ON processos_kanban(pendencia_tipo, processo_referencia, modal)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_processos_kanban_di_analise "
+        "ON processos_kanban(di_em_analise, processo_referencia)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_processos_kanban_duimp_analise "
+        "ON processos_kanban(duimp_em_analise, processo_referencia)"
+    )
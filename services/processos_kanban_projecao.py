@@ -0,0 +1,474 @@
+"""
+Projeção de campos "quentes" do JSON do Kanban em colunas tipadas de `processos_kanban`.
+
+✅ NOVO (16/10/2026): pendências ativas e DIs/DUIMPs em análise eram calculadas a cada
+leitura fazendo `json.loads(dados_completos_json)` de todas as linhas (+ 1 consulta extra por
+processo para `situacao_entrega`). Agora a mesma regra roda UMA vez, na gravação do processo
+(`ProcessoKanbanService` / `ProcessoRepository`), e o resultado fica em colunas indexadas:
+
+- `pendencia_tipo` / `pendencia_descricao` (Bloqueio CE > LPCO > ICMS > AFRMM > Frete);
+- `pendencia_afrmm` / `pendencia_lpco` / `bloqueio` (flags 0/1, independentes da prioridade acima);
+- `di_em_analise` + situação/canal/datas da DI;
+- `duimp_em_analise` + situação/versão/canal/datas da DUIMP.
+
+As funções de listagem do `db_manager` passam a ser SQL puro sobre essas colunas.
+Mudou a regra? Incremente `PROJECAO_VERSAO`: `reprojetar_pendentes` (chamado no `init_db`)
+recalcula as linhas gravadas com versão anterior.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECAO_VERSAO = 3
+
+# Colunas projetadas (ordem usada nos INSERTs dos writers)
+COLUNAS_PROJECAO: Tuple[str, ...] = (
+    'pendencia_tipo', 'pendencia_descricao',
+    'pendencia_afrmm', 'pendencia_lpco', 'bloqueio',
+    'di_em_analise', 'di_situacao', 'di_canal', 'di_data_registro', 'di_data_desembaraco',
+    'di_situacao_entrega_carga',
+    'duimp_em_analise', 'duimp_situacao', 'duimp_versao', 'duimp_canal', 'duimp_data_registro',
+    'duimp_data_desembaraco', 'duimp_situacao_entrega_carga',
+    'projecao_versao',
+)
+
+_TIPOS_COLUNAS = {
+    'pendencia_afrmm': 'INTEGER NOT NULL DEFAULT 0',
+    'pendencia_lpco': 'INTEGER NOT NULL DEFAULT 0',
+    'bloqueio': 'INTEGER NOT NULL DEFAULT 0',
+    'di_em_analise': 'INTEGER NOT NULL DEFAULT 0',
+    'duimp_em_analise': 'INTEGER NOT NULL DEFAULT 0',
+    'projecao_versao': 'INTEGER',
+}
+
+_DI_VAZIA = ('', '/       -')
+_ENTREGA_CONDICIONADA_ICMS = (
+    'ENTREGA CONDICIONADA A APRESENTACAO E RETENCAO DOS SEGUINTES DOCUMENTOS: DOCUMENTO DE ARRECADACAO DO ICMS'
+)
+
+
+def criar_colunas_projecao(cursor: sqlite3.Cursor) -> None:
+    """Migração: adiciona as colunas projetadas em instalações antigas (idempotente)."""
+    for coluna in COLUNAS_PROJECAO:
+        try:
+            cursor.execute(
+                f"ALTER TABLE processos_kanban ADD COLUMN {coluna} {_TIPOS_COLUNAS.get(coluna, 'TEXT')}"
+            )
+        except sqlite3.OperationalError:
+            pass
+
+
+# ---------------------------------------------------------------------- helpers
+def _primeiro(valor: Any) -> Any:
+    if isinstance(valor, list) and len(valor) > 0:
+        return valor[0]
+    return valor
+
+
+def _texto(valor: Any) -> Optional[str]:
+    """Normaliza para TEXT do SQLite (None/vazio → None)."""
+    if valor is None or valor == '':
+        return None
+    return valor if isinstance(valor, str) else str(valor)
+
+
+def _carregar_json(linha: Mapping[str, Any]) -> Dict[str, Any]:
+    raw = linha.get('dados_completos_json')
+    if not raw:
+        return {}
+    if isinstance(raw, dict):
+        return raw
+    try:
+        dados = json.loads(raw)
+    except (TypeError, ValueError):
+        return {}
+    return dados if isinstance(dados, dict) else {}
+
+
+# ---------------------------------------------------------------------- pendências
+def _icms_valido(pendencia_icms: Any) -> bool:
+    """Valor de `pendencia_icms` indica pendência de fato (não 'OK', 'PAGO', histórico, etc.)."""
+    if not pendencia_icms:
+        return False
+    valor = str(pendencia_icms).upper().strip()
+    # ⚠️ '' na lista faz a checagem sempre dar False (ICMS nunca vira pendência). Regra herdada de
+    # `obter_pendencias_ativas`, mantida aqui para a projeção não mudar o resultado do dashboard.
+    nao_pendencia = ['OK', 'PAGO', 'RESOLVID', 'LIQUIDAD', 'QUITAD', 'FINALIZAD', 'N/A', 'NULL', 'NONE', '']
+    return bool(valor) and not any(v in valor for v in nao_pendencia)
+
+
+def _verdadeiro(valor: Any) -> bool:
+    """Flag do JSON (bool, 0/1 ou texto) ligada. Também usada pela listagem por categoria."""
+    return valor is True or valor == 1 or (isinstance(valor, str) and valor.strip().lower() in ('true', '1', 'sim', 'yes'))
+
+
+def _sinais_ce_lpco(dados_json: Dict[str, Any]) -> Dict[str, Any]:
+    """AFRMM, bloqueios do CE e exigência de LPCO do JSON do Kanban (usados pela pendência e pelas flags)."""
+    sinais: Dict[str, Any] = {
+        'pendencia_afrmm': False,
+        'bloqueios_ce': None,
+        'bloqueio_ativo': False,
+        'lpco_exigencia': None,
+    }
+    try:
+        ce_data = _primeiro(dados_json.get('ce'))
+        if ce_data:
+            sinais['pendencia_afrmm'] = _verdadeiro(ce_data.get('pendencia_afrmm', False))
+            sinais['bloqueios_ce'] = ce_data.get('bloqueios') or ce_data.get('bloqueios_baixados')
+            # Flag de bloqueio: só bloqueio ativo (baixados não contam)
+            sinais['bloqueio_ativo'] = bool(ce_data.get('bloqueios')) or any(
+                _verdadeiro(ce_data.get(chave))
+                for chave in ('carga_bloqueada', 'cargaBloqueada', 'bloqueio_impede_despacho', 'bloqueioImpedeVinculacaodespacho')
+            )
+
+        # LPCO pode estar em 'lpco' ou 'lpcoDetails'
+        lpco_data = _primeiro(dados_json.get('lpco') or dados_json.get('lpcoDetails'))
+        if lpco_data:
+            situacao_lpco = lpco_data.get('situacao') or lpco_data.get('situacao_lpco') or lpco_data.get('status')
+            numero_lpco = lpco_data.get('LPCO') or lpco_data.get('numero_lpco') or lpco_data.get('numero')
+            lpco_exigencia = lpco_data.get('exigencia')
+            # LPCO não deferido é pendência bloqueante (mesmo sem exigência)
+            if situacao_lpco and 'deferido' not in str(situacao_lpco).lower():
+                lpco_exigencia = lpco_exigencia or f"LPCO {numero_lpco or 'N/A'} não deferido - Situação: {situacao_lpco}"
+            sinais['lpco_exigencia'] = lpco_exigencia
+    except Exception:
+        # JSON com formato inesperado: fica com o que já foi extraído (mesmo comportamento anterior)
+        pass
+    return sinais
+
+
+def projetar_flags(dados_json: Dict[str, Any]) -> Dict[str, int]:
+    """Flags tipadas de AFRMM pendente, LPCO não deferido/com exigência e bloqueio ativo do CE."""
+    sinais = _sinais_ce_lpco(dados_json)
+    return {
+        'pendencia_afrmm': 1 if sinais['pendencia_afrmm'] else 0,
+        'pendencia_lpco': 1 if sinais['lpco_exigencia'] else 0,
+        'bloqueio': 1 if sinais['bloqueio_ativo'] else 0,
+    }
+
+
+def projetar_pendencia(linha: Mapping[str, Any], dados_json: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Tipo/descrição da pendência ativa do processo (mesma regra de `obter_pendencias_ativas`).
+
+    Prioridade: Bloqueio CE > LPCO > ICMS (só após desembaraço) > AFRMM > Frete.
+    """
+    pendencia_icms = linha.get('pendencia_icms')
+    sinais = _sinais_ce_lpco(dados_json)
+    pendencia_afrmm = sinais['pendencia_afrmm']
+    lpco_exigencia = sinais['lpco_exigencia']
+    bloqueios_ce = sinais['bloqueios_ce']
+
+    # Situação da tabela primeiro (prioridade); DUIMP só existe no JSON
+    situacao_di = linha.get('situacao_di') or ''
+    situacao_entrega = linha.get('situacao_entrega') or ''
+    situacao_duimp = None
+
+    try:
+        if not situacao_di and dados_json.get('di'):
+            di_data = _primeiro(dados_json.get('di'))
+            situacao_di = di_data.get('situacao', '') or di_data.get('situacao_di', '')
+
+        if dados_json.get('duimp'):
+            duimp_data = _primeiro(dados_json.get('duimp'))
+            situacao_duimp = duimp_data.get('situacao', '') or duimp_data.get('status', '') or duimp_data.get('situacao_duimp', '')
+
+        if not situacao_entrega:
+            situacao_entrega = dados_json.get('situacao_entrega', '') or dados_json.get('situacaoEntrega', '')
+    except Exception:
+        # JSON com formato inesperado: fica com o que já foi extraído (mesmo comportamento anterior)
+        pass
+
+    # ✅ REGRA LEGAL: ICMS só pode ser cobrado APÓS desembaraço (ato gerador)
+    pendencia_icms_valida = _icms_valido(pendencia_icms)
+    icms_pode_ser_cobrado = False
+    if pendencia_icms_valida:
+        numero_di = linha.get('numero_di') or ''
+        numero_duimp = linha.get('numero_duimp') or ''
+        tem_di = bool(numero_di and numero_di not in _DI_VAZIA)
+        if tem_di:
+            situacao_di_lower = str(situacao_di or '').lower()
+            situacao_entrega_lower = str(situacao_entrega or '').lower()
+            icms_pode_ser_cobrado = (
+                'desembara' in situacao_di_lower
+                or 'desembara' in situacao_entrega_lower
+                or 'entregue' in situacao_entrega_lower
+                or 'entrega autorizada' in situacao_entrega_lower
+            )
+        elif numero_duimp:
+            # DUIMP: só nas situações específicas de tributos estaduais
+            situacao_duimp_upper = str(situacao_duimp or '').upper()
+            icms_pode_ser_cobrado = (
+                'DESEMBARACADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS' in situacao_duimp_upper
+                or 'ENTREGA_ANTECIPADA_AGUARDANDO_PENDENCIA_TRIBUTOS_ESTADUAIS' in situacao_duimp_upper
+            )
+
+    if bloqueios_ce:
+        return 'Bloqueio CE', str(bloqueios_ce)
+    if lpco_exigencia:
+        return 'LPCO', str(lpco_exigencia)
+    if pendencia_icms_valida and icms_pode_ser_cobrado:
+        return 'ICMS', str(pendencia_icms)
+    if pendencia_afrmm:
+        return 'AFRMM', 'Pendente de pagamento'
+    if linha.get('pendencia_frete'):
+        return 'Frete', 'Pendente de pagamento'
+    return None, None
+
+
+# ---------------------------------------------------------------------- DUIMP em análise
+def _excluir_da_analise(situacao_doc_upper: str, entrega_tabela_upper: str, entrega_carga_upper: str) -> bool:
+    """Desembaraçada com entrega autorizada/condicionada (ICMS) ou entrega autorizada sem prosseguimento."""
+    esta_desembaracada = 'DESEMBARACADA' in situacao_doc_upper or 'DESEMBARACADO' in situacao_doc_upper
+    tem_entrega_autorizada = 'ENTREGA AUTORIZADA' in entrega_tabela_upper or 'ENTREGA AUTORIZADA' in entrega_carga_upper
+    tem_entrega_condicionada_icms = (
+        _ENTREGA_CONDICIONADA_ICMS in entrega_tabela_upper or _ENTREGA_CONDICIONADA_ICMS in entrega_carga_upper
+    )
+    sem_prosseguimento = any(
+        'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in s
+        for s in (situacao_doc_upper, entrega_tabela_upper, entrega_carga_upper)
+    )
+    return (esta_desembaracada and (tem_entrega_autorizada or tem_entrega_condicionada_icms)) or sem_prosseguimento
+
+
+def _ce_entregue(linha: Mapping[str, Any]) -> bool:
+    return linha.get('situacao_ce') == 'ENTREGUE'
+
+
+def projetar_duimp(linha: Mapping[str, Any], dados_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Situação da DUIMP (do JSON) e flag `duimp_em_analise` (mesma regra de `obter_duimps_em_analise`)."""
+    numero_duimp = linha.get('numero_duimp')
+    numero_di = linha.get('numero_di')
+    resultado: Dict[str, Any] = {
+        'duimp_em_analise': 0,
+        'duimp_situacao': None,
+        'duimp_versao': None,
+        'duimp_canal': None,
+        'duimp_data_registro': None,
+        'duimp_data_desembaraco': None,
+        'duimp_situacao_entrega_carga': None,
+    }
+    if not numero_duimp:
+        return resultado
+
+    situacao_duimp = None
+    try:
+        resultado['duimp_situacao_entrega_carga'] = (
+            dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
+        )
+        canal = dados_json.get('canal') or dados_json.get('canal_duimp')
+
+        duimps_json = dados_json.get('duimp', [])
+        itens = duimps_json if isinstance(duimps_json, list) else [duimps_json]
+        for item in itens:
+            if isinstance(item, dict) and item.get('numero') == numero_duimp:
+                situacao_duimp = (
+                    item.get('situacao_duimp') or item.get('situacao_duimp_agr') or item.get('ultima_situacao') or ''
+                )
+                resultado['duimp_versao'] = item.get('versao', '1')
+                resultado['duimp_data_registro'] = item.get('data_registro_mais_recente') or item.get('data_ultimo_evento')
+                canal = canal or item.get('canal') or item.get('canal_duimp') or item.get('canal_consolidado')
+                resultado['duimp_data_desembaraco'] = (
+                    item.get('data_desembaraco') or item.get('data_hora_desembaraco') or item.get('dataDesembaraco')
+                )
+                break
+        resultado['duimp_canal'] = canal
+    except Exception as e:
+        logger.debug(f"Erro ao projetar DUIMP de {linha.get('processo_referencia')}: {e}")
+
+    resultado['duimp_situacao'] = situacao_duimp or None
+    # Em análise: DUIMP (sem DI) com situação conhecida, CE não entregue e não excluída pela entrega
+    if (
+        situacao_duimp
+        and (not numero_di or numero_di in _DI_VAZIA)
+        and not _ce_entregue(linha)
+        and not _excluir_da_analise(
+            str(situacao_duimp).upper(),
+            str(linha.get('situacao_entrega') or '').upper(),
+            str(resultado['duimp_situacao_entrega_carga'] or '').upper(),
+        )
+    ):
+        resultado['duimp_em_analise'] = 1
+    return resultado
+
+
+# ---------------------------------------------------------------------- DI em análise
+def _campos_di_raiz(dados_json: Dict[str, Any], atual: Dict[str, Any]) -> None:
+    """Dados da DI no nível raiz do JSON (processos rodoviários, ex.: ARG)."""
+    if not atual['situacao']:
+        atual['situacao'] = dados_json.get('situacaoDI') or dados_json.get('situacao_di')
+    if not atual['canal']:
+        atual['canal'] = dados_json.get('canal') or dados_json.get('canal_di')
+    if not atual['data_desembaraco']:
+        atual['data_desembaraco'] = dados_json.get('dataDesembaraco') or dados_json.get('data_desembaraco')
+    if not atual['entrega_carga']:
+        atual['entrega_carga'] = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
+
+
+def projetar_di(linha: Mapping[str, Any], dados_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Situação/canal/datas da DI e flag `di_em_analise` (mesma regra de `obter_dis_em_analise`)."""
+    numero_di = linha.get('numero_di')
+    situacao_di_tabela = linha.get('situacao_di')
+    di: Dict[str, Any] = {
+        'situacao': situacao_di_tabela if situacao_di_tabela and str(situacao_di_tabela).strip() else None,
+        'canal': None,
+        'data_registro': None,
+        'data_desembaraco': None,
+        'entrega_carga': None,
+    }
+    tem_di = bool(numero_di and numero_di not in _DI_VAZIA)
+
+    if tem_di:
+        try:
+            di['entrega_carga'] = dados_json.get('situacaoEntregaCarga') or dados_json.get('situacao_entrega_carga')
+            di['canal'] = dados_json.get('canal') or dados_json.get('canal_di')
+            if not di['situacao']:
+                di['situacao'] = dados_json.get('situacaoDI') or dados_json.get('situacao_di')
+            di['data_registro'] = (
+                dados_json.get('dataHoraRegistro')
+                or dados_json.get('dataHoraRegistroDi')
+                or dados_json.get('dataRegistro')
+                or dados_json.get('data_registro')
+            )
+            di['data_desembaraco'] = dados_json.get('dataDesembaraco') or dados_json.get('data_desembaraco')
+
+            numero_di_json = dados_json.get('numeroDi') or dados_json.get('numero_di')
+            if (numero_di_json and str(numero_di_json) == str(numero_di)) or (
+                dados_json.get('situacaoDI') or dados_json.get('canal') or dados_json.get('situacaoEntregaCarga')
+            ):
+                _campos_di_raiz(dados_json, di)
+
+            # A DI pode estar em dados_json['di'] (lista ou dict)
+            dis_json = dados_json.get('di', [])
+            itens = dis_json if isinstance(dis_json, list) else [dis_json]
+            for item in itens:
+                if not isinstance(item, dict):
+                    continue
+                numero_item = item.get('numero_di') or item.get('numero', '')
+                if numero_item == numero_di or not di['situacao']:
+                    di['situacao'] = item.get('situacao_di') or item.get('situacao') or di['situacao'] or ''
+                    if not di['entrega_carga']:
+                        di['entrega_carga'] = item.get('situacao_entrega_carga') or item.get('situacaoEntregaCarga')
+                    if not di['canal']:
+                        di['canal'] = (
+                            item.get('canal') or item.get('canal_selecao_parametrizada') or item.get('canal_di')
+                        )
+                    if not di['data_desembaraco']:
+                        di['data_desembaraco'] = (
+                            item.get('data_hora_desembaraco') or item.get('data_desembaraco') or item.get('dataDesembaraco')
+                        )
+                    di['data_registro'] = (
+                        item.get('data_hora_registro')
+                        or item.get('data_registro')
+                        or item.get('dataHoraRegistro')
+                        or item.get('dataRegistro')
+                        or di['data_registro']
+                    )
+                    break
+        except Exception as e:
+            logger.debug(f"Erro ao projetar DI de {linha.get('processo_referencia')}: {e}")
+
+    em_analise = 0
+    if tem_di and not _ce_entregue(linha):
+        entrega_tabela = str(linha.get('situacao_entrega') or '').upper()
+        entrega_carga = str(di['entrega_carga'] or '').upper()
+        situacao_upper = str(di['situacao']).upper() if di['situacao'] else ''
+        esta_desembaracada = 'DESEMBARACADA' in situacao_upper or 'DESEMBARACADO' in situacao_upper
+        # Entrega autorizada só conta quando a tabela tem situação de entrega (regra herdada do relatório)
+        tem_entrega_autorizada = bool(entrega_tabela) and (
+            'ENTREGA AUTORIZADA' in entrega_carga or 'ENTREGA AUTORIZADA' in entrega_tabela
+        )
+        tem_entrega_condicionada_icms = (
+            _ENTREGA_CONDICIONADA_ICMS in entrega_carga or _ENTREGA_CONDICIONADA_ICMS in entrega_tabela
+        )
+        sem_prosseguimento = any(
+            'ENTREGA AUTORIZADA SEM PROSSEGUIMENTO' in s for s in (situacao_upper, entrega_carga, entrega_tabela)
+        )
+        excluir = (esta_desembaracada and (tem_entrega_autorizada or tem_entrega_condicionada_icms)) or sem_prosseguimento
+        em_analise = 0 if excluir else 1
+
+    return {
+        'di_em_analise': em_analise,
+        'di_situacao': di['situacao'] or None,
+        'di_canal': di['canal'],
+        'di_data_registro': di['data_registro'],
+        'di_data_desembaraco': di['data_desembaraco'],
+        'di_situacao_entrega_carga': di['entrega_carga'],
+    }
+
+
+# ---------------------------------------------------------------------- API
+def projetar(linha: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula as colunas projetadas a partir de uma linha de `processos_kanban`.
+
+    Args:
+        linha: colunas da tabela (dict ou sqlite3.Row convertido); `dados_completos_json`
+            pode ser a string gravada ou o dict já carregado.
+
+    Returns:
+        Dict com todas as chaves de `COLUNAS_PROJECAO`.
+    """
+    dados_json = _carregar_json(linha)
+    tipo, descricao = projetar_pendencia(linha, dados_json)
+    projecao: Dict[str, Any] = {'pendencia_tipo': tipo, 'pendencia_descricao': descricao}
+    projecao.update(projetar_flags(dados_json))
+    projecao.update(projetar_di(linha, dados_json))
+    projecao.update(projetar_duimp(linha, dados_json))
+    projecao['projecao_versao'] = PROJECAO_VERSAO
+    return {
+        coluna: (_texto(valor) if coluna not in _TIPOS_COLUNAS else valor)
+        for coluna, valor in projecao.items()
+    }
+
+
+def valores_projecao(linha: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """Valores de `projetar(linha)` na ordem de `COLUNAS_PROJECAO` (para INSERTs posicionais)."""
+    projecao = projetar(linha)
+    return tuple(projecao[coluna] for coluna in COLUNAS_PROJECAO)
+
+
+_COLUNAS_ENTRADA = (
+    'processo_referencia', 'numero_di', 'numero_duimp', 'situacao_ce', 'situacao_di',
+    'situacao_entrega', 'pendencia_icms', 'pendencia_frete', 'dados_completos_json',
+)
+
+
+def reprojetar_pendentes(cursor: sqlite3.Cursor, lote: int = 500) -> int:
+    """
+    Backfill: recalcula a projeção das linhas sem projeção ou com `projecao_versao` antiga.
+
+    Returns:
+        Quantidade de linhas atualizadas.
+    """
+    sets = ', '.join(f'{coluna} = ?' for coluna in COLUNAS_PROJECAO)
+    total = 0
+    while True:
+        cursor.execute(
+            f"""
+            SELECT {', '.join(_COLUNAS_ENTRADA)} FROM processos_kanban
+            WHERE projecao_versao IS NULL OR projecao_versao < ?
+            LIMIT ?
+            """,
+            (PROJECAO_VERSAO, lote),
+        )
+        linhas = cursor.fetchall()
+        if not linhas:
+            break
+        cursor.executemany(
+            f'UPDATE processos_kanban SET {sets} WHERE processo_referencia = ?',
+            [
+                valores_projecao(dict(zip(_COLUNAS_ENTRADA, linha))) + (linha[0],)
+                for linha in linhas
+            ],
+        )
+        total += len(linhas)
+    if total:
+        logger.info(f"[KANBAN_PROJECAO] {total} processo(s) reprojetado(s) (versão {PROJECAO_VERSAO})")
+    return total
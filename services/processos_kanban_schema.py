@@ -57,7 +57,8 @@ def criar_tabelas_processos_e_kanban(cursor: sqlite3.Cursor) -> None:
             numero_documento_despacho TEXT,
             dados_completos_json TEXT,
             atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            fonte TEXT DEFAULT 'kanban'
+            fonte TEXT DEFAULT 'kanban',
+            payload_hash TEXT
         )
         """
     )
@@ -76,9 +77,16 @@ def criar_tabelas_processos_e_kanban(cursor: sqlite3.Cursor) -> None:
         "ALTER TABLE processos_kanban ADD COLUMN numero_dta TEXT",
         "ALTER TABLE processos_kanban ADD COLUMN documento_despacho TEXT",
         "ALTER TABLE processos_kanban ADD COLUMN numero_documento_despacho TEXT",
+        # Hash do JSON recebido do Kanban (sync incremental: pula processos sem mudança)
+        "ALTER TABLE processos_kanban ADD COLUMN payload_hash TEXT",
     ):
         try:
             cursor.execute(ddl)
         except sqlite3.OperationalError:
             pass
 
+    # ✅ NOVO (16/10/2026): colunas projetadas do JSON (pendências / DI / DUIMP em análise)
+    from services.processos_kanban_projecao import criar_colunas_projecao
+
+    criar_colunas_projecao(cursor)
+
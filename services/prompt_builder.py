@@ -2,47 +2,29 @@
 
 Extraído de ChatService para deixar o código mais limpo e facilitar
 as próximas evoluções de "inteligência" do mAIke.
+
+✅ NOVO (16/10/2026): montagem em segmentos estáveis por prefixo.
+O cache automático de prompt da OpenAI só reaproveita o PREFIXO idêntico da
+requisição; por isso os segmentos estáticos (núcleo + política de tools) vêm
+sempre primeiro e byte a byte iguais, seguidos das regras aprendidas (globais)
+e só então do que varia por usuário/turno (saudação, contexto, histórico,
+mensagem).
 """
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class PromptBuilder:
-    """Constrói system_prompt e user_prompt a partir dos dados calculados no ChatService.
-
-    Importante: esta classe NÃO toma decisões de negócio complexas; ela apenas
-    reorganiza e formata o texto que já era montado dentro do ChatService.
-    Isso garante comportamento idêntico ao código anterior.
-    """
-
-    def __init__(self, nome_usuario: Optional[str] = None) -> None:
-        self.nome_usuario = nome_usuario
-
-    # --- API principal -----------------------------------------------------
-
-    def build_system_prompt(
-        self,
-        saudacao_personalizada: str,
-        regras_aprendidas: Optional[str] = None,
-    ) -> str:
-        """Monta o system_prompt exatamente como estava em ChatService.
-
-        O conteúdo foi copiado de `chat_service.py` (bloco em torno de L7195).
-        Qualquer ajuste futuro deve ser feito AQUI, não mais dentro do ChatService.
-        
-        Args:
-            saudacao_personalizada: Saudação personalizada com nome do usuário
-            regras_aprendidas: Texto formatado com regras aprendidas (opcional)
-        """
-        # Import local para evitar ciclos se precisarmos no futuro
-        # (atualmente não há dependências internas).
+# --- Segmentos estáticos ---------------------------------------------------
+# ⚠️ Qualquer byte alterado aqui invalida o prefixo em cache no provedor.
+# Nada dinâmico (nome, data, contexto) pode entrar nestes textos.
 
-        system_prompt = f"""Você é o mAIke, um assistente inteligente e conversacional especializado em DUIMP (Declaração Única de Importação) e processos de importação no Brasil.{saudacao_personalizada}
+SYSTEM_PROMPT_NUCLEO = """Você é o mAIke, um assistente inteligente e conversacional especializado em DUIMP (Declaração Única de Importação) e processos de importação no Brasil.
 
 🧠 CHAIN OF THOUGHT (SEMPRE PENSE ANTES DE AGIR):
 ANTES de escolher uma tool, SEMPRE pense passo a passo:
@@ -332,7 +314,9 @@ Sua função é ajudar usuários a:
 - Responder perguntas sobre processos, CEs (Conhecimentos de Embarque) e CCTs (Conhecimentos de Carga Aérea)
 - Pagar boletos bancários (via PDF ou dados manuais)
 
-📋 REGRAS DE USO DAS FUNÇÕES:
+"""
+
+SYSTEM_PROMPT_POLITICA_TOOLS = """📋 REGRAS DE USO DAS FUNÇÕES:
 
 PROCESSO:
 - Número específico (VDM.0003/25) → consultar_status_processo
@@ -461,7 +445,7 @@ PAGAMENTO DE BOLETO (✅ NOVO - 13/01/2026):
 
 📊 SISTEMA INTELIGENTE DE RELATÓRIOS (✅ NOVO - 12/01/2026):
 - Cada relatório gerado tem um ID único no formato "rel_YYYYMMDD_HHMMSS" (ex: "rel_20260112_145026")
-- O ID aparece no JSON inline [REPORT_META:{{"id":"rel_20260112_145026",...}}] no final de cada relatório
+- O ID aparece no JSON inline [REPORT_META:{"id":"rel_20260112_145026",...}] no final de cada relatório
 - 🎯 SISTEMA AUTOMÁTICO: A função pick_report() escolhe inteligentemente qual relatório usar:
   1. Se mensagem menciona tipo ("fechamento", "hoje") → escolhe o mais recente daquele tipo
   2. Senão → escolhe active_report_id se ainda estiver dentro do TTL (60 min padrão)
@@ -636,12 +620,126 @@ Se a resposta for convertida para voz (TTS), siglas serão automaticamente forma
 - ETA → "eta" (palavra)
 Você não precisa formatar manualmente - o sistema faz isso automaticamente. Mas seja claro ao usar siglas no texto.
 """
+
+
+def _contar_tokens(texto: str) -> int:
+    from services.tool_definitions import estimar_tokens
+    return estimar_tokens(texto) if texto else 0
+
+
+@dataclass
+class SegmentoPrompt:
+    """Trecho nomeado do prompt. `cacheavel` = igual entre usuários e turnos."""
+
+    nome: str
+    texto: str
+    cacheavel: bool = False
+    tokens: Optional[int] = None
+
+    def contar_tokens(self) -> int:
+        if self.tokens is None:
+            self.tokens = _contar_tokens(self.texto)
+        return self.tokens
+
+
+@dataclass
+class PromptMontado:
+    """Resultado da montagem: texto final + métricas por segmento."""
+
+    system: List[SegmentoPrompt] = field(default_factory=list)
+    user: List[SegmentoPrompt] = field(default_factory=list)
+
+    @property
+    def system_prompt(self) -> str:
+        return "".join(s.texto for s in self.system)
+
+    @property
+    def user_prompt(self) -> str:
+        return "".join(s.texto for s in self.user)
+
+    def tokens_por_segmento(self) -> Dict[str, int]:
+        return {s.nome: s.contar_tokens() for s in self.system + self.user if s.texto}
+
+    def prefixo_cacheavel_tokens(self) -> int:
+        """Tokens do prefixo contínuo de segmentos cacheáveis (do início do system prompt)."""
+        total = 0
+        for s in self.system:
+            if not s.cacheavel:
+                break
+            total += s.contar_tokens()
+        return total
+
+    def metricas(self) -> Dict[str, Any]:
+        por_segmento = self.tokens_por_segmento()
+        total = sum(por_segmento.values())
+        prefixo = self.prefixo_cacheavel_tokens()
+        return {
+            "tokens_por_segmento": por_segmento,
+            "total_tokens": total,
+            "prefixo_cacheavel_tokens": prefixo,
+            "prefixo_cacheavel_ratio": round(prefixo / total, 3) if total else 0.0,
+        }
+
+
+_SEGMENTOS_ESTATICOS: Optional[tuple] = None
+
+
+def segmentos_estaticos() -> tuple:
+    """Segmentos estáticos memoizados (mesmos objetos e tokens contados uma vez por processo)."""
+    global _SEGMENTOS_ESTATICOS
+    if _SEGMENTOS_ESTATICOS is None:
+        _SEGMENTOS_ESTATICOS = (
+            SegmentoPrompt("nucleo", SYSTEM_PROMPT_NUCLEO, cacheavel=True),
+            SegmentoPrompt("politica_tools", SYSTEM_PROMPT_POLITICA_TOOLS, cacheavel=True),
+        )
+    return _SEGMENTOS_ESTATICOS
+
+
+class PromptBuilder:
+    """Constrói system_prompt e user_prompt a partir dos dados calculados no ChatService.
+
+    Importante: esta classe NÃO toma decisões de negócio complexas; ela apenas
+    reorganiza e formata o texto que já era montado dentro do ChatService.
+    """
+
+    def __init__(self, nome_usuario: Optional[str] = None) -> None:
+        self.nome_usuario = nome_usuario
+        # Métricas da última montagem (consumidas pelos logs do MessageProcessingService)
+        self.ultima_montagem: Optional[PromptMontado] = None
+
+    # --- API principal -----------------------------------------------------
+
+    def build_system_prompt(
+        self,
+        saudacao_personalizada: str,
+        regras_aprendidas: Optional[str] = None,
+    ) -> str:
+        """Monta o system_prompt a partir dos segmentos.
+
+        Ordem: núcleo → política de tools → regras aprendidas → saudação do usuário.
+        A saudação (por usuário) fica no fim para não quebrar o prefixo em cache.
         
-        # ✅ NOVO: Adicionar regras aprendidas se disponíveis
+        Args:
+            saudacao_personalizada: Saudação personalizada com nome do usuário
+            regras_aprendidas: Texto formatado com regras aprendidas (opcional)
+        """
+        segmentos = self.montar_segmentos_system(saudacao_personalizada, regras_aprendidas)
+        montagem = PromptMontado(system=segmentos)
+        self.ultima_montagem = montagem
+        return montagem.system_prompt
+
+    def montar_segmentos_system(
+        self,
+        saudacao_personalizada: str = "",
+        regras_aprendidas: Optional[str] = None,
+    ) -> List[SegmentoPrompt]:
+        segmentos = list(segmentos_estaticos())
         if regras_aprendidas:
-            system_prompt += regras_aprendidas
-        
-        return system_prompt
+            # Regras são globais (iguais para todos os usuários) → ainda fazem parte do prefixo
+            segmentos.append(SegmentoPrompt("regras_aprendidas", regras_aprendidas, cacheavel=True))
+        if saudacao_personalizada:
+            segmentos.append(SegmentoPrompt("perfil_usuario", saudacao_personalizada))
+        return segmentos
 
     def build_user_prompt(
         self,
@@ -651,7 +749,7 @@ Você não precisa formatar manualmente - o sistema faz isso automaticamente. Ma
         acao_info: Optional[Dict[str, Any]] = None,
         contexto_sessao: Optional[str] = None,
     ) -> str:
-        """Monta o user_prompt combinando mensagem + contexto + histórico.
+        """Monta o user_prompt combinando contexto + histórico + mensagem.
 
         A lógica de construção detalhada (contexto_str, historico_str, etc.)
         continua sendo calculada no ChatService; aqui apenas juntamos tudo
@@ -664,79 +762,128 @@ Você não precisa formatar manualmente - o sistema faz isso automaticamente. Ma
             acao_info: Informação de ação sugerida (opcional)
             contexto_sessao: Contexto de sessão formatado (opcional)
         """
-        partes: List[str] = []
+        segmentos = self.montar_segmentos_user(
+            mensagem=mensagem,
+            contexto_str=contexto_str,
+            historico_str=historico_str,
+            acao_info=acao_info,
+            contexto_sessao=contexto_sessao,
+        )
+        return "".join(s.texto for s in segmentos)
+
+    def montar_segmentos_user(
+        self,
+        mensagem: str,
+        contexto_str: str = "",
+        historico_str: str = "",
+        acao_info: Optional[Dict[str, Any]] = None,
+        contexto_sessao: Optional[str] = None,
+    ) -> List[SegmentoPrompt]:
+        """Segmentos do user_prompt: contexto de sessão → contexto → histórico → mensagem.
 
-        # Mensagem atual do usuário
-        partes.append(f"Usuário: {mensagem}\n")
-        
-        # ✅ NOVO: Adicionar contexto de sessão antes do contexto estruturado
+        ✅ NOVO (16/10/2026): a mensagem do usuário (o que mais varia) vai por último.
+        """
+        segmentos: List[SegmentoPrompt] = []
+
+        # ✅ NOVO: Contexto de sessão antes do contexto estruturado
         if contexto_sessao:
-            partes.append(contexto_sessao)
+            segmentos.append(SegmentoPrompt("contexto_sessao", contexto_sessao))
 
         # Contexto estruturado (processo, categoria, CE/CCT, ações detectadas, etc.)
         if contexto_str:
-            partes.append(contexto_str)
+            segmentos.append(SegmentoPrompt("contexto", contexto_str))
 
-        # Histórico relevante
+        # Histórico relevante (+ instrução de email que se refere ao "histórico acima")
         if historico_str:
-            partes.append(historico_str)
-            # ✅ CRÍTICO: Adicionar instrução explícita sobre usar TODAS as informações do histórico
-            # Verificar se é comando de email (detecção mais precisa)
-            mensagem_lower = mensagem.lower()
-            
-            # Detecção mais restrita: precisa ter "email/e-mail" OU verbo de enviar + destinatário
-            tem_palavra_email = any(p in mensagem_lower for p in ['email', 'e-mail'])
-            tem_verbo_enviar = any(p in mensagem_lower for p in ['envie', 'envia', 'mande', 'manda', 'enviar', 'mandar'])
-            tem_destinatario = 'para ' in mensagem_lower  # simples, mas suficiente pro contexto atual
-            
-            # Só aciona se:
-            # 1. Tem palavra "email" E (verbo de enviar OU destinatário), OU
-            # 2. Tem verbo de enviar E destinatário
-            eh_comando_email = (
-                (tem_palavra_email and (tem_verbo_enviar or tem_destinatario))
-                or (tem_verbo_enviar and tem_destinatario)
-            )
-            
-            # ✅ CORREÇÃO A (14/01/2026): Separar "email de relatório do sistema" vs "email personalizado"
-            # Detectar se é envio de relatório do sistema (não extrato bancário)
-            eh_envio_relatorio_sistema = (
-                eh_comando_email
-                and any(x in mensagem_lower for x in ["relatorio", "relatório", "resumo", "dashboard", "fechamento", "parecer", "análise"])
-                and not any(x in mensagem_lower for x in ["extrato", "lançamento", "transação", "movimentação", "saldo", "banco", "santander", "bb"])
-            )
-            
-            if eh_envio_relatorio_sistema:
-                # ✅ INSTRUÇÃO CURTA E OBJETIVA para relatórios do sistema
-                partes.append("\n\n🚨 INSTRUÇÃO: ENVIO DE RELATÓRIO DO SISTEMA")
-                partes.append("\n- Use enviar_relatorio_email (a última resposta contém [REPORT_META:...]).")
-                partes.append("\n- O sistema detecta automaticamente qual relatório enviar.\n")
-            elif eh_comando_email:
-                # ✅ BLOCO GIGANTE apenas para emails personalizados (não relatórios do sistema)
-                partes.append("\n\n🚨🚨🚨 INSTRUÇÃO CRÍTICA ABSOLUTA - USAR CONTEXTO COMPLETO DO HISTÓRICO: 🚨🚨🚨")
-                partes.append("O histórico acima contém TODAS as informações que você forneceu anteriormente ao usuário.")
-                partes.append("⚠️⚠️⚠️ VOCÊ DEVE INCLUIR TODAS ESSAS INFORMAÇÕES NO EMAIL: ⚠️⚠️⚠️")
-                partes.append("")
-                partes.append("📋 EXEMPLO DO QUE DEVE ESTAR NO EMAIL:")
-                partes.append("Se o histórico mostra:")
-                partes.append("  - NCM 90041000, confiança 60%, NESH completa → INCLUA TUDO ISSO")
-                partes.append("  - Alíquotas: II: 18%, IPI: 9,75%, PIS: 2,1%, COFINS: 9,65%, ICMS: TN → INCLUA TODAS")
-                partes.append("  - Descrição: Óculos de sol → INCLUA")
-                partes.append("  - Unidade de Medida: Unidade → INCLUA")
-                partes.append("  - Fonte: TECwin → INCLUA")
-                partes.append("")
-                partes.append("⚠️⚠️⚠️ REGRAS OBRIGATÓRIAS: ⚠️⚠️⚠️")
-                partes.append("1. NÃO gere apenas 'o porque da classificacao do oculos' - isso é genérico demais")
-                partes.append("2. INCLUA o NCM completo (90041000) com confiança e NESH completa do histórico")
-                partes.append("3. INCLUA TODAS as alíquotas do histórico (II, IPI, PIS, COFINS, ICMS)")
-                partes.append("4. INCLUA a explicação da classificação fiscal baseada na NESH")
-                partes.append("5. Formate profissionalmente com tabelas para alíquotas")
-                partes.append("6. NÃO pergunte ao usuário - use TODAS as informações do histórico!")
-                partes.append("")
-                partes.append("🚨🚨🚨 O EMAIL DEVE SER COMPLETO, FUNDAMENTADO E PROFISSIONAL COM TODAS AS INFORMAÇÕES DO HISTÓRICO! 🚨🚨🚨\n")
+            segmentos.append(SegmentoPrompt("historico", historico_str + self._instrucao_historico_email(mensagem)))
 
+        # Mensagem atual do usuário
+        rotulo = "Usuário (mensagem atual)" if segmentos else "Usuário"
+        texto_mensagem = f"\n\n{rotulo}: {mensagem}\n" if segmentos else f"{rotulo}: {mensagem}\n"
         # Informação adicional de ação (caso exista)
         if acao_info and acao_info.get("acao"):
-            partes.append(f"\n\n🎯 AÇÃO SUGERIDA (sistema): {acao_info['acao']}")
+            texto_mensagem += f"\n\n🎯 AÇÃO SUGERIDA (sistema): {acao_info['acao']}"
+        segmentos.append(SegmentoPrompt("mensagem", texto_mensagem))
 
-        return "".join(partes)
+        return segmentos
 
+    def montar(
+        self,
+        saudacao_personalizada: str = "",
+        regras_aprendidas: Optional[str] = None,
+        mensagem: str = "",
+        contexto_str: str = "",
+        historico_str: str = "",
+        acao_info: Optional[Dict[str, Any]] = None,
+        contexto_sessao: Optional[str] = None,
+    ) -> PromptMontado:
+        """Monta system + user em segmentos (com métricas de tokens e prefixo cacheável)."""
+        return PromptMontado(
+            system=self.montar_segmentos_system(saudacao_personalizada, regras_aprendidas),
+            user=self.montar_segmentos_user(
+                mensagem=mensagem,
+                contexto_str=contexto_str,
+                historico_str=historico_str,
+                acao_info=acao_info,
+                contexto_sessao=contexto_sessao,
+            ),
+        )
+
+    @staticmethod
+    def _instrucao_historico_email(mensagem: str) -> str:
+        """✅ CRÍTICO: instrução explícita sobre usar TODAS as informações do histórico em emails."""
+        partes: List[str] = []
+        # Verificar se é comando de email (detecção mais precisa)
+        mensagem_lower = mensagem.lower()
+        
+        # Detecção mais restrita: precisa ter "email/e-mail" OU verbo de enviar + destinatário
+        tem_palavra_email = any(p in mensagem_lower for p in ['email', 'e-mail'])
+        tem_verbo_enviar = any(p in mensagem_lower for p in ['envie', 'envia', 'mande', 'manda', 'enviar', 'mandar'])
+        tem_destinatario = 'para ' in mensagem_lower  # simples, mas suficiente pro contexto atual
+        
+        # Só aciona se:
+        # 1. Tem palavra "email" E (verbo de enviar OU destinatário), OU
+        # 2. Tem verbo de enviar E destinatário
+        eh_comando_email = (
+            (tem_palavra_email and (tem_verbo_enviar or tem_destinatario))
+            or (tem_verbo_enviar and tem_destinatario)
+        )
+        
+        # ✅ CORREÇÃO A (14/01/2026): Separar "email de relatório do sistema" vs "email personalizado"
+        # Detectar se é envio de relatório do sistema (não extrato bancário)
+        eh_envio_relatorio_sistema = (
+            eh_comando_email
+            and any(x in mensagem_lower for x in ["relatorio", "relatório", "resumo", "dashboard", "fechamento", "parecer", "análise"])
+            and not any(x in mensagem_lower for x in ["extrato", "lançamento", "transação", "movimentação", "saldo", "banco", "santander", "bb"])
+        )
+        
+        if eh_envio_relatorio_sistema:
+            # ✅ INSTRUÇÃO CURTA E OBJETIVA para relatórios do sistema
+            partes.append("\n\n🚨 INSTRUÇÃO: ENVIO DE RELATÓRIO DO SISTEMA")
+            partes.append("\n- Use enviar_relatorio_email (a última resposta contém [REPORT_META:...]).")
+            partes.append("\n- O sistema detecta automaticamente qual relatório enviar.\n")
+        elif eh_comando_email:
+            # ✅ BLOCO GIGANTE apenas para emails personalizados (não relatórios do sistema)
+            partes.append("\n\n🚨🚨🚨 INSTRUÇÃO CRÍTICA ABSOLUTA - USAR CONTEXTO COMPLETO DO HISTÓRICO: 🚨🚨🚨")
+            partes.append("O histórico acima contém TODAS as informações que você forneceu anteriormente ao usuário.")
+            partes.append("⚠️⚠️⚠️ VOCÊ DEVE INCLUIR TODAS ESSAS INFORMAÇÕES NO EMAIL: ⚠️⚠️⚠️")
+            partes.append("")
+            partes.append("📋 EXEMPLO DO QUE DEVE ESTAR NO EMAIL:")
+            partes.append("Se o histórico mostra:")
+            partes.append("  - NCM 90041000, confiança 60%, NESH completa → INCLUA TUDO ISSO")
+            partes.append("  - Alíquotas: II: 18%, IPI: 9,75%, PIS: 2,1%, COFINS: 9,65%, ICMS: TN → INCLUA TODAS")
+            partes.append("  - Descrição: Óculos de sol → INCLUA")
+            partes.append("  - Unidade de Medida: Unidade → INCLUA")
+            partes.append("  - Fonte: TECwin → INCLUA")
+            partes.append("")
+            partes.append("⚠️⚠️⚠️ REGRAS OBRIGATÓRIAS: ⚠️⚠️⚠️")
+            partes.append("1. NÃO gere apenas 'o porque da classificacao do oculos' - isso é genérico demais")
+            partes.append("2. INCLUA o NCM completo (90041000) com confiança e NESH completa do histórico")
+            partes.append("3. INCLUA TODAS as alíquotas do histórico (II, IPI, PIS, COFINS, ICMS)")
+            partes.append("4. INCLUA a explicação da classificação fiscal baseada na NESH")
+            partes.append("5. Formate profissionalmente com tabelas para alíquotas")
+            partes.append("6. NÃO pergunte ao usuário - use TODAS as informações do histórico!")
+            partes.append("")
+            partes.append("🚨🚨🚨 O EMAIL DEVE SER COMPLETO, FUNDAMENTADO E PROFISSIONAL COM TODAS AS INFORMAÇÕES DO HISTÓRICO! 🚨🚨🚨\n")
+
+        return "".join(partes)
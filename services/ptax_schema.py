@@ -0,0 +1,58 @@
+"""
+PTAX schema (SQLite)
+
+Boletins PTAX do BCB persistidos localmente + calendário de dias úteis.
+PTAX de dia já fechado nunca muda: datas passadas são respondidas só por estas tabelas.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+
+def criar_tabelas_ptax(cursor: sqlite3.Cursor) -> None:
+    # Todos os boletins do dia (Abertura, Intermediários, Fechamento), no formato da API
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ptax_cotacoes (
+            moeda TEXT NOT NULL,
+            data TEXT NOT NULL,
+            tipo_boletim TEXT NOT NULL,
+            data_hora TEXT NOT NULL,
+            cotacao_compra REAL NOT NULL,
+            cotacao_venda REAL NOT NULL,
+            paridade_compra REAL,
+            paridade_venda REAL,
+            gravado_em TEXT NOT NULL,
+            PRIMARY KEY (moeda, data, tipo_boletim, data_hora)
+        )
+        """
+    )
+
+    # Dias fechados já baixados (inclusive os sem boletim: fim de semana/feriado)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ptax_dias_carregados (
+            moeda TEXT NOT NULL,
+            data TEXT NOT NULL,
+            qtd_boletins INTEGER NOT NULL DEFAULT 0,
+            carregado_em TEXT NOT NULL,
+            PRIMARY KEY (moeda, data)
+        )
+        """
+    )
+
+    # Calendário: um registro por dia do ano (origem 'calculado' ou 'bcb' = dia útil sem PTAX publicada)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ptax_calendario (
+            data TEXT PRIMARY KEY,
+            ano INTEGER NOT NULL,
+            dia_semana INTEGER NOT NULL,
+            dia_util INTEGER NOT NULL,
+            feriado TEXT,
+            origem TEXT NOT NULL DEFAULT 'calculado'
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ptax_calendario_ano ON ptax_calendario(ano, dia_util)")
@@ -0,0 +1,324 @@
+"""
+Store local de PTAX (SQLite) + calendário de dias úteis.
+
+✅ NOVO (16/10/2026): `utils.ptax_bcb.obter_ptax_dolar` fazia de 1 a 3 requisições ao BCB
+(OData) a cada chamada — inclusive para datas passadas, cuja PTAX nunca muda — e
+`obter_ptax_periodo` baixava o intervalo inteiro de novo. Agora:
+
+- os boletins ficam em `ptax_cotacoes`, por (moeda, data, tipo de boletim, hora);
+- `ptax_dias_carregados` marca os dias fechados já baixados (inclusive os sem boletim), então
+  datas passadas são respondidas só pelo SQLite;
+- `ptax_calendario` guarda os dias úteis do ano (fins de semana + feriados nacionais, móveis
+  calculados pela Páscoa) e aprende dias úteis em que o BCB não publicou PTAX.
+
+O download (um mês por chamada `CotacaoMoedaPeriodo`) fica em `utils.ptax_bcb`; aqui só SQLite.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PTAX_STORE_ENABLED = os.getenv("PTAX_STORE_ENABLED", "true").lower() == "true"
+
+FERIADO_SEM_PTAX = "Sem PTAX publicada (BCB)"
+
+_FERIADOS_FIXOS = (
+    (1, 1, "Confraternização Universal"),
+    (4, 21, "Tiradentes"),
+    (5, 1, "Dia do Trabalho"),
+    (9, 7, "Independência do Brasil"),
+    (10, 12, "Nossa Senhora Aparecida"),
+    (11, 2, "Finados"),
+    (11, 15, "Proclamação da República"),
+    (12, 25, "Natal"),
+)
+
+
+def _pascoa(ano: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+@lru_cache(maxsize=64)
+def _feriados_nacionais(ano: int) -> Tuple[Tuple[date, str], ...]:
+    pascoa = _pascoa(ano)
+    feriados = [(date(ano, mes, dia), nome) for mes, dia, nome in _FERIADOS_FIXOS]
+    if ano >= 2024:  # Lei 14.759/2023
+        feriados.append((date(ano, 11, 20), "Dia Nacional de Zumbi e da Consciência Negra"))
+    # Móveis: sem mercado de câmbio/PTAX (Carnaval é ponto facultativo, mas o BCB não publica)
+    feriados.extend(
+        [
+            (pascoa - timedelta(days=48), "Carnaval"),
+            (pascoa - timedelta(days=47), "Carnaval"),
+            (pascoa - timedelta(days=2), "Sexta-feira Santa"),
+            (pascoa + timedelta(days=60), "Corpus Christi"),
+        ]
+    )
+    return tuple(sorted(feriados))
+
+
+def feriados_nacionais(ano: int) -> Dict[date, str]:
+    """Feriados nacionais (e dias sem mercado de câmbio) do ano: {data: nome}."""
+    return dict(_feriados_nacionais(ano))
+
+
+# ---------------------------------------------------------------------- conexão / schema
+_tabelas_ok = False
+_tabelas_lock = threading.Lock()
+
+
+def _conectar():
+    """Conexão do `db_manager` com as tabelas de PTAX garantidas (uma vez por processo)."""
+    global _tabelas_ok
+    from db_manager import get_db_connection
+
+    conn = get_db_connection()
+    if not _tabelas_ok:
+        with _tabelas_lock:
+            if not _tabelas_ok:
+                from services.ptax_schema import criar_tabelas_ptax
+
+                criar_tabelas_ptax(conn.cursor())
+                conn.commit()
+                _tabelas_ok = True
+    return conn
+
+
+def _iso(d: date) -> str:
+    return d.isoformat()
+
+
+def _dias(inicio: date, fim: date) -> Iterable[date]:
+    d = inicio
+    while d <= fim:
+        yield d
+        d += timedelta(days=1)
+
+
+# ---------------------------------------------------------------------- calendário
+# {ano: {data: motivo}} só com dias de semana que não são úteis (fim de semana é implícito)
+_nao_uteis: Dict[int, Dict[date, str]] = {}
+_nao_uteis_lock = threading.Lock()
+
+
+def _carregar_calendario(ano: int) -> Dict[date, str]:
+    feriados = feriados_nacionais(ano)
+    if not PTAX_STORE_ENABLED:
+        return feriados
+    try:
+        conn = _conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM ptax_calendario WHERE ano = ?", (ano,))
+            if (cursor.fetchone()[0] or 0) < (date(ano, 12, 31) - date(ano, 1, 1)).days + 1:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO ptax_calendario (data, ano, dia_semana, dia_util, feriado, origem) "
+                    "VALUES (?, ?, ?, ?, ?, 'calculado')",
+                    [
+                        (_iso(d), ano, d.weekday(), int(d.weekday() < 5 and d not in feriados), feriados.get(d))
+                        for d in _dias(date(ano, 1, 1), date(ano, 12, 31))
+                    ],
+                )
+                conn.commit()
+            cursor.execute(
+                "SELECT data, COALESCE(feriado, '') FROM ptax_calendario "
+                "WHERE ano = ? AND dia_util = 0 AND dia_semana < 5",
+                (ano,),
+            )
+            return {date.fromisoformat(row[0]): row[1] for row in cursor.fetchall()}
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.warning(f"[PTAX_STORE] ⚠️ Calendário de {ano} indisponível no SQLite, usando feriados calculados: {e}")
+        return feriados
+
+
+def dias_nao_uteis(ano: int) -> Dict[date, str]:
+    """Dias de semana sem expediente/PTAX no ano: {data: motivo} (lido do SQLite uma vez por ano)."""
+    dias = _nao_uteis.get(ano)
+    if dias is None:
+        with _nao_uteis_lock:
+            dias = _nao_uteis.get(ano)
+            if dias is None:
+                dias = _carregar_calendario(ano)
+                _nao_uteis[ano] = dias
+    return dias
+
+
+def eh_dia_util(d: date) -> bool:
+    """Segunda a sexta, fora de feriado nacional e de dia em que o BCB não publicou PTAX."""
+    return d.weekday() < 5 and d not in dias_nao_uteis(d.year)
+
+
+def _marcar_sem_ptax(cursor, dias: List[date]) -> None:
+    cursor.executemany(
+        "UPDATE ptax_calendario SET dia_util = 0, feriado = ?, origem = 'bcb' WHERE data = ?",
+        [(FERIADO_SEM_PTAX, _iso(d)) for d in dias],
+    )
+    with _nao_uteis_lock:
+        for d in dias:
+            if d.year in _nao_uteis:
+                _nao_uteis[d.year][d] = FERIADO_SEM_PTAX
+
+
+# ---------------------------------------------------------------------- cotações
+def _como_api(row) -> Dict[str, Any]:
+    """Linha de `ptax_cotacoes` no mesmo formato do item `value` da API do BCB."""
+    return {
+        "paridadeCompra": row[4],
+        "paridadeVenda": row[5],
+        "cotacaoCompra": row[2],
+        "cotacaoVenda": row[3],
+        "dataHoraCotacao": row[1],
+        "tipoBoletim": row[0],
+    }
+
+
+_COLUNAS = "tipo_boletim, data_hora, cotacao_compra, cotacao_venda, paridade_compra, paridade_venda"
+
+
+def ler_cotacoes_dia(moeda: str, dia: date) -> Optional[List[Dict[str, Any]]]:
+    """
+    Boletins gravados do dia (formato da API).
+
+    Returns:
+        None se o dia ainda não foi carregado como fechado; lista (possivelmente vazia) caso contrário.
+    """
+    conn = _conectar()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM ptax_dias_carregados WHERE moeda = ? AND data = ?", (moeda, _iso(dia)))
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute(
+            f"SELECT {_COLUNAS} FROM ptax_cotacoes WHERE moeda = ? AND data = ? ORDER BY data_hora",
+            (moeda, _iso(dia)),
+        )
+        return [_como_api(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def ler_cotacoes_periodo(moeda: str, inicio: date, fim: date) -> List[Dict[str, Any]]:
+    """Boletins gravados no intervalo (inclusive), em ordem cronológica."""
+    conn = _conectar()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT {_COLUNAS} FROM ptax_cotacoes WHERE moeda = ? AND data BETWEEN ? AND ? ORDER BY data_hora",
+            (moeda, _iso(inicio), _iso(fim)),
+        )
+        return [_como_api(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def dias_pendentes(moeda: str, inicio: date, fim: date) -> List[date]:
+    """Dias do intervalo ainda não carregados como fechados."""
+    if fim < inicio:
+        return []
+    conn = _conectar()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT data FROM ptax_dias_carregados WHERE moeda = ? AND data BETWEEN ? AND ?",
+            (moeda, _iso(inicio), _iso(fim)),
+        )
+        carregados = {row[0] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+    return [d for d in _dias(inicio, fim) if _iso(d) not in carregados]
+
+
+def gravar_cotacoes(
+    moeda: str,
+    cotacoes: List[Dict[str, Any]],
+    dias_fechados: Optional[Tuple[date, date]] = None,
+) -> int:
+    """
+    Grava boletins (itens `value` da API) numa transação.
+
+    Args:
+        dias_fechados: intervalo (inicio, fim) já encerrado que a resposta cobre por inteiro.
+            Esses dias ficam marcados como carregados (próximas leituras não vão ao BCB) e dias
+            úteis do intervalo sem nenhum boletim passam a contar como não úteis no calendário.
+            Só até o último boletim retornado: dias úteis depois dele (ou resposta vazia) podem
+            ser falha momentânea do BCB e ficam pendentes para a próxima consulta.
+
+    Returns:
+        Quantidade de boletins gravados.
+    """
+    agora = datetime.now().isoformat()
+    linhas = []
+    por_dia: Counter = Counter()
+    for cot in cotacoes or []:
+        data_hora = str(cot.get("dataHoraCotacao") or "")
+        if len(data_hora) < 10:
+            continue
+        por_dia[data_hora[:10]] += 1
+        linhas.append(
+            (
+                moeda,
+                data_hora[:10],
+                cot.get("tipoBoletim") or "",
+                data_hora,
+                float(cot.get("cotacaoCompra", 0)),
+                float(cot.get("cotacaoVenda", 0)),
+                cot.get("paridadeCompra"),
+                cot.get("paridadeVenda"),
+                agora,
+            )
+        )
+
+    carregados: List[date] = []
+    sem_ptax: List[date] = []
+    if dias_fechados:
+        ultimo = max(por_dia) if por_dia else ""
+        dias = list(_dias(*dias_fechados))
+        carregados = [d for d in dias if _iso(d) <= ultimo]
+        depois = dias[len(carregados):]
+        if any(eh_dia_util(d) for d in depois):
+            if depois:
+                logger.info(f"[PTAX_STORE] Sem boletim de {_iso(depois[0])} em diante; dias ficam pendentes")
+        else:
+            carregados += depois  # só fim de semana/feriado depois do último boletim
+        sem_ptax = [d for d in carregados if not por_dia.get(_iso(d)) and eh_dia_util(d)]
+
+    conn = _conectar()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO ptax_cotacoes "
+            "(moeda, data, tipo_boletim, data_hora, cotacao_compra, cotacao_venda, paridade_compra, paridade_venda, gravado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            linhas,
+        )
+        if carregados:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO ptax_dias_carregados (moeda, data, qtd_boletins, carregado_em) VALUES (?, ?, ?, ?)",
+                [(moeda, _iso(d), por_dia.get(_iso(d), 0), agora) for d in carregados],
+            )
+        if sem_ptax:
+            logger.info(f"[PTAX_STORE] 📅 Dias úteis sem PTAX publicada (calendário atualizado): {sem_ptax}")
+            _marcar_sem_ptax(cursor, sem_ptax)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(linhas)
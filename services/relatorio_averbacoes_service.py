@@ -24,12 +24,24 @@ Estrutura do relatório (baseado na planilha de exemplo):
 
 import logging
 import json
-from typing import Dict, Any, Optional, List
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# ✅ NOVO (16/10/2026): pipeline em lote (DIs do mês numa query `IN (...)`, API só para faltantes)
+# 2 parâmetros por DI (número original + normalizado): 500 DIs = 1000 parâmetros (< 2100 do SQL Server)
+RELATORIO_AVERBACOES_LOTE_DI = int(os.getenv("RELATORIO_AVERBACOES_LOTE_DI", "500"))
+RELATORIO_AVERBACOES_MAX_WORKERS = int(os.getenv("RELATORIO_AVERBACOES_MAX_WORKERS", "4"))
+
+# Callback de progresso: recebe dict com 'etapa', 'processados', 'total' (e 'processo_referencia')
+ProgressoCallback = Callable[[Dict[str, Any]], None]
+
 # Mapeamento de códigos de impostos
 CODIGOS_IMPOSTOS = {
     '0086': 'II',  # IMPOSTO DE IMPORTAÇÃO
@@ -63,6 +75,177 @@ TIPOS_TRANSPORTE = {
 }
 
 
+# Colunas/joins da DI no Serpro (consulta individual e em lote)
+# ✅ CORREÇÃO (26/01/2026): Di_Dados_Embarque não existe no Serpro. Usar Di_Transporte.nomeVeiculo como navio.
+_SQL_DI_COLUNAS = '''
+                    ddg.numeroDi,
+                    ddg.situacaoDi,
+                    ddg.dataHoraSituacaoDi,
+                    diTransp.nomeVeiculo,
+                    diTransp.codigoViaTransporte,
+                    diTransp.nomeTransportador,
+                    diTransp.nomeVeiculo AS nomeNavio,
+                    diFrete.valorTotalDolares AS frete_valorTotalDolares,
+                    diFrete.totalReais AS frete_totalReais,
+                    diSeguro.valorTotalDolares AS seguro_valorTotalDolares,
+                    diSeguro.valorTotalReais AS seguro_valorTotalReais,
+                    DVME.totalDolares AS valorMercadoriaEmbarque_totalDolares,
+                    DVME.totalReais AS valorMercadoriaEmbarque_totalReais'''
+
+_SQL_DI_FROM = '''
+                FROM Serpro.dbo.Di_Dados_Gerais ddg
+                INNER JOIN Serpro.dbo.Di_Root_Declaracao_Importacao diRoot ON ddg.dadosGeraisId = diRoot.dadosGeraisId
+                LEFT JOIN Serpro.dbo.Di_Transporte diTransp ON diRoot.transporteId = diTransp.transporteId
+                LEFT JOIN Serpro.dbo.Di_Frete diFrete ON diRoot.dadosDiId = diFrete.freteId
+                LEFT JOIN Serpro.dbo.Di_Seguro diSeguro ON diRoot.dadosDiId = diSeguro.seguroId
+                LEFT JOIN Serpro.dbo.Di_Valor_Mercadoria_Embarque DVME 
+                    ON diRoot.valorMercadoriaEmbarqueId = DVME.valorMercadoriaEmbarqueId'''
+
+_SQL_PAGAMENTOS_COLUNAS = '''
+                        dp.codigoReceita,
+                        dp.numeroRetificacao,
+                        dp.valorTotal,
+                        dp.dataPagamento,
+                        dp.dataHoraPagamento,
+                        dpcr.descricao_receita
+                    FROM Serpro.dbo.Di_Pagamento dp
+                    LEFT JOIN Serpro.dbo.Di_pagamentos_cod_receitas dpcr 
+                        ON dpcr.cod_receita = dp.codigoReceita'''
+
+# Larguras das colunas A..P da planilha
+_LARGURAS_COLUNAS = {
+    'A': 20, 'B': 15, 'C': 15, 'D': 15, 'E': 20, 'F': 12, 'G': 15, 'H': 40,
+    'I': 25, 'J': 12, 'K': 12, 'L': 12, 'M': 12, 'N': 18, 'O': 15, 'P': 15,
+}
+
+_CABECALHOS_COLUNAS = [
+    'Averbação provisória',
+    'País de Origem',
+    'Porto Origem',
+    'País Origem',
+    'Cidade de  Destino',
+    'Data do BL',
+    'Tipo de transporte',
+    'Mercadoria',
+    'Nome Navio',
+    'Custo USD',
+    'Frete USD',
+    'Despesas',
+    'Lucros',
+    'Impostos da DI USD',
+    'DI',
+    'OBS'
+]
+
+
+def _normalizar_numero_di(numero_di: str) -> str:
+    return str(numero_di).replace('/', '').replace('-', '').replace(' ', '').replace('.', '')
+
+
+def _mapear_pagamento(pag_row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'codigoReceita': str(pag_row.get('codigoReceita') or ''),
+        'valorTotal': str(pag_row.get('valorTotal') or '0'),
+        'dataPagamento': pag_row.get('dataPagamento') or pag_row.get('dataHoraPagamento'),
+        'descricao_receita': pag_row.get('descricao_receita') or ''
+    }
+
+
+def _montar_dados_di_sql(row: Dict[str, Any], pagamentos_di: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Monta a DI do SQL Server na estrutura da API (compatível com `_mapear_dados_di_para_linha`)."""
+    return {
+        'numeroDi': row.get('numeroDi'),
+        'situacaoDi': row.get('situacaoDi'),
+        'navio': {
+            'nome_veiculo': row.get('nomeVeiculo') or row.get('nomeNavio') or ''
+        },
+        'transporte': {
+            'nomeVeiculo': row.get('nomeVeiculo') or '',
+            'nomeNavio': row.get('nomeNavio') or '',
+            'codigoViaTransporte': row.get('codigoViaTransporte') or '',
+            'nomeTransportador': row.get('nomeTransportador') or ''
+        },
+        'frete': {
+            'valorTotalDolares': str(row.get('frete_valorTotalDolares') or '0'),
+            'totalReais': str(row.get('frete_totalReais') or '0')
+        },
+        'seguro': {
+            'valorTotalDolares': str(row.get('seguro_valorTotalDolares') or '0'),
+            'valorTotalReais': str(row.get('seguro_valorTotalReais') or '0')
+        },
+        'valorMercadoriaEmbarque': {
+            'totalDolares': str(row.get('valorMercadoriaEmbarque_totalDolares') or '0'),
+            'totalReais': str(row.get('valorMercadoriaEmbarque_totalReais') or '0')
+        },
+        'pagamentos': pagamentos_di  # ✅ Pagamentos do SQL Server
+    }
+
+
+class _PlanilhaAverbacoes:
+    """
+    Planilha de averbações em modo write-only (openpyxl): cada linha vai direto para o
+    arquivo, sem manter a planilha inteira em memória. Linhas precisam chegar em ordem.
+    """
+
+    def __init__(self, caminho: Path):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+
+        self.caminho = caminho
+        self.total_linhas = 0
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet('IMPORTAÇÃO')
+
+        # Larguras precisam ser definidas antes da primeira linha no modo write-only
+        for coluna, largura in _LARGURAS_COLUNAS.items():
+            self._ws.column_dimensions[coluna].width = largura
+
+        # Cabeçalho (linhas 1-4)
+        self._ws.append(['Modelo Averbação Via Planilha'])
+        self._ws.append(['Nome do Segurado', None, 'BANDEMAR COMERCIO IMPORTACAO E EXPORTACAO'])
+        self._ws.append(['CNPJ', None, '08.641.586/0002-66 e 08.641.586/0004-28'])
+        self._ws.append(['Nº Apólice'])
+
+        # Cabeçalhos das colunas (linha 5)
+        fonte = Font(bold=True)
+        preenchimento = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
+        cabecalhos = []
+        for header in _CABECALHOS_COLUNAS:
+            cell = WriteOnlyCell(self._ws, value=header)
+            cell.font = fonte
+            cell.fill = preenchimento
+            cabecalhos.append(cell)
+        self._ws.append(cabecalhos)
+
+    def escrever(self, linha: Dict[str, Any]) -> None:
+        """Dados (linha 6 em diante)."""
+        self._ws.append([
+            '',  # Averbação provisória (vazio)
+            linha.get('pais_origem', ''),
+            linha.get('porto_origem', ''),
+            linha.get('pais_origem_2', ''),
+            linha.get('cidade_destino', ''),
+            linha.get('data_bl', ''),
+            linha.get('tipo_transporte', ''),
+            linha.get('mercadoria', ''),
+            linha.get('nome_navio', ''),
+            linha.get('custo_usd', 0),
+            linha.get('frete_usd', 0),
+            linha.get('despesas', 0),
+            linha.get('lucros', 0),
+            linha.get('impostos_usd', 0),
+            linha.get('di', ''),
+            linha.get('obs', ''),
+        ])
+        self.total_linhas += 1
+
+    def salvar(self) -> Path:
+        self._wb.save(self.caminho)
+        logger.info(f'✅ Excel gerado: {self.caminho} ({self.total_linhas} linhas)')
+        return self.caminho
+
+
 class RelatorioAverbacoesService:
     """Serviço para geração de relatório de averbações"""
     
@@ -75,16 +258,24 @@ class RelatorioAverbacoesService:
         self,
         mes: str,
         ano: Optional[int] = None,
-        categoria: Optional[str] = None
+        categoria: Optional[str] = None,
+        progresso: Optional[ProgressoCallback] = None
     ) -> Dict[str, Any]:
         """
         Gera relatório de averbações para processos com DI registrada no mês.
         
+        ✅ OTIMIZADO (16/10/2026): DIs do mês buscadas no SQL Server em lote (`IN (...)`),
+        API Integra Comex só para as faltantes e com concorrência limitada
+        (`RELATORIO_AVERBACOES_MAX_WORKERS`), linhas gravadas no Excel (write-only) à medida
+        que ficam prontas, na ordem dos processos.
+        
         Args:
             mes: Mês no formato MM (ex: "06") ou YYYY-MM (ex: "2025-06")
             ano: Ano (opcional, se não fornecido no mes)
             categoria: Categoria do processo (opcional, ex: "BND", "ALH", "VDM")
                       Se None, busca todas as categorias
+            progresso: Callback opcional chamado a cada etapa/processo com
+                      {'etapa', 'processados', 'total', 'processo_referencia'}
         
         Returns:
             Dict com sucesso, caminho_arquivo, total_processos, erros
@@ -105,6 +296,7 @@ class RelatorioAverbacoesService:
             logger.info(f'📊 Gerando relatório de averbações para {mes_num:02d}/{ano} (categoria: {categoria or "TODAS"})')
             
             # 1. Buscar processos com DI registrada no mês
+            self._notificar(progresso, 'buscando_processos', 0, 0)
             processos = self._buscar_processos_com_di_no_mes(mes_num, ano, categoria)
             
             if not processos:
@@ -114,29 +306,55 @@ class RelatorioAverbacoesService:
                     'mensagem': f'Nenhum processo encontrado com DI registrada em {mes_num:02d}/{ano}'
                 }
             
-            logger.info(f'✅ Encontrados {len(processos)} processos com DI registrada')
+            total = len(processos)
+            logger.info(f'✅ Encontrados {total} processos com DI registrada')
             
-            # 2. Para cada processo, buscar dados completos da DI via API
-            dados_relatorio = []
+            # 2. DIs do mês no SQL Server, em lote (sem custo)
+            self._notificar(progresso, 'buscando_dis', 0, total)
+            dis_sql = self._buscar_dis_sql_server_lote([p.get('numero_di') for p in processos if p.get('numero_di')])
+            
+            # 3. Demais etapas por processo (API só para faltantes + PTAX/CE) com concorrência limitada;
+            #    linhas vão para o Excel na ordem dos processos, assim que o prefixo fica pronto
+            categoria_str = f'_{categoria}' if categoria else ''
+            caminho_arquivo = self.downloads_dir / f'Relatorio_Averbacoes_{ano:04d}_{mes_num:02d}{categoria_str}.xlsx'
+            planilha: Optional[_PlanilhaAverbacoes] = None
+            prontos: Dict[int, Optional[Dict[str, Any]]] = {}
+            proximo = 0
+            processados = 0
             erros = []
             
-            for idx, processo in enumerate(processos, 1):
-                try:
-                    logger.info(f'📄 Processando {idx}/{len(processos)}: {processo.get("processo_referencia")} - DI {processo.get("numero_di")}')
-                    
-                    # Buscar dados completos da DI
-                    dados_linha = self._extrair_dados_processo(processo)
+            def _tarefa(processo: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                numero_di = processo.get('numero_di')
+                dados_di = dis_sql.get(_normalizar_numero_di(numero_di)) if numero_di else None
+                return self._extrair_dados_processo(processo, dados_di_sql=dados_di, consultar_sql=False)
+            
+            workers = max(1, min(RELATORIO_AVERBACOES_MAX_WORKERS, total))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='averbacoes') as pool:
+                futuros = {pool.submit(_tarefa, processo): idx for idx, processo in enumerate(processos)}
+                for futuro in as_completed(futuros):
+                    idx = futuros[futuro]
+                    processo = processos[idx]
+                    try:
+                        dados_linha = futuro.result()
+                        if not dados_linha:
+                            erros.append(f'{processo.get("processo_referencia")}: Não foi possível extrair dados da DI')
+                    except Exception as e:
+                        logger.error(f'❌ Erro ao processar {processo.get("processo_referencia")}: {e}', exc_info=True)
+                        erros.append(f'{processo.get("processo_referencia")}: {str(e)}')
+                        dados_linha = None
+                    prontos[idx] = dados_linha
+                    processados += 1
+                    self._notificar(progresso, 'processando', processados, total, processo.get('processo_referencia'))
                     
-                    if dados_linha:
-                        dados_relatorio.append(dados_linha)
-                    else:
-                        erros.append(f'{processo.get("processo_referencia")}: Não foi possível extrair dados da DI')
-                        
-                except Exception as e:
-                    logger.error(f'❌ Erro ao processar {processo.get("processo_referencia")}: {e}', exc_info=True)
-                    erros.append(f'{processo.get("processo_referencia")}: {str(e)}')
-            
-            if not dados_relatorio:
+                    while proximo in prontos:
+                        linha = prontos.pop(proximo)
+                        proximo += 1
+                        if linha:
+                            if planilha is None:
+                                planilha = _PlanilhaAverbacoes(caminho_arquivo)
+                            planilha.escrever(linha)
+            
+            if planilha is None:
                 return {
                     'sucesso': False,
                     'erro': 'NENHUM_DADO',
@@ -144,13 +362,15 @@ class RelatorioAverbacoesService:
                     'erros': erros
                 }
             
-            # 3. Gerar Excel
-            caminho_arquivo = self._gerar_excel(dados_relatorio, mes_num, ano, categoria)
+            # 4. Fechar Excel
+            self._notificar(progresso, 'gerando_excel', processados, total)
+            caminho_arquivo = planilha.salvar()
+            self._notificar(progresso, 'concluido', processados, total)
             
             return {
                 'sucesso': True,
                 'caminho_arquivo': str(caminho_arquivo),
-                'total_processos': len(dados_relatorio),
+                'total_processos': planilha.total_linhas,
                 'total_erros': len(erros),
                 'erros': erros if erros else None
             }
@@ -163,6 +383,26 @@ class RelatorioAverbacoesService:
                 'mensagem': f'Erro ao gerar relatório: {str(e)}'
             }
     
+    @staticmethod
+    def _notificar(
+        progresso: Optional[ProgressoCallback],
+        etapa: str,
+        processados: int,
+        total: int,
+        processo_referencia: Optional[str] = None
+    ) -> None:
+        if progresso is None:
+            return
+        try:
+            progresso({
+                'etapa': etapa,
+                'processados': processados,
+                'total': total,
+                'processo_referencia': processo_referencia,
+            })
+        except Exception as e:
+            logger.debug(f'Erro no callback de progresso do relatório de averbações: {e}')
+    
     def _buscar_processos_com_di_no_mes(
         self,
         mes: int,
@@ -297,29 +537,8 @@ class RelatorioAverbacoesService:
             
             # Query para buscar dados da DI incluindo nome do navio
             # Baseada na query documentada em MAPEAMENTO_SQL_SERVER.md
-            # ✅ CORREÇÃO (26/01/2026): Di_Dados_Embarque não existe no Serpro. Usar Di_Transporte.nomeVeiculo como navio.
-            query = '''
-                SELECT TOP 1
-                    ddg.numeroDi,
-                    ddg.situacaoDi,
-                    ddg.dataHoraSituacaoDi,
-                    diTransp.nomeVeiculo,
-                    diTransp.codigoViaTransporte,
-                    diTransp.nomeTransportador,
-                    diTransp.nomeVeiculo AS nomeNavio,
-                    diFrete.valorTotalDolares AS frete_valorTotalDolares,
-                    diFrete.totalReais AS frete_totalReais,
-                    diSeguro.valorTotalDolares AS seguro_valorTotalDolares,
-                    diSeguro.valorTotalReais AS seguro_valorTotalReais,
-                    DVME.totalDolares AS valorMercadoriaEmbarque_totalDolares,
-                    DVME.totalReais AS valorMercadoriaEmbarque_totalReais
-                FROM Serpro.dbo.Di_Dados_Gerais ddg
-                INNER JOIN Serpro.dbo.Di_Root_Declaracao_Importacao diRoot ON ddg.dadosGeraisId = diRoot.dadosGeraisId
-                LEFT JOIN Serpro.dbo.Di_Transporte diTransp ON diRoot.transporteId = diTransp.transporteId
-                LEFT JOIN Serpro.dbo.Di_Frete diFrete ON diRoot.dadosDiId = diFrete.freteId
-                LEFT JOIN Serpro.dbo.Di_Seguro diSeguro ON diRoot.dadosDiId = diSeguro.seguroId
-                LEFT JOIN Serpro.dbo.Di_Valor_Mercadoria_Embarque DVME 
-                    ON diRoot.valorMercadoriaEmbarqueId = DVME.valorMercadoriaEmbarqueId
+            query = f'''
+                SELECT TOP 1{_SQL_DI_COLUNAS}{_SQL_DI_FROM}
                 WHERE ddg.numeroDi = ? OR ddg.numeroDi = ?
                 ORDER BY ddg.dataHoraSituacaoDi DESC
             '''
@@ -361,58 +580,19 @@ class RelatorioAverbacoesService:
                             
                             if dados_di_id:
                                 # Buscar pagamentos
-                                query_pagamentos = '''
-                                    SELECT 
-                                        dp.codigoReceita,
-                                        dp.numeroRetificacao,
-                                        dp.valorTotal,
-                                        dp.dataPagamento,
-                                        dp.dataHoraPagamento,
-                                        dpcr.descricao_receita
-                                    FROM Serpro.dbo.Di_Pagamento dp
-                                    LEFT JOIN Serpro.dbo.Di_pagamentos_cod_receitas dpcr 
-                                        ON dpcr.cod_receita = dp.codigoReceita
+                                query_pagamentos = f'''
+                                    SELECT{_SQL_PAGAMENTOS_COLUNAS}
                                     WHERE dp.rootDiId = ?
                                 '''
                                 result_pag = sql_adapter.execute_query(query_pagamentos, 'Serpro', [dados_di_id], notificar_erro=False)
                                 if result_pag.get('success') and result_pag.get('data'):
                                     for pag_row in result_pag['data']:
-                                        pagamentos_di.append({
-                                            'codigoReceita': str(pag_row.get('codigoReceita') or ''),
-                                            'valorTotal': str(pag_row.get('valorTotal') or '0'),
-                                            'dataPagamento': pag_row.get('dataPagamento') or pag_row.get('dataHoraPagamento'),
-                                            'descricao_receita': pag_row.get('descricao_receita') or ''
-                                        })
+                                        pagamentos_di.append(_mapear_pagamento(pag_row))
                     except Exception as e:
                         logger.debug(f'Erro ao buscar pagamentos da DI {numero_di_normalizado}: {e}')
                     
                     # Montar estrutura similar à API para compatibilidade
-                    dados_di = {
-                        'numeroDi': row.get('numeroDi'),
-                        'situacaoDi': row.get('situacaoDi'),
-                        'navio': {
-                            'nome_veiculo': row.get('nomeVeiculo') or row.get('nomeNavio') or ''
-                        },
-                        'transporte': {
-                            'nomeVeiculo': row.get('nomeVeiculo') or '',
-                            'nomeNavio': row.get('nomeNavio') or '',
-                            'codigoViaTransporte': row.get('codigoViaTransporte') or '',
-                            'nomeTransportador': row.get('nomeTransportador') or ''
-                        },
-                        'frete': {
-                            'valorTotalDolares': str(row.get('frete_valorTotalDolares') or '0'),
-                            'totalReais': str(row.get('frete_totalReais') or '0')
-                        },
-                        'seguro': {
-                            'valorTotalDolares': str(row.get('seguro_valorTotalDolares') or '0'),
-                            'valorTotalReais': str(row.get('seguro_valorTotalReais') or '0')
-                        },
-                        'valorMercadoriaEmbarque': {
-                            'totalDolares': str(row.get('valorMercadoriaEmbarque_totalDolares') or '0'),
-                            'totalReais': str(row.get('valorMercadoriaEmbarque_totalReais') or '0')
-                        },
-                        'pagamentos': pagamentos_di  # ✅ Pagamentos do SQL Server
-                    }
+                    dados_di = _montar_dados_di_sql(row, pagamentos_di)
                     
                     nome_veiculo = dados_di['navio']['nome_veiculo'] or dados_di['transporte']['nomeVeiculo'] or ''
                     logger.info(f'✅ Dados da DI {numero_di_normalizado} encontrados no SQL Server (nomeVeiculo: {nome_veiculo}, {len(pagamentos_di)} pagamentos)')
@@ -424,7 +604,105 @@ class RelatorioAverbacoesService:
             logger.warning(f'⚠️ Erro ao buscar DI {numero_di_normalizado} no SQL Server: {e}')
             return None
     
-    def _extrair_dados_processo(self, processo: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _buscar_dis_sql_server_lote(self, numeros_di: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca várias DIs no SQL Server com uma query `IN (...)` por lote (+ uma de pagamentos).
+        
+        ✅ NOVO (16/10/2026): substitui as 3 queries por DI de `_buscar_di_sql_server` no relatório.
+        Se a query do lote falhar, as DIs daquele lote são buscadas uma a uma (como antes),
+        para não mandar à API bilhetada DIs que existem no SQL Server.
+        
+        Args:
+            numeros_di: Números das DIs (como vieram do processo)
+        
+        Returns:
+            Dict {numero_di_normalizado: dados_di no formato da API}; DIs ausentes ficam fora
+        """
+        encontrados: Dict[str, Dict[str, Any]] = {}
+        originais: Dict[str, str] = {}
+        for numero_di in numeros_di:
+            originais.setdefault(_normalizar_numero_di(numero_di), numero_di)
+        if not originais:
+            return encontrados
+        
+        try:
+            from utils.sql_server_adapter import get_sql_adapter
+            sql_adapter = get_sql_adapter()
+        except Exception as e:
+            logger.warning(f'⚠️ SQL Server indisponível para buscar DIs em lote: {e}')
+            return encontrados
+        
+        normalizados = list(originais)
+        tamanho = max(1, RELATORIO_AVERBACOES_LOTE_DI)
+        for inicio in range(0, len(normalizados), tamanho):
+            lote = normalizados[inicio:inicio + tamanho]
+            try:
+                encontrados.update(self._buscar_lote_dis(sql_adapter, lote, originais))
+            except Exception as e:
+                logger.warning(f'⚠️ Falha na busca em lote de {len(lote)} DIs ({e}). Buscando uma a uma...')
+                for normalizado in lote:
+                    dados_di = self._buscar_di_sql_server(originais[normalizado], normalizado)
+                    if dados_di:
+                        encontrados[normalizado] = dados_di
+        
+        logger.info(f'✅ {len(encontrados)}/{len(originais)} DIs encontradas no SQL Server (em lote)')
+        return encontrados
+    
+    def _buscar_lote_dis(
+        self,
+        sql_adapter: Any,
+        lote: List[str],
+        originais: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Um lote de `_buscar_dis_sql_server_lote` (levanta RuntimeError se a query principal falhar)."""
+        parametros = list(dict.fromkeys(lote + [originais[n] for n in lote]))
+        marcadores = ', '.join('?' for _ in parametros)
+        query = f'''
+                SELECT diRoot.dadosDiId,{_SQL_DI_COLUNAS}{_SQL_DI_FROM}
+                WHERE ddg.numeroDi IN ({marcadores})
+                ORDER BY ddg.dataHoraSituacaoDi DESC
+            '''
+        result = sql_adapter.execute_query(query, 'Serpro', parametros, notificar_erro=False)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error') or 'erro desconhecido')
+        
+        # Mesma regra do TOP 1 ... ORDER BY dataHoraSituacaoDi DESC: a primeira linha de cada DI vence
+        linhas: Dict[str, Dict[str, Any]] = {}
+        for row in result.get('data') or []:
+            normalizado = _normalizar_numero_di(row.get('numeroDi') or '')
+            if normalizado in originais and normalizado not in linhas:
+                linhas[normalizado] = row
+        if not linhas:
+            return {}
+        
+        pagamentos: Dict[Any, List[Dict[str, Any]]] = {}
+        ids = list(dict.fromkeys(row.get('dadosDiId') for row in linhas.values() if row.get('dadosDiId')))
+        if ids:
+            try:
+                query_pagamentos = f'''
+                    SELECT dp.rootDiId,{_SQL_PAGAMENTOS_COLUNAS}
+                    WHERE dp.rootDiId IN ({', '.join('?' for _ in ids)})
+                '''
+                result_pag = sql_adapter.execute_query(query_pagamentos, 'Serpro', ids, notificar_erro=False)
+                if result_pag.get('success'):
+                    for pag_row in result_pag.get('data') or []:
+                        pagamentos.setdefault(pag_row.get('rootDiId'), []).append(_mapear_pagamento(pag_row))
+                else:
+                    logger.debug(f'Erro ao buscar pagamentos das DIs em lote: {result_pag.get("error")}')
+            except Exception as e:
+                logger.debug(f'Erro ao buscar pagamentos das DIs em lote: {e}')
+        
+        return {
+            normalizado: _montar_dados_di_sql(row, pagamentos.get(row.get('dadosDiId'), []))
+            for normalizado, row in linhas.items()
+        }
+    
+    def _extrair_dados_processo(
+        self,
+        processo: Dict[str, Any],
+        dados_di_sql: Optional[Dict[str, Any]] = None,
+        consultar_sql: bool = True
+    ) -> Optional[Dict[str, Any]]:
         """
         Extrai dados completos de um processo para o relatório.
         
@@ -433,6 +711,8 @@ class RelatorioAverbacoesService:
         
         Args:
             processo: Dict com processo_referencia, numero_di, etc.
+            dados_di_sql: DI já buscada no SQL Server (ex: busca em lote do relatório)
+            consultar_sql: False quando a busca em lote já confirmou que a DI não está no SQL Server
         
         Returns:
             Dict com dados da linha do relatório ou None se erro
@@ -444,10 +724,11 @@ class RelatorioAverbacoesService:
                 return None
             
             # Normalizar número da DI
-            numero_di_normalizado = numero_di.replace('/', '').replace('-', '').replace(' ', '').replace('.', '')
+            numero_di_normalizado = _normalizar_numero_di(numero_di)
             
             # ✅ PRIORIDADE 1: Buscar dados da DI do SQL Server primeiro (sem custo)
-            dados_di_sql = self._buscar_di_sql_server(numero_di, numero_di_normalizado)
+            if dados_di_sql is None and consultar_sql:
+                dados_di_sql = self._buscar_di_sql_server(numero_di, numero_di_normalizado)
             
             # ✅ PRIORIDADE 2: Se não encontrou no SQL Server, buscar via API (bilhetada)
             if not dados_di_sql:
@@ -658,94 +939,70 @@ class RelatorioAverbacoesService:
             Path do arquivo gerado
         """
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-            
-            wb = Workbook()
-            ws = wb.active
-            ws.title = 'IMPORTAÇÃO'
-            
-            # Cabeçalho (linhas 1-4)
-            ws['A1'] = 'Modelo Averbação Via Planilha'
-            ws['A2'] = 'Nome do Segurado'
-            ws['C2'] = 'BANDEMAR COMERCIO IMPORTACAO E EXPORTACAO'
-            ws['A3'] = 'CNPJ'
-            ws['C3'] = '08.641.586/0002-66 e 08.641.586/0004-28'
-            ws['A4'] = 'Nº Apólice'
-            
-            # Cabeçalhos das colunas (linha 5)
-            headers = [
-                'Averbação provisória',
-                'País de Origem',
-                'Porto Origem',
-                'País Origem',
-                'Cidade de  Destino',
-                'Data do BL',
-                'Tipo de transporte',
-                'Mercadoria',
-                'Nome Navio',
-                'Custo USD',
-                'Frete USD',
-                'Despesas',
-                'Lucros',
-                'Impostos da DI USD',
-                'DI',
-                'OBS'
-            ]
-            
-            for col_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=5, column=col_idx)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
-            
-            # Dados (linha 6 em diante)
-            for row_idx, linha in enumerate(dados, start=6):
-                ws.cell(row=row_idx, column=1).value = ''  # Averbação provisória (vazio)
-                ws.cell(row=row_idx, column=2).value = linha.get('pais_origem', '')
-                ws.cell(row=row_idx, column=3).value = linha.get('porto_origem', '')
-                ws.cell(row=row_idx, column=4).value = linha.get('pais_origem_2', '')
-                ws.cell(row=row_idx, column=5).value = linha.get('cidade_destino', '')
-                ws.cell(row=row_idx, column=6).value = linha.get('data_bl', '')
-                ws.cell(row=row_idx, column=7).value = linha.get('tipo_transporte', '')
-                ws.cell(row=row_idx, column=8).value = linha.get('mercadoria', '')
-                ws.cell(row=row_idx, column=9).value = linha.get('nome_navio', '')
-                ws.cell(row=row_idx, column=10).value = linha.get('custo_usd', 0)
-                ws.cell(row=row_idx, column=11).value = linha.get('frete_usd', 0)
-                ws.cell(row=row_idx, column=12).value = linha.get('despesas', 0)
-                ws.cell(row=row_idx, column=13).value = linha.get('lucros', 0)
-                ws.cell(row=row_idx, column=14).value = linha.get('impostos_usd', 0)
-                ws.cell(row=row_idx, column=15).value = linha.get('di', '')
-                ws.cell(row=row_idx, column=16).value = linha.get('obs', '')
-            
-            # Ajustar largura das colunas
-            ws.column_dimensions['A'].width = 20
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 15
-            ws.column_dimensions['D'].width = 15
-            ws.column_dimensions['E'].width = 20
-            ws.column_dimensions['F'].width = 12
-            ws.column_dimensions['G'].width = 15
-            ws.column_dimensions['H'].width = 40
-            ws.column_dimensions['I'].width = 25
-            ws.column_dimensions['J'].width = 12
-            ws.column_dimensions['K'].width = 12
-            ws.column_dimensions['L'].width = 12
-            ws.column_dimensions['M'].width = 12
-            ws.column_dimensions['N'].width = 18
-            ws.column_dimensions['O'].width = 15
-            ws.column_dimensions['P'].width = 15
-            
-            # Salvar arquivo
             categoria_str = f'_{categoria}' if categoria else ''
             nome_arquivo = f'Relatorio_Averbacoes_{ano:04d}_{mes:02d}{categoria_str}.xlsx'
-            caminho_arquivo = self.downloads_dir / nome_arquivo
-            
-            wb.save(caminho_arquivo)
-            logger.info(f'✅ Excel gerado: {caminho_arquivo}')
-            
-            return caminho_arquivo
+            planilha = _PlanilhaAverbacoes(self.downloads_dir / nome_arquivo)
+            for linha in dados:
+                planilha.escrever(linha)
+            return planilha.salvar()
             
         except Exception as e:
             logger.error(f'❌ Erro ao gerar Excel: {e}', exc_info=True)
             raise
+
+
+# ---------------------------------------------------------------------- execução em background
+# ✅ NOVO (16/10/2026): relatório de fim de mês estourava o timeout do request HTTP.
+# O endpoint pode iniciar o relatório numa thread e o front consulta o progresso pelo job_id.
+_MAX_JOBS_GUARDADOS = 50
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+
+def iniciar_relatorio_averbacoes_em_background(
+    mes: str,
+    ano: Optional[int] = None,
+    categoria: Optional[str] = None
+) -> str:
+    """Dispara `gerar_relatorio_averbacoes` numa thread e retorna o job_id para acompanhar o progresso."""
+    job_id = uuid.uuid4().hex
+    job: Dict[str, Any] = {
+        'job_id': job_id,
+        'status': 'executando',
+        'etapa': 'iniciando',
+        'processados': 0,
+        'total': 0,
+        'iniciado_em': datetime.now().isoformat(),
+        'resultado': None,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+        # Descartar os jobs finalizados mais antigos
+        finalizados = [jid for jid, j in _jobs.items() if j['status'] != 'executando']
+        for jid in finalizados[:max(0, len(_jobs) - _MAX_JOBS_GUARDADOS)]:
+            _jobs.pop(jid, None)
+
+    def _progresso(evento: Dict[str, Any]) -> None:
+        with _jobs_lock:
+            job.update({k: evento.get(k) for k in ('etapa', 'processados', 'total')})
+
+    def _executar() -> None:
+        try:
+            resultado = RelatorioAverbacoesService().gerar_relatorio_averbacoes(mes, ano, categoria, progresso=_progresso)
+        except Exception as e:
+            logger.error(f'❌ Erro no relatório de averbações em background: {e}', exc_info=True)
+            resultado = {'sucesso': False, 'erro': 'ERRO_INTERNO', 'mensagem': f'Erro ao gerar relatório: {str(e)}'}
+        with _jobs_lock:
+            job['resultado'] = resultado
+            job['status'] = 'concluido' if resultado.get('sucesso') else 'erro'
+            job['finalizado_em'] = datetime.now().isoformat()
+
+    threading.Thread(target=_executar, name=f'averbacoes-{job_id[:8]}', daemon=True).start()
+    return job_id
+
+
+def obter_status_relatorio_averbacoes(job_id: str) -> Optional[Dict[str, Any]]:
+    """Estado do job (status, etapa, processados/total e, ao final, o resultado) ou None se desconhecido."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
@@ -0,0 +1,29 @@
+"""
+Relatório FOB schema (SQLite)
+
+Marca os anos FECHADOS já materializados em `mAIke_assistente.dbo.VALOR_MERCADORIA` pelo
+relatório FOB, para o relatório anual reaproveitar os valores persistidos em vez de recalcular.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+
+def criar_tabela_relatorio_fob(cursor: sqlite3.Cursor) -> None:
+    # Um registro por (ano, categoria) materializado; categoria '' = todas.
+    # `chaves_json`: "TIPO|processo" que geraram linhas em VALOR_MERCADORIA (conferidas na leitura)
+    # `sem_valores_json`: processos sem nenhum valor > 0 (não geram linha no SQL Server)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS relatorio_fob_anos_materializados (
+            ano INTEGER NOT NULL,
+            categoria TEXT NOT NULL DEFAULT '',
+            total_processos INTEGER NOT NULL,
+            chaves_json TEXT NOT NULL,
+            sem_valores_json TEXT NOT NULL DEFAULT '[]',
+            materializado_em TEXT NOT NULL,
+            PRIMARY KEY (ano, categoria)
+        )
+        """
+    )
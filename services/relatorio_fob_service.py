@@ -9,184 +9,414 @@ Para DUIMP: FOB já está disponível diretamente
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-def _sql_escape(value: str) -> str:
-    return (value or '').replace("'", "''")
+# ✅ NOVO (16/10/2026): materialização em lote de VALOR_MERCADORIA e reuso no relatório anual
+RELATORIO_FOB_REUSO_ANO_FECHADO = os.getenv("RELATORIO_FOB_REUSO_ANO_FECHADO", "true").lower() == "true"
+# Linhas por MERGE parametrizado no caminho sem transação (Node.js): 9 parâmetros/linha, limite 2100
+VALOR_MERCADORIA_LOTE_MERGE = int(os.getenv("VALOR_MERCADORIA_LOTE_MERGE", "200"))
 
+_COLUNAS_VALOR = (
+    'processo_referencia',
+    'numero_documento',
+    'tipo_documento',
+    'tipo_valor',
+    'moeda',
+    'valor',
+    'data_valor',
+    'fonte_dados',
+    'json_dados_originais',
+)
 
-def _sql_quote(value: Optional[str]) -> str:
-    if value is None:
-        return 'NULL'
-    return f"'{_sql_escape(str(value))}'"
+_SQL_STAGE_CRIAR = """
+    CREATE TABLE #VALOR_MERCADORIA_STAGE (
+        processo_referencia VARCHAR(50) NOT NULL,
+        numero_documento VARCHAR(50) NOT NULL,
+        tipo_documento VARCHAR(10) NOT NULL,
+        tipo_valor VARCHAR(50) NOT NULL,
+        moeda VARCHAR(3) NOT NULL,
+        valor DECIMAL(18,2) NOT NULL,
+        data_valor NVARCHAR(50) NULL,
+        fonte_dados VARCHAR(50) NOT NULL,
+        json_dados_originais NVARCHAR(MAX) NULL
+    )
+"""
 
+_SQL_STAGE_INSERIR = (
+    f"INSERT INTO #VALOR_MERCADORIA_STAGE ({', '.join(_COLUNAS_VALOR)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUNAS_VALOR)})"
+)
 
-def _sql_decimal(value: Optional[float]) -> str:
-    if value is None:
-        return 'NULL'
-    try:
-        # Garantir ponto como separador decimal
-        return str(float(value))
-    except Exception:
-        return 'NULL'
+# MERGE único na chave natural; `{origem}` é a tabela de staging ou um VALUES parametrizado
+_SQL_MERGE_VALOR_MERCADORIA = """
+    MERGE mAIke_assistente.dbo.VALOR_MERCADORIA WITH (HOLDLOCK) AS tgt
+    USING {origem} AS src
+    ON tgt.processo_referencia = src.processo_referencia
+       AND tgt.numero_documento = src.numero_documento
+       AND tgt.tipo_documento = src.tipo_documento
+       AND tgt.tipo_valor = src.tipo_valor
+       AND tgt.moeda = src.moeda
+    WHEN MATCHED THEN
+        UPDATE SET
+            valor = src.valor,
+            data_valor = TRY_CONVERT(DATETIME2, src.data_valor),
+            data_atualizacao = GETDATE(),
+            fonte_dados = src.fonte_dados,
+            json_dados_originais = src.json_dados_originais,
+            atualizado_em = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (
+            processo_referencia,
+            numero_documento,
+            tipo_documento,
+            tipo_valor,
+            moeda,
+            valor,
+            taxa_cambio,
+            data_valor,
+            data_atualizacao,
+            fonte_dados,
+            json_dados_originais,
+            criado_em,
+            atualizado_em
+        )
+        VALUES (
+            src.processo_referencia,
+            src.numero_documento,
+            src.tipo_documento,
+            src.tipo_valor,
+            src.moeda,
+            src.valor,
+            NULL,
+            TRY_CONVERT(DATETIME2, src.data_valor),
+            GETDATE(),
+            src.fonte_dados,
+            src.json_dados_originais,
+            GETDATE(),
+            GETDATE()
+        );
+"""
+
+
+def _chave_processo(proc: Dict[str, Any]) -> str:
+    return f"{(proc.get('tipo_documento') or '').upper().strip()}|{proc.get('numero_processo')}"
+
+
+def _montar_linhas_valor_mercadoria(
+    processos: List[Dict[str, Any]],
+    fonte_dados: str,
+) -> Tuple[List[Tuple[Any, ...]], List[Dict[str, Any]]]:
+    """
+    Linhas de VALOR_MERCADORIA (uma por tipo_valor x moeda com valor != 0), sem chave repetida.
+
+    Returns:
+        (linhas na ordem de `_COLUNAS_VALOR`, processos válidos que não geraram nenhuma linha)
+    """
+    linhas: Dict[Tuple[str, ...], Tuple[Any, ...]] = {}
+    sem_valores: List[Dict[str, Any]] = []
+
+    for proc in processos or []:
+        processo_ref = proc.get('numero_processo')
+        tipo_doc = (proc.get('tipo_documento') or '').upper().strip() or None
+        numero_doc = proc.get('numero_di') or proc.get('numero_duimp')
+        data_valor = proc.get('data_desembaraco') or proc.get('dataHoraDesembaraco')
+
+        if not processo_ref or not tipo_doc or not numero_doc:
+            continue
+
+        # Mapear campos disponíveis
+        candidatos = []
+        # FOB sempre
+        candidatos.append(('FOB', 'USD', proc.get('fob_usd')))
+        candidatos.append(('FOB', 'BRL', proc.get('fob_brl')))
+
+        # DI: VMLD, FRETE, SEGURO
+        if tipo_doc == 'DI':
+            candidatos.append(('VMLD', 'USD', proc.get('vmld_usd')))
+            candidatos.append(('VMLD', 'BRL', proc.get('vmld_brl')))
+            candidatos.append(('FRETE', 'USD', proc.get('frete_usd')))
+            candidatos.append(('FRETE', 'BRL', proc.get('frete_brl')))
+            candidatos.append(('SEGURO', 'USD', proc.get('seguro_usd')))
+            candidatos.append(('SEGURO', 'BRL', proc.get('seguro_brl')))
+
+        # DUIMP: frete_brl (se houver)
+        if tipo_doc == 'DUIMP':
+            candidatos.append(('FRETE', 'BRL', proc.get('frete_brl')))
+
+        payload = None
+        try:
+            payload = json.dumps(proc, ensure_ascii=False, default=str)
+        except Exception:
+            payload = None
+
+        gerou = False
+        for tipo_valor, moeda, valor in candidatos:
+            if valor is None:
+                continue
+            try:
+                valor_f = float(valor)
+            except Exception:
+                continue
+            # Evitar inserir zeros "vazios" demais
+            if valor_f == 0.0:
+                continue
+            chave = (str(processo_ref), str(numero_doc), str(tipo_doc), tipo_valor, moeda)
+            linhas[chave] = chave + (
+                round(valor_f, 2),
+                str(data_valor) if data_valor is not None else None,
+                fonte_dados,
+                payload,
+            )
+            gerou = True
+        if not gerou:
+            sem_valores.append(proc)
+
+    return list(linhas.values()), sem_valores
+
+
+def _merge_valores_em_blocos(sql_adapter, linhas: List[Tuple[Any, ...]]) -> bool:
+    """Fallback sem transação multi-comando (Node.js): um MERGE parametrizado por bloco de linhas."""
+    tamanho = max(1, min(VALOR_MERCADORIA_LOTE_MERGE, 2000 // len(_COLUNAS_VALOR)))
+    placeholders_linha = f"({', '.join('?' for _ in _COLUNAS_VALOR)})"
+    for inicio in range(0, len(linhas), tamanho):
+        bloco = linhas[inicio:inicio + tamanho]
+        origem = f"(VALUES {', '.join(placeholders_linha for _ in bloco)}) AS v ({', '.join(_COLUNAS_VALOR)})"
+        params = [valor for linha in bloco for valor in linha]
+        result = sql_adapter.execute_query(
+            _SQL_MERGE_VALOR_MERCADORIA.format(origem=f"(SELECT * FROM {origem})"),
+            database='mAIke_assistente',
+            params=params,
+            notificar_erro=False,
+        )
+        if not result.get('success'):
+            logger.warning(f"⚠️ MERGE em bloco de VALOR_MERCADORIA falhou: {result.get('error')}")
+            return False
+    return True
 
 
 def _persistir_valores_mercadoria_sql_server(
     processos: List[Dict[str, Any]],
     fonte_dados: str = 'RELATORIO_FOB',
-) -> None:
+) -> Optional[List[Dict[str, Any]]]:
     """
     Persiste valores calculados na tabela mAIke_assistente.dbo.VALOR_MERCADORIA.
 
     ✅ Objetivo: popular tabela que hoje está vazia e permitir consultas futuras no banco novo.
     ✅ Chave natural de upsert: (processo_referencia, numero_documento, tipo_documento, tipo_valor, moeda).
+    ✅ OTIMIZADO (16/10/2026): antes era um MERGE montado em string por linha (até 8 por processo,
+    milhares de round trips no relatório anual). Agora todas as linhas vão para `#VALOR_MERCADORIA_STAGE`
+    (`fast_executemany`) e um único MERGE aplica tudo, na mesma transação. Sem pyodbc (Node.js),
+    MERGE parametrizado em blocos de `VALOR_MERCADORIA_LOTE_MERGE` linhas.
+
+    Returns:
+        Processos válidos sem nenhum valor persistido (lista, possivelmente vazia) se tudo foi gravado;
+        None se não gravou (sem adapter ou erro - não crítico).
     """
     try:
         from utils.sql_server_adapter import get_sql_adapter
-        import json as _json
 
         sql_adapter = get_sql_adapter()
         if not sql_adapter:
-            return
+            return None
 
-        # Montar linhas (uma linha por tipo_valor x moeda quando houver valor)
-        linhas: List[Dict[str, Any]] = []
+        linhas, sem_valores = _montar_linhas_valor_mercadoria(processos, fonte_dados)
+        if not linhas:
+            return sem_valores
 
-        for proc in processos or []:
-            processo_ref = proc.get('numero_processo')
-            tipo_doc = (proc.get('tipo_documento') or '').upper().strip() or None
-            numero_doc = proc.get('numero_di') or proc.get('numero_duimp')
-            data_valor = proc.get('data_desembaraco') or proc.get('dataHoraDesembaraco')
+        gravado = False
+        if hasattr(sql_adapter, 'execute_transaction'):
+            result = sql_adapter.execute_transaction(
+                [
+                    (_SQL_STAGE_CRIAR, None),
+                    (_SQL_STAGE_INSERIR, linhas),
+                    (_SQL_MERGE_VALOR_MERCADORIA.format(origem='#VALOR_MERCADORIA_STAGE'), None),
+                    ("DROP TABLE #VALOR_MERCADORIA_STAGE", None),
+                ],
+                database='mAIke_assistente',
+                notificar_erro=False,
+            )
+            gravado = bool(result.get('success'))
+            if not gravado:
+                logger.debug(f"Staging de VALOR_MERCADORIA indisponível ({result.get('error')}), usando MERGE em blocos")
+        if not gravado:
+            gravado = _merge_valores_em_blocos(sql_adapter, linhas)
+        if not gravado:
+            return None
 
-            if not processo_ref or not tipo_doc or not numero_doc:
-                continue
+        logger.info(f"✅ VALOR_MERCADORIA populada/atualizada: {len(linhas)} linha(s) (fonte={fonte_dados})")
+        return sem_valores
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao persistir VALOR_MERCADORIA (não crítico): {e}")
+        return None
 
-            # Mapear campos disponíveis
-            candidatos = []
-            # FOB sempre
-            candidatos.append(('FOB', 'USD', proc.get('fob_usd')))
-            candidatos.append(('FOB', 'BRL', proc.get('fob_brl')))
-
-            # DI: VMLD, FRETE, SEGURO
-            if tipo_doc == 'DI':
-                candidatos.append(('VMLD', 'USD', proc.get('vmld_usd')))
-                candidatos.append(('VMLD', 'BRL', proc.get('vmld_brl')))
-                candidatos.append(('FRETE', 'USD', proc.get('frete_usd')))
-                candidatos.append(('FRETE', 'BRL', proc.get('frete_brl')))
-                candidatos.append(('SEGURO', 'USD', proc.get('seguro_usd')))
-                candidatos.append(('SEGURO', 'BRL', proc.get('seguro_brl')))
-
-            # DUIMP: frete_brl (se houver)
-            if tipo_doc == 'DUIMP':
-                candidatos.append(('FRETE', 'BRL', proc.get('frete_brl')))
 
-            payload = None
-            try:
-                payload = _json.dumps(proc, ensure_ascii=False, default=str)
-            except Exception:
-                payload = None
+# ---------------------------------------------------------------------- reuso no relatório anual
+_tabela_fob_ok = False
+_tabela_fob_lock = threading.Lock()
 
-            for tipo_valor, moeda, valor in candidatos:
-                if valor is None:
-                    continue
-                try:
-                    valor_f = float(valor)
-                except Exception:
-                    continue
-                # Evitar inserir zeros "vazios" demais
-                if valor_f == 0.0:
-                    continue
-                linhas.append({
-                    'processo_referencia': str(processo_ref),
-                    'numero_documento': str(numero_doc),
-                    'tipo_documento': str(tipo_doc),
-                    'tipo_valor': str(tipo_valor),
-                    'moeda': str(moeda),
-                    'valor': valor_f,
-                    'data_valor': data_valor,
-                    'fonte_dados': fonte_dados,
-                    'json_dados_originais': payload,
-                })
 
-        if not linhas:
-            return
-
-        # Executar MERGE por linha (simples e robusto; volume típico é aceitável)
-        for row in linhas:
-            processo_referencia = _sql_quote(row['processo_referencia'])
-            numero_documento = _sql_quote(row['numero_documento'])
-            tipo_documento = _sql_quote(row['tipo_documento'])
-            tipo_valor = _sql_quote(row['tipo_valor'])
-            moeda = _sql_quote(row['moeda'])
-            valor_sql = _sql_decimal(row['valor'])
-            data_valor_sql = _sql_quote(row.get('data_valor'))
-            fonte_sql = _sql_quote(row.get('fonte_dados') or fonte_dados)
-            json_sql = _sql_quote(row.get('json_dados_originais'))
-
-            merge = f"""
-            MERGE mAIke_assistente.dbo.VALOR_MERCADORIA WITH (HOLDLOCK) AS tgt
-            USING (
-                SELECT
-                    {processo_referencia} AS processo_referencia,
-                    {numero_documento} AS numero_documento,
-                    {tipo_documento} AS tipo_documento,
-                    {tipo_valor} AS tipo_valor,
-                    {moeda} AS moeda
-            ) AS src
-            ON tgt.processo_referencia = src.processo_referencia
-               AND tgt.numero_documento = src.numero_documento
-               AND tgt.tipo_documento = src.tipo_documento
-               AND tgt.tipo_valor = src.tipo_valor
-               AND tgt.moeda = src.moeda
-            WHEN MATCHED THEN
-                UPDATE SET
-                    valor = {valor_sql},
-                    data_valor = {data_valor_sql},
-                    data_atualizacao = GETDATE(),
-                    fonte_dados = {fonte_sql},
-                    json_dados_originais = {json_sql},
-                    atualizado_em = GETDATE()
-            WHEN NOT MATCHED THEN
-                INSERT (
-                    processo_referencia,
-                    numero_documento,
-                    tipo_documento,
-                    tipo_valor,
-                    moeda,
-                    valor,
-                    taxa_cambio,
-                    data_valor,
-                    data_atualizacao,
-                    fonte_dados,
-                    json_dados_originais,
-                    criado_em,
-                    atualizado_em
-                )
-                VALUES (
-                    src.processo_referencia,
-                    src.numero_documento,
-                    src.tipo_documento,
-                    src.tipo_valor,
-                    src.moeda,
-                    {valor_sql},
-                    NULL,
-                    {data_valor_sql},
-                    GETDATE(),
-                    {fonte_sql},
-                    {json_sql},
-                    GETDATE(),
-                    GETDATE()
-                );
-            """
-
-            sql_adapter.execute_query(merge, database='mAIke_assistente', params=None, notificar_erro=False)
+def _conectar_sqlite():
+    """Conexão do `db_manager` com a tabela de anos materializados garantida (uma vez por processo)."""
+    global _tabela_fob_ok
+    from db_manager import get_db_connection
+
+    conn = get_db_connection()
+    if not _tabela_fob_ok:
+        with _tabela_fob_lock:
+            if not _tabela_fob_ok:
+                from services.relatorio_fob_schema import criar_tabela_relatorio_fob
+
+                criar_tabela_relatorio_fob(conn.cursor())
+                conn.commit()
+                _tabela_fob_ok = True
+    return conn
+
+
+def _ano_fechado(ano: int) -> bool:
+    return ano < datetime.now().year
 
-        logger.info(f"✅ VALOR_MERCADORIA populada/atualizada: {len(linhas)} linha(s) (fonte={fonte_dados})")
-    except Exception as e:
-        logger.warning(f"⚠️ Falha ao persistir VALOR_MERCADORIA (não crítico): {e}")
+
+def _registrar_ano_materializado(
+    ano: int,
+    categoria: Optional[str],
+    processos: List[Dict[str, Any]],
+    sem_valores: List[Dict[str, Any]],
+) -> None:
+    chaves_sem_valor = {_chave_processo(p) for p in sem_valores}
+    chaves = sorted({_chave_processo(p) for p in processos} - chaves_sem_valor)
+    conn = _conectar_sqlite()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO relatorio_fob_anos_materializados "
+            "(ano, categoria, total_processos, chaves_json, sem_valores_json, materializado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                ano,
+                (categoria or '').upper(),
+                len(processos),
+                json.dumps(chaves, ensure_ascii=False),
+                json.dumps(sem_valores, ensure_ascii=False, default=str),
+                datetime.now().isoformat(),
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _ler_ano_materializado(ano: int, categoria: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Processos de um ano FECHADO a partir de VALOR_MERCADORIA (payload original de cada processo).
+
+    Returns:
+        Lista (DI primeiro, depois DUIMP, por número do processo) ou None se o ano não foi
+        materializado ou o SQL Server não tem todas as chaves registradas (aí recalcula).
+    """
+    categoria_upper = (categoria or '').upper()
+    conn = _conectar_sqlite()
+    try:
+        cursor = conn.cursor()
+        registro = None
+        # Ano materializado para todas as categorias também atende uma categoria específica
+        for cat in dict.fromkeys([categoria_upper, '']):
+            cursor.execute(
+                "SELECT chaves_json, sem_valores_json FROM relatorio_fob_anos_materializados "
+                "WHERE ano = ? AND categoria = ?",
+                (ano, cat),
+            )
+            registro = cursor.fetchone()
+            if registro:
+                break
+    finally:
+        conn.close()
+    if not registro:
+        return None
+
+    prefixo = f"{categoria_upper}." if categoria_upper else ''
+    esperadas = {c for c in json.loads(registro[0]) if c.split('|', 1)[1].upper().startswith(prefixo)}
+    sem_valores = [
+        p for p in json.loads(registro[1] or '[]')
+        if str(p.get('numero_processo') or '').upper().startswith(prefixo)
+    ]
+
+    from utils.sql_server_adapter import get_sql_adapter
+
+    sql_adapter = get_sql_adapter()
+    if not sql_adapter:
+        return None
+
+    # data_valor NULL: DI sem data de desembaraço (filtrada pela data da situação) - conferida pela chave
+    query = """
+        SELECT processo_referencia, tipo_documento, json_dados_originais
+        FROM (
+            SELECT
+                processo_referencia,
+                tipo_documento,
+                json_dados_originais,
+                ROW_NUMBER() OVER (
+                    PARTITION BY processo_referencia, tipo_documento
+                    ORDER BY atualizado_em DESC
+                ) AS rn
+            FROM mAIke_assistente.dbo.VALOR_MERCADORIA WITH (NOLOCK)
+            WHERE fonte_dados = ?
+              AND json_dados_originais IS NOT NULL
+              AND (data_valor IS NULL OR (data_valor >= ? AND data_valor < ?))
+              AND processo_referencia LIKE ?
+        ) v
+        WHERE v.rn = 1
+    """
+    result = sql_adapter.execute_query(
+        query,
+        'mAIke_assistente',
+        ['RELATORIO_FOB', f"{ano}-01-01", f"{ano + 1}-01-01", f"{prefixo}%"],
+        notificar_erro=False,
+    )
+    if not result.get('success'):
+        logger.warning(f"⚠️ Não foi possível ler VALOR_MERCADORIA de {ano}, recalculando: {result.get('error')}")
+        return None
+
+    processos: Dict[str, Dict[str, Any]] = {}
+    for row in result.get('data') or []:
+        chave = f"{(row.get('tipo_documento') or '').upper()}|{row.get('processo_referencia')}"
+        if chave not in esperadas:
+            continue
+        try:
+            processos[chave] = json.loads(row.get('json_dados_originais'))
+        except Exception:
+            continue
+    if len(processos) != len(esperadas):
+        logger.info(
+            f"ℹ️ VALOR_MERCADORIA de {ano} incompleta ({len(processos)}/{len(esperadas)} processos), recalculando"
+        )
+        return None
+
+    todos = list(processos.values()) + sem_valores
+    return sorted(
+        todos,
+        key=lambda p: (0 if p.get('tipo_documento') == 'DI' else 1, str(p.get('numero_processo') or '')),
+    )
+
+
+def _buscar_processos_periodo(mes: Optional[int], ano: int, categoria: Optional[str]) -> List[Dict[str, Any]]:
+    """DI e DUIMP do período, consultados em paralelo (bancos/queries independentes)."""
+    if mes is None:
+        busca_di, busca_duimp = (lambda: buscar_processos_di_por_ano(ano, categoria),
+                                 lambda: buscar_processos_duimp_por_ano(ano, categoria))
+    else:
+        busca_di, busca_duimp = (lambda: buscar_processos_di_por_mes(mes, ano, categoria),
+                                 lambda: buscar_processos_duimp_por_mes(mes, ano, categoria))
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='relatorio_fob') as executor:
+        futuro_duimp = executor.submit(busca_duimp)
+        processos_di = busca_di()
+        processos_duimp = futuro_duimp.result()
+    return processos_di + processos_duimp
 
 
 def normalizar_fob_para_incoterm(
@@ -884,20 +1114,30 @@ def gerar_relatorio_importacoes_fob(
         }
     """
     try:
-        # Buscar processos com DI / DUIMP
-        if mes is None:
-            processos_di = buscar_processos_di_por_ano(ano, categoria)
-            processos_duimp = buscar_processos_duimp_por_ano(ano, categoria)
-        else:
-            processos_di = buscar_processos_di_por_mes(mes, ano, categoria)
-            processos_duimp = buscar_processos_duimp_por_mes(mes, ano, categoria)
-        
-        # Combinar todos os processos
-        todos_processos = processos_di + processos_duimp
+        # ✅ OTIMIZADO (16/10/2026): ano fechado já materializado vem de VALOR_MERCADORIA
+        # (valores de DI/DUIMP desembaraçadas não mudam); senão consulta DI e DUIMP em paralelo.
+        reuso_ano = mes is None and RELATORIO_FOB_REUSO_ANO_FECHADO and _ano_fechado(ano)
+        todos_processos = None
+        if reuso_ano:
+            try:
+                todos_processos = _ler_ano_materializado(ano, categoria)
+            except Exception as e:
+                logger.warning(f"⚠️ Reuso de VALOR_MERCADORIA para {ano} falhou, recalculando: {e}")
+                todos_processos = None
+            if todos_processos is not None:
+                logger.info(f"✅ Relatório FOB {ano}: {len(todos_processos)} processo(s) reaproveitados de VALOR_MERCADORIA")
 
-        # ✅ NOVO (19/01/2026): Persistir valores no banco novo (mAIke_assistente)
-        # Isso materializa os valores calculados (FOB/VMLD/FRETE/SEGURO) em dbo.VALOR_MERCADORIA.
-        _persistir_valores_mercadoria_sql_server(todos_processos, fonte_dados='RELATORIO_FOB')
+        if todos_processos is None:
+            todos_processos = _buscar_processos_periodo(mes, ano, categoria)
+
+            # ✅ NOVO (19/01/2026): Persistir valores no banco novo (mAIke_assistente)
+            # Isso materializa os valores calculados (FOB/VMLD/FRETE/SEGURO) em dbo.VALOR_MERCADORIA.
+            sem_valores = _persistir_valores_mercadoria_sql_server(todos_processos, fonte_dados='RELATORIO_FOB')
+            if reuso_ano and sem_valores is not None and todos_processos:
+                try:
+                    _registrar_ano_materializado(ano, categoria, todos_processos, sem_valores)
+                except Exception as e:
+                    logger.debug(f"Não foi possível registrar {ano} como materializado: {e}")
         
         if not todos_processos:
             periodo_label = f"{ano}" if mes is None else f"{mes}/{ano}"
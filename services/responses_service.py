@@ -56,7 +56,8 @@ class ResponsesService:
             return
         
         try:
-            self.client = OpenAI(api_key=AI_API_KEY)
+            from services.openai_client_registry import obter_cliente_openai
+            self.client = obter_cliente_openai(api_key=AI_API_KEY, timeout=600.0, perfil="responses", sdk_max_retries=2)
             logger.info("✅ ResponsesService inicializado com sucesso")
         except Exception as e:
             logger.error(f"❌ Erro ao inicializar ResponsesService: {e}")
@@ -2,6 +2,9 @@
 Schema: sales_watch_state (SQLite)
 ---------------------------------
 Persistência do estado do "watch" de vendas (evitar notificar repetido).
+
+`sales_watch_state` (JSON de chaves por termo) é o formato antigo, lido só para migrar
+para `sales_watch_vistos`.
 """
 
 from __future__ import annotations
@@ -24,3 +27,48 @@ def criar_tabela_sales_watch_state(cursor: sqlite3.Cursor) -> None:
         "CREATE INDEX IF NOT EXISTS idx_sales_watch_state_updated_at ON sales_watch_state(updated_at)"
     )
 
+
+    # ✅ NOVO (16/10/2026): motor consolidado do watch (1 consulta por tick para todos os termos)
+    # NFs já vistas por termo: só INSERT OR IGNORE (append-only), indexado por (termo, chave)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sales_watch_vistos (
+            termo TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            dia TEXT NOT NULL,
+            criado_em TEXT NOT NULL,
+            PRIMARY KEY (termo, chave)
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_watch_vistos_dia ON sales_watch_vistos(dia)")
+
+    # Termos já inicializados (baseline feito) - substitui "seen vazio" do sales_watch_state
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sales_watch_termos (
+            termo TEXT PRIMARY KEY,
+            baseline_em TEXT NOT NULL
+        )
+        """
+    )
+
+    # Marca d'água do dia: último codigo_documento lido por (filial, tipo_movimento) - a chave do documento
+    # no legado é filial|tipo_movimento|codigo_documento, e cada tipo tem sua própria sequência de código.
+    # Versão anterior (só por filial) é descartada: a marca é só otimização, `sales_watch_vistos` deduplica.
+    cursor.execute("PRAGMA table_info(sales_watch_marca)")
+    colunas_marca = {row[1] for row in cursor.fetchall()}
+    if colunas_marca and "tipo_movimento" not in colunas_marca:
+        cursor.execute("DROP TABLE sales_watch_marca")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sales_watch_marca (
+            dia TEXT NOT NULL,
+            codigo_empresa_filial TEXT NOT NULL,
+            tipo_movimento TEXT NOT NULL,
+            ultimo_codigo_documento INTEGER NOT NULL,
+            atualizado_em TEXT NOT NULL,
+            PRIMARY KEY (dia, codigo_empresa_filial, tipo_movimento)
+        )
+        """
+    )
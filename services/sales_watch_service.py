@@ -8,6 +8,15 @@ Ativação via .env:
 - SALES_WATCH_ENABLED=true|false
 - SALES_WATCH_INTERVAL_MINUTES=15
 - SALES_WATCH_TERMS=rastreadoe,alho,hikvision
+
+✅ OTIMIZADO (16/10/2026): motor consolidado. Antes era 1 `consultar_vendas_por_nf` por termo a cada
+tick + reescrita do JSON de chaves vistas (até 2000) por termo. Agora cada tick:
+- busca as NFs de hoje UMA vez (todos os termos), só as mais novas que a marca d'água do dia
+  (último `codigo_documento` por filial + tipo_movimento; SALES_WATCH_HIGH_WATER_MARK=false volta a ler
+  o dia todo) e, a cada SALES_WATCH_RELEITURA_COMPLETA_MINUTOS, relê o dia inteiro para pegar documentos
+  que passaram a ser venda de hoje com código abaixo da marca;
+- casa todos os termos em memória com um matcher pré-compilado (mesma regra do filtro SQL de termo);
+- grava chaves vistas em `sales_watch_vistos` (termo, chave) só com INSERT OR IGNORE.
 """
 
 from __future__ import annotations
@@ -15,16 +24,26 @@ from __future__ import annotations
 import json
 import logging
 import os
+import time
 from dataclasses import dataclass
 from datetime import date, timedelta, datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
 from db_manager import get_db_connection
 from services.notificacao_service import NotificacaoService
-from services.vendas_make_service import VendasMakeService
+from services.vendas_make_service import VendasMakeService, _build_term_variants, _normalize_search_text
 
 logger = logging.getLogger(__name__)
 
+SALES_WATCH_HIGH_WATER_MARK = os.getenv("SALES_WATCH_HIGH_WATER_MARK", "true").strip().lower() == "true"
+SALES_WATCH_PAGINA_NFS = int(os.getenv("SALES_WATCH_PAGINA_NFS", "500"))
+SALES_WATCH_MAX_PAGINAS = int(os.getenv("SALES_WATCH_MAX_PAGINAS", "10"))
+SALES_WATCH_RETENCAO_DIAS = int(os.getenv("SALES_WATCH_RETENCAO_DIAS", "7"))
+SALES_WATCH_RELEITURA_COMPLETA_MINUTOS = int(os.getenv("SALES_WATCH_RELEITURA_COMPLETA_MINUTOS", "60"))
+
+# dia -> time.monotonic() da última leitura do dia inteiro (sem marca d'água) neste processo
+_releitura_completa_em: Dict[str, float] = {}
+
 
 def _today_range() -> Tuple[str, str]:
     dt = date.today()
@@ -63,6 +82,36 @@ def _fmt_brl(v: Any) -> str:
     return f"R$ {s}"
 
 
+class MatcherTermos:
+    """
+    Casa uma NF com TODOS os termos monitorados de uma vez.
+
+    Mesma regra do WHERE de termo do `VendasMakeService`: o termo casa se alguma variante tiver
+    todos os tokens presentes no centro de custo ou na descrição da operação. Tokens de todos os
+    termos são testados uma única vez por linha; termo sem tokens casa com tudo (como `1=1`).
+    """
+
+    def __init__(self, termos: Sequence[str]) -> None:
+        self._variantes: Dict[str, List[FrozenSet[str]]] = {}
+        for termo in termos:
+            self._variantes[termo] = [frozenset(v) for v in _build_term_variants(termo) if v]
+        self._tokens: Tuple[str, ...] = tuple(
+            sorted({tok for variantes in self._variantes.values() for v in variantes for tok in v})
+        )
+
+    def termos_da_linha(self, row: Dict[str, Any]) -> List[str]:
+        textos = (
+            _normalize_search_text(str(row.get("descricao_centro_custo_documento") or "")),
+            _normalize_search_text(str(row.get("descricao_tipo_operacao_documento") or "")),
+        )
+        presentes = {tok for tok in self._tokens if tok in textos[0] or tok in textos[1]}
+        return [
+            termo
+            for termo, variantes in self._variantes.items()
+            if not variantes or any(v <= presentes for v in variantes)
+        ]
+
+
 @dataclass
 class WatchResult:
     termo: str
@@ -88,102 +137,176 @@ class SalesWatchService:
         except Exception as e:
             logger.warning(f"⚠️ [SALES_WATCH] Não foi possível garantir schema: {e}", exc_info=True)
 
-    def _load_seen(self, termo: str) -> Set[str]:
+    def _migrar_estado_legado(self, cur, termo: str, dia: str, agora: str) -> bool:
+        """Importa o JSON antigo de `sales_watch_state` (se houver) para `sales_watch_vistos`."""
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
             cur.execute("SELECT seen_keys_json FROM sales_watch_state WHERE termo = ?", (termo,))
             row = cur.fetchone()
-            conn.close()
-            if not row:
-                return set()
-            raw = row[0]
-            if not raw:
-                return set()
-            data = json.loads(raw)
-            if isinstance(data, list):
-                return set(str(x) for x in data if x)
-            return set()
+            data = json.loads(row[0]) if row and row[0] else []
         except Exception:
-            return set()
-
-    def _save_seen(self, termo: str, seen: Set[str], max_keep: int = 2000) -> None:
-        try:
-            # limitar tamanho
-            lst = list(seen)
-            if len(lst) > max_keep:
-                lst = lst[-max_keep:]
-            payload = json.dumps(lst)
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO sales_watch_state(termo, seen_keys_json, updated_at)
-                VALUES (?, ?, ?)
-                ON CONFLICT(termo) DO UPDATE SET
-                    seen_keys_json=excluded.seen_keys_json,
-                    updated_at=excluded.updated_at
-                """,
-                (termo, payload, datetime.now().isoformat()),
-            )
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.warning(f"⚠️ [SALES_WATCH] Erro ao salvar estado: {e}", exc_info=True)
+            return False
+        if not isinstance(data, list) or not data:
+            return False
+        cur.executemany(
+            "INSERT OR IGNORE INTO sales_watch_vistos(termo, chave, dia, criado_em) VALUES (?, ?, ?, ?)",
+            [(termo, str(k), dia, agora) for k in data if k],
+        )
+        return True
+
+    @staticmethod
+    def _releitura_completa_vencida(dia: str) -> bool:
+        """
+        A marca d'água só enxerga códigos acima do último lido; um documento que vira venda de hoje
+        depois (código menor) só aparece relendo o dia todo. Faz isso no 1º tick do dia/processo e
+        depois a cada SALES_WATCH_RELEITURA_COMPLETA_MINUTOS (`sales_watch_vistos` evita notificar de novo).
+        """
+        ultima = _releitura_completa_em.get(dia)
+        if ultima is None:
+            return True
+        return time.monotonic() - ultima >= max(0, SALES_WATCH_RELEITURA_COMPLETA_MINUTOS) * 60
+
+    def _buscar_nfs_novas(
+        self, ini: str, fim: str, marca: Dict[Tuple[str, str], int]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        NFs de hoje (todos os termos) depois da marca d'água, paginadas por código crescente.
+        Avança `marca` (in-place) com o maior `codigo_documento` lido por (filial, tipo_movimento).
+        Retorna None se a primeira página falhar.
+        """
+        pagina = min(max(SALES_WATCH_PAGINA_NFS, 10), 500)
+        linhas: List[Dict[str, Any]] = []
+        for n in range(max(1, SALES_WATCH_MAX_PAGINAS)):
+            resp = self._svc.consultar_vendas_por_nf(inicio=ini, fim=fim, top=pagina, apos_documentos=dict(marca))
+            if not resp.get("sucesso"):
+                if n == 0:
+                    logger.info(f"[SALES_WATCH] Consulta de NFs falhou: {resp.get('erro')}")
+                    return None
+                break
+            rows = [r for r in (resp.get("dados") or []) if isinstance(r, dict)]
+            linhas.extend(rows)
+            for r in rows:
+                filial = r.get("codigo_empresa_filial")
+                try:
+                    codigo = int(r.get("codigo_documento"))
+                except Exception:
+                    continue
+                if filial is None:
+                    continue
+                par = (str(filial), str(r.get("tipo_movimento_documento") or ""))
+                if codigo > marca.get(par, -1):
+                    marca[par] = codigo
+            if len(rows) < pagina:
+                break
+        return linhas
 
     def check_once(self, *, termos: List[str]) -> List[WatchResult]:
         """
-        Roda uma vez: para cada termo, busca vendas por NF de HOJE e detecta NFs novas.
+        Roda uma vez: busca as NFs novas de HOJE (uma consulta para todos os termos) e detecta,
+        por termo, as que ainda não foram vistas.
         """
         if not self._svc.is_ready():
             logger.info("[SALES_WATCH] SQL adapter indisponível; pulando.")
             return []
 
+        termos = _parse_terms_env(",".join(termos or []))
+        if not termos:
+            return []
+
         ini, fim = _today_range()
-        results: List[WatchResult] = []
+        agora = datetime.now().isoformat()
+        notify_on_first = os.getenv("SALES_WATCH_NOTIFY_ON_FIRST_RUN", "false").strip().lower() == "true"
 
-        for termo in termos:
-            seen = self._load_seen(termo)
-            first_run_for_termo = len(seen) == 0
-            notify_on_first = os.getenv("SALES_WATCH_NOTIFY_ON_FIRST_RUN", "false").strip().lower() == "true"
-            resp = self._svc.consultar_vendas_por_nf(inicio=ini, fim=fim, termo=termo, top=250)
-            if not resp.get("sucesso"):
-                continue
-            rows = resp.get("dados") or []
-            novas: List[Dict[str, Any]] = []
-            total_novas = 0.0
+        conn = get_db_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT termo FROM sales_watch_termos")
+            conhecidos = {row[0] for row in cur.fetchall()}
+            novos_termos: Set[str] = set()
+            for termo in termos:
+                if termo not in conhecidos and not self._migrar_estado_legado(cur, termo, ini, agora):
+                    novos_termos.add(termo)
+
+            marca: Dict[Tuple[str, str], int] = {}
+            releitura_completa = self._releitura_completa_vencida(ini)
+            if SALES_WATCH_HIGH_WATER_MARK and not releitura_completa and not (novos_termos and notify_on_first):
+                cur.execute(
+                    "SELECT codigo_empresa_filial, tipo_movimento, ultimo_codigo_documento "
+                    "FROM sales_watch_marca WHERE dia = ?",
+                    (ini,),
+                )
+                marca = {(str(row[0]), str(row[1] or "")): int(row[2]) for row in cur.fetchall()}
+
+            rows = self._buscar_nfs_novas(ini, fim, marca)
+            if rows is None:
+                conn.rollback()
+                return []
+
+            matcher = MatcherTermos(termos)
+            novas_por_termo: Dict[str, List[Dict[str, Any]]] = {t: [] for t in termos}
+            baseline_por_termo: Dict[str, int] = {}
             for r in rows:
-                if not isinstance(r, dict):
-                    continue
                 k = _row_key(r)
                 if not k:
                     continue
+                for termo in matcher.termos_da_linha(r):
+                    # INSERT OR IGNORE no índice (termo, chave): rowcount 1 = NF nova para o termo
+                    cur.execute(
+                        "INSERT OR IGNORE INTO sales_watch_vistos(termo, chave, dia, criado_em) VALUES (?, ?, ?, ?)",
+                        (termo, k, ini, agora),
+                    )
+                    if cur.rowcount != 1:
+                        continue
+                    # ✅ Comportamento padrão: na PRIMEIRA execução do termo, "seedar" baseline (sem notificar)
+                    # para evitar spam ao subir o container e, ao mesmo tempo, deixar o watch pronto imediatamente.
+                    if termo in novos_termos and not notify_on_first:
+                        baseline_por_termo[termo] = baseline_por_termo.get(termo, 0) + 1
+                        continue
+                    novas_por_termo[termo].append(r)
+
+            cur.executemany(
+                "INSERT OR IGNORE INTO sales_watch_termos(termo, baseline_em) VALUES (?, ?)",
+                [(t, agora) for t in novos_termos],
+            )
+            if SALES_WATCH_HIGH_WATER_MARK and marca:
+                cur.executemany(
+                    "INSERT OR REPLACE INTO sales_watch_marca"
+                    "(dia, codigo_empresa_filial, tipo_movimento, ultimo_codigo_documento, atualizado_em) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(ini, filial, tipo, codigo, agora) for (filial, tipo), codigo in marca.items()],
+                )
+            # Retenção: chaves de dias antigos e marcas de outros dias não servem mais
+            limite = (date.today() - timedelta(days=max(1, SALES_WATCH_RETENCAO_DIAS))).isoformat()
+            cur.execute("DELETE FROM sales_watch_vistos WHERE dia < ?", (limite,))
+            cur.execute("DELETE FROM sales_watch_marca WHERE dia <> ?", (ini,))
+            conn.commit()
+            if releitura_completa:
+                _releitura_completa_em.clear()
+                _releitura_completa_em[ini] = time.monotonic()
+        except Exception as e:
+            logger.warning(f"⚠️ [SALES_WATCH] Erro ao processar tick: {e}", exc_info=True)
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            return []
+        finally:
+            conn.close()
 
-                # ✅ Comportamento padrão: na PRIMEIRA execução do termo, "seedar" baseline (sem notificar)
-                # para evitar spam ao subir o container e, ao mesmo tempo, deixar o watch pronto imediatamente.
-                if first_run_for_termo and (not notify_on_first):
-                    seen.add(k)
-                    continue
+        for termo, qtd in baseline_por_termo.items():
+            logger.info(f"💾 [SALES_WATCH] Baseline inicial salvo (termo={termo!r}, rows={qtd})")
 
-                if k not in seen:
-                    novas.append(r)
-                    try:
-                        total_novas += float(r.get("total_nf") or 0.0)
-                    except Exception:
-                        pass
-                    seen.add(k)
-                else:
-                    # já visto
+        results: List[WatchResult] = []
+        for termo in termos:
+            novas = novas_por_termo[termo]
+            if not novas:
+                continue
+            total_novas = 0.0
+            for r in novas:
+                try:
+                    total_novas += float(r.get("total_nf") or 0.0)
+                except Exception:
                     pass
-
-            # persistir sempre (para não duplicar no próximo tick)
-            self._save_seen(termo, seen)
-
-            if novas:
-                results.append(WatchResult(termo=termo, novas=novas, total_novas=total_novas))
-            elif first_run_for_termo and rows and (not notify_on_first):
-                logger.info(f"💾 [SALES_WATCH] Baseline inicial salvo (termo={termo!r}, rows={len(rows)})")
-
+            results.append(WatchResult(termo=termo, novas=novas, total_novas=total_novas))
         return results
 
     def notificar(self, results: List[WatchResult]) -> int:
@@ -144,6 +144,20 @@ class ScheduledNotificationsService:
                 coalesce=True,
                 max_instances=1,
             )
+
+        # ✅ NOVO (16/10/2026): aquecimento do store local de PTAX (Fechamento de ontem + dias faltando)
+        if os.getenv("PTAX_WARMUP_ENABLED", "true").lower() == "true":
+            from datetime import datetime, timedelta
+            self.scheduler.add_job(
+                func=self._aquecer_ptax,
+                trigger=CronTrigger(hour=int(os.getenv("PTAX_WARMUP_HOUR", "6")), minute=0),
+                id="ptax_warmup",
+                name="Aquecimento PTAX (store local)",
+                replace_existing=True,
+                next_run_time=datetime.now() + timedelta(seconds=30),
+                coalesce=True,
+                max_instances=1,
+            )
         
         logger.info("✅ Agendamentos de notificações configurados")
 
@@ -174,6 +188,22 @@ class ScheduledNotificationsService:
         except Exception as e:
             logger.warning(f"⚠️ Erro no watch de vendas: {e}", exc_info=True)
 
+    def _aquecer_ptax(self) -> None:
+        """Baixa para o store local de PTAX os dias fechados que ainda faltam."""
+        try:
+            from utils.ptax_bcb import aquecer_ptax
+
+            resultado = aquecer_ptax()
+            if resultado.get("meses_baixados") or resultado.get("erros"):
+                logger.info(
+                    "💱 Aquecimento PTAX: "
+                    f"meses_baixados={resultado.get('meses_baixados')}, "
+                    f"boletins={resultado.get('boletins')}, "
+                    f"erros={len(resultado.get('erros') or [])}"
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Erro no aquecimento de PTAX: {e}", exc_info=True)
+
     def _limpar_cache_tts(self):
         """Remove mp3 antigos/expirados do cache TTS."""
         try:
@@ -316,24 +346,32 @@ class ScheduledNotificationsService:
         try:
             logger.info("📊 Criando resumo diário...")
             
-            # Buscar dados do dia
-            pendencias = obter_pendencias_ativas()
-            
-            # Buscar processos chegando hoje
+            # ✅ NOVO (16/10/2026): dados do dia vêm do dashboard materializado (mesmo cálculo do "o que temos pra hoje")
             try:
-                from db_manager import obter_processos_chegando_hoje
-                processos_chegando = obter_processos_chegando_hoje()
+                from services.dashboard_snapshot_service import obter_dashboard_snapshot
+                secoes = obter_dashboard_snapshot()['secoes']
+                pendencias = secoes.get('pendencias') or []
+                processos_chegando = secoes.get('processos_chegando') or []
+                processos_prontos = secoes.get('processos_prontos') or []
             except Exception as e:
-                logger.warning(f"⚠️ Erro ao buscar processos chegando hoje: {e}")
-                processos_chegando = []
-            
-            # Buscar processos prontos para registro
-            try:
-                from db_manager import obter_processos_prontos_registro
-                processos_prontos = obter_processos_prontos_registro()
-            except Exception as e:
-                logger.warning(f"⚠️ Erro ao buscar processos prontos: {e}")
-                processos_prontos = []
+                logger.warning(f"⚠️ Erro ao obter dashboard materializado, consultando direto: {e}")
+                pendencias = obter_pendencias_ativas()
+                
+                # Buscar processos chegando hoje
+                try:
+                    from db_manager import obter_processos_chegando_hoje
+                    processos_chegando = obter_processos_chegando_hoje()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao buscar processos chegando hoje: {e}")
+                    processos_chegando = []
+                
+                # Buscar processos prontos para registro
+                try:
+                    from db_manager import obter_processos_prontos_registro
+                    processos_prontos = obter_processos_prontos_registro()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao buscar processos prontos: {e}")
+                    processos_prontos = []
             
             # Agrupar pendências por tipo
             pendencias_por_tipo = {}
@@ -30,6 +30,10 @@ def criar_indices_otimizacao_sqlite(cursor: sqlite3.Cursor) -> None:
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_dis_cache_chave ON dis_cache(chave_unica)"
         )
+        # ✅ NOVO (16/10/2026): canal/datas da DI por número na listagem por categoria
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dis_cache_numero_di ON dis_cache(numero_di, atualizado_em)"
+        )
         cursor.execute(
             "CREATE INDEX IF NOT EXISTS idx_processo_documentos_ref ON processo_documentos(processo_referencia)"
         )
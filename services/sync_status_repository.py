@@ -58,7 +58,15 @@ class SyncStatusRepository:
         except Exception as e:
             logger.error(f"❌ [SyncStatus] Erro ao registrar tentativa: {e}")
 
-    def registrar_sucesso(self, nome: str, *, count: Optional[int] = None, duration_ms: Optional[int] = None) -> None:
+    def registrar_sucesso(
+        self,
+        nome: str,
+        *,
+        count: Optional[int] = None,
+        duration_ms: Optional[int] = None,
+        changed: Optional[int] = None,
+        unchanged: Optional[int] = None,
+    ) -> None:
         try:
             from db_manager import get_db_connection
 
@@ -67,14 +75,19 @@ class SyncStatusRepository:
                 cur = conn.cursor()
                 cur.execute(
                     """
-                    INSERT INTO sync_status (nome, last_attempt_at, last_success_at, last_error, last_count, last_duration_ms)
-                    VALUES (?, ?, ?, NULL, ?, ?)
+                    INSERT INTO sync_status (
+                        nome, last_attempt_at, last_success_at, last_error, last_count, last_duration_ms,
+                        last_changed, last_unchanged
+                    )
+                    VALUES (?, ?, ?, NULL, ?, ?, ?, ?)
                     ON CONFLICT(nome) DO UPDATE SET
                         last_attempt_at=excluded.last_attempt_at,
                         last_success_at=excluded.last_success_at,
                         last_error=NULL,
                         last_count=excluded.last_count,
-                        last_duration_ms=excluded.last_duration_ms
+                        last_duration_ms=excluded.last_duration_ms,
+                        last_changed=excluded.last_changed,
+                        last_unchanged=excluded.last_unchanged
                     """,
                     (
                         (nome or "").strip(),
@@ -82,6 +95,8 @@ class SyncStatusRepository:
                         _now_iso(),
                         int(count) if count is not None else None,
                         int(duration_ms) if duration_ms is not None else None,
+                        int(changed) if changed is not None else None,
+                        int(unchanged) if unchanged is not None else None,
                     ),
                 )
                 conn.commit()
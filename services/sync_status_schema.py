@@ -18,8 +18,20 @@ def criar_tabela_sync_status(cursor: sqlite3.Cursor) -> None:
             last_success_at TEXT,
             last_error TEXT,
             last_count INTEGER,
-            last_duration_ms INTEGER
+            last_duration_ms INTEGER,
+            last_changed INTEGER,
+            last_unchanged INTEGER
         )
         """
     )
 
+    # Migração: métricas do sync incremental (alterados/inalterados no último ciclo)
+    for ddl in (
+        "ALTER TABLE sync_status ADD COLUMN last_changed INTEGER",
+        "ALTER TABLE sync_status ADD COLUMN last_unchanged INTEGER",
+    ):
+        try:
+            cursor.execute(ddl)
+        except sqlite3.OperationalError:
+            pass
+
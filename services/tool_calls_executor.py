@@ -0,0 +1,139 @@
+"""
+Execução concorrente das tool_calls de um turno.
+
+Quando a IA pede várias tools no mesmo turno (ex.: `obter_dashboard_hoje` + `consultar_status_processo`
++ NESH), a maioria é I/O (SQL Server, Integracomex, Portal Único). Este executor:
+- roda em paralelo (pool limitado) as tools de consulta consecutivas
+- roda sozinha, na ordem, toda tool marcada como serial (`tool_definitions.tool_somente_serial`):
+  ela funciona como barreira entre os lotes paralelos
+- devolve os resultados na MESMA ordem das chamadas (contrato de `_combinar_resultados_tools`)
+- isola erro e timeout por tool (uma tool lenta/quebrada não derruba as outras)
+
+ENV:
+- TOOL_CALLS_PARALELO=true|false (padrão: true)
+- TOOL_CALLS_MAX_WORKERS (padrão: 4)
+- TOOL_CALL_TIMEOUT_SECONDS (padrão: 120) - só vale para tools em lote paralelo
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOOL_CALLS_PARALELO = os.getenv("TOOL_CALLS_PARALELO", "true").strip().lower() == "true"
+TOOL_CALLS_MAX_WORKERS = max(1, int(os.getenv("TOOL_CALLS_MAX_WORKERS", "4") or 4))
+TOOL_CALL_TIMEOUT_SECONDS = float(os.getenv("TOOL_CALL_TIMEOUT_SECONDS", "120") or 120)
+
+
+@dataclass
+class ResultadoChamadaTool:
+    nome: str
+    resultado: Any = None
+    erro: Optional[BaseException] = None
+    timeout: bool = False
+    duracao_ms: int = 0
+
+
+def resultado_timeout(nome_tool: str, timeout_s: float) -> Dict[str, Any]:
+    """Resultado padrão (dict de tool) para uma tool que estourou o tempo limite."""
+    return {
+        "sucesso": False,
+        "erro": "TOOL_TIMEOUT",
+        "resposta": f"⏱️ A consulta **{nome_tool}** demorou mais de {int(timeout_s)}s e foi ignorada nesta resposta.",
+    }
+
+
+def _executar_uma(nome: str, args: Dict[str, Any], executar: Callable[[str, Dict[str, Any]], Any]) -> ResultadoChamadaTool:
+    inicio = time.monotonic()
+    try:
+        resultado = executar(nome, args)
+        return ResultadoChamadaTool(nome=nome, resultado=resultado, duracao_ms=int((time.monotonic() - inicio) * 1000))
+    except Exception as e:
+        return ResultadoChamadaTool(nome=nome, erro=e, duracao_ms=int((time.monotonic() - inicio) * 1000))
+
+
+def _executar_lote_paralelo(
+    chamadas: List[Tuple[str, Dict[str, Any]]],
+    executar: Callable[[str, Dict[str, Any]], Any],
+    max_workers: int,
+    timeout_s: float,
+) -> List[ResultadoChamadaTool]:
+    workers = min(max_workers, len(chamadas))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool_call")
+    try:
+        # copy_context: propaga contextvars (ex.: app context do Flask) para as threads do pool
+        futures = [
+            pool.submit(contextvars.copy_context().run, _executar_uma, nome, args, executar)
+            for nome, args in chamadas
+        ]
+        # Com mais chamadas que workers, as últimas esperam na fila: o prazo cresce por "onda"
+        ondas = -(-len(chamadas) // workers)
+        prazo = time.monotonic() + timeout_s * ondas
+        resultados: List[ResultadoChamadaTool] = []
+        for (nome, _args), future in zip(chamadas, futures):
+            try:
+                resultados.append(future.result(timeout=max(0.0, prazo - time.monotonic())))
+            except FuturesTimeoutError:
+                future.cancel()
+                logger.warning(f"⏱️ [TOOL_CALLS] {nome} excedeu {timeout_s:.0f}s - seguindo sem o resultado")
+                resultados.append(ResultadoChamadaTool(nome=nome, timeout=True, duracao_ms=int(timeout_s * 1000)))
+        return resultados
+    finally:
+        # Não esperar threads presas em I/O (timeout): elas terminam sozinhas em background
+        pool.shutdown(wait=False)
+
+
+def executar_tool_calls(
+    chamadas: List[Tuple[str, Dict[str, Any]]],
+    executar: Callable[[str, Dict[str, Any]], Any],
+    *,
+    max_workers: Optional[int] = None,
+    timeout_s: Optional[float] = None,
+) -> List[ResultadoChamadaTool]:
+    """
+    Executa `chamadas` [(nome_tool, argumentos), ...] e retorna um resultado por chamada, na mesma ordem.
+
+    Tools seriais rodam sozinhas na thread atual; sequências de tools de consulta rodam em paralelo.
+    Um turno com várias consultas leva o tempo da mais lenta, não a soma.
+    """
+    from services.tool_definitions import tool_somente_serial
+
+    max_workers = TOOL_CALLS_MAX_WORKERS if max_workers is None else max(1, int(max_workers))
+    timeout_s = TOOL_CALL_TIMEOUT_SECONDS if timeout_s is None else float(timeout_s)
+
+    if not TOOL_CALLS_PARALELO or max_workers <= 1 or len(chamadas) <= 1:
+        return [_executar_uma(nome, args, executar) for nome, args in chamadas]
+
+    inicio = time.monotonic()
+    resultados: List[ResultadoChamadaTool] = []
+    lote: List[Tuple[str, Dict[str, Any]]] = []
+
+    def _descarregar_lote() -> None:
+        if len(lote) == 1:
+            resultados.append(_executar_uma(lote[0][0], lote[0][1], executar))
+        elif lote:
+            resultados.extend(_executar_lote_paralelo(list(lote), executar, max_workers, timeout_s))
+        lote.clear()
+
+    for nome, args in chamadas:
+        if tool_somente_serial(nome):
+            _descarregar_lote()
+            resultados.append(_executar_uma(nome, args, executar))
+        else:
+            lote.append((nome, args))
+    _descarregar_lote()
+
+    total_ms = int((time.monotonic() - inicio) * 1000)
+    soma_ms = sum(r.duracao_ms for r in resultados)
+    logger.info(
+        f"⚡ [TOOL_CALLS] {len(chamadas)} tool(s) em {total_ms}ms (soma sequencial: {soma_ms}ms): "
+        + ", ".join(f"{r.nome}={r.duracao_ms}ms" for r in resultados)
+    )
+    return resultados
@@ -1,7 +1,9 @@
 """
 Definições de Tools (Funções) para Function Calling da IA
 """
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import json
 import logging
 
 def _shorten_description(description: str, max_length: int = 200) -> str:
@@ -102,6 +104,43 @@ def _shorten_description(description: str, max_length: int = 200) -> str:
     
     return desc_clean
 
+# ✅ NOVO (16/10/2026): Tools que NUNCA rodam em paralelo com outras no mesmo turno
+# (pedem confirmação, criam PendingIntent/draft ou alteram estado: email, pagamentos, DUIMP, vínculos).
+# Demais tools (consultas/listagens) podem ser executadas concorrentemente quando a IA pede várias.
+TOOLS_SOMENTE_SERIAIS = frozenset({
+    "buscar_e_importar_legislacao",
+    "melhorar_email_draft",
+    "responder_email",
+    "processar_boleto_upload",
+    "fechar_dia",
+    "preparar_pagamento_afrmm",
+    "gerar_resumo_reuniao",
+})
+
+_PREFIXOS_SOMENTE_SERIAIS = (
+    "adicionar_",
+    "aprovar_",
+    "confirmar_",
+    "criar_",
+    "desvincular_",
+    "efetivar_",
+    "enviar_",
+    "executar_",
+    "importar_",
+    "iniciar_",
+    "rejeitar_",
+    "salvar_",
+    "sincronizar_",
+    "vincular_",
+)
+
+
+def tool_somente_serial(nome_tool: str) -> bool:
+    """True se a tool deve rodar sozinha (sem concorrência com outras tools do turno)."""
+    nome = (nome_tool or "").strip()
+    return nome in TOOLS_SOMENTE_SERIAIS or nome.startswith(_PREFIXOS_SOMENTE_SERIAIS)
+
+
 def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Retorna lista de funções disponíveis para a IA usar via function calling.
@@ -114,7 +153,90 @@ def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = N
     Args:
         compact: Se True, encurta descriptions para reduzir tokens (padrão: True)
         whitelist: Lista de nomes de tools permitidas (None = todas permitidas)
+
+    ✅ NOVO (16/10/2026): catálogo montado uma vez e memoizado por (compact, whitelist).
+    A lista é nova a cada chamada, mas os dicts das tools são compartilhados: NÃO mutar
+    (use copy.deepcopy se precisar alterar um schema).
+    """
+    return list(_catalogo_filtrado(bool(compact), _chave_whitelist(whitelist)))
+
+
+def get_available_tools_json(compact: bool = True, whitelist: Optional[List[str]] = None) -> str:
+    """JSON (compacto) do array `tools`, serializado uma vez por (compact, whitelist)."""
+    return _catalogo_json(bool(compact), _chave_whitelist(whitelist))
+
+
+def estimar_tokens_tools(compact: bool = True, whitelist: Optional[List[str]] = None) -> Dict[str, Any]:
     """
+    Custo estimado (tokens) do payload de tools, para orçar o prompt.
+
+    Returns:
+        {'total': int, 'por_tool': {nome: tokens}, 'quantidade': int}
+    """
+    custos = _custos_por_tool(bool(compact))
+    nomes = [(t.get("function") or {}).get("name", "") for t in _catalogo_filtrado(bool(compact), _chave_whitelist(whitelist))]
+    por_tool = {n: custos.get(n, 0) for n in nomes}
+    return {"total": sum(por_tool.values()), "por_tool": por_tool, "quantidade": len(nomes)}
+
+
+def limpar_cache_tools() -> None:
+    """Descarta o catálogo memoizado (ex.: testes ou hot-reload de definições)."""
+    _catalogo_base.cache_clear()
+    _catalogo_filtrado.cache_clear()
+    _catalogo_json.cache_clear()
+    _custos_por_tool.cache_clear()
+
+
+def _chave_whitelist(whitelist: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    # Whitelist é filtro por pertinência: ordem/duplicatas não mudam o resultado
+    return None if whitelist is None else tuple(sorted(set(whitelist)))
+
+
+@lru_cache(maxsize=1)
+def _encoder_tokens():
+    try:
+        import tiktoken  # type: ignore
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def estimar_tokens(texto: str) -> int:
+    """Tokens via tiktoken quando instalado; senão ~4 caracteres por token."""
+    encoder = _encoder_tokens()
+    if encoder is not None:
+        try:
+            return len(encoder.encode(texto))
+        except Exception:
+            pass
+    return -(-len(texto) // 4)
+
+
+@lru_cache(maxsize=2)
+def _catalogo_base(compact: bool) -> Tuple[Dict[str, Any], ...]:
+    return tuple(_construir_tools(compact))
+
+
+@lru_cache(maxsize=64)
+def _catalogo_filtrado(compact: bool, whitelist: Optional[Tuple[str, ...]]) -> Tuple[Dict[str, Any], ...]:
+    return tuple(_filtrar_e_limitar_tools(list(_catalogo_base(compact)), whitelist))
+
+
+@lru_cache(maxsize=64)
+def _catalogo_json(compact: bool, whitelist: Optional[Tuple[str, ...]]) -> str:
+    return json.dumps(list(_catalogo_filtrado(compact, whitelist)), ensure_ascii=False, separators=(",", ":"))
+
+
+@lru_cache(maxsize=2)
+def _custos_por_tool(compact: bool) -> Dict[str, int]:
+    return {
+        (t.get("function") or {}).get("name", ""): estimar_tokens(json.dumps(t, ensure_ascii=False, separators=(",", ":")))
+        for t in _catalogo_base(compact)
+    }
+
+
+def _construir_tools(compact: bool) -> List[Dict[str, Any]]:
+    """Monta as definições de tools (chamado uma vez por variante compact/full)."""
     tools = [
         {
             "type": "function",
@@ -1659,6 +1781,11 @@ def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = N
                         "minimum": 10,
                         "maximum": 200,
                         "default": 80
+                    },
+                    "atualizar_catalogo": {
+                        "type": "boolean",
+                        "description": "Se true, descarta o catálogo de schema em cache e redescobre colunas/JOINs agora (use quando o schema do legado mudou ou as consultas de NF vierem com colunas erradas).",
+                        "default": False
                     }
                 },
                 "required": []
@@ -2278,6 +2405,12 @@ def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = N
                         "type": "boolean",
                         "description": "Se True, inclui trechos revogados nos resultados. Padrão: False.",
                         "default": False
+                    },
+                    "proximidade": {
+                        "type": "integer",
+                        "description": "Opcional. Exige TODOS os termos a no máximo N palavras de distância no mesmo trecho (ex: termos ['multa', 'despacho'] com proximidade 10). Sem este campo, retorna trechos com QUALQUER um dos termos. Termos com várias palavras (ex: 'despacho aduaneiro') são sempre buscados como frase.",
+                        "minimum": 1,
+                        "maximum": 50
                     }
                 },
                 "required": ["termos"]
@@ -3920,6 +4053,11 @@ def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = N
         }
     })
     
+    return tools
+
+
+def _filtrar_e_limitar_tools(tools: List[Dict[str, Any]], whitelist: Optional[Tuple[str, ...]]) -> List[Dict[str, Any]]:
+    """Aplica whitelist, dedupe por nome e limite de tools da OpenAI."""
     # ✅ FILTRO POR WHITELIST (14/01/2026): Se whitelist fornecida, filtrar tools
     if whitelist is not None:
         logger_whitelist = logging.getLogger(__name__)
@@ -4008,3 +4146,10 @@ def get_available_tools(compact: bool = True, whitelist: Optional[List[str]] = N
 
     return tools
 
+
+# Catálogo montado no import (compact e full): os turnos de chat só leem
+try:
+    _catalogo_base(True)
+    _catalogo_base(False)
+except Exception as _e:  # pragma: no cover - nunca impedir import do módulo
+    logging.getLogger(__name__).warning(f"⚠️ [TOOLS] Falha ao pré-montar catálogo de tools: {_e}")
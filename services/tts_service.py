@@ -137,18 +137,20 @@ class TTSService:
         
         # Gerar novo áudio
         try:
-            from openai import OpenAI
+            from services.openai_client_registry import obter_cliente_openai, chamada_openai
             
-            client = OpenAI(api_key=self.api_key, timeout=30.0)
+            client = obter_cliente_openai(api_key=self.api_key, timeout=30.0, perfil="tts")
             
             logger.info(f"🎤 Gerando áudio TTS: '{texto[:50]}...' (voz: {voz_usar}, modelo: {self.model})")
             
-            response = client.audio.speech.create(
-                model=self.model,
-                voice=voz_usar,
-                input=texto,
-                response_format="mp3"
-            )
+            with chamada_openai(self.model, "tts") as chamada:
+                response = chamada.executar(
+                    client.audio.speech.create,
+                    model=self.model,
+                    voice=voz_usar,
+                    input=texto,
+                    response_format="mp3"
+                )
             
             # Salvar arquivo
             arquivo_cache.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,23 @@
+"""
+Schema: vendas_make_schema_catalogo (SQLite)
+--------------------------------------------
+Catálogo persistente da introspecção do legado Make/Spalla (colunas de `spalla.dbo.documentos`,
+tabelas de cadastro para JOIN de cliente/empresa, tabelas sugeridas), com TTL controlado pelo
+`VendasMakeService` e atualização explícita via `inspecionar_schema_nf_make(atualizar_catalogo=true)`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+
+def criar_tabela_vendas_make_catalogo(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS vendas_make_schema_catalogo (
+            chave TEXT PRIMARY KEY,
+            valor_json TEXT,
+            atualizado_em TEXT NOT NULL
+        )
+        """
+    )
@@ -19,12 +19,17 @@ retorna erro claro e não tenta fallback para SQLite, pois os dados de vendas es
 
 from __future__ import annotations
 
+import json
 import logging
+import os
 import re
+import threading
+import time
 import unicodedata
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from utils.sql_server_adapter import get_sql_adapter
 
@@ -172,6 +177,128 @@ def _month_range_from_yyyy_mm(yyyy_mm: str) -> Optional[Tuple[str, str]]:
         return None
 
 
+# ---------------------------------------------------------------------------
+# ✅ NOVO (16/10/2026): catálogo de schema (introspecção) + planos de consulta compilados.
+# `consultar_vendas_por_nf` descobria colunas/JOINs via sys.columns/INFORMATION_SCHEMA a cada
+# chamada (e o SalesWatch chama por termo a cada tick). Agora a introspecção fica no SQLite
+# (`vendas_make_schema_catalogo`) com TTL, em memória no processo, e o plano resolvido
+# (colunas + JOINs) é compilado uma vez por (relatório, período): a consulta vira 1 round trip.
+# ---------------------------------------------------------------------------
+VENDAS_MAKE_SCHEMA_TTL_HORAS = float(os.getenv("VENDAS_MAKE_SCHEMA_TTL_HORAS", "24"))
+VENDAS_MAKE_PLANOS_MAX = int(os.getenv("VENDAS_MAKE_PLANOS_MAX", "64"))
+
+_catalogo_mem: Dict[str, Tuple[float, Any]] = {}  # chave -> (time.monotonic() da leitura, valor)
+_catalogo_lock = threading.RLock()
+_tabela_catalogo_ok = False
+_planos: "OrderedDict[Tuple[Any, ...], _PlanoVendasNF]" = OrderedDict()
+_planos_lock = threading.Lock()
+
+
+def _conectar_catalogo():
+    """Conexão do `db_manager` com a tabela do catálogo garantida (uma vez por processo)."""
+    global _tabela_catalogo_ok
+    from db_manager import get_db_connection
+
+    conn = get_db_connection()
+    if not _tabela_catalogo_ok:
+        from services.vendas_make_schema import criar_tabela_vendas_make_catalogo
+
+        criar_tabela_vendas_make_catalogo(conn.cursor())
+        conn.commit()
+        _tabela_catalogo_ok = True
+    return conn
+
+
+def _catalogo_ler_sqlite(chave: str) -> Tuple[bool, Any]:
+    try:
+        conn = _conectar_catalogo()
+        try:
+            row = conn.execute(
+                "SELECT valor_json, atualizado_em FROM vendas_make_schema_catalogo WHERE chave = ?",
+                (chave,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return False, None
+        idade = datetime.now() - datetime.fromisoformat(row[1])
+        if idade.total_seconds() > VENDAS_MAKE_SCHEMA_TTL_HORAS * 3600:
+            return False, None
+        return True, json.loads(row[0]) if row[0] else None
+    except Exception as e:
+        logger.debug(f"[VENDAS_MAKE] catálogo SQLite indisponível ({chave}): {e}")
+        return False, None
+
+
+def _catalogo_gravar_sqlite(chave: str, valor: Any) -> None:
+    try:
+        conn = _conectar_catalogo()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO vendas_make_schema_catalogo (chave, valor_json, atualizado_em) VALUES (?, ?, ?)",
+                (chave, json.dumps(valor, ensure_ascii=False), datetime.now().isoformat()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.debug(f"[VENDAS_MAKE] não foi possível gravar catálogo ({chave}): {e}")
+
+
+def _catalogo_obter(chave: str, descobrir: Callable[[], Tuple[Any, Optional[str]]]) -> Tuple[Any, Optional[str]]:
+    """
+    Valor do catálogo (memória -> SQLite -> introspecção no SQL Server), respeitando o TTL.
+    Erro de introspecção não é cacheado (próxima chamada tenta de novo).
+    """
+    ttl_seg = VENDAS_MAKE_SCHEMA_TTL_HORAS * 3600
+    item = _catalogo_mem.get(chave)
+    if item and time.monotonic() - item[0] < ttl_seg:
+        return item[1], None
+    with _catalogo_lock:
+        item = _catalogo_mem.get(chave)
+        if item and time.monotonic() - item[0] < ttl_seg:
+            return item[1], None
+        achou, valor = _catalogo_ler_sqlite(chave)
+        if not achou:
+            valor, err = descobrir()
+            if err:
+                return valor, err
+            _catalogo_gravar_sqlite(chave, valor)
+        _catalogo_mem[chave] = (time.monotonic(), valor)
+        return valor, None
+
+
+def limpar_catalogo_schema() -> None:
+    """Descarta catálogo (SQLite + memória) e planos compilados; a próxima consulta redescobre o schema."""
+    with _catalogo_lock:
+        _catalogo_mem.clear()
+        try:
+            conn = _conectar_catalogo()
+            try:
+                conn.execute("DELETE FROM vendas_make_schema_catalogo")
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ [VENDAS_MAKE] não foi possível limpar catálogo SQLite: {e}")
+    with _planos_lock:
+        _planos.clear()
+
+
+@dataclass(frozen=True)
+class _PlanoVendasNF:
+    """Colunas e JOINs resolvidos para `consultar_vendas_por_nf` (sem filtros de período/termo)."""
+
+    col_nf: str
+    col_cliente_nome: Optional[str]
+    col_cliente_cod: Optional[str]
+    col_empresa: Optional[str]
+    cliente_select_base: str
+    join_cliente: str
+    empresa_expr: str
+    join_empresa: str
+
+
 @dataclass
 class VendasMakeQuery:
     sql: str
@@ -205,6 +332,16 @@ class VendasMakeService:
         return [{"value": data}], None
 
     def _listar_colunas_spalla(self, table: str) -> Tuple[List[str], Optional[str]]:
+        """
+        Lista colunas de uma tabela em `spalla` (via catálogo de schema, com TTL).
+        """
+        table = (table or "").strip()
+        if not table:
+            return [], "tabela_vazia"
+        cols, err = _catalogo_obter(f"colunas:spalla.{table.lower()}", lambda: self._consultar_colunas_spalla(table))
+        return list(cols or []), err
+
+    def _consultar_colunas_spalla(self, table: str) -> Tuple[List[str], Optional[str]]:
         """
         Lista colunas de uma tabela em `spalla` sem depender do DB atual da conexão.
         """
@@ -239,6 +376,10 @@ ORDER BY c.column_id;
         return cols, None
 
     def _find_cliente_join_candidate(self) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        """Tabela de cadastro de cliente/pessoa/parceiro para JOIN (via catálogo de schema, com TTL)."""
+        return _catalogo_obter("join:cliente", self._descobrir_cliente_join_candidate)
+
+    def _descobrir_cliente_join_candidate(self) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
         """
         Tenta descobrir uma tabela de cadastro (cliente/pessoa/parceiro) no legado contendo:
         - uma coluna ID (codigo_cliente/codigo_pessoa/codigo_parceiro/...)
@@ -332,6 +473,10 @@ ORDER BY score, table_name;
         return None, None
 
     def _find_empresa_join_candidate(self) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        """Tabela de cadastro de empresa/filial/emitente para JOIN (via catálogo de schema, com TTL)."""
+        return _catalogo_obter("join:empresa", self._descobrir_empresa_join_candidate)
+
+    def _descobrir_empresa_join_candidate(self) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
         """
         Tenta descobrir uma tabela de cadastro de empresa/filial/emitente contendo:
         - coluna ID (codigo_empresa/codigo_filial/codigo_emitente/...)
@@ -525,6 +670,31 @@ WHERE d.data_emissao >= '{_escape_sql_literal(dt_ini)}'
 
         return best_col
 
+    def atualizar_catalogo_schema(self) -> Dict[str, Any]:
+        """
+        Descarta o catálogo de schema (e os planos compilados) e redescobre agora:
+        colunas de `spalla.dbo.documentos` e tabelas de cadastro de cliente/empresa.
+        Use após mudança de schema no legado (sem esperar o TTL).
+        """
+        if not self._adapter:
+            return {"sucesso": False, "erro": "SQL_ADAPTER_INDISPONIVEL", "dados": None}
+
+        limpar_catalogo_schema()
+        cols_doc, err = self._listar_colunas_spalla("dbo.documentos")
+        if err:
+            return {"sucesso": False, "erro": err, "dados": None}
+        cliente, _ = self._find_cliente_join_candidate()
+        empresa, _ = self._find_empresa_join_candidate()
+        return {
+            "sucesso": True,
+            "dados": {
+                "documentos_colunas": len(cols_doc),
+                "cliente_join": cliente,
+                "empresa_join": empresa,
+                "ttl_horas": VENDAS_MAKE_SCHEMA_TTL_HORAS,
+            },
+        }
+
     def inspecionar_schema_nf(self, *, top: int = 80) -> Dict[str, Any]:
         """
         Descobre (best-effort) onde ficam campos de NF/cliente/itens no legado.
@@ -609,9 +779,13 @@ WHERE t.TABLE_TYPE='BASE TABLE'
   )
 ORDER BY t.TABLE_NAME;
 """.strip()
-        tab_rows, tab_err = self._run_query(sql_tab, database="Make")
-        if tab_err:
-            tab_rows, tab_err = self._run_query(sql_tab, database=None)
+        def _consultar_tabelas() -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+            tab_rows, tab_err = self._run_query(sql_tab, database="Make")
+            if tab_err:
+                tab_rows, tab_err = self._run_query(sql_tab, database=None)
+            return tab_rows, tab_err
+
+        tab_rows, _tab_err = _catalogo_obter(f"tabelas_itens:{min(max(int(top), 10), 200)}", _consultar_tabelas)
         tabelas_sugeridas = tab_rows or []
 
         return {
@@ -636,6 +810,29 @@ ORDER BY t.TABLE_NAME;
             parts.append(f"{column_sql} LIKE '%{_escape_sql_literal(t)}%'")
         return "(" + " OR ".join(parts) + ")"
 
+    def _build_where_apos_documentos(self, apos_documentos: Dict[Tuple[str, str], int]) -> str:
+        """
+        Marca d'água por (filial, tipo_movimento): `codigo_documento` > último visto no par.
+        Cada tipo de movimento tem sua própria sequência de código; pares sem marca entram inteiros.
+        """
+        partes = []
+        pares = []
+        for (filial, tipo), ultimo in (apos_documentos or {}).items():
+            try:
+                ultimo_i = int(ultimo)
+            except Exception:
+                continue
+            par = (
+                f"d.codigo_empresa_filial = '{_escape_sql_literal(str(filial))}' "
+                f"AND ISNULL(d.tipo_movimento, '') = '{_escape_sql_literal(str(tipo or ''))}'"
+            )
+            pares.append(f"({par})")
+            partes.append(f"({par} AND d.codigo_documento > {ultimo_i})")
+        if not partes:
+            return "1=1"
+        partes.append(f"NOT ({' OR '.join(pares)})")
+        return "(" + " OR ".join(partes) + ")"
+
     def _build_where_tokens_all_columns(self, *, tokens: Sequence[str], columns_sql: Sequence[str]) -> str:
         """
         Monta WHERE exigindo que TODOS os tokens apareçam em pelo menos uma das colunas.
@@ -873,40 +1070,22 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
             },
         }
 
-    def consultar_vendas_por_nf(
+    def _compilar_plano_nf(
         self,
         *,
-        inicio: Optional[str] = None,
-        fim: Optional[str] = None,
-        periodo_mes: Optional[str] = None,
-        apenas_hoje: bool = False,
-        termo: Optional[str] = None,
-        venda_td_des_like: Optional[Sequence[str]] = None,
-        top: int = 80,
-    ) -> Dict[str, Any]:
+        dt_ini: str,
+        dt_fim: str,
+        where_venda: str,
+    ) -> Tuple[Optional[_PlanoVendasNF], Optional[str]]:
         """
-        Vendas por NF (nível "documento"): data, número NF, cliente (se existir), total e centro de custo.
+        Resolve colunas de NF/cliente/empresa e JOINs de cadastro para `consultar_vendas_por_nf`.
 
-        ⚠️ Importante:
-        - Como o schema do Make/Spalla varia, este método descobre colunas em `spalla.dbo.documentos`
-          e só usa as que existirem.
-        - Se não encontrar uma coluna de número NF, retorna erro orientando rodar `inspecionar_schema_nf`.
+        Usa o catálogo de schema; só vai ao SQL Server quando o catálogo expirou ou quando precisa
+        medir a coluna mais preenchida no período.
         """
-        if not self._adapter:
-            return {"sucesso": False, "erro": "SQL_ADAPTER_INDISPONIVEL", "dados": None}
-
-        dt_ini, dt_fim, err = self._resolve_periodo(
-            inicio=inicio,
-            fim=fim,
-            periodo_mes=periodo_mes,
-            apenas_hoje=bool(apenas_hoje),
-        )
-        if err:
-            return {"sucesso": False, "erro": err, "dados": None}
-
         cols_doc, err_cols = self._listar_colunas_spalla("dbo.documentos")
         if err_cols:
-            return {"sucesso": False, "erro": err_cols, "dados": None}
+            return None, err_cols
         cols_l = {c.lower(): c for c in cols_doc}
 
         def first_existing(cands: Sequence[str]) -> Optional[str]:
@@ -929,15 +1108,7 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
             ]
         )
         if not col_nf:
-            return {
-                "sucesso": False,
-                "erro": "COLUNA_NF_NAO_ENCONTRADA",
-                "dados": None,
-                "resposta": (
-                    "❌ Não consegui localizar a coluna de número NF em `spalla.dbo.documentos`.\n\n"
-                    "💡 Rode primeiro: **inspecionar_schema_nf_make** para eu descobrir quais colunas existem."
-                ),
-            }
+            return None, "COLUNA_NF_NAO_ENCONTRADA"
 
         # ✅ Cliente: ampliar candidatos porque o schema do legado varia bastante
         col_cliente_nome = first_existing(
@@ -1016,43 +1187,9 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
             if col_empresa and col_empresa.lower() not in cols_l:
                 col_empresa = None
 
-        like_venda = list(venda_td_des_like or [])
-        if not like_venda:
-            like_venda = [
-                "VENDA",
-                "FATUR",
-                "NF",
-                "NOTA FISCAL COMPLEMENTAR",
-                "COMPLEMENTAR DE IMPOSTO",
-                "DEVOLUÇÃO DE VENDA",
-                "ENTREGA FUTURA",
-                "SIMPLES FATURAMENTO",
-            ]
-
-        termo_raw = (termo or "").strip()
-        termo_norm = _normalize_search_text(termo_raw) if termo_raw else ""
-        termo_tokens = _tokenize_search_terms(termo_raw)
-
-        where_venda = self._build_like_where("tds.TD_DES", like_venda)
-        # ✅ Regra de negócio: "Nacionalização por Conta Própria" NÃO é venda (é entrada/importação).
-        # ⚠️ texto pode vir com acento ("PRÓPRIA") -> usar collation CI_AI.
-        where_excluir = "1=1"
-        try:
-            where_excluir = (
-                "tds.TD_DES COLLATE Latin1_General_CI_AI NOT LIKE '%NACIONALIZ%CONTA%PROPR%' "
-                "AND tds.TD_DES COLLATE Latin1_General_CI_AI NOT LIKE '%CONTA%PROPR%'"
-            )
-        except Exception:
-            where_excluir = "1=1"
-        where_termo = "1=1"
-        if termo_tokens:
-            where_termo = self._build_where_termo_variants(
-                termo=termo_raw,
-                columns_sql=["cc.descricao_centro_custo", "tds.TD_DES"],
-            )
-
         # ✅ Seleção por "realidade" (coluna mais preenchida) para cliente/empresa.
-        # Se ainda não achou, tenta identificar pelo preenchimento real no período.
+        # Se ainda não achou, tenta identificar pelo preenchimento real no período
+        # (vendas do período inteiro, sem o termo: o plano vale para qualquer termo).
         if not col_cliente_nome:
             cand_nome = [
                 c
@@ -1066,7 +1203,7 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
                 dt_ini=dt_ini,
                 dt_fim=dt_fim,
                 where_venda_sql=where_venda,
-                where_termo_sql=where_termo,
+                where_termo_sql="1=1",
                 candidate_cols=cand_nome,
             )
 
@@ -1083,7 +1220,7 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
                 dt_ini=dt_ini,
                 dt_fim=dt_fim,
                 where_venda_sql=where_venda,
-                where_termo_sql=where_termo,
+                where_termo_sql="1=1",
                 candidate_cols=cand_cod,
             )
 
@@ -1099,43 +1236,10 @@ ORDER BY a.periodo DESC, a.total_valor DESC;
                 dt_ini=dt_ini,
                 dt_fim=dt_fim,
                 where_venda_sql=where_venda,
-                where_termo_sql=where_termo,
+                where_termo_sql="1=1",
                 candidate_cols=cand_emp,
             )
 
-        # ✅ Empresa emissora + Cliente (fonte correta)
-        # Cliente (nome) vem do legado via ANALISE_VENDAS_SPALLA.CF_RSOCIAL (join por filial/tipo/cod_doc).
-        # Empresa emissora vem de empresas_filiais.nome_fantasia.
-        join_ef = "LEFT JOIN spalla.dbo.empresas_filiais ef ON ef.codigo_empresa_filial = d.codigo_empresa_filial"
-        # ⚠️ IMPORTANTE: ANALISE_VENDAS_SPALLA pode ter múltiplas linhas por documento.
-        # Usar OUTER APPLY (TOP 1) evita duplicar NFs/valores no relatório.
-        apply_avs = """
-OUTER APPLY (
-    SELECT TOP 1 avs.CF_RSOCIAL
-    FROM Make.dbo.ANALISE_VENDAS_SPALLA avs
-    WHERE d.codigo_empresa_filial = avs.FL_COD
-      AND d.tipo_movimento = avs.CF_TIPO
-      AND d.codigo_documento = avs.FT_COD
-    ORDER BY avs.CF_RSOCIAL
-) avs1
-""".strip()
-
-        # ✅ Financeiro (títulos): somar recebido e sugerir em aberto por NF
-        # ⚠️ IMPORTANTE: titulos/titulos_baixa podem ter múltiplas linhas (parcelas/baixas).
-        # Usar OUTER APPLY agregado evita multiplicar linhas do documento.
-        apply_titulos = """
-OUTER APPLY (
-    SELECT
-        SUM(COALESCE(CAST(t.valor_titulo AS decimal(18,2)), CAST(t.valor_titulo_original AS decimal(18,2)), 0)) AS valor_titulo_total,
-        SUM(COALESCE(CAST(t.total_baixado_geral AS decimal(18,2)), CAST(t.total_baixado_titulo AS decimal(18,2)), 0)) AS valor_recebido_total,
-        MIN(t.data_vencimento) AS proximo_vencimento
-    FROM spalla.dbo.titulos t WITH (NOLOCK)
-    WHERE t.codigo_empresa_filial = d.codigo_empresa_filial
-      AND t.tipo_movimento = d.tipo_movimento
-      AND t.codigo_movimento = d.codigo_documento
-) tit1
-""".strip()
-
         # Select cliente best-effort (fallback) — se avs não tiver, tenta os caminhos anteriores.
         cliente_select_base = "NULL"
         join_cliente = ""
@@ -1177,6 +1281,168 @@ OUTER APPLY (
             else:
                 empresa_expr = f"CAST(d.{_qident(col_empresa)} AS varchar(80))"
 
+        return _PlanoVendasNF(
+            col_nf=col_nf,
+            col_cliente_nome=col_cliente_nome,
+            col_cliente_cod=col_cliente_cod,
+            col_empresa=col_empresa,
+            cliente_select_base=cliente_select_base,
+            join_cliente=join_cliente,
+            empresa_expr=empresa_expr,
+            join_empresa=join_empresa,
+        ), None
+
+    def _obter_plano_nf(
+        self,
+        *,
+        dt_ini: str,
+        dt_fim: str,
+        where_venda: str,
+    ) -> Tuple[Optional[_PlanoVendasNF], Optional[str]]:
+        """Plano compilado uma vez por (relatório, período, filtro de venda) e reaproveitado (LRU)."""
+        chave = ("nf", dt_ini, dt_fim, where_venda)
+        with _planos_lock:
+            plano = _planos.get(chave)
+            if plano is not None:
+                _planos.move_to_end(chave)
+                return plano, None
+        plano, err = self._compilar_plano_nf(dt_ini=dt_ini, dt_fim=dt_fim, where_venda=where_venda)
+        if plano is not None:
+            with _planos_lock:
+                _planos[chave] = plano
+                while len(_planos) > max(1, VENDAS_MAKE_PLANOS_MAX):
+                    _planos.popitem(last=False)
+        return plano, err
+
+    def consultar_vendas_por_nf(
+        self,
+        *,
+        inicio: Optional[str] = None,
+        fim: Optional[str] = None,
+        periodo_mes: Optional[str] = None,
+        apenas_hoje: bool = False,
+        termo: Optional[str] = None,
+        venda_td_des_like: Optional[Sequence[str]] = None,
+        top: int = 80,
+        apos_documentos: Optional[Dict[Tuple[str, str], int]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Vendas por NF (nível "documento"): data, número NF, cliente (se existir), total e centro de custo.
+
+        ⚠️ Importante:
+        - Como o schema do Make/Spalla varia, este método descobre colunas em `spalla.dbo.documentos`
+          e só usa as que existirem.
+        - Se não encontrar uma coluna de número NF, retorna erro orientando rodar `inspecionar_schema_nf`.
+
+        ✅ NOVO (16/10/2026) - modo incremental (watch de vendas): com `apos_documentos`
+        ({(codigo_empresa_filial, tipo_movimento): último codigo_documento visto}, pode ser vazio) só vêm
+        documentos com código maior que a marca do par, em ordem crescente de código, e cada linha traz
+        `codigo_empresa_filial`/`tipo_movimento_documento`/`codigo_documento` para o chamador avançar a marca.
+        """
+        if not self._adapter:
+            return {"sucesso": False, "erro": "SQL_ADAPTER_INDISPONIVEL", "dados": None}
+
+        dt_ini, dt_fim, err = self._resolve_periodo(
+            inicio=inicio,
+            fim=fim,
+            periodo_mes=periodo_mes,
+            apenas_hoje=bool(apenas_hoje),
+        )
+        if err:
+            return {"sucesso": False, "erro": err, "dados": None}
+
+        like_venda = list(venda_td_des_like or [])
+        if not like_venda:
+            like_venda = [
+                "VENDA",
+                "FATUR",
+                "NF",
+                "NOTA FISCAL COMPLEMENTAR",
+                "COMPLEMENTAR DE IMPOSTO",
+                "DEVOLUÇÃO DE VENDA",
+                "ENTREGA FUTURA",
+                "SIMPLES FATURAMENTO",
+            ]
+
+        termo_raw = (termo or "").strip()
+        termo_norm = _normalize_search_text(termo_raw) if termo_raw else ""
+        termo_tokens = _tokenize_search_terms(termo_raw)
+
+        where_venda = self._build_like_where("tds.TD_DES", like_venda)
+        # ✅ Regra de negócio: "Nacionalização por Conta Própria" NÃO é venda (é entrada/importação).
+        # ⚠️ texto pode vir com acento ("PRÓPRIA") -> usar collation CI_AI.
+        where_excluir = "1=1"
+        try:
+            where_excluir = (
+                "tds.TD_DES COLLATE Latin1_General_CI_AI NOT LIKE '%NACIONALIZ%CONTA%PROPR%' "
+                "AND tds.TD_DES COLLATE Latin1_General_CI_AI NOT LIKE '%CONTA%PROPR%'"
+            )
+        except Exception:
+            where_excluir = "1=1"
+        where_termo = "1=1"
+        if termo_tokens:
+            where_termo = self._build_where_termo_variants(
+                termo=termo_raw,
+                columns_sql=["cc.descricao_centro_custo", "tds.TD_DES"],
+            )
+
+        # ✅ OTIMIZADO (16/10/2026): colunas/JOINs vêm do plano compilado (catálogo de schema);
+        # aqui sobra só a consulta de vendas (1 round trip).
+        plano, err_plano = self._obter_plano_nf(dt_ini=dt_ini, dt_fim=dt_fim, where_venda=where_venda)
+        if err_plano == "COLUNA_NF_NAO_ENCONTRADA":
+            return {
+                "sucesso": False,
+                "erro": "COLUNA_NF_NAO_ENCONTRADA",
+                "dados": None,
+                "resposta": (
+                    "❌ Não consegui localizar a coluna de número NF em `spalla.dbo.documentos`.\n\n"
+                    "💡 Rode primeiro: **inspecionar_schema_nf_make** para eu descobrir quais colunas existem."
+                ),
+            }
+        if err_plano or plano is None:
+            return {"sucesso": False, "erro": err_plano or "erro_desconhecido", "dados": None}
+        col_nf = plano.col_nf
+        col_cliente_nome = plano.col_cliente_nome
+        col_cliente_cod = plano.col_cliente_cod
+        col_empresa = plano.col_empresa
+        cliente_select_base = plano.cliente_select_base
+        join_cliente = plano.join_cliente
+        empresa_expr = plano.empresa_expr
+        join_empresa = plano.join_empresa
+
+        # ✅ Empresa emissora + Cliente (fonte correta)
+        # Cliente (nome) vem do legado via ANALISE_VENDAS_SPALLA.CF_RSOCIAL (join por filial/tipo/cod_doc).
+        # Empresa emissora vem de empresas_filiais.nome_fantasia.
+        join_ef = "LEFT JOIN spalla.dbo.empresas_filiais ef ON ef.codigo_empresa_filial = d.codigo_empresa_filial"
+        # ⚠️ IMPORTANTE: ANALISE_VENDAS_SPALLA pode ter múltiplas linhas por documento.
+        # Usar OUTER APPLY (TOP 1) evita duplicar NFs/valores no relatório.
+        apply_avs = """
+OUTER APPLY (
+    SELECT TOP 1 avs.CF_RSOCIAL
+    FROM Make.dbo.ANALISE_VENDAS_SPALLA avs
+    WHERE d.codigo_empresa_filial = avs.FL_COD
+      AND d.tipo_movimento = avs.CF_TIPO
+      AND d.codigo_documento = avs.FT_COD
+    ORDER BY avs.CF_RSOCIAL
+) avs1
+""".strip()
+
+        # ✅ Financeiro (títulos): somar recebido e sugerir em aberto por NF
+        # ⚠️ IMPORTANTE: titulos/titulos_baixa podem ter múltiplas linhas (parcelas/baixas).
+        # Usar OUTER APPLY agregado evita multiplicar linhas do documento.
+        apply_titulos = """
+OUTER APPLY (
+    SELECT
+        SUM(COALESCE(CAST(t.valor_titulo AS decimal(18,2)), CAST(t.valor_titulo_original AS decimal(18,2)), 0)) AS valor_titulo_total,
+        SUM(COALESCE(CAST(t.total_baixado_geral AS decimal(18,2)), CAST(t.total_baixado_titulo AS decimal(18,2)), 0)) AS valor_recebido_total,
+        MIN(t.data_vencimento) AS proximo_vencimento
+    FROM spalla.dbo.titulos t WITH (NOLOCK)
+    WHERE t.codigo_empresa_filial = d.codigo_empresa_filial
+      AND t.tipo_movimento = d.tipo_movimento
+      AND t.codigo_movimento = d.codigo_documento
+) tit1
+""".strip()
+
         # Preferir nome fantasia da filial (ef), com fallback para o que já tínhamos.
         empresa_select_final = f"COALESCE(ef.nome_fantasia, {empresa_expr}) AS empresa_vendedora"
 
@@ -1185,8 +1451,20 @@ OUTER APPLY (
 
         total_nf_expr = "CAST(d.valor_documento AS decimal(18,2))"
 
+        incremental = apos_documentos is not None
+        colunas_incrementais = ""
+        where_apos = "1=1"
+        order_by = "d.data_emissao DESC, total_nf DESC"
+        if incremental:
+            colunas_incrementais = (
+                "\n    d.codigo_empresa_filial AS codigo_empresa_filial,"
+                "\n    d.codigo_documento AS codigo_documento,"
+            )
+            where_apos = self._build_where_apos_documentos(apos_documentos or {})
+            order_by = "d.codigo_documento ASC, d.codigo_empresa_filial ASC, d.tipo_movimento ASC"
+
         sql = f"""
-SELECT TOP {min(max(int(top), 10), 500)}
+SELECT TOP {min(max(int(top), 10), 500)}{colunas_incrementais}
     CONVERT(date, d.data_emissao) AS data_emissao,
     CAST(d.{_qident(col_nf)} AS varchar(60)) AS numero_nf,
     {cliente_select_final},
@@ -1214,7 +1492,8 @@ WHERE d.data_emissao >= '{_escape_sql_literal(dt_ini)}'
   AND {where_venda}
   AND {where_excluir}
   AND {where_termo}
-ORDER BY d.data_emissao DESC, total_nf DESC;
+  AND {where_apos}
+ORDER BY {order_by};
 """.strip()
 
         rows, qerr = self._run_query(sql, database="Make")
@@ -0,0 +1,21 @@
+"""
+Fixtures compartilhadas dos testes.
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def llm_cache_isolado(tmp_path, monkeypatch):
+    """Cache persistente do LLM em tmp_path: nenhum teste grava `llm_cache.db` no diretório do repo."""
+    import services.llm_cache as llm_cache
+
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_DB", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, "_llm_cache", None)
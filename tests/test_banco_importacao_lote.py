@@ -0,0 +1,207 @@
+"""
+Testes da importação em lote de extratos (`BancoSincronizacaoService.importar_lancamentos`).
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+from services.banco_sincronizacao_service import BancoSincronizacaoService
+
+
+class _FakeAdapter:
+    """Adapter mínimo: responde SELECTs de hash/candidatos e registra execute_many."""
+
+    database = "mAIke_assistente"
+
+    def __init__(self, existentes=None, candidatos=None, falhar_insert=None, gravadas_antes_da_falha=0):
+        self.existentes = existentes or {}
+        self.candidatos = candidatos or []
+        self.falhar_insert = falhar_insert
+        self.gravadas_antes_da_falha = gravadas_antes_da_falha
+        self.queries = []
+        self.execute_many_calls = []
+
+    def execute_query(self, sql_query, database=None, params=None, notificar_erro=False):
+        self.queries.append(sql_query)
+        if "hash_dados IN" in sql_query:
+            data = [
+                {"hash_dados": h, "id_movimentacao": i, "data_movimentacao_date": d}
+                for h, (i, d) in self.existentes.items()
+                if f"'{h}'" in sql_query
+            ]
+            return {"success": True, "data": data}
+        if "hash_dados = '" in sql_query:
+            data = [
+                {"id_movimentacao": i, "data_movimentacao_date": d}
+                for h, (i, d) in self.existentes.items()
+                if f"'{h}'" in sql_query
+            ]
+            return {"success": True, "data": data}
+        if "valor_movimentacao," in sql_query:
+            return {"success": True, "data": list(self.candidatos)}
+        if sql_query.lstrip().upper().startswith("INSERT"):
+            return {"success": True, "data": [], "rows_affected": 1}
+        return {"success": True, "data": []}
+
+    def execute_many(self, sql_query, seq_params, database=None, notificar_erro=False):
+        linhas = [list(p) for p in seq_params]
+        self.execute_many_calls.append((sql_query, linhas))
+        if self.falhar_insert and sql_query.startswith("INSERT"):
+            # Parte do lote entrou antes da falha (sem transação única, ex.: caminho Node.js)
+            for linha in linhas[:self.gravadas_antes_da_falha]:
+                self.existentes[linha[21]] = (len(self.existentes) + 1, linha[3][:10])
+            return {"success": False, "error": self.falhar_insert}
+        return {"success": True, "rows_affected": len(linhas)}
+
+
+def _service(adapter):
+    svc = BancoSincronizacaoService.__new__(BancoSincronizacaoService)
+    svc.sql_adapter = adapter
+    svc.bb_service = None
+    svc.santander_service = None
+    svc.cpf_cnpj_service = None
+    svc._sql_server_down_logged = False
+    return svc
+
+
+def _bb(dia, valor, descricao, doc):
+    return {
+        "dataLancamento": int(f"{dia:02d}012026"),
+        "valorLancamento": valor,
+        "tipoLancamento": "1",
+        "indicadorSinalLancamento": "C",
+        "textoDescricaoHistorico": descricao,
+        "numeroDocumento": doc,
+    }
+
+
+def _santander(data, valor, nome, complemento="", tid="1"):
+    return {
+        "transactionDate": data,
+        "amount": valor,
+        "transactionName": nome,
+        "historicComplement": complemento,
+        "creditDebitType": "DEBITO",
+        "transactionId": tid,
+    }
+
+
+def test_lote_insere_novos_com_uma_consulta_de_hash_e_um_insert():
+    adapter = _FakeAdapter()
+    svc = _service(adapter)
+    lancs = [_bb(5, 100.0 + i, f"PAG FRETE DMD 00{i}3/25", str(i)) for i in range(5)]
+
+    r = svc.importar_lancamentos(lancs, "1234", "99999", "BB")
+
+    assert (r["novos"], r["duplicados"], r["erros"]) == (5, 0, 0)
+    assert sum("hash_dados IN" in q for q in adapter.queries) == 1
+    inserts = [c for c in adapter.execute_many_calls if c[0].startswith("INSERT")]
+    assert len(inserts) == 1 and len(inserts[0][1]) == 5
+    assert "DMD.0003/25" in r["processos_detectados"]
+
+
+def test_lote_pula_duplicados_por_hash_e_dentro_do_lote():
+    adapter = _FakeAdapter()
+    svc = _service(adapter)
+    existente = _bb(5, 10.0, "TARIFA", "1")
+    novo = _bb(5, 20.0, "PIX", "2")
+    adapter.existentes[svc.gerar_hash_lancamento(existente, "1", "2", "BB")] = (7, "2026-01-05")
+
+    r = svc.importar_lancamentos([existente, novo, novo], "1", "2", "BB")
+
+    assert (r["novos"], r["duplicados"], r["erros"]) == (1, 2, 0)
+    assert not [c for c in adapter.execute_many_calls if c[0].startswith("UPDATE")]
+
+
+def test_lote_santander_valor_descricao_corrige_data():
+    adapter = _FakeAdapter(candidatos=[{
+        "id_movimentacao": 42,
+        "data_movimentacao_date": "2026-01-07",
+        "valor_movimentacao": 150.0,
+        "sinal_movimentacao": "D",
+        "descricao_movimentacao": "PIX ENVIADO",
+    }])
+    svc = _service(adapter)
+    lanc = _santander("2026-01-08", 150.0, "PIX ENVIADO", "RIO BRASIL TERMINAL")
+
+    r = svc.importar_lancamentos([lanc], "0001", "123", "SANTANDER")
+
+    assert (r["novos"], r["duplicados"]) == (0, 1)
+    updates = [c for c in adapter.execute_many_calls if c[0].startswith("UPDATE")]
+    assert updates and updates[0][1][0][2] == 42
+
+
+def test_lote_sql_server_indisponivel_mantem_contrato():
+    adapter = _FakeAdapter(falhar_insert="Failed to connect to 172.16.0.1 (ETIMEOUT)")
+    svc = _service(adapter)
+
+    r = svc.importar_lancamentos([_bb(5, 1.0, "X", "1")], "1", "2", "BB")
+
+    assert r["sucesso"] is False
+    assert r["sql_server_indisponivel"] is True
+    assert r["novos"] == 0 and r["erros"] == 1
+
+
+def test_lote_insert_rejeitado_refaz_item_a_item():
+    adapter = _FakeAdapter(falhar_insert="String or binary data would be truncated")
+    svc = _service(adapter)
+
+    r = svc.importar_lancamentos([_bb(5, 1.0, "A", "1"), _bb(5, 2.0, "B", "2")], "1", "2", "BB")
+
+    assert (r["novos"], r["duplicados"], r["erros"]) == (2, 0, 0)
+    assert sum(q.lstrip().startswith("INSERT") for q in adapter.queries) == 2
+
+
+@pytest.mark.parametrize("em_lote", [True, False])
+def test_resultado_igual_com_e_sem_lote(monkeypatch, em_lote):
+    import services.banco_sincronizacao_service as mod
+
+    monkeypatch.setattr(mod, "BANCO_IMPORTACAO_EM_LOTE", em_lote)
+    adapter = _FakeAdapter()
+    svc = _service(adapter)
+
+    r = svc.importar_lancamentos([_bb(5, 1.0, "A", "1"), _bb(0, 2.0, "B", "2")], "1", "2", "BB")
+
+    assert (r["novos"], r["duplicados"], r["erros"]) == (1, 0, 1)
+
+
+def test_lote_santander_deduplica_valor_descricao_dentro_do_extrato():
+    adapter = _FakeAdapter()
+    svc = _service(adapter)
+    # Mesmo lançamento duas vezes no extrato: com e sem historicComplement (hash diferente).
+    # Como na importação unitária, o critério só enxerga lançamentos gravados nas datas de correção.
+    lancs = [
+        _santander("2026-01-09", 80.0, "TED ENVIADA", "DESPACHANTE", tid="1"),
+        _santander("2026-01-09", 80.0, "TED ENVIADA", tid="2"),
+        _santander("2026-01-07", 150.0, "PIX ENVIADO", "RIO BRASIL TERMINAL", tid="3"),
+        _santander("2026-01-07", 150.0, "PIX ENVIADO", tid="4"),
+    ]
+
+    r = svc.importar_lancamentos(lancs, "0001", "123", "SANTANDER")
+
+    assert (r["novos"], r["duplicados"], r["erros"]) == (3, 1, 0)
+    inserts = [c for c in adapter.execute_many_calls if c[0].startswith("INSERT")]
+    assert [linha[16] for linha in inserts[0][1]] == [
+        "TED ENVIADA - DESPACHANTE", "TED ENVIADA", "PIX ENVIADO - RIO BRASIL TERMINAL",
+    ]
+    assert not [c for c in adapter.execute_many_calls if c[0].startswith("UPDATE")]
+
+
+def test_lote_parcial_conta_linhas_ja_gravadas_como_novas():
+    adapter = _FakeAdapter(falhar_insert="String or binary data would be truncated", gravadas_antes_da_falha=2)
+    svc = _service(adapter)
+    existente = _bb(5, 10.0, "TARIFA", "9")
+    adapter.existentes[svc.gerar_hash_lancamento(existente, "1", "2", "BB")] = (99, "2026-01-05")
+    lancs = [existente] + [_bb(5, float(i), f"PAG FRETE DMD 00{i}3/25", str(i)) for i in range(1, 4)]
+
+    r = svc.importar_lancamentos(lancs, "1", "2", "BB")
+
+    # 2 gravadas pela parte do lote que entrou + 1 refeita item a item: todas novas deste extrato
+    assert (r["novos"], r["duplicados"], r["erros"]) == (3, 1, 0)
+    assert sorted(r["processos_detectados"]) == ["DMD.0013/25", "DMD.0023/25", "DMD.0033/25"]
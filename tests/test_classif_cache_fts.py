@@ -0,0 +1,99 @@
+"""
+Testes da busca de NCM por descrição via índice FTS5 (`db_manager.buscar_ncms_por_descricao`).
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import db_manager
+import services.database_service as database_service
+
+
+NCMS = [
+    ("0703", "Cebolas, chalotas, alhos, alhos-porros e outros produtos hortícolas aliáceos"),
+    ("070320", "Alhos"),
+    ("07032010", "Para semeadura"),
+    ("07032090", "Outros"),
+    ("25171000", "Calhaus, cascalho, pedras britadas"),
+    ("08055000", "Limões e limas"),
+    ("01069000", "Outros animais vivos"),
+]
+
+
+@pytest.fixture
+def classif_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "classif.db")
+    db_manager.init_classif_cache()
+    for ncm, descricao in NCMS:
+        assert db_manager.save_classif_ncm(ncm, "KG", descricao)
+    return tmp_path / "classif.db"
+
+
+def _ncms(resultados, relacionado=None):
+    return {r["ncm"] for r in resultados if relacionado is None or r["relacionado"] is relacionado}
+
+
+def test_busca_palavra_completa_sem_substring(classif_db):
+    resultados = db_manager.buscar_ncms_por_descricao("alho")
+
+    assert {"0703", "070320"} <= _ncms(resultados, relacionado=False)
+    assert "25171000" not in _ncms(resultados)  # "cascalho" não casa com "alho"
+    # Expansão hierárquica continua como pós-etapa
+    assert {"07032010", "07032090"} <= _ncms(resultados)
+
+
+def test_busca_sem_acento_e_plural_irregular(classif_db):
+    assert "08055000" in _ncms(db_manager.buscar_ncms_por_descricao("limao", incluir_relacionados=False))
+    assert "01069000" in _ncms(db_manager.buscar_ncms_por_descricao("animal", incluir_relacionados=False))
+
+
+def test_indice_acompanha_atualizacao_do_cache(classif_db):
+    db_manager.save_classif_ncm("08055000", "KG", "Laranjas")
+
+    assert "08055000" not in _ncms(db_manager.buscar_ncms_por_descricao("limões", incluir_relacionados=False))
+    assert "08055000" in _ncms(db_manager.buscar_ncms_por_descricao("laranja", incluir_relacionados=False))
+
+
+def test_indice_criado_para_cache_ja_populado(tmp_path, monkeypatch):
+    import sqlite3
+
+    db_path = tmp_path / "legado.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE classif_cache (ncm TEXT PRIMARY KEY, unidade_medida_estatistica TEXT, "
+        "descricao TEXT, data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.execute("INSERT INTO classif_cache (ncm, descricao) VALUES ('070320', 'Alhos')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(database_service, "DB_PATH", db_path)
+
+    db_manager.init_classif_cache()
+
+    assert "070320" in _ncms(db_manager.buscar_ncms_por_descricao("alho", incluir_relacionados=False))
+
+
+def test_indice_antigo_com_prefixos_e_recriado_sem_eles(classif_db):
+    import sqlite3
+
+    from services.classif_cache_schema import criar_indice_fts_classif_cache
+
+    conn = sqlite3.connect(str(classif_db))
+    conn.execute("DROP TABLE classif_cache_fts")
+    conn.execute(
+        "CREATE VIRTUAL TABLE classif_cache_fts USING fts5(ncm UNINDEXED, descricao, content='classif_cache', "
+        "content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')"
+    )
+    assert criar_indice_fts_classif_cache(conn.cursor())
+    conn.commit()
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'classif_cache_fts'").fetchone()[0]
+    conn.close()
+
+    assert "prefix" not in sql
+    assert "070320" in _ncms(db_manager.buscar_ncms_por_descricao("alhos", incluir_relacionados=False))
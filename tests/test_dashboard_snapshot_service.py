@@ -0,0 +1,96 @@
+"""
+Testes do dashboard materializado (`services.dashboard_snapshot_service`).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+from services.dashboard_snapshot_service import DashboardSnapshotService, calcular_secoes
+
+
+@pytest.fixture(autouse=True)
+def _db_temporario(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "dashboard.db")
+    monkeypatch.setattr(DashboardSnapshotService, "_tabela_ok", False)
+
+
+class _Secoes:
+    def __init__(self, espera=0.0):
+        self.chamadas = []
+        self.espera = espera
+        self._lock = threading.Lock()
+
+    def fn(self, nome):
+        def _f(categoria, modal):
+            with self._lock:
+                self.chamadas.append((nome, categoria, modal))
+            time.sleep(self.espera)
+            return [{"secao": nome, "categoria": categoria}]
+        return _f
+
+    def lista(self):
+        return [(n, self.fn(n)) for n in ("processos_chegando", "pendencias", "alertas", "eta_alterado")]
+
+
+def test_secoes_calculadas_em_paralelo():
+    fake = _Secoes(espera=0.1)
+    inicio = time.monotonic()
+    secoes = calcular_secoes("ALH", None, max_workers=4, secoes=fake.lista())
+    assert time.monotonic() - inicio < 0.3  # ~0.1s, não 0.4s
+    assert list(secoes) == ["processos_chegando", "pendencias", "alertas", "eta_alterado"]
+
+
+def test_segunda_leitura_vem_do_snapshot():
+    fake = _Secoes()
+    svc = DashboardSnapshotService(secoes=fake.lista())
+
+    r1 = svc.obter("alh", None)
+    r2 = svc.obter("ALH", None)
+
+    assert r1["origem"] == "calculado" and r2["origem"] == "snapshot"
+    assert r2["secoes"]["pendencias"] == [{"secao": "pendencias", "categoria": "ALH"}]
+    assert r2["gerado_em"] == r1["gerado_em"] and r2["idade_segundos"] >= 0
+    assert len(fake.chamadas) == 4
+
+
+def test_snapshot_expirado_e_recalculado():
+    fake = _Secoes()
+    svc = DashboardSnapshotService(max_idade_segundos=0, secoes=fake.lista())
+    svc.obter(None, None)
+    time.sleep(0.01)
+    assert svc.obter(None, None)["origem"] == "calculado"
+    assert len(fake.chamadas) == 8
+
+
+def test_pedidos_simultaneos_calculam_uma_vez():
+    fake = _Secoes(espera=0.05)
+    svc = DashboardSnapshotService(secoes=fake.lista())
+    threads = [threading.Thread(target=svc.obter, args=("VDM", "Aéreo")) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(fake.chamadas) == 4
+
+
+def test_sync_atualiza_apenas_snapshots_afetados():
+    fake = _Secoes()
+    svc = DashboardSnapshotService(secoes=fake.lista())
+    svc.obter("ALH", None)
+    svc.obter("VDM", None)
+    fake.chamadas.clear()
+
+    atualizados = svc.atualizar_apos_sync(["ALH.0001/26"])
+
+    assert atualizados == 2  # geral + ALH
+    assert {c[1] for c in fake.chamadas} == {None, "ALH"}
+    assert svc.obter("VDM", None)["origem"] == "snapshot"
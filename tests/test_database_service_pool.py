@@ -0,0 +1,185 @@
+"""
+Testes do pool de conexões de `services/database_service.py`.
+"""
+import gc
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+from services.database_service import (
+    PostgresConnectionPool,
+    PostgresConnectionWrapper,
+    PostgresPoolEsgotado,
+    SQLiteConnectionPool,
+    SQLiteConnectionWrapper,
+)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    p = SQLiteConnectionPool(tmp_path / "pool.db", max_idle_per_thread=2)
+    yield p
+    p.close_thread_connections()
+
+
+def test_close_devolve_conexao_e_reaproveita_na_mesma_thread(pool):
+    w1 = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    raw = w1.conn
+    w1.close()
+
+    w2 = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    assert w2.conn is raw
+    w2.close()
+
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_pragmas_aplicados_na_criacao(pool):
+    conn = pool.acquire()
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        pool.release(conn)
+
+
+def test_checkout_aninhado_recebe_conexao_distinta(pool):
+    externo = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    interno = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    assert externo.conn is not interno.conn
+
+    externo.execute("CREATE TABLE t (x INTEGER)")
+    externo.commit()
+    externo.execute("INSERT INTO t VALUES (1)")
+    interno.close()  # não pode afetar a transação da conexão externa
+    externo.commit()
+    assert externo.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    externo.close()
+
+
+def test_release_descarta_transacao_pendente_e_reseta_row_factory(pool):
+    w = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    w.execute("CREATE TABLE t (x INTEGER)")
+    w.commit()
+    w.row_factory = sqlite3.Row
+    w.execute("INSERT INTO t VALUES (1)")
+    w.close()
+
+    w2 = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    assert w2.row_factory is None
+    assert w2.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    w2.close()
+
+
+def test_wrapper_fechado_nao_opera(pool):
+    w = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    w.close()
+    w.close()  # idempotente
+    with pytest.raises(sqlite3.ProgrammingError):
+        w.cursor()
+
+
+def test_conexoes_nao_sao_compartilhadas_entre_threads(pool):
+    w = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    principal = w.conn
+    w.close()
+
+    vistas = []
+
+    def worker():
+        c = pool.acquire()
+        vistas.append(c)
+        pool.release(c)
+        pool.close_thread_connections()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert vistas and vistas[0] is not principal
+
+
+def test_limite_de_ociosas_por_thread(pool):
+    conns = [pool.acquire() for _ in range(4)]
+    for c in conns:
+        pool.release(c)
+    assert pool.stats()["idle_current_thread"] == 2
+    assert pool.stats()["discarded"] == 2
+
+
+def test_wrapper_sqlite_nao_fechado_ajusta_in_use(pool):
+    w = SQLiteConnectionWrapper(pool.acquire(), pool=pool)
+    w.execute("SELECT 1")
+    del w
+    gc.collect()
+    stats = pool.stats()
+    assert stats["in_use"] == 0 and stats["leaked"] == 1
+
+
+class _ConexaoPgFalsa:
+    closed = 0
+
+    def cursor(self):
+        return object()
+
+    def rollback(self):
+        pass
+
+
+class _ThreadedPoolFalso:
+    def getconn(self):
+        return _ConexaoPgFalsa()
+
+    def putconn(self, conn, close=False):
+        pass
+
+
+def _pool_pg(maxconn=1, wait_timeout=0.01):
+    pg = PostgresConnectionPool.__new__(PostgresConnectionPool)
+    pg.minconn, pg.maxconn, pg.wait_timeout = 0, maxconn, wait_timeout
+    pg._pool = _ThreadedPoolFalso()
+    pg._slots = threading.BoundedSemaphore(maxconn)
+    pg._lock = threading.Lock()
+    pg._stats = {"checkouts": 0, "released": 0, "discarded": 0, "in_use": 0, "wait_timeouts": 0, "leaked": 0}
+    return pg
+
+
+def test_checkout_postgres_vazado_volta_ao_pool():
+    pg = _pool_pg()
+    w = PostgresConnectionWrapper(pg.acquire(), pool=pg)
+    cursor = w.cursor()
+    del w
+    gc.collect()
+    # Cursor ainda em uso segura o checkout
+    with pytest.raises(PostgresPoolEsgotado):
+        pg.acquire()
+
+    del cursor
+    gc.collect()
+    PostgresConnectionWrapper(pg.acquire(), pool=pg).close()
+    stats = pg.stats()
+    assert stats["in_use"] == 0 and stats["leaked"] == 1 and stats["wait_timeouts"] == 1
+
+
+def test_pool_postgres_esgotado_nao_cai_para_sqlite(monkeypatch):
+    pg = _pool_pg()
+    monkeypatch.setenv("USE_POSTGRES", "true")
+    monkeypatch.setattr(database_service, "DB_POOL_ENABLED", True)
+    monkeypatch.setattr(database_service, "_postgres_pool", pg)
+    monkeypatch.setattr(database_service, "_connect_sqlite", lambda: pytest.fail("fallback para SQLite"))
+
+    ocupada = database_service.get_db_connection()
+    with pytest.raises(PostgresPoolEsgotado):
+        database_service.get_db_connection()
+    ocupada.close()
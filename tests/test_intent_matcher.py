@@ -0,0 +1,142 @@
+"""
+Testes do motor único de intenções (`services.intent_matcher`) e dos serviços que passaram
+a usá-lo (`IntentDetectionService`, `MessageIntentService`, `_identificar_acao`, detecção
+proativa do chat e `PrecheckService`).
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+from services.intent_detection_service import IntentDetectionService, IntentType
+from services.intent_matcher import IntentMatcher, Regra, analisar_mensagem, normalizar_mensagem
+from services.message_intent_service import MessageIntentService
+import services.chat_service_intent_rules as chat_regras
+import services.precheck_service  # noqa: F401  (registra as regras `precheck.*`)
+
+
+def test_normalizacao():
+    assert normalizar_mensagem("  Relatório   de\tSITUAÇÃO ") == "relatorio de situacao"
+    assert normalizar_mensagem("Ponto de Ônibus ﬁnal") == "ponto de onibus final"
+    assert normalizar_mensagem(None) == ""
+
+
+def test_gatilhos_tem_semantica_de_substring():
+    # 'manda' dentro de 'mandar'; 'ab'/'bc' sobrepostos em 'abc'
+    matcher = IntentMatcher([Regra("x", gatilhos=("mandar", "manda"))], gatilhos_extras=("ab", "bc", "abc"))
+    r = matcher.analisar("vou MANDAR abc")
+    assert {"mandar", "manda", "ab", "bc", "abc"} <= r.gatilhos
+    assert matcher.analisar("xabcy").gatilhos == frozenset({"ab", "bc", "abc"})
+    assert matcher.analisar("abxbc").gatilhos == frozenset({"ab", "bc"})
+
+
+def test_regra_so_roda_com_gatilho():
+    matcher = IntentMatcher(
+        [
+            Regra("extrato", r"extrato.*banco", ("extrato",)),
+            Regra("saudacao", gatilhos=("oi",)),
+            Regra("sempre", r"^\w"),
+        ]
+    )
+    assert matcher.analisar("Extrato do banco").regras == ("extrato", "sempre")
+    assert matcher.analisar("oi").regras == ("saudacao", "sempre")
+    assert matcher.analisar("banco extrato").regras == ("sempre",)
+
+    with pytest.raises(ValueError):
+        IntentMatcher([Regra("a"), Regra("a")])
+
+
+def test_entidades():
+    r = IntentMatcher([]).analisar(
+        "situação da DUIMP 26BR0000194844-1 do ALH.0001/26, CE 132505284587462, CCT MIA-4675; "
+        "avisar fulano@empresa.com.br"
+    )
+    assert r.entidade("processo") == "ALH.0001/26"
+    assert r.entidade("categoria") == "ALH"
+    assert r.entidade("duimp") == "26BR0000194844-1"
+    assert r.entidade("ce") == "132505284587462"
+    assert r.entidade("cct") == "MIA-4675"
+    assert r.entidade("email") == "fulano@empresa.com.br"
+
+
+def test_categorias_conhecidas_filtram_cct():
+    matcher = IntentMatcher([])
+    assert matcher.analisar("tem o alh0176?").entidades_de("cct") == ("ALH0176",)
+    r = matcher.analisar("processos de gym e o alh0176", categorias={"ALH", "GYM"})
+    assert r.entidades_de("cct") == ()
+    assert r.entidades_de("categoria") == ("GYM",)
+
+
+def test_analise_memoizada():
+    assert analisar_mensagem("extrato do banco do brasil") is analisar_mensagem("extrato do banco do brasil")
+
+
+@pytest.mark.parametrize(
+    "mensagem, esperado",
+    [
+        ("extrato do banco do brasil de ontem", IntentType.CONSULTAR_EXTRATO_BANCARIO),
+        ("extrato do CE 132505284587462", IntentType.OUTROS),
+        ("mandar email para x@y.com assine joao", IntentType.ENVIAR_EMAIL_PERSONALIZADO),
+        ("criar duimp do processo MV5.0013/26", IntentType.CRIAR_DUIMP),
+        ("qual a ncm de parafuso de aço inox?", IntentType.CONSULTAR_NCM),
+    ],
+)
+def test_intent_detection_service(mensagem, esperado):
+    assert IntentDetectionService().detectar_intencao(mensagem)["intent_type"] == esperado
+
+
+def test_relatorio_email_exige_relatorio_na_ultima_resposta():
+    service = IntentDetectionService()
+    mensagem = "envia esse relatório para o joão"
+    assert service.detectar_intencao(mensagem)["intent_type"] == IntentType.OUTROS
+    r = service.detectar_intencao(mensagem, ultima_resposta_texto="📋 O que temos pra hoje\n...")
+    assert r["intent_type"] == IntentType.ENVIAR_RELATORIO_EMAIL
+    assert r["keywords"][0] == "envia"
+
+
+def test_message_intent_service_comandos():
+    service = MessageIntentService()
+    assert service.detectar_comando_limpar_contexto("Começar do zero")
+    assert not service.detectar_comando_limpar_contexto("quero limpar contexto")
+    assert service.detectar_comando_interface("maike menu") == {"tipo": "menu", "acao": "abrir_menu"}
+    assert service.detectar_comando_interface("quero fazer a conciliação bancária")["tipo"] == "conciliação"
+    assert service.detectar_comando_interface("obrigado!") is None
+
+
+@pytest.mark.parametrize(
+    "mensagem, acao",
+    [
+        ("criar DUIMP do ALH.0001/25", "criar_duimp"),
+        ("Pode prosseguir", "criar_duimp"),
+        ("como está o VDM.0003/25?", "consultar_status"),
+        ("documentos do processo", "consultar_documentos"),
+        ("processos bloqueados", "consultar_bloqueios"),
+        ("bom dia", None),
+    ],
+)
+def test_regras_de_acao_do_chat(mensagem, acao):
+    analise = analisar_mensagem(mensagem)
+    assert next((a for a in chat_regras.ACOES_CHAT if analise.tem(f"acao.{a}")), None) == acao
+
+
+def test_regras_proativas_e_de_precheck():
+    r = analisar_mensagem("Quando chegam os processos da semana que vem?")
+    assert r.tem("proativo.quando_chegam", "proativo.periodo_proxima_semana")
+    assert not r.tem("proativo.quando_chegaram")
+    assert analisar_mensagem("aprovar consulta #12").tem("proativo.aprovar")
+    assert analisar_mensagem("processos com pendência").tem("proativo.pendencia")
+
+    assert analisar_mensagem("Leia meus e-mails de hoje").tem("precheck.ver_emails")
+    assert not analisar_mensagem("ver emails antigos").tem("precheck.ver_emails")
+    r = analisar_mensagem("quais DMD foram registrados amanhã?")
+    assert r.tem("precheck.registrados", "precheck.futuro", "precheck.categoria_explicita")
+    r = analisar_mensagem("pagar AFRMM do comprovante")
+    assert r.tem("precheck.verbo_pagar") and r.tem("precheck.historico_comprovante")
+    assert analisar_mensagem("extrato do processo ALH.0001/25").tem("precheck.extrato_documento")
+    assert analisar_mensagem("envie esse extrato").tem("precheck.followup_extrato")
+    assert analisar_mensagem("consultar legislação de NCM").tem("precheck.comando_especifico")
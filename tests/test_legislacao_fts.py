@@ -0,0 +1,100 @@
+"""
+Testes da busca em legislações via FTS5 (`LegislacaoService.buscar_em_todas_legislacoes`).
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+from db_manager import get_db_connection
+from services.legislacao_schema import criar_tabelas_legislacao
+from services.legislacao_service import LegislacaoService
+
+
+TRECHOS = [
+    # (referencia, tipo, texto, numero_artigo, revogado)
+    ("TÍTULO I", "titulo", "Das disposições gerais", None, 0),
+    ("Art. 1º", "caput", "Este Decreto regula o despacho aduaneiro de importação.", 1, 0),
+    ("TÍTULO II", "titulo", "Das infrações", None, 0),
+    ("Art. 2º", "caput", "As sanções previstas neste Título aplicam-se sem prejuízo de outras.", 2, 0),
+    ("Art. 3º", "caput", "Aplica-se a pena de perdimento à mercadoria abandonada.", 3, 0),
+    ("Art. 4º", "caput", "Fica sujeito a multa o importador que deixar de prestar informação.", 4, 0),
+    ("Art. 5º", "caput", "Revogado: multa de cem reais.", 5, 1),
+    ("TÍTULO III", "titulo", "Das disposições finais", None, 0),
+    ("Art. 6º", "caput", "Este Decreto entra em vigor na data de sua publicação.", 6, 0),
+]
+
+
+@pytest.fixture
+def legislacao_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "legislacao.db")
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    criar_tabelas_legislacao(cursor)
+    cursor.execute(
+        "INSERT INTO legislacao (tipo_ato, numero, ano, sigla_orgao, titulo_oficial) "
+        "VALUES ('Decreto', '6759', 2009, 'PR', 'Regulamento Aduaneiro')"
+    )
+    leg_id = cursor.lastrowid
+    for ordem, (ref, tipo, texto, artigo, revogado) in enumerate(TRECHOS, start=1):
+        cursor.execute(
+            "INSERT INTO legislacao_trecho (legislacao_id, referencia, tipo_trecho, texto, texto_com_artigo, "
+            "ordem, numero_artigo, revogado) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (leg_id, ref, tipo, texto, texto, ordem, artigo, revogado),
+        )
+    conn.commit()
+    conn.close()
+    return LegislacaoService()
+
+
+def _refs(trechos, contextual=None):
+    return [t["referencia"] for t in trechos if contextual is None or t["contextual"] is contextual]
+
+
+def test_busca_direta_com_destaque_e_sem_revogados(legislacao_db):
+    trechos = legislacao_db.buscar_em_todas_legislacoes(["multa"])
+
+    assert "Art. 4º" in _refs(trechos, contextual=False)
+    assert "Art. 5º" not in _refs(trechos)
+    art4 = next(t for t in trechos if t["referencia"] == "Art. 4º")
+    assert "**multa**" in art4["destaque"]
+    assert "relevancia" in art4
+
+    com_revogados = legislacao_db.buscar_em_todas_legislacoes(["multa"], incluir_revogados=True)
+    assert "Art. 5º" in _refs(com_revogados)
+
+
+def test_contexto_hierarquico_ate_proximo_titulo(legislacao_db):
+    # "sanções" só aparece no Art. 2º, que menciona "neste Título": Arts. 3º e 4º entram como contexto,
+    # mas nada depois do TÍTULO III
+    trechos = legislacao_db.buscar_em_todas_legislacoes(["sanções"])
+
+    assert "Art. 2º" in _refs(trechos, contextual=False)
+    contextuais = _refs(trechos, contextual=True)
+    assert "Art. 3º" in contextuais
+    assert "Art. 6º" not in contextuais
+
+
+def test_frase_e_proximidade(legislacao_db):
+    assert _refs(legislacao_db.buscar_em_todas_legislacoes(["despacho aduaneiro"])) == ["Art. 1º"]
+    assert _refs(legislacao_db.buscar_em_todas_legislacoes(["aduaneiro despacho"])) == []
+
+    perto = legislacao_db.buscar_em_todas_legislacoes(["perdimento", "mercadoria"], proximidade=3)
+    longe = legislacao_db.buscar_em_todas_legislacoes(["pena", "abandonada"], proximidade=2)
+    assert _refs(perto) == ["Art. 3º"]
+    assert _refs(longe) == []
+
+
+def test_indice_acompanha_exclusao_de_trechos(legislacao_db):
+    conn = get_db_connection()
+    conn.execute("DELETE FROM legislacao_trecho WHERE referencia = 'Art. 3º'")
+    conn.commit()
+    conn.close()
+
+    assert _refs(legislacao_db.buscar_em_todas_legislacoes(["perdimento"])) == []
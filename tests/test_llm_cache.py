@@ -0,0 +1,81 @@
+"""
+Testes do cache persistente de respostas do LLM (`services.llm_cache`).
+"""
+import sys
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.llm_cache as llm_cache
+from services.llm_cache import LLMCache, chave_llm
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(db_path=str(tmp_path / "llm_cache.db"), max_entradas=3)
+
+
+def test_chave_estavel_e_normalizada():
+    a = chave_llm("sugerir_ncm", prompt="Alho   Fresco\n", system_prompt="sys", model="gpt-4o", temperature=0.5)
+    b = chave_llm("sugerir_ncm", prompt="alho fresco", system_prompt="SYS", model="gpt-4o", temperature=0.50)
+    assert a == b and len(a) == 64
+    assert a != chave_llm("sugerir_ncm", prompt="alho fresco", system_prompt="sys", model="gpt-5.1", temperature=0.5)
+    assert chave_llm("x", tools=[{"a": 1}]) == chave_llm("x", tools='[{"a":1}]')
+
+
+def test_persistencia_e_contadores(tmp_path, cache):
+    cache.salvar("k1", {"ncm": "07032090"}, "sugerir_ncm")
+    assert cache.obter("k1", "sugerir_ncm") == {"ncm": "07032090"}
+    assert cache.obter("k2", "sugerir_ncm") is None
+
+    # outra instância (outro worker) enxerga a mesma entrada
+    assert LLMCache(db_path=cache.db_path).obter("k1", "sugerir_ncm") == {"ncm": "07032090"}
+
+    stats = cache.stats()["por_tipo"]["sugerir_ncm"]
+    assert (stats["hits"], stats["misses"], stats["gravacoes"]) == (1, 1, 1)
+
+
+def test_ttl_por_tipo(monkeypatch, cache):
+    monkeypatch.setenv("LLM_CACHE_TTL_SUGESTAO", "0")
+    cache.salvar("k", {"v": 1}, "sugestao")
+    time.sleep(0.01)
+    assert cache.obter("k", "sugestao") is None
+    assert llm_cache.ttl_para("sugerir_ncm") > llm_cache.ttl_para("tipo_sem_ttl") == llm_cache.LLM_CACHE_TTL_PADRAO
+
+
+def test_despejo_lru(cache):
+    for i in range(3):
+        cache.salvar(f"k{i}", i, "erro")
+        time.sleep(0.01)
+    cache.obter("k0", "erro")  # k0 vira o mais recente
+    cache.salvar("k3", 3, "erro")
+    cache.despejar()
+
+    assert cache.obter("k1", "erro") is None
+    assert cache.obter("k0", "erro") == 0
+    assert cache.obter("k3", "erro") == 3
+
+
+def test_ai_service_usa_cache_e_modo_somente_cache(monkeypatch, tmp_path):
+    import ai_service
+
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MODO", "somente_cache")
+    monkeypatch.setattr(ai_service.AIService, "_abrir_cache", staticmethod(lambda: LLMCache(db_path=str(tmp_path / "ai.db"))))
+    svc = ai_service.AIService()
+    svc.enabled = True
+    svc.provider = "openai"
+
+    # somente-cache: nenhum LLM é chamado, cai no fallback sem gravar
+    r = svc.interpretar_erro_api("XPTO-1", "Falha qualquer")
+    assert r["fonte"] == "fallback"
+    assert svc.cache.stats()["entradas"] == 0
+
+    chave = svc._cache_key("erro", {"codigo": "XPTO-1", "mensagem": "Falha qualquer", "campo": None, "contexto": {}})
+    svc._set_cache(chave, {"titulo": "do cache", "fonte": "llm"})
+    assert svc.interpretar_erro_api("XPTO-1", "Falha qualquer")["titulo"] == "do cache"
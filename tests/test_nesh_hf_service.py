@@ -0,0 +1,107 @@
+"""
+Testes do runtime NESH HF (`NeshHfService`): índice mmap, meta sob demanda e cache de embeddings.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+
+from services.nesh_hf_service import NeshHfService, _MetaSobDemanda
+
+_VOCAB = ["ventilador", "axial", "bomba", "centrifuga", "motor", "eletrico"]
+
+
+class _FakeEmbedder:
+    """Embedding bag-of-words sobre um vocabulário fixo; conta chamadas a encode."""
+
+    def __init__(self):
+        self.chamadas = []
+
+    def encode(self, textos, normalize_embeddings=True):
+        self.chamadas.append(list(textos))
+        out = np.zeros((len(textos), len(_VOCAB)), dtype="float32")
+        for i, t in enumerate(textos):
+            for j, w in enumerate(_VOCAB):
+                if w in t.lower():
+                    out[i, j] = 1.0
+            out[i] /= max(np.linalg.norm(out[i]), 1e-6)
+        return out
+
+
+_DOCS = [
+    {"position_code": "84.14", "text": "ventilador axial"},
+    {"position_code": "84.13", "text": "bomba centrifuga"},
+    {"position_code": "85.01", "text": "motor eletrico"},
+]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    emb = _FakeEmbedder()
+    index = faiss.IndexFlatIP(len(_VOCAB))
+    index.add(emb.encode([d["text"] for d in _DOCS]))
+    faiss.write_index(index, str(tmp_path / "index.faiss"))
+    with (tmp_path / "meta.jsonl").open("w", encoding="utf-8") as f:
+        for d in _DOCS:
+            f.write(json.dumps(d, ensure_ascii=False) + "\n")
+
+    monkeypatch.setenv("NESH_HF_ENABLED", "true")
+    monkeypatch.setenv("NESH_HF_INDEX_DIR", str(tmp_path))
+    monkeypatch.setenv("NESH_HF_EMBED_MODEL", "fake-model")
+    svc = NeshHfService()
+    svc._embedder = _FakeEmbedder()
+    monkeypatch.setattr(svc, "is_ready", lambda: True)
+    return svc
+
+
+def test_busca_com_meta_sob_demanda(service):
+    rows = service.buscar_por_descricao("Ventilador  axial industrial", limite=1)
+
+    assert rows[0]["position_code"] == "84.14"
+    assert rows[0]["_nesh_source"] == "HF"
+    assert isinstance(service._meta, _MetaSobDemanda)
+    assert len(service._meta) == 3
+    assert (service.index_dir / "meta.offsets").exists()
+
+
+def test_cache_de_embeddings_por_texto_normalizado(service):
+    service.buscar_por_descricao("bomba centrifuga")
+    service.buscar_por_descricao("  BOMBA   centrifuga ")
+
+    assert len(service._embedder.chamadas) == 1
+    assert service.stats["query_cache_hits"] == 1
+
+
+def test_modelo_recebe_texto_original_e_nao_a_chave_do_cache(service):
+    service.encode_queries(["  Motor  Elétrico ", "motor elétrico", "Bomba"])
+
+    # Mesma chave normalizada: só a primeira grafia vai ao modelo, com caixa/espaços internos intactos
+    assert service._embedder.chamadas == [["Motor  Elétrico", "Bomba"]]
+
+
+def test_busca_em_lote_encoda_apenas_faltantes(service):
+    service.buscar_por_descricao("motor eletrico")
+    service._embedder.chamadas.clear()
+
+    resultados = service.buscar_por_descricoes(["bomba", "", "motor eletrico", "ventilador"], limite=1)
+
+    assert [r[0]["position_code"] if r else None for r in resultados] == ["84.13", None, "85.01", "84.14"]
+    assert service._embedder.chamadas == [["bomba", "ventilador"]]
+
+
+def test_modo_nao_compartilhado_carrega_meta_em_lista(service, monkeypatch):
+    service.shared = False
+
+    rows = service.buscar_por_descricao("motor", limite=1)
+
+    assert rows[0]["position_code"] == "85.01"
+    assert isinstance(service._meta, list)
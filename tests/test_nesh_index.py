@@ -0,0 +1,146 @@
+"""
+Testes do índice NESH (`services.nesh_index`) e das buscas NESH do `db_manager` sobre ele.
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import db_manager
+import services.nesh_index as nesh_index
+from services.nesh_index import NeshIndex
+from services.nesh_schema import criar_tabela_nesh_chunks
+
+
+REGISTROS = [
+    {"chapter_code": "07", "chapter_title": "Produtos hortícolas", "position_code": "07.03",
+     "position_title": "Cebolas, alhos", "subposition_code": None, "subposition_title": None,
+     "text": "Esta posição compreende cebolas e alhos frescos."},
+    {"chapter_code": "07", "chapter_title": "Produtos hortícolas", "position_code": "07.03",
+     "position_title": "Cebolas, alhos", "subposition_code": "0703.20", "subposition_title": "Alhos",
+     "text": "Alho para semeadura ou consumo."},
+    {"chapter_code": "84", "chapter_title": "Máquinas e aparelhos mecânicos", "position_code": "84.14",
+     "position_title": "Ventiladores", "subposition_code": "8414.51", "subposition_title": "Ventiladores de mesa",
+     "text": "Eletroventiladores axiais de uso doméstico."},
+    {"chapter_code": "84", "chapter_title": "Máquinas e aparelhos mecânicos", "position_code": "84.13",
+     "position_title": "Bombas para líquidos", "subposition_code": None, "subposition_title": None,
+     "text": "Bombas centrífugas."},
+]
+
+
+@pytest.fixture(autouse=True)
+def _sem_hf_e_indice_limpo(monkeypatch):
+    monkeypatch.setenv("NESH_HF_ENABLED", "false")
+    nesh_index.invalidar_nesh_index()
+    yield
+    nesh_index.invalidar_nesh_index()
+
+
+def _conectar_factory(db_path):
+    def conectar():
+        return sqlite3.connect(str(db_path))
+    return conectar
+
+
+@pytest.fixture
+def nesh_db(tmp_path):
+    db_path = tmp_path / "nesh.db"
+    conn = sqlite3.connect(str(db_path))
+    criar_tabela_nesh_chunks(conn.cursor())
+    for r in REGISTROS:
+        pos = nesh_index.normalizar_codigo_nesh(r["position_code"])
+        sub = nesh_index.normalizar_codigo_nesh(r["subposition_code"])
+        conn.execute(
+            """
+            INSERT INTO nesh_chunks (record_key, chapter_code, chapter_title, position_code, position_code_clean,
+                                     position_title, subposition_code, subposition_code_clean, subposition_title, text)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (f"{sub or ''}:{pos}", r["chapter_code"], r["chapter_title"], r["position_code"], pos,
+             r["position_title"], r["subposition_code"], sub, r["subposition_title"], r["text"]),
+        )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+@pytest.mark.parametrize("origem", ["json", "sqlite"])
+def test_lookup_ncm_respeita_prioridades(origem, nesh_db):
+    if origem == "json":
+        idx = NeshIndex.de_registros(REGISTROS)
+    else:
+        idx = NeshIndex.de_sqlite(_conectar_factory(nesh_db))
+
+    assert idx.buscar_por_ncm("0703.20.10")["subposition_code"] == "0703.20"
+    assert idx.buscar_por_ncm("07039000")["subposition_code"] is None  # nota geral da posição
+    assert idx.buscar_por_ncm("8414.59")["subposition_code"] == "8414.51"  # qualquer registro da posição
+    assert idx.buscar_por_ncm("9999") is None
+    assert len(idx.ids_por_capitulo("84")) == 2
+
+
+def test_candidatos_palavra_inteira_e_substring():
+    idx = NeshIndex.de_registros(REGISTROS)
+
+    assert idx.candidatos(["alho"]) == [1]
+    assert idx.candidatos(["alhos"]) == [0, 1]
+    assert idx.candidatos(["ventiladores"], substring=True) == [2]
+    assert idx.candidatos(["mecânicos"], incluir_capitulo=True) == [2, 3]
+    assert idx.candidatos(["aço-inox"]) is None
+
+
+def test_busca_json_por_descricao_e_ncm(tmp_path, monkeypatch):
+    json_path = tmp_path / "nesh_chunks.json"
+    json_path.write_text(json.dumps(REGISTROS), encoding="utf-8")
+    monkeypatch.setenv("NESH_CHUNKS_PATH", str(json_path))
+    monkeypatch.setattr(db_manager, "_NESH_SQLITE_READY", False)
+
+    nota = db_manager.buscar_nota_explicativa_nesh_por_ncm("0703.20.10")
+    assert nota["subposition_title"] == "Alhos" and nota["_nesh_source"] == "JSON"
+
+    resultados = db_manager.buscar_notas_explicativas_nesh_por_descricao("ventiladores")
+    assert [r["position_code"] for r in resultados] == ["84.14"]
+    assert "_nesh_source" not in REGISTROS[2]
+
+
+def test_busca_sqlite_por_descricao_usa_indice(nesh_db, monkeypatch):
+    monkeypatch.setattr(db_manager, "_NESH_SQLITE_READY", True)
+    monkeypatch.setattr(db_manager, "get_db_connection", _conectar_factory(nesh_db))
+
+    resultados = db_manager.buscar_notas_explicativas_nesh_por_descricao("bombas centrífugas")
+
+    assert [r["position_code"] for r in resultados] == ["84.13"]
+    assert resultados[0]["_nesh_source"] == "SQLITE"
+    assert nesh_index._INDEX is not None and nesh_index._INDEX.fonte == "SQLITE"
+
+
+def test_reimportacao_por_outro_processo_reconstroi_o_indice(nesh_db, monkeypatch):
+    monkeypatch.setattr(db_manager, "_NESH_SQLITE_READY", True)
+    monkeypatch.setattr(db_manager, "get_db_connection", _conectar_factory(nesh_db))
+    monkeypatch.setattr(nesh_index, "NESH_INDEX_VERIFICAR_SEGUNDOS", 0.0)
+    assert db_manager.buscar_notas_explicativas_nesh_por_descricao("turbinas") == []
+    indice_antigo = nesh_index._INDEX
+
+    # Upsert do import (mesmo rowid, texto novo) feito por outra conexão/processo
+    conn = sqlite3.connect(str(nesh_db))
+    conn.execute(
+        "UPDATE nesh_chunks SET text = ?, atualizado_em = ? WHERE position_code = '84.13'",
+        ("Bombas e turbinas hidráulicas.", "2026-10-16 10:00:00.000000"),
+    )
+    conn.commit()
+    conn.close()
+
+    resultados = db_manager.buscar_notas_explicativas_nesh_por_descricao("turbinas")
+    assert [r["position_code"] for r in resultados] == ["84.13"]
+    indice_novo = nesh_index._INDEX
+    assert indice_novo is not indice_antigo
+
+    # Sem mudança de versão o índice é reaproveitado
+    db_manager.buscar_notas_explicativas_nesh_por_descricao("bombas")
+    assert nesh_index._INDEX is indice_novo
@@ -0,0 +1,173 @@
+"""
+Testes do registro de clientes OpenAI (`services.openai_client_registry`): retry, concorrência e métricas.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.openai_client_registry as registry
+
+
+class _Resp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+class _ErroHTTP(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = _Resp(status, headers)
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class APITimeoutError(APIConnectionError):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _sem_espera(monkeypatch):
+    monkeypatch.setattr(registry, "OPENAI_RETRY_MAX_SECONDS", 0.0)
+    registry.resetar_metricas_openai()
+    yield
+    registry.resetar_metricas_openai()
+
+
+def test_classificacao_de_erros_retentaveis():
+    assert registry.erro_retentavel(_ErroHTTP(429))
+    assert registry.erro_retentavel(_ErroHTTP(503))
+    assert registry.erro_retentavel(APIConnectionError())
+    assert not registry.erro_retentavel(_ErroHTTP(400))
+    assert not registry.erro_retentavel(APITimeoutError())
+
+
+def test_backoff_respeita_retry_after_e_teto(monkeypatch):
+    monkeypatch.setattr(registry, "OPENAI_RETRY_MAX_SECONDS", 8.0)
+    assert registry.espera_backoff(0, _ErroHTTP(429, {"retry-after": "2"})) == 2.0
+    for tentativa in range(6):
+        assert 0 <= registry.espera_backoff(tentativa) <= registry.OPENAI_RETRY_MAX_SECONDS
+
+
+def test_retry_em_429_ate_sucesso_e_metricas():
+    falhas = [_ErroHTTP(429), _ErroHTTP(502)]
+
+    def criar(**kwargs):
+        if falhas:
+            raise falhas.pop(0)
+        return {"ok": kwargs["model"]}
+
+    with registry.chamada_openai("modelo-teste") as chamada:
+        r = chamada.executar(criar, model="modelo-teste")
+        chamada.registrar_uso({"prompt_tokens": 10, "completion_tokens": 5})
+
+    assert r == {"ok": "modelo-teste"}
+    m = registry.obter_metricas_openai()["modelo-teste"]
+    assert (m["chamadas"], m["erros"], m["retries"]) == (1, 0, 2)
+    assert (m["prompt_tokens"], m["completion_tokens"]) == (10, 5)
+
+
+def test_erro_nao_retentavel_propaga_sem_retry():
+    chamadas = []
+
+    def criar():
+        chamadas.append(1)
+        raise _ErroHTTP(400)
+
+    with pytest.raises(_ErroHTTP):
+        with registry.chamada_openai("modelo-400") as chamada:
+            chamada.executar(criar)
+
+    assert len(chamadas) == 1
+    assert registry.obter_metricas_openai()["modelo-400"]["erros"] == 1
+
+
+def test_limite_de_concorrencia_por_modelo(monkeypatch):
+    monkeypatch.setitem(registry.OPENAI_CONCORRENCIA_MODELOS, "modelo-limitado", 2)
+    registry._semaforos.pop("modelo-limitado", None)
+    ativos, pico = [0], [0]
+    lock = threading.Lock()
+
+    def trabalho():
+        with registry.chamada_openai("modelo-limitado") as chamada:
+            with lock:
+                ativos[0] += 1
+                pico[0] = max(pico[0], ativos[0])
+            chamada.primeiro_token()
+            time.sleep(0.02)
+            with lock:
+                ativos[0] -= 1
+
+    threads = [threading.Thread(target=trabalho) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert pico[0] <= 2
+    m = registry.obter_metricas_openai()["modelo-limitado"]
+    assert m["chamadas"] == 6 and m["ttft_ms_p50"] is not None
+
+
+def test_fila_cheia_levanta_erro_claro_apos_timeout(monkeypatch):
+    monkeypatch.setitem(registry.OPENAI_CONCORRENCIA_MODELOS, "modelo-cheio", 1)
+    monkeypatch.setattr(registry, "OPENAI_FILA_TIMEOUT_SEGUNDOS", 0.05)
+    registry._semaforos.pop("modelo-cheio", None)
+
+    with registry.chamada_openai("modelo-cheio"):
+        with pytest.raises(registry.FilaOpenAIEsgotada, match="modelo-cheio"):
+            with registry.chamada_openai("modelo-cheio"):
+                pass
+
+    # A vaga da primeira chamada foi devolvida; a que estourou o tempo não devolveu nada a mais
+    with registry.chamada_openai("modelo-cheio"):
+        pass
+    assert registry.obter_metricas_openai()["modelo-cheio"]["erros"] == 1
+
+
+def test_stream_abandonado_libera_a_vaga(monkeypatch):
+    import ai_service
+
+    monkeypatch.setitem(registry.OPENAI_CONCORRENCIA_MODELOS, "modelo-stream", 1)
+    monkeypatch.setattr(registry, "OPENAI_FILA_TIMEOUT_SEGUNDOS", 0.05)
+    registry._semaforos.pop("modelo-stream", None)
+
+    class _Stream:
+        fechado = False
+
+        def __iter__(self):
+            for texto in ("a", "b", "c"):
+                delta = type("Delta", (), {"content": texto, "tool_calls": None})()
+                yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})()], "usage": None})()
+
+        def close(self):
+            _Stream.fechado = True
+
+    class _Completions:
+        def create(self, **kwargs):
+            return _Stream()
+
+    cliente = type("Cliente", (), {"chat": type("Chat", (), {"completions": _Completions()})()})()
+    monkeypatch.setattr(registry, "obter_cliente_openai", lambda **kwargs: cliente)
+    monkeypatch.setattr(ai_service, "_llm_somente_cache", lambda: False)
+    svc = ai_service.AIService()
+    svc.enabled, svc.provider = True, "openai"
+
+    gen = svc._call_llm_api_stream("oi", "sistema", model="modelo-stream")
+    assert next(gen)["chunk"] == "a"
+    gen.close()  # consumidor desconectou no meio do stream
+
+    assert _Stream.fechado
+    pedacos = [p["chunk"] for p in svc._call_llm_api_stream("oi", "sistema", model="modelo-stream")]
+    assert pedacos == ["a", "b", "c", ""]
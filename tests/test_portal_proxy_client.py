@@ -0,0 +1,151 @@
+"""
+Testes do cliente reutilizável do Portal Único (`utils.portal_proxy.PortalClient`):
+sessão única por ambiente, cache/renovação de tokens, retry em 401, itens em paralelo e
+debug log opt-in.
+"""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import utils.portal_proxy as portal_proxy
+
+
+class _Resposta:
+    def __init__(self, status_code=200, corpo=None):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.content = json.dumps(corpo if corpo is not None else {}).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+class _SessaoFalsa:
+    def __init__(self, responder):
+        self.responder = responder
+        self.chamadas = []
+        self.ativas = 0
+        self.max_ativas = 0
+        self._lock = threading.Lock()
+
+    def mount(self, prefixo, adapter):
+        pass
+
+    def close(self):
+        pass
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.chamadas.append((method, url, kwargs["headers"]["Authorization"]))
+            self.ativas += 1
+            self.max_ativas = max(self.max_ativas, self.ativas)
+        try:
+            time.sleep(0.01)
+            return self.responder(method, url, kwargs)
+        finally:
+            with self._lock:
+                self.ativas -= 1
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    """Cliente com autenticação e sessão falsas; conta autenticações e sessões criadas."""
+    estado = {"autenticacoes": [], "sessoes": [], "expira_ms": None, "responder": lambda m, u, k: _Resposta(200, {"ok": u})}
+
+    def _obtain_tokens(settings):
+        estado["autenticacoes"].append(settings.force_refresh)
+        n = len(estado["autenticacoes"])
+        expira = estado["expira_ms"] or int(time.time() * 1000 + 3600_000)
+        return {"setToken": f"tok{n}", "csrfToken": f"csrf{n}", "csrfExpiration": str(expira)}
+
+    def _build_session(settings):
+        sessao = _SessaoFalsa(lambda m, u, k: estado["responder"](m, u, k))
+        estado["sessoes"].append(sessao)
+        return sessao
+
+    settings = portal_proxy.duimp_auth.Settings(
+        base_url="https://portal.teste", role_type="IMPORTADOR", pfx_path=Path("cert.pfx"), pfx_password="x",
+        ca_bundle=None, cache_path=Path("cache.json"), force_refresh=False, max_redirects=5, output_mode="json",
+    )
+    monkeypatch.setattr(portal_proxy.duimp_auth, "obtain_tokens", _obtain_tokens)
+    monkeypatch.setattr(portal_proxy, "build_session", _build_session)
+    monkeypatch.setattr(portal_proxy, "_gravar_historico_se_documento", lambda **kw: None)
+    monkeypatch.setattr(portal_proxy.duimp_auth, "load_settings", lambda: settings)
+    monkeypatch.setenv("PUCOMEX_BASE_URL", "https://portal.teste")
+    portal_proxy.resetar_portal_clients()
+    yield estado
+    portal_proxy.resetar_portal_clients()
+
+
+def test_sessao_e_tokens_reaproveitados(portal):
+    for _ in range(3):
+        status, body = portal_proxy.call_portal("ext/duimp/26BR0000000001/1")
+        assert status == 200
+    assert body == {"ok": "https://portal.teste/duimp-api/api/ext/duimp/26BR0000000001/1"}
+    assert len(portal["sessoes"]) == 1
+    assert portal["autenticacoes"] == [False]
+    assert len(portal["sessoes"][0].chamadas) == 3
+
+
+def test_renova_token_perto_de_vencer(portal):
+    portal["expira_ms"] = int(time.time() * 1000 + 60_000)  # dentro da margem padrão (120s)
+    client = portal_proxy.obter_portal_client()
+    assert client.obter_tokens() == ("tok2", "csrf2")  # cache em disco perto de vencer → autenticou de novo
+    assert portal["autenticacoes"] == [False, True]
+
+    portal["expira_ms"] = None
+    assert client.obter_tokens() == ("tok3", "csrf3")  # renovação proativa
+    assert client.obter_tokens() == ("tok3", "csrf3")
+    assert portal["autenticacoes"] == [False, True, True]
+
+
+def test_401_renova_token_e_repete_uma_vez(portal):
+    def _responder(method, url, kwargs):
+        return _Resposta(401 if kwargs["headers"]["Authorization"] == "tok1" else 200, {"ok": True})
+
+    portal["responder"] = _responder
+    assert portal_proxy.call_portal("/x") == (200, {"ok": True})
+    assert [c[2] for c in portal["sessoes"][0].chamadas] == ["tok1", "tok2"]
+
+    portal["responder"] = lambda m, u, k: _Resposta(401, {"erro": "negado"})
+    assert portal_proxy.call_portal("/x")[0] == 401  # sem loop de renovação
+
+
+def test_itens_duimp_em_paralelo_limitado(portal):
+    resultados = portal_proxy.call_portal_itens_duimp("26BR0000000001", "1", range(1, 9), max_workers=3)
+    assert [r[0] for r in resultados] == list(range(1, 9))
+    assert all(status == 200 for _, status, _ in resultados)
+    assert resultados[4][2] == {"ok": "https://portal.teste/duimp-api/api/ext/duimp/26BR0000000001/1/itens/5"}
+    sessao = portal["sessoes"][0]
+    assert 1 < sessao.max_ativas <= 3
+    assert len(portal["autenticacoes"]) == 1
+
+
+def test_debug_log_opt_in_e_assincrono(portal, monkeypatch, tmp_path):
+    log = tmp_path / "debug_log.txt"
+    monkeypatch.setattr(portal_proxy._debug_log, "path", str(log))
+
+    monkeypatch.setattr(portal_proxy, "PORTAL_DEBUG_LOG", False)
+    portal_proxy.call_portal("/x")
+    portal_proxy._debug_log.aguardar()
+    assert not log.exists()
+
+    monkeypatch.setattr(portal_proxy, "PORTAL_DEBUG_LOG", True)
+    portal_proxy.call_portal("/x")
+    portal_proxy._debug_log.aguardar()
+    conteudo = log.read_text(encoding="utf-8")
+    assert "URL: https://portal.teste/x" in conteudo and "STATUS: 200" in conteudo
+    assert '"Authorization": "tok1"' not in conteudo  # token mascarado
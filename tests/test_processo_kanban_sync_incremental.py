@@ -0,0 +1,101 @@
+"""
+Testes do sync incremental do Kanban (`ProcessoKanbanService.sincronizar(incremental=True)`).
+"""
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+from services.processo_kanban_service import ProcessoKanbanService
+
+
+def _processo(ref, etapa="EM TRANSITO"):
+    return {"numeroPedido": ref, "etapaKanban": etapa, "modal": "Marítimo"}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "kanban.db")
+    monkeypatch.setattr(ProcessoKanbanService, "_db_inicializado", False)
+    svc = ProcessoKanbanService()
+    with patch.object(ProcessoKanbanService, "_detectar_mudancas") as detectar, \
+         patch.object(ProcessoKanbanService, "_efeitos_pos_salvar") as efeitos:
+        svc._mock_detectar = detectar
+        svc._mock_efeitos = efeitos
+        yield svc
+
+
+def _sync(svc, processos):
+    with patch.object(ProcessoKanbanService, "_buscar_api", return_value=processos):
+        assert svc.sincronizar(incremental=True) is True
+    return svc.ultimas_metricas
+
+
+def test_primeiro_ciclo_grava_tudo_e_segundo_pula_inalterados(service):
+    processos = [_processo("ALH.0001/26"), _processo("ALH.0002/26")]
+
+    m1 = _sync(service, processos)
+    assert (m1["alterados"], m1["inalterados"]) == (2, 0)
+    assert service._mock_efeitos.call_count == 2
+
+    m2 = _sync(service, processos)
+    assert (m2["alterados"], m2["inalterados"]) == (0, 2)
+    assert service._mock_efeitos.call_count == 2  # nenhum efeito colateral para inalterados
+
+
+def test_so_processo_alterado_dispara_efeitos(service):
+    _sync(service, [_processo("ALH.0001/26"), _processo("ALH.0002/26")])
+    service._mock_detectar.reset_mock()
+    service._mock_efeitos.reset_mock()
+
+    m = _sync(service, [_processo("ALH.0001/26", etapa="CHEGOU"), _processo("ALH.0002/26")])
+    assert (m["alterados"], m["inalterados"]) == (1, 1)
+    dto = service._mock_efeitos.call_args[0][0]
+    assert dto.processo_referencia == "ALH.0001/26"
+
+    conn = database_service.get_db_connection()
+    try:
+        etapa = conn.execute(
+            "SELECT etapa_kanban FROM processos_kanban WHERE processo_referencia = ?", ("ALH.0001/26",)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert etapa == "CHEGOU"
+
+
+def test_metricas_registradas_no_sync_status(service):
+    _sync(service, [_processo("ALH.0001/26")])
+    _sync(service, [_processo("ALH.0001/26")])
+
+    from services.sync_status_repository import SyncStatusRepository
+
+    status = SyncStatusRepository().obter("kanban")
+    assert status["last_changed"] == 0
+    assert status["last_unchanged"] == 1
+
+
+def test_sync_que_so_remove_processos_atualiza_dashboard(service):
+    _sync(service, [_processo("ALH.0001/26"), _processo("VDM.0002/26")])
+
+    with patch.object(ProcessoKanbanService, "_atualizar_dashboard_snapshot") as dashboard:
+        m = _sync(service, [_processo("ALH.0001/26")])
+
+    assert (m["alterados"], m["inalterados"]) == (0, 1)
+    dashboard.assert_called_once_with(["VDM.0002/26"])
+
+
+def test_sync_invalida_snapshot_dos_processos_removidos(service):
+    _sync(service, [_processo("ALH.0001/26"), _processo("VDM.0002/26")])
+
+    with patch.object(ProcessoKanbanService, "_atualizar_dashboard_snapshot"), \
+         patch("services.processo_snapshot_service.invalidar_snapshots") as invalidar:
+        _sync(service, [_processo("ALH.0001/26")])
+
+    invalidar.assert_called_once_with(["VDM.0002/26"])
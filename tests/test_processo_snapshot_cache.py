@@ -0,0 +1,165 @@
+"""
+Testes do carregamento do `ProcessoSnapshotService`: seções em paralelo, pedidos simultâneos
+do mesmo processo numa única carga e cache de TTL curto invalidado por sync/classificação.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.processo_snapshot_service as snap
+import utils.sql_server_adapter as sql_server_adapter
+
+
+class _AdapterFalso:
+    def __init__(self, barreira=None, atraso=0.0):
+        self.queries = []
+        self.barreira = barreira
+        self.atraso = atraso
+        self._lock = threading.Lock()
+
+    def execute_query(self, sql, database=None, params=None, notificar_erro=False):
+        with self._lock:
+            self.queries.append(sql)
+        if self.barreira is not None:
+            self.barreira.wait(timeout=5)  # só passa se as 5 seções estiverem em voo juntas
+        if self.atraso:
+            time.sleep(self.atraso)
+        if "PROCESSO_IMPORTACAO" in sql:
+            return {"success": True, "data": [{"numero_processo": "ALH.0001/25", "numero_di": "25/0001"}]}
+        if "DOCUMENTO_ADUANEIRO" in sql:
+            return {"success": True, "data": [{"tipo_documento": "DI", "numero_documento": "25/0001"}]}
+        return {"success": True, "data": []}
+
+    def capas(self):
+        return [q for q in self.queries if "PROCESSO_IMPORTACAO" in q]
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo(monkeypatch):
+    monkeypatch.setattr(snap, "_cache", snap.OrderedDict())
+    monkeypatch.setattr(snap, "_versoes", {})
+    monkeypatch.setattr(snap, "_locks", {})
+    monkeypatch.setattr(snap, "_locks_em_uso", {})
+
+
+def _usar(monkeypatch, adapter):
+    monkeypatch.setattr(sql_server_adapter, "get_sql_adapter", lambda: adapter)
+    return adapter
+
+
+def test_secoes_consultadas_em_paralelo(monkeypatch):
+    adapter = _usar(monkeypatch, _AdapterFalso(barreira=threading.Barrier(5)))
+    r = snap.ProcessoSnapshotService().obter_snapshot("alh.0001/25")
+    assert r["sucesso"]
+    assert len(adapter.queries) == 5
+    assert r["dados"]["completude"]["documentos_total"] == 1
+    assert r["dados"]["processo"]["numero_di"] == "25/0001"
+
+
+def test_cache_ttl_e_invalidacao(monkeypatch):
+    adapter = _usar(monkeypatch, _AdapterFalso())
+    svc = snap.ProcessoSnapshotService()
+    primeiro = svc.obter_snapshot("ALH.0001/25")
+    primeiro["dados"]["documentos"].clear()  # quem chama pode alterar o dict sem sujar o cache
+
+    segundo = svc.obter_snapshot("ALH.0001/25")
+    assert len(adapter.queries) == 5
+    assert len(segundo["dados"]["documentos"]) == 1
+
+    snap.invalidar_snapshots(["alh.0001/25"])
+    svc.obter_snapshot("ALH.0001/25")
+    assert len(adapter.queries) == 10
+
+    svc.obter_snapshot("ALH.0001/25", usar_cache=False)
+    assert len(adapter.queries) == 15
+
+    monkeypatch.setattr(snap, "PROCESSO_SNAPSHOT_TTL_SEGUNDOS", 0)
+    time.sleep(0.01)
+    svc.obter_snapshot("ALH.0001/25")
+    assert len(adapter.queries) == 20
+
+
+def test_pedidos_simultaneos_compartilham_uma_carga(monkeypatch):
+    adapter = _usar(monkeypatch, _AdapterFalso(atraso=0.05))
+    resultados = []
+
+    def pedir():
+        resultados.append(snap.ProcessoSnapshotService().obter_snapshot("ALH.0001/25"))
+
+    threads = [threading.Thread(target=pedir) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(resultados) == 4 and all(r["sucesso"] for r in resultados)
+    assert len(adapter.capas()) == 1
+
+
+def test_invalidacao_durante_a_carga_nao_grava_snapshot_velho(monkeypatch):
+    adapter = _AdapterFalso()
+    original = adapter.execute_query
+
+    def com_sync_no_meio(sql, database=None, params=None, notificar_erro=False):
+        if "PROCESSO_IMPORTACAO" in sql and len(adapter.capas()) == 0:
+            snap.invalidar_snapshots()  # ex.: sync do Kanban terminou durante a leitura
+        return original(sql, database=database, params=params)
+
+    monkeypatch.setattr(adapter, "execute_query", com_sync_no_meio)
+    _usar(monkeypatch, adapter)
+    svc = snap.ProcessoSnapshotService()
+    svc.obter_snapshot("ALH.0001/25")
+    svc.obter_snapshot("ALH.0001/25")
+    assert len(adapter.capas()) == 2
+
+
+def test_locks_de_processos_fora_do_cache_sao_descartados(monkeypatch):
+    _usar(monkeypatch, _AdapterFalso())
+    monkeypatch.setattr(snap, "PROCESSO_SNAPSHOT_CACHE_MAX", 2)
+    svc = snap.ProcessoSnapshotService()
+    for i in range(1, 6):
+        svc.obter_snapshot(f"ALH.000{i}/25")
+
+    assert list(snap._cache) == ["ALH.0004/25", "ALH.0005/25"]
+    assert set(snap._locks) == {"ALH.0004/25", "ALH.0005/25"}
+
+    snap.invalidar_snapshots(["ALH.0004/25"])
+    assert set(snap._locks) == {"ALH.0005/25"} and "ALH.0004/25" not in snap._versoes
+
+
+def test_lock_entregue_e_ainda_nao_adquirido_nao_e_descartado():
+    primeiro = snap._lock_do_processo("ALH.0001/25")
+    primeiro.__enter__()
+    entrou, libera = threading.Event(), threading.Event()
+
+    def segundo_pedido():
+        with snap._lock_do_processo("ALH.0001/25"):
+            entrou.set()
+            libera.wait(5)
+
+    t = threading.Thread(target=segundo_pedido)
+    t.start()
+    while snap._locks_em_uso.get("ALH.0001/25") != 2:
+        time.sleep(0.001)
+    lock = snap._locks["ALH.0001/25"]
+
+    # Primeiro pedido termina; o segundo ainda pode não ter adquirido o lock
+    primeiro.__exit__(None, None, None)
+    snap._descartar_locks(["ALH.0001/25"])
+    assert snap._locks.get("ALH.0001/25") is lock
+
+    assert entrou.wait(5)
+    assert lock.locked()
+    libera.set()
+    t.join(5)
+
+    snap._descartar_locks(["ALH.0001/25"])
+    assert snap._locks == {} and snap._locks_em_uso == {}
@@ -0,0 +1,199 @@
+"""
+Testes da projeção de campos do JSON do Kanban em colunas (`services.processos_kanban_projecao`)
+e das listagens do dashboard que passaram a ler essas colunas.
+"""
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import db_manager
+import services.database_service as database_service
+from services.processo_kanban_service import ProcessoKanbanService
+from services.processos_kanban_projecao import PROJECAO_VERSAO, projetar, reprojetar_pendentes
+from services.processos_situacao_categoria_repository import listar_processos_por_categoria_e_situacao
+
+
+def _linha(**campos):
+    dados = campos.pop("dados", None)
+    base = {
+        "processo_referencia": "ALH.0001/26",
+        "numero_di": None,
+        "numero_duimp": None,
+        "situacao_ce": None,
+        "situacao_di": None,
+        "situacao_entrega": None,
+        "pendencia_icms": None,
+        "pendencia_frete": 0,
+        "dados_completos_json": json.dumps(dados) if dados is not None else None,
+    }
+    base.update(campos)
+    return base
+
+
+def test_prioridade_das_pendencias():
+    dados = {"ce": {"bloqueios": ["BLOQ-1"], "pendencia_afrmm": True}, "lpco": [{"situacao": "Em análise", "LPCO": "L1"}]}
+    assert projetar(_linha(dados=dados))["pendencia_tipo"] == "Bloqueio CE"
+
+    dados.pop("ce")
+    p = projetar(_linha(dados=dados, pendencia_frete=1))
+    assert p["pendencia_tipo"] == "LPCO"
+    assert p["pendencia_descricao"] == "LPCO L1 não deferido - Situação: Em análise"
+
+    p = projetar(_linha(dados={"ce": [{"pendencia_afrmm": "true"}]}, pendencia_frete=1))
+    assert (p["pendencia_tipo"], p["pendencia_descricao"]) == ("AFRMM", "Pendente de pagamento")
+
+    assert projetar(_linha(pendencia_frete=1))["pendencia_tipo"] == "Frete"
+    assert projetar(_linha(dados={"lpco": {"situacao": "Deferido"}}))["pendencia_tipo"] is None
+
+
+def test_flags_de_afrmm_lpco_e_bloqueio_independem_da_prioridade():
+    dados = {"ce": {"bloqueios": ["BLOQ-1"], "pendencia_afrmm": True}, "lpco": [{"situacao": "Em análise", "LPCO": "L1"}]}
+    p = projetar(_linha(dados=dados))
+    assert (p["pendencia_afrmm"], p["pendencia_lpco"], p["bloqueio"]) == (1, 1, 1)
+
+    p = projetar(_linha(dados={"ce": {"bloqueios_baixados": ["B"], "cargaBloqueada": "false"}, "lpco": {"situacao": "Deferido"}}))
+    assert (p["pendencia_afrmm"], p["pendencia_lpco"], p["bloqueio"]) == (0, 0, 0)
+    assert projetar(_linha(dados={"ce": [{"carga_bloqueada": True}]}))["bloqueio"] == 1
+    # Mesmo critério de "verdadeiro" da listagem por categoria (fora do Kanban)
+    p = projetar(_linha(dados={"ce": {"pendencia_afrmm": "sim", "bloqueio_impede_despacho": "1"}}))
+    assert (p["pendencia_afrmm"], p["bloqueio"]) == (1, 1)
+
+
+def test_icms_mantem_regra_herdada():
+    # Mesmo resultado da implementação anterior de `obter_pendencias_ativas` (ver `_icms_valido`)
+    desembaracada = _linha(numero_di="2601234567", situacao_di="DESEMBARACADA", pendencia_icms="PENDENTE")
+    assert projetar(desembaracada)["pendencia_tipo"] is None
+    assert projetar(dict(desembaracada, pendencia_frete=1))["pendencia_tipo"] == "Frete"
+
+
+def test_di_em_analise_e_exclusao_por_entrega():
+    dados = {"di": [{"numero_di": "2601234567", "situacao_di": "EM ANALISE", "canal": "VERDE", "data_registro": "2026-10-01"}]}
+    p = projetar(_linha(numero_di="2601234567", dados=dados))
+    assert p["di_em_analise"] == 1
+    assert (p["di_situacao"], p["di_canal"], p["di_data_registro"]) == ("EM ANALISE", "VERDE", "2026-10-01")
+
+    liberada = _linha(numero_di="2601234567", situacao_di="DESEMBARACADA", situacao_entrega="ENTREGA AUTORIZADA")
+    assert projetar(liberada)["di_em_analise"] == 0
+    assert projetar(_linha(numero_di="2601234567", situacao_ce="ENTREGUE"))["di_em_analise"] == 0
+    assert projetar(_linha(numero_di="/       -"))["di_em_analise"] == 0
+
+
+def test_duimp_em_analise_exige_situacao_do_json():
+    dados = {"canal": "VERDE", "duimp": [{"numero": "26BR1", "situacao_duimp": "EM_ANALISE", "versao": "2"}]}
+    p = projetar(_linha(numero_duimp="26BR1", dados=dados))
+    assert (p["duimp_em_analise"], p["duimp_situacao"], p["duimp_versao"], p["duimp_canal"]) == (1, "EM_ANALISE", "2", "VERDE")
+
+    assert projetar(_linha(numero_duimp="26BR2", dados=dados))["duimp_em_analise"] == 0
+    assert projetar(_linha(numero_duimp="26BR1", numero_di="2601234567", dados=dados))["duimp_em_analise"] == 0
+
+
+@pytest.fixture
+def kanban_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "kanban.db")
+    monkeypatch.setattr(ProcessoKanbanService, "_db_inicializado", False)
+    db_manager.init_db()
+    return ProcessoKanbanService()
+
+
+def _inserir_sem_projecao(linha):
+    conn = database_service.get_db_connection()
+    try:
+        colunas = ", ".join(linha)
+        conn.execute(
+            f"INSERT INTO processos_kanban ({colunas}) VALUES ({', '.join('?' * len(linha))})",
+            tuple(linha.values()),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_backfill_e_listagens_sem_parse_de_json(kanban_db):
+    dados_di = {"di": {"numero_di": "2601234567", "situacao_di": "EM ANALISE", "canal": "AMARELO"}}
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0001/26", modal="Marítimo", pendencia_frete=1))
+    _inserir_sem_projecao(_linha(processo_referencia="VDM.0002/26", numero_di="2601234567", dados=dados_di))
+
+    conn = database_service.get_db_connection()
+    try:
+        assert reprojetar_pendentes(conn.cursor()) == 2
+        assert reprojetar_pendentes(conn.cursor()) == 0  # versão atual: nada a refazer
+        conn.commit()
+    finally:
+        conn.close()
+
+    pendencias = db_manager.obter_pendencias_ativas("alh", "Marítimo")
+    assert [(p["processo_referencia"], p["tipo_pendencia"]) for p in pendencias] == [("ALH.0001/26", "Frete")]
+    assert db_manager.obter_pendencias_ativas("VDM") == []
+
+    dis = db_manager.obter_dis_em_analise()
+    assert [(d["processo_referencia"], d["canal_di"]) for d in dis] == [("VDM.0002/26", "AMARELO")]
+
+
+def test_sync_do_kanban_grava_projecao(kanban_db):
+    processo = {
+        "numeroPedido": "ALH.0003/26",
+        "etapaKanban": "EM TRANSITO",
+        "modal": "Marítimo",
+        "ce": {"bloqueios": ["BLOQUEIO SISCOMEX"]},
+    }
+    with patch.object(ProcessoKanbanService, "_buscar_api", return_value=[processo]), \
+         patch.object(ProcessoKanbanService, "_detectar_mudancas"), \
+         patch.object(ProcessoKanbanService, "_efeitos_pos_salvar"):
+        assert kanban_db.sincronizar(incremental=True) is True
+
+    conn = database_service.get_db_connection()
+    try:
+        row = conn.execute(
+            "SELECT pendencia_tipo, projecao_versao FROM processos_kanban WHERE processo_referencia = ?",
+            ("ALH.0003/26",),
+        ).fetchone()
+    finally:
+        conn.close()
+    assert tuple(row) == ("Bloqueio CE", PROJECAO_VERSAO)
+
+
+def test_listagem_por_categoria_filtra_pelas_colunas_projetadas(kanban_db):
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0001/26", numero_ce="CE1", situacao_ce="ARMAZENADA", pendencia_frete=1))
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0002/26", numero_ce="CE2", dados={"ce": {"pendencia_afrmm": True}}))
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0003/26", numero_ce="CE3", dados={"lpco": {"situacao": "Em análise"}}))
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0004/26", numero_ce="CE4", dados={"ce": {"bloqueios": ["B1"]}}))
+    _inserir_sem_projecao(_linha(processo_referencia="ALH.0005/26", numero_ce="CE5", situacao_ce="MANIFESTADA"))
+    conn = database_service.get_db_connection()
+    try:
+        reprojetar_pendentes(conn.cursor())
+        # Bloqueio só no cache do CE (ex.: consulta avulsa depois do último sync)
+        conn.execute(
+            "INSERT INTO ces_cache (numero_ce, carga_bloqueada, json_completo) VALUES (?, 1, '{}')", ("CE5",)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    fora_do_kanban = []
+
+    def listar(**filtros):
+        return listar_processos_por_categoria_e_situacao(
+            "ALH",
+            listar_processos_por_categoria=lambda categoria, limit: [f"ALH.000{i}/26" for i in range(1, 7)],
+            obter_dados_documentos_processo=lambda ref, usar_sql_server=False: fora_do_kanban.append(ref) or {},
+            buscar_di_cache=lambda **_: None,
+            carregar_projecao_kanban=db_manager.carregar_projecao_kanban,
+            **filtros,
+        )
+
+    assert [p["processo_referencia"] for p in listar(filtro_pendencias=True)] == ["ALH.0001/26", "ALH.0002/26", "ALH.0003/26"]
+    assert [p["processo_referencia"] for p in listar(filtro_bloqueio=True)] == ["ALH.0004/26", "ALH.0005/26"]
+
+    itens = listar(situacao_filtro="armazenada")
+    assert [p["processo_referencia"] for p in itens] == ["ALH.0001/26"]
+    assert itens[0]["ce"]["pendencia_frete"] is True and itens[0]["ce"]["pendencia_afrmm"] is False
+    # Só o processo que não está no Kanban passa pelo caminho antigo
+    assert set(fora_do_kanban) == {"ALH.0006/26"}
@@ -0,0 +1,69 @@
+"""
+Testes da montagem em segmentos do PromptBuilder (prefixo estável para cache de prompt).
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+from services.prompt_builder import (
+    PromptBuilder,
+    SYSTEM_PROMPT_NUCLEO,
+    SYSTEM_PROMPT_POLITICA_TOOLS,
+    segmentos_estaticos,
+)
+
+
+def test_prefixo_estatico_identico_entre_usuarios():
+    pb = PromptBuilder()
+    a = pb.build_system_prompt("\n\n👤 O nome do usuário é **Ana**", regras_aprendidas="\nREGRA 1")
+    b = pb.build_system_prompt("\n\n👤 O nome do usuário é **Bruno**", regras_aprendidas="\nREGRA 1")
+
+    prefixo = SYSTEM_PROMPT_NUCLEO + SYSTEM_PROMPT_POLITICA_TOOLS + "\nREGRA 1"
+    assert a.startswith(prefixo) and b.startswith(prefixo)
+    assert a.endswith("**Ana**") and b.endswith("**Bruno**")
+    assert "{{" not in SYSTEM_PROMPT_POLITICA_TOOLS and '[REPORT_META:{"id"' in SYSTEM_PROMPT_POLITICA_TOOLS
+
+
+def test_segmentos_estaticos_memoizados():
+    assert segmentos_estaticos() is segmentos_estaticos()
+    nucleo, politica = segmentos_estaticos()
+    nucleo.contar_tokens()
+    assert segmentos_estaticos()[0].tokens == nucleo.tokens > 0
+    assert nucleo.cacheavel and politica.cacheavel
+
+
+def test_user_prompt_mensagem_por_ultimo():
+    pb = PromptBuilder()
+    user = pb.build_user_prompt(
+        mensagem="como está o DMD.0073/25?",
+        contexto_str="\n\n📋 CONTEXTO DMD.0073/25",
+        historico_str="\n\n📜 Histórico",
+        acao_info={"acao": "consultar_status_processo"},
+        contexto_sessao="\n\n🧠 Sessão",
+    )
+
+    assert user.index("Sessão") < user.index("CONTEXTO") < user.index("Histórico") < user.index("DMD.0073/25?")
+    assert user.rstrip().endswith("AÇÃO SUGERIDA (sistema): consultar_status_processo")
+    assert pb.build_user_prompt("oi", "", "") == "Usuário: oi\n"
+
+
+def test_metricas_por_segmento_e_prefixo_cacheavel():
+    montagem = PromptBuilder().montar(
+        saudacao_personalizada="\n\n👤 Ana",
+        regras_aprendidas="\nREGRA 1",
+        mensagem="oi",
+        historico_str="\n\n📜 Histórico",
+    )
+    m = montagem.metricas()
+
+    assert list(m["tokens_por_segmento"]) == [
+        "nucleo", "politica_tools", "regras_aprendidas", "perfil_usuario", "historico", "mensagem"
+    ]
+    esperado = sum(m["tokens_por_segmento"][k] for k in ("nucleo", "politica_tools", "regras_aprendidas"))
+    assert m["prefixo_cacheavel_tokens"] == esperado
+    assert m["total_tokens"] == sum(m["tokens_por_segmento"].values())
+    assert 0.9 < m["prefixo_cacheavel_ratio"] < 1
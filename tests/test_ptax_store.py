@@ -0,0 +1,173 @@
+"""
+Testes do store local de PTAX (`services.ptax_store`) usado por `utils.ptax_bcb`:
+calendário de dias úteis, download por mês, leitura de datas passadas sem rede e aquecimento.
+"""
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+import utils.ptax_bcb as ptax_bcb
+from services import ptax_store
+
+
+class _Resposta:
+    def __init__(self, valores):
+        self._valores = valores
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"value": self._valores}
+
+
+class _BCBFalso:
+    """CotacaoMoedaPeriodo falso: Abertura, Intermediário e Fechamento em cada dia útil."""
+
+    def __init__(self, sem_ptax=()):
+        self.urls = []
+        self.sem_ptax = set(sem_ptax)
+
+    @staticmethod
+    def _data(url, parametro):
+        mes, dia, ano = re.search(rf"@{parametro}='(\d\d)-(\d\d)-(\d{{4}})'", url).groups()
+        return date(int(ano), int(mes), int(dia))
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        inicio, fim = self._data(url, "dataInicial"), self._data(url, "dataFinalCotacao")
+        valores = []
+        d = inicio
+        while d <= fim:
+            if d.weekday() < 5 and d not in ptax_store.feriados_nacionais(d.year) and d not in self.sem_ptax:
+                base = 5 + d.day / 100
+                for hora, tipo, delta in (("10:08", "Abertura", 0.0), ("12:06", "Intermediário", 0.001), ("13:05", "Fechamento", 0.002)):
+                    valores.append(
+                        {
+                            "paridadeCompra": 1.0,
+                            "paridadeVenda": 1.0,
+                            "cotacaoCompra": base + delta,
+                            "cotacaoVenda": base + delta + 0.0006,
+                            "dataHoraCotacao": f"{d.isoformat()} {hora}:27.123",
+                            "tipoBoletim": tipo,
+                        }
+                    )
+            d += timedelta(days=1)
+        return _Resposta(valores)
+
+
+@pytest.fixture
+def bcb(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "ptax.db")
+    monkeypatch.setattr(ptax_store, "PTAX_STORE_ENABLED", True)
+    monkeypatch.setattr(ptax_store, "_tabelas_ok", False)
+    monkeypatch.setattr(ptax_store, "_nao_uteis", {})
+    falso = _BCBFalso()
+    monkeypatch.setattr(ptax_bcb.requests, "get", falso.get)
+    return falso
+
+
+def test_calendario_feriados_moveis_e_fixos(bcb):
+    assert ptax_store._pascoa(2025) == date(2025, 4, 20)
+    assert ptax_store._pascoa(2026) == date(2026, 4, 5)
+    feriados = ptax_store.feriados_nacionais(2025)
+    assert feriados[date(2025, 3, 3)] == feriados[date(2025, 3, 4)] == "Carnaval"
+    assert feriados[date(2025, 4, 18)] == "Sexta-feira Santa"
+    assert feriados[date(2025, 6, 19)] == "Corpus Christi"
+    assert not ptax_store.eh_dia_util(date(2025, 11, 20))  # Consciência Negra (desde 2024)
+    assert ptax_store.eh_dia_util(date(2023, 11, 20))
+    assert not ptax_store.eh_dia_util(date(2025, 12, 13))  # sábado
+    assert ptax_store.eh_dia_util(date(2025, 12, 15))
+
+
+def test_data_passada_baixa_mes_uma_vez_e_depois_so_sqlite(bcb):
+    r = ptax_bcb.obter_ptax_dolar("12-15-2025")
+    assert r["sucesso"] and r["tipo_boletim"] == "Fechamento"
+    assert r["cotacao_compra"] == pytest.approx(5.152)
+    assert r["data_cotacao_real"] == "12-15-2025"
+    assert len(bcb.urls) == 1
+    assert "@dataInicial='12-01-2025'&@dataFinalCotacao='12-31-2025'" in bcb.urls[0]
+
+    # Mesmo mês, fim de semana e feriado: tudo do store
+    assert ptax_bcb.obter_ptax_dolar("12-15-2025")["cotacao_media"] == r["cotacao_media"]
+    sabado = ptax_bcb.obter_ptax_dolar("12-13-2025")
+    assert sabado["data_cotacao_real"] == "12-12-2025"
+    assert ptax_bcb.obter_ptax_dolar("12-25-2025")["data_cotacao_real"] == "12-24-2025"
+    anterior = ptax_bcb.obter_ptax_dia_util_anterior("12-15-2025")
+    assert anterior["data_util_encontrada"] == "12-12-2025"
+    assert anterior["cotacao_media"] == sabado["cotacao_media"]
+    assert len(bcb.urls) == 1
+
+    # Sexta-feira Santa: último dia útil anterior (antes era "nenhuma cotação encontrada")
+    assert ptax_bcb.obter_ptax_dolar("04-18-2025")["data_cotacao_real"] == "04-17-2025"
+    assert len(bcb.urls) == 2
+
+
+def test_dia_util_sem_ptax_entra_no_calendario(bcb):
+    bcb.sem_ptax = {date(2025, 12, 24)}
+    assert ptax_store.eh_dia_util(date(2025, 12, 24))
+    r = ptax_bcb.obter_ptax_dolar("12-24-2025")
+    assert r["sucesso"] and r["data_cotacao_real"] == "12-23-2025"
+    assert not ptax_store.eh_dia_util(date(2025, 12, 24))
+
+    # Persistido: vale para o próximo processo (cache em memória zerado)
+    ptax_store._nao_uteis.clear()
+    assert ptax_store.dias_nao_uteis(2025)[date(2025, 12, 24)] == ptax_store.FERIADO_SEM_PTAX
+    assert len(bcb.urls) == 1
+
+
+def test_periodo_le_do_store(bcb):
+    periodo = ptax_bcb.obter_ptax_periodo("11-27-2025", "12-02-2025")
+    assert [p["data_cotacao"][:10] for p in periodo] == ["2025-11-27", "2025-11-28", "2025-12-01", "2025-12-02"]
+    assert periodo[0]["cotacao_compra"] == pytest.approx(5.272)
+    assert len(bcb.urls) == 2  # um download por mês
+    assert ptax_bcb.obter_ptax_periodo("11-27-2025", "12-02-2025") == periodo
+    assert len(bcb.urls) == 2
+
+
+def test_aquecimento_baixa_so_meses_incompletos(bcb):
+    hoje = date.today()
+    mes_passado = (hoje.replace(day=1) - timedelta(days=1)).replace(day=15)
+    ptax_bcb.obter_ptax_dolar(mes_passado.strftime("%m-%d-%Y"))
+    bcb.urls.clear()
+
+    resultado = ptax_bcb.aquecer_ptax(meses=3)
+    assert resultado["meses_verificados"] == 3 and resultado["erros"] == []
+    esperados = 2 if hoje.day > 1 else 1  # mês corrente só tem dias fechados a partir do dia 2
+    assert len(bcb.urls) == esperados
+
+    assert ptax_bcb.aquecer_ptax(meses=3)["meses_baixados"] == 0
+    assert len(bcb.urls) == esperados
+
+
+def test_resposta_vazia_do_bcb_nao_vira_dia_sem_ptax(bcb, monkeypatch):
+    def vazio(url, timeout=None):  # 200 com `value` vazio (instabilidade do OData)
+        bcb.urls.append(url)
+        return _Resposta([])
+
+    monkeypatch.setattr(ptax_bcb.requests, "get", vazio)
+    ptax_bcb.obter_ptax_dolar("12-15-2025")
+    assert ptax_store.dias_pendentes("USD", date(2025, 12, 1), date(2025, 12, 31))
+    assert ptax_store.eh_dia_util(date(2025, 12, 15))
+
+    # BCB volta: o mês é baixado de novo e a data é respondida
+    monkeypatch.setattr(ptax_bcb.requests, "get", bcb.get)
+    r = ptax_bcb.obter_ptax_dolar("12-15-2025")
+    assert r["sucesso"] and r["data_cotacao_real"] == "12-15-2025"
+
+
+def test_resposta_cortada_marca_so_ate_o_ultimo_boletim(bcb):
+    bcb.sem_ptax = {date(2025, 12, d) for d in range(22, 32)}
+    ptax_bcb.obter_ptax_dolar("12-15-2025")
+    pendentes = ptax_store.dias_pendentes("USD", date(2025, 12, 1), date(2025, 12, 31))
+    assert pendentes[0] == date(2025, 12, 20) and pendentes[-1] == date(2025, 12, 31)
+    assert ptax_store.eh_dia_util(date(2025, 12, 22))
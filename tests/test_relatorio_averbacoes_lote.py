@@ -0,0 +1,161 @@
+"""
+Testes do pipeline em lote do relatório de averbações (`services.relatorio_averbacoes_service`):
+DIs do mês numa query `IN (...)`, API só para faltantes (concorrência limitada), Excel write-only
+na ordem dos processos e progresso reportado ao chamador.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+import services.relatorio_averbacoes_service as averbacoes
+from services.relatorio_averbacoes_service import RelatorioAverbacoesService
+
+
+class _SqlFalso:
+    def __init__(self, dis_no_sql, falhar_lote=False):
+        self.dis_no_sql = dis_no_sql  # {numeroDi: (dadosDiId, custo_usd)}
+        self.falhar_lote = falhar_lote
+        self.queries = []
+
+    def execute_query(self, query, database=None, params=None, notificar_erro=False):
+        query = " ".join(query.split())
+        self.queries.append((query, list(params or [])))
+        if "ddg.numeroDi IN" in query:
+            if self.falhar_lote:
+                return {"success": False, "error": "timeout"}
+            return {"success": True, "data": [self._linha(n) for n in params if n in self.dis_no_sql]}
+        if "SELECT TOP 1 ddg.numeroDi" in query:
+            return {"success": True, "data": [self._linha(n) for n in params if n in self.dis_no_sql][:1]}
+        if "SELECT TOP 1 diRoot.dadosDiId" in query:
+            return {"success": True, "data": [{"dadosDiId": self.dis_no_sql[n][0]} for n in params if n in self.dis_no_sql][:1]}
+        if "dp.rootDiId IN" in query or "dp.rootDiId = ?" in query:
+            return {
+                "success": True,
+                "data": [{"rootDiId": i, "codigoReceita": "0086", "valorTotal": "500"} for i in params],
+            }
+        raise AssertionError(f"query inesperada: {query}")
+
+    def _linha(self, numero_di):
+        dados_di_id, custo = self.dis_no_sql[numero_di]
+        return {
+            "dadosDiId": dados_di_id,
+            "numeroDi": numero_di,
+            "nomeVeiculo": f"NAVIO {numero_di}",
+            "codigoViaTransporte": "1",
+            "frete_valorTotalDolares": 100,
+            "valorMercadoriaEmbarque_totalDolares": custo,
+        }
+
+
+class _ApiFalsa:
+    def __init__(self):
+        self.chamadas = []
+        self.ativas = 0
+        self.max_ativas = 0
+        self._lock = threading.Lock()
+
+    def consultar(self, numero_di):
+        with self._lock:
+            self.chamadas.append(numero_di)
+            self.ativas += 1
+            self.max_ativas = max(self.max_ativas, self.ativas)
+        time.sleep(0.05)
+        with self._lock:
+            self.ativas -= 1
+        if numero_di.endswith("66"):
+            return 404, None
+        return 200, {"numeroDi": numero_di, "valorMercadoriaEmbarque": {"totalDolares": "1000"}, "pagamentos": []}
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    processos = [
+        {"processo_referencia": f"BND.00{i}/25", "numero_di": f"25/000000{i}-{i}", "data_registro": "2025-06-10"}
+        for i in range(1, 7)
+    ]
+    sql = _SqlFalso({"2500000011": (11, 2000), "2500000033": (33, 3000), "2500000055": (55, 5000)})
+    api = _ApiFalsa()
+
+    import services.di_pdf_service as di_pdf_service
+    import services.sql_server_processo_schema as processo_schema
+    import utils.ptax_bcb as ptax_bcb
+    import utils.sql_server_adapter as sql_server_adapter
+
+    monkeypatch.setattr(sql_server_adapter, "get_sql_adapter", lambda: sql)
+    monkeypatch.setattr(di_pdf_service.DiPdfService, "__init__", lambda self: None)
+    monkeypatch.setattr(di_pdf_service.DiPdfService, "consultar_di_integracomex", lambda self, n: api.consultar(n))
+    monkeypatch.setattr(ptax_bcb, "obter_ptax_dolar", lambda data: {"sucesso": True, "cotacao_media": 5.0})
+    monkeypatch.setattr(processo_schema, "buscar_processo_consolidado_sql_server", lambda ref: None)
+    monkeypatch.setattr(RelatorioAverbacoesService, "_buscar_processos_com_di_no_mes", lambda self, m, a, c: processos)
+    monkeypatch.setattr(averbacoes, "RELATORIO_AVERBACOES_MAX_WORKERS", 2)
+    monkeypatch.chdir(tmp_path)
+    return sql, api
+
+
+def _linhas_excel(caminho):
+    ws = openpyxl.load_workbook(caminho).active
+    return [row for row in ws.iter_rows(min_row=5, values_only=True)]
+
+
+def test_dis_em_lote_api_so_para_faltantes(ambiente):
+    sql, api = ambiente
+    eventos = []
+    resultado = RelatorioAverbacoesService().gerar_relatorio_averbacoes("2025-06", categoria="BND", progresso=eventos.append)
+
+    assert resultado["sucesso"] and resultado["total_processos"] == 5
+    assert resultado["erros"] == ["BND.006/25: Não foi possível extrair dados da DI"]
+
+    # 1 query de DIs + 1 de pagamentos, independente do número de processos
+    assert len(sql.queries) == 2
+    assert sorted(sql.queries[0][1]) == sorted(
+        [f"25000000{i}{i}" for i in range(1, 7)] + [f"25/000000{i}-{i}" for i in range(1, 7)]
+    )
+    assert sorted(sql.queries[1][1]) == [11, 33, 55]
+
+    # API bilhetada só para as DIs fora do SQL Server, no máximo 2 por vez
+    assert sorted(api.chamadas) == ["2500000022", "2500000044", "2500000066"]
+    assert api.max_ativas <= 2
+
+    linhas = _linhas_excel(resultado["caminho_arquivo"])
+    assert linhas[0][0] == "Averbação provisória"
+    assert [l[15] for l in linhas[1:]] == ["BND.001/25", "BND.002/25", "BND.003/25", "BND.004/25", "BND.005/25"]
+    assert linhas[1][8] == "NAVIO 2500000011" and linhas[1][9] == 2000
+    assert linhas[1][13] == pytest.approx(100.0)  # 500 BRL / PTAX 5.0
+
+    assert eventos[0]["etapa"] == "buscando_processos"
+    processando = [e for e in eventos if e["etapa"] == "processando"]
+    assert [e["processados"] for e in processando] == [1, 2, 3, 4, 5, 6]
+    assert eventos[-1] == {"etapa": "concluido", "processados": 6, "total": 6, "processo_referencia": None}
+
+
+def test_falha_do_lote_cai_na_busca_individual(ambiente):
+    sql, api = ambiente
+    sql.falhar_lote = True
+    resultado = RelatorioAverbacoesService().gerar_relatorio_averbacoes("06", ano=2025)
+
+    assert resultado["sucesso"] and resultado["total_processos"] == 5
+    # DIs do SQL Server não vão para a API bilhetada mesmo com o lote falhando
+    assert sorted(api.chamadas) == ["2500000022", "2500000044", "2500000066"]
+
+
+def test_status_do_job_em_background(ambiente):
+    job_id = averbacoes.iniciar_relatorio_averbacoes_em_background("2025-06", categoria="BND")
+    for _ in range(200):
+        job = averbacoes.obter_status_relatorio_averbacoes(job_id)
+        if job["status"] != "executando":
+            break
+        time.sleep(0.02)
+    assert job["status"] == "concluido"
+    assert job["processados"] == job["total"] == 6
+    assert job["resultado"]["total_processos"] == 5
+    assert averbacoes.obter_status_relatorio_averbacoes("desconhecido") is None
@@ -0,0 +1,180 @@
+"""
+Testes da materialização em lote de VALOR_MERCADORIA (`services.relatorio_fob_service`):
+staging + MERGE único numa transação, fallback em blocos parametrizados e reuso do ano fechado.
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+import services.relatorio_fob_service as fob
+import utils.sql_server_adapter as sql_server_adapter
+
+
+class _SqlFalso:
+    """Guarda em memória o que o MERGE gravaria em VALOR_MERCADORIA."""
+
+    def __init__(self, com_transacao=True):
+        self.tabela = {}
+        self.transacoes = []
+        self.queries = []
+        self.com_transacao = com_transacao
+
+    def _gravar(self, linhas):
+        for linha in linhas:
+            self.tabela[tuple(linha[:5])] = dict(zip(fob._COLUNAS_VALOR, linha))
+
+    def execute_transaction(self, etapas, database=None, notificar_erro=False):
+        if not self.com_transacao:  # como o adapter no Node.js
+            return {"success": False, "error": "Transação multi-comando disponível apenas via pyodbc."}
+        self.transacoes.append(etapas)
+        for sql, linhas in etapas:
+            if linhas is not None:
+                self._gravar(linhas)
+        return {"success": True}
+
+    def execute_query(self, query, database=None, params=None, notificar_erro=False):
+        query = " ".join(query.split())
+        self.queries.append((query, list(params or [])))
+        if query.startswith("MERGE"):
+            n = len(fob._COLUNAS_VALOR)
+            self._gravar([params[i:i + n] for i in range(0, len(params), n)])
+            return {"success": True, "data": []}
+        if "FROM mAIke_assistente.dbo.VALOR_MERCADORIA" in query:
+            prefixo = params[3].rstrip("%")
+            por_processo = {}
+            for linha in self.tabela.values():
+                if linha["processo_referencia"].startswith(prefixo):
+                    por_processo[(linha["processo_referencia"], linha["tipo_documento"])] = linha
+            return {"success": True, "data": list(por_processo.values())}
+        raise AssertionError(f"query inesperada: {query}")
+
+
+def _di(numero, fob_brl):
+    return {
+        "numero_processo": numero,
+        "numero_di": f"24/{numero[-6:-3]}",
+        "data_desembaraco": "2024-05-02 10:00:00",
+        "vmld_usd": fob_brl / 5 + 20,
+        "vmld_brl": fob_brl + 100,
+        "frete_usd": 20.0,
+        "frete_brl": 100.0,
+        "seguro_usd": 0.0,
+        "seguro_brl": 0.0,
+        "fob_usd": fob_brl / 5,
+        "fob_brl": fob_brl,
+        "tipo_documento": "DI",
+        "incoterm": "FOB",
+        "aviso": None,
+    }
+
+
+def _duimp(numero, fob_brl):
+    return {
+        "numero_processo": numero,
+        "numero_duimp": f"24BR{numero[-6:-3]}",
+        "data_desembaraco": "2024-08-09",
+        "fob_usd": fob_brl / 5,
+        "fob_brl": fob_brl,
+        "frete_brl": 0.0,
+        "tipo_documento": "DUIMP",
+        "incoterm": "FOB",
+        "aviso": None,
+    }
+
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "fob.db")
+    monkeypatch.setattr(fob, "_tabela_fob_ok", False)
+    sql = _SqlFalso()
+    monkeypatch.setattr(sql_server_adapter, "get_sql_adapter", lambda: sql)
+
+    chamadas = []
+    dis = [_di("DMD.001/24", 1000.0), _di("VDM.002/24", 3000.0), _di("DMD.003/24", 0.0)]
+    dis[2].update(vmld_usd=0.0, vmld_brl=0.0, frete_usd=0.0, frete_brl=0.0)
+    duimps = [_duimp("DMD.004/24", 500.0)]
+
+    def _por_ano(lista, tipo):
+        def buscar(ano, categoria=None):
+            chamadas.append((tipo, ano, categoria))
+            return [p for p in lista if not categoria or p["numero_processo"].startswith(f"{categoria}.")]
+        return buscar
+
+    monkeypatch.setattr(fob, "buscar_processos_di_por_ano", _por_ano(dis, "DI"))
+    monkeypatch.setattr(fob, "buscar_processos_duimp_por_ano", _por_ano(duimps, "DUIMP"))
+    return sql, chamadas
+
+
+def test_staging_e_merge_unico_na_transacao(ambiente):
+    sql, _ = ambiente
+    processos = [_di("DMD.001/24", 1000.0), _di("DMD.001/24", 1200.0), _duimp("DMD.004/24", 500.0)]
+    sem_valores = fob._persistir_valores_mercadoria_sql_server(processos)
+
+    assert sem_valores == []
+    assert len(sql.transacoes) == 1 and sql.queries == []
+    etapas = sql.transacoes[0]
+    assert [linhas is None for _, linhas in etapas] == [True, False, True, True]
+    assert "#VALOR_MERCADORIA_STAGE" in etapas[0][0] and "MERGE" in etapas[2][0]
+    # Chave natural repetida vira uma linha só (MERGE não aceita origem duplicada); a última vence
+    linhas = etapas[1][1]
+    assert len(linhas) == len({tuple(l[:5]) for l in linhas}) == 6 + 2
+    assert sql.tabela[("DMD.001/24", "24/001", "DI", "FOB", "BRL")]["valor"] == 1200.0
+
+
+def test_sem_transacao_usa_merge_parametrizado_em_blocos(ambiente, monkeypatch):
+    sql = _SqlFalso(com_transacao=False)
+    monkeypatch.setattr(sql_server_adapter, "get_sql_adapter", lambda: sql)
+    monkeypatch.setattr(fob, "VALOR_MERCADORIA_LOTE_MERGE", 4)
+
+    fob._persistir_valores_mercadoria_sql_server([_di("DMD.001/24", 1000.0), _duimp("DMD.004/24", 500.0)])
+
+    # 6 linhas da DI + 2 da DUIMP = 8 linhas -> 2 MERGEs de 4 linhas, sem SQL montado em string
+    assert [len(p) for _, p in sql.queries] == [4 * 9, 4 * 9]
+    assert all("'" not in q for q, _ in sql.queries)
+    assert len(sql.tabela) == 8
+
+
+def test_ano_fechado_reaproveita_valores_persistidos(ambiente):
+    sql, chamadas = ambiente
+    primeiro = fob.gerar_relatorio_importacoes_fob(None, 2024)
+    assert primeiro["total_processos"] == 4
+    assert len(chamadas) == 2 and len(sql.transacoes) == 1
+
+    segundo = fob.gerar_relatorio_importacoes_fob(None, 2024)
+    assert len(chamadas) == 2  # nada recalculado
+    assert segundo["total_processos"] == 4
+    assert segundo["total_fob_brl"] == pytest.approx(primeiro["total_fob_brl"]) == 4500.0
+    assert [g["categoria"] for g in segundo["por_categoria"]] == ["VDM", "DMD"]
+    dmd = [p["numero_processo"] for p in segundo["por_categoria"][1]["processos"]]
+    assert dmd == ["DMD.001/24", "DMD.003/24", "DMD.004/24"]
+
+    # Categoria específica sai do ano materializado para todas
+    so_vdm = fob.gerar_relatorio_importacoes_fob(None, 2024, categoria="vdm")
+    assert so_vdm["total_processos"] == 1 and len(chamadas) == 2
+
+
+def test_ano_incompleto_no_sql_server_recalcula(ambiente):
+    sql, chamadas = ambiente
+    fob.gerar_relatorio_importacoes_fob(None, 2024)
+    sql.tabela = {k: v for k, v in sql.tabela.items() if k[0] != "VDM.002/24"}
+
+    resultado = fob.gerar_relatorio_importacoes_fob(None, 2024)
+    assert resultado["total_processos"] == 4
+    assert len(chamadas) == 4 and len(sql.transacoes) == 2
+
+
+def test_ano_corrente_sempre_recalcula(ambiente):
+    from datetime import datetime
+
+    _, chamadas = ambiente
+    ano = datetime.now().year
+    fob.gerar_relatorio_importacoes_fob(None, ano)
+    fob.gerar_relatorio_importacoes_fob(None, ano)
+    assert len(chamadas) == 4
@@ -0,0 +1,172 @@
+"""
+Testes do motor consolidado do `SalesWatchService`: uma consulta de NFs por tick para todos os
+termos, matcher em memória, chaves vistas append-only e marca d'água por (filial, tipo_movimento).
+"""
+import json
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+import services.sales_watch_service as watch
+
+
+class _VendasFalso:
+    """Simula `consultar_vendas_por_nf` incremental sobre uma lista de NFs do dia."""
+
+    def __init__(self):
+        self.nfs = []
+        self.chamadas = []
+
+    def is_ready(self):
+        return True
+
+    def consultar_vendas_por_nf(self, *, inicio, fim, termo=None, top=50, apos_documentos=None):
+        self.chamadas.append({"termo": termo, "top": top, "apos": dict(apos_documentos or {})})
+        marcas = apos_documentos or {}
+        ordem = sorted(
+            self.nfs, key=lambda n: (n["codigo_documento"], n["codigo_empresa_filial"], n["tipo_movimento_documento"])
+        )
+        linhas = [
+            nf for nf in ordem
+            if nf["codigo_documento"]
+            > marcas.get((nf["codigo_empresa_filial"], nf["tipo_movimento_documento"]), -1)
+        ]
+        return {"sucesso": True, "dados": linhas[:top]}
+
+    def adicionar(self, codigo, centro_custo, filial="1", operacao="VENDA", tipo="F"):
+        self.nfs.append({
+            "codigo_empresa_filial": filial,
+            "tipo_movimento_documento": tipo,
+            "codigo_documento": codigo,
+            "numero_nf": f"{tipo}{1000 + codigo}",
+            "empresa_vendedora": "MAKE",
+            "data_emissao": "2026-10-16",
+            "total_nf": 100.0 * codigo,
+            "descricao_centro_custo_documento": centro_custo,
+            "descricao_tipo_operacao_documento": operacao,
+        })
+
+
+@pytest.fixture
+def vendas(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "watch.db")
+    monkeypatch.delenv("SALES_WATCH_NOTIFY_ON_FIRST_RUN", raising=False)
+    monkeypatch.setattr(watch, "_releitura_completa_em", {})
+    falso = _VendasFalso()
+    monkeypatch.setattr(watch, "VendasMakeService", lambda: falso)
+    return falso
+
+
+def _tick(termos):
+    return {r.termo: r for r in watch.SalesWatchService().check_once(termos=termos)}
+
+
+def test_uma_consulta_por_tick_e_baseline_sem_notificar(vendas):
+    vendas.adicionar(1, "ALHO CHINÊS")
+    vendas.adicionar(2, "HIKVISION CFTV")
+    assert _tick(["alho", "hikvision", "rastreador"]) == {}
+    assert len(vendas.chamadas) == 1 and vendas.chamadas[0]["termo"] is None
+
+    vendas.adicionar(3, "Alho Nobre", filial="2")
+    vendas.chamadas.clear()
+    resultado = _tick(["alho", "hikvision", "rastreador"])
+    assert list(resultado) == ["alho"]
+    assert [r["codigo_documento"] for r in resultado["alho"].novas] == [3]
+    assert resultado["alho"].total_novas == 300.0
+    # Só o que veio depois da marca d'água da filial
+    assert vendas.chamadas == [{"termo": None, "top": 500, "apos": {("1", "F"): 2}}]
+
+    vendas.chamadas.clear()
+    assert _tick(["alho", "hikvision", "rastreador"]) == {}
+    assert vendas.chamadas[0]["apos"] == {("1", "F"): 2, ("2", "F"): 3}
+
+
+def test_matcher_usa_a_mesma_regra_do_filtro_de_termo():
+    matcher = watch.MatcherTermos(["alho", "câmera ip", ""])
+    linha = {"descricao_centro_custo_documento": "Câmeras IP", "descricao_tipo_operacao_documento": "Venda ALHO"}
+    assert matcher.termos_da_linha(linha) == ["alho", "câmera ip", ""]
+    assert matcher.termos_da_linha({"descricao_centro_custo_documento": "Câmera"}) == [""]
+
+
+def test_paginacao_e_nf_repetida_nao_notifica_duas_vezes(vendas, monkeypatch):
+    monkeypatch.setattr(watch, "SALES_WATCH_PAGINA_NFS", 10)
+    _tick(["alho"])
+    for codigo in range(1, 26):
+        vendas.adicionar(codigo, "ALHO")
+    vendas.chamadas.clear()
+    assert len(_tick(["alho"])["alho"].novas) == 25
+    assert [c["apos"] for c in vendas.chamadas] == [{}, {("1", "F"): 10}, {("1", "F"): 20}]
+
+    # Sem marca d'água (lê o dia todo): o índice (termo, chave) segura as repetidas
+    monkeypatch.setattr(watch, "SALES_WATCH_HIGH_WATER_MARK", False)
+    vendas.adicionar(26, "ALHO")
+    resultado = _tick(["alho"])
+    assert [r["codigo_documento"] for r in resultado["alho"].novas] == [26]
+
+
+def test_tipos_de_movimento_com_sequencias_sobrepostas(vendas):
+    vendas.adicionar(500, "ALHO", tipo="F")
+    vendas.adicionar(10, "ALHO", tipo="S")
+    _tick(["alho"])
+
+    # Venda nova do tipo S com código bem abaixo do maior código do tipo F na mesma filial
+    vendas.adicionar(11, "ALHO NOBRE", tipo="S")
+    vendas.chamadas.clear()
+    resultado = _tick(["alho"])
+    assert vendas.chamadas[0]["apos"] == {("1", "F"): 500, ("1", "S"): 10}
+    assert [(r["tipo_movimento_documento"], r["codigo_documento"]) for r in resultado["alho"].novas] == [("S", 11)]
+
+
+def test_releitura_completa_pega_documento_abaixo_da_marca(vendas, monkeypatch):
+    vendas.adicionar(1, "ALHO")
+    vendas.adicionar(5, "ALHO")
+    _tick(["alho"])
+
+    # Documento antigo (código 3) que só agora virou venda de hoje: a marca (5) não o enxerga...
+    vendas.adicionar(3, "ALHO")
+    assert _tick(["alho"]) == {}
+
+    # ...até a releitura do dia inteiro, que notifica só ele (o resto já está em sales_watch_vistos)
+    monkeypatch.setattr(watch, "SALES_WATCH_RELEITURA_COMPLETA_MINUTOS", 0)
+    vendas.chamadas.clear()
+    resultado = _tick(["alho"])
+    assert vendas.chamadas[0]["apos"] == {}
+    assert [r["codigo_documento"] for r in resultado["alho"].novas] == [3]
+
+
+def test_termo_novo_com_notify_on_first_run_le_o_dia_todo(vendas, monkeypatch):
+    vendas.adicionar(1, "ALHO")
+    vendas.adicionar(2, "HIKVISION")
+    _tick(["alho"])
+
+    monkeypatch.setenv("SALES_WATCH_NOTIFY_ON_FIRST_RUN", "true")
+    vendas.chamadas.clear()
+    resultado = _tick(["alho", "hikvision"])
+    assert vendas.chamadas[0]["apos"] == {}
+    assert list(resultado) == ["hikvision"]
+
+
+def test_migra_chaves_do_estado_legado(vendas):
+    vendas.adicionar(1, "ALHO")
+    vendas.adicionar(2, "ALHO")
+    svc = watch.SalesWatchService()
+    from db_manager import get_db_connection
+
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO sales_watch_state(termo, seen_keys_json, updated_at) VALUES (?, ?, ?)",
+        ("alho", json.dumps([watch._row_key(vendas.nfs[0])]), "2026-10-16T08:00:00"),
+    )
+    conn.commit()
+    conn.close()
+
+    # Termo já acompanhado no formato antigo: não refaz baseline, notifica só a NF não vista
+    resultado = svc.check_once(termos=["alho"])
+    assert [r["codigo_documento"] for r in resultado[0].novas] == [2]
@@ -0,0 +1,88 @@
+"""
+Testes do worker Node.js persistente (`utils/sql_server_node_worker.py`).
+
+Usa um script Node falso (sem `mssql`) que implementa o mesmo protocolo JSON por linha.
+"""
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+from utils.sql_server_node_worker import NodeSqlWorker
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="Node.js não instalado")
+
+FAKE_WORKER_JS = r"""
+const readline = require('readline');
+const write = (o) => process.stdout.write(JSON.stringify(o) + '\n');
+const rl = readline.createInterface({ input: process.stdin });
+rl.on('line', (line) => {
+    const msg = JSON.parse(line);
+    if (msg.op === 'cancel') return;
+    if (msg.sql === 'CRASH') process.exit(3);
+    if (msg.sql === 'HANG') return;
+    // Responde fora de ordem: queries com "SLOW" demoram mais
+    const delay = msg.sql.includes('SLOW') ? 200 : 0;
+    setTimeout(() => write({ id: msg.id, success: true, data: [{ sql: msg.sql, params: msg.params, database: msg.database }] }), delay);
+});
+rl.on('close', () => process.exit(0));
+write({ ready: true });
+"""
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / "fake_worker.js"
+    script.write_text(FAKE_WORKER_JS, encoding="utf-8")
+    w = NodeSqlWorker(script, env=None)
+    yield w
+    w.close()
+
+
+def test_execute_repassa_sql_params_e_database(worker):
+    r = worker.execute("SELECT * FROM t WHERE id = ?", database="Make", params=[42])
+    assert r["success"] is True
+    assert r["data"] == [{"sql": "SELECT * FROM t WHERE id = ?", "params": [42], "database": "Make"}]
+
+
+def test_queries_concorrentes_recebem_respostas_corretas(worker):
+    resultados = {}
+
+    def run(sql):
+        resultados[sql] = worker.execute(sql)
+
+    threads = [threading.Thread(target=run, args=(f"SELECT {i}{' SLOW' if i % 2 else ''}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(resultados) == 6
+    for sql, r in resultados.items():
+        assert r["data"][0]["sql"] == sql
+    assert worker.stats["starts"] == 1
+
+
+def test_reinicia_apos_crash(worker):
+    r = worker.execute("CRASH")
+    assert r["success"] is False
+    assert r["code"] == "EWORKER"
+
+    r = worker.execute("SELECT 1")
+    assert r["success"] is True
+    assert worker.stats["starts"] == 2
+
+
+def test_timeout_por_query(worker):
+    r = worker.execute("HANG", timeout=0.1)
+    assert r["success"] is False
+    assert r["code"] == "ETIMEOUT"
+    # Worker continua utilizável
+    assert worker.execute("SELECT 1")["success"] is True
@@ -0,0 +1,142 @@
+"""
+Testes do pool de conexões pyodbc (`utils/sql_server_pyodbc_pool.py`).
+
+O pool recebe a factory de conexão; aqui usamos conexões fake (sem ODBC/SQL Server).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+from utils.sql_server_pyodbc_pool import PyodbcConnectionPool, is_connection_error
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql):
+        if self.conn.broken:
+            raise RuntimeError("[08S01] Communication link failure")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, database):
+        self.database = database
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError("[08S01] Communication link failure")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def criadas():
+    return []
+
+
+@pytest.fixture
+def pool(criadas):
+    def connect(database):
+        conn = FakeConn(database)
+        criadas.append(conn)
+        return conn
+
+    return PyodbcConnectionPool(connect, max_per_database=2, idle_timeout=60, healthcheck_after=0, wait_timeout=0.2)
+
+
+def test_reaproveita_conexao_por_database(pool, criadas):
+    with pool.connection("Make") as c1:
+        pass
+    with pool.connection("Make") as c2:
+        assert c2 is c1
+    with pool.connection("mAIke_assistente") as c3:
+        assert c3 is not c1
+    assert len(criadas) == 2
+    assert pool.stats["reused"] == 1
+
+
+def test_healthcheck_descarta_conexao_quebrada(pool, criadas):
+    with pool.connection("Make") as c1:
+        pass
+    c1.broken = True
+    with pool.connection("Make") as c2:
+        assert c2 is not c1
+    assert c1.closed
+    assert pool.stats["healthcheck_failed"] == 1
+
+
+def test_erro_de_conexao_no_bloco_descarta(pool):
+    with pytest.raises(RuntimeError):
+        with pool.connection("Make") as c1:
+            raise RuntimeError("[08S01] TCP Provider: connection reset")
+    assert c1.closed
+    assert pool.get_stats()["idle"]["Make"] == 0
+
+
+def test_erro_de_sql_devolve_conexao(pool):
+    with pytest.raises(ValueError):
+        with pool.connection("Make") as c1:
+            raise ValueError("Invalid column name 'x'")
+    assert not c1.closed
+    assert pool.get_stats()["idle"]["Make"] == 1
+
+
+def test_limite_por_database_espera_e_estoura_timeout(pool):
+    a = pool.acquire("Make")
+    b = pool.acquire("Make")
+    with pytest.raises(TimeoutError):
+        pool.acquire("Make")
+
+    liberado = []
+
+    def devolver():
+        time.sleep(0.05)
+        pool.release("Make", a)
+        liberado.append(True)
+
+    t = threading.Thread(target=devolver)
+    t.start()
+    c = pool.acquire("Make")
+    t.join()
+    assert liberado and c is a
+    pool.release("Make", b)
+    pool.release("Make", c)
+
+
+def test_evicta_ociosas_expiradas(criadas):
+    pool = PyodbcConnectionPool(lambda db: criadas.append(FakeConn(db)) or criadas[-1], idle_timeout=0.01)
+    with pool.connection("Make") as c1:
+        pass
+    time.sleep(0.03)
+    with pool.connection("Make") as c2:
+        assert c2 is not c1
+    assert c1.closed
+    assert pool.stats["evicted_idle"] == 1
+
+
+def test_is_connection_error():
+    assert is_connection_error(RuntimeError("('08S01', '[08S01] Communication link failure')"))
+    assert not is_connection_error(RuntimeError("Invalid object name 'dbo.X'"))
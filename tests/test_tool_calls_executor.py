@@ -0,0 +1,84 @@
+"""
+Testes do executor concorrente de tool_calls (`services.tool_calls_executor`).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+from services.tool_calls_executor import executar_tool_calls
+from services.tool_definitions import tool_somente_serial
+
+
+def test_consultas_rodam_em_paralelo_e_mantem_ordem():
+    def executar(nome, args):
+        time.sleep(args["espera"])
+        return {"sucesso": True, "resposta": nome}
+
+    chamadas = [
+        ("obter_dashboard_hoje", {"espera": 0.3}),
+        ("consultar_status_processo", {"espera": 0.1}),
+        ("buscar_nota_explicativa_nesh", {"espera": 0.2}),
+    ]
+    inicio = time.monotonic()
+    resultados = executar_tool_calls(chamadas, executar, max_workers=4)
+    duracao = time.monotonic() - inicio
+
+    assert [r.resultado["resposta"] for r in resultados] == [c[0] for c in chamadas]
+    assert duracao < 0.5  # tempo da mais lenta, não a soma (0.6s)
+
+
+def test_erro_e_timeout_isolados_por_tool():
+    def executar(nome, args):
+        if nome == "listar_processos":
+            raise RuntimeError("SQL Server fora")
+        if nome == "obter_dados_di":
+            time.sleep(1.0)
+        return {"sucesso": True}
+
+    resultados = executar_tool_calls(
+        [("listar_processos", {}), ("obter_dados_di", {}), ("consultar_cct", {})],
+        executar,
+        max_workers=4,
+        timeout_s=0.2,
+    )
+
+    assert isinstance(resultados[0].erro, RuntimeError)
+    assert resultados[1].timeout is True
+    assert resultados[2].resultado == {"sucesso": True}
+
+
+def test_tools_seriais_rodam_sozinhas_como_barreira():
+    ativos = []
+    lock = threading.Lock()
+    concorrencia_na_serial = []
+
+    def executar(nome, args):
+        with lock:
+            ativos.append(nome)
+            if nome == "enviar_email":
+                concorrencia_na_serial.append(len(ativos))
+        time.sleep(0.05)
+        with lock:
+            ativos.remove(nome)
+        return {"resposta": nome}
+
+    chamadas = [("consultar_cct", {}), ("obter_valores_ce", {}), ("enviar_email", {}), ("listar_processos", {})]
+    resultados = executar_tool_calls(chamadas, executar, max_workers=4)
+
+    assert [r.resultado["resposta"] for r in resultados] == [c[0] for c in chamadas]
+    assert concorrencia_na_serial == [1]
+
+
+def test_metadata_serial():
+    assert tool_somente_serial("enviar_email")
+    assert tool_somente_serial("efetivar_pix_payment_santander")
+    assert tool_somente_serial("criar_duimp")
+    assert tool_somente_serial("melhorar_email_draft")
+    assert not tool_somente_serial("consultar_status_processo")
+    assert not tool_somente_serial("obter_dashboard_hoje")
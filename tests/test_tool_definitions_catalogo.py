@@ -0,0 +1,57 @@
+"""
+Testes do catálogo memoizado de tools (`services.tool_definitions`).
+"""
+import json
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+from services import tool_definitions as td
+
+
+def _nomes(tools):
+    return [t["function"]["name"] for t in tools]
+
+
+def test_catalogo_memoizado_reusa_schemas():
+    a = td.get_available_tools(compact=True)
+    b = td.get_available_tools(compact=True)
+
+    assert a is not b  # lista nova (append do chamador não afeta o cache)
+    assert all(x is y for x, y in zip(a, b))
+    assert len(a) <= 128
+    a.append({"type": "function", "function": {"name": "fake"}})
+    assert "fake" not in _nomes(td.get_available_tools(compact=True))
+
+
+def test_whitelist_independe_de_ordem_e_duplicatas():
+    w1 = td.get_available_tools(whitelist=["enviar_email", "criar_duimp"])
+    w2 = td.get_available_tools(whitelist=["criar_duimp", "enviar_email", "criar_duimp"])
+
+    assert _nomes(w1) == _nomes(w2) == ["criar_duimp", "enviar_email"]
+    assert td._catalogo_filtrado.cache_info().hits >= 1
+
+
+def test_compact_encurta_descricoes():
+    full = {t["function"]["name"]: t for t in td.get_available_tools(compact=False)}
+    compact = {t["function"]["name"]: t for t in td.get_available_tools(compact=True)}
+
+    assert len(compact["criar_duimp"]["function"]["description"]) < len(full["criar_duimp"]["function"]["description"])
+
+
+def test_json_e_tokens():
+    whitelist = ["criar_duimp", "enviar_email"]
+    payload = td.get_available_tools_json(whitelist=whitelist)
+
+    assert json.loads(payload) == td.get_available_tools(whitelist=whitelist)
+    assert td.get_available_tools_json(whitelist=whitelist) is payload
+
+    custo = td.estimar_tokens_tools(whitelist=whitelist)
+    assert custo["quantidade"] == 2
+    assert set(custo["por_tool"]) == set(whitelist)
+    assert custo["total"] == sum(custo["por_tool"].values()) > 0
+    assert td.estimar_tokens_tools(compact=False)["total"] > td.estimar_tokens_tools(compact=True)["total"]
@@ -0,0 +1,122 @@
+"""
+Testes do catálogo de schema e dos planos compilados do `VendasMakeService`:
+introspecção do legado só na primeira vez (SQLite + memória com TTL), consulta de NF em 1 round trip
+e refresh explícito do catálogo.
+"""
+import sys
+from pathlib import Path
+
+# Garantir root no path
+root_dir = Path(__file__).parent.parent
+if str(root_dir) not in sys.path:
+    sys.path.insert(0, str(root_dir))
+
+import pytest
+
+import services.database_service as database_service
+import services.vendas_make_service as vendas
+
+
+class _AdapterFalso:
+    def __init__(self):
+        self.queries = []
+
+    def execute_query(self, sql, database=None, params=None, notificar_erro=False):
+        self.queries.append(sql)
+        if "spalla.sys.columns" in sql:
+            cols = ["codigo_documento", "numero_nf", "nome_cliente", "codigo_empresa", "data_emissao"]
+            return {"success": True, "data": [{"coluna": c} for c in cols]}
+        if "INFORMATION_SCHEMA.COLUMNS" in sql:
+            if "spalla" in sql:
+                return {
+                    "success": True,
+                    "data": [{"schema_name": "dbo", "table_name": "empresas", "id_col": "codigo_empresa", "name_col": "nome"}],
+                }
+            return {"success": True, "data": []}
+        if "FROM spalla.dbo.documentos d" in sql:
+            return {"success": True, "data": [{"numero_nf": "123", "total_nf": 10.0}]}
+        raise AssertionError(f"query inesperada: {sql[:200]}")
+
+    def introspeccoes(self):
+        return [q for q in self.queries if "sys.columns" in q or "INFORMATION_SCHEMA" in q]
+
+
+def _novo_processo():
+    """Simula outro processo: só o SQLite sobrevive."""
+    vendas._catalogo_mem.clear()
+    vendas._planos.clear()
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service, "DB_PATH", tmp_path / "vendas.db")
+    monkeypatch.setattr(vendas, "_tabela_catalogo_ok", False)
+    monkeypatch.setattr(vendas, "_catalogo_mem", {})
+    monkeypatch.setattr(vendas, "_planos", vendas.OrderedDict())
+    falso = _AdapterFalso()
+    monkeypatch.setattr(vendas, "get_sql_adapter", lambda: falso)
+    return falso
+
+
+def test_introspeccao_uma_vez_e_plano_reaproveitado(adapter):
+    svc = vendas.VendasMakeService()
+    r1 = svc.consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02", termo="alho")
+    assert r1["sucesso"] and r1["meta"]["coluna_nf"] == "numero_nf"
+    assert r1["meta"]["empresa_join"] is True
+    assert len(adapter.introspeccoes()) == 2  # colunas + cadastro de empresa
+    assert "emp.[nome]" in adapter.queries[-1]
+
+    # Outro termo, mesmo período: só a consulta de vendas
+    adapter.queries.clear()
+    r2 = vendas.VendasMakeService().consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02", termo="hikvision")
+    assert r2["sucesso"] and len(adapter.queries) == 1
+    assert "hikvision" in adapter.queries[0]
+
+
+def test_catalogo_persistido_no_sqlite_e_ttl(adapter, monkeypatch):
+    vendas.VendasMakeService().consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02")
+    _novo_processo()
+    adapter.queries.clear()
+
+    vendas.VendasMakeService().consultar_vendas_por_nf(inicio="2026-10-05", fim="2026-10-06")
+    assert adapter.introspeccoes() == [] and len(adapter.queries) == 1
+
+    # TTL vencido: redescobre
+    _novo_processo()
+    monkeypatch.setattr(vendas, "VENDAS_MAKE_SCHEMA_TTL_HORAS", 0)
+    adapter.queries.clear()
+    vendas.VendasMakeService().consultar_vendas_por_nf(inicio="2026-10-05", fim="2026-10-06")
+    assert len(adapter.introspeccoes()) == 2
+
+
+def test_refresh_explicito_descarta_catalogo_e_planos(adapter):
+    svc = vendas.VendasMakeService()
+    svc.consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02")
+    adapter.queries.clear()
+
+    resultado = svc.atualizar_catalogo_schema()
+    assert resultado["sucesso"] and resultado["dados"]["documentos_colunas"] == 5
+    assert resultado["dados"]["empresa_join"]["table"] == "empresas"
+    assert len(adapter.introspeccoes()) == 3  # colunas + cadastro de cliente + cadastro de empresa
+    assert not vendas._planos
+
+    adapter.queries.clear()
+    svc.consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02")
+    assert len(adapter.queries) == 1
+
+
+def test_erro_de_introspeccao_nao_e_cacheado(adapter, monkeypatch):
+    original = adapter.execute_query
+    falhas = {"n": 0}
+
+    def instavel(sql, database=None, params=None, notificar_erro=False):
+        if "sys.columns" in sql and falhas["n"] < 2:
+            falhas["n"] += 1
+            adapter.queries.append(sql)
+            return {"success": False, "error": "timeout"}
+        return original(sql, database=database, params=params)
+
+    monkeypatch.setattr(adapter, "execute_query", instavel)
+    svc = vendas.VendasMakeService()
+    assert svc.consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02")["erro"] == "timeout"
+    assert svc.consultar_vendas_por_nf(inicio="2026-10-01", fim="2026-10-02")["sucesso"]
@@ -13,10 +13,10 @@ from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
 import os
 import logging
-import tempfile
-import subprocess
 from pathlib import Path
 
+from utils.mtls_credenciais import arquivo_tem_chave_privada, materializar_pfx, obter_sessao, tokens_oauth
+
 logger = logging.getLogger(__name__)
 
 def _resolver_caminho_certificado(
@@ -214,14 +214,12 @@ class BancoBrasilExtratoAPI:
         self.config = config
         # ✅ IMPORTANTE: Criar sessão SEM certificado configurado
         # O certificado mTLS será passado apenas nas requisições específicas que precisam
-        self.session = requests.Session()
-        # Garantir que a sessão não tenha certificado configurado
-        if hasattr(self.session, 'cert'):
-            self.session.cert = None
+        # ✅ OTIMIZADO (16/10/2026): sessão compartilhada (pool + retry) em vez de uma nova por requisição
+        self.session = obter_sessao('bb_extrato', self.config.environment)
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[float] = None
         self.debug = debug
-        self._temp_cert_file: Optional[str] = None  # Arquivo temporário criado a partir de .pfx
+        self._cert_requisicao: Any = False  # cache de `_cert_para_requisicao` (False = não calculado)
         
         # ✅ IMPORTANTE: NÃO configurar certificado mTLS na sessão global
         # O certificado mTLS deve ser usado APENAS nas requisições à API de extratos
@@ -229,75 +227,20 @@ class BancoBrasilExtratoAPI:
         self._mtls_cert = None
         self._setup_mtls()
     
-    def __del__(self):
-        """Limpa arquivo temporário se foi criado a partir de .pfx"""
-        if self._temp_cert_file and os.path.exists(self._temp_cert_file):
-            try:
-                os.unlink(self._temp_cert_file)
-            except:
-                pass
-    
     def _extrair_pfx_para_pem(self, pfx_path: str, senha: str = "senha001") -> Optional[str]:
         """
         Extrai certificado e chave privada de um arquivo .pfx para .pem temporário.
         
+        ✅ OTIMIZADO (16/10/2026): conversão única por processo (ver `utils.mtls_credenciais`).
+        
         Args:
             pfx_path: Caminho do arquivo .pfx
             senha: Senha do arquivo .pfx
         
         Returns:
-            Caminho do arquivo .pem temporário ou None se erro
+            Caminho do arquivo .pem (compartilhado, não apagar) ou None se erro
         """
-        try:
-            # Criar arquivo temporário
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.pem', prefix='bb_cert_')
-            os.close(temp_fd)  # Fechar o file descriptor, vamos usar o caminho
-            
-            # Extrair certificado e chave privada do .pfx
-            cmd = [
-                'openssl', 'pkcs12',
-                '-in', pfx_path,
-                '-nodes',  # Não criptografar a chave privada
-                '-out', temp_path,
-                '-passin', f'pass:{senha}',
-                '-legacy'  # Suportar .pfx antigos
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Verificar se o arquivo tem chave privada
-                with open(temp_path, 'r') as f:
-                    content = f.read()
-                    if 'BEGIN PRIVATE KEY' in content or 'BEGIN RSA PRIVATE KEY' in content or 'BEGIN EC PRIVATE KEY' in content:
-                        if self.debug:
-                            logger.debug(f"✅ Certificado .pfx extraído com sucesso para: {temp_path}")
-                        return temp_path
-                    else:
-                        logger.warning(f"⚠️ Arquivo .pfx extraído mas não contém chave privada")
-                        os.unlink(temp_path)
-                        return None
-            else:
-                logger.error(f"❌ Erro ao extrair .pfx: {result.stderr}")
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return None
-                
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Timeout ao extrair .pfx")
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
-        except Exception as e:
-            logger.error(f"❌ Erro ao extrair .pfx: {e}", exc_info=True)
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
+        return materializar_pfx(pfx_path, senha, prefixo='bb_cert_')
     
     def _setup_mtls(self):
         """Prepara certificados mTLS para uso apenas nas requisições à API de extratos (não na sessão global)"""
@@ -312,7 +255,6 @@ class BancoBrasilExtratoAPI:
                     temp_pem = self._extrair_pfx_para_pem(cert_path, senha_pfx)
                     if temp_pem:
                         self._mtls_cert = temp_pem
-                        self._temp_cert_file = temp_pem  # Guardar para limpar depois
                         if self.debug:
                             logger.debug("✅ Certificado .pfx convertido automaticamente para uso em mTLS")
                     else:
@@ -357,6 +299,35 @@ class BancoBrasilExtratoAPI:
             # Nenhum certificado configurado
             self._mtls_cert = None
     
+    def _cert_para_requisicao(self) -> Any:
+        """
+        Certificado mTLS a passar nas requisições à API (None = requisição sem mTLS).
+
+        Só usa o certificado se o arquivo existir e contiver chave privada. Validado uma vez
+        por instância (antes o arquivo era relido a cada tentativa).
+        """
+        if self._cert_requisicao is not False:
+            return self._cert_requisicao
+        cert = None
+        if self._mtls_cert:
+            cert_path = None
+            if isinstance(self._mtls_cert, str):
+                cert_path = self._mtls_cert
+            elif isinstance(self._mtls_cert, tuple) and len(self._mtls_cert) == 2:
+                cert_path = self._mtls_cert[0]
+            
+            if cert_path and os.path.exists(cert_path):
+                if arquivo_tem_chave_privada(cert_path):
+                    cert = self._mtls_cert
+                    if self.debug:
+                        logger.debug(f"🔐 Usando certificado mTLS: {cert_path}")
+                elif self.debug:
+                    logger.warning(f"⚠️ Certificado {cert_path} não tem chave privada - não pode ser usado para mTLS")
+            elif self.debug:
+                logger.warning(f"⚠️ Certificado mTLS configurado mas arquivo não encontrado: {cert_path}")
+        self._cert_requisicao = cert
+        return cert
+    
     def _obter_token(self) -> str:
         """
         Obtém token de acesso OAuth 2.0 (Client Credentials).
@@ -364,11 +335,13 @@ class BancoBrasilExtratoAPI:
         Returns:
             Token de acesso
         """
-        # Se token ainda válido, retornar
-        if self._access_token and self._token_expires_at:
-            import time
-            if time.time() < self._token_expires_at - 60:  # Renovar 1 minuto antes
-                return self._access_token
+        # Se token ainda válido, retornar (renovar 1 minuto antes)
+        # ✅ OTIMIZADO (16/10/2026): cache por processo, não por instância
+        chave_token = ('bb_extrato', self.config.client_id, self.config.token_url)
+        token = tokens_oauth.ler(chave_token, margem_segundos=60)
+        if token:
+            self._access_token = token
+            return token
         
         # Validar credenciais
         if not self.config.client_id or not self.config.client_secret:
@@ -411,9 +384,8 @@ class BancoBrasilExtratoAPI:
         
         try:
             # ✅ IMPORTANTE: Requisição de token OAuth NÃO usa certificado mTLS
-            # Usar requests.post diretamente (sem sessão) para garantir que não há certificado
-            # NÃO usar self.session pois pode ter certificado configurado
-            response = requests.post(
+            # Sessão OAuth compartilhada SEM certificado cliente (pool de conexões)
+            response = obter_sessao('bb_oauth', self.config.environment).post(
                 self.config.token_url, 
                 headers=headers, 
                 data=data, 
@@ -452,8 +424,7 @@ class BancoBrasilExtratoAPI:
             
             # Calcular expiração (padrão: 3600 segundos se não informado)
             expires_in = token_data.get("expires_in", 3600)
-            import time
-            self._token_expires_at = time.time() + expires_in
+            self._token_expires_at = tokens_oauth.gravar(chave_token, self._access_token, expires_in)
             
             if self.debug:
                 logger.debug(f"✅ Token OAuth obtido com sucesso (expira em {expires_in}s)")
@@ -611,9 +582,8 @@ class BancoBrasilExtratoAPI:
                 # Mas se não tivermos certificado válido, vamos tentar sem (pode dar erro, mas vamos tentar)
                 # Se der erro SSL, o usuário precisa configurar o certificado
                 
-                # Garantir que a sessão não tenha certificado configurado globalmente
-                # Criar uma nova sessão limpa para esta requisição
-                api_session = requests.Session()
+                # Sessão compartilhada sem certificado global (o cert vai por requisição)
+                api_session = self.session
                 
                 # Preparar parâmetros da requisição
                 request_kwargs = {
@@ -624,37 +594,11 @@ class BancoBrasilExtratoAPI:
                 
                 # ✅ CRÍTICO: Só usar certificado se realmente tivermos um válido COM CHAVE PRIVADA
                 # Se não tiver certificado válido, NÃO passar parâmetro cert (requisição normal)
-                if self._mtls_cert:
-                    cert_path = None
-                    if isinstance(self._mtls_cert, str):
-                        cert_path = self._mtls_cert
-                    elif isinstance(self._mtls_cert, tuple) and len(self._mtls_cert) == 2:
-                        cert_path = self._mtls_cert[0]
-                    
-                    if cert_path and os.path.exists(cert_path):
-                        # Verificar novamente se tem chave privada (validação dupla)
-                        try:
-                            with open(cert_path, 'r') as f:
-                                content = f.read()
-                                if 'BEGIN PRIVATE KEY' in content or 'BEGIN RSA PRIVATE KEY' in content or 'BEGIN EC PRIVATE KEY' in content:
-                                    request_kwargs['cert'] = self._mtls_cert
-                                    if self.debug:
-                                        logger.debug(f"🔐 Usando certificado mTLS: {cert_path}")
-                                else:
-                                    if self.debug:
-                                        logger.warning(f"⚠️ Certificado {cert_path} não tem chave privada - não pode ser usado para mTLS")
-                                    # NÃO passar cert - tentar sem mTLS
-                        except Exception as e:
-                            if self.debug:
-                                logger.warning(f"⚠️ Erro ao validar certificado: {e}")
-                            # NÃO passar cert - tentar sem mTLS
-                    else:
-                        if self.debug:
-                            logger.warning(f"⚠️ Certificado mTLS configurado mas arquivo não encontrado: {cert_path}")
-                        # NÃO passar cert - tentar sem mTLS
-                else:
-                    if self.debug:
-                        logger.debug("ℹ️ Sem certificado mTLS configurado - tentando requisição sem mTLS")
+                cert_requisicao = self._cert_para_requisicao()
+                if cert_requisicao:
+                    request_kwargs['cert'] = cert_requisicao
+                elif self.debug:
+                    logger.debug("ℹ️ Sem certificado mTLS válido - tentando requisição sem mTLS")
                 
                 # ✅ IMPORTANTE: Se não tivermos certificado válido, NÃO passar parâmetro cert
                 # Isso garante que não tentaremos usar certificado inválido
@@ -14,12 +14,12 @@ from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
 import os
 import logging
-import tempfile
-import subprocess
 import json
 import urllib3
 from pathlib import Path
 
+from utils.mtls_credenciais import materializar_pfx, obter_sessao, tokens_oauth
+
 # ✅ Suprimir aviso SSL para ambiente sandbox (certificado auto-assinado)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -211,78 +211,38 @@ class BancoBrasilPaymentsAPI:
     
     def __init__(self, config: BancoBrasilPaymentsConfig, debug: bool = False):
         self.config = config
-        self.session = requests.Session()
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[float] = None
         self.debug = debug
-        self._temp_cert_file: Optional[str] = None
         self._mtls_cert = None
         self._setup_mtls()
-    
-    def __del__(self):
-        """Limpa arquivo temporário se foi criado a partir de .pfx"""
-        if self._temp_cert_file and os.path.exists(self._temp_cert_file):
-            try:
-                os.unlink(self._temp_cert_file)
-            except:
-                pass
+        # ✅ OTIMIZADO (16/10/2026): sessão compartilhada (pool + retry só em leituras) em vez de
+        # `requests.get/post(cert=...)` soltos a cada chamada do lote.
+        # ✅ Para ambiente sandbox, o servidor pode usar certificado auto-assinado
+        # Desabilitar verificação SSL apenas em sandbox (não em produção!)
+        self.session = obter_sessao(
+            'bb_pagamentos', self.config.environment, cert=self._mtls_cert,
+            verify=self.config.environment != "sandbox",
+        )
     
     def _extrair_pfx_para_pem(self, pfx_path: str, senha: str = "senha001") -> Optional[str]:
         """
         Extrai certificado e chave privada de um arquivo .pfx para .pem temporário.
         
         ✅ Igual ao Banco do Brasil Extratos - suporta .pfx automaticamente.
+        ✅ OTIMIZADO (16/10/2026): conversão única por processo (ver `utils.mtls_credenciais`).
         
         Args:
             pfx_path: Caminho do arquivo .pfx
             senha: Senha do arquivo .pfx
         
         Returns:
-            Caminho do arquivo .pem temporário ou None se falhar
+            Caminho do arquivo .pem (compartilhado, não apagar) ou None se falhar
         """
-        try:
-            # Criar arquivo temporário
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.pem', prefix='bb_payments_')
-            os.close(temp_fd)
-            
-            # Extrair certificado e chave privada do .pfx
-            result = subprocess.run(
-                ['openssl', 'pkcs12', '-in', pfx_path, '-nodes', '-out', temp_path,
-                 '-passin', f'pass:{senha}', '-legacy'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Verificar se o arquivo tem chave privada
-                with open(temp_path, 'r') as f:
-                    content = f.read()
-                    if 'BEGIN PRIVATE KEY' in content or 'BEGIN RSA PRIVATE KEY' in content or 'BEGIN EC PRIVATE KEY' in content:
-                        self._temp_cert_file = temp_path
-                        logger.info(f"✅ Certificado .pfx convertido automaticamente para uso em mTLS - Pagamentos: {pfx_path}")
-                        return temp_path
-                    else:
-                        logger.error("❌ Arquivo .pfx não contém chave privada")
-                        if os.path.exists(temp_path):
-                            os.unlink(temp_path)
-                        return None
-            else:
-                logger.error(f"❌ Erro ao extrair .pfx: {result.stderr}")
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return None
-                
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Timeout ao extrair .pfx")
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
-        except Exception as e:
-            logger.error(f"❌ Erro ao extrair .pfx: {e}", exc_info=True)
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
+        pem_path = materializar_pfx(pfx_path, senha, prefixo='bb_payments_')
+        if pem_path:
+            logger.info(f"✅ Certificado .pfx convertido automaticamente para uso em mTLS - Pagamentos: {pfx_path}")
+        return pem_path
     
     def _setup_mtls(self):
         """Configura certificados mTLS se disponíveis"""
@@ -324,12 +284,13 @@ class BancoBrasilPaymentsAPI:
         Returns:
             Token de acesso
         """
-        import time
-        
-        # Se token ainda válido, retornar
-        if self._access_token and self._token_expires_at:
-            if time.time() < self._token_expires_at - 60:  # Renovar 1 minuto antes
-                return self._access_token
+        # Se token ainda válido, retornar (renovar 1 minuto antes)
+        # ✅ OTIMIZADO (16/10/2026): cache por processo, não por instância
+        chave_token = ('bb_pagamentos', self.config.client_id, self.config.token_url)
+        token = tokens_oauth.ler(chave_token, margem_segundos=60)
+        if token:
+            self._access_token = token
+            return token
         
         # Validar credenciais
         if not self.config.client_id or not self.config.client_secret:
@@ -377,8 +338,8 @@ class BancoBrasilPaymentsAPI:
             logger.debug(f"🔑 Data completo: {data}")
         
         try:
-            # Requisição de token OAuth NÃO usa certificado mTLS
-            response = requests.post(
+            # Requisição de token OAuth NÃO usa certificado mTLS (sessão OAuth compartilhada)
+            response = obter_sessao('bb_oauth', self.config.environment).post(
                 self.config.token_url,
                 headers=headers,
                 data=data,
@@ -448,7 +409,8 @@ class BancoBrasilPaymentsAPI:
             token_data = response.json()
             self._access_token = token_data.get('access_token')
             expires_in = token_data.get('expires_in', 3600)
-            self._token_expires_at = time.time() + expires_in
+            if self._access_token:
+                self._token_expires_at = tokens_oauth.gravar(chave_token, self._access_token, expires_in)
             
             if self.debug:
                 logger.debug("✅ Token OAuth obtido com sucesso")
@@ -488,32 +450,20 @@ class BancoBrasilPaymentsAPI:
                 logger.debug(f"📤 Body JSON: {json.dumps(json_data, indent=2)}")
         
         try:
-            # Usar certificado mTLS se configurado
-            cert = self._mtls_cert if self._mtls_cert else None
-            
-            # ✅ Para ambiente sandbox, o servidor pode usar certificado auto-assinado
-            # Desabilitar verificação SSL apenas em sandbox (não em produção!)
-            verify_ssl = self.config.environment != "sandbox"
-            
+            # Sessão compartilhada já configurada com certificado mTLS e verificação SSL do ambiente
             if self.debug:
-                logger.debug(f"🔐 SSL Verification: {verify_ssl} (ambiente: {self.config.environment})")
+                logger.debug(f"🔐 SSL Verification: {self.session.verify} (ambiente: {self.config.environment})")
             
-            if method.upper() == "GET":
-                response = requests.get(url, headers=headers, cert=cert, timeout=30, verify=verify_ssl)
-            elif method.upper() == "POST":
-                if json_data:
-                    response = requests.post(url, headers=headers, json=json_data, cert=cert, timeout=30, verify=verify_ssl)
-                else:
-                    response = requests.post(url, headers=headers, data=data, cert=cert, timeout=30, verify=verify_ssl)
-            elif method.upper() == "PUT":
+            metodo = method.upper()
+            if metodo not in ("GET", "POST", "PUT", "DELETE"):
+                raise ValueError(f"Método HTTP não suportado: {method}")
+            kwargs: Dict[str, Any] = {'headers': headers, 'timeout': 30}
+            if metodo in ("POST", "PUT"):
                 if json_data:
-                    response = requests.put(url, headers=headers, json=json_data, cert=cert, timeout=30, verify=verify_ssl)
+                    kwargs['json'] = json_data
                 else:
-                    response = requests.put(url, headers=headers, data=data, cert=cert, timeout=30, verify=verify_ssl)
-            elif method.upper() == "DELETE":
-                response = requests.delete(url, headers=headers, cert=cert, timeout=30, verify=verify_ssl)
-            else:
-                raise ValueError(f"Método HTTP não suportado: {method}")
+                    kwargs['data'] = data
+            response = self.session.request(metodo, url, **kwargs)
             
             if self.debug:
                 logger.debug(f"📥 Resposta: Status {response.status_code}")
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Utils - Credenciais mTLS compartilhadas (Banco do Brasil / Santander)
+=====================================================================
+
+✅ NOVO (16/10/2026): cada cliente bancário (`banco_brasil_api`, `banco_brasil_payments_api`,
+`santander_api`, `santander_payments_api`) chamava `openssl pkcs12` num subprocesso para
+converter o .pfx em PEM temporário a cada instância, e vários caminhos usavam
+`requests.post/get(cert=...)` soltos (sem reaproveitar conexão). Sincronização de extratos e
+pagamentos em lote fazem dezenas de chamadas por execução. Agora:
+
+- cada .pfx é convertido UMA vez por processo (chave: caminho + mtime + tamanho + senha),
+  com o loader PKCS#12 do `cryptography` em processo; sem o pacote, cai no `openssl` (como antes);
+- o PEM fica em arquivo 0600 dentro de um diretório temporário privado (0700), removido no
+  encerramento do processo;
+- `obter_sessao(banco, ambiente, ...)` devolve uma `requests.Session` compartilhada com pool de
+  conexões e retry (conexão + 502/503/504, só leituras GET/HEAD/OPTIONS — operação de
+  pagamento nunca é reenviada pelo adapter);
+- tokens OAuth ficam em cache por processo até a expiração (`TokenCacheOAuth`), não por instância.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+BANCO_HTTP_POOL_MAXSIZE = int(os.getenv("BANCO_HTTP_POOL_MAXSIZE", "10"))
+BANCO_HTTP_RETRIES = int(os.getenv("BANCO_HTTP_RETRIES", "3"))
+BANCO_HTTP_BACKOFF = float(os.getenv("BANCO_HTTP_BACKOFF", "0.5"))
+
+_MARCADORES_CHAVE = ("BEGIN PRIVATE KEY", "BEGIN RSA PRIVATE KEY", "BEGIN EC PRIVATE KEY")
+
+CertMTLS = Union[str, Tuple[str, str], None]
+
+
+def pem_tem_chave_privada(conteudo: str) -> bool:
+    return any(marcador in conteudo for marcador in _MARCADORES_CHAVE)
+
+
+def arquivo_tem_chave_privada(caminho: str) -> bool:
+    """True se o arquivo PEM existe e contém uma chave privada."""
+    try:
+        with open(caminho, "r") as f:
+            return pem_tem_chave_privada(f.read())
+    except Exception:
+        return False
+
+
+# ---------------------------------------------------------------------- .pfx → PEM
+_pems: Dict[Tuple[Any, ...], str] = {}
+_pems_lock = threading.Lock()
+_diretorio: Optional[str] = None
+
+
+def _diretorio_privado() -> str:
+    global _diretorio
+    if _diretorio is None or not os.path.isdir(_diretorio):
+        _diretorio = tempfile.mkdtemp(prefix="mtls_")  # criado com permissão 0700
+    return _diretorio
+
+
+def _converter_pfx_cryptography(dados: bytes, senha: str) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.serialization import pkcs12
+
+    chave, certificado, cadeia = pkcs12.load_key_and_certificates(dados, senha.encode() if senha else None)
+    if chave is None or certificado is None:
+        raise ValueError(".pfx sem chave privada ou certificado")
+    partes = [certificado.public_bytes(serialization.Encoding.PEM)]
+    partes.extend(c.public_bytes(serialization.Encoding.PEM) for c in (cadeia or []))
+    partes.append(
+        chave.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return b"".join(partes)
+
+
+def _converter_pfx_openssl(pfx_path: str, senha: str) -> bytes:
+    """Fallback sem `cryptography`: `openssl pkcs12` (tenta com e sem `-legacy`)."""
+    base = ["openssl", "pkcs12", "-in", pfx_path, "-nodes", "-passin", f"pass:{senha}"]
+    erro = ""
+    for extra in (["-legacy"], []):
+        result = subprocess.run(base + extra, capture_output=True, timeout=30)
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+        erro = result.stderr.decode(errors="replace").strip()
+    raise ValueError(f"openssl pkcs12 falhou: {erro}")
+
+
+def _gravar_privado(conteudo: bytes, prefixo: str) -> str:
+    fd, caminho = tempfile.mkstemp(suffix=".pem", prefix=prefixo, dir=_diretorio_privado())  # 0600
+    with os.fdopen(fd, "wb") as f:
+        f.write(conteudo)
+    return caminho
+
+
+def materializar_pfx(pfx_path: str, senha: str, prefixo: str = "mtls_") -> Optional[str]:
+    """
+    Converte o .pfx/.p12 para um PEM combinado (certificado + cadeia + chave) uma vez por processo.
+
+    Returns:
+        Caminho do PEM privado (compartilhado entre instâncias — não apagar) ou None se falhar.
+    """
+    try:
+        stat = os.stat(pfx_path)
+    except OSError:
+        logger.warning(f"⚠️ Arquivo .pfx não encontrado: {pfx_path}")
+        return None
+    chave = (
+        os.path.abspath(pfx_path),
+        stat.st_mtime_ns,
+        stat.st_size,
+        hashlib.sha256((senha or "").encode()).hexdigest(),
+    )
+    caminho = _pems.get(chave)
+    if caminho and os.path.exists(caminho):
+        return caminho
+
+    with _pems_lock:
+        caminho = _pems.get(chave)
+        if caminho and os.path.exists(caminho):
+            return caminho
+        try:
+            with open(pfx_path, "rb") as f:
+                dados = f.read()
+            try:
+                pem = _converter_pfx_cryptography(dados, senha)
+            except ImportError:
+                logger.debug("cryptography não instalado; convertendo .pfx via openssl")
+                pem = _converter_pfx_openssl(pfx_path, senha)
+        except Exception as e:
+            logger.error(f"❌ Erro ao extrair certificado .pfx {pfx_path}: {e}")
+            return None
+        if not pem_tem_chave_privada(pem.decode(errors="replace")):
+            logger.warning(f"⚠️ Certificado .pfx {pfx_path} extraído mas não contém chave privada")
+            return None
+        caminho = _gravar_privado(pem, prefixo)
+        _pems[chave] = caminho
+        logger.debug(f"✅ Certificado .pfx convertido uma vez para uso em mTLS: {pfx_path}")
+        return caminho
+
+
+# ---------------------------------------------------------------------- sessões
+_sessoes: Dict[Tuple[Hashable, ...], requests.Session] = {}
+_sessoes_lock = threading.Lock()
+
+
+def _novo_adapter() -> HTTPAdapter:
+    retry = Retry(
+        total=BANCO_HTTP_RETRIES,
+        connect=BANCO_HTTP_RETRIES,
+        status=BANCO_HTTP_RETRIES,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        backoff_factor=BANCO_HTTP_BACKOFF,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=4, pool_maxsize=BANCO_HTTP_POOL_MAXSIZE, max_retries=retry)
+
+
+def obter_sessao(banco: str, ambiente: str, cert: CertMTLS = None, verify: Union[bool, str] = True) -> requests.Session:
+    """
+    Sessão HTTP compartilhada por (banco, ambiente, certificado, verify), com pool e retry.
+
+    A sessão é reaproveitada entre instâncias dos clientes; não altere `cert`/`verify` nela
+    (peça outra sessão com os parâmetros desejados).
+    """
+    cert_chave = tuple(cert) if isinstance(cert, (list, tuple)) else cert
+    chave = (banco, ambiente, cert_chave, verify)
+    sessao = _sessoes.get(chave)
+    if sessao is None:
+        with _sessoes_lock:
+            sessao = _sessoes.get(chave)
+            if sessao is None:
+                sessao = requests.Session()
+                adapter = _novo_adapter()
+                sessao.mount("https://", adapter)
+                sessao.mount("http://", adapter)
+                sessao.cert = cert_chave
+                sessao.verify = verify
+                _sessoes[chave] = sessao
+    return sessao
+
+
+# ---------------------------------------------------------------------- tokens OAuth
+class TokenCacheOAuth:
+    """Tokens OAuth (client credentials) por chave, válidos até `expira_em - margem`."""
+
+    def __init__(self):
+        self._tokens: Dict[Hashable, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def ler(self, chave: Hashable, margem_segundos: float = 60) -> Optional[str]:
+        item = self._tokens.get(chave)
+        if item and time.time() < item[1] - margem_segundos:
+            return item[0]
+        return None
+
+    def gravar(self, chave: Hashable, token: str, expires_in: float) -> float:
+        """Guarda o token; retorna o instante (epoch) de expiração."""
+        expira_em = time.time() + float(expires_in)
+        with self._lock:
+            self._tokens[chave] = (token, expira_em)
+        return expira_em
+
+    def invalidar(self, chave: Hashable) -> None:
+        with self._lock:
+            self._tokens.pop(chave, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+tokens_oauth = TokenCacheOAuth()
+
+
+def limpar_credenciais() -> None:
+    """Fecha sessões, descarta tokens e apaga os PEMs gerados (encerramento / troca de certificado)."""
+    global _diretorio
+    with _sessoes_lock:
+        sessoes = list(_sessoes.values())
+        _sessoes.clear()
+    for sessao in sessoes:
+        try:
+            sessao.close()
+        except Exception:
+            pass
+    tokens_oauth.limpar()
+    with _pems_lock:
+        _pems.clear()
+        if _diretorio:
+            shutil.rmtree(_diretorio, ignore_errors=True)
+            _diretorio = None
+
+
+atexit.register(limpar_credenciais)
@@ -5,14 +5,21 @@ Utils - Portal Proxy
 Funções para fazer requisições HTTP ao Portal Único Siscomex.
 """
 
+import dataclasses
 import json
+import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # Importar duimp_auth com tratamento de erro (pode não estar disponível)
 try:
@@ -48,7 +55,20 @@ except ImportError:
         duimp_auth = None
         build_session = None
 
-from utils.auth import ensure_tokens, get_effective_base_url
+from utils.auth import get_effective_base_url
+
+logger = logging.getLogger(__name__)
+
+# ✅ NOVO (16/10/2026): cliente do Portal Único reutilizável (ver `PortalClient`)
+PORTAL_POOL_MAXSIZE = int(os.getenv('PORTAL_POOL_MAXSIZE', '10'))
+PORTAL_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('PORTAL_TOKEN_REFRESH_MARGIN_SECONDS', '120'))
+PORTAL_ITENS_MAX_WORKERS = int(os.getenv('PORTAL_ITENS_MAX_WORKERS', '4'))
+PORTAL_TIMEOUT_SECONDS = int(os.getenv('PORTAL_TIMEOUT_SECONDS', '60'))
+# Log de requisições/respostas em debug_log.txt: antes era sempre síncrono; agora opt-in e assíncrono
+PORTAL_DEBUG_LOG = os.getenv('PORTAL_DEBUG_LOG', 'false').lower() == 'true'
+PORTAL_DEBUG_LOG_MAX_FILA = int(os.getenv('PORTAL_DEBUG_LOG_MAX_FILA', '1000'))
+
+_DEBUG_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'debug_log.txt')
 
 
 def normalize_duimp_path(path: str) -> str:
@@ -85,12 +105,288 @@ def normalize_duimp_path(path: str) -> str:
     return p
 
 
+def _mascarar_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Cópia dos headers com tokens truncados (o log não deve carregar credenciais inteiras)."""
+    mascarados = dict(headers)
+    for nome in ('Authorization', 'X-CSRF-Token'):
+        valor = mascarados.get(nome)
+        if valor:
+            mascarados[nome] = f'{valor[:12]}...({len(valor)} chars)'
+    return mascarados
+
+
+class _DebugLogAssincrono:
+    """
+    Sink opcional do debug_log.txt: fila limitada + thread escritora (daemon).
+
+    Quem faz a requisição só enfileira; com a fila cheia a linha é descartada (e contada),
+    nunca bloqueia a chamada ao Portal.
+    """
+
+    def __init__(self, path: str, max_fila: int):
+        self.path = path
+        self.descartadas = 0
+        self._fila: 'queue.Queue[str]' = queue.Queue(maxsize=max(1, max_fila))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def escrever(self, texto: str) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name='portal-debug-log', daemon=True)
+                    self._thread.start()
+        try:
+            self._fila.put_nowait(texto)
+        except queue.Full:
+            self.descartadas += 1
+
+    def aguardar(self, timeout: float = 5.0) -> None:
+        """Espera a fila esvaziar (testes / encerramento)."""
+        limite = time.monotonic() + timeout
+        while self._fila.unfinished_tasks and time.monotonic() < limite:
+            time.sleep(0.01)
+
+    def _loop(self) -> None:
+        while True:
+            blocos = [self._fila.get()]
+            while True:  # agrupar o que já estiver na fila em uma escrita
+                try:
+                    blocos.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(blocos))
+            except Exception as e:
+                logger.debug(f'[PORTAL] Falha ao gravar debug_log: {e}')
+            finally:
+                for _ in blocos:
+                    self._fila.task_done()
+
+
+_debug_log = _DebugLogAssincrono(_DEBUG_LOG_PATH, PORTAL_DEBUG_LOG_MAX_FILA)
+
+
+def _log_debug(texto: str) -> None:
+    if PORTAL_DEBUG_LOG:
+        _debug_log.escrever(texto)
+
+
+class PortalClient:
+    """
+    Cliente do Portal Único para UM ambiente (base_url).
+
+    ✅ NOVO (16/10/2026): `call_portal` montava settings, conferia tokens (lendo o cache em disco
+    e o hash do .pfx) e abria uma `requests.Session` mTLS nova (extração do .pfx via openssl +
+    handshake TLS) a CADA chamada — uma DUIMP com N itens pagava isso N+1 vezes. Agora:
+
+    - uma sessão por ambiente, com pool de conexões keep-alive (`PORTAL_POOL_MAXSIZE`);
+    - Set-Token/CSRF em memória até a expiração, renovados antes de vencer
+      (`PORTAL_TOKEN_REFRESH_MARGIN_SECONDS`): uma thread renova, as demais seguem com o token
+      ainda válido; 401 invalida o token e a chamada é repetida uma vez;
+    - seguro para várias threads (itens da DUIMP em paralelo via `buscar_itens_duimp`).
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.base_url = settings.base_url
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._tokens: Optional[Tuple[str, str, float]] = None  # (set_token, csrf_token, expira_em epoch s)
+        self._tokens_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ sessão
+    def _obter_session(self) -> requests.Session:
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                if self._session is None:
+                    if build_session is None:
+                        raise ImportError("duimp_request não está disponível. Verifique se o módulo duimp_request.py existe no diretório raiz do projeto.")
+                    nova = build_session(self.settings)
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PORTAL_POOL_MAXSIZE)
+                    nova.mount('https://', adapter)
+                    nova.mount('http://', adapter)
+                    self._session = nova
+                session = self._session
+        return session
+
+    def fechar(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                try:
+                    self._session.close()
+                except Exception:
+                    pass
+                self._session = None
+
+    # ------------------------------------------------------------------ tokens
+    def obter_tokens(self) -> Tuple[str, str]:
+        """(set_token, csrf_token) válidos, renovando antes da expiração."""
+        tokens = self._tokens
+        restante = tokens[2] - time.time() if tokens else 0.0
+        if tokens and restante > PORTAL_TOKEN_REFRESH_MARGIN_SECONDS:
+            return tokens[0], tokens[1]
+
+        if tokens and restante > 0:
+            # Perto de vencer: só uma thread renova; as outras seguem com o token ainda válido
+            if not self._tokens_lock.acquire(blocking=False):
+                return tokens[0], tokens[1]
+        else:
+            self._tokens_lock.acquire()
+        try:
+            atual = self._tokens
+            if atual is not tokens and atual and atual[2] - time.time() > PORTAL_TOKEN_REFRESH_MARGIN_SECONDS:
+                return atual[0], atual[1]  # outra thread já renovou
+            self._tokens = self._renovar_tokens(forcar=tokens is not None)
+            return self._tokens[0], self._tokens[1]
+        finally:
+            self._tokens_lock.release()
+
+    def invalidar_tokens(self, set_token_rejeitado: Optional[str] = None) -> None:
+        """Descarta o token em memória (se ainda for o rejeitado) para a próxima chamada renovar."""
+        with self._tokens_lock:
+            if self._tokens and (set_token_rejeitado is None or self._tokens[0] == set_token_rejeitado):
+                self._tokens = (self._tokens[0], self._tokens[1], 0.0)
+
+    def _renovar_tokens(self, forcar: bool) -> Tuple[str, str, float]:
+        payload = duimp_auth.obtain_tokens(dataclasses.replace(self.settings, force_refresh=forcar))
+        expira_em = duimp_auth.resolve_expiration(payload.get('csrfExpiration')) / 1000.0
+        if not forcar and (
+            not payload.get('setToken') or not payload.get('csrfToken')
+            or expira_em - time.time() <= PORTAL_TOKEN_REFRESH_MARGIN_SECONDS
+        ):
+            # Cache em disco vazio/perto de vencer: autenticar de novo
+            payload = duimp_auth.obtain_tokens(dataclasses.replace(self.settings, force_refresh=True))
+            expira_em = duimp_auth.resolve_expiration(payload.get('csrfExpiration')) / 1000.0
+        set_token, csrf_token = payload.get('setToken'), payload.get('csrfToken')
+        if not set_token or not csrf_token:
+            raise RuntimeError('Tokens não encontrados após refresh.')
+        logger.debug(f'[PORTAL] Tokens renovados para {self.base_url} (expiram em {int(expira_em - time.time())}s)')
+        return set_token, csrf_token, expira_em
+
+    # ------------------------------------------------------------------ requisições
+    def requisitar(
+        self,
+        path: str,
+        query: Optional[Dict[str, Any]] = None,
+        accept: str = 'application/json',
+        method: str = 'GET',
+        body: Optional[Dict[str, Any]] = None,
+        rotulo: str = 'REQUEST',
+    ) -> Tuple[requests.Response, bytes]:
+        """
+        Executa a requisição autenticada. Retorna (response, conteúdo) com a conexão já devolvida ao pool.
+
+        401 invalida o token e repete a chamada uma vez com token novo.
+        """
+        session = self._obter_session()
+        url = urljoin(self.base_url.rstrip('/') + '/', path.lstrip('/'))
+        for tentativa in range(2):
+            set_token, csrf_token = self.obter_tokens()
+            headers = {'Authorization': set_token, 'X-CSRF-Token': csrf_token, 'Accept': accept or 'application/json'}
+            # Se for POST/PUT, adicionar Content-Type para JSON
+            if method in ('POST', 'PUT', 'PATCH') and body is not None:
+                headers['Content-Type'] = 'application/json'
+            _log_debug(
+                f"--- NEW {rotulo} ---\nMETHOD: {method}\nURL: {url}\n"
+                f"HEADERS: {json.dumps(_mascarar_headers(headers), indent=2)}\n"
+            )
+
+            kwargs: Dict[str, Any] = {'params': query, 'headers': headers, 'timeout': PORTAL_TIMEOUT_SECONDS}
+            if method in ('POST', 'PUT', 'PATCH'):
+                kwargs['json'] = body
+            response = session.request(method, url, **kwargs)
+            try:
+                conteudo = response.content
+            finally:
+                response.close()
+
+            if PORTAL_DEBUG_LOG:
+                _log_debug(
+                    f"--- RESPONSE ---\nSTATUS: {response.status_code}\nCT: {response.headers.get('Content-Type')}\n"
+                    f"BODY:\n{response.text[:2000]}\n\n"
+                )
+            if response.status_code == 401 and tentativa == 0:
+                logger.info(f'[PORTAL] 401 em {path}; renovando tokens e repetindo a chamada')
+                self.invalidar_tokens(set_token)
+                continue
+            return response, conteudo
+        return response, conteudo
+
+    def buscar_itens_duimp(
+        self,
+        numero: str,
+        versao: str,
+        indices: Iterable[Any],
+        max_workers: Optional[int] = None,
+    ) -> List[Tuple[Any, int, Any]]:
+        """
+        Busca os itens da DUIMP com paralelismo limitado (`PORTAL_ITENS_MAX_WORKERS`).
+
+        Returns:
+            Lista [(indice, status_code, body)] na ordem dos índices. Erro em um item vira
+            (indice, 500, {'erro': ...}) sem interromper os demais.
+        """
+        indices = list(indices)
+        if not indices:
+            return []
+
+        def _buscar(indice: Any) -> Tuple[Any, int, Any]:
+            try:
+                status, dados = _executar_call_portal(self, f'/duimp-api/api/ext/duimp/{numero}/{versao}/itens/{indice}')
+                return indice, status, dados
+            except Exception as e:
+                logger.warning(f'[PORTAL] Erro ao buscar item {indice} da DUIMP {numero}/{versao}: {e}')
+                return indice, 500, {'erro': str(e)}
+
+        workers = max(1, min(max_workers or PORTAL_ITENS_MAX_WORKERS, len(indices)))
+        if workers == 1:
+            return [_buscar(i) for i in indices]
+        # Tokens/sessão prontos antes de disparar as threads (uma autenticação, não N)
+        self.obter_tokens()
+        self._obter_session()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='portal-itens') as pool:
+            return list(pool.map(_buscar, indices))
+
+
+_clients: Dict[str, PortalClient] = {}
+_clients_lock = threading.Lock()
+
+
+def obter_portal_client(base_url: Optional[str] = None) -> PortalClient:
+    """Cliente compartilhado do ambiente (padrão: `PUCOMEX_BASE_URL`)."""
+    if duimp_auth is None:
+        raise ImportError("duimp_auth não está disponível. Verifique se o módulo duimp_auth.py existe no diretório raiz do projeto.")
+    base_url = (base_url or get_effective_base_url()).strip()
+    client = _clients.get(base_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(base_url)
+            if client is None:
+                settings = duimp_auth.load_settings()
+                settings.base_url = base_url
+                client = _clients[base_url] = PortalClient(settings)
+    return client
+
+
+def resetar_portal_clients() -> None:
+    """Fecha as sessões e descarta os clientes (troca de certificado/credenciais, testes)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.fechar()
+
+
 def call_portal(path: str, query: Optional[Dict[str, Any]] = None, accept: str = 'application/json', method: str = 'GET', body: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
     """
     Função auxiliar centralizada para fazer requisições HTTP ao Portal Único Siscomex.
     Gerencia automaticamente autenticação, tokens, sessão e normalização de URLs.
     
     ⚠️ CRÍTICO: Esta função é usada por TODOS os endpoints do fluxo DUIMP.
+    ✅ OTIMIZADO (16/10/2026): usa o `PortalClient` do ambiente (sessão e tokens reaproveitados).
     
     Args:
         path: Caminho da API (será normalizado automaticamente)
@@ -102,94 +398,67 @@ def call_portal(path: str, query: Optional[Dict[str, Any]] = None, accept: str =
     Returns:
         Tuple[int, Any]: (status_code, response_body)
     """
-    if duimp_auth is None:
-        raise ImportError("duimp_auth não está disponível. Verifique se o módulo duimp_auth.py existe no diretório raiz do projeto.")
-    
-    settings = duimp_auth.load_settings()
-    settings.base_url = get_effective_base_url()
+    return _executar_call_portal(obter_portal_client(), path, query, accept, method, body)
 
-    set_token, csrf_token = ensure_tokens(settings)
-    
-    if build_session is None:
-        raise ImportError("duimp_request não está disponível. Verifique se o módulo duimp_request.py existe no diretório raiz do projeto.")
-    
-    session = build_session(settings)
-    headers = {'Authorization': set_token, 'X-CSRF-Token': csrf_token, 'Accept': accept or 'application/json'}
-    
-    # Se for POST/PUT, adicionar Content-Type para JSON
-    if method in ('POST', 'PUT', 'PATCH') and body is not None:
-        headers['Content-Type'] = 'application/json'
 
-    # >>> AJUSTE CRÍTICO: normalizar caminho relativo de itens da Duimp <<<
-    path = normalize_duimp_path(path)
-
-    url = urljoin(settings.base_url.rstrip('/') + '/', path.lstrip('/'))
-    response: Optional[requests.Response] = None
+def call_portal_itens_duimp(numero: str, versao: str, indices: Iterable[Any], max_workers: Optional[int] = None) -> List[Tuple[Any, int, Any]]:
+    """Atalho: todos os itens da DUIMP em paralelo limitado (ver `PortalClient.buscar_itens_duimp`)."""
+    return obter_portal_client().buscar_itens_duimp(numero, versao, indices, max_workers=max_workers)
 
-    log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'debug_log.txt')
-    try:
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"--- NEW REQUEST ---\nMETHOD: {method}\nURL: {url}\n")
-            f.write(f"HEADERS: {json.dumps(headers, indent=2)}\n")
-
-        # Fazer requisição com método especificado
-        if method in ('POST', 'PUT', 'PATCH'):
-            response = session.request(method, url, params=query, headers=headers, json=body, timeout=60)
-        else:
-            response = session.request(method, url, params=query, headers=headers, timeout=60)
 
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"--- RESPONSE ---\nSTATUS: {response.status_code}\nCT: {response.headers.get('Content-Type')}\nBODY:\n{response.text[:2000]}\n\n")
+def _executar_call_portal(
+    client: PortalClient,
+    path: str,
+    query: Optional[Dict[str, Any]] = None,
+    accept: str = 'application/json',
+    method: str = 'GET',
+    body: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, Any]:
+    # >>> AJUSTE CRÍTICO: normalizar caminho relativo de itens da Duimp <<<
+    path = normalize_duimp_path(path)
+    response, conteudo = client.requisitar(path, query=query, accept=accept, method=method, body=body)
 
-        content_type = (response.headers.get('Content-Type') or '').lower()
-        is_json_expected = 'application/json' in (accept or '').lower()
-        is_html_response = 'text/html' in content_type
+    content_type = (response.headers.get('Content-Type') or '').lower()
+    is_json_expected = 'application/json' in (accept or '').lower()
+    is_html_response = 'text/html' in content_type
 
-        if is_json_expected and is_html_response:
-            body = {'error': 'ERRO_API_EXTERNA', 'message': 'API retornou HTML, não JSON.', 'details': response.text[:1000]}
-            status_code = 502 if 200 <= response.status_code < 300 else response.status_code
-            return status_code, body
+    if is_json_expected and is_html_response:
+        body = {'error': 'ERRO_API_EXTERNA', 'message': 'API retornou HTML, não JSON.', 'details': response.text[:1000]}
+        status_code = 502 if 200 <= response.status_code < 300 else response.status_code
+        return status_code, body
 
-        if 'application/json' in content_type:
-            try:
-                body: Any = response.json()
-            except ValueError:
-                body = response.text
-        elif 'application/zip' in content_type or 'application/octet-stream' in content_type:
-            downloads_dir = Path('downloads')
-            downloads_dir.mkdir(exist_ok=True)
-            # Usar extensão .zip para arquivos ZIP
-            filename = downloads_dir / f'download_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
-            filename.write_bytes(response.content)
-            body = f'<arquivo salvo em {filename.resolve()} ({len(response.content)} bytes)>\n<br>Caminho completo: <code>{filename.resolve()}</code>'
-        else:
+    if 'application/json' in content_type:
+        try:
+            body: Any = response.json()
+        except ValueError:
             body = response.text
+    elif 'application/zip' in content_type or 'application/octet-stream' in content_type:
+        downloads_dir = Path('downloads')
+        downloads_dir.mkdir(exist_ok=True)
+        # Usar extensão .zip para arquivos ZIP
+        filename = downloads_dir / f'download_{datetime.now().strftime("%Y%m%d_%H%M%S_%f")}.zip'
+        filename.write_bytes(conteudo)
+        body = f'<arquivo salvo em {filename.resolve()} ({len(conteudo)} bytes)>\n<br>Caminho completo: <code>{filename.resolve()}</code>'
+    else:
+        body = response.text
 
-        status_code = response.status_code
-        
-        # ✅ NOVO: Gravar histórico de mudanças se resposta for de documento aduaneiro
-        if status_code == 200 and body and isinstance(body, dict):
-            try:
-                _gravar_historico_se_documento(
-                    path=path,
-                    response_body=body,
-                    processo_referencia=None,  # Portal não passa processo_referencia
-                    fonte_dados='PORTAL_UNICO',
-                    api_endpoint=path
-                )
-            except Exception as e:
-                # Não bloquear se houver erro no histórico
-                import logging
-                logging.warning(f'⚠️ Erro ao gravar histórico de documento: {e}')
+    status_code = response.status_code
+    
+    # ✅ NOVO: Gravar histórico de mudanças se resposta for de documento aduaneiro
+    if status_code == 200 and body and isinstance(body, dict):
+        try:
+            _gravar_historico_se_documento(
+                path=path,
+                response_body=body,
+                processo_referencia=None,  # Portal não passa processo_referencia
+                fonte_dados='PORTAL_UNICO',
+                api_endpoint=path
+            )
+        except Exception as e:
+            # Não bloquear se houver erro no histórico
+            logging.warning(f'⚠️ Erro ao gravar histórico de documento: {e}')
 
-        return status_code, body
-    finally:
-        if response is not None:
-            try:
-                response.close()
-            except Exception:
-                pass
-        session.close()
+    return status_code, body
 
 
 def _gravar_historico_se_documento(
@@ -278,67 +547,29 @@ def call_portal_catp(path: str, query: Optional[Dict[str, Any]] = None, accept:
     Returns:
         Tuple[int, Any]: (status_code, response_body)
     """
-    settings = duimp_auth.load_settings()
-    
     # Determinar URL base conforme ambiente
     # ✅ CRÍTICO: O ambiente usado para buscar atributos DEVE ser o mesmo usado para cadastrar o produto
     if ambiente == 'validacao':
-        settings.base_url = 'https://val.portalunico.siscomex.gov.br'
+        base_url = 'https://val.portalunico.siscomex.gov.br'
     elif ambiente == 'producao':
-        settings.base_url = 'https://portalunico.siscomex.gov.br'
+        base_url = 'https://portalunico.siscomex.gov.br'
     else:  # homologacao ou outros
-        settings.base_url = 'https://hom.pucomex.serpro.gov.br'
+        base_url = 'https://hom.pucomex.serpro.gov.br'
     
-    set_token, csrf_token = ensure_tokens(settings)
-    
-    if build_session is None:
-        raise ImportError("duimp_request não está disponível. Verifique se o módulo duimp_request.py existe no diretório raiz do projeto.")
-    
-    session = build_session(settings)
-    headers = {'Authorization': set_token, 'X-CSRF-Token': csrf_token, 'Accept': accept or 'application/json'}
-    
-    # Se for POST/PUT, adicionar Content-Type para JSON
-    if method in ('POST', 'PUT', 'PATCH') and body is not None:
-        headers['Content-Type'] = 'application/json'
-    
-    url = urljoin(settings.base_url.rstrip('/') + '/', path.lstrip('/'))
-    response: Optional[requests.Response] = None
-    
-    log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'debug_log.txt')
+    client = obter_portal_client(base_url)
+    client.obter_tokens()  # falha de autenticação propaga (como antes), não vira 500
     try:
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"--- NEW CATP REQUEST (ambiente: {ambiente}) ---\nMETHOD: {method}\nURL: {url}\n")
-            f.write(f"HEADERS: {json.dumps(headers, indent=2)}\n")
-        
-        # Fazer requisição com método especificado
-        if method in ('POST', 'PUT', 'PATCH'):
-            response = session.request(method, url, params=query, headers=headers, json=body, timeout=60)
-        else:
-            response = session.request(method, url, params=query, headers=headers, timeout=60)
-        
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"STATUS: {response.status_code}\n")
-            if response.text:
-                f.write(f"RESPONSE: {response.text[:500]}\n")
-        
+        response, _ = client.requisitar(
+            path, query=query, accept=accept, method=method, body=body, rotulo=f'CATP REQUEST (ambiente: {ambiente})'
+        )
         status = response.status_code
         try:
             body_data = response.json() if response.text else {}
-        except:
+        except ValueError:
             body_data = response.text if response.text else {}
         
         return (status, body_data)
     except Exception as e:
-        import logging
         logging.error(f'Erro ao chamar CATP API: {str(e)}')
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(f"ERROR: {str(e)}\n")
+        _log_debug(f"ERROR: {str(e)}\n")
         return (500, {'error': str(e)})
-    finally:
-        if response is not None:
-            try:
-                response.close()
-            except Exception:
-                pass
-        session.close()
-
@@ -18,31 +18,38 @@ API oficial: https://olinda.bcb.gov.br/olinda/servico/PTAX/versao/v1/odata/
 import requests
 import logging
 import calendar
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
 # URL base da API do Banco Central
 BCB_PTAX_API_BASE = "https://olinda.bcb.gov.br/olinda/servico/PTAX/versao/v1/odata"
 
+# ✅ NOVO (16/10/2026): store local de PTAX (`services/ptax_store.py`)
+PTAX_TIMEOUT_SECONDS = float(os.getenv("PTAX_TIMEOUT_SECONDS", "10"))
+PTAX_AQUECIMENTO_MESES = int(os.getenv("PTAX_AQUECIMENTO_MESES", "12"))
+PTAX_MOEDA_PADRAO = "USD"
+
 
 def _eh_dia_util(data_dt: datetime) -> bool:
     """
     Verifica se uma data é dia útil (segunda a sexta, não feriado).
     
-    ⚠️ NOTA: Esta função não verifica feriados nacionais. Apenas verifica se é segunda a sexta.
-    Para verificação completa de feriados, seria necessário usar biblioteca externa.
+    ✅ OTIMIZADO (16/10/2026): usa o calendário de `services/ptax_store.py` (feriados nacionais,
+    Carnaval/Sexta-feira Santa/Corpus Christi e dias úteis em que o BCB não publicou PTAX).
     
     Args:
         data_dt: Data como datetime
     
     Returns:
-        True se for dia útil (segunda a sexta), False caso contrário
+        True se for dia útil, False caso contrário
     """
-    # 0 = Segunda, 1 = Terça, ..., 4 = Sexta, 5 = Sábado, 6 = Domingo
-    dia_semana = data_dt.weekday()
-    return dia_semana < 5  # Segunda (0) a Sexta (4)
+    from services.ptax_store import eh_dia_util
+    dia = data_dt.date() if isinstance(data_dt, datetime) else data_dt
+    return eh_dia_util(dia)
 
 
 def _obter_ultimo_dia_util(data_dt: datetime, max_dias: int = 10) -> Optional[datetime]:
@@ -63,6 +70,118 @@ def _obter_ultimo_dia_util(data_dt: datetime, max_dias: int = 10) -> Optional[da
     return None
 
 
+def _buscar_cotacoes_api(moeda: str, inicio: date, fim: date) -> List[Dict[str, Any]]:
+    """Uma chamada `CotacaoMoedaPeriodo` com todos os boletins do intervalo (itens de `value`)."""
+    url = (
+        f"{BCB_PTAX_API_BASE}/CotacaoMoedaPeriodo(moeda=@moeda,dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)"
+        f"?@moeda='{moeda}'&@dataInicial='{inicio.strftime('%m-%d-%Y')}'&@dataFinalCotacao='{fim.strftime('%m-%d-%Y')}'&$format=json"
+    )
+    response = requests.get(url, timeout=PTAX_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response.json().get('value') or []
+
+
+_locks_mes: Dict[Tuple[str, int, int], threading.Lock] = {}
+_locks_mes_guard = threading.Lock()
+
+
+def _carregar_mes(moeda: str, ano: int, mes: int) -> int:
+    """
+    Baixa o mês inteiro (até ontem) numa chamada e grava no store, se ainda faltar algum dia.
+
+    Pedidos simultâneos do mesmo mês esperam um único download.
+
+    Returns:
+        Quantidade de boletins baixados (0 se o mês já estava completo).
+    """
+    from services import ptax_store
+
+    inicio = date(ano, mes, 1)
+    fim = min(date(ano, mes, calendar.monthrange(ano, mes)[1]), date.today() - timedelta(days=1))
+    if fim < inicio:
+        return 0
+    with _locks_mes_guard:
+        lock = _locks_mes.setdefault((moeda, ano, mes), threading.Lock())
+    with lock:
+        pendentes = ptax_store.dias_pendentes(moeda, inicio, fim)
+        if not pendentes:
+            return 0
+        # Só o trecho que falta (mês parcialmente carregado em execuções anteriores)
+        inicio = pendentes[0]
+        logger.info(f"📥 Baixando PTAX {moeda} de {inicio.isoformat()} a {fim.isoformat()} para o store local...")
+        cotacoes = _buscar_cotacoes_api(moeda, inicio, fim)
+        return ptax_store.gravar_cotacoes(moeda, cotacoes, dias_fechados=(inicio, fim))
+
+
+def _cotacoes_do_dia(data_dt: datetime, moeda: str = PTAX_MOEDA_PADRAO) -> List[Dict[str, Any]]:
+    """
+    Boletins do dia (formato da API do BCB).
+
+    Dia já fechado: lido do store (o mês é baixado de uma vez na primeira falta).
+    Hoje/futuro: consulta ao vivo (boletins do dia ainda mudam), gravando o que veio.
+    Se o SQLite falhar, cai na consulta ao vivo do dia, como antes.
+    """
+    from services import ptax_store
+
+    dia = data_dt.date() if isinstance(data_dt, datetime) else data_dt
+    if ptax_store.PTAX_STORE_ENABLED and dia < date.today():
+        try:
+            cotacoes = ptax_store.ler_cotacoes_dia(moeda, dia)
+            if cotacoes is None:
+                _carregar_mes(moeda, dia.year, dia.month)
+                cotacoes = ptax_store.ler_cotacoes_dia(moeda, dia)
+            if cotacoes is not None:
+                return cotacoes
+        except requests.exceptions.RequestException:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Store local de PTAX indisponível ({e}). Consultando BCB diretamente...")
+
+    cotacoes = _buscar_cotacoes_api(moeda, dia, dia)
+    if ptax_store.PTAX_STORE_ENABLED and cotacoes:
+        try:
+            ptax_store.gravar_cotacoes(moeda, cotacoes)
+        except Exception as e:
+            logger.debug(f"Falha ao gravar PTAX de {dia.isoformat()} no store local: {e}")
+    return cotacoes
+
+
+def _prioridade_boletim(cot: Dict[str, Any]) -> Tuple[int, str]:
+    """Prioridade: 1=Fechamento Interbancário, 2=Fechamento, 3=Intermediário (mais recente), 4=Abertura."""
+    tipo = cot.get('tipoBoletim', '').lower()
+    hora = cot.get('dataHoraCotacao', '')
+    if 'fechamento interbancário' in tipo or 'fechamento interbancario' in tipo:
+        return (1, hora)  # Maior prioridade
+    elif 'fechamento' in tipo and 'interbanc' not in tipo:
+        return (2, hora)  # Fechamento normal (cotação oficial do dia)
+    elif 'intermediário' in tipo or 'intermediario' in tipo:
+        return (3, hora)  # Intermediário (usar mais recente se não tiver Fechamento)
+    elif 'abertura' in tipo:
+        return (4, hora)  # Abertura (menor prioridade - só usar se não tiver outras)
+    else:
+        return (5, hora)  # Outros tipos
+
+
+def _selecionar_cotacao(cots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Melhor boletim do dia.
+
+    Ordena por tipo de boletim (prioridade) e depois por hora; Intermediários vêm depois dos
+    demais, do mais recente para o mais antigo. O Fechamento é a cotação oficial do dia para fins fiscais.
+    """
+    intermediarios = [c for c in cots if _prioridade_boletim(c)[0] == 3]
+    outros = [c for c in cots if _prioridade_boletim(c)[0] != 3]
+    outros_ordenados = sorted(outros, key=_prioridade_boletim)
+    intermediarios_ordenados = sorted(intermediarios, key=lambda x: _prioridade_boletim(x)[1], reverse=True)
+    return (outros_ordenados + intermediarios_ordenados)[0]
+
+
+def _fechamento_do_dia(cots: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Boletim de Fechamento (a PTAX do dia), ou None se o dia ainda não fechou / não teve PTAX."""
+    fechamentos = [c for c in cots if _prioridade_boletim(c)[0] <= 2]
+    return _selecionar_cotacao(fechamentos) if fechamentos else None
+
+
 def obter_ptax_dolar(data: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Obtém a cotação PTAX do dólar americano para uma data específica.
@@ -218,19 +337,14 @@ def obter_ptax_dolar(data: Optional[str] = None) -> Optional[Dict[str, Any]]:
         
         # ✅ CORREÇÃO: Usar endpoint CotacaoMoedaPeriodo para buscar todas as cotações do dia
         # Isso permite selecionar a cotação correta baseada no tipo de boletim
-        url = f"{BCB_PTAX_API_BASE}/CotacaoMoedaPeriodo(moeda=@moeda,dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)?@moeda='USD'&@dataInicial='{data_para_buscar}'&@dataFinalCotacao='{data_para_buscar}'&$format=json"
+        # ✅ OTIMIZADO (16/10/2026): dia já fechado vem do store local (mês baixado uma vez)
+        cots = _cotacoes_do_dia(data_para_buscar_dt)
         
-        # Fazer requisição
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        # Parsear JSON
-        data_json = response.json()
-        
-        # A API retorna em 'value' (array de cotações do dia)
-        if 'value' not in data_json or len(data_json['value']) == 0:
+        if not cots:
             # ✅ NOVO: Se é data futura ou hoje sem cotação, usar último dia útil disponível
-            if eh_data_futura or (eh_hoje and data_para_buscar == data):
+            # ✅ NOVO (16/10/2026): idem para dia passado que o calendário descobriu sem PTAX publicada
+            sem_ptax_publicada = eh_passado and not _eh_dia_util(data_para_buscar_dt)
+            if eh_data_futura or (eh_hoje and data_para_buscar == data) or sem_ptax_publicada:
                 logger.info(f"⚠️ {data} é data futura ou hoje sem cotação ainda. Buscando último dia útil disponível...")
                 ultimo_dia_util = _obter_ultimo_dia_util(data_solicitada_dt)
                 if ultimo_dia_util:
@@ -238,13 +352,10 @@ def obter_ptax_dolar(data: Optional[str] = None) -> Optional[Dict[str, Any]]:
                     data_para_buscar = data_para_buscar_dt.strftime('%m-%d-%Y')
                     logger.info(f"🔄 Tentando cotação de {data_para_buscar} (último dia útil disponível)...")
                     # Tentar novamente com último dia útil
-                    url = f"{BCB_PTAX_API_BASE}/CotacaoMoedaPeriodo(moeda=@moeda,dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)?@moeda='USD'&@dataInicial='{data_para_buscar}'&@dataFinalCotacao='{data_para_buscar}'&$format=json"
-                    response = requests.get(url, timeout=10)
-                    response.raise_for_status()
-                    data_json = response.json()
+                    cots = _cotacoes_do_dia(data_para_buscar_dt)
             
             # Se ainda não tem cotação, retornar erro
-            if 'value' not in data_json or len(data_json['value']) == 0:
+            if not cots:
                 logger.warning(f"⚠️ Nenhuma cotação encontrada para {data_para_buscar}")
                 return {
                     'sucesso': False,
@@ -256,10 +367,6 @@ def obter_ptax_dolar(data: Optional[str] = None) -> Optional[Dict[str, Any]]:
                     'timestamp': datetime.now().isoformat()
                 }
         
-        # ✅ NOVO: Selecionar a melhor cotação baseada no tipo de boletim
-        # Prioridade: Fechamento Interbancário > Fechamento > Intermediário (mais recente) > Abertura
-        cots = data_json['value']
-        
         # ✅ CRÍTICO: Se é hoje e só tem Abertura (dia ainda não fechou), buscar Fechamento do dia anterior
         # ⚠️ EXCEÇÃO: Se a data solicitada é AMANHÃ, usar Abertura de HOJE (não buscar Fechamento de ontem)
         eh_data_buscada_hoje = data_para_buscar_dt.date() == datetime.now().date()
@@ -274,69 +381,22 @@ def obter_ptax_dolar(data: Optional[str] = None) -> Optional[Dict[str, Any]]:
             ultimo_dia_util = _obter_ultimo_dia_util(data_para_buscar_dt)
             if ultimo_dia_util:
                 data_fechamento = ultimo_dia_util.strftime('%m-%d-%Y')
-                url_fechamento = f"{BCB_PTAX_API_BASE}/CotacaoMoedaPeriodo(moeda=@moeda,dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)?@moeda='USD'&@dataInicial='{data_fechamento}'&@dataFinalCotacao='{data_fechamento}'&$format=json"
                 try:
-                    response_fechamento = requests.get(url_fechamento, timeout=10)
-                    response_fechamento.raise_for_status()
-                    data_json_fechamento = response_fechamento.json()
-                    if 'value' in data_json_fechamento and len(data_json_fechamento['value']) > 0:
-                        # Buscar Fechamento do dia anterior
-                        cots_anterior = data_json_fechamento['value']
-                        fechamento_anterior = None
-                        for cot in cots_anterior:
-                            if 'fechamento' in cot.get('tipoBoletim', '').lower():
-                                fechamento_anterior = cot
-                                break
-                        if fechamento_anterior:
-                            logger.info(f"✅ Usando Fechamento de {data_fechamento} para {data} (dia ainda não fechou)")
-                            cots = [fechamento_anterior]  # Usar apenas o Fechamento do dia anterior
-                            data_para_buscar_dt = ultimo_dia_util
-                            data_para_buscar = data_fechamento
+                    fechamento_anterior = None
+                    for cot in _cotacoes_do_dia(ultimo_dia_util):
+                        if 'fechamento' in cot.get('tipoBoletim', '').lower():
+                            fechamento_anterior = cot
+                            break
+                    if fechamento_anterior:
+                        logger.info(f"✅ Usando Fechamento de {data_fechamento} para {data} (dia ainda não fechou)")
+                        cots = [fechamento_anterior]  # Usar apenas o Fechamento do dia anterior
+                        data_para_buscar_dt = ultimo_dia_util
+                        data_para_buscar = data_fechamento
                 except Exception as e:
                     logger.warning(f"⚠️ Erro ao buscar Fechamento do dia anterior: {e}. Usando Abertura do dia atual.")
         
-        # ✅ CORREÇÃO: Ordenar por tipo de boletim (prioridade) e depois por hora (mais recente primeiro)
         # Prioridade: Fechamento Interbancário > Fechamento > Intermediário (mais recente) > Abertura
-        # O Fechamento é a cotação oficial do dia para fins fiscais
-        def prioridade_boletim(cot):
-            tipo = cot.get('tipoBoletim', '').lower()
-            hora = cot.get('dataHoraCotacao', '')
-            # Prioridade: 1=Fechamento Interbancário, 2=Fechamento, 3=Intermediário (mais recente), 4=Abertura
-            if 'fechamento interbancário' in tipo or 'fechamento interbancario' in tipo:
-                return (1, hora)  # Maior prioridade
-            elif 'fechamento' in tipo and 'interbanc' not in tipo:
-                return (2, hora)  # Fechamento normal (cotação oficial do dia)
-            elif 'intermediário' in tipo or 'intermediario' in tipo:
-                return (3, hora)  # Intermediário (usar mais recente se não tiver Fechamento)
-            elif 'abertura' in tipo:
-                return (4, hora)  # Abertura (menor prioridade - só usar se não tiver outras)
-            else:
-                return (5, hora)  # Outros tipos
-        
-        # Ordenar e pegar a melhor
-        # Para Intermediário, queremos o mais recente (hora maior), então inverter ordem
-        def key_sort(cot):
-            prioridade, hora = prioridade_boletim(cot)
-            # Para Intermediário (prioridade 3), ordenar por hora decrescente (mais recente primeiro)
-            if prioridade == 3:
-                # Converter hora para ordenação (usar timestamp negativo para ordem decrescente)
-                # Como hora é string ISO, podemos ordenar diretamente (maior = mais recente)
-                return (prioridade, hora)  # Ordenar depois com reverse=True para Intermediário
-            else:
-                return (prioridade, hora)
-        
-        # Separar Intermediários dos outros para ordenar separadamente
-        intermediarios = [c for c in cots if prioridade_boletim(c)[0] == 3]
-        outros = [c for c in cots if prioridade_boletim(c)[0] != 3]
-        
-        # Ordenar outros normalmente
-        outros_ordenados = sorted(outros, key=key_sort)
-        # Ordenar Intermediários por hora decrescente (mais recente primeiro)
-        intermediarios_ordenados = sorted(intermediarios, key=lambda x: prioridade_boletim(x)[1], reverse=True)
-        
-        # Combinar: outros primeiro, depois Intermediários
-        cots_ordenadas = outros_ordenados + intermediarios_ordenados
-        cotacao = cots_ordenadas[0]  # Melhor cotação
+        cotacao = _selecionar_cotacao(cots)  # Melhor cotação
         
         # Extrair valores
         data_cotacao = cotacao.get('dataHoraCotacao', '').split('T')[0] if cotacao.get('dataHoraCotacao') else data
@@ -411,14 +471,11 @@ def obter_ptax_dia_util_anterior(data: str) -> Optional[Dict[str, Any]]:
             
             logger.info(f"🔍 Tentando PTAX para {data_str}...")
             
-            # Chamar API diretamente (sem recursão para evitar loop)
-            url = f"{BCB_PTAX_API_BASE}/CotacaoDolarDia(dataCotacao=@dataCotacao)?@dataCotacao='{data_str}'&$format=json"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data_json = response.json()
+            # ✅ OTIMIZADO (16/10/2026): Fechamento do dia (= CotacaoDolarDia) via store local;
+            # sem recursão em obter_ptax_dolar para evitar loop
+            cotacao = _fechamento_do_dia(_cotacoes_do_dia(data_anterior))
             
-            if 'value' in data_json and len(data_json['value']) > 0:
-                cotacao = data_json['value'][0]
+            if cotacao:
                 data_cotacao = cotacao.get('dataHoraCotacao', '').split('T')[0] if cotacao.get('dataHoraCotacao') else data_str
                 cotacao_compra = float(cotacao.get('cotacaoCompra', 0))
                 cotacao_venda = float(cotacao.get('cotacaoVenda', 0))
@@ -449,6 +506,9 @@ def obter_ptax_periodo(data_inicio: str, data_fim: str) -> Optional[list]:
     """
     Obtém cotações PTAX para um período.
     
+    ✅ OTIMIZADO (16/10/2026): dias já fechados vêm do store local (cada mês que faltar é
+    baixado numa chamada `CotacaoMoedaPeriodo`); só o dia de hoje é consultado ao vivo.
+    
     Args:
         data_inicio: Data inicial (MM-DD-YYYY)
         data_fim: Data final (MM-DD-YYYY)
@@ -457,42 +517,44 @@ def obter_ptax_periodo(data_inicio: str, data_fim: str) -> Optional[list]:
         Lista de dicts com cotações do período
     """
     try:
-        # Converter para formato da API (YYYY-MM-DD)
         partes_inicio = data_inicio.split('-')
         partes_fim = data_fim.split('-')
         
         if len(partes_inicio) != 3 or len(partes_fim) != 3:
             return None
         
-        data_inicio_api = f"{partes_inicio[2]}-{partes_inicio[0]}-{partes_inicio[1]}"
-        data_fim_api = f"{partes_fim[2]}-{partes_fim[0]}-{partes_fim[1]}"
+        from services import ptax_store
+        if not ptax_store.PTAX_STORE_ENABLED:
+            return _obter_ptax_periodo_api(partes_inicio, partes_fim)
         
-        # URL da API para período
-        url = f"{BCB_PTAX_API_BASE}/CotacaoDolarPeriodo(dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)?@dataInicial='{data_inicio_api}'&@dataFinalCotacao='{data_fim_api}'&$format=json"
+        inicio = date(int(partes_inicio[2]), int(partes_inicio[0]), int(partes_inicio[1]))
+        fim = date(int(partes_fim[2]), int(partes_fim[0]), int(partes_fim[1]))
+        hoje = date.today()
         
         logger.info(f"🔍 Consultando PTAX do período {data_inicio} a {data_fim}...")
         
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        data_json = response.json()
-        
-        if 'value' not in data_json:
-            return []
+        cots: List[Dict[str, Any]] = []
+        fim_fechado = min(fim, hoje - timedelta(days=1))
+        if inicio <= fim_fechado:
+            ano, mes = inicio.year, inicio.month
+            while (ano, mes) <= (fim_fechado.year, fim_fechado.month):
+                _carregar_mes(PTAX_MOEDA_PADRAO, ano, mes)
+                ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+            cots = ptax_store.ler_cotacoes_periodo(PTAX_MOEDA_PADRAO, inicio, fim_fechado)
+        if inicio <= hoje <= fim:
+            cots = cots + _cotacoes_do_dia(hoje)
+        
+        # Uma cotação por dia: o Fechamento (mesmo valor de CotacaoDolarPeriodo)
+        por_dia: Dict[str, List[Dict[str, Any]]] = {}
+        for cot in cots:
+            por_dia.setdefault(str(cot.get('dataHoraCotacao', ''))[:10], []).append(cot)
         
         resultados = []
-        for cotacao in data_json['value']:
-            data_cotacao = cotacao.get('dataHoraCotacao', '').split('T')[0] if cotacao.get('dataHoraCotacao') else None
-            cotacao_compra = float(cotacao.get('cotacaoCompra', 0))
-            cotacao_venda = float(cotacao.get('cotacaoVenda', 0))
-            cotacao_media = (cotacao_compra + cotacao_venda) / 2.0
-            
-            resultados.append({
-                'data_cotacao': data_cotacao,
-                'cotacao_compra': cotacao_compra,
-                'cotacao_venda': cotacao_venda,
-                'cotacao_media': cotacao_media
-            })
+        for dia in sorted(por_dia):
+            cotacao = _fechamento_do_dia(por_dia[dia])
+            if not cotacao:
+                continue
+            resultados.append(_resumo_cotacao(cotacao))
         
         logger.info(f"✅ {len(resultados)} cotações encontradas no período")
         
@@ -503,6 +565,70 @@ def obter_ptax_periodo(data_inicio: str, data_fim: str) -> Optional[list]:
         return None
 
 
+def _resumo_cotacao(cotacao: Dict[str, Any]) -> Dict[str, Any]:
+    data_cotacao = cotacao.get('dataHoraCotacao', '').split('T')[0] if cotacao.get('dataHoraCotacao') else None
+    cotacao_compra = float(cotacao.get('cotacaoCompra', 0))
+    cotacao_venda = float(cotacao.get('cotacaoVenda', 0))
+    return {
+        'data_cotacao': data_cotacao,
+        'cotacao_compra': cotacao_compra,
+        'cotacao_venda': cotacao_venda,
+        'cotacao_media': (cotacao_compra + cotacao_venda) / 2.0
+    }
+
+
+def _obter_ptax_periodo_api(partes_inicio: List[str], partes_fim: List[str]) -> list:
+    """Consulta direta `CotacaoDolarPeriodo` (store local desligado)."""
+    # Converter para formato da API (YYYY-MM-DD)
+    data_inicio_api = f"{partes_inicio[2]}-{partes_inicio[0]}-{partes_inicio[1]}"
+    data_fim_api = f"{partes_fim[2]}-{partes_fim[0]}-{partes_fim[1]}"
+    
+    # URL da API para período
+    url = f"{BCB_PTAX_API_BASE}/CotacaoDolarPeriodo(dataInicial=@dataInicial,dataFinalCotacao=@dataFinalCotacao)?@dataInicial='{data_inicio_api}'&@dataFinalCotacao='{data_fim_api}'&$format=json"
+    
+    response = requests.get(url, timeout=PTAX_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    
+    data_json = response.json()
+    
+    if 'value' not in data_json:
+        return []
+    
+    resultados = [_resumo_cotacao(cotacao) for cotacao in data_json['value']]
+    logger.info(f"✅ {len(resultados)} cotações encontradas no período")
+    return resultados
+
+
+def aquecer_ptax(meses: Optional[int] = None, moeda: str = PTAX_MOEDA_PADRAO) -> Dict[str, Any]:
+    """
+    Preenche o store local com os dias fechados que faltam nos últimos `meses` meses.
+    
+    ✅ NOVO (16/10/2026): rodado pelo scheduler (`ScheduledNotificationsService`), de manhã,
+    para que o Fechamento de ontem e os meses recentes já estejam no SQLite quando
+    cálculo de impostos, normalização de FOB, `/api/ptax` e preparo de DUIMP pedirem.
+    Meses completos custam só um SELECT; cada mês incompleto, uma chamada ao BCB.
+    
+    Returns:
+        Dict com 'meses_verificados', 'meses_baixados', 'boletins' e 'erros'.
+    """
+    meses = max(1, meses or PTAX_AQUECIMENTO_MESES)
+    hoje = date.today()
+    ano, mes = hoje.year, hoje.month
+    resultado: Dict[str, Any] = {'meses_verificados': 0, 'meses_baixados': 0, 'boletins': 0, 'erros': []}
+    for _ in range(meses):
+        resultado['meses_verificados'] += 1
+        try:
+            boletins = _carregar_mes(moeda, ano, mes)
+            if boletins:
+                resultado['meses_baixados'] += 1
+                resultado['boletins'] += boletins
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao aquecer PTAX {moeda} {mes:02d}/{ano}: {e}")
+            resultado['erros'].append(f"{mes:02d}/{ano}: {e}")
+        ano, mes = (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+    return resultado
+
+
 # Teste rápido
 if __name__ == "__main__":
     print("🔍 Testando PTAX do dólar...")
@@ -15,10 +15,10 @@ import json
 import time
 import os
 import logging
-import subprocess
-import tempfile
 from pathlib import Path
 
+from utils.mtls_credenciais import CertMTLS, materializar_pfx, obter_sessao, tokens_oauth
+
 logger = logging.getLogger(__name__)
 
 def _resolver_caminho_certificado(
@@ -160,86 +160,32 @@ class SantanderPaymentsAPI:
     
     def __init__(self, config: SantanderPaymentsConfig, debug: bool = False):
         self.config = config
-        self.session = requests.Session()
         self._access_token: Optional[str] = None
         self._token_expires_at: Optional[float] = None
         self.debug = debug
-        self._temp_cert_file: Optional[str] = None  # Arquivo temporário criado a partir de .pfx
+        self._mtls_cert: CertMTLS = None
         
         # Configurar certificados mTLS se fornecidos
         self._setup_mtls()
+        # ✅ OTIMIZADO (16/10/2026): sessão compartilhada (pool + retry) por ambiente/certificado.
+        # POST/PATCH (criação/efetivação de pagamento) nunca são repetidos pelo adapter.
+        self.session = obter_sessao('santander_pagamentos', self.config.base_url, cert=self._mtls_cert)
     
     def _extrair_pfx_para_pem(self, pfx_path: str, senha: str = "senha001") -> Optional[str]:
         """
         Extrai certificado e chave privada de um arquivo .pfx para .pem temporário.
         
         ✅ Igual ao Banco do Brasil - suporta .pfx automaticamente.
+        ✅ OTIMIZADO (16/10/2026): conversão única por processo (ver `utils.mtls_credenciais`).
         
         Args:
             pfx_path: Caminho do arquivo .pfx
             senha: Senha do arquivo .pfx
         
         Returns:
-            Caminho do arquivo .pem temporário ou None se falhar
+            Caminho do arquivo .pem (compartilhado, não apagar) ou None se falhar
         """
-        import subprocess
-        import tempfile
-        
-        try:
-            # Criar arquivo temporário
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.pem', prefix='santander_payments_')
-            os.close(temp_fd)
-            
-            # Extrair certificado e chave privada do .pfx
-            result = subprocess.run(
-                ['openssl', 'pkcs12',
-                 '-in', pfx_path,
-                 '-out', temp_path,
-                 '-nodes',  # Sem criptografia na chave privada
-                 '-passin', f'pass:{senha}',
-                 '-legacy'  # Suportar .pfx antigos
-                ],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Verificar se o arquivo foi criado e tem conteúdo
-                if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-                    # Verificar se contém chave privada
-                    with open(temp_path, 'r') as f:
-                        content = f.read()
-                        if 'BEGIN PRIVATE KEY' in content or 'BEGIN RSA PRIVATE KEY' in content:
-                            if self.debug:
-                                logger.debug(f"✅ Certificado .pfx extraído com sucesso para: {temp_path}")
-                            return temp_path
-                        else:
-                            logger.warning(f"⚠️ Arquivo .pfx extraído mas não contém chave privada")
-                            if os.path.exists(temp_path):
-                                os.unlink(temp_path)
-                            return None
-                else:
-                    logger.error(f"❌ Arquivo .pfx extraído mas está vazio")
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                    return None
-            else:
-                logger.error(f"❌ Erro ao extrair .pfx: {result.stderr}")
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                return None
-                
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Timeout ao extrair .pfx")
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
-        except Exception as e:
-            logger.error(f"❌ Erro ao extrair .pfx: {e}", exc_info=True)
-            if 'temp_path' in locals() and os.path.exists(temp_path):
-                os.unlink(temp_path)
-            return None
+        return materializar_pfx(pfx_path, senha, prefixo='santander_payments_')
     
     def _setup_mtls(self):
         """Configura certificados mTLS para autenticação mútua"""
@@ -255,8 +201,7 @@ class SantanderPaymentsAPI:
                     senha_pfx = os.getenv("SANTANDER_PFX_PASSWORD", os.getenv("SANTANDER_PAYMENTS_PFX_PASSWORD", "senha001"))
                     temp_pem = self._extrair_pfx_para_pem(cert_path, senha_pfx)
                     if temp_pem:
-                        self.session.cert = temp_pem
-                        self._temp_cert_file = temp_pem  # Guardar para limpar depois
+                        self._mtls_cert = temp_pem
                         logger.info(f"✅ Certificado .pfx convertido automaticamente para uso em mTLS - Pagamentos: {cert_path}")
                     else:
                         logger.error(f"❌ Não foi possível extrair certificado do .pfx: {cert_path}")
@@ -265,14 +210,14 @@ class SantanderPaymentsAPI:
                     logger.warning(f"⚠️ Arquivo .pfx não encontrado: {cert_path}")
             elif os.path.exists(cert_path):
                 # Certificado combinado (cert + key no mesmo arquivo)
-                self.session.cert = cert_path
+                self._mtls_cert = cert_path
                 logger.info(f"✅ Certificado mTLS configurado (arquivo combinado) - Pagamentos: {cert_path}")
             else:
                 logger.warning(f"⚠️ Certificado não encontrado: {cert_path}")
         elif self.config.cert_file and self.config.key_file:
             # Certificado e chave separados
             if os.path.exists(self.config.cert_file) and os.path.exists(self.config.key_file):
-                self.session.cert = (self.config.cert_file, self.config.key_file)
+                self._mtls_cert = (self.config.cert_file, self.config.key_file)
                 logger.info(f"✅ Certificado mTLS configurado (cert + key separados) - Pagamentos: cert={self.config.cert_file}, key={self.config.key_file}")
             else:
                 missing = []
@@ -282,15 +227,6 @@ class SantanderPaymentsAPI:
                     missing.append(f"key={self.config.key_file}")
                 logger.warning(f"⚠️ Certificados não encontrados: {', '.join(missing)}")
     
-    def __del__(self):
-        """Limpa arquivo temporário se foi criado a partir de .pfx"""
-        if hasattr(self, '_temp_cert_file') and self._temp_cert_file:
-            try:
-                if os.path.exists(self._temp_cert_file):
-                    os.unlink(self._temp_cert_file)
-            except Exception:
-                pass  # Ignorar erros na limpeza
-    
     def _log(self, message: str):
         """Log apenas se debug estiver ativado"""
         if self.debug:
@@ -306,9 +242,15 @@ class SantanderPaymentsAPI:
         ✅ Alinhado com implementação de Extratos que funciona.
         """
         # Verificar se token ainda é válido (com margem de 1 minuto)
-        if not force_refresh and self._access_token and self._token_expires_at:
-            if time.time() < (self._token_expires_at - 60):
-                return self._access_token
+        # ✅ OTIMIZADO (16/10/2026): cache por processo, não por instância
+        chave_token = ('santander_pagamentos', self.config.client_id, self.config.token_url or self.config.base_url)
+        if force_refresh:
+            tokens_oauth.invalidar(chave_token)
+        else:
+            token = tokens_oauth.ler(chave_token, margem_segundos=60)
+            if token:
+                self._access_token = token
+                return token
         
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
@@ -352,7 +294,7 @@ class SantanderPaymentsAPI:
                     
                     self._access_token = token_response["access_token"]
                     expires_in = token_response.get("expires_in", 900)
-                    self._token_expires_at = time.time() + expires_in
+                    self._token_expires_at = tokens_oauth.gravar(chave_token, self._access_token, expires_in)
                     
                     self._log("✅ Token OAuth2 obtido com sucesso para Pagamentos")
                     return self._access_token
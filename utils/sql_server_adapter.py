@@ -15,9 +15,11 @@ Configurao via variveis de ambiente:
 import os
 import json
 import logging
-from typing import Optional, List, Any, Dict
+import time
+from typing import Optional, List, Any, Dict, Iterator, Sequence, Tuple
 from pathlib import Path
 import socket
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
@@ -87,12 +89,28 @@ def _parse_sql_server_value(sql_server_value: str) -> tuple[str, Optional[str],
     return v, None, v
 
 
+# ✅ NOVO (16/10/2026): cache curto do probe (adapter é recriado quando env muda; evita DNS+TCP repetidos)
+SQL_PROBE_CACHE_SEC = float(os.getenv('SQL_PROBE_CACHE_SEC', '60'))
+_probe_cache: Dict[tuple, tuple] = {}
+
+
 def _quick_tcp_probe(host: str, port: int = 1433, timeout_sec: float = 1.2) -> tuple[bool, str]:
     """
     Probe rpido: DNS + tentativa TCP na porta 1433.
     Isso NO garante que a instncia named esteja acessvel (pode usar porta dinmica),
     mas ajuda a decidir ambiente sem esperar timeouts longos.
+    Resultado fica em cache por SQL_PROBE_CACHE_SEC segundos.
     """
+    key = (host, port)
+    cached = _probe_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SQL_PROBE_CACHE_SEC:
+        return cached[1]
+    result = _quick_tcp_probe_uncached(host, port, timeout_sec)
+    _probe_cache[key] = (time.monotonic(), result)
+    return result
+
+
+def _quick_tcp_probe_uncached(host: str, port: int, timeout_sec: float) -> tuple[bool, str]:
     try:
         if not host:
             return False, 'host_vazio'
@@ -317,18 +335,105 @@ class SQLServerAdapter:
                 'error': 'Nenhum adaptador SQL Server disponvel. Instale pyodbc ou configure Node.js adapter.'
             }
     
-    def _execute_with_pyodbc(self, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
-        """Executa query usando pyodbc. Se falhar, tenta Node.js adapter como fallback."""
-        try:
+    def _get_pyodbc_driver(self) -> Optional[str]:
+        """Detecta (uma vez) o ODBC Driver 18/17 para SQL Server."""
+        if not hasattr(self, '_pyodbc_driver'):
             import pyodbc
-            
-            # Detectar driver
+
             drivers = pyodbc.drivers()
             if "ODBC Driver 18 for SQL Server" in drivers:
-                driver_name = "ODBC Driver 18 for SQL Server"
+                self._pyodbc_driver = "ODBC Driver 18 for SQL Server"
             elif "ODBC Driver 17 for SQL Server" in drivers:
-                driver_name = "ODBC Driver 17 for SQL Server"
+                self._pyodbc_driver = "ODBC Driver 17 for SQL Server"
+            else:
+                self._pyodbc_driver = None
+        return self._pyodbc_driver
+
+    def _build_pyodbc_conn_str(self, driver_name: str, database: str) -> str:
+        server_full = f"{self.server}\\{self.instance}" if self.instance else self.server
+        return (
+            f"DRIVER={{{driver_name}}};"
+            f"SERVER={server_full};"
+            f"DATABASE={database};"
+            f"UID={self.username};"
+            f"PWD={self.password};"
+            "TrustServerCertificate=yes;"
+            "Encrypt=yes;"
+        )
+
+    def _connect_pyodbc(self, database: str):
+        import pyodbc
+
+        driver_name = self._get_pyodbc_driver()
+        if not driver_name:
+            raise RuntimeError("ODBC Driver 17/18 para SQL Server não encontrado no ambiente.")
+        return pyodbc.connect(self._build_pyodbc_conn_str(driver_name, database))
+
+    def _get_pyodbc_pool(self):
+        """Pool de conexões pyodbc compartilhado por servidor/usuário (conexões separadas por database)."""
+        from utils.sql_server_pyodbc_pool import get_pyodbc_pool
+
+        server_full = f"{self.server}\\{self.instance}" if self.instance else self.server
+        return get_pyodbc_pool(f"{server_full}|{self.username}|{self.password}", self._connect_pyodbc)
+
+    @contextmanager
+    def _pyodbc_connection(self, database: str):
+        """Conexão pyodbc do pool (ou avulsa, se SQL_PYODBC_POOL_ENABLED=false)."""
+        from utils.sql_server_pyodbc_pool import SQL_PYODBC_POOL_ENABLED
+
+        if SQL_PYODBC_POOL_ENABLED:
+            with self._get_pyodbc_pool().connection(database) as conn:
+                yield conn
+            return
+        conn = self._connect_pyodbc(database)
+        try:
+            yield conn
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _executar_cursor_pyodbc(conn, sql_query: str, params: Optional[List[Any]] = None) -> Dict[str, Any]:
+        cursor = conn.cursor()
+        try:
+            if params:
+                cursor.execute(sql_query, params)
             else:
+                cursor.execute(sql_query)
+
+            # ✅ IMPORTANTE: INSERT/UPDATE/DELETE não tem cursor.description e NÃO deve chamar fetchall()
+            if not cursor.description:
+                conn.commit()
+                return {
+                    'success': True,
+                    'data': [],
+                    'rows_affected': cursor.rowcount
+                }
+
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+            data = [dict(zip(columns, row)) for row in rows]
+
+            return {
+                'success': True,
+                'data': data
+            }
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def _execute_with_pyodbc(self, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """Executa query usando pyodbc (pool de conexões). Se falhar, tenta Node.js adapter como fallback."""
+        try:
+            from utils.sql_server_pyodbc_pool import is_connection_error
+
+            # Detectar driver
+            driver_name = self._get_pyodbc_driver()
+            if not driver_name:
                 # Se no tem driver, tentar Node.js somente se estiver disponvel
                 error_msg = "ODBC Driver 17/18 para SQL Server no encontrado no ambiente."
                 if self.use_node:
@@ -339,51 +444,19 @@ class SQLServerAdapter:
                 else:
                     logger.debug(f"?? Erro SQL Server (no notificado): {error_msg}")
                 return {'success': False, 'error': error_msg}
-            
-            # Construir connection string
-            server_full = f"{self.server}\\{self.instance}" if self.instance else self.server
-            conn_str = (
-                f"DRIVER={{{driver_name}}};"
-                f"SERVER={server_full};"
-                f"DATABASE={database};"
-                f"UID={self.username};"
-                f"PWD={self.password};"
-                "TrustServerCertificate=yes;"
-                "Encrypt=yes;"
-            )
-            
-            # Conectar e executar
-            conn = pyodbc.connect(conn_str)
-            try:
-                cursor = conn.cursor()
-
-                if params:
-                    cursor.execute(sql_query, params)
-                else:
-                    cursor.execute(sql_query)
 
-                # ? IMPORTANTE: INSERT/UPDATE/DELETE no tem cursor.description e NO deve chamar fetchall()
-                if not cursor.description:
-                    conn.commit()
-                    return {
-                        'success': True,
-                        'data': [],
-                        'rows_affected': cursor.rowcount
-                    }
-
-                columns = [column[0] for column in cursor.description]
-                rows = cursor.fetchall()
-                data = [dict(zip(columns, row)) for row in rows]
-
-                return {
-                    'success': True,
-                    'data': data
-                }
-            finally:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+            try:
+                with self._pyodbc_connection(database) as conn:
+                    return self._executar_cursor_pyodbc(conn, sql_query, params)
+            except Exception as e:
+                # Conexão do pool caiu (ex.: oscilação de rede/VPN): reconectar e repetir UMA vez.
+                # Só para leituras - repetir INSERT/UPDATE poderia duplicar escrita já aplicada.
+                is_leitura = sql_query.lstrip().upper().startswith(('SELECT', 'WITH'))
+                if not (is_leitura and is_connection_error(e)):
+                    raise
+                logger.warning(f"⚠️ Conexão pyodbc perdida ({e}). Reconectando...")
+                with self._pyodbc_connection(database) as conn:
+                    return self._executar_cursor_pyodbc(conn, sql_query, params)
         except Exception as e:
             error_msg = f"Erro ao executar query via pyodbc: {e}"
             logger.error(error_msg)
@@ -400,20 +473,264 @@ class SQLServerAdapter:
                 'success': False,
                 'error': error_msg
             }
-    
-    def _execute_with_node(self, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
-        """Executa query usando Node.js adapter."""
-        import subprocess
-        
+
+    def execute_many(self, sql_query: str, seq_params: Sequence[Sequence[Any]], database: Optional[str] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """
+        Executa o mesmo comando (INSERT/UPDATE/DELETE) para várias linhas de parâmetros numa única transação.
+
+        pyodbc: `fast_executemany` (parâmetros enviados em lote, statement preparado uma vez).
+        Node.js: uma requisição por linha no worker persistente (sem transação única).
+
+        Returns:
+            Dict com success, rows_affected ou error
+        """
+        database = database or self.database
+        linhas = [list(p) for p in seq_params]
+        if not linhas:
+            return {'success': True, 'rows_affected': 0}
+
+        if self.use_pyodbc and self._get_pyodbc_driver():
+            try:
+                with self._pyodbc_connection(database) as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.fast_executemany = True
+                        cursor.executemany(sql_query, linhas)
+                        conn.commit()
+                        return {'success': True, 'rows_affected': len(linhas)}
+                    finally:
+                        try:
+                            cursor.close()
+                        except Exception:
+                            pass
+            except Exception as e:
+                error_msg = f"Erro ao executar execute_many via pyodbc: {e}"
+                logger.error(error_msg)
+                if not self.use_node:
+                    if notificar_erro:
+                        self._notificar_erro_conexao(error_msg, tipo='pyodbc_erro')
+                    return {'success': False, 'error': error_msg}
+
+        if self.use_node:
+            total = 0
+            for params in linhas:
+                result = self._execute_with_node(sql_query, database, params, notificar_erro=notificar_erro)
+                if not result.get('success'):
+                    result['rows_affected'] = total
+                    return result
+                total += 1
+            return {'success': True, 'rows_affected': total}
+
+        return {
+            'success': False,
+            'error': 'Nenhum adaptador SQL Server disponível. Instale pyodbc ou configure Node.js adapter.'
+        }
+
+    def execute_transaction(self, etapas: Sequence[Tuple[str, Optional[Sequence[Sequence[Any]]]]], database: Optional[str] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """
+        Executa vários comandos na MESMA conexão e numa única transação (commit no fim, rollback se falhar).
+
+        Cada etapa é `(sql, linhas)`: com `linhas`, usa `fast_executemany`; sem, um `execute` simples.
+        Serve para staging em tabela temporária (#tmp vive na conexão) seguido de um MERGE.
+        Só pyodbc: o Node.js abre uma requisição por comando (sem transação/#tmp compartilhados).
+
+        Returns:
+            Dict com success, rows_affected (do último comando) ou error
+        """
+        database = database or self.database
+        if not (self.use_pyodbc and self._get_pyodbc_driver()):
+            return {'success': False, 'error': 'Transação multi-comando disponível apenas via pyodbc.'}
+
+        try:
+            with self._pyodbc_connection(database) as conn:
+                cursor = conn.cursor()
+                try:
+                    rows_affected = 0
+                    for sql_query, linhas in etapas:
+                        if linhas is not None:
+                            linhas = [list(p) for p in linhas]
+                            if not linhas:
+                                continue
+                            cursor.fast_executemany = True
+                            cursor.executemany(sql_query, linhas)
+                            rows_affected = len(linhas)
+                        else:
+                            cursor.execute(sql_query)
+                            rows_affected = cursor.rowcount
+                    conn.commit()
+                    return {'success': True, 'rows_affected': rows_affected}
+                except Exception:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                    raise
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+        except Exception as e:
+            error_msg = f"Erro ao executar transação via pyodbc: {e}"
+            logger.error(error_msg)
+            if notificar_erro:
+                self._notificar_erro_conexao(error_msg, tipo='pyodbc_erro')
+            return {'success': False, 'error': error_msg}
+
+    def fetch_iter(self, sql_query: str, database: Optional[str] = None, params: Optional[List[Any]] = None, chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Itera as linhas de um SELECT como dicts, buscando em blocos (`fetchmany`) sem materializar tudo.
+
+        No pyodbc a conexão fica reservada até o iterador terminar (ou ser fechado).
+        No Node.js o resultado vem inteiro do worker e é apenas iterado.
+        Erros levantam RuntimeError (não há dict de retorno num gerador).
+        """
+        database = database or self.database
+
+        if self.use_pyodbc and self._get_pyodbc_driver():
+            with self._pyodbc_connection(database) as conn:
+                cursor = conn.cursor()
+                try:
+                    if params:
+                        cursor.execute(sql_query, params)
+                    else:
+                        cursor.execute(sql_query)
+                    if not cursor.description:
+                        return
+                    columns = [column[0] for column in cursor.description]
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield dict(zip(columns, row))
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+            return
+
+        result = self.execute_query(sql_query, database, params)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error') or 'Erro ao executar query no SQL Server')
+        for row in result.get('data') or []:
+            yield row
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Estatísticas do pool pyodbc e do worker Node.js (quando em uso)."""
+        stats: Dict[str, Any] = {'pyodbc': None, 'node_worker': None}
+        if self.use_pyodbc:
+            try:
+                stats['pyodbc'] = self._get_pyodbc_pool().get_stats()
+            except Exception:
+                pass
+        worker = getattr(self, '_node_worker', None)
+        if worker is not None:
+            stats['node_worker'] = dict(worker.stats)
+        return stats
+
+    def _resolver_node_script(self) -> Optional[Path]:
+        """Localiza o script Node.js (local do projeto ou do protótipo)."""
         script_dir = Path(__file__).parent
         node_script_local = script_dir / 'sql_server_node.js'
         node_script_prototype = Path('/Users/helenomaffra/CHAT IA/backend/infrastructure/db/sql_server_node.js')
         
         if node_script_local.exists():
-            node_script = node_script_local
-        elif node_script_prototype.exists():
-            node_script = node_script_prototype
+            return node_script_local
+        if node_script_prototype.exists():
+            return node_script_prototype
+        return None
+
+    def _build_node_env(self, database: Optional[str]) -> Dict[str, str]:
+        """Prepara variáveis de ambiente (credenciais + host já resolvido) para o processo Node.js."""
+        env = os.environ.copy()
+        # ? Robustez (19/01/2026): Alguns ambientes resolvem DNS no Python mas no no Node (ex.: *.local via VPN).
+        # Resolver host no Python e passar IP para o Node evita ENOTFOUND no adapter.
+        server_for_node = self.server
+        try:
+            if self.server and not all(ch.isdigit() or ch == '.' for ch in self.server):
+                infos = socket.getaddrinfo(self.server, None)
+                ips = [i[4][0] for i in infos if i and i[4] and i[4][0]]
+                if ips:
+                    server_for_node = ips[0]
+        except Exception:
+            server_for_node = self.server
+
+        env['SQL_SERVER'] = server_for_node
+        if self.instance:
+            env['SQL_SERVER'] = f"{server_for_node}\\{self.instance}"
+        env['SQL_USERNAME'] = self.username
+        env['SQL_PASSWORD'] = self.password
+        env['SQL_DATABASE'] = database or self.database
+        return env
+
+    def _get_node_worker(self):
+        """
+        Retorna o worker Node.js persistente (um por servidor/credencial), criando sob demanda.
+        O DNS é resolvido uma única vez, na criação do worker.
+        """
+        from utils.sql_server_node_worker import get_node_worker
+
+        if getattr(self, '_node_worker', None) is None:
+            node_script = self._resolver_node_script()
+            if node_script is None:
+                return None
+            self._node_worker = get_node_worker(node_script, self._build_node_env(self.database))
+        return self._node_worker
+
+    def _execute_with_node(self, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """Executa query usando Node.js adapter (worker persistente; fallback: 1 processo por query)."""
+        from utils.sql_server_node_worker import SQL_NODE_PERSISTENT
+
+        if SQL_NODE_PERSISTENT:
+            try:
+                worker = self._get_node_worker()
+                if worker is not None:
+                    return self._execute_with_node_worker(worker, sql_query, database, params, notificar_erro=notificar_erro)
+            except RuntimeError as e:
+                logger.warning(f"⚠️ Worker Node.js indisponível ({e}). Usando 1 processo por query.")
+        return self._execute_with_node_spawn(sql_query, database, params, notificar_erro=notificar_erro)
+
+    def _execute_with_node_worker(self, worker, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """Executa query no worker Node.js persistente (suporta parâmetros `?`)."""
+        data = worker.execute(sql_query, database=database, params=params)
+        if data.get('success'):
+            return {
+                'success': True,
+                'data': data.get('data', [])
+            }
+
+        error_msg = data.get('error') or 'Erro no Node.js worker'
+        if data.get('code') and data.get('code') not in error_msg:
+            error_msg += f" (code: {data.get('code')})"
+
+        is_connection_error = any(keyword in error_msg.lower() for keyword in [
+            'econnrefused', 'etimedout', 'timeout', 'connection',
+            'connect econnrefused', 'network', 'unreachable', '172.16',
+            'login failed', 'authentication', 'cannot open database'
+        ])
+        if is_connection_error:
+            logger.warning(f"⚠️ SQL Server não acessível (fora da rede do escritório): {error_msg[:100]}")
         else:
+            logger.error(f"❌ Erro no Node.js worker: {error_msg[:200]}")
+
+        if notificar_erro:
+            tipo = 'timeout' if data.get('code') == 'ETIMEOUT' else 'node_adapter_erro'
+            self._notificar_erro_conexao(error_msg, tipo=tipo)
+        else:
+            logger.debug(f"⚠️ Erro SQL Server (não notificado): {error_msg[:100]}")
+        return {
+            'success': False,
+            'error': error_msg
+        }
+
+    def _execute_with_node_spawn(self, sql_query: str, database: str, params: Optional[List[Any]] = None, notificar_erro: bool = False) -> Dict[str, Any]:
+        """Executa query usando Node.js adapter (um processo `node` por query)."""
+        import subprocess
+        
+        node_script = self._resolver_node_script()
+        if node_script is None:
             return {
                 'success': False,
                 'error': 'Script Node.js adapter no encontrado.'
@@ -433,25 +750,7 @@ class SQLServerAdapter:
             cmd.append(database)
         
         # Preparar variveis de ambiente para passar ao Node.js
-        env = os.environ.copy()
-        # ? Robustez (19/01/2026): Alguns ambientes resolvem DNS no Python mas no no Node (ex.: *.local via VPN).
-        # Resolver host no Python e passar IP para o Node evita ENOTFOUND no adapter.
-        server_for_node = self.server
-        try:
-            if self.server and not all(ch.isdigit() or ch == '.' for ch in self.server):
-                infos = socket.getaddrinfo(self.server, None)
-                ips = [i[4][0] for i in infos if i and i[4] and i[4][0]]
-                if ips:
-                    server_for_node = ips[0]
-        except Exception:
-            server_for_node = self.server
-
-        env['SQL_SERVER'] = server_for_node
-        if self.instance:
-            env['SQL_SERVER'] = f"{server_for_node}\\{self.instance}"
-        env['SQL_USERNAME'] = self.username
-        env['SQL_PASSWORD'] = self.password
-        env['SQL_DATABASE'] = database or self.database
+        env = self._build_node_env(database)
         
         try:
             # ? CORREO: Usar stdout e stderr separadamente (no usar capture_output=True)
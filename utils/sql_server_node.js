@@ -13,6 +13,8 @@
  * Comandos:
  *   query <sql> [database] - Executa uma query SQL e retorna JSON
  *   test - Testa a conexão
+ *   serve - Worker persistente: lê requisições JSON (uma por linha) do stdin e
+ *           responde uma linha JSON por requisição no stdout (ver `serve()` abaixo)
  */
 
 // Carregar variáveis de ambiente do arquivo .env
@@ -186,6 +188,165 @@ async function executeQuery(sqlQuery, database = null) {
     }
 }
 
+// ✅ NOVO (16/10/2026): Modo worker persistente (`serve`)
+// Mantém um pool `mssql` por database aberto entre queries, evitando cold start do Node,
+// leitura do .env, DNS e login TDS a cada consulta feita pelo Python.
+const workerPools = new Map();
+
+async function getWorkerPool(database) {
+    const key = database || config.database;
+    const existing = workerPools.get(key);
+    if (existing) {
+        const pool = await existing;
+        if (pool.connected) return pool;
+        workerPools.delete(key);
+        try { await pool.close(); } catch (_) {}
+    }
+    const pending = new sql.ConnectionPool({ ...config, database: key }).connect();
+    workerPools.set(key, pending);
+    try {
+        return await pending;
+    } catch (error) {
+        workerPools.delete(key);
+        throw error;
+    }
+}
+
+/**
+ * Converte placeholders `?` (estilo pyodbc) em `@p0, @p1...` e registra os inputs.
+ * Ignora `?` dentro de literais ('...'), identificadores ([...]) e comentários.
+ */
+function bindParams(request, sqlQuery, params) {
+    if (!Array.isArray(params) || params.length === 0) return sqlQuery;
+    let out = '';
+    let idx = 0;
+    let i = 0;
+    while (i < sqlQuery.length) {
+        const ch = sqlQuery[i];
+        const next = sqlQuery[i + 1];
+        if (ch === "'" || ch === '[') {
+            const close = ch === "'" ? "'" : ']';
+            let j = i + 1;
+            while (j < sqlQuery.length) {
+                if (sqlQuery[j] === close) {
+                    if (close === "'" && sqlQuery[j + 1] === "'") { j += 2; continue; }
+                    break;
+                }
+                j++;
+            }
+            out += sqlQuery.slice(i, j + 1);
+            i = j + 1;
+        } else if (ch === '-' && next === '-') {
+            const j = sqlQuery.indexOf('\n', i);
+            const end = j === -1 ? sqlQuery.length : j;
+            out += sqlQuery.slice(i, end);
+            i = end;
+        } else if (ch === '/' && next === '*') {
+            const j = sqlQuery.indexOf('*/', i + 2);
+            const end = j === -1 ? sqlQuery.length : j + 2;
+            out += sqlQuery.slice(i, end);
+            i = end;
+        } else if (ch === '?') {
+            if (idx >= params.length) {
+                throw new Error(`Query tem mais placeholders '?' do que parâmetros (${params.length})`);
+            }
+            const name = `p${idx}`;
+            request.input(name, params[idx]);
+            out += `@${name}`;
+            idx++;
+            i++;
+        } else {
+            out += ch;
+            i++;
+        }
+    }
+    if (idx !== params.length) {
+        throw new Error(`Query tem ${idx} placeholders '?' mas ${params.length} parâmetros foram enviados`);
+    }
+    return out;
+}
+
+const inflight = new Map();
+
+async function handleWorkerRequest(msg) {
+    const pool = await getWorkerPool(msg.database);
+    const request = pool.request();
+    const query = bindParams(request, msg.sql, msg.params);
+    inflight.set(msg.id, request);
+    let timer = null;
+    if (msg.timeout_ms && msg.timeout_ms > 0) {
+        timer = setTimeout(() => { try { request.cancel(); } catch (_) {} }, msg.timeout_ms);
+    }
+    try {
+        const result = await request.query(query);
+        return {
+            id: msg.id,
+            success: true,
+            data: result.recordset || [],
+            rowsAffected: result.rowsAffected || []
+        };
+    } finally {
+        if (timer) clearTimeout(timer);
+        inflight.delete(msg.id);
+    }
+}
+
+/**
+ * Worker persistente.
+ *
+ * Entrada (uma linha JSON por requisição):
+ *   {"id": 1, "sql": "SELECT ... WHERE x = ?", "params": [123], "database": "Make", "timeout_ms": 60000}
+ *   {"op": "cancel", "id": 1}
+ *   {"op": "ping", "id": 2}
+ * Saída (uma linha JSON por resposta, sempre com o mesmo `id`):
+ *   {"id": 1, "success": true, "data": [...], "rowsAffected": [..]}
+ *   {"id": 1, "success": false, "error": "...", "code": "..."}
+ * Ao iniciar, escreve {"ready": true}. Requisições são processadas concorrentemente.
+ */
+function serve() {
+    const readline = require('readline');
+    const write = (obj) => process.stdout.write(JSON.stringify(obj) + '\n');
+    const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+    rl.on('line', (line) => {
+        if (!line.trim()) return;
+        let msg;
+        try {
+            msg = JSON.parse(line);
+        } catch (error) {
+            write({ id: null, success: false, error: `JSON inválido: ${error.message}` });
+            return;
+        }
+        if (msg.op === 'ping') {
+            write({ id: msg.id, success: true, data: [] });
+            return;
+        }
+        if (msg.op === 'cancel') {
+            const request = inflight.get(msg.id);
+            if (request) { try { request.cancel(); } catch (_) {} }
+            return;
+        }
+        handleWorkerRequest(msg)
+            .then(write)
+            .catch((error) => write({
+                id: msg.id,
+                success: false,
+                error: error.message,
+                code: error.code
+            }));
+    });
+
+    // stdin fechado = processo Python encerrou o worker
+    rl.on('close', async () => {
+        for (const pending of workerPools.values()) {
+            try { (await pending).close(); } catch (_) {}
+        }
+        process.exit(0);
+    });
+
+    write({ ready: true });
+}
+
 /**
  * Testa a conexão
  */
@@ -217,6 +378,10 @@ if (require.main === module) {
     
     (async () => {
         try {
+            if (command === 'serve') {
+                serve();
+                return;
+            }
             if (command === 'test') {
                 const result = await testConnection();
                 console.log(JSON.stringify(result, null, 2));
@@ -239,7 +404,7 @@ if (require.main === module) {
             } else {
                 console.log(JSON.stringify({
                     success: false,
-                    error: 'Comando inválido. Use: test ou query <sql> [database]'
+                    error: 'Comando inválido. Use: test, serve ou query <sql> [database]'
                 }, null, 2));
                 process.exit(1);
             }
@@ -257,5 +422,7 @@ if (require.main === module) {
 module.exports = {
     executeQuery,
     testConnection,
+    serve,
+    bindParams,
     config
 };
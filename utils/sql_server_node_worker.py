@@ -0,0 +1,286 @@
+"""
+Worker Node.js persistente para SQL Server.
+
+Em vez de executar `node sql_server_node.js query <sql>` a cada consulta (cold start do Node,
+leitura do .env, DNS e login TDS em toda query), mantém um único processo `node ... serve`
+com pool `mssql` aberto e conversa com ele via JSON delimitado por linha (stdin/stdout).
+
+Recursos:
+- várias queries em voo ao mesmo tempo (cada requisição tem `id`)
+- timeout por query (cancela a request no Node)
+- reinício automático se o processo morrer (com limite de reinícios por janela)
+- queries parametrizadas (`?` estilo pyodbc → `@p0..` no Node)
+
+Configuração via variáveis de ambiente:
+- SQL_NODE_PERSISTENT (default: true)
+- SQL_NODE_WORKER_TIMEOUT_SEC (default: 120)
+- SQL_NODE_WORKER_START_TIMEOUT_SEC (default: 15)
+- SQL_NODE_WORKER_MAX_RESTARTS (default: 5 por minuto)
+"""
+import atexit
+import itertools
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SQL_NODE_PERSISTENT = os.getenv('SQL_NODE_PERSISTENT', 'true').lower() == 'true'
+SQL_NODE_WORKER_TIMEOUT_SEC = float(os.getenv('SQL_NODE_WORKER_TIMEOUT_SEC', '120'))
+SQL_NODE_WORKER_START_TIMEOUT_SEC = float(os.getenv('SQL_NODE_WORKER_START_TIMEOUT_SEC', '15'))
+SQL_NODE_WORKER_MAX_RESTARTS = int(os.getenv('SQL_NODE_WORKER_MAX_RESTARTS', '5'))
+_RESTART_WINDOW_SEC = 60.0
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa parâmetros que o JSON não conhece (datas/Decimal) como texto para o SQL Server converter."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+class _PendingRequest:
+    __slots__ = ('event', 'response', 'proc')
+
+    def __init__(self, proc: subprocess.Popen) -> None:
+        self.event = threading.Event()
+        self.response: Optional[Dict[str, Any]] = None
+        self.proc = proc
+
+
+class NodeSqlWorker:
+    """Processo `node sql_server_node.js serve` de longa duração, seguro para uso entre threads."""
+
+    def __init__(self, node_script: Path, env: Dict[str, str], command: Optional[List[str]] = None):
+        self.node_script = Path(node_script)
+        self.env = env
+        self.command = command or ['node', str(self.node_script), 'serve']
+        self._proc: Optional[subprocess.Popen] = None
+        self._pending: Dict[int, _PendingRequest] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()        # protege _proc/_pending/_restarts
+        self._write_lock = threading.Lock()  # serializa escrita no stdin
+        self._restarts: List[float] = []
+        self._closed = False
+        self.stats = {'queries': 0, 'errors': 0, 'timeouts': 0, 'starts': 0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start_locked(self) -> None:
+        now = time.monotonic()
+        self._restarts = [t for t in self._restarts if now - t < _RESTART_WINDOW_SEC]
+        if len(self._restarts) >= SQL_NODE_WORKER_MAX_RESTARTS:
+            raise RuntimeError(
+                f'Worker Node.js reiniciado {len(self._restarts)}x no último minuto; desistindo temporariamente'
+            )
+        self._restarts.append(now)
+
+        proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            env=self.env,
+        )
+        # Aguarda handshake {"ready": true} (o script carrega .env/mssql antes de responder)
+        ready = threading.Event()
+        threading.Thread(target=self._read_stdout, args=(proc, ready), daemon=True, name='sql-node-worker-stdout').start()
+        threading.Thread(target=self._drain_stderr, args=(proc,), daemon=True, name='sql-node-worker-stderr').start()
+        if not ready.wait(SQL_NODE_WORKER_START_TIMEOUT_SEC) or proc.poll() is not None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+            raise RuntimeError('Worker Node.js não ficou pronto (verifique `npm install` e o script sql_server_node.js)')
+        self._proc = proc
+        self.stats['starts'] += 1
+        logger.info(f'✅ Worker Node.js SQL Server iniciado (pid={proc.pid})')
+
+    def _ensure_started(self) -> subprocess.Popen:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Worker Node.js encerrado')
+            if not self.is_alive():
+                if self._proc is not None or self.stats['starts']:
+                    logger.warning('⚠️ Worker Node.js SQL Server morreu. Reiniciando...')
+                self._start_locked()
+            assert self._proc is not None
+            return self._proc
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            proc = self._proc
+            self._proc = None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()  # o worker encerra sozinho ao ver EOF
+            proc.wait(timeout=3)
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        self._fail_pending('Worker Node.js encerrado', proc)
+
+    # ------------------------------------------------------------------
+    # Threads de leitura
+    # ------------------------------------------------------------------
+    def _read_stdout(self, proc: subprocess.Popen, ready: threading.Event) -> None:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                msg = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f'[sql-node-worker] linha não-JSON ignorada: {line[:200]}')
+                continue
+            if msg.get('ready'):
+                ready.set()
+                continue
+            req_id = msg.get('id')
+            with self._lock:
+                pending = self._pending.pop(req_id, None)
+            if pending is not None:
+                pending.response = msg
+                pending.event.set()
+        # EOF: processo morreu → acordar todos que esperavam resposta deste processo.
+        # `poll()` pode ainda retornar None por alguns ms, então o processo é descartado aqui.
+        ready.set()
+        with self._lock:
+            if self._proc is proc:
+                self._proc = None
+        self._fail_pending('Worker Node.js encerrou inesperadamente', proc)
+
+    @staticmethod
+    def _drain_stderr(proc: subprocess.Popen) -> None:
+        # Drenar stderr evita que o pipe encha e trave o worker
+        assert proc.stderr is not None
+        for line in proc.stderr:
+            line = line.rstrip()
+            if line:
+                logger.debug(f'[sql-node-worker] {line[:500]}')
+
+    def _fail_pending(self, error: str, proc: subprocess.Popen) -> None:
+        # Só falha requisições enviadas a ESTE processo (um novo worker pode já estar atendendo)
+        with self._lock:
+            ids = [req_id for req_id, p in self._pending.items() if p.proc is proc]
+            pendentes = [self._pending.pop(req_id) for req_id in ids]
+        for pending in pendentes:
+            pending.response = {'success': False, 'error': error, 'code': 'EWORKER'}
+            pending.event.set()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def _send(self, proc: subprocess.Popen, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload, default=_json_default, ensure_ascii=False)
+        with self._write_lock:
+            assert proc.stdin is not None
+            proc.stdin.write(line + '\n')
+            proc.stdin.flush()
+
+    def execute(self, sql_query: str, database: Optional[str] = None,
+                params: Optional[List[Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Executa uma query no worker.
+
+        Returns:
+            Dict no mesmo formato do script Node: {success, data, rowsAffected} ou {success: False, error, code}
+        """
+        timeout = timeout if timeout and timeout > 0 else SQL_NODE_WORKER_TIMEOUT_SEC
+        req_id = next(self._ids)
+        while True:
+            proc = self._ensure_started()
+            pending = _PendingRequest(proc)
+            with self._lock:
+                # Se o processo morreu entre o start e o registro, `_fail_pending` já rodou: tentar de novo
+                if self._proc is proc:
+                    self._pending[req_id] = pending
+                    break
+        payload = {
+            'id': req_id,
+            'sql': sql_query,
+            'database': database,
+            'params': list(params) if params else [],
+            'timeout_ms': int(timeout * 1000),
+        }
+        self.stats['queries'] += 1
+        try:
+            self._send(proc, payload)
+        except (BrokenPipeError, OSError, ValueError) as e:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            self.stats['errors'] += 1
+            return {'success': False, 'error': f'Falha ao enviar query ao worker Node.js: {e}', 'code': 'EWORKER'}
+
+        # Margem sobre o timeout do Node (que cancela a request do lado do servidor)
+        if not pending.event.wait(timeout + min(5.0, timeout)):
+            with self._lock:
+                self._pending.pop(req_id, None)
+            self.stats['timeouts'] += 1
+            try:
+                self._send(proc, {'op': 'cancel', 'id': req_id})
+            except Exception:
+                pass
+            return {'success': False, 'error': 'Timeout ao executar query via Node.js worker', 'code': 'ETIMEOUT'}
+
+        response = pending.response or {'success': False, 'error': 'Resposta vazia do worker Node.js'}
+        if not response.get('success'):
+            self.stats['errors'] += 1
+        return response
+
+
+_workers: Dict[tuple, NodeSqlWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_node_worker(node_script: Path, env: Dict[str, str]) -> NodeSqlWorker:
+    """Retorna o worker compartilhado para a combinação servidor/usuário/database padrão."""
+    key = (
+        str(node_script),
+        env.get('SQL_SERVER', ''),
+        env.get('SQL_USERNAME', ''),
+        env.get('SQL_PASSWORD', ''),
+        env.get('SQL_DATABASE', ''),
+    )
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            worker = NodeSqlWorker(node_script, env)
+            _workers[key] = worker
+        return worker
+
+
+def close_all_workers() -> None:
+    """Encerra todos os workers (chamado automaticamente no shutdown do processo)."""
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        worker.close()
+
+
+atexit.register(close_all_workers)
@@ -0,0 +1,218 @@
+"""
+Pool de conexões pyodbc para o SQLServerAdapter.
+
+Antes, cada `execute_query` montava a connection string e chamava `pyodbc.connect()` (login TDS
+completo por query). Este pool mantém conexões abertas por database:
+- limitado (máximo de conexões por database; chamadores esperam por vaga)
+- thread-safe
+- health check (`SELECT 1`) em conexões ociosas há mais de N segundos
+- descarte de conexões ociosas há muito tempo
+- reconexão transparente: conexões quebradas são descartadas e recriadas
+
+Configuração via variáveis de ambiente:
+- SQL_PYODBC_POOL_ENABLED (default: true)
+- SQL_PYODBC_POOL_MAX (default: 8 por database)
+- SQL_PYODBC_POOL_IDLE_SEC (default: 300)
+- SQL_PYODBC_POOL_HEALTHCHECK_SEC (default: 30)
+- SQL_PYODBC_POOL_WAIT_SEC (default: 30)
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SQL_PYODBC_POOL_ENABLED = os.getenv('SQL_PYODBC_POOL_ENABLED', 'true').lower() == 'true'
+SQL_PYODBC_POOL_MAX = int(os.getenv('SQL_PYODBC_POOL_MAX', '8'))
+SQL_PYODBC_POOL_IDLE_SEC = float(os.getenv('SQL_PYODBC_POOL_IDLE_SEC', '300'))
+SQL_PYODBC_POOL_HEALTHCHECK_SEC = float(os.getenv('SQL_PYODBC_POOL_HEALTHCHECK_SEC', '30'))
+SQL_PYODBC_POOL_WAIT_SEC = float(os.getenv('SQL_PYODBC_POOL_WAIT_SEC', '30'))
+
+# Trechos de mensagens de erro ODBC que indicam conexão quebrada (não erro de SQL)
+_CONNECTION_ERROR_MARKERS = (
+    '08s01',            # communication link failure
+    '08001',            # unable to connect
+    '08003',            # connection does not exist
+    '08004',
+    '08007',
+    'communication link failure',
+    'tcp provider',
+    'connection is busy',
+    'connection reset',
+    'broken pipe',
+    'server has gone away',
+    'not connected',
+    'closed connection',
+)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """True se o erro indica conexão quebrada (vale reconectar e tentar de novo)."""
+    msg = str(error).lower()
+    return any(marker in msg for marker in _CONNECTION_ERROR_MARKERS)
+
+
+class PyodbcConnectionPool:
+    """Pool limitado de conexões por database (a factory recebe o nome do database)."""
+
+    def __init__(self, connect: Callable[[str], Any], max_per_database: int = SQL_PYODBC_POOL_MAX,
+                 idle_timeout: float = SQL_PYODBC_POOL_IDLE_SEC,
+                 healthcheck_after: float = SQL_PYODBC_POOL_HEALTHCHECK_SEC,
+                 wait_timeout: float = SQL_PYODBC_POOL_WAIT_SEC):
+        self._connect = connect
+        self.max_per_database = max(1, max_per_database)
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._idle: Dict[str, List[Tuple[Any, float]]] = {}   # database -> [(conn, last_used)]
+        self._in_use: Dict[str, int] = {}
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0, 'healthcheck_failed': 0, 'evicted_idle': 0}
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _safe_close(conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: Any) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self, now: float) -> List[Any]:
+        expirados: List[Any] = []
+        for database, idle in self._idle.items():
+            keep = []
+            for conn, last_used in idle:
+                if now - last_used > self.idle_timeout:
+                    expirados.append(conn)
+                else:
+                    keep.append((conn, last_used))
+            self._idle[database] = keep
+        self.stats['evicted_idle'] += len(expirados)
+        return expirados
+
+    # ------------------------------------------------------------------
+    def acquire(self, database: str) -> Any:
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            candidate = None
+            last_used = 0.0
+            with self._cond:
+                now = time.monotonic()
+                expirados = self._evict_idle_locked(now)
+                idle = self._idle.setdefault(database, [])
+                if idle:
+                    candidate, last_used = idle.pop()
+                    self._in_use[database] = self._in_use.get(database, 0) + 1
+                elif self._in_use.get(database, 0) < self.max_per_database:
+                    self._in_use[database] = self._in_use.get(database, 0) + 1
+                else:
+                    restante = deadline - now
+                    if restante <= 0:
+                        raise TimeoutError(
+                            f'Pool pyodbc esgotado para {database} ({self.max_per_database} conexões em uso)'
+                        )
+                    for conn in expirados:
+                        self._safe_close(conn)
+                    self._cond.wait(restante)
+                    continue
+            for conn in expirados:
+                self._safe_close(conn)
+
+            if candidate is not None:
+                if time.monotonic() - last_used < self.healthcheck_after or self._healthy(candidate):
+                    self.stats['reused'] += 1
+                    return candidate
+                self.stats['healthcheck_failed'] += 1
+                self._safe_close(candidate)
+            try:
+                conn = self._connect(database)
+            except Exception:
+                self._release_slot(database)
+                raise
+            self.stats['created'] += 1
+            return conn
+
+    def _release_slot(self, database: str) -> None:
+        with self._cond:
+            self._in_use[database] = max(0, self._in_use.get(database, 0) - 1)
+            self._cond.notify()
+
+    def release(self, database: str, conn: Any, discard: bool = False) -> None:
+        if not discard:
+            try:
+                # Não devolver conexão com transação aberta
+                conn.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self.stats['discarded'] += 1
+            self._safe_close(conn)
+            self._release_slot(database)
+            return
+        with self._cond:
+            self._in_use[database] = max(0, self._in_use.get(database, 0) - 1)
+            self._idle.setdefault(database, []).append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, database: str) -> Iterator[Any]:
+        """Context manager: conexão do pool; descartada se o bloco falhar com erro de conexão."""
+        conn = self.acquire(database)
+        discard = False
+        try:
+            yield conn
+        except Exception as e:
+            discard = is_connection_error(e)
+            raise
+        finally:
+            self.release(database, conn, discard=discard)
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle = [conn for conns in self._idle.values() for conn, _ in conns]
+            self._idle.clear()
+        for conn in idle:
+            self._safe_close(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            data: Dict[str, Any] = dict(self.stats)
+            data['idle'] = {db: len(conns) for db, conns in self._idle.items()}
+            data['in_use'] = dict(self._in_use)
+        data['max_per_database'] = self.max_per_database
+        return data
+
+
+_pools: Dict[str, PyodbcConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pyodbc_pool(key: str, connect: Callable[[str], Any]) -> PyodbcConnectionPool:
+    """Pool compartilhado por servidor/credencial (`key`); cada pool separa conexões por database."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = PyodbcConnectionPool(connect)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()